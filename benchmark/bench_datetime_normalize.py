@@ -0,0 +1,100 @@
+"""日時文字列の変換と未来日判定のマイクロベンチマーク
+
+動画一覧の登録日時について、以下の処理の所要時間を比較する
+    変換
+        legacy : 変更前の各パーサの処理（動画ごとに strptime/strftime する）
+        cold   : normalize_datetime_list（キャッシュが空の状態）
+        warm   : normalize_datetime_list（定期更新で同じ動画を再取得した状態）
+    未来日判定
+        legacy : 変更前の FetchedVideoInfo の処理（動画ごとに strptime して datetime.now() と比較する）
+        epoch  : datetime_to_epoch_list で変換したエポック秒を get_now_epoch() と比較する
+
+Usage:
+    python ./benchmark/bench_datetime_normalize.py [-v VIDEO_NUM ...]
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from nnmm import util  # noqa: E402
+from nnmm.util import datetime_to_epoch_list, get_now_epoch, normalize_datetime_list  # noqa: E402
+
+SOURCE_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+DESTINATION_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def make_src_list(video_num: int) -> list[str]:
+    """API返り値の registeredAt を模した日時文字列リストを返す"""
+    base = datetime(2023, 12, 26, 12, 34, 56)
+    return [(base - timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%S+09:00") for i in range(video_num)]
+
+
+def normalize_legacy(src_list: list[str]) -> list[str]:
+    """変更前の経路: 動画ごとに strptime/strftime する"""
+    return [datetime.strptime(src, SOURCE_DATETIME_FORMAT).strftime(DESTINATION_DATETIME_FORMAT) for src in src_list]
+
+
+def normalize_cold(src_list: list[str]) -> list[str]:
+    """キャッシュを空にしてからまとめて変換する"""
+    util._normalize_datetime.cache_clear()
+    return normalize_datetime_list(src_list)
+
+
+def normalize_warm(src_list: list[str]) -> list[str]:
+    """キャッシュ済の状態でまとめて変換する"""
+    return normalize_datetime_list(src_list)
+
+
+def filter_legacy(dt_str_list: list[str]) -> list[str]:
+    """変更前の経路: 動画ごとに strptime して現在日時と比較する"""
+    now_date = datetime.now()
+    return [dt_str for dt_str in dt_str_list if not now_date < datetime.strptime(dt_str, DESTINATION_DATETIME_FORMAT)]
+
+
+def filter_epoch(dt_str_list: list[str]) -> list[str]:
+    """まとめて変換したエポック秒を現在日時と比較する"""
+    now_epoch = get_now_epoch()
+    epoch_list = datetime_to_epoch_list(dt_str_list)
+    return [dt_str for dt_str, epoch in zip(dt_str_list, epoch_list) if not now_epoch < epoch]
+
+
+def measure(func, number: int, repeat: int) -> float:
+    """func の1回あたりの所要時間[ms]の最小値を返す"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="datetime normalize micro benchmark.")
+    arg_parser.add_argument("-v", "--video-num", type=int, nargs="*", default=[100, 1000, 10000])
+    arg_parser.add_argument("-n", "--number", type=int, default=5, help="loops per repeat.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=5, help="repeat count.")
+    args = arg_parser.parse_args()
+
+    print(f"{'videos':>8}{'legacy[ms]':>13}{'cold[ms]':>11}{'warm[ms]':>11}{'speedup':>10}", end="")
+    print(f"{'filter legacy[ms]':>20}{'filter epoch[ms]':>19}{'speedup':>10}")
+    for video_num in args.video_num:
+        src_list = make_src_list(video_num)
+
+        # 変更前後で同じ結果が得られることを確認してから計測する
+        expect = normalize_legacy(src_list)
+        if not (expect == normalize_cold(src_list) == normalize_warm(src_list)):
+            raise ValueError(f"normalize({video_num}): result is different.")
+        if filter_legacy(expect) != filter_epoch(expect):
+            raise ValueError(f"filter({video_num}): result is different.")
+
+        legacy_ms = measure(lambda: normalize_legacy(src_list), args.number, args.repeat)
+        cold_ms = measure(lambda: normalize_cold(src_list), args.number, args.repeat)
+        warm_ms = measure(lambda: normalize_warm(src_list), args.number, args.repeat)
+        filter_legacy_ms = measure(lambda: filter_legacy(expect), args.number, args.repeat)
+        filter_epoch_ms = measure(lambda: filter_epoch(expect), args.number, args.repeat)
+        print(f"{video_num:>8}{legacy_ms:>13.3f}{cold_ms:>11.3f}{warm_ms:>11.3f}{legacy_ms / cold_ms:>9.1f}x", end="")
+        print(f"{filter_legacy_ms:>20.3f}{filter_epoch_ms:>19.3f}{filter_legacy_ms / filter_epoch_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
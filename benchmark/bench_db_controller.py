@@ -0,0 +1,185 @@
+"""MylistDBController / MylistInfoDBController のベンチマーク
+
+synthetic_db.py で MylistInfo の行数が -s で指定した数（既定 1k, 100k, 1M 行）となるDBを一時ディレクトリに生成し、
+以下のDB操作の1回あたりの所要時間を計測する
+    mylist.select                     : MylistDBController.select()
+    mylist.swap_id                    : MylistDBController.swap_id(), 先頭2件の id を交換する
+    mylist_info.select                : MylistInfoDBController.select(), 全行を取得する
+    mylist_info.select_from_mylist_url: 1マイリスト分（M 行）を取得する
+    mylist_info.upsert_from_list      : 1マイリスト分（M 行）の既存レコードを UPSERT する
+    mylist_info.update_status         : 1動画の視聴状況を更新する
+    mylist_info.update_status_in_mylist: 1マイリスト分の視聴状況をまとめて更新する
+    mylist_info.delete_in_mylist      : 1マイリスト分を削除する（削除した行は計測外で元に戻す）
+DBの状態が計測ごとに変わらないよう、視聴状況の更新は「未視聴」と「視聴済」を交互に行い、swap_id は同じ2件を交換し直す
+対象のマイリストは中ほどの1件とし、HEAVY_CASES の操作は -n によらず計測1回あたり1度だけ実行する
+計測結果は表として表示し、合わせて JSON として -o で指定したファイルに書き出す
+-b で以前の JSON を指定すると、同じ行数・操作の中央値との比を表示する（性能劣化の追跡用）
+
+Usage:
+    python ./benchmark/bench_db_controller.py [-s ROWS ...] [-v VIDEO_NUM] [-n NUMBER] [-r REPEAT]
+                                              [-o OUTPUT] [-b BASELINE]
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import insert
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).parent))
+
+from nnmm.model import MylistInfo  # noqa: E402
+from nnmm.mylist_db_controller import MylistDBController  # noqa: E402
+from nnmm.mylist_info_db_controller import MylistInfoDBController  # noqa: E402
+from nnmm.util import get_app_version, get_now_datetime  # noqa: E402
+from synthetic_db import generate  # noqa: E402
+
+# 全行を対象とする（行数に比例する）重い操作は、計測1回あたり1度だけ実行する
+HEAVY_CASES = ["mylist_info.select", "mylist_info.upsert_from_list"]
+
+
+def measure(
+    func: Callable[[], object], number: int, repeat: int, teardown: Callable[[], object] | None = None
+) -> list[float]:
+    """func を number 回実行する計測を repeat 回行い、計測ごとの1回あたりの所要時間[ms]のリストを返す
+
+    teardown は func を実行するたびに呼び出し、所要時間には含めない
+    """
+    res = []
+    for _ in range(repeat):
+        elapsed = 0.0
+        for _ in range(number):
+            start = time.perf_counter()
+            func()
+            elapsed += time.perf_counter() - start
+            if teardown:
+                teardown()
+        res.append(elapsed / number * 1000)
+    return res
+
+
+def make_cases(
+    mylist_db: MylistDBController, mylist_info_db: MylistInfoDBController
+) -> list[tuple[str, Callable[[], object], Callable[[], object] | None]]:
+    """(操作名, 計測対象, 後処理) のリストを返す"""
+    mylist_list = mylist_db.select()
+    target_url = mylist_list[len(mylist_list) // 2]["url"]
+    target_records = mylist_info_db.select_from_mylist_url(target_url)
+    if not target_records:
+        raise ValueError("target mylist has no video.")
+    target_video_id = target_records[0]["video_id"]
+    src_id, dst_id = mylist_list[0]["id"], mylist_list[min(1, len(mylist_list) - 1)]["id"]
+
+    video_status_cycle = itertools.cycle(["未視聴", ""])
+    mylist_status_cycle = itertools.cycle(["未視聴", ""])
+
+    def restore_target_records() -> None:
+        with mylist_info_db.engine.begin() as conn:
+            conn.execute(insert(MylistInfo), target_records)
+
+    return [
+        ("mylist.select", mylist_db.select, None),
+        ("mylist.swap_id", lambda: mylist_db.swap_id(src_id, dst_id), None),
+        ("mylist_info.select", mylist_info_db.select, None),
+        ("mylist_info.select_from_mylist_url", lambda: mylist_info_db.select_from_mylist_url(target_url), None),
+        ("mylist_info.upsert_from_list", lambda: mylist_info_db.upsert_from_list(target_records), None),
+        (
+            "mylist_info.update_status",
+            lambda: mylist_info_db.update_status(target_video_id, target_url, next(video_status_cycle)),
+            None,
+        ),
+        (
+            "mylist_info.update_status_in_mylist",
+            lambda: mylist_info_db.update_status_in_mylist(target_url, next(mylist_status_cycle)),
+            None,
+        ),
+        ("mylist_info.delete_in_mylist", lambda: mylist_info_db.delete_in_mylist(target_url), restore_target_records),
+    ]
+
+
+def load_baseline(path: str | None) -> dict[tuple[int, str], float]:
+    """以前の計測結果の JSON から {(行数, 操作名): 中央値[ms]} を返す"""
+    if not path:
+        return {}
+    baseline = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {(r["rows"], r["case"]): r["median_ms"] for r in baseline["results"]}
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="MylistDBController / MylistInfoDBController benchmark.")
+    arg_parser.add_argument("-s", "--rows", type=int, nargs="*", default=[1000, 100000, 1000000])
+    arg_parser.add_argument("-v", "--video-num", type=int, default=100, help="number of videos per mylist.")
+    arg_parser.add_argument("-u", "--unwatched-ratio", type=float, default=0.2, help="ratio of unwatched videos.")
+    arg_parser.add_argument("--seed", type=int, default=0, help="random seed for the synthetic DB.")
+    arg_parser.add_argument("-n", "--number", type=int, default=10, help="loops per repeat.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=3, help="repeat count.")
+    arg_parser.add_argument("-o", "--output", default="bench_db_controller.json", help="JSON result path.")
+    arg_parser.add_argument("-b", "--baseline", help="previous JSON result to compare with.")
+    args = arg_parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    dataset_list = []
+    result_list = []
+    print(f"{'rows':>9}{'case':>38}{'min[ms]':>12}{'median[ms]':>12}{'vs base':>9}")
+    for rows in args.rows:
+        mylist_num = max(1, rows // args.video_num)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = Path(temp_dir) / "NNMM_DB.db"
+            summary = generate(str(db_path), mylist_num, args.video_num, args.unwatched_ratio, args.seed)
+            dataset_list.append(summary | {"db_bytes": db_path.stat().st_size})
+
+            mylist_db = MylistDBController(str(db_path))
+            mylist_info_db = MylistInfoDBController(str(db_path))
+            for name, func, teardown in make_cases(mylist_db, mylist_info_db):
+                number = 1 if name in HEAVY_CASES else args.number
+                samples = measure(func, number, args.repeat, teardown)
+                median_ms = statistics.median(samples)
+                result_list.append({
+                    "rows": summary["rows"],
+                    "mylist_num": mylist_num,
+                    "video_num": args.video_num,
+                    "case": name,
+                    "number": number,
+                    "repeat": args.repeat,
+                    "min_ms": min(samples),
+                    "median_ms": median_ms,
+                    "samples_ms": samples,
+                })
+                base_ms = baseline.get((summary["rows"], name))
+                ratio = f"{median_ms / base_ms:>8.2f}x" if base_ms else f"{'-':>9}"
+                print(f"{summary['rows']:>9}{name:>38}{min(samples):>12.3f}{median_ms:>12.3f}{ratio}")
+            mylist_db.engine.dispose()
+            mylist_info_db.engine.dispose()
+
+    report = {
+        "benchmark": "bench_db_controller",
+        "version": get_app_version(),
+        "created_at": get_now_datetime(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "params": {
+            "video_num": args.video_num,
+            "unwatched_ratio": args.unwatched_ratio,
+            "seed": args.seed,
+            "number": args.number,
+            "repeat": args.repeat,
+        },
+        "datasets": dataset_list,
+        "results": result_list,
+    }
+    Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"result -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""find_values / JsonPath のマイクロベンチマーク
+
+大きなシリーズAPI返り値と投稿動画ページ初期データを模したJSONについて、
+各パーサが行っている値の取り出しを以下の3通りで実行して所要時間を比較する
+    legacy    : 変更前の再帰版 find_values（階層ごとにリストを生成して extend する）
+    find_values: 反復版 find_values（木全体を走査するが再帰とリスト生成を行わない）
+    JsonPath  : 事前コンパイル済のキーパス（パスに沿った要素のみを辿る）
+
+Usage:
+    python ./benchmark/bench_json_path.py [-v VIDEO_NUM ...]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import Any
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from nnmm.util import JsonPath, find_values  # noqa: E402
+from nnmm.video_info_fetcher.series_api_response_json_parser import SeriesAPIResponseJsonParser  # noqa: E402
+from nnmm.video_info_fetcher.uploaded_html_parser import UploadedHtmlParser  # noqa: E402
+
+
+def legacy_find_values(
+    obj: Any,
+    key: str,
+    is_predict_one: bool = False,
+    key_white_list: list[str] = None,
+    key_black_list: list[str] = None,
+) -> list | Any:
+    """比較用: 変更前の再帰版 find_values"""
+    if not key_white_list:
+        key_white_list = []
+    if not key_black_list:
+        key_black_list = []
+
+    def _inner_helper(inner_obj: Any, inner_key: str, inner_result: list) -> list:
+        if isinstance(inner_obj, dict) and (inner_dict := inner_obj):
+            for k, v in inner_dict.items():
+                if k == inner_key:
+                    inner_result.append(v)
+                if key_white_list and (k not in key_white_list):
+                    continue
+                if k in key_black_list:
+                    continue
+                inner_result.extend(_inner_helper(v, inner_key, []))
+        if isinstance(inner_obj, list) and (inner_list := inner_obj):
+            for element in inner_list:
+                inner_result.extend(_inner_helper(element, inner_key, []))
+        return inner_result
+
+    result = _inner_helper(obj, key, [])
+    if not is_predict_one:
+        return result
+
+    if len(result) < 1:
+        raise ValueError(f"Value of key='{key}' is not found.")
+    if len(result) > 1:
+        raise ValueError(f"Value of key='{key}' are multiple found.")
+    return result[0]
+
+
+def make_video(i: int) -> dict:
+    """API返り値の動画1件分を模した辞書を返す"""
+    return {
+        "type": "essential",
+        "id": f"sm{10000000 + i}",
+        "title": f"動画タイトル_{i}",
+        "registeredAt": "2023-12-26T12:34:56+09:00",
+        "count": {"view": i * 100, "comment": i * 10, "mylist": i, "like": i},
+        "thumbnail": {
+            "url": f"https://nicovideo.cdn.nimg.jp/thumbnails/{i}/{i}",
+            "middleUrl": f"https://nicovideo.cdn.nimg.jp/thumbnails/{i}/{i}.M",
+            "largeUrl": f"https://nicovideo.cdn.nimg.jp/thumbnails/{i}/{i}.L",
+            "nHdUrl": None,
+        },
+        "duration": 300,
+        "shortDescription": "説明文" * 20,
+        "latestCommentSummary": "コメント",
+        "isChannelVideo": False,
+        "isPaymentRequired": False,
+        "playbackPosition": None,
+        "owner": {"ownerType": "user", "id": "11111111", "name": "投稿者1", "iconUrl": "https://example/icon.jpg"},
+        "requireSensitiveMasking": False,
+        "videoLive": None,
+        "9d091f87": False,
+        "acf68865": False,
+    }
+
+
+def make_series_json(video_num: int) -> dict:
+    """シリーズAPI返り値を模した辞書を返す"""
+    return {
+        "meta": {"status": 200},
+        "data": {
+            "detail": {
+                "id": 123456,
+                "owner": {"type": "user", "id": "11111111", "user": {"nickname": "投稿者1", "isPremium": True}},
+                "title": "テスト用シリーズ1",
+                "description": "シリーズ説明" * 50,
+                "createdAt": "2023-12-26T12:34:56+09:00",
+            },
+            "totalCount": video_num,
+            "items": [
+                {"meta": {"id": f"sm{10000000 + i}", "order": i}, "video": make_video(i)} for i in range(video_num)
+            ],
+        },
+    }
+
+
+def make_uploaded_json(video_num: int) -> dict:
+    """投稿動画ページの初期データを模した辞書を返す"""
+    return {
+        "state": {
+            "userDetails": {
+                "userDetails": {
+                    "type": "user",
+                    "user": {"id": 11111111, "nickname": "投稿者1", "description": "紹介文" * 100},
+                    "followStatus": {"isFollowing": False},
+                }
+            },
+            "userVideos": {"sortKey": "registeredAt", "sortOrder": "desc"},
+        },
+        "nvapi": [
+            {
+                "query": {"path": "/v3/users/11111111/videos"},
+                "body": {
+                    "meta": {"status": 200},
+                    "data": {"items": [{"series": None, "essential": make_video(i)} for i in range(video_num)]},
+                },
+            }
+        ],
+    }
+
+
+def series_legacy(json_dict: dict) -> tuple:
+    """変更前の SeriesAPIResponseJsonParser の値の取り出し"""
+    username = legacy_find_values(json_dict, "nickname", True, ["data", "detail", "owner", "user"], [])
+    title = legacy_find_values(json_dict, "title", True, ["data", "detail"], [])
+    items_dict = legacy_find_values(json_dict, "items", True, [], [])
+    video_id_list = legacy_find_values(items_dict, "id", False, ["video"], ["owner"])
+    title_list = legacy_find_values(items_dict, "title", False, [], [])
+    registered_at_list = legacy_find_values(items_dict, "registeredAt", False, [], [])
+    return (username, title, video_id_list, title_list, registered_at_list)
+
+
+def series_find_values(json_dict: dict) -> tuple:
+    """反復版 find_values での同等の取り出し"""
+    username = find_values(json_dict, "nickname", True, ["data", "detail", "owner", "user"], [])
+    title = find_values(json_dict, "title", True, ["data", "detail"], [])
+    items_dict = find_values(json_dict, "items", True, [], [])
+    video_id_list = find_values(items_dict, "id", False, ["video"], ["owner"])
+    title_list = find_values(items_dict, "title", False, [], [])
+    registered_at_list = find_values(items_dict, "registeredAt", False, [], [])
+    return (username, title, video_id_list, title_list, registered_at_list)
+
+
+def series_json_path(json_dict: dict) -> tuple:
+    """現在の SeriesAPIResponseJsonParser の値の取り出し"""
+    p = SeriesAPIResponseJsonParser
+    username = p.USERNAME_PATH.find_one(json_dict)
+    title = p.TITLE_PATH.find_one(json_dict)
+    items_dict = p.ITEMS_PATH.find_one(json_dict)
+    video_id_list = p.ITEM_VIDEO_ID_PATH.find_all(items_dict)
+    title_list = p.ITEM_TITLE_PATH.find_all(items_dict)
+    registered_at_list = p.ITEM_REGISTERED_AT_PATH.find_all(items_dict)
+    return (username, title, video_id_list, title_list, registered_at_list)
+
+
+def uploaded_legacy(data: dict) -> tuple:
+    """変更前の UploadedHtmlParser の値の取り出し"""
+    username = legacy_find_values(data, "nickname", True, ["state", "userDetails", "userDetails", "user"], [])
+    items = legacy_find_values(data["nvapi"][0], "items", True, ["body", "data", "items"], [])
+    return (username, items)
+
+
+def uploaded_find_values(data: dict) -> tuple:
+    """反復版 find_values での同等の取り出し"""
+    username = find_values(data, "nickname", True, ["state", "userDetails", "userDetails", "user"], [])
+    items = find_values(data["nvapi"][0], "items", True, ["body", "data", "items"], [])
+    return (username, items)
+
+
+def uploaded_json_path(data: dict) -> tuple:
+    """現在の UploadedHtmlParser の値の取り出し"""
+    username = UploadedHtmlParser.USERNAME_PATH.find_one(data)
+    items = UploadedHtmlParser.ITEMS_PATH.find_one(data["nvapi"][0])
+    return (username, items)
+
+
+def measure(func, number: int, repeat: int) -> float:
+    """func の1回あたりの所要時間[ms]の最小値を返す"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="find_values / JsonPath micro benchmark.")
+    arg_parser.add_argument("-v", "--video-num", type=int, nargs="*", default=[100, 1000, 10000])
+    arg_parser.add_argument("-n", "--number", type=int, default=5, help="loops per repeat.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=5, help="repeat count.")
+    args = arg_parser.parse_args()
+
+    cases = [
+        ("series", make_series_json, series_legacy, series_find_values, series_json_path),
+        ("uploaded", make_uploaded_json, uploaded_legacy, uploaded_find_values, uploaded_json_path),
+    ]
+    print(f"{'payload':<10}{'videos':>8}{'legacy[ms]':>13}{'find_values[ms]':>17}{'JsonPath[ms]':>14}{'speedup':>10}")
+    for name, make_json, legacy_func, find_values_func, json_path_func in cases:
+        for video_num in args.video_num:
+            json_dict = make_json(video_num)
+
+            # 3通りで同じ結果が得られることを確認してから計測する
+            expect = legacy_func(json_dict)
+            if not (expect == find_values_func(json_dict) == json_path_func(json_dict)):
+                raise ValueError(f"{name}({video_num}): result is different.")
+
+            legacy_ms = measure(lambda: legacy_func(json_dict), args.number, args.repeat)
+            find_values_ms = measure(lambda: find_values_func(json_dict), args.number, args.repeat)
+            json_path_ms = measure(lambda: json_path_func(json_dict), args.number, args.repeat)
+            speedup = legacy_ms / json_path_ms
+            print(
+                f"{name:<10}{video_num:>8}{legacy_ms:>13.3f}{find_values_ms:>17.3f}{json_path_ms:>14.3f}{speedup:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
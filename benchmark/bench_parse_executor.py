@@ -0,0 +1,115 @@
+"""ParseExecutor による fetch 結果の解析のプロセスプール化のベンチマーク
+
+擬似的な大きな投稿動画ページ（既定 64 ページ）を、fetch を行うスレッド群（既定 8 スレッド）で並行に解析し、
+全ページの解析が終わるまでの所要時間を以下の2通りで比較する
+    thread  : 各スレッド内で解析する（ParseExecutor のプロセス数 0, GIL により直列化される）
+    process : ParseExecutor のプロセスプールに bytes で送って解析させ、タプルから ValueObject に復元する
+プロセスプールは計測前に起動済にしておき、起動時間は含めない
+解析のスケールはマシンのコア数が上限となる（os.cpu_count() を合わせて表示する）
+
+Usage:
+    python ./benchmark/bench_parse_executor.py [-m PAGE_NUM] [-v VIDEO_NUM] [-t THREAD_NUM] [-p PROCESS_NUM ...]
+"""
+
+import argparse
+import asyncio
+import html
+import os
+import sys
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import orjson
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from nnmm.util import MylistType  # noqa: E402
+from nnmm.video_info_fetcher.parse_executor import ParseExecutor  # noqa: E402
+from nnmm.video_info_fetcher.value_objects.fetched_page_video_info import FetchedPageVideoInfo  # noqa: E402
+
+
+def mylist_url(index: int) -> str:
+    return f"https://www.nicovideo.jp/user/{10000000 + index}/video"
+
+
+def make_page(video_num: int) -> str:
+    """投稿動画ページに近い構造の擬似的なページを返す"""
+    items = [
+        {
+            "essential": {
+                "id": f"sm{20000000 + i}",
+                "title": f"動画タイトル_{i}",
+                "registeredAt": "2023-12-26T12:34:56+09:00",
+                "count": {"view": i * 100, "comment": i * 10, "mylist": i, "like": i},
+                "thumbnail": {"url": f"https://nicovideo.cdn.nimg.jp/thumbnails/{i}/{i}"},
+                "shortDescription": "説明文" * 20,
+            }
+        }
+        for i in range(video_num)
+    ]
+    initial_data = {
+        "state": {"userDetails": {"userDetails": {"user": {"nickname": "投稿者1", "description": "紹介文" * 100}}}},
+        "nvapi": [{"body": {"data": {"items": items, "totalCount": video_num}}}],
+    }
+    attribute_value = html.escape(orjson.dumps(initial_data).decode(), quote=True)
+    filler = '<div class="common-header"><a href="/ranking" data-ref="header">ランキング</a></div>\n' * 3000
+    return (
+        "<!DOCTYPE html><html lang='ja'><head><meta charset='utf-8'><title>投稿者1さんの投稿動画</title></head>"
+        f"<body>{filler}"
+        f'<div id="js-initial-userpage-data" data-initial-data="{attribute_value}" data-env="{{}}"></div>'
+        f"{filler}</body></html>"
+    )
+
+
+def run(page: str, page_num: int, thread_num: int) -> list[FetchedPageVideoInfo]:
+    """fetch を行うスレッド群と同様に、各スレッドで asyncio.run して解析する"""
+
+    def parse(index: int) -> FetchedPageVideoInfo:
+        return asyncio.run(ParseExecutor.parse(MylistType.uploaded, mylist_url(index), page))
+
+    with ThreadPoolExecutor(max_workers=thread_num) as executor:
+        return list(executor.map(parse, range(page_num)))
+
+
+def measure(func, number: int, repeat: int) -> float:
+    """func の1回あたりの所要時間[ms]の最小値を返す"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="ParseExecutor benchmark.")
+    arg_parser.add_argument("-m", "--page-num", type=int, default=64, help="number of pages.")
+    arg_parser.add_argument("-v", "--video-num", type=int, default=100, help="number of videos per page.")
+    arg_parser.add_argument("-t", "--thread-num", type=int, default=8, help="fetch threads.")
+    arg_parser.add_argument("-p", "--process-num", type=int, nargs="+", default=[1, 2, 4], help="parse processes.")
+    arg_parser.add_argument("-n", "--number", type=int, default=1, help="loops per repeat.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=3, help="repeat count.")
+    args = arg_parser.parse_args()
+
+    page = make_page(args.video_num)
+    print(
+        f"pages={args.page_num}, videos/page={args.video_num}, page_size={len(page.encode()) / 1024:.0f}KB, "
+        f"threads={args.thread_num}, cpu_count={os.cpu_count()}"
+    )
+    print(f"{'mode':<10}{'processes':>10}{'total[ms]':>12}{'speedup':>10}")
+
+    try:
+        ParseExecutor.configure(0)
+        expect = run(page, args.page_num, args.thread_num)
+        thread_ms = measure(lambda: run(page, args.page_num, args.thread_num), args.number, args.repeat)
+        print(f"{'thread':<10}{0:>10}{thread_ms:>12.1f}{1.0:>9.2f}x")
+
+        for process_num in args.process_num:
+            ParseExecutor.configure(process_num)
+            # 同じ解析結果が得られることを確認し、合わせてプロセスプールを起動しておく
+            if run(page, args.page_num, args.thread_num) != expect:
+                raise ValueError(f"processes={process_num}: parse result is different from thread.")
+            process_ms = measure(lambda: run(page, args.page_num, args.thread_num), args.number, args.repeat)
+            print(f"{'process':<10}{process_num:>10}{process_ms:>12.1f}{thread_ms / process_ms:>9.2f}x")
+    finally:
+        ParseExecutor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
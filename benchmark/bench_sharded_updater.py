@@ -0,0 +1,204 @@
+"""ShardedUpdater によるマイリスト更新の CPU 処理のマルチプロセス化のベンチマーク
+
+擬似的な大量のマイリスト（既定 2,000 件）について、fetch 後の CPU 処理（ページ解析, 動画情報APIの応答解析,
+FetchedVideoInfo の構築, 差分確認）を以下の2通りで行い、所要時間を比較する
+    serial  : 1プロセスで全マイリストを順に処理する（スレッドで並行させても GIL により直列化される処理に相当）
+    sharded : ShardedUpdater.iter_shard_results() でシャードに分け、-p で指定した数のワーカープロセスで処理する
+通信は行わず、ページと動画情報APIの応答はワーカープロセス内で生成済のものを解析する
+sharded の total はワーカープロセスの起動を含む所要時間で、spawn は解析を行わないシャード関数での所要時間
+cpu = total - spawn を CPU 処理の所要時間とし、serial に対する speedup と efficiency（speedup / プロセス数）を示す
+CPU 処理のスケールはマシンのコア数が上限となる（os.cpu_count() を合わせて表示する）
+
+Usage:
+    python ./benchmark/bench_sharded_updater.py [-m MYLIST_NUM] [-v VIDEO_NUM] [-p PROCESS_NUM ...] [-r REPEAT]
+"""
+
+import argparse
+import asyncio
+import functools
+import html
+import os
+import sys
+import timeit
+from pathlib import Path
+
+import orjson
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from nnmm.mylist_db_controller import MylistDBController  # noqa: E402
+from nnmm.mylist_info_db_controller import MylistInfoDBController  # noqa: E402
+from nnmm.process.update_mylist.database_updater import DatabaseUpdater  # noqa: E402
+from nnmm.process.update_mylist.sharded_updater import ShardedUpdater  # noqa: E402
+from nnmm.process.update_mylist.value_objects.mylist_diff import MylistDiff  # noqa: E402
+from nnmm.process.update_mylist.value_objects.mylist_with_video import MylistWithVideo  # noqa: E402
+from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList  # noqa: E402
+from nnmm.process.update_mylist.value_objects.shard_task import ShardTask  # noqa: E402
+from nnmm.process.update_mylist.value_objects.typed_mylist import TypedMylist  # noqa: E402
+from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList  # noqa: E402
+from nnmm.process.value_objects.headless_host import HeadlessHost  # noqa: E402
+from nnmm.process.value_objects.process_info import ProcessInfo  # noqa: E402
+from nnmm.util import MylistType, Result  # noqa: E402
+from nnmm.video_info_fetcher.parser_factory import ParserFactory  # noqa: E402
+from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo  # noqa: E402
+from nnmm.video_info_fetcher.video_info_fetcher_base import VideoInfoFetcherBase  # noqa: E402
+
+CHECKED_AT = "2023-12-26 12:34:56"
+
+
+def mylist_url(index: int) -> str:
+    return f"https://www.nicovideo.jp/user/{10000000 + index}/video"
+
+
+@functools.cache
+def make_page(video_num: int) -> str:
+    """投稿動画ページに近い構造の擬似的なページを返す, ワーカープロセスごとに1度だけ生成する"""
+    items = [
+        {
+            "essential": {
+                "id": f"sm{20000000 + i}",
+                "title": f"動画タイトル_{i}",
+                "registeredAt": "2023-12-26T12:34:56+09:00",
+                "count": {"view": i * 100, "comment": i * 10, "mylist": i, "like": i},
+                "thumbnail": {"url": f"https://nicovideo.cdn.nimg.jp/thumbnails/{i}/{i}"},
+                "shortDescription": "説明文" * 20,
+            }
+        }
+        for i in range(video_num)
+    ]
+    initial_data = {
+        "state": {"userDetails": {"userDetails": {"user": {"nickname": "投稿者1", "description": "紹介文" * 100}}}},
+        "nvapi": [{"body": {"data": {"items": items, "totalCount": video_num}}}],
+    }
+    attribute_value = html.escape(orjson.dumps(initial_data).decode(), quote=True)
+    filler = '<div class="common-header"><a href="/ranking" data-ref="header">ランキング</a></div>\n' * 300
+    return (
+        "<!DOCTYPE html><html lang='ja'><head><meta charset='utf-8'><title>投稿者1さんの投稿動画</title></head>"
+        f"<body>{filler}"
+        f'<div id="js-initial-userpage-data" data-initial-data="{attribute_value}" data-env="{{}}"></div>'
+        f"{filler}</body></html>"
+    )
+
+
+@functools.cache
+def make_api_response_list(video_num: int) -> list[str]:
+    """動画情報API（getthumbinfo）の擬似的な応答を返す"""
+    return [
+        "<?xml version='1.0' encoding='UTF-8'?><nicovideo_thumb_response status='ok'><thumb>"
+        f"<video_id>sm{20000000 + i}</video_id><title>動画タイトル_{i}</title>"
+        "<first_retrieve>2023-12-26T12:34:56+09:00</first_retrieve>"
+        f"<watch_url>https://www.nicovideo.jp/watch/sm{20000000 + i}</watch_url>"
+        "<user_nickname>投稿者1</user_nickname></thumb></nicovideo_thumb_response>"
+        for i in range(video_num)
+    ]
+
+
+async def _parse_shard(task_list: list[ShardTask], video_num: int) -> list[MylistDiff]:
+    diff_list = []
+    for task in task_list:
+        parser = ParserFactory.create(MylistType.uploaded, task.mylist_url, make_page(video_num))
+        page_info = await parser.parse()
+        api_info = VideoInfoFetcherBase.parse_api_response_list(
+            page_info.video_id_list, make_api_response_list(video_num)
+        )
+        fetched_info = FetchedVideoInfo.merge(page_info, api_info)
+        diff_list.append(DatabaseUpdater.make_diff(task.mylist_url, task.video_status_dict, fetched_info, CHECKED_AT))
+    return diff_list
+
+
+def parse_shard(task_list: list[ShardTask], is_backfill: bool, video_num: int) -> list[MylistDiff]:
+    """fetch_shard の代わりにワーカープロセスで実行する, 通信を行わずに CPU 処理のみを行う"""
+    return asyncio.run(_parse_shard(task_list, video_num))
+
+
+def noop_shard(task_list: list[ShardTask], is_backfill: bool) -> list[MylistDiff]:
+    """ワーカープロセスの起動とシャードの受け渡しのみの所要時間を測るためのシャード関数"""
+    return [MylistDiff(task.mylist_url, Result.success, checked_at=CHECKED_AT) for task in task_list]
+
+
+def make_mylist_with_video_list(mylist_num: int) -> MylistWithVideoList:
+    """動画を持たないマイリストを mylist_num 個持つ MylistWithVideoList を返す"""
+    mylist_with_video_list = []
+    for i in range(mylist_num):
+        typed_mylist = TypedMylist.create({
+            "id": i,
+            "username": f"投稿者{i}",
+            "mylistname": "投稿動画",
+            "type": "uploaded",
+            "showname": f"投稿者{i}さんの投稿動画",
+            "url": mylist_url(i),
+            "created_at": CHECKED_AT,
+            "updated_at": CHECKED_AT,
+            "checked_at": CHECKED_AT,
+            "check_interval": "15分",
+            "check_failed_count": 0,
+            "is_include_new": False,
+        })
+        mylist_with_video_list.append(MylistWithVideo(typed_mylist, TypedVideoList.create([])))
+    return MylistWithVideoList(mylist_with_video_list)
+
+
+def run_serial(mylist_num: int, video_num: int) -> list[MylistDiff]:
+    task_list = [ShardTask(mylist_url(i), {}) for i in range(mylist_num)]
+    return parse_shard(task_list, False, video_num)
+
+
+def run_sharded(process_info: ProcessInfo, mylist_num: int, process_num: int, shard_func) -> list[MylistDiff]:
+    mylist_with_video_list = make_mylist_with_video_list(mylist_num)
+    updater = ShardedUpdater(mylist_with_video_list, process_info, False, process_num, shard_func=shard_func)
+    diff_list = [diff for shard_diff_list in updater.iter_shard_results() for diff in shard_diff_list]
+    # 終わったシャードから順に返るため、URLの順に並べ直す
+    return sorted(diff_list, key=lambda diff: int(diff.mylist_url.split("/")[-2]))
+
+
+def measure(func, number: int, repeat: int) -> float:
+    """func の1回あたりの所要時間[ms]の最小値を返す"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="ShardedUpdater benchmark.")
+    arg_parser.add_argument("-m", "--mylist-num", type=int, default=2000, help="number of mylists.")
+    arg_parser.add_argument("-v", "--video-num", type=int, default=30, help="number of videos per mylist.")
+    arg_parser.add_argument("-p", "--process-num", type=int, nargs="+", default=[1, 2, 4], help="worker processes.")
+    arg_parser.add_argument("-n", "--number", type=int, default=1, help="loops per repeat.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=3, help="repeat count.")
+    args = arg_parser.parse_args()
+
+    db_fullpath = ":memory:"
+    mylist_db = MylistDBController(db_fullpath)
+    mylist_info_db = MylistInfoDBController(db_fullpath)
+    process_info = ProcessInfo(
+        "-BENCH_SHARDED_UPDATE-", HeadlessHost(mylist_db, mylist_info_db), mylist_db, mylist_info_db
+    )
+    shard_func = functools.partial(parse_shard, video_num=args.video_num)
+
+    # 全ての方式で同じ更新内容が得られることを確認してから計測する
+    expect = run_serial(args.mylist_num, args.video_num)
+    for process_num in args.process_num:
+        if run_sharded(process_info, args.mylist_num, process_num, shard_func) != expect:
+            raise ValueError(f"processes={process_num}: MylistDiff is different from serial.")
+
+    print(f"mylists={args.mylist_num}, videos/mylist={args.video_num}, cpu_count={os.cpu_count()}")
+    print(
+        f"{'mode':<10}{'processes':>10}{'total[ms]':>12}{'spawn[ms]':>12}{'cpu[ms]':>12}{'speedup':>10}{'efficiency':>12}"
+    )
+    serial_ms = measure(lambda: run_serial(args.mylist_num, args.video_num), args.number, args.repeat)
+    print(f"{'serial':<10}{1:>10}{serial_ms:>12.1f}{0.0:>12.1f}{serial_ms:>12.1f}{1.0:>9.2f}x{1.0:>12.2f}")
+    for process_num in args.process_num:
+        total_ms = measure(
+            lambda: run_sharded(process_info, args.mylist_num, process_num, shard_func), args.number, args.repeat
+        )
+        spawn_ms = measure(
+            lambda: run_sharded(process_info, args.mylist_num, process_num, noop_shard), args.number, args.repeat
+        )
+        cpu_ms = max(total_ms - spawn_ms, 1e-6)
+        speedup = serial_ms / cpu_ms
+        print(
+            f"{'sharded':<10}{process_num:>10}{total_ms:>12.1f}{spawn_ms:>12.1f}{cpu_ms:>12.1f}"
+            f"{speedup:>9.2f}x{speedup / process_num:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
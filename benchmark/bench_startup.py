@@ -0,0 +1,233 @@
+"""起動時間（最初の描画まで）のベンチマーク
+
+一時ディレクトリに設定ファイルと擬似的なマイリストを登録したDBを用意し、子プロセスで GUI を起動して
+プロセス起動からの経過時間を以下の時点ごとに計測する（QT_QPA_PLATFORM=offscreen で実行する）
+    import : nnmm.main_window の読み込み完了
+    init   : MainWindow の構築完了
+    paint  : ウィンドウの最初の描画（Paint イベント）
+    loaded : DBからのマイリスト一覧の読み込みと表示の完了
+起動方式は以下の2通りで比較する
+    eager : 変更前の起動に相当する, 通信・解析用のモジュールを起動時に読み込み、マイリスト一覧を表示してから描画する
+    lazy  : 通信・解析用のモジュールは初回の更新時に読み込み、描画後にイベントループ上でマイリスト一覧を読み込む
+合わせて python -X importtime による nnmm.main_window の読み込み時間の内訳（累積時間の上位）を表示する
+目標は lazy の paint が 1 秒未満であること
+
+Usage:
+    python ./benchmark/bench_startup.py [-m MYLIST_NUM] [-r REPEAT] [-t TOP]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+SRC_PATH = REPO_ROOT / "src"
+sys.path.append(str(SRC_PATH))
+
+from nnmm.mylist_db_controller import MylistDBController  # noqa: E402
+
+TARGET_PAINT_MS = 1000
+HEAVY_MODULES = ["httpx", "bs4", "browser_cookie3", "xmltodict"]
+RESULT_PREFIX = "BENCH_STARTUP_RESULT:"
+POINTS = ["import", "init", "paint", "loaded"]
+
+
+def run_child(mode: str, start: float) -> None:
+    """子プロセスとして GUI を起動し、各時点のプロセス起動からの経過時間[ms]を出力する"""
+    import asyncio
+
+    import qdarktheme
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    if mode == "eager":
+        import nnmm.process.update_mylist.fetcher  # noqa: F401
+        import nnmm.video_info_fetcher.parser_factory  # noqa: F401
+    from nnmm.main_window import MainWindow
+
+    elapsed = {"import": (time.time() - start) * 1000}
+    if not hasattr(asyncio, "WindowsSelectorEventLoopPolicy"):
+        # Windows 以外で計測する場合, MainWindow が設定するイベントループポリシーを既定のものに読み替える
+        asyncio.WindowsSelectorEventLoopPolicy = asyncio.DefaultEventLoopPolicy
+    app = QApplication([])
+
+    def finish_if_done() -> None:
+        if "paint" in elapsed and "loaded" in elapsed:
+            QTimer.singleShot(0, app.quit)
+
+    load_initial_data = MainWindow.load_initial_data
+    is_loaded = False
+
+    def load_initial_data_once(self):
+        # eager では描画前に読み込み済のため、イベントループ上での2度目の読み込みは行わない
+        nonlocal is_loaded
+        if is_loaded:
+            return None
+        is_loaded = True
+        res = load_initial_data(self)
+        elapsed["loaded"] = (time.time() - start) * 1000
+        finish_if_done()
+        return res
+
+    MainWindow.load_initial_data = load_initial_data_once
+
+    class PaintFilter(QObject):
+        def eventFilter(self, obj, event) -> bool:
+            if event.type() == QEvent.Type.Paint and "paint" not in elapsed:
+                elapsed["paint"] = (time.time() - start) * 1000
+                finish_if_done()
+            return False
+
+    if hasattr(qdarktheme, "setup_theme"):
+        # main.py と同様にテーマを設定する, setup_theme を持たない版の pyqtdarktheme では省略する
+        qdarktheme.setup_theme()
+    window = MainWindow()
+    if mode == "eager":
+        window.load_initial_data()
+    elapsed["init"] = (time.time() - start) * 1000
+    paint_filter = PaintFilter()
+    window.installEventFilter(paint_filter)
+    window.show()
+    QTimer.singleShot(30 * 1000, app.quit)
+    app.exec()
+    # 標準出力はログの出力先でもあるため、計測結果は標準エラー出力に書き出す
+    print(RESULT_PREFIX + json.dumps(elapsed), file=sys.stderr, flush=True)
+
+
+def prepare_workdir(work_dir: Path, mylist_num: int) -> None:
+    """設定ファイル, ログ設定, 擬似的なマイリストを登録したDBを用意する"""
+    (work_dir / "config").mkdir()
+    (work_dir / "log").mkdir()
+    shutil.copy(REPO_ROOT / "log" / "logging.ini", work_dir / "log" / "logging.ini")
+    config = json.loads((REPO_ROOT / "config" / "config_example.json").read_text(encoding="utf-8"))
+    db_path = work_dir / "NNMM_DB.db"
+    config["db"]["save_path"] = str(db_path)
+    config["general"]["rss_save_path"] = str(work_dir / "rss")
+    (work_dir / "config" / "config.json").write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+
+    mylist_db = MylistDBController(str(db_path))
+    checked_at = "2023-12-26 12:34:56"
+    for i in range(mylist_num):
+        url = f"https://www.nicovideo.jp/user/{10000000 + i}/video"
+        showname = f"投稿者{i}さんの投稿動画"
+        mylist_db.upsert(
+            i,
+            f"投稿者{i}",
+            "投稿動画",
+            "uploaded",
+            showname,
+            url,
+            checked_at,
+            checked_at,
+            checked_at,
+            "15分",
+            0,
+            False,
+        )
+    mylist_db.engine.dispose()
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env["QT_QPA_PLATFORM"] = "offscreen"
+    env["PYTHONPATH"] = os.pathsep.join([str(SRC_PATH), env.get("PYTHONPATH", "")])
+    return env
+
+
+def measure_startup(work_dir: Path, mode: str, repeat: int) -> dict:
+    """子プロセスで repeat 回起動し、各時点の経過時間[ms]の最小値を返す"""
+    result = {point: float("inf") for point in POINTS}
+    for _ in range(repeat):
+        start = time.time()
+        proc = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--child", mode, "--start", repr(start)],
+            cwd=work_dir,
+            env=child_env(),
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            check=True,
+        )
+        lines = [line for line in proc.stderr.splitlines() if line.startswith(RESULT_PREFIX)]
+        if not lines:
+            raise ValueError(f"{mode}: startup result not found.\n{proc.stdout}\n{proc.stderr}")
+        elapsed = json.loads(lines[-1].removeprefix(RESULT_PREFIX))
+        if set(elapsed) != set(POINTS):
+            raise ValueError(f"{mode}: window is not painted or data is not loaded: {elapsed}.")
+        for point in POINTS:
+            result[point] = min(result[point], elapsed[point])
+    return result
+
+
+def import_time(work_dir: Path) -> tuple[list[tuple[str, int]], set[str]]:
+    """python -X importtime で nnmm.main_window を読み込む
+
+    Returns:
+        tuple[list[tuple[str, int]], set[str]]: 累積時間の降順の (モジュール名, 累積時間[us]) のリストと、
+                                                読み込まれた HEAVY_MODULES
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import nnmm.main_window"],
+        cwd=work_dir,
+        env=child_env(),
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        check=True,
+    )
+    cumulative_list = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            cumulative_list.append((name.strip(), int(cumulative)))
+    loaded_heavy_modules = {name for name, _ in cumulative_list if name in HEAVY_MODULES}
+    return sorted(cumulative_list, key=lambda item: item[1], reverse=True), loaded_heavy_modules
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Startup benchmark.")
+    arg_parser.add_argument("-m", "--mylist-num", type=int, default=300, help="number of mylists in DB.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=5, help="repeat count.")
+    arg_parser.add_argument("-t", "--top", type=int, default=15, help="number of modules to show in importtime.")
+    arg_parser.add_argument("--child", choices=["eager", "lazy"], help=argparse.SUPPRESS)
+    arg_parser.add_argument("--start", type=float, help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.start)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        prepare_workdir(work_dir, args.mylist_num)
+
+        cumulative_list, loaded_heavy_modules = import_time(work_dir)
+        print(f"importtime of nnmm.main_window (top {args.top} by cumulative):")
+        for name, cumulative in cumulative_list[: args.top]:
+            print(f"  {cumulative / 1000:>8.1f}ms  {name}")
+        print(f"heavy modules loaded at startup: {sorted(loaded_heavy_modules) or 'none'}")
+        print()
+
+        result = {mode: measure_startup(work_dir, mode, args.repeat) for mode in ["eager", "lazy"]}
+
+    print(f"mylists={args.mylist_num}, repeat={args.repeat}, elapsed from process start [ms]")
+    print(f"{'mode':<8}" + "".join(f"{point + '[ms]':>14}" for point in POINTS) + f"{'speedup':>10}")
+    eager_paint = result["eager"]["paint"]
+    for mode, elapsed in result.items():
+        speedup = eager_paint / elapsed["paint"]
+        print(f"{mode:<8}" + "".join(f"{elapsed[point]:>14.1f}" for point in POINTS) + f"{speedup:>9.2f}x")
+    lazy_paint = result["lazy"]["paint"]
+    verdict = "OK" if lazy_paint < TARGET_PAINT_MS else "NG"
+    print(f"target: paint < {TARGET_PAINT_MS}ms -> {verdict} ({lazy_paint:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
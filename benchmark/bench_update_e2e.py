@@ -0,0 +1,339 @@
+"""マイリスト更新処理のオフラインでのエンドツーエンドのベンチマーク
+
+synthetic_db.py で擬似的なマイリスト（既定 10, 100, 1000 件）を登録したDBを用意し、
+fake_niconico.py の擬似サーバを相手に以下の更新処理を実行して、更新処理1回分を計測する
+    every   : すべて更新 (Every)
+    partial : インターバル更新 (Partial), --due-ratio の割合のマイリストのみ次回更新確認日時を過ぎた状態とする
+    single  : 単一のマイリストの更新 (Single), 中ほどの1件を上部のマイリストURL欄に表示した状態とする
+計測する値は以下のとおり
+    throughput  : 1秒あたりの更新したマイリスト数とリクエスト数
+    tail latency: マイリストごとの fetch の所要時間の p50 / p95 / p99（更新履歴の MylistFetchLatency から求める）
+    peak memory : 更新処理中の最大常駐メモリ（resource を利用できない Windows では計測しない）
+最大常駐メモリを更新処理ごとに計測するため、更新処理は1回ごとに子プロセスで実行する
+更新処理後のGUIへの反映（後続処理）は計測対象外とする
+計測結果は表として表示し、合わせて JSON として -o で指定したファイルに書き出す
+-b で以前の JSON を指定すると、同じマイリスト数・更新処理の所要時間の中央値との比を表示する
+
+Usage:
+    python ./benchmark/bench_update_e2e.py [-m MYLIST_NUM ...] [-v VIDEO_NUM] [--modes MODE ...] [-r REPEAT]
+                                           [--latency-ms MS] [--api-latency-ms MS] [--error-rate RATE]
+                                           [--rate-limit-rate RATE] [--api-error-rate RATE] [--padding-kb KB]
+                                           [-o OUTPUT] [-b BASELINE]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+SRC_PATH = REPO_ROOT / "src"
+sys.path.append(str(SRC_PATH))
+sys.path.append(str(Path(__file__).parent))
+
+from nnmm.mylist_db_controller import MylistDBController  # noqa: E402
+from nnmm.util import get_app_version, get_now_datetime  # noqa: E402
+from synthetic_db import generate  # noqa: E402
+
+RESULT_PREFIX = "BENCH_UPDATE_E2E_RESULT:"
+MODES = ["every", "partial", "single"]
+SERVER_CONFIG_KEYS = [
+    "latency_ms",
+    "api_latency_ms",
+    "error_rate",
+    "rate_limit_rate",
+    "api_error_rate",
+    "padding_kb",
+    "page_size",
+    "new_video_num",
+]
+
+
+def get_peak_rss_mb() -> float | None:
+    """プロセス開始からの最大常駐メモリ[MB]を返す, resource を利用できない環境では None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS は byte, それ以外は KB 単位
+    return maxrss / 1024 / 1024 if sys.platform == "darwin" else maxrss / 1024
+
+
+def percentile(value_list: list[float], q: float) -> float | None:
+    """value_list の q パーセンタイルを線形補間で求める, 空なら None"""
+    if not value_list:
+        return None
+    sorted_list = sorted(value_list)
+    pos = (len(sorted_list) - 1) * q / 100
+    lower, upper = math.floor(pos), math.ceil(pos)
+    return sorted_list[lower] + (sorted_list[upper] - sorted_list[lower]) * (pos - lower)
+
+
+def run_child(params: dict) -> None:
+    """子プロセスとして更新処理を1回実行し、計測結果を出力する
+
+    Args:
+        params (dict): 親プロセスから渡される計測条件, main() を参照
+    """
+    from fake_niconico import FakeNiconicoServer, FakeServerConfig
+
+    from nnmm.config_store import ConfigStore
+    from nnmm.mylist_info_db_controller import MylistInfoDBController
+    from nnmm.process.update_mylist.every import Every
+    from nnmm.process.update_mylist.partial import Partial
+    from nnmm.process.update_mylist.single import Single
+    from nnmm.process.value_objects.headless_host import HeadlessHost
+    from nnmm.process.value_objects.process_info import ProcessInfo
+    from nnmm.update_run_db_controller import UpdateRunDBController
+    from nnmm.util import Result
+    from nnmm.video_info_fetcher.video_info_fetcher_base import VideoInfoFetcherBase
+
+    class MylistURLBox:
+        """上部のマイリストURL欄の代わり, Single が更新対象を求める際に参照する"""
+
+        def __init__(self, mylist_url: str) -> None:
+            self.mylist_url = mylist_url
+
+        def text(self) -> str:
+            return self.mylist_url
+
+    class BenchHost(HeadlessHost):
+        """更新履歴のDBと上部のマイリストURL欄を持つ、メインウィンドウの代わり"""
+
+        def __init__(self, mylist_db, mylist_info_db, update_run_db, mylist_url: str) -> None:
+            super().__init__(mylist_db, mylist_info_db)
+            self.update_run_db = update_run_db
+            self.tbox_mylist_url = MylistURLBox(mylist_url)
+
+    class NoPostProcessMixin:
+        def thread_done(self) -> Result:
+            """GUIへの反映は計測対象外のため行わない"""
+            return Result.success
+
+    class BenchEvery(NoPostProcessMixin, Every):
+        pass
+
+    class BenchPartial(NoPostProcessMixin, Partial):
+        pass
+
+    class BenchSingle(NoPostProcessMixin, Single):
+        pass
+
+    process_class_dict = {"every": BenchEvery, "partial": BenchPartial, "single": BenchSingle}
+
+    # 注入したエラーによるエラーログで標準出力が埋まらないようにする
+    logging.disable(logging.CRITICAL)
+    ConfigStore.set_config()
+
+    db_path = Path(params["db_path"])
+    shutil.copy(params["template_path"], db_path)
+    server_config = FakeServerConfig(**{key: params[key] for key in SERVER_CONFIG_KEYS})
+    server = FakeNiconicoServer(
+        params["mylist_num"], params["video_num"], params["unwatched_ratio"], params["seed"], server_config
+    )
+    VideoInfoFetcherBase.configure_transport(server.transport)
+
+    mylist_db = MylistDBController(str(db_path))
+    mylist_info_db = MylistInfoDBController(str(db_path))
+    update_run_db = UpdateRunDBController(str(db_path))
+    mylist_list = mylist_db.select()
+    single_mylist_url = mylist_list[len(mylist_list) // 2]["url"]
+    host = BenchHost(mylist_db, mylist_info_db, update_run_db, single_mylist_url)
+    process = process_class_dict[params["mode"]](ProcessInfo("-BENCH_UPDATE-", host, mylist_db, mylist_info_db))
+
+    peak_rss_before = get_peak_rss_mb()
+    start = time.perf_counter()
+    process.update_mylist_info_thread()
+    elapsed_sec = time.perf_counter() - start
+    peak_rss_after = get_peak_rss_mb()
+
+    run_list = update_run_db.select(1)
+    if not run_list:
+        raise ValueError(f"{params['mode']}: update run is not recorded.")
+    run = run_list[0]
+    latency_list = [r["latency_ms"] for r in update_run_db.select_fetch_latency() if r["latency_ms"] is not None]
+    stats = server.get_stats()
+    result = {
+        "elapsed_sec": elapsed_sec,
+        "target_num": run["target_num"],
+        "success_num": run["success_num"],
+        "failed_num": run["failed_num"],
+        "new_video_num": run["new_video_num"],
+        "mylist_per_sec": run["target_num"] / elapsed_sec,
+        "request_per_sec": stats["requests"] / elapsed_sec,
+        "latency_p50_ms": percentile(latency_list, 50),
+        "latency_p95_ms": percentile(latency_list, 95),
+        "latency_p99_ms": percentile(latency_list, 99),
+        "latency_max_ms": max(latency_list, default=None),
+        "peak_rss_mb": peak_rss_after,
+        "peak_rss_delta_mb": None if peak_rss_after is None else peak_rss_after - peak_rss_before,
+        "stage_total_ms": run["stage_total_ms"],
+        "server": stats,
+    }
+    for db in [mylist_db, mylist_info_db, update_run_db]:
+        db.engine.dispose()
+    # 標準出力はログの出力先でもあるため、計測結果は標準エラー出力に書き出す
+    print(RESULT_PREFIX + json.dumps(result), file=sys.stderr, flush=True)
+
+
+def prepare_workdir(work_dir: Path) -> None:
+    """設定ファイルを用意する, DBは子プロセスごとにテンプレートから複製する"""
+    (work_dir / "config").mkdir()
+    config = json.loads((REPO_ROOT / "config" / "config_example.json").read_text(encoding="utf-8"))
+    config["db"]["save_path"] = str(work_dir / "NNMM_DB.db")
+    config["general"]["rss_save_path"] = str(work_dir / "rss")
+    (work_dir / "config" / "config.json").write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+
+
+def prepare_template(template_path: Path, args: argparse.Namespace, mylist_num: int) -> dict:
+    """擬似的なマイリストを登録したDBを生成する
+
+    Notes:
+        生成したマイリストはすべて次回更新確認日時を過ぎているため、
+        Partial の計測用に先頭の --due-ratio の割合以外は更新確認したばかりの状態とする
+    """
+    summary = generate(str(template_path), mylist_num, args.video_num, args.unwatched_ratio, args.seed)
+    mylist_db = MylistDBController(str(template_path))
+    due_num = math.ceil(mylist_num * args.due_ratio)
+    now_str = get_now_datetime()
+    for mylist in mylist_db.select()[due_num:]:
+        mylist_db.update_checked_at(mylist["url"], now_str)
+    mylist_db.engine.dispose()
+    return summary | {"due_num": due_num}
+
+
+def measure_update(work_dir: Path, params: dict) -> dict:
+    """子プロセスで更新処理を1回実行し、計測結果を返す"""
+    env = dict(os.environ)
+    env["QT_QPA_PLATFORM"] = "offscreen"
+    env["PYTHONPATH"] = os.pathsep.join([str(SRC_PATH), env.get("PYTHONPATH", "")])
+    proc = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--child", json.dumps(params)],
+        cwd=work_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+    lines = [line for line in proc.stderr.splitlines() if line.startswith(RESULT_PREFIX)]
+    if not lines:
+        raise ValueError(f"{params['mode']}: update result not found.\n{proc.stdout}\n{proc.stderr}")
+    return json.loads(lines[-1].removeprefix(RESULT_PREFIX))
+
+
+def load_baseline(path: str | None) -> dict[tuple[int, str], float]:
+    """以前の計測結果の JSON から {(マイリスト数, 更新処理): 所要時間の中央値[s]} を返す"""
+    if not path:
+        return {}
+    baseline = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {(r["mylist_num"], r["mode"]): r["elapsed_sec"] for r in baseline["results"]}
+
+
+def format_value(value: float | None, width: int, precision: int = 1) -> str:
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}.{precision}f}"
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Offline end-to-end mylist update benchmark.")
+    arg_parser.add_argument("-m", "--mylist-num", type=int, nargs="*", default=[10, 100, 1000])
+    arg_parser.add_argument("-v", "--video-num", type=int, default=20, help="number of videos per mylist in DB.")
+    arg_parser.add_argument("--modes", nargs="*", choices=MODES, default=MODES, help="update processes to run.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=3, help="repeat count.")
+    arg_parser.add_argument("-u", "--unwatched-ratio", type=float, default=0.2, help="ratio of unwatched videos.")
+    arg_parser.add_argument("--due-ratio", type=float, default=0.2, help="ratio of due mylists for partial.")
+    arg_parser.add_argument("--seed", type=int, default=0, help="random seed.")
+    arg_parser.add_argument("--latency-ms", type=float, default=50.0, help="mean latency of page requests.")
+    arg_parser.add_argument("--api-latency-ms", type=float, default=2.0, help="mean latency of video info API.")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="ratio of 503 for page requests.")
+    arg_parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="ratio of 429 for page requests.")
+    arg_parser.add_argument("--api-error-rate", type=float, default=0.0, help="ratio of 503 for video info API.")
+    arg_parser.add_argument("--padding-kb", type=int, default=50, help="padding size of page responses.")
+    arg_parser.add_argument("--page-size", type=int, default=100, help="number of videos per page.")
+    arg_parser.add_argument("--new-video-num", type=int, default=3, help="number of new videos per mylist.")
+    arg_parser.add_argument("-o", "--output", default="bench_update_e2e.json", help="JSON result path.")
+    arg_parser.add_argument("-b", "--baseline", help="previous JSON result to compare with.")
+    arg_parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(json.loads(args.child))
+        return
+
+    if not (0.0 <= args.due_ratio <= 1.0):
+        raise ValueError("due_ratio must be in [0.0, 1.0].")
+    baseline = load_baseline(args.baseline)
+    server_params = {key: getattr(args, key) for key in SERVER_CONFIG_KEYS}
+    dataset_list = []
+    result_list = []
+    print(
+        f"{'mylists':>8}{'mode':>9}{'elapsed[s]':>12}{'mylist/s':>10}{'req/s':>9}{'p50[ms]':>10}{'p95[ms]':>10}"
+        f"{'p99[ms]':>10}{'rss[MB]':>9}{'success':>11}{'new':>6}{'vs base':>9}"
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        prepare_workdir(work_dir)
+        for mylist_num in args.mylist_num:
+            template_path = work_dir / f"template_{mylist_num}.db"
+            dataset_list.append(prepare_template(template_path, args, mylist_num))
+            for mode in args.modes:
+                params = {
+                    "mode": mode,
+                    "mylist_num": mylist_num,
+                    "video_num": args.video_num,
+                    "unwatched_ratio": args.unwatched_ratio,
+                    "seed": args.seed,
+                    "template_path": str(template_path),
+                    "db_path": str(work_dir / "NNMM_DB.db"),
+                } | server_params
+                run_list = [measure_update(work_dir, params) for _ in range(args.repeat)]
+                # 所要時間が中央値となった回の結果を代表とする
+                run_list.sort(key=lambda r: r["elapsed_sec"])
+                result = run_list[(len(run_list) - 1) // 2]
+                result_list.append(
+                    {"mylist_num": mylist_num, "mode": mode}
+                    | result
+                    | {"elapsed_samples_sec": [r["elapsed_sec"] for r in run_list]}
+                )
+                base_sec = baseline.get((mylist_num, mode))
+                ratio = f"{result['elapsed_sec'] / base_sec:>8.2f}x" if base_sec else f"{'-':>9}"
+                print(
+                    f"{mylist_num:>8}{mode:>9}{result['elapsed_sec']:>12.2f}{result['mylist_per_sec']:>10.1f}"
+                    f"{result['request_per_sec']:>9.0f}{format_value(result['latency_p50_ms'], 10)}"
+                    f"{format_value(result['latency_p95_ms'], 10)}{format_value(result['latency_p99_ms'], 10)}"
+                    f"{format_value(result['peak_rss_mb'], 9)}"
+                    f"{str(result['success_num']) + '/' + str(result['target_num']):>11}"
+                    f"{result['new_video_num']:>6}{ratio}"
+                )
+
+    report = {
+        "benchmark": "bench_update_e2e",
+        "version": get_app_version(),
+        "created_at": get_now_datetime(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "video_num": args.video_num,
+            "unwatched_ratio": args.unwatched_ratio,
+            "due_ratio": args.due_ratio,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        }
+        | server_params,
+        "datasets": dataset_list,
+        "results": result_list,
+    }
+    Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"result -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
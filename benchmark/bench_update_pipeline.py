@@ -0,0 +1,185 @@
+"""マイリスト更新処理のパイプライン化のベンチマーク
+
+マイリスト更新処理について、以下の2通りの所要時間を比較する
+    barrier  : 全マイリストを fetch した後にDB更新を行う（変更前, run_barrier() で再現する）
+    pipeline : UpdatePipeline.execute() で fetch が終わったマイリストから順にDB更新を行う
+fetch とDB更新はそれぞれ time.sleep で待つだけのワーカーに差し替えて、処理時間のみを模擬する
+fetch の所要時間はマイリストごとにばらつきを持たせる（一部のマイリストのみ遅い）
+ideal は fetch とDB更新をそれぞれ単独で行った場合の所要時間の大きい方で、pipeline の下限の目安
+
+Usage:
+    python ./benchmark/bench_update_pipeline.py [-m MYLIST_NUM ...] [-f FETCH_MS] [-w WRITE_MS] [-q QUEUE_SIZE]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QDialog  # noqa: E402
+
+from nnmm.mylist_db_controller import MylistDBController  # noqa: E402
+from nnmm.mylist_info_db_controller import MylistInfoDBController  # noqa: E402
+from nnmm.process.update_mylist.database_updater import DatabaseUpdater  # noqa: E402
+from nnmm.process.update_mylist.fetcher import Fetcher  # noqa: E402
+from nnmm.process.update_mylist.pipeline import UpdatePipeline  # noqa: E402
+from nnmm.process.update_mylist.value_objects.mylist_with_video import MylistWithVideo  # noqa: E402
+from nnmm.process.update_mylist.value_objects.payload import Payload  # noqa: E402
+from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList  # noqa: E402
+from nnmm.process.update_mylist.value_objects.typed_mylist import TypedMylist  # noqa: E402
+from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList  # noqa: E402
+from nnmm.process.value_objects.process_info import ProcessInfo  # noqa: E402
+from nnmm.util import Result  # noqa: E402
+
+
+def make_mylist_with_video_list(mylist_num: int) -> MylistWithVideoList:
+    """動画を持たないマイリストを mylist_num 個持つ MylistWithVideoList を返す"""
+    mylist_with_video_list = []
+    for i in range(mylist_num):
+        typed_mylist = TypedMylist.create({
+            "id": i,
+            "username": f"投稿者{i}",
+            "mylistname": "投稿動画",
+            "type": "uploaded",
+            "showname": f"投稿者{i}さんの投稿動画",
+            "url": f"https://www.nicovideo.jp/user/{10000000 + i}/video",
+            "created_at": "2023-12-26 12:34:56",
+            "updated_at": "2023-12-26 12:34:56",
+            "checked_at": "2023-12-26 12:34:56",
+            "check_interval": "15分",
+            "check_failed_count": 0,
+            "is_include_new": False,
+        })
+        mylist_with_video_list.append(MylistWithVideo(typed_mylist, TypedVideoList.create([])))
+    return MylistWithVideoList(mylist_with_video_list)
+
+
+def fetch_sec(mylist_url: str, fetch_ms: float) -> float:
+    """マイリストごとの fetch の所要時間[sec], 8個に1個は4倍遅い"""
+    return fetch_ms * (4 if int(mylist_url.split("/")[-2]) % 8 == 0 else 1) / 1000
+
+
+class SleepFetcher(Fetcher):
+    fetch_ms: float = 0.0
+
+    def execute_worker(self, *argv) -> Result:
+        mylist_url, _, _ = argv
+        time.sleep(fetch_sec(mylist_url, self.fetch_ms))
+        return Result.failed
+
+
+class SleepDatabaseUpdater(DatabaseUpdater):
+    write_ms: float = 0.0
+
+    def execute_worker(self, *argv) -> Result:
+        time.sleep(self.write_ms / 1000)
+        return Result.success
+
+
+def run_barrier(mylist_with_video_list, process_info, fetch_ms: float, write_ms: float) -> list:
+    """全マイリストの fetch を待ってからDB更新を行う（パイプライン化前の処理）"""
+    fetcher = SleepFetcher(process_info)
+    fetcher.fetch_ms = fetch_ms
+    database_updater = SleepDatabaseUpdater(process_info)
+    database_updater.write_ms = write_ms
+    all_index_num = len(mylist_with_video_list)
+    with ThreadPoolExecutor(max_workers=8, thread_name_prefix="ap_thread") as executor:
+        futures = []
+        for mylist_with_video in mylist_with_video_list:
+            mylist_url = mylist_with_video.mylist.url.non_query_url
+            known_video_id_list = list(mylist_with_video.video_status_dict.keys())
+            future = executor.submit(fetcher.execute_worker, mylist_url, known_video_id_list, all_index_num)
+            futures.append((mylist_with_video, future))
+        payload_list = [Payload.create(m, f.result()) for m, f in futures]
+    with ThreadPoolExecutor(max_workers=8, thread_name_prefix="np_thread") as executor:
+        futures = []
+        for payload in payload_list:
+            future = executor.submit(
+                database_updater.execute_worker,
+                payload.mylist,
+                payload.video_status_dict,
+                payload.fetched_info,
+                all_index_num,
+            )
+            futures.append((payload, future))
+        return [(p, f.result()) for p, f in futures]
+
+
+def run_pipeline(mylist_with_video_list, process_info, fetch_ms: float, write_ms: float, queue_size: int) -> list:
+    pipeline = UpdatePipeline(mylist_with_video_list, process_info, queue_size=queue_size)
+    pipeline.fetcher = SleepFetcher(process_info)
+    pipeline.fetcher.fetch_ms = fetch_ms
+    pipeline.database_updater = SleepDatabaseUpdater(process_info)
+    pipeline.database_updater.write_ms = write_ms
+    return pipeline.execute()
+
+
+def to_result_set(result_buf: list) -> set:
+    return {(payload.mylist.url.non_query_url, result) for payload, result in result_buf}
+
+
+def measure(func, number: int, repeat: int) -> float:
+    """func の1回あたりの所要時間[ms]の最小値を返す"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="update mylist pipeline benchmark.")
+    arg_parser.add_argument("-m", "--mylist-num", type=int, nargs="*", default=[32, 128])
+    arg_parser.add_argument("-f", "--fetch-ms", type=float, default=40.0, help="fetch time per mylist.")
+    arg_parser.add_argument("-w", "--write-ms", type=float, default=20.0, help="db write time per mylist.")
+    arg_parser.add_argument("-q", "--queue-size", type=int, default=UpdatePipeline.DEFAULT_QUEUE_SIZE)
+    arg_parser.add_argument("-n", "--number", type=int, default=1, help="loops per repeat.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=3, help="repeat count.")
+    args = arg_parser.parse_args()
+
+    app = QApplication()  # noqa: F841
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / "bench.db")
+        window = QDialog()
+        process_info = ProcessInfo("-BENCH-", window, MylistDBController(db_path), MylistInfoDBController(db_path))
+
+        print(f"{'mylists':>8}{'barrier[ms]':>13}{'pipeline[ms]':>14}{'ideal[ms]':>11}{'speedup':>10}")
+        for mylist_num in args.mylist_num:
+            mylist_with_video_list = make_mylist_with_video_list(mylist_num)
+
+            # 両者で同じ結果が得られることを確認してから計測する
+            expect = to_result_set(run_barrier(mylist_with_video_list, process_info, 0, 0))
+            actual = to_result_set(run_pipeline(mylist_with_video_list, process_info, 0, 0, args.queue_size))
+            if expect != actual or len(expect) != mylist_num:
+                raise ValueError(f"mylists({mylist_num}): result is different.")
+
+            barrier_ms = measure(
+                lambda: run_barrier(mylist_with_video_list, process_info, args.fetch_ms, args.write_ms),
+                args.number,
+                args.repeat,
+            )
+            pipeline_ms = measure(
+                lambda: run_pipeline(
+                    mylist_with_video_list, process_info, args.fetch_ms, args.write_ms, args.queue_size
+                ),
+                args.number,
+                args.repeat,
+            )
+
+            # 各ステージを単独で行った場合の所要時間の大きい方, パイプライン化での下限の目安
+            fetch_total = sum(fetch_sec(m.mylist.url.non_query_url, args.fetch_ms) for m in mylist_with_video_list)
+            write_total = args.write_ms / 1000 * mylist_num
+            ideal_ms = (
+                max(fetch_total / UpdatePipeline.FETCH_WORKER_NUM, write_total / UpdatePipeline.UPDATE_WORKER_NUM)
+                * 1000
+            )
+            speedup = barrier_ms / pipeline_ms
+            print(f"{mylist_num:>8}{barrier_ms:>13.1f}{pipeline_ms:>14.1f}{ideal_ms:>11.1f}{speedup:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
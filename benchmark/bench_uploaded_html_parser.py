@@ -0,0 +1,128 @@
+"""UploadedHtmlParser のマイクロベンチマーク
+
+投稿動画ページから js-initial-userpage-data の data-initial-data 属性値を取り出す処理について、
+BeautifulSoup による DOM 構築と、UploadedHtmlParser._extract_initial_data による高速経路の所要時間を比較する
+
+Usage:
+    python ./benchmark/bench_uploaded_html_parser.py [recorded_page ...]
+
+    recorded_page には取得済の投稿動画ページを指定する
+    （VideoInfoFetcher は取得したページを rss_save_path 配下に {userid}.xml として保存している）
+    指定がなければ ./rss/ 配下の投稿動画ページを使い、それもなければ擬似的なページを生成して使う
+"""
+
+import argparse
+import html
+import re
+import sys
+import timeit
+from pathlib import Path
+
+import orjson
+from bs4 import BeautifulSoup
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from nnmm.video_info_fetcher.uploaded_html_parser import UploadedHtmlParser  # noqa: E402
+
+RECORDED_PAGE_DIR = "./rss/"
+URL = "https://www.nicovideo.jp/user/11111111/video"
+
+
+def make_synthetic_page(video_num: int = 100, filler_kb: int = 300) -> str:
+    """実際の投稿動画ページに近い大きさと構造の擬似的なページを返す
+
+    Args:
+        video_num (int): 埋め込む動画数
+        filler_kb (int): 初期データ以外の要素のおおよその大きさ[KB]
+    """
+    items = [
+        {
+            "essential": {
+                "id": f"sm{10000000 + i}",
+                "title": f'動画タイトル_{i} 【テスト】 & "quoted"',
+                "registeredAt": "2023-12-26T12:34:56+09:00",
+                "count": {"view": i * 100, "comment": i * 10, "mylist": i, "like": i},
+                "thumbnail": {"url": f"https://nicovideo.cdn.nimg.jp/thumbnails/{i}/{i}"},
+                "shortDescription": "説明文" * 20,
+            }
+        }
+        for i in range(video_num)
+    ]
+    initial_data = {
+        "state": {"userDetails": {"userDetails": {"user": {"nickname": "投稿者1", "description": "紹介文" * 100}}}},
+        "nvapi": [{"body": {"data": {"items": items, "totalCount": video_num}}}],
+    }
+    attribute_value = html.escape(orjson.dumps(initial_data).decode(), quote=True)
+
+    filler_unit = (
+        '<div class="common-header"><ul class="menu"><li><a href="/ranking" data-ref="header">ランキング</a></li>'
+        '<li><a href="/tag" data-ref="header">タグ</a></li></ul><img src="/img.png" alt="logo"></div>\n'
+    )
+    filler = filler_unit * (filler_kb * 1024 // len(filler_unit.encode()))
+    return (
+        "<!DOCTYPE html><html lang='ja'><head><meta charset='utf-8'><title>投稿者1さんの投稿動画</title>"
+        '<script>window.addEventListener("load", () => document.getElementById("js-initial-userpage-data"));</script>'
+        f"</head><body>{filler}"
+        f'<div id="js-initial-userpage-data" data-initial-data="{attribute_value}" data-env="{{}}"></div>'
+        f"{filler}</body></html>"
+    )
+
+
+def load_pages(paths: list[str]) -> dict[str, str]:
+    """ベンチマーク対象のページを {名前: html文字列} で返す"""
+    if not paths:
+        # 投稿動画ページは {userid}.xml, マイリスト/シリーズは {userid}_{mylistid}.xml で保存されている
+        paths = [str(p) for p in Path(RECORDED_PAGE_DIR).glob("*.xml") if re.fullmatch(r"[0-9]+", p.stem)]
+
+    pages = {}
+    for path in paths:
+        page_text = Path(path).read_text(encoding="utf-8")
+        if "js-initial-userpage-data" in page_text:
+            pages[Path(path).name] = page_text
+    if not pages:
+        pages["synthetic(100 videos)"] = make_synthetic_page(100)
+        pages["synthetic(1000 videos)"] = make_synthetic_page(1000)
+    return pages
+
+
+def extract_with_beautifulsoup(page_text: str) -> str:
+    """変更前の経路: BeautifulSoup で DOM を構築してから属性値を取り出す"""
+    soup = BeautifulSoup(page_text, "html.parser")
+    elem = soup.find(id=UploadedHtmlParser.INITIAL_DATA_ELEMENT_ID)
+    return elem[UploadedHtmlParser.INITIAL_DATA_ATTRIBUTE_NAME]
+
+
+def extract_with_fast_path(page_text: str) -> str:
+    """高速経路: DOM を構築せずに属性値を取り出す"""
+    return UploadedHtmlParser._extract_initial_data(page_text)
+
+
+def measure(func, number: int, repeat: int) -> float:
+    """func の1回あたりの所要時間[ms]の最小値を返す"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="UploadedHtmlParser micro benchmark.")
+    arg_parser.add_argument("pages", nargs="*", help="recorded uploaded video pages.")
+    arg_parser.add_argument("-n", "--number", type=int, default=5, help="loops per repeat.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=5, help="repeat count.")
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args.pages)
+    print(f"{'page':<28}{'size[KB]':>10}{'bs4[ms]':>12}{'fast[ms]':>12}{'init[ms]':>12}{'speedup':>10}")
+    for name, page_text in pages.items():
+        # 両経路で同じ属性値が得られることを確認してから計測する
+        if extract_with_fast_path(page_text) != extract_with_beautifulsoup(page_text):
+            raise ValueError(f"{name}: extracted attribute value is different.")
+
+        bs4_ms = measure(lambda: extract_with_beautifulsoup(page_text), args.number, args.repeat)
+        fast_ms = measure(lambda: extract_with_fast_path(page_text), args.number, args.repeat)
+        init_ms = measure(lambda: UploadedHtmlParser(URL, page_text), args.number, args.repeat)
+        size_kb = len(page_text.encode()) / 1024
+        print(f"{name:<28}{size_kb:>10.1f}{bs4_ms:>12.3f}{fast_ms:>12.3f}{init_ms:>12.3f}{bs4_ms / fast_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
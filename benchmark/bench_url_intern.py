@@ -0,0 +1,115 @@
+"""URL 系ValueObject のインターンキャッシュのマイクロベンチマーク
+
+VideoDictList.to_typed_video_list() について、以下の状態の所要時間を比較する
+    disabled : URL, VideoURL, MylistURLFactory のキャッシュを無効にした状態（変更前相当）
+    cold     : キャッシュが空の状態から変換する
+    warm     : 一度変換した後に同じ一覧を再度変換する（定期更新で同じ動画一覧を読み直す状態）
+あわせて warm 計測後の各キャッシュのヒット率を表示する
+
+Usage:
+    python ./benchmark/bench_url_intern.py [-v VIDEO_NUM ...] [-m MYLIST_NUM]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from nnmm.process.update_mylist.value_objects.video_dict_list import VideoDictList  # noqa: E402
+from nnmm.video_info_fetcher.value_objects.intern_cache import InternCache  # noqa: E402
+from nnmm.video_info_fetcher.value_objects.mylist_url_factory import MylistURLFactory  # noqa: E402
+from nnmm.video_info_fetcher.value_objects.url import URL  # noqa: E402
+from nnmm.video_info_fetcher.value_objects.video_url import VideoURL  # noqa: E402
+
+CACHE_LIST: list[InternCache] = [URL._intern_cache, VideoURL._intern_cache, MylistURLFactory._intern_cache]
+
+
+def make_video_dict_list(video_num: int, mylist_num: int) -> list[dict[str, str]]:
+    """mylist_info_db.select_from_mylist_url() の返り値を模した dict のリストを返す"""
+    mylist_urls = [
+        f"https://www.nicovideo.jp/user/{10000000 + i}/video"
+        if i % 2 == 0
+        else f"https://www.nicovideo.jp/user/{10000000 + i}/mylist/{20000000 + i}"
+        for i in range(mylist_num)
+    ]
+    return [
+        {
+            "id": str(i),
+            "video_id": f"sm{10000000 + i}",
+            "title": f"動画タイトル_{i}",
+            "username": f"投稿者{i % mylist_num}",
+            "status": "",
+            "uploaded_at": "2023-12-26 12:34:56",
+            "registered_at": "2023-12-26 12:34:56",
+            "video_url": f"https://www.nicovideo.jp/watch/sm{10000000 + i}",
+            "mylist_url": mylist_urls[i % mylist_num],
+            "created_at": "2023-12-26 12:34:56",
+        }
+        for i in range(video_num)
+    ]
+
+
+def set_cache(maxsize: int) -> None:
+    """全てのキャッシュを空にして上限を設定する"""
+    for cache in CACHE_LIST:
+        cache.set_maxsize(maxsize)
+        cache.clear()
+
+
+def measure(func, number: int, repeat: int, setup=None) -> float:
+    """func の1回あたりの所要時間[ms]の最小値を返す"""
+    times = []
+    for _ in range(repeat):
+        total = 0.0
+        for _ in range(number):
+            if setup:
+                setup()
+            total += timeit.timeit(func, number=1)
+        times.append(total)
+    return min(times) / number * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="URL intern cache micro benchmark.")
+    arg_parser.add_argument("-v", "--video-num", type=int, nargs="*", default=[1000, 10000])
+    arg_parser.add_argument("-m", "--mylist-num", type=int, default=100, help="distinct mylist url count.")
+    arg_parser.add_argument("-n", "--number", type=int, default=3, help="loops per repeat.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=3, help="repeat count.")
+    args = arg_parser.parse_args()
+
+    maxsize = max(args.video_num) * 2
+    print(f"{'videos':>8}{'disabled[ms]':>14}{'cold[ms]':>10}{'warm[ms]':>10}{'speedup':>10}   hit rate(warm)")
+    for video_num in args.video_num:
+        video_dict_list = VideoDictList.create(make_video_dict_list(video_num, args.mylist_num))
+
+        # キャッシュの有無で同じ結果が得られることを確認してから計測する
+        set_cache(0)
+        expect = video_dict_list.to_typed_video_list()
+        set_cache(maxsize)
+        if expect != video_dict_list.to_typed_video_list():
+            raise ValueError(f"videos({video_num}): result is different.")
+
+        func = video_dict_list.to_typed_video_list
+        disabled_ms = measure(func, args.number, args.repeat, lambda: set_cache(0))
+        cold_ms = measure(func, args.number, args.repeat, lambda: set_cache(maxsize))
+        set_cache(maxsize)
+        func()
+        before = [(cache.hits, cache.misses) for cache in CACHE_LIST]
+        warm_ms = measure(func, args.number, args.repeat)
+        hit_rate_list = []
+        for cache, (hits, misses) in zip(CACHE_LIST, before):
+            hits, misses = cache.hits - hits, cache.misses - misses
+            # 参照されなかったキャッシュは "-" と表示する
+            hit_rate_list.append(f"{cache.name}={hits / (hits + misses):.2f}" if hits + misses else f"{cache.name}=-")
+        speedup = disabled_ms / warm_ms
+        print(
+            f"{video_num:>8}{disabled_ms:>14.3f}{cold_ms:>10.3f}{warm_ms:>10.3f}{speedup:>9.1f}x   "
+            + ", ".join(hit_rate_list)
+        )
+    set_cache(InternCache.DEFAULT_MAXSIZE)
+
+
+if __name__ == "__main__":
+    main()
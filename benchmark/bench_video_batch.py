@@ -0,0 +1,125 @@
+"""TypedVideoList / VideoBatch のマイクロベンチマーク
+
+DB更新処理（DatabaseUpdater.execute_worker）で行っている以下の処理について、
+1動画ごとに TypedVideo を生成する TypedVideoList と、列ごとに値を保持する VideoBatch の
+所要時間とメモリ使用量を比較する
+    create : 動画を表す dict のリストから作成する
+    status : 全動画の状況を差し替える
+    dict   : DB格納用の dict のリストに変換する
+    memory : 作成したインスタンスが保持しているメモリ量(tracemalloc)
+
+Usage:
+    python ./benchmark/bench_video_batch.py [-v VIDEO_NUM ...]
+"""
+
+import argparse
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from nnmm.process.update_mylist.value_objects.typed_video import TypedVideo  # noqa: E402
+from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList  # noqa: E402
+from nnmm.process.update_mylist.value_objects.video_batch import VideoBatch  # noqa: E402
+from nnmm.process.value_objects.table_row import Status  # noqa: E402
+
+
+def make_video_dict_list(video_num: int, mylist_num: int = 10) -> list[dict[str, str]]:
+    """mylist_info_db.select_from_mylist_url() の返り値を模した dict のリストを返す"""
+    return [
+        {
+            "id": str(i),
+            "video_id": f"sm{10000000 + i}",
+            "title": f"動画タイトル_{i}",
+            "username": f"投稿者{i % mylist_num}",
+            "status": "未視聴" if i % 3 == 0 else "",
+            "uploaded_at": f"2023-12-{i % 28 + 1:02} 12:{i % 60:02}:{i % 60:02}",
+            "registered_at": f"2023-12-{i % 28 + 1:02} 12:{i % 60:02}:{i % 60:02}",
+            "video_url": f"https://www.nicovideo.jp/watch/sm{10000000 + i}",
+            "mylist_url": f"https://www.nicovideo.jp/user/{10000000 + i % mylist_num}/video",
+            "created_at": "2023-12-26 12:34:56",
+        }
+        for i in range(video_num)
+    ]
+
+
+def create_typed_video_list(video_dict_list: list[dict]) -> TypedVideoList:
+    return TypedVideoList.create([TypedVideo.create(d) for d in video_dict_list])
+
+
+def replace_status_typed_video_list(typed_video_list: TypedVideoList, status_list: list[Status]) -> TypedVideoList:
+    """変更前の DatabaseUpdater と同じく1動画ずつ replace_from_typed_value する"""
+    result = TypedVideoList.create(list(typed_video_list))
+    for index, status in enumerate(status_list):
+        result[index] = result[index].replace_from_typed_value(status=status)
+    return result
+
+
+def measure(func, number: int, repeat: int) -> float:
+    """func の1回あたりの所要時間[ms]の最小値を返す"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def measure_memory(func) -> float:
+    """func の返り値が保持しているメモリ量[KB]を返す"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    instance = func()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instance
+    return (after - before) / 1024
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="TypedVideoList / VideoBatch micro benchmark.")
+    arg_parser.add_argument("-v", "--video-num", type=int, nargs="*", default=[1000, 10000])
+    arg_parser.add_argument("-n", "--number", type=int, default=3, help="loops per repeat.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=3, help="repeat count.")
+    args = arg_parser.parse_args()
+
+    print(f"{'videos':>8}{'case':>8}{'TypedVideoList':>16}{'VideoBatch':>12}{'speedup':>10}")
+    for video_num in args.video_num:
+        video_dict_list = make_video_dict_list(video_num)
+        status_list = [Status.watched if i % 2 else Status.not_watched for i in range(video_num)]
+        typed_video_list = create_typed_video_list(video_dict_list)
+        video_batch = VideoBatch.create(video_dict_list)
+
+        # 両者で同じ結果が得られることを確認してから計測する
+        expect = [v.to_dict() for v in replace_status_typed_video_list(typed_video_list, status_list)]
+        if expect != video_batch.replace_status_list(status_list).to_dict_list():
+            raise ValueError(f"videos({video_num}): result is different.")
+        if video_batch.to_typed_video_list() != typed_video_list:
+            raise ValueError(f"videos({video_num}): typed video list is different.")
+
+        cases = [
+            (
+                "create",
+                lambda: create_typed_video_list(video_dict_list),
+                lambda: VideoBatch.create(video_dict_list),
+            ),
+            (
+                "status",
+                lambda: replace_status_typed_video_list(typed_video_list, status_list),
+                lambda: video_batch.replace_status_list(status_list),
+            ),
+            (
+                "dict",
+                lambda: [v.to_dict() for v in typed_video_list],
+                lambda: video_batch.to_dict_list(),
+            ),
+        ]
+        for name, typed_func, batch_func in cases:
+            typed_ms = measure(typed_func, args.number, args.repeat)
+            batch_ms = measure(batch_func, args.number, args.repeat)
+            print(f"{video_num:>8}{name:>8}{typed_ms:>14.3f}ms{batch_ms:>10.3f}ms{typed_ms / batch_ms:>9.1f}x")
+
+        typed_kb = measure_memory(lambda: create_typed_video_list(video_dict_list))
+        batch_kb = measure_memory(lambda: VideoBatch.create(video_dict_list))
+        print(f"{video_num:>8}{'memory':>8}{typed_kb:>14.1f}KB{batch_kb:>10.1f}KB{typed_kb / batch_kb:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
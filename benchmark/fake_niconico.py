@@ -0,0 +1,347 @@
+"""ベンチマーク用の擬似的なニコニコ動画サーバ
+
+synthetic_db.py と同じ引数で生成した擬似的なマイリストについて、
+更新処理が取得する以下のページを httpx.MockTransport として応答する（実際の通信は行わない）
+    投稿動画   : https://www.nicovideo.jp/user/{userid}/video?rss=2.0 (HTML), 2ページ目以降は nvapi v3 (JSON)
+    マイリスト : https://nvapi.nicovideo.jp/v2/mylists/{mylistid} (JSON)
+    シリーズ   : https://nvapi.nicovideo.jp/v1/series/{seriesid} (JSON, 古い順)
+    動画情報API: https://ext.nicovideo.jp/api/getthumbinfo/{video_id} (XML)
+各マイリストにはDBに登録済の動画に加えて、DBより新しい動画を FakeServerConfig.new_video_num 件ずつ掲載する
+応答時間, 503 / 429 を返す確率, ページの大きさは FakeServerConfig で設定する
+VideoInfoFetcherBase.configure_transport(server.transport) とすることで、更新処理の通信先をこのサーバに差し替える
+
+Usage:
+    python ./benchmark/fake_niconico.py [-m MYLIST_NUM] [-v VIDEO_NUM] [-s SEED]
+"""
+
+import argparse
+import asyncio
+import html
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import httpx
+import orjson
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).parent))
+
+from synthetic_db import (  # noqa: E402
+    DATETIME_FORMAT,
+    SUBJECT_LIST,
+    TAG_LIST,
+    format_datetime,
+    iter_mylist_with_video,
+    make_title,
+)
+
+UPLOADED_PAGE_PATTERN = re.compile(r"^/user/([0-9]+)/video$")
+UPLOADED_API_PATTERN = re.compile(r"^/v3/users/([0-9]+)/videos$")
+MYLIST_API_PATTERN = re.compile(r"^/v2/mylists/([0-9]+)$")
+SERIES_API_PATTERN = re.compile(r"^/v1/series/([0-9]+)$")
+THUMBINFO_API_PATTERN = re.compile(r"^/api/getthumbinfo/([a-z]{2}[0-9]+)$")
+
+
+@dataclass(frozen=True)
+class FakeServerConfig:
+    """擬似サーバの応答の設定
+
+    Attributes:
+        latency_ms (float): ページ取得の平均応答時間[ms], 指数分布でばらつかせる
+        api_latency_ms (float): 動画情報APIの平均応答時間[ms]
+        error_rate (float): ページ取得に 503 を返す確率
+        rate_limit_rate (float): ページ取得に 429 を返す確率
+        api_error_rate (float): 動画情報APIに 503 を返す確率
+        padding_kb (int): ページの応答に付け加える詰め物の大きさ[KB], 実際のページの大きさに近づける
+        page_size (int): 1ページあたりの動画数
+        new_video_num (int): マイリストごとに掲載する、DBより新しい動画の数
+    """
+
+    latency_ms: float = 50.0
+    api_latency_ms: float = 2.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    api_error_rate: float = 0.0
+    padding_kb: int = 50
+    page_size: int = 100
+    new_video_num: int = 3
+
+    def __post_init__(self) -> None:
+        if self.latency_ms < 0 or self.api_latency_ms < 0:
+            raise ValueError("latency_ms and api_latency_ms must be non-negative.")
+        for rate in [self.error_rate, self.rate_limit_rate, self.api_error_rate]:
+            if not (0.0 <= rate <= 1.0):
+                raise ValueError("error_rate, rate_limit_rate and api_error_rate must be in [0.0, 1.0].")
+        if self.error_rate + self.rate_limit_rate > 1.0:
+            raise ValueError("error_rate + rate_limit_rate must be 1.0 or less.")
+        if self.padding_kb < 0 or self.new_video_num < 0:
+            raise ValueError("padding_kb and new_video_num must be non-negative.")
+        if self.page_size < 1:
+            raise ValueError("page_size must be positive.")
+
+
+def to_iso_datetime(dt_str: str) -> str:
+    """ "2023-12-26 12:34:56" -> "2023-12-26T12:34:56+09:00" """
+    return datetime.strptime(dt_str, DATETIME_FORMAT).strftime("%Y-%m-%dT%H:%M:%S+09:00")
+
+
+class FakeNiconicoServer:
+    """擬似的なニコニコ動画サーバ
+
+    Notes:
+        応答はすべて生成時に用意した動画の一覧から作成し、リクエストごとに状態は変えない
+        handle() は複数のスレッドのイベントループから並行して呼び出されるため、集計はロックで保護する
+
+    Attributes:
+        config (FakeServerConfig): 応答の設定
+        mylist_dict (dict[tuple[str, str], dict]): {(種別, ID): {"record": Mylist の行, "video_list": 新しい順の動画}}
+        video_dict (dict[str, tuple[dict, dict]]): {動画ID: (動画, Mylist の行)}
+    """
+
+    config: FakeServerConfig
+    mylist_dict: dict[tuple[str, str], dict]
+    video_dict: dict[str, tuple[dict, dict]]
+
+    def __init__(
+        self,
+        mylist_num: int,
+        video_num: int,
+        unwatched_ratio: float = 0.2,
+        seed: int = 0,
+        config: FakeServerConfig | None = None,
+    ) -> None:
+        """synthetic_db.generate() と同じ引数を渡すと、生成したDBと同じマイリストと動画を応答する"""
+        self.config = config or FakeServerConfig()
+        self.mylist_dict = {}
+        self.video_dict = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._status_counter = Counter()
+        self._kind_counter = Counter()
+        self._bytes = 0
+
+        for index, (mylist_record, records) in enumerate(
+            iter_mylist_with_video(mylist_num, video_num, unwatched_ratio, seed)
+        ):
+            video_list = self._make_new_video_list(mylist_record, records, index) + records
+            # URL の末尾が投稿者ID, マイリストID, シリーズIDのいずれかとなる
+            key_id = mylist_record["url"].split("/")[-2 if mylist_record["type"] == "uploaded" else -1]
+            self.mylist_dict[(mylist_record["type"], key_id)] = {"record": mylist_record, "video_list": video_list}
+            for video in video_list:
+                self.video_dict[video["video_id"]] = (video, mylist_record)
+
+    def _make_new_video_list(self, mylist_record: dict, records: list[dict], index: int) -> list[dict]:
+        """DBに登録済の動画より新しい動画を、新しい順に new_video_num 件返す"""
+        new_video_num = self.config.new_video_num
+        latest_str = records[0]["uploaded_at"] if records else mylist_record["checked_at"]
+        latest_dt = datetime.strptime(latest_str, DATETIME_FORMAT)
+        tag, subject = self._rng.choice(TAG_LIST), self._rng.choice(SUBJECT_LIST)
+        res = []
+        for i in range(new_video_num):
+            video_id = f"sm{20000000 + index * new_video_num + new_video_num - i}"
+            uploaded_at = format_datetime(latest_dt + timedelta(hours=new_video_num - i))
+            res.append({
+                "video_id": video_id,
+                "title": make_title(self._rng, tag, subject, len(records) + new_video_num - i),
+                "username": mylist_record["username"],
+                "uploaded_at": uploaded_at,
+                "registered_at": uploaded_at,
+            })
+        return res
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def get_stats(self) -> dict:
+        """これまでに応答したリクエストの集計を返す"""
+        with self._lock:
+            return {
+                "requests": sum(self._kind_counter.values()),
+                "kind": dict(self._kind_counter),
+                "status": {str(k): v for k, v in sorted(self._status_counter.items())},
+                "bytes": self._bytes,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._status_counter.clear()
+            self._kind_counter.clear()
+            self._bytes = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """リクエストに対する応答を返す, MockTransport のハンドラ"""
+        is_api = request.url.host == "ext.nicovideo.jp"
+        latency_ms = self.config.api_latency_ms if is_api else self.config.latency_ms
+        p = self._rng.random()
+        if latency_ms > 0:
+            # 平均 latency_ms, 最小 latency_ms / 2 で長い裾を持つ分布とする
+            await asyncio.sleep(latency_ms * (0.5 + self._rng.expovariate(2.0)) / 1000)
+
+        if is_api and p < self.config.api_error_rate:
+            kind, response = "api", httpx.Response(503)
+        elif not is_api and p < self.config.error_rate:
+            kind, response = "page", httpx.Response(503)
+        elif not is_api and p < self.config.error_rate + self.config.rate_limit_rate:
+            kind, response = "page", httpx.Response(429, headers={"Retry-After": "1"})
+        else:
+            kind, response = self._route(request.url)
+
+        with self._lock:
+            self._kind_counter[kind] += 1
+            self._status_counter[response.status_code] += 1
+            self._bytes += len(response.content)
+        return response
+
+    def _route(self, url: httpx.URL) -> tuple[str, httpx.Response]:
+        """URL に応じた (リクエストの種別, 応答) を返す"""
+        path = url.path
+        page = int(url.params.get("page", 1))
+        page_size = int(url.params.get("pageSize", self.config.page_size))
+        if url.host == "ext.nicovideo.jp" and (m := THUMBINFO_API_PATTERN.match(path)):
+            return "api", self._thumbinfo_response(m.group(1))
+        if url.host == "www.nicovideo.jp" and (m := UPLOADED_PAGE_PATTERN.match(path)):
+            entry = self.mylist_dict.get(("uploaded", m.group(1)))
+            return "page", self._uploaded_html_response(entry, page_size) if entry else httpx.Response(404)
+        if url.host != "nvapi.nicovideo.jp":
+            return "unknown", httpx.Response(404)
+        if m := UPLOADED_API_PATTERN.match(path):
+            entry = self.mylist_dict.get(("uploaded", m.group(1)))
+            return "page", self._uploaded_json_response(entry, page, page_size) if entry else httpx.Response(404)
+        if m := MYLIST_API_PATTERN.match(path):
+            entry = self.mylist_dict.get(("mylist", m.group(1)))
+            return "page", self._mylist_json_response(entry, page, page_size) if entry else httpx.Response(404)
+        if m := SERIES_API_PATTERN.match(path):
+            entry = self.mylist_dict.get(("series", m.group(1)))
+            return "page", self._series_json_response(entry, page, page_size) if entry else httpx.Response(404)
+        return "unknown", httpx.Response(404)
+
+    @staticmethod
+    def _to_item(video: dict) -> dict:
+        return {
+            "id": video["video_id"],
+            "title": video["title"],
+            "registeredAt": to_iso_datetime(video["registered_at"]),
+        }
+
+    def _padding(self) -> str:
+        return "x" * (self.config.padding_kb * 1024)
+
+    def _json_response(self, data: dict) -> httpx.Response:
+        if self.config.padding_kb > 0:
+            data = data | {"padding": self._padding()}
+        return httpx.Response(200, content=orjson.dumps(data), headers={"Content-Type": "application/json"})
+
+    def _uploaded_html_response(self, entry: dict, page_size: int) -> httpx.Response:
+        video_list = entry["video_list"]
+        initial_data = {
+            "state": {"userDetails": {"userDetails": {"user": {"nickname": entry["record"]["username"]}}}},
+            "nvapi": [
+                {
+                    "body": {
+                        "data": {
+                            "items": [{"essential": self._to_item(v)} for v in video_list[:page_size]],
+                            "totalCount": len(video_list),
+                        }
+                    }
+                }
+            ],
+        }
+        attribute_value = html.escape(orjson.dumps(initial_data).decode())
+        # 実際のページと同じく、動画一覧を埋め込んだ要素より前に他の要素が並ぶ
+        text = (
+            "<!DOCTYPE html><html><head><title>投稿動画</title></head><body>"
+            f'<div class="padding">{self._padding()}</div>'
+            f'<div id="js-initial-userpage-data" data-initial-data="{attribute_value}">'
+            "</div></body></html>"
+        )
+        return httpx.Response(200, content=text.encode(), headers={"Content-Type": "text/html; charset=utf-8"})
+
+    def _uploaded_json_response(self, entry: dict, page: int, page_size: int) -> httpx.Response:
+        video_list = entry["video_list"]
+        items = video_list[(page - 1) * page_size : page * page_size]
+        return self._json_response({
+            "data": {"items": [{"essential": self._to_item(v)} for v in items], "totalCount": len(video_list)}
+        })
+
+    def _mylist_json_response(self, entry: dict, page: int, page_size: int) -> httpx.Response:
+        record, video_list = entry["record"], entry["video_list"]
+        items = video_list[(page - 1) * page_size : page * page_size]
+        return self._json_response({
+            "data": {
+                "mylist": {
+                    "name": record["mylistname"],
+                    "owner": {"name": record["username"]},
+                    "items": [{"video": self._to_item(v)} for v in items],
+                    "totalItemCount": len(video_list),
+                }
+            }
+        })
+
+    def _series_json_response(self, entry: dict, page: int, page_size: int) -> httpx.Response:
+        # シリーズは古い順に並ぶ
+        record, video_list = entry["record"], entry["video_list"][::-1]
+        items = video_list[(page - 1) * page_size : page * page_size]
+        return self._json_response({
+            "data": {
+                "detail": {"title": record["mylistname"], "owner": {"user": {"nickname": record["username"]}}},
+                "items": [{"video": self._to_item(v)} for v in items],
+                "totalCount": len(video_list),
+            }
+        })
+
+    def _thumbinfo_response(self, video_id: str) -> httpx.Response:
+        headers = {"Content-Type": "text/xml; charset=utf-8"}
+        if video_id not in self.video_dict:
+            text = (
+                '<?xml version="1.0" encoding="UTF-8"?>\n<nicovideo_thumb_response status="fail">'
+                "<error><code>NOT_FOUND</code><description>not found or invalid</description></error>"
+                "</nicovideo_thumb_response>"
+            )
+            return httpx.Response(200, content=text.encode(), headers=headers)
+        video, record = self.video_dict[video_id]
+        text = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n<nicovideo_thumb_response status="ok"><thumb>'
+            f"<video_id>{video_id}</video_id>"
+            f"<title>{escape(video['title'])}</title>"
+            f"<description>{escape(video['title'])}の動画です</description>"
+            f"<first_retrieve>{to_iso_datetime(video['uploaded_at'])}</first_retrieve>"
+            "<length>12:34</length>"
+            f"<watch_url>https://www.nicovideo.jp/watch/{video_id}</watch_url>"
+            f"<user_id>{record['url'].split('/')[4]}</user_id>"
+            f"<user_nickname>{escape(video['username'])}</user_nickname>"
+            "</thumb></nicovideo_thumb_response>"
+        )
+        return httpx.Response(200, content=text.encode(), headers=headers)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Fake niconico server for benchmarks.")
+    arg_parser.add_argument("-m", "--mylist-num", type=int, default=10, help="number of mylists.")
+    arg_parser.add_argument("-v", "--video-num", type=int, default=20, help="number of videos per mylist.")
+    arg_parser.add_argument("-s", "--seed", type=int, default=0, help="random seed.")
+    args = arg_parser.parse_args()
+
+    from nnmm.video_info_fetcher.value_objects.mylist_url_factory import MylistURLFactory
+
+    server = FakeNiconicoServer(args.mylist_num, args.video_num, seed=args.seed)
+
+    async def main() -> None:
+        async with httpx.AsyncClient(transport=server.transport) as client:
+            for entry in list(server.mylist_dict.values())[:3]:
+                record = entry["record"]
+                response = await client.get(MylistURLFactory.create(record["url"]).fetch_url)
+                print(record["type"], record["url"], response.status_code, len(response.content))
+            video_id = next(iter(server.video_dict))
+            response = await client.get(f"https://ext.nicovideo.jp/api/getthumbinfo/{video_id}")
+            print(response.text)
+        print(server.get_stats())
+
+    asyncio.run(main())
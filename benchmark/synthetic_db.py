@@ -0,0 +1,293 @@
+"""ベンチマーク用の擬似的なDBを生成する
+
+マイリスト N 件 × 動画 M 件（MylistInfo は N × M 行）を登録したDBを、シード値から決定的に生成する
+同じ引数で生成したDBは、生成日時によらず常に同じ内容となる
+    マイリスト : 7割を投稿動画、2割をマイリスト、1割をシリーズとし、投稿者名・更新確認インターバルをばらつかせる
+    動画タイトル : マイリストごとのシリーズ（タグ・題材）に沿った日本語タイトルとし、長さをばらつかせる
+    視聴状況 : 動画ごとに --unwatched-ratio の確率で未視聴とする（新しい動画ほど未視聴になりやすい）
+    投稿日時 : マイリストごとの投稿頻度で、新しい動画から順に過去へさかのぼる
+大量の行を短時間で登録するため、各DBコントローラは経由せずにテーブルへまとめて INSERT する
+テーブルの作成は MylistDBController / MylistInfoDBController と同じく DBControllerBase で行う
+DBを介さずに同じ内容を参照する場合（擬似的なサーバなど）は iter_mylist_with_video() を用いる
+
+Usage:
+    python ./benchmark/synthetic_db.py -o DB_PATH [-m MYLIST_NUM] [-v VIDEO_NUM] [-u UNWATCHED_RATIO] [-s SEED]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from nnmm.model import Mylist, MylistInfo, calc_next_check_at, interval_to_minutes  # noqa: E402
+from nnmm.mylist_db_controller import MylistDBController  # noqa: E402
+from nnmm.mylist_info_db_controller import MylistInfoDBController  # noqa: E402
+
+BASE_DATETIME = datetime(2023, 12, 26, 12, 34, 56)
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+INSERT_CHUNK_SIZE = 10000
+
+TAG_LIST = [
+    "実況プレイ",
+    "ゆっくり実況",
+    "歌ってみた",
+    "踊ってみた",
+    "演奏してみた",
+    "MMD",
+    "VOCALOID",
+    "ゆっくり解説",
+    "料理",
+    "RTA",
+    "東方",
+    "作業用BGM",
+]
+SUBJECT_LIST = [
+    "ゼルダの伝説",
+    "マインクラフト",
+    "ポケットモンスター",
+    "初音ミク",
+    "スーパーマリオ",
+    "ドラゴンクエスト",
+    "ファイナルファンタジー",
+    "アイドルマスター",
+    "鉄道",
+    "猫",
+    "カレー",
+    "モンスターハンター",
+]
+ACTION_LIST = [
+    "をプレイ",
+    "を全力で楽しむ",
+    "を解説してみた",
+    "をまったり遊ぶ",
+    "縛りで攻略",
+    "を作ってみた",
+    "に挑戦",
+    "を歌ってみた",
+]
+EPISODE_LIST = ["最初の村", "地下迷宮", "雪山", "最終決戦", "寄り道", "番外編", "大型アップデート", "視聴者参加型"]
+HANDLE_LIST = [
+    "たろう",
+    "はなこ",
+    "ゆうき",
+    "さくら",
+    "けんた",
+    "みどり",
+    "くろねこ",
+    "しろくま",
+    "ぽてと",
+    "もちもち",
+]
+HANDLE_SUFFIX_LIST = ["", "P", "さん", "@実況", "(仮)"]
+CHECK_INTERVAL_LIST = ["15分", "30分", "1時間", "6時間", "12時間", "1日"]
+
+
+def format_datetime(dt: datetime) -> str:
+    return dt.strftime(DATETIME_FORMAT)
+
+
+def make_title(rng: random.Random, tag: str, subject: str, part: int) -> str:
+    """シリーズ（タグ・題材）に沿った動画タイトルを返す
+
+    短いもの（10文字程度）から長いもの（60文字程度）までを一定の割合で生成する
+    """
+    action = rng.choice(ACTION_LIST)
+    p = rng.random()
+    if p < 0.2:
+        return f"{subject}{action}"
+    if p < 0.6:
+        return f"【{tag}】{subject}{action} part{part}"
+    if p < 0.85:
+        return f"【{tag}】{subject}{action}【{rng.choice(EPISODE_LIST)}編】#{part}"
+    other_tag = rng.choice(TAG_LIST)
+    episode = rng.choice(EPISODE_LIST)
+    other_subject = rng.choice(SUBJECT_LIST)
+    return f"【{tag}】【{other_tag}】{subject}{action}～{episode}から{other_subject}まで～ part{part}（修正版）"
+
+
+def make_mylist_record(rng: random.Random, index: int) -> dict:
+    """Mylist の1行分の辞書を返す, 日時は更新確認済の状態とする"""
+    username = f"{rng.choice(HANDLE_LIST)}{rng.choice(HANDLE_SUFFIX_LIST)}_{index}"
+    user_id = 10000000 + index
+    p = rng.random()
+    if p < 0.7:
+        mylist_type = "uploaded"
+        mylistname = "投稿動画"
+        showname = f"{username}さんの投稿動画"
+        url = f"https://www.nicovideo.jp/user/{user_id}/video"
+    elif p < 0.9:
+        mylist_type = "mylist"
+        mylistname = f"{rng.choice(SUBJECT_LIST)}まとめ"
+        showname = f"「{mylistname}」-{username}さんのマイリスト"
+        url = f"https://www.nicovideo.jp/user/{user_id}/mylist/{70000000 + index}"
+    else:
+        mylist_type = "series"
+        mylistname = f"{rng.choice(SUBJECT_LIST)}シリーズ"
+        showname = f"「{mylistname}」-{username}さんのシリーズ"
+        url = f"https://www.nicovideo.jp/user/{user_id}/series/{80000000 + index}"
+    check_interval = rng.choice(CHECK_INTERVAL_LIST)
+    check_interval_minutes = interval_to_minutes(check_interval)
+    checked_at = format_datetime(BASE_DATETIME)
+    return {
+        "id": index + 1,
+        "username": username,
+        "mylistname": mylistname,
+        "type": mylist_type,
+        "showname": showname,
+        "url": url,
+        "created_at": checked_at,
+        "updated_at": checked_at,
+        "checked_at": checked_at,
+        "check_interval": check_interval,
+        "check_failed_count": 0,
+        "is_include_new": False,
+        "check_interval_minutes": check_interval_minutes,
+        "next_check_at": calc_next_check_at(checked_at, check_interval_minutes),
+    }
+
+
+def make_video_record_list(
+    rng: random.Random, mylist_record: dict, video_id_start: int, video_num: int, unwatched_ratio: float
+) -> list[dict]:
+    """マイリスト1件分の MylistInfo の行の辞書リストを、新しい動画から順に返す
+
+    未視聴となる確率は新しい動画ほど高くし、マイリスト全体では平均して unwatched_ratio となるようにする
+    """
+    tag = rng.choice(TAG_LIST)
+    subject = rng.choice(SUBJECT_LIST)
+    # 投稿頻度はマイリストごとに 1時間 ～ 14日 の間でばらつかせる
+    mean_interval_hours = rng.uniform(1, 24 * 14)
+    uploaded_dt = BASE_DATETIME - timedelta(hours=rng.uniform(0, mean_interval_hours))
+    created_at = format_datetime(BASE_DATETIME)
+    username = mylist_record["username"]
+    mylist_url = mylist_record["url"]
+    # マイリスト以外は登録日時と投稿日時が一致する
+    is_uploaded = mylist_record["type"] != "mylist"
+
+    res = []
+    for i in range(video_num):
+        video_id = f"sm{video_id_start + video_num - i}"
+        # 新しい動画ほど未視聴になりやすくする, 平均すると unwatched_ratio となる
+        weight = 2 * (1 - i / video_num) if video_num > 1 else 1
+        status = "未視聴" if rng.random() < min(1.0, unwatched_ratio * weight) else ""
+        uploaded_at = format_datetime(uploaded_dt)
+        registered_dt = uploaded_dt if is_uploaded else uploaded_dt + timedelta(hours=rng.uniform(0, 72))
+        res.append({
+            "video_id": video_id,
+            "title": make_title(rng, tag, subject, video_num - i),
+            "username": username,
+            "status": status,
+            "uploaded_at": uploaded_at,
+            "registered_at": format_datetime(registered_dt),
+            "video_url": f"https://www.nicovideo.jp/watch/{video_id}",
+            "mylist_url": mylist_url,
+            "created_at": created_at,
+        })
+        uploaded_dt -= timedelta(hours=rng.expovariate(1 / mean_interval_hours))
+    return res
+
+
+def iter_mylist_with_video(
+    mylist_num: int, video_num: int, unwatched_ratio: float = 0.2, seed: int = 0
+) -> Iterator[tuple[dict, list[dict]]]:
+    """擬似的なマイリストを1件ずつ、そのマイリストの動画とともに返す
+
+    generate() がDBに登録する内容と同じものを、同じ順に返す
+
+    Args:
+        mylist_num (int): マイリスト数 N
+        video_num (int): マイリストごとの動画数 M
+        unwatched_ratio (float): 未視聴の動画の割合
+        seed (int): シード値
+
+    Yields:
+        tuple[dict, list[dict]]: (Mylist の1行分の辞書, 新しい順の MylistInfo の行の辞書リスト)
+    """
+    rng = random.Random(seed)
+    for index in range(mylist_num):
+        mylist_record = make_mylist_record(rng, index)
+        records = make_video_record_list(rng, mylist_record, 10000000 + index * video_num, video_num, unwatched_ratio)
+        if records:
+            mylist_record["updated_at"] = records[0]["uploaded_at"]
+        mylist_record["is_include_new"] = any(r["status"] == "未視聴" for r in records)
+        yield mylist_record, records
+
+
+def generate(db_fullpath: str, mylist_num: int, video_num: int, unwatched_ratio: float = 0.2, seed: int = 0) -> dict:
+    """擬似的なマイリストと動画を登録したDBを生成する
+
+    Args:
+        db_fullpath (str): 生成先のDBファイルパス, 既存のテーブルに行を追加するため空のDBを指定すること
+        mylist_num (int): マイリスト数 N
+        video_num (int): マイリストごとの動画数 M
+        unwatched_ratio (float): 未視聴の動画の割合
+        seed (int): シード値
+
+    Returns:
+        dict: 生成結果の概要 {"mylist_num", "video_num", "rows", "unwatched_num", "elapsed_sec"}
+    """
+    if mylist_num < 0 or video_num < 0:
+        raise ValueError("mylist_num and video_num must be non-negative.")
+    if not (0.0 <= unwatched_ratio <= 1.0):
+        raise ValueError("unwatched_ratio must be in [0.0, 1.0].")
+
+    start = time.perf_counter()
+    # テーブル作成は各DBコントローラに任せる
+    mylist_db = MylistDBController(db_fullpath)
+    MylistInfoDBController(db_fullpath).engine.dispose()
+
+    mylist_record_list = []
+    video_record_list = []
+    rows = 0
+    unwatched_num = 0
+    with mylist_db.engine.begin() as conn:
+        for mylist_record, records in iter_mylist_with_video(mylist_num, video_num, unwatched_ratio, seed):
+            unwatched_num += sum(r["status"] == "未視聴" for r in records)
+            rows += len(records)
+            mylist_record_list.append(mylist_record)
+            video_record_list.extend(records)
+            if len(video_record_list) >= INSERT_CHUNK_SIZE:
+                conn.execute(insert(MylistInfo), video_record_list)
+                video_record_list = []
+        if video_record_list:
+            conn.execute(insert(MylistInfo), video_record_list)
+        if mylist_record_list:
+            conn.execute(insert(Mylist), mylist_record_list)
+    mylist_db.engine.dispose()
+
+    return {
+        "mylist_num": mylist_num,
+        "video_num": video_num,
+        "rows": rows,
+        "unwatched_num": unwatched_num,
+        "elapsed_sec": time.perf_counter() - start,
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Generate a synthetic NNMM DB.")
+    arg_parser.add_argument("-o", "--output", required=True, help="DB file path to create.")
+    arg_parser.add_argument("-m", "--mylist-num", type=int, default=100, help="number of mylists.")
+    arg_parser.add_argument("-v", "--video-num", type=int, default=100, help="number of videos per mylist.")
+    arg_parser.add_argument("-u", "--unwatched-ratio", type=float, default=0.2, help="ratio of unwatched videos.")
+    arg_parser.add_argument("-s", "--seed", type=int, default=0, help="random seed.")
+    args = arg_parser.parse_args()
+
+    if Path(args.output).exists():
+        raise ValueError(f"{args.output} already exists.")
+    summary = generate(args.output, args.mylist_num, args.video_num, args.unwatched_ratio, args.seed)
+    print(
+        f"mylists={summary['mylist_num']}, videos/mylist={summary['video_num']}, rows={summary['rows']}, "
+        f"unwatched={summary['unwatched_num']}, elapsed={summary['elapsed_sec']:.2f}s -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
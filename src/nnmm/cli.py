@@ -0,0 +1,274 @@
+"""GUIを伴わない NNMM のコマンドラインインターフェース
+
+GUIと同じDBを対象に、マイリストの更新、書き出し、統計表示を行う
+更新処理はGUIと同じ UpdatePipeline で行い、Qt は import しない
+
+Usage:
+    nnmm update --all | --due | --url URL [URL ...] | --daemon [--poll SEC] [--backfill] [-j N] [--parse-processes N]
+                [--report DIR [--trace]] [--json]
+    nnmm export OUTPUT
+    nnmm stats [--json]
+
+    共通オプション:
+        --config PATH: 設定ファイル（必須, 既定は ./config/config.json）
+        --db PATH: DBファイル（既定は設定ファイルの値）, -q: 警告以上のみ表示
+
+Exit status:
+    0: 正常終了, 1: 更新やエクスポートに失敗したマイリストがある, 2: 設定や引数の誤り
+"""
+
+import argparse
+import logging
+import signal
+import sys
+import time
+from datetime import datetime
+from logging import INFO, WARNING, getLogger
+from pathlib import Path
+
+import orjson
+
+from nnmm.config_store import ConfigStore
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.headless_updater import HeadlessUpdater
+from nnmm.process.update_mylist.progress_sink import ConsoleProgressSink
+from nnmm.process.value_objects.table_row import Status
+from nnmm.util import Result, log_suppress, save_mylist
+from nnmm.video_info_fetcher.parse_executor import ParseExecutor
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """引数のパーサーを作成する"""
+    parser = argparse.ArgumentParser(prog="nnmm", description="NNMM のマイリストをGUIなしで操作する")
+    parser.add_argument("--config", default=ConfigStore.CONFIG_FILE_PATH, help="設定ファイルのパス")
+    parser.add_argument("--db", default=None, help="DBファイルのパス, 指定がなければ設定ファイルの値を用いる")
+    parser.add_argument("-q", "--quiet", action="store_true", help="警告以上のログのみ表示する")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    update_parser = subparsers.add_parser("update", help="マイリストを更新する")
+    target_group = update_parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument("--all", action="store_true", help="全てのマイリストを更新する")
+    target_group.add_argument("--due", action="store_true", help="次回更新確認日時を迎えたマイリストを更新する")
+    target_group.add_argument("--url", nargs="+", metavar="URL", help="指定のマイリストを更新する")
+    target_group.add_argument("--daemon", action="store_true", help="中止されるまで --due の更新を繰り返す")
+    update_parser.add_argument(
+        "--poll", type=float, default=HeadlessUpdater.DEFAULT_POLL_SECONDS, help="--daemon の待機時間の上限[sec]"
+    )
+    update_parser.add_argument("--backfill", action="store_true", help="取得済の動画に到達しても全件取得する")
+    update_parser.add_argument(
+        "-j", "--processes", type=int, default=None, help="fetch と差分確認を行うワーカープロセス数"
+    )
+    update_parser.add_argument(
+        "--parse-processes",
+        type=int,
+        default=None,
+        help="fetch 結果の解析を行うプロセス数, 0 ならスレッド内で解析する（既定は設定ファイルの値）",
+    )
+    update_parser.add_argument(
+        "--report", default=None, metavar="DIR", help="各段階の所要時間の集計を DIR/update_report.json に書き出す"
+    )
+    update_parser.add_argument(
+        "--trace", action="store_true", help="--report に加えて Chrome trace 形式の DIR/update_trace.json も書き出す"
+    )
+    update_parser.add_argument("--json", action="store_true", help="更新結果をJSONで出力する")
+
+    export_parser = subparsers.add_parser("export", help="マイリスト一覧をcsvファイルに書き出す")
+    export_parser.add_argument("output", help="保存先パス")
+
+    stats_parser = subparsers.add_parser("stats", help="マイリストと動画の統計を表示する")
+    stats_parser.add_argument("--json", action="store_true", help="統計をJSONで出力する")
+    return parser
+
+
+def setup_logging(is_quiet: bool) -> None:
+    """ログを標準エラー出力に出力する, 標準出力は結果の出力のみに用いる"""
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    level = WARNING if is_quiet else INFO
+    root_logger.setLevel(level)
+    getLogger("nnmm").setLevel(level)
+    log_suppress()
+
+
+def resolve_db_fullpath(config_file_path: str, db_fullpath: str | None) -> str:
+    """設定ファイルを読み込み、対象とするDBファイルのパスを返す
+
+    rss_save_path など DB以外の設定も更新処理の中で参照するため、--db の指定があっても設定ファイルは必ず読み込む
+    --db の指定は読み込んだ設定の db.save_path を上書きする
+
+    Raises:
+        IOError: 設定ファイルが読み込めない場合
+    """
+    ConfigStore.CONFIG_FILE_PATH = config_file_path
+    config = ConfigStore.set_config()
+    if db_fullpath:
+        config["db"]["save_path"] = db_fullpath
+    return str(Path(config["db"].get("save_path", "")))
+
+
+def collect_stats(mylist_db: MylistDBController, mylist_info_db: MylistInfoDBController, now: float) -> dict:
+    """マイリストと動画の統計を集計する
+
+    件数はDB側で集計し、レコードは読み込まない
+
+    Args:
+        mylist_db (MylistDBController): マイリスト情報DB
+        mylist_info_db (MylistInfoDBController): 動画情報DB
+        now (float): 基準日時（エポック秒）
+
+    Returns:
+        dict: 統計, next_check_at は "%Y-%m-%d %H:%M:%S" 形式の文字列, 予定がなければ空文字列
+    """
+    mylist_stats = mylist_db.select_stats(datetime.fromtimestamp(now), MylistCircuitBreaker.FAILURE_THRESHOLD)
+    status_count = mylist_info_db.select_status_count()
+
+    next_check_at = mylist_stats["next_check_at"]
+    return {
+        "mylist_num": mylist_stats["mylist_num"],
+        "include_new_num": mylist_stats["include_new_num"],
+        "video_num": sum(status_count.values()),
+        "not_watched_num": status_count.get(Status.not_watched.value, 0),
+        "failing_mylist_num": mylist_stats["failing_mylist_num"],
+        "circuit_tripped_num": mylist_stats["tripped_mylist_num"],
+        "due_num": mylist_stats["due_num"],
+        "next_check_at": (
+            datetime.fromtimestamp(next_check_at).strftime("%Y-%m-%d %H:%M:%S") if next_check_at is not None else ""
+        ),
+    }
+
+
+def run_update(args: argparse.Namespace, mylist_db: MylistDBController, mylist_info_db: MylistInfoDBController) -> int:
+    """update サブコマンド"""
+    progress_sink = None if args.quiet else ConsoleProgressSink(sys.stderr)
+    if args.processes is not None and args.processes < 1:
+        logger.error("--processes must be >= 1.")
+        return EXIT_USAGE
+    parse_process_num = args.parse_processes
+    if parse_process_num is None:
+        parse_process_num = ConfigStore.get_parse_process_num()
+    elif parse_process_num < 0:
+        logger.error("--parse-processes must be >= 0.")
+        return EXIT_USAGE
+    if args.trace and args.report is None:
+        logger.error("--trace requires --report.")
+        return EXIT_USAGE
+    if args.report is not None and args.processes is not None:
+        logger.error("--report is not available with --processes.")
+        return EXIT_USAGE
+    report_dir = None if args.report is None else Path(args.report)
+    updater = HeadlessUpdater(
+        mylist_db, mylist_info_db, progress_sink, args.processes, report_dir=report_dir, is_chrome_trace=args.trace
+    )
+
+    # Ctrl+C などで中止する, 書き込み中のマイリストは最後まで反映させてから終了する
+    def handle_signal(signum, frame) -> None:
+        logger.warning(f"Signal {signum} received, cancelling update.")
+        updater.cancel()
+
+    previous_handlers = {signum: signal.signal(signum, handle_signal) for signum in (signal.SIGINT, signal.SIGTERM)}
+    ParseExecutor.configure(parse_process_num)
+    try:
+        return _run_update(args, updater)
+    finally:
+        ParseExecutor.shutdown()
+        for signum, previous_handler in previous_handlers.items():
+            signal.signal(signum, previous_handler)
+
+
+def _run_update(args: argparse.Namespace, updater: HeadlessUpdater) -> int:
+    """update サブコマンドの本体, 対象のマイリストを選んで更新し、結果を出力する"""
+    if args.daemon:
+        if args.poll <= 0:
+            logger.error("--poll must be > 0.")
+            return EXIT_USAGE
+        run_count = updater.run_daemon(args.poll, args.backfill)
+        logger.info(f"Headless update daemon stopped, {run_count} run(s).")
+        return EXIT_SUCCESS
+
+    if args.all:
+        m_list = updater.select_all()
+    elif args.due:
+        m_list = updater.select_due()
+    else:
+        m_list = updater.select_url(args.url)
+        if len(m_list) != len(args.url):
+            return EXIT_USAGE
+    # 個別に指定されたマイリストはGUIの単一更新と同じく、待機時間を待たずに回復確認を行う
+    summary = updater.update(m_list, args.backfill, is_forced_probe=bool(args.url))
+
+    if args.json:
+        print(orjson.dumps(summary.to_dict()).decode())
+    else:
+        print(summary.to_text())
+    return EXIT_SUCCESS if summary.is_success else EXIT_FAILURE
+
+
+def run_export(args: argparse.Namespace, mylist_db: MylistDBController) -> int:
+    """export サブコマンド"""
+    result = save_mylist(mylist_db, args.output)
+    if result != Result.success:
+        logger.error(f"Export failed : {args.output}.")
+        return EXIT_FAILURE
+    print(args.output)
+    return EXIT_SUCCESS
+
+
+def run_stats(args: argparse.Namespace, mylist_db: MylistDBController, mylist_info_db: MylistInfoDBController) -> int:
+    """stats サブコマンド"""
+    stats = collect_stats(mylist_db, mylist_info_db, time.time())
+    if args.json:
+        print(orjson.dumps(stats).decode())
+    else:
+        width = max(len(key) for key in stats)
+        for key, value in stats.items():
+            print(f"{key:<{width}}  {value}")
+    return EXIT_SUCCESS
+
+
+def main(argv: list[str] | None = None) -> int:
+    """nnmm コマンドのエントリポイント
+
+    Args:
+        argv (list[str] | None): 引数リスト, Noneなら sys.argv[1:]
+
+    Returns:
+        int: 終了ステータス
+    """
+    parser = create_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else EXIT_USAGE
+    setup_logging(args.quiet)
+
+    try:
+        db_fullpath = resolve_db_fullpath(args.config, args.db)
+    except (IOError, KeyError, ValueError) as e:
+        logger.error(f"Config load failed, {type(e).__name__}: {e}")
+        return EXIT_USAGE
+
+    mylist_db = MylistDBController(db_fullpath=db_fullpath)
+    mylist_info_db = MylistInfoDBController(db_fullpath=db_fullpath)
+    match args.command:
+        case "update":
+            return run_update(args, mylist_db, mylist_info_db)
+        case "export":
+            return run_export(args, mylist_db)
+        case "stats":
+            return run_stats(args, mylist_db, mylist_info_db)
+    return EXIT_USAGE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+from logging import INFO, getLogger
+from pathlib import Path
+
+import orjson
+
+from nnmm.model import interval_to_minutes
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class ConfigStore:
+    """設定ファイルの読み込みと、読み込んだ設定の保持を担う
+
+    Notes:
+        Qt に依存しないため、GUIを伴わない nnmm.cli や更新処理のエンジン部分からも参照できる
+        GUIの ConfigBase はこのクラスを継承し、GUIで読み込み直した設定はこのクラスにも反映する
+
+    Attributes:
+        CONFIG_FILE_PATH (str): 設定ファイルのパス
+        MAX_CHECK_INTERVAL_CANDIDATES (tuple[str, ...]): 適応的インターバルの上限の候補
+        config (dict | None): 読み込んだ設定, 未読み込みならNone
+    """
+
+    CONFIG_FILE_PATH = "./config/config.json"
+    # 適応的インターバルの上限の候補, 先頭は適応的インターバルを用いない
+    MAX_CHECK_INTERVAL_CANDIDATES = ("(使用しない)", "1時間", "6時間", "1日", "3日", "1週間")
+    config = None
+
+    @classmethod
+    def load_config(cls, config_file_path: str) -> dict:
+        """設定ファイルを読み込んで構造を確認する
+
+        Args:
+            config_file_path (str): 設定ファイルのパス
+
+        Returns:
+            dict: 読み込んだ設定
+
+        Raises:
+            IOError: 設定ファイルが存在しない、または構造が不正な場合
+        """
+        if not Path(config_file_path).exists():
+            raise IOError("Config file not found.")
+        config = orjson.loads(Path(config_file_path).read_bytes())
+        if not config:
+            raise IOError("Config file is invalid.")
+
+        # 構造チェック
+        match config:
+            case {
+                "general": {
+                    "browser_path": _,
+                    "auto_reload": _,
+                    "rss_save_path": _,
+                },
+                "db": _,
+            }:
+                pass
+            case _:
+                raise IOError("Config file is invalid structure.")
+        return config
+
+    @classmethod
+    def get_config(cls) -> dict:
+        """クラス変数configを返す, 未読み込みなら読み込む
+
+        Returns:
+            dict: クラス変数config
+        """
+        if not cls.config:
+            cls.set_config()
+        return cls.config
+
+    @classmethod
+    def set_config(cls) -> dict:
+        """CONFIG_FILE_PATH を読み込んでクラス変数configに設定する
+
+        Returns:
+            dict: クラス変数config
+        """
+        cls.config = dict()
+        cls.config = cls.load_config(cls.CONFIG_FILE_PATH)
+        return cls.config
+
+    @classmethod
+    def get_max_check_interval_minutes(cls) -> int | None:
+        """適応的インターバルの上限[min]を返す
+
+        Notes:
+            "general" の "max_check_interval" に "1日" などのインターバル文字列で設定する
+            項目がない旧形式の設定ファイルや、設定ファイルが読み込めない場合は適応的インターバルを用いない
+
+        Returns:
+            int | None: 適応的インターバルの上限[min], 適応的インターバルを用いない場合None
+        """
+        try:
+            config = cls.get_config()
+            max_check_interval = config["general"].get("max_check_interval", "")
+        except Exception:
+            return None
+        return interval_to_minutes(max_check_interval)
+
+    @classmethod
+    def get_parse_process_num(cls) -> int:
+        """fetch 結果の解析を行うプロセスプールのプロセス数を返す
+
+        Notes:
+            "general" の "parse_process_num" に設定する
+            0 ならプロセスプールを用いず、fetch を行うスレッド内で解析する
+            項目がない旧形式の設定ファイルや、設定ファイルが読み込めない場合、値が不正な場合も 0 とする
+
+        Returns:
+            int: プロセス数, プロセスプールを用いない場合 0
+        """
+        try:
+            config = cls.get_config()
+            process_num = int(config["general"].get("parse_process_num", 0))
+        except Exception:
+            return 0
+        return max(0, process_num)
+
+    @classmethod
+    def is_update_trace_enabled(cls) -> bool:
+        """マイリスト更新時に Chrome trace 形式のファイルも書き出すかどうかを返す
+
+        Notes:
+            "general" の "update_trace" に true/false で設定する
+            項目がない旧形式の設定ファイルや、設定ファイルが読み込めない場合は書き出さない
+
+        Returns:
+            bool: 書き出す場合True
+        """
+        try:
+            config = cls.get_config()
+            return config["general"].get("update_trace", False) is True
+        except Exception:
+            return False
+
+
+if __name__ == "__main__":
+    config = ConfigStore.get_config()
+    print(config)
+    print(ConfigStore.get_max_check_interval_minutes())
+    print(ConfigStore.get_parse_process_num())
+    print(ConfigStore.is_update_trace_enabled())
@@ -1,27 +1,108 @@
+import threading
 from abc import ABCMeta, abstractmethod
 from pathlib import Path
+from typing import Any, Callable
 
-from sqlalchemy import create_engine
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool, StaticPool
 
 from nnmm.model import Base
 
 
 class DBControllerBase(metaclass=ABCMeta):
+    # スキーマの確認・移行を済ませたDBファイル, (処理名, 絶対パス, inode) の集合
+    # MylistDBController と MylistInfoDBController は同じDBファイルを指すため、確認は1度で済ませる
+    _done_schema_task_set: set[tuple[str, str, int]] = set()
+    _schema_lock = threading.Lock()
+
     def __init__(self, db_fullpath="NNMM_DB.db"):
         self.dbname = db_fullpath
         self.db_url = f"sqlite:///{self.dbname}"
 
+        # インメモリDBは接続ごとに別のDBとなるため、1つの接続を使い回す
+        # DBファイルは更新処理の各スレッドとGUIスレッドから並行して読み書きされる
+        # sqlite3 の1つの接続を複数スレッドで同時に使うとエラーとなるため、スレッドごとに別の接続を払い出す
+        # 接続数の上限は設けない（上限を設けると、接続の返却待ちが pool_timeout を超えた場合に例外となる）
+        if self.dbname in ("", ":memory:"):
+            pool_kwargs = {"poolclass": StaticPool}
+        else:
+            pool_kwargs = {"poolclass": QueuePool, "max_overflow": -1}
         self.engine = create_engine(
             self.db_url,
             echo=False,
-            poolclass=StaticPool,
             connect_args={
                 "timeout": 30,
                 "check_same_thread": False,
             },
+            **pool_kwargs,
         )
-        Base.metadata.create_all(self.engine)
+        if self.dbname not in ("", ":memory:"):
+            event.listen(self.engine, "connect", self._set_wal_journal_mode)
+        self.run_schema_task_once("create_all", lambda: Base.metadata.create_all(self.engine))
+
+    @staticmethod
+    def _set_wal_journal_mode(dbapi_connection, connection_record) -> None:
+        """DBファイルを WAL モードにする
+
+        Notes:
+            WAL モードでは読み込みが書き込みを待たず、書き込みも読み込みを待たない
+            書き込み同士は直列化され、他の接続の書き込みが終わるまで最大 timeout 秒待機する
+            DBファイルと同じディレクトリに -wal, -shm ファイルが作成される
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+    def close(self) -> None:
+        """未反映の書き込みをDBファイル本体に反映させて、保持している接続をすべて閉じる
+
+        Notes:
+            WAL モードでは書き込みはまず -wal ファイルに記録されるため、DBファイルを移動する前に呼び出す
+            インメモリDBは接続を閉じるとDBが失われるため何もしない
+            呼び出し後も、再度DBにアクセスすれば新しく接続を張る
+        """
+        if self.dbname in ("", ":memory:"):
+            return
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.engine.dispose()
+
+    def _db_file_key(self) -> tuple[str, int] | None:
+        """DBファイルを識別するキーを返す
+
+        Returns:
+            tuple[str, int] | None: (絶対パス, inode), インメモリDBやファイルが存在しない場合はNone
+        """
+        if self.dbname in ("", ":memory:"):
+            return None
+        db_path = Path(self.dbname)
+        if not db_path.is_file():
+            return None
+        return (str(db_path.resolve()), db_path.stat().st_ino)
+
+    def run_schema_task_once(self, task_name: str, func: Callable[[], Any]) -> bool:
+        """テーブル作成などのスキーマの確認・移行処理を、同じDBファイルに対して1プロセスで1度だけ行う
+
+        Notes:
+            インメモリDBはエンジンごとに別のDBとなるため、常に処理を行う
+            DBファイルが削除・再作成された場合は inode が変わるため、再度処理を行う
+
+        Args:
+            task_name (str): 処理名, 処理済かどうかの判定に用いる
+            func (Callable[[], Any]): 処理
+
+        Returns:
+            bool: 処理を行った場合True, 処理済のため省略した場合False
+        """
+        with DBControllerBase._schema_lock:
+            key = self._db_file_key()
+            if key is not None and (task_name, *key) in DBControllerBase._done_schema_task_set:
+                return False
+            func()
+            key = self._db_file_key()
+            if key is not None:
+                DBControllerBase._done_schema_task_set.add((task_name, *key))
+        return True
 
     @abstractmethod
     def select(self) -> list[dict]:
@@ -0,0 +1,138 @@
+import atexit
+import logging
+import queue
+from collections import deque
+from logging import INFO, getLogger
+from logging.handlers import QueueHandler, QueueListener
+
+from PySide6.QtCore import QObject, QTimer, Slot
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QPlainTextEdit
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+_queue_listener: QueueListener | None = None
+
+
+class GuiLogSink(QObject):
+    """GUIのログタブへの出力をまとめて行うログシンク
+
+    Notes:
+        CustomLogger は put() で行を積むのみで、ウィジェットは操作しない（ワーカースレッドからも呼ばれるため）
+        積まれた行は FLUSH_INTERVAL_MS ごとにGUIスレッドのタイマーでまとめて追記する
+        バッファとテキストエリアはどちらも MAX_BLOCK_COUNT 行で打ち切り、古い行から捨てる
+
+    Attributes:
+        textarea (QPlainTextEdit): ログ出力用テキストエリア
+    """
+
+    FLUSH_INTERVAL_MS = 100
+    MAX_BLOCK_COUNT = 5000
+
+    textarea: QPlainTextEdit
+
+    def __init__(self, textarea: QPlainTextEdit, parent=None) -> None:
+        super().__init__(parent)
+        self.textarea = textarea
+        self.textarea.setReadOnly(True)
+        self.textarea.setMaximumBlockCount(self.MAX_BLOCK_COUNT)
+
+        # deque の append, popleft はスレッドセーフ
+        self._buffer: deque[str] = deque(maxlen=self.MAX_BLOCK_COUNT)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def put(self, line: str) -> None:
+        """ログ行を積む, 任意のスレッドから呼び出してよい
+
+        Args:
+            line (str): 表示するログ行
+        """
+        self._buffer.append(line)
+
+    @Slot()
+    def flush(self) -> None:
+        """積まれたログ行をテキストエリアにまとめて追記する"""
+        lines = []
+        try:
+            while True:
+                lines.append(self._buffer.popleft())
+        except IndexError:
+            pass
+        if not lines:
+            return
+
+        self.textarea.appendPlainText("\n".join(lines))
+        self.textarea.moveCursor(QTextCursor.MoveOperation.End)
+
+
+def start_queue_logging() -> QueueListener:
+    """rootロガーのハンドラを QueueListener のスレッドへ移す
+
+    logging.config.fileConfig で設定されたハンドラ（コンソール、ローテーションファイル）を
+    QueueListener に渡し、rootロガーには QueueHandler のみを設定する
+    ログ出力の呼び出し元スレッドはキューに積むのみとなり、ファイル書き込みを待たない
+    既に開始済の場合は何もせず、開始済の QueueListener を返す
+
+    Returns:
+        QueueListener: 開始した QueueListener
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        return _queue_listener
+
+    root_logger = logging.getLogger()
+    handlers = root_logger.handlers[:]
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+    queue_handler = QueueHandler(log_queue)
+    root_logger.addHandler(queue_handler)
+
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    # 移したハンドラ（ログファイルの出力先など）を QueueHandler から辿れるようにする
+    queue_handler.listener = _queue_listener
+    _queue_listener.start()
+    atexit.register(stop_queue_logging)
+    return _queue_listener
+
+
+def stop_queue_logging() -> None:
+    """QueueListener を停止し、rootロガーのハンドラを元に戻す
+
+    キューに残っているログは停止前に全て出力される
+    """
+    global _queue_listener
+    if _queue_listener is None:
+        return
+
+    _queue_listener.stop()
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in _queue_listener.handlers:
+        root_logger.addHandler(handler)
+    _queue_listener = None
+
+
+if __name__ == "__main__":
+    import sys
+
+    from PySide6.QtWidgets import QApplication
+
+    logging.basicConfig(level=INFO)
+    start_queue_logging()
+
+    app = QApplication()
+    textarea = QPlainTextEdit()
+    log_sink = GuiLogSink(textarea)
+    for i in range(10):
+        log_sink.put(f"log line {i}")
+        logger.info(f"log line {i}")
+    textarea.show()
+    sys.exit(app.exec())
@@ -4,10 +4,16 @@ import qdarktheme
 from PySide6.QtWidgets import QApplication
 
 from nnmm.main_window import MainWindow
+from nnmm.video_info_fetcher.parse_executor import ParseExecutor
 
 if __name__ == "__main__":
     app = QApplication()
     qdarktheme.setup_theme()
     window_main = MainWindow()
     window_main.show()
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    # 次回起動時にすぐ表示できるよう、終了時の表示内容を保存する
+    window_main.save_pane_snapshot()
+    # 解析用のワーカープロセスを終了させてから終了する
+    ParseExecutor.shutdown()
+    sys.exit(exit_code)
@@ -6,27 +6,38 @@ from pathlib import Path
 from typing import Callable
 
 import qdarktheme
-from PySide6.QtCore import QPoint, Qt, Slot, qVersion
-from PySide6.QtGui import QAction, QIcon
+from PySide6.QtCore import QPoint, Qt, QTimer, Slot, qVersion
+from PySide6.QtGui import QAction, QIcon, QPaintEvent
 from PySide6.QtWidgets import QAbstractItemView, QApplication, QComboBox, QDialog, QGridLayout, QGroupBox, QHBoxLayout
-from PySide6.QtWidgets import QLabel, QLineEdit, QListWidget, QListWidgetItem, QMenu, QPushButton, QTableWidget
-from PySide6.QtWidgets import QTabWidget, QTextEdit, QVBoxLayout, QWidget
+from PySide6.QtWidgets import QLabel, QLineEdit, QListWidget, QListWidgetItem, QMenu, QPlainTextEdit, QProgressBar
+from PySide6.QtWidgets import QPushButton, QTableWidget
+from PySide6.QtWidgets import QTabWidget, QVBoxLayout, QWidget
 
 import nnmm.util
+from nnmm.log_sink import GuiLogSink, start_queue_logging
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
 from nnmm.process import base, config, copy_mylist_url, copy_video_url, create_mylist, delete_mylist, move_down
-from nnmm.process import move_up, not_watched, popup, search, show_mylist_info, show_mylist_info_all, timer
+from nnmm.process import move_up, not_watched, pane_snapshot, popup, search, show_mylist_info, show_mylist_info_all
+from nnmm.process import timer, update_history
 from nnmm.process import video_play, video_play_with_focus_back, watched, watched_all_mylist, watched_mylist
-from nnmm.process.update_mylist import every, partial, single
+from nnmm.process.update_mylist import every, partial, single, stop
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
+from nnmm.process.update_mylist.progress_bus import ProgressBus
+from nnmm.process.update_mylist.update_job_manager import UpdateJobManager
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_run_db_controller import UpdateRunDBController
 from nnmm.util import CustomLogger, Result, log_suppress
+from nnmm.video_info_fetcher.parse_executor import ParseExecutor
 
 APP_NAME = "NNMM"
 ICON_PATH = "./image/icon.png"
 
 # ログ設定
 logging.config.fileConfig("./log/logging.ini", disable_existing_loggers=False)
+# コンソール、ファイルへの出力は QueueListener のスレッドで行う
+start_queue_logging()
 log_suppress()
 logging.setLoggerClass(CustomLogger)
 logger = getLogger(__name__)
@@ -43,12 +54,27 @@ class MainWindow(QDialog):
         # 設定値初期化
         self.config = config.ConfigBase.set_config()
 
+        # fetch 結果の解析を行うプロセスプール, 0 なら fetch スレッド内で解析する
+        ParseExecutor.configure(config.ConfigBase.get_parse_process_num())
+
         # DB操作コンポーネント設定
         self.db_fullpath = Path(self.config["db"].get("save_path", ""))
         self.mylist_db = MylistDBController(db_fullpath=str(self.db_fullpath))
         self.mylist_info_db = MylistInfoDBController(db_fullpath=str(self.db_fullpath))
+        self.update_run_db = UpdateRunDBController(db_fullpath=str(self.db_fullpath))
         log_suppress()
 
+        # マイリスト更新ジョブ管理
+        self.update_job_manager = UpdateJobManager()
+
+        # マイリストごとの次回更新確認日時の管理
+        # DBからの読み込みは load_initial_data で行い、以降はマイリストの追加・編集・更新確認のたびに差分更新する
+        # 失敗し続けるマイリストを除外するかどうかはサーキットブレーカーで判定するため、失敗回数の上限は設けない
+        self.mylist_scheduler = MylistScheduler(max_check_failed_count=None)
+
+        # 失敗し続けるマイリストへの fetch を止めるサーキットブレーカー
+        self.circuit_breaker = MylistCircuitBreaker()
+
         # アイコン画像設定
         if Path(ICON_PATH).exists():
             self.setWindowIcon(QIcon(ICON_PATH))
@@ -67,21 +93,75 @@ class MainWindow(QDialog):
         # Windows特有のruntimeError抑止
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-        # マイリスト一覧初期化
-        # DBからマイリスト一覧を取得する
-        self.update_mylist_pane()
-
         # 設定タブの初期入力
         self.init_config()
 
-        # タイマーセットイベントを起動
-        self.time = timer.Timer(ProcessInfo.create("Timer", self)).callback()
+        # 前回終了時の表示内容があれば、DBを問い合わせずにそのまま表示する
+        self.is_pane_snapshot_restored = False
+        self.restore_pane_snapshot()
+
+        # マイリスト一覧の表示（DBとの照合）とタイマーの起動は、ウィンドウの最初の描画の後に行う（paintEvent）
+        self.time = None
+        self.is_initial_data_requested = False
 
         # 画面をアクティブにする
         self.activateWindow()
 
         logger.info("window setup done.")
 
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """最初の描画の後に、イベントループ上で load_initial_data を呼び出す"""
+        super().paintEvent(event)
+        if not self.is_initial_data_requested:
+            self.is_initial_data_requested = True
+            QTimer.singleShot(0, self.load_initial_data)
+
+    def load_initial_data(self) -> Result:
+        """DBからマイリスト一覧などを読み込んで画面に反映し、タイマーを起動する
+
+        Notes:
+            起動時にウィンドウを先に描画させるため、最初の描画の後に paintEvent から呼び出す
+
+        Returns:
+            Result: 成功時success
+        """
+        # 次回更新確認日時とサーキットブレーカーの状態をDBから読み込む
+        schedule_list = self.mylist_db.select_schedule()
+        self.mylist_scheduler.load(schedule_list)
+        self.circuit_breaker.load(schedule_list)
+
+        # マイリスト一覧初期化
+        # DBからマイリスト一覧を取得する
+        # スナップショットを表示していれば、選択中のマイリストとテーブルの表示を保ったままDBの内容で表示し直す
+        if self.is_pane_snapshot_restored:
+            self.callback_helper("表示内容照合", pane_snapshot.ReconcilePaneSnapshot)()
+        else:
+            self.update_mylist_pane()
+
+        # タイマーセットイベントを起動
+        self.time = timer.Timer(ProcessInfo.create("Timer", self)).callback()
+
+        logger.info("initial data loaded.")
+        return Result.success
+
+    def restore_pane_snapshot(self) -> Result:
+        """前回終了時に保存したマイリストペインとテーブルペインの表示内容を復元する
+
+        Returns:
+            Result: 復元した場合success, スナップショットがない場合failed
+        """
+        res = self.callback_helper("表示内容復元", pane_snapshot.RestorePaneSnapshot)()
+        self.is_pane_snapshot_restored = res == Result.success
+        return res
+
+    def save_pane_snapshot(self) -> Result:
+        """次回起動時に表示するため、マイリストペインとテーブルペインの表示内容を保存する
+
+        Returns:
+            Result: 保存した場合success
+        """
+        return self.callback_helper("表示内容保存", pane_snapshot.SavePaneSnapshot)()
+
     def create_layout(self) -> QVBoxLayout:
         """画面のレイアウトを作成する
 
@@ -101,20 +181,35 @@ class MainWindow(QDialog):
         # 設定タブ
         tab2 = self.create_config_tab_layout(WINDOW_WIDTH, WINDOW_HEIGHT)
 
+        # 更新履歴タブ
+        tab3 = self.create_update_history_tab_layout(WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.update_history_tab = tab3
+
         # ログ出力用テキストエリア
-        self.textarea = QTextEdit()
+        # 追記は log_sink がまとめて行い、表示行数は GuiLogSink.MAX_BLOCK_COUNT で打ち切る
+        self.textarea = QPlainTextEdit()
         self.textarea.setMinimumHeight(300)
+        self.log_sink = GuiLogSink(self.textarea, self)
         nnmm.util.window_cache = self
         logger.info("---ここにログが表示されます---")
 
         # タブにウィジェットを追加
         tabs.addTab(tab1, "マイリスト")
         tabs.addTab(tab2, "設定")
+        tabs.addTab(tab3, "更新履歴")
         tabs.addTab(self.textarea, "ログ")
+        # 更新履歴は、更新履歴タブを表示したときにDBから読み込む
+        self.tabs = tabs
+        tabs.currentChanged.connect(self.on_tab_changed)
 
         layout.addWidget(tabs)
         return layout
 
+    @Slot(int)
+    def on_tab_changed(self, index: int) -> None:
+        if self.tabs.widget(index) is self.update_history_tab:
+            self.callback_helper("更新履歴表示", update_history.ShowUpdateHistory)()
+
     def callback_helper(self, name, process_base_class) -> Callable:
         return lambda: process_base_class(ProcessInfo.create(name, self)).callback()
 
@@ -143,9 +238,11 @@ class MainWindow(QDialog):
         partial_update_button: QPushButton = self.component_helper("インターバル更新", partial.Partial)
         partial_update_button.setFocus()
         single_update_button = self.component_helper("更新", single.Single)
+        stop_update_button = self.component_helper("更新中止", stop.Stop)
         update_button.addWidget(all_update_button)
         update_button.addWidget(partial_update_button)
         update_button.addWidget(single_update_button)
+        update_button.addWidget(stop_update_button)
 
         # マイリストペイン（左ペイン内）
         self.list_widget = QListWidget()
@@ -173,10 +270,18 @@ class MainWindow(QDialog):
         mylist_control_button.addWidget(add_mylist_button)
         mylist_control_button.addWidget(del_mylist_button)
         self.oneline_log = QLineEdit()
+        # マイリスト更新処理の進捗表示
+        # ワーカースレッドからの進捗イベントは progress_bus を経由してGUIスレッドで反映する
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setFormat("")
+        self.progress_bus = ProgressBus(self.oneline_log, self.progress_bar, self)
         leftpane.addLayout(update_button)
         leftpane.addWidget(self.list_widget)
         leftpane.addLayout(mylist_control_button)
         leftpane.addWidget(self.oneline_log)
+        leftpane.addWidget(self.progress_bar)
 
         # 右ペイン
         rightpane = QVBoxLayout()
@@ -219,6 +324,7 @@ class MainWindow(QDialog):
             self.process_helper("---", None),
             self.process_helper("全動画表示", show_mylist_info_all.ShowMylistInfoAll),
             self.process_helper("マイリストURLをクリップボードにコピー", copy_mylist_url.CopyMylistUrl),
+            self.process_helper("全件再取得", single.SingleBackfill),
             self.process_helper("---", None),
             self.process_helper("視聴済にする（選択）", watched_mylist.WatchedMylist),
             self.process_helper("視聴済にする（全て）", watched_all_mylist.WatchedAllMylist),
@@ -302,6 +408,11 @@ class MainWindow(QDialog):
         self.cbox.addItems(combo_box_text)
         vbox2.addWidget(label2)
         vbox2.addWidget(self.cbox)
+        label21 = QLabel("更新確認間隔の上限（新着がないマイリストの確認間隔をこの値まで伸ばす）")
+        self.cbox_max_check_interval = QComboBox()
+        self.cbox_max_check_interval.addItems(config.ConfigBase.MAX_CHECK_INTERVAL_CANDIDATES)
+        vbox2.addWidget(label21)
+        vbox2.addWidget(self.cbox_max_check_interval)
 
         c_group3 = QGroupBox("RSS")
         vbox3 = QVBoxLayout(c_group3)
@@ -348,6 +459,32 @@ class MainWindow(QDialog):
 
         return group
 
+    def create_update_history_tab_layout(self, window_w: int, window_h: int) -> QGroupBox:
+        group = QGroupBox("更新履歴")
+        vbox = QVBoxLayout(group)
+
+        def create_table_widget() -> QTableWidget:
+            table_widget = QTableWidget()
+            table_widget.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+            table_widget.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            table_widget.setSortingEnabled(True)
+            table_widget.verticalHeader().hide()
+            table_widget.setMinimumHeight(window_h / 3)
+            return table_widget
+
+        label1 = QLabel("更新の実行履歴（各段階の列は全マイリスト分の所要時間の合計）")
+        self.update_run_table_widget = create_table_widget()
+        label2 = QLabel("マイリストごとの直近の取得時間と、累計の取得・失敗回数")
+        self.mylist_latency_table_widget = create_table_widget()
+        button = self.component_helper("再読込", update_history.ShowUpdateHistory)
+
+        vbox.addWidget(label1)
+        vbox.addWidget(self.update_run_table_widget)
+        vbox.addWidget(label2)
+        vbox.addWidget(self.mylist_latency_table_widget)
+        vbox.addWidget(button, alignment=Qt.AlignmentFlag.AlignRight)
+        return group
+
     def update_mylist_pane(self) -> Result:
         """マイリストペインの初期表示
 
@@ -396,4 +533,7 @@ if __name__ == "__main__":
     qdarktheme.setup_theme()
     window_main = MainWindow()
     window_main.show()
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    window_main.save_pane_snapshot()
+    ParseExecutor.shutdown()
+    sys.exit(exit_code)
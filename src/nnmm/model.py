@@ -1,8 +1,91 @@
-from sqlalchemy import Boolean, Column, Integer, String, create_engine, text
+import re
+from datetime import datetime
+
+import orjson
+from sqlalchemy import Boolean, Column, Float, Integer, String, Text, create_engine, text
 from sqlalchemy.orm import Session, declarative_base
 
 Base = declarative_base()
 
+# 更新確認インターバルの単位と、1単位あたりの分数
+# 月は正確ではない28,29,30,31
+CHECK_INTERVAL_UNIT_MINUTES = {"分": 1, "時間": 60, "日": 60 * 24, "週間": 60 * 24 * 7, "ヶ月": 60 * 24 * 31}
+CHECK_INTERVAL_PATTERN = re.compile(r"^([0-9]+)(分|時間|日|週間|ヶ月)$")
+
+# 適応的インターバルの調整パラメータ
+# 新着がなければインターバルを ADAPTIVE_BACKOFF_FACTOR 倍に伸ばし、新着があれば基準インターバルに戻す
+# 伸ばす場合も、最後に新着があってからの経過時間の 1/ADAPTIVE_ELAPSED_DIVISOR を超えないようにする
+ADAPTIVE_BACKOFF_FACTOR = 2
+ADAPTIVE_ELAPSED_DIVISOR = 4
+
+
+def interval_to_minutes(interval_str: str) -> int | None:
+    """更新確認インターバル文字列を分[min]に変換する
+
+    Args:
+        interval_str (str): インターバルを表す文字列 ["n分","n時間","n日","n週間","nヶ月"]
+
+    Returns:
+        int | None: 成功時 分[min]を表す数値、解釈できない場合None
+    """
+    if not isinstance(interval_str, str):
+        return None
+    if m := CHECK_INTERVAL_PATTERN.match(interval_str):
+        return int(m.group(1)) * CHECK_INTERVAL_UNIT_MINUTES[m.group(2)]
+    return None
+
+
+def calc_next_check_at(checked_at: str, check_interval_minutes: int | None) -> int | None:
+    """更新確認日時とインターバルから次回更新確認日時を求める
+
+    Args:
+        checked_at (str): 更新確認日時 "%Y-%m-%d %H:%M:%S" 形式
+        check_interval_minutes (int | None): 更新確認インターバル[min]
+
+    Returns:
+        int | None: 次回更新確認日時（エポック秒）、求められない場合None
+    """
+    if check_interval_minutes is None:
+        return None
+    try:
+        checked_dt = datetime.strptime(checked_at, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+    return int(checked_dt.timestamp()) + check_interval_minutes * 60
+
+
+def calc_adaptive_interval(
+    current_minutes: int | None,
+    base_minutes: int,
+    max_minutes: int,
+    is_changed: bool,
+    elapsed_minutes: int | None = None,
+) -> int:
+    """更新確認の結果から次に用いる更新確認インターバルを求める
+
+    Notes:
+        新着があった場合は基準インターバルに戻す
+        新着がなかった場合は現在のインターバルを ADAPTIVE_BACKOFF_FACTOR 倍に伸ばす（指数バックオフ）
+        ただし最後に新着があってからの経過時間 elapsed_minutes から見積もった更新頻度を超えて伸ばさない
+        結果は [base_minutes, max_minutes] の範囲に収める, max_minutes が base_minutes より小さい場合は base_minutes
+
+    Args:
+        current_minutes (int | None): 現在のインターバル[min], 未設定ならNone
+        base_minutes (int): 基準インターバル[min], ユーザーが設定した check_interval, 下限となる
+        max_minutes (int): インターバルの上限[min]
+        is_changed (bool): 更新確認で新着があったか
+        elapsed_minutes (int | None): 最後に新着があってから今回の更新確認までの経過時間[min], 不明ならNone
+
+    Returns:
+        int: 次に用いる更新確認インターバル[min]
+    """
+    if is_changed or current_minutes is None:
+        return base_minutes
+    next_minutes = current_minutes * ADAPTIVE_BACKOFF_FACTOR
+    if elapsed_minutes is not None:
+        next_minutes = min(next_minutes, elapsed_minutes // ADAPTIVE_ELAPSED_DIVISOR)
+    return max(base_minutes, min(next_minutes, max_minutes))
+
 
 class MylistInfo(Base):
     """マイリスト情報モデル
@@ -80,11 +163,23 @@ class Mylist(Base):
     [url] TEXT NOT NULL UNIQUE,
     [created_at] TEXT,
     [updated_at] TEXT,
+    [checked_at] TEXT,
+    [check_interval] TEXT,
+    [check_failed_count] INTEGER,
     [is_include_new] BOOLEAN DEFAULT 'True',
+    [check_interval_minutes] INTEGER,
+    [next_check_at] INTEGER,
     PRIMARY KEY([id])
+
+    check_interval_minutes は実際に用いる更新確認インターバル[min]
+    通常は check_interval を分に変換した値で、適応的インターバルが有効な場合は更新確認の結果に応じて伸縮する
+    next_check_at は checked_at と check_interval_minutes から求める次回更新確認日時（エポック秒）
+    インターバル更新の対象を1回のSQLで選択するために保持し、next_check_at にはインデックスを張る
+    DERIVED_COLUMNS に含まれる列は to_dict や csv 入出力には含めない
     """
 
     __tablename__ = "Mylist"
+    DERIVED_COLUMNS = ("check_interval_minutes", "next_check_at")
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     username = Column(String(256), nullable=False)
@@ -98,6 +193,8 @@ class Mylist(Base):
     check_interval = Column(String(256))
     check_failed_count = Column(Integer)
     is_include_new = Column(Boolean, server_default=text("True"))
+    check_interval_minutes = Column(Integer)
+    next_check_at = Column(Integer, index=True)
 
     def __init__(
         self,
@@ -126,6 +223,56 @@ class Mylist(Base):
         self.check_interval = check_interval
         self.check_failed_count = check_failed_count
         self.is_include_new = is_include_new
+        self.reset_check_interval()
+
+    @classmethod
+    def column_keys(cls) -> list[str]:
+        """他の列から求める列を除いた列名のリストを返す"""
+        return [key for key in cls.__table__.c.keys() if key not in cls.DERIVED_COLUMNS]
+
+    def refresh_next_check_at(self) -> None:
+        """checked_at と check_interval_minutes から next_check_at を求め直す
+
+        checked_at を変更した場合は必ず呼び出すこと
+        """
+        self.next_check_at = calc_next_check_at(self.checked_at, self.check_interval_minutes)
+
+    def reset_check_interval(self) -> None:
+        """check_interval_minutes を check_interval から求め直し、next_check_at も求め直す
+
+        適応的インターバルで伸縮した値は破棄される
+        check_interval を変更した場合は必ず呼び出すこと
+        """
+        self.check_interval_minutes = interval_to_minutes(self.check_interval)
+        self.refresh_next_check_at()
+
+    def adapt_check_interval(self, is_changed: bool, max_minutes: int) -> None:
+        """更新確認の結果から check_interval_minutes を伸縮させ、next_check_at も求め直す
+
+        checked_at を今回の更新確認日時に更新してから呼び出すこと
+        最後に新着があってからの経過時間は updated_at から checked_at までとする
+
+        Args:
+            is_changed (bool): 更新確認で新着があったか
+            max_minutes (int): インターバルの上限[min]
+        """
+        base_minutes = interval_to_minutes(self.check_interval)
+        if base_minutes is None:
+            # インターバル文字列が解釈できない場合は更新対象としない
+            self.reset_check_interval()
+            return
+
+        try:
+            updated_dt = datetime.strptime(self.updated_at, "%Y-%m-%d %H:%M:%S")
+            checked_dt = datetime.strptime(self.checked_at, "%Y-%m-%d %H:%M:%S")
+            elapsed_minutes = max(0, int((checked_dt - updated_dt).total_seconds()) // 60)
+        except (TypeError, ValueError):
+            elapsed_minutes = None
+
+        self.check_interval_minutes = calc_adaptive_interval(
+            self.check_interval_minutes, base_minutes, max_minutes, is_changed, elapsed_minutes
+        )
+        self.refresh_next_check_at()
 
     def __repr__(self):
         return "<Mylist(id='{}', username='{}')>".format(self.id, self.username)
@@ -150,6 +297,139 @@ class Mylist(Base):
         }
 
 
+class UpdateRun(Base):
+    """マイリスト更新の実行履歴モデル
+
+    [id] INTEGER NOT NULL UNIQUE,
+    [kind] TEXT NOT NULL,
+    [version] TEXT,
+    [started_at] TEXT NOT NULL,
+    [finished_at] TEXT,
+    [elapsed_sec] FLOAT,
+    [target_num] INTEGER,
+    [success_num] INTEGER,
+    [failed_num] INTEGER,
+    [cancelled_num] INTEGER,
+    [new_video_num] INTEGER,
+    [bytes] INTEGER,
+    [stage_total_ms] TEXT,
+    PRIMARY KEY([id])
+
+    kind は更新の種類（すべて更新、インターバル更新など）、version は更新を行った NNMM のバージョン
+    stage_total_ms は {段階: 全マイリスト分の所要時間の合計[ms]} を JSON 文字列として保持する
+    """
+
+    __tablename__ = "UpdateRun"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(256), nullable=False)
+    version = Column(String(256))
+    started_at = Column(String(256), nullable=False)
+    finished_at = Column(String(256))
+    elapsed_sec = Column(Float)
+    target_num = Column(Integer)
+    success_num = Column(Integer)
+    failed_num = Column(Integer)
+    cancelled_num = Column(Integer)
+    new_video_num = Column(Integer)
+    bytes = Column(Integer)
+    stage_total_ms = Column(Text)
+
+    def __init__(
+        self,
+        kind,
+        version,
+        started_at,
+        finished_at,
+        elapsed_sec,
+        target_num,
+        success_num,
+        failed_num,
+        cancelled_num,
+        new_video_num,
+        bytes,
+        stage_total_ms,
+    ):
+        self.kind = kind
+        self.version = version
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.elapsed_sec = elapsed_sec
+        self.target_num = target_num
+        self.success_num = success_num
+        self.failed_num = failed_num
+        self.cancelled_num = cancelled_num
+        self.new_video_num = new_video_num
+        self.bytes = bytes
+        self.stage_total_ms = orjson.dumps(stage_total_ms).decode()
+
+    def __repr__(self):
+        return "<UpdateRun(id='{}', started_at='{}')>".format(self.id, self.started_at)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "version": self.version,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_sec": self.elapsed_sec,
+            "target_num": self.target_num,
+            "success_num": self.success_num,
+            "failed_num": self.failed_num,
+            "cancelled_num": self.cancelled_num,
+            "new_video_num": self.new_video_num,
+            "bytes": self.bytes,
+            "stage_total_ms": orjson.loads(self.stage_total_ms or "{}"),
+        }
+
+
+class MylistFetchLatency(Base):
+    """マイリストごとの直近の fetch 所要時間と、fetch の累計回数のモデル
+
+    [mylist_url] TEXT NOT NULL UNIQUE,
+    [fetched_at] TEXT,
+    [latency_ms] FLOAT,
+    [is_success] BOOLEAN,
+    [fetch_count] INTEGER,
+    [failed_count] INTEGER,
+    PRIMARY KEY([mylist_url])
+
+    fetched_at, latency_ms, is_success は直近の更新時の値で、更新のたびに上書きする
+    fetch_count, failed_count は累計で、Mylist.check_failed_count と異なり成功してもリセットしない
+    """
+
+    __tablename__ = "MylistFetchLatency"
+
+    mylist_url = Column(String(512), primary_key=True)
+    fetched_at = Column(String(256))
+    latency_ms = Column(Float)
+    is_success = Column(Boolean)
+    fetch_count = Column(Integer)
+    failed_count = Column(Integer)
+
+    def __init__(self, mylist_url, fetched_at, latency_ms, is_success, fetch_count, failed_count):
+        self.mylist_url = mylist_url
+        self.fetched_at = fetched_at
+        self.latency_ms = latency_ms
+        self.is_success = is_success
+        self.fetch_count = fetch_count
+        self.failed_count = failed_count
+
+    def __repr__(self):
+        return "<MylistFetchLatency(mylist_url='{}', latency_ms='{}')>".format(self.mylist_url, self.latency_ms)
+
+    def to_dict(self):
+        return {
+            "mylist_url": self.mylist_url,
+            "fetched_at": self.fetched_at,
+            "latency_ms": self.latency_ms,
+            "is_success": self.is_success,
+            "fetch_count": self.fetch_count,
+            "failed_count": self.failed_count,
+        }
+
+
 if __name__ == "__main__":
     engine = create_engine("sqlite:///test_NNMM_DB.db", echo=True)
     Base.metadata.create_all(engine)
@@ -1,16 +1,76 @@
 import re
+import time
+from datetime import datetime
+from logging import INFO, getLogger
 
-from sqlalchemy import asc, or_
+from sqlalchemy import ColumnElement, asc, case, func, inspect, or_, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.exc import NoResultFound
 
 from nnmm.db_controller_base import DBControllerBase
 from nnmm.model import Mylist
 
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
 
 class MylistDBController(DBControllerBase):
     def __init__(self, db_fullpath: str = "NNMM_DB.db"):
         super().__init__(db_fullpath)
+        self.run_schema_task_once("migrate_next_check_at", self.migrate_next_check_at)
+
+    def migrate_next_check_at(self) -> int:
+        """check_interval_minutes, next_check_at 列を持たない旧形式のDBを移行する
+
+        Notes:
+            列がなければ追加し、next_check_at にインデックスを張る
+            check_interval_minutes が未設定のレコードについて、
+            テキスト形式の check_interval（"15分", "1時間" など）と checked_at から値を求めて設定する
+            インターバル文字列が解釈できないレコードは未設定のまま残り、インターバル更新の対象とならない
+            そのようなレコードはエラーログに出力する
+
+        Returns:
+            int: 値を設定したレコード数
+        """
+        column_names = [c["name"] for c in inspect(self.engine).get_columns(Mylist.__tablename__)]
+        with self.engine.begin() as conn:
+            for column_name in Mylist.DERIVED_COLUMNS:
+                if column_name not in column_names:
+                    conn.execute(text(f"ALTER TABLE {Mylist.__tablename__} ADD COLUMN {column_name} INTEGER"))
+            conn.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS ix_{Mylist.__tablename__}_next_check_at "
+                    f"ON {Mylist.__tablename__} (next_check_at)"
+                )
+            )
+
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        session = Session()
+        records = session.query(Mylist).filter(Mylist.check_interval_minutes.is_(None)).all()
+        res = 0
+        for record in records:
+            record.reset_check_interval()
+            if record.check_interval_minutes is not None:
+                res = res + 1
+            else:
+                self._log_unscheduled(record)
+        session.commit()
+        session.close()
+        return res
+
+    @classmethod
+    def _log_unscheduled(cls, record: Mylist) -> None:
+        """インターバル文字列が解釈できず、インターバル更新の対象とならないレコードをエラーログに出力する
+
+        Args:
+            record (Mylist): check_interval_minutes, next_check_at を求め直した後のレコード
+        """
+        if record.check_interval_minutes is not None:
+            return
+        logger.error(
+            f"{record.url} : update interval setting is invalid, not scheduled : "
+            f"{record.showname} : {record.check_interval}."
+        )
 
     def get_showname(self, url: str, username: str, old_showname: str) -> str:
         pattern = "^https://www.nicovideo.jp/user/[0-9]+/video$"
@@ -91,10 +151,12 @@ class MylistDBController(DBControllerBase):
         except NoResultFound:
             # INSERT
             session.add(r)
+            self._log_unscheduled(r)
             res = 0
         else:
             # UPDATE
             # id以外を更新する
+            is_check_interval_changed = p.check_interval != r.check_interval
             p.username = r.username
             p.mylistname = r.mylistname
             p.type = r.type
@@ -106,6 +168,12 @@ class MylistDBController(DBControllerBase):
             p.check_interval = r.check_interval
             p.check_failed_count = r.check_failed_count
             p.is_include_new = r.is_include_new
+            if is_check_interval_changed:
+                # インターバル設定が変更された場合は適応的インターバルで伸縮した値を破棄する
+                p.reset_check_interval()
+            else:
+                p.refresh_next_check_at()
+            self._log_unscheduled(p)
             res = 1
 
         session.commit()
@@ -180,15 +248,27 @@ class MylistDBController(DBControllerBase):
 
         return 0
 
-    def update_checked_at(self, mylist_url: str, checked_at: str) -> int:
+    def update_checked_at(
+        self,
+        mylist_url: str,
+        checked_at: str,
+        is_changed: bool = False,
+        max_check_interval_minutes: int | None = None,
+    ) -> int:
         """Mylistの特定のレコードについて更新確認日時を更新する
 
         Note:
             "update Mylist set checked_at = {} where mylist_url = {}"
+            次回更新確認日時 next_check_at も求め直す
+            max_check_interval_minutes が指定された場合は適応的インターバルとして
+            更新確認の結果に応じて check_interval_minutes を伸縮させる
+            指定されなかった場合は check_interval_minutes を check_interval の値に戻す
 
         Args:
             mylist_url (str): マイリストURL
             checked_at (str): 変更後の更新確認日時："%Y-%m-%d %H:%M:%S" 形式
+            is_changed (bool): 更新確認で新着があったか
+            max_check_interval_minutes (int | None): 適応的インターバルの上限[min], Noneなら用いない
 
         Returns:
             int: 更新確認日時を更新した場合0, その他失敗時-1
@@ -205,6 +285,11 @@ class MylistDBController(DBControllerBase):
 
         # 更新する
         record.checked_at = checked_at
+        if max_check_interval_minutes is not None:
+            record.adapt_check_interval(is_changed, max_check_interval_minutes)
+        else:
+            record.reset_check_interval()
+        self._log_unscheduled(record)
 
         session.commit()
         session.close()
@@ -398,6 +483,131 @@ class MylistDBController(DBControllerBase):
         session.close()
         return res_dict
 
+    def select_due(self, now: datetime | None = None, max_check_failed_count: int | None = 10) -> list[dict]:
+        """次回更新確認日時を過ぎたマイリストをSELECTする
+
+        Note:
+            "select * from Mylist where next_check_at <= {now} and check_failed_count < {max}
+             order by next_check_at asc"
+            next_check_at のインデックスを用いる
+            次回更新確認日時を過ぎているが、更新確認失敗カウントが上限以上のため除外したマイリストは警告ログに出力する
+
+        Args:
+            now (datetime | None): 基準日時, Noneなら現在日時
+            max_check_failed_count (int | None): 更新確認失敗カウントの上限, この値以上のマイリストは対象としない
+                                                 Noneなら更新確認失敗カウントで除外しない
+
+        Returns:
+            list[dict]: SELECTしたレコードの辞書リスト
+        """
+        now_epoch = int(now.timestamp()) if now is not None else int(time.time())
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        session = Session()
+
+        q = session.query(Mylist).filter(Mylist.next_check_at <= now_epoch)
+        if max_check_failed_count is not None:
+            # 更新が停止したor削除されたマイリストとみなして除外する
+            # このマイリストを再び更新対象としたい場合はDBの check_failed_count を手動更新すること
+            excluded = (
+                session
+                .query(Mylist.url, Mylist.showname)
+                .filter(Mylist.next_check_at <= now_epoch, Mylist.check_failed_count >= max_check_failed_count)
+                .order_by(asc(Mylist.next_check_at))
+                .all()
+            )
+            for url, showname in excluded:
+                logger.warning(f"{url} : exceed max_check_failed_count, not selected : {showname}.")
+            q = q.filter(Mylist.check_failed_count < max_check_failed_count)
+        res = q.order_by(asc(Mylist.next_check_at)).all()
+        res_dict = [r.to_dict() for r in res]  # 辞書リストに変換
+
+        session.close()
+        return res_dict
+
+    def select_stats(self, now: datetime | None = None, tripped_check_failed_count: int = 10) -> dict:
+        """Mylistの件数などの統計をSELECTする
+
+        Note:
+            "select count(*), sum(is_include_new), sum(check_failed_count > 0),
+             sum(check_failed_count >= {tripped}), sum(next_check_at <= {now}), min(next_check_at) from Mylist"
+            レコードを読み込まず、1回の集計クエリで求める
+
+        Args:
+            now (datetime | None): 基準日時, Noneなら現在日時
+            tripped_check_failed_count (int): 更新確認失敗カウントがこの値以上ならば tripped_mylist_num に数える
+
+        Returns:
+            dict: 統計, キーは以下の通り
+                  mylist_num: マイリスト数, include_new_num: 未視聴の動画を含むマイリスト数,
+                  failing_mylist_num: 更新確認失敗カウントが1以上のマイリスト数,
+                  tripped_mylist_num: 更新確認失敗カウントが tripped_check_failed_count 以上のマイリスト数,
+                  due_num: 次回更新確認日時を過ぎたマイリスト数,
+                  next_check_at: 最も早い次回更新確認日時（エポック秒）, 予定がなければNone
+        """
+        now_epoch = int(now.timestamp()) if now is not None else int(time.time())
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        session = Session()
+
+        def count_if(condition: ColumnElement[bool]) -> ColumnElement[int]:
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        res = session.query(
+            func.count(Mylist.id),
+            count_if(Mylist.is_include_new.is_(True)),
+            count_if(Mylist.check_failed_count > 0),
+            count_if(Mylist.check_failed_count >= tripped_check_failed_count),
+            count_if(Mylist.next_check_at <= now_epoch),
+            func.min(Mylist.next_check_at),
+        ).one()
+        keys = [
+            "mylist_num",
+            "include_new_num",
+            "failing_mylist_num",
+            "tripped_mylist_num",
+            "due_num",
+            "next_check_at",
+        ]
+        res_dict = dict(zip(keys, res))
+
+        session.close()
+        return res_dict
+
+    def select_schedule(self, url: str | None = None) -> list[dict]:
+        """MylistScheduler に登録するための列をSELECTする
+
+        Note:
+            "select url, checked_at, check_interval, check_failed_count, check_interval_minutes, next_check_at
+             from Mylist [where url = {}]"
+            to_dict に含まれない check_interval_minutes, next_check_at も返す
+
+        Args:
+            url (str | None): 取得対象のマイリストurl, Noneなら全て
+
+        Returns:
+            list[dict]: SELECTしたレコードの辞書リスト
+        """
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        session = Session()
+
+        q = session.query(Mylist)
+        if url is not None:
+            q = q.filter_by(url=url)
+        res = q.order_by(asc(Mylist.id)).all()
+        res_dict = [
+            {
+                "url": r.url,
+                "checked_at": r.checked_at,
+                "check_interval": r.check_interval,
+                "check_failed_count": r.check_failed_count,
+                "check_interval_minutes": r.check_interval_minutes,
+                "next_check_at": r.next_check_at,
+            }
+            for r in res
+        ]
+
+        session.close()
+        return res_dict
+
     def select_from_showname(self, showname: str) -> list[dict]:
         """Mylistからshownameを条件としてSELECTする
 
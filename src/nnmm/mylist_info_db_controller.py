@@ -1,6 +1,6 @@
 import re
 
-from sqlalchemy import and_, asc
+from sqlalchemy import and_, asc, func
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.exc import NoResultFound
 
@@ -442,6 +442,48 @@ class MylistInfoDBController(DBControllerBase):
         session.close()
         return res_dict
 
+    def select_status_from_mylist_url(self, mylist_url: str) -> dict[str, str]:
+        """MylistInfoからmylist_urlを条件として動画IDと視聴状況のみをSELECTする
+
+        Note:
+            "select video_id, status from MylistInfo where mylist_url = {}".format(mylist_url)
+            マイリスト更新時の差分確認用
+            ORMインスタンスを作成せず、必要な2列のみを取得する
+
+        Args:
+            mylist_url (str): 取得対象の所属マイリストURL
+
+        Returns:
+            dict[str, str]: {動画ID: 視聴状況} の辞書
+        """
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        session = Session()
+
+        res = session.query(MylistInfo.video_id, MylistInfo.status).filter_by(mylist_url=mylist_url).all()
+        res_dict = {video_id: status for video_id, status in res}
+
+        session.close()
+        return res_dict
+
+    def select_status_count(self) -> dict[str, int]:
+        """MylistInfoの視聴状況ごとのレコード数をSELECTする
+
+        Note:
+            "select status, count(*) from MylistInfo group by status"
+            統計表示用, レコードを読み込まずに集計する
+
+        Returns:
+            dict[str, int]: {視聴状況: レコード数} の辞書, レコードが無い視聴状況は含まない
+        """
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        session = Session()
+
+        res = session.query(MylistInfo.status, func.count(MylistInfo.id)).group_by(MylistInfo.status).all()
+        res_dict = {status: count for status, count in res}
+
+        session.close()
+        return res_dict
+
     def select_from_username(self, username: str) -> list[dict]:
         """MylistInfoからusernameを条件としてSELECTする
 
@@ -9,6 +9,7 @@ from PySide6.QtWidgets import QTableWidgetItem, QWidget
 
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
 from nnmm.process.value_objects.mylist_row import MylistRow, SelectedMylistRow
 from nnmm.process.value_objects.mylist_row_index import SelectedMylistRowIndex
 from nnmm.process.value_objects.mylist_row_list import MylistRowList
@@ -283,11 +284,22 @@ class ProcessBase(ABC):
                 m["showname"] = mylist_row.with_new_mark_name()
                 include_new_index_list.append(i)
         list_data = [m["showname"] for m in m_list]
+        self.set_all_mylist_row(list_data, include_new_index_list, index)
+        return Result.success
+
+    def set_all_mylist_row(self, showname_list: list[str], include_new_index_list: list[int], index: int) -> None:
+        """list_widget にマイリストの表示名を設定する
 
+        Args:
+            showname_list (list[str]): マイリストの表示名, 新着マイリストは新着マーク付き
+            include_new_index_list (list[int]): 新着マイリストのインデックス
+            index (int): 選択してスクロールするマイリストのインデックス
+        """
+        include_new_index_set = set(include_new_index_list)
         list_widget: QListWidget = self.window.list_widget
         list_widget.clear()
-        for i, data in enumerate(list_data):
-            if i not in include_new_index_list:
+        for i, data in enumerate(showname_list):
+            if i not in include_new_index_set:
                 list_widget.addItem(data)
             else:
                 # 新着マイリストの背景色とテキスト色を変更する
@@ -297,7 +309,6 @@ class ProcessBase(ABC):
 
         # indexをセットしてスクロール
         list_widget.setCurrentRow(index)
-        return Result.success
 
     def update_table_pane(self, mylist_url: str = "") -> Result:
         """テーブルリストペインの表示を更新する
@@ -363,6 +374,29 @@ class ProcessBase(ABC):
 
         return Result.success
 
+    def reschedule_mylist(self, mylist_url: str) -> Result:
+        """マイリストの次回更新確認日時をスケジューラに反映する
+
+        マイリストの追加、編集、削除時に呼び出す
+        DBにマイリストが存在しなければスケジューラから取り除く
+
+        Args:
+            mylist_url (str): 対象のマイリストURL
+
+        Returns:
+            Result: 反映した場合success, スケジューラが設定されていない場合failed
+        """
+        scheduler: MylistScheduler | None = getattr(self.window, "mylist_scheduler", None)
+        if scheduler is None:
+            return Result.failed
+
+        records = self.mylist_db.select_schedule(mylist_url)
+        if records:
+            scheduler.schedule_from_record(records[0])
+        else:
+            scheduler.remove(mylist_url)
+        return Result.success
+
 
 if __name__ == "__main__":
     import sys
@@ -9,24 +9,27 @@ from PySide6.QtCore import Slot
 from PySide6.QtWidgets import QApplication, QComboBox, QDialog, QFileDialog, QLineEdit, QListWidget, QPushButton
 from PySide6.QtWidgets import QWidget
 
+from nnmm.config_store import ConfigStore
+from nnmm.model import interval_to_minutes
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
 from nnmm.process.base import ProcessBase
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_run_db_controller import UpdateRunDBController
 from nnmm.util import Result, find_values, load_mylist, popup, save_mylist
 
 logger = getLogger(__name__)
 logger.setLevel(INFO)
 
 
-class ConfigBase(ProcessBase):
+class ConfigBase(ProcessBase, ConfigStore):
     """コンフィグ機能のベースクラス
 
     派生クラスと外部から使用されるクラス変数とクラスメソッドを定義する
+    設定ファイルの読み込みは ConfigStore に任せ、読み込んだ設定は ConfigStore と共有する
     このベースクラス自体は抽象メソッドであるcreate_componentとcallbackを実装していないためインスタンスは作成できない
     """
 
-    CONFIG_FILE_PATH = "./config/config.json"
     config = None
 
     def __init__(self, process_info: ProcessInfo) -> None:
@@ -52,30 +55,14 @@ class ConfigBase(ProcessBase):
 
         Notes:
             CONFIG_FILE_PATH をロードしてプラグラム内で用いる変数に適用する
+            読み込んだ設定は ConfigStore にも設定し、更新処理のエンジン部分から参照できるようにする
 
         Returns:
             ConfigParser: クラス変数config
         """
         cls.config = dict()
-        if not Path(cls.CONFIG_FILE_PATH).exists():
-            raise IOError("Config file not found.")
-        cls.config = orjson.loads(Path(cls.CONFIG_FILE_PATH).read_bytes())
-        if not cls.config:
-            raise IOError("Config file is invalid.")
-
-        # 構造チェック
-        match cls.config:
-            case {
-                "general": {
-                    "browser_path": _,
-                    "auto_reload": _,
-                    "rss_save_path": _,
-                },
-                "db": _,
-            }:
-                pass
-            case _:
-                raise IOError("Config file is invalid structure.")
+        cls.config = cls.load_config(cls.CONFIG_FILE_PATH)
+        ConfigStore.config = cls.config
         return cls.config
 
 
@@ -407,6 +394,20 @@ class ConfigLoad(ConfigBase):
         tbox_db_path: QLineEdit = window.tbox_db_path
         tbox_db_path.setText(db_save_path)
 
+        # 適応的インターバルの上限, 項目がない旧形式の設定ファイルでは使用しない
+        cbox_max_check_interval: QComboBox | None = getattr(window, "cbox_max_check_interval", None)
+        if cbox_max_check_interval is not None:
+            max_check_interval = config["general"].get("max_check_interval", "")
+            cbox_max_check_interval.clear()
+            cbox_max_check_interval.addItems(ConfigBase.MAX_CHECK_INTERVAL_CANDIDATES)
+            if max_check_interval not in ConfigBase.MAX_CHECK_INTERVAL_CANDIDATES:
+                if interval_to_minutes(max_check_interval) is not None:
+                    # 候補にない文言でもフォーマットが合っているなら許容する
+                    cbox_max_check_interval.addItem(max_check_interval)
+                else:
+                    max_check_interval = ConfigBase.MAX_CHECK_INTERVAL_CANDIDATES[0]
+            cbox_max_check_interval.setCurrentText(max_check_interval)
+
         logger.info("Config load done.")
         return Result.success
 
@@ -466,6 +467,13 @@ class ConfigSave(ConfigBase):
         tbox_db_path: QLineEdit = window.tbox_db_path
         db_save_path = tbox_db_path.text()
 
+        cbox_max_check_interval: QComboBox | None = getattr(window, "cbox_max_check_interval", None)
+        max_check_interval = None
+        if cbox_max_check_interval is not None:
+            max_check_interval = cbox_max_check_interval.currentText()
+            if interval_to_minutes(max_check_interval) is None:
+                max_check_interval = ConfigBase.MAX_CHECK_INTERVAL_CANDIDATES[0]
+
         # DB
         db_prev: str = prev_config_dict["db"]["save_path"]
         db_new: str = db_save_path
@@ -480,12 +488,24 @@ class ConfigSave(ConfigBase):
 
                 # DB移動
                 try:
+                    # WAL モードでは書き込みが -wal ファイルに残っている場合があるため、
+                    # DBファイル本体に反映させて接続を閉じてから移動する
+                    update_run_db: UpdateRunDBController | None = getattr(self.window, "update_run_db", None)
+                    for db_controller in [
+                        self.process_info.mylist_db,
+                        self.process_info.mylist_info_db,
+                        update_run_db,
+                    ]:
+                        if db_controller is not None:
+                            db_controller.close()
                     shutil.move(sd_prev, sd_new)
 
                     # 以降の処理で新しいパスに移動させたDBを参照するように再設定
                     self.db_fullpath = str(sd_new)
                     self.process_info.mylist_db = MylistDBController(db_fullpath=str(sd_new))
                     self.process_info.mylist_info_db = MylistInfoDBController(db_fullpath=str(sd_new))
+                    if update_run_db is not None:
+                        self.window.update_run_db = UpdateRunDBController(db_fullpath=str(sd_new))
 
                     # 移動成功
                     db_move_success = True
@@ -504,6 +524,8 @@ class ConfigSave(ConfigBase):
             },
             "db": {"save_path": str(db_save_path)},
         }
+        if max_check_interval is not None:
+            new_config_dict["general"]["max_check_interval"] = str(max_check_interval)
 
         Path(ConfigBase.CONFIG_FILE_PATH).write_bytes(orjson.dumps(new_config_dict, option=orjson.OPT_INDENT_2))
         ConfigBase.set_config()
@@ -234,6 +234,9 @@ class CreateMylist(ProcessBase):
             is_include_new,
         )
 
+        # 次回更新確認日時をスケジューラに登録
+        self.reschedule_mylist(non_query_url)
+
         # テキストボックス表示更新
         self.set_upper_textbox(non_query_url)
         self.set_bottom_textbox("マイリスト追加完了")
@@ -78,6 +78,7 @@ class DeleteMylist(ProcessBase):
 
         # マイリストからも削除する
         self.mylist_db.delete_from_mylist_url(mylist_url)
+        self.reschedule_mylist(mylist_url)
 
         # マイリスト画面表示更新
         self.update_mylist_pane()
@@ -0,0 +1,163 @@
+import logging
+from logging import INFO, getLogger
+from pathlib import Path
+
+from PySide6.QtCore import Slot
+from PySide6.QtWidgets import QListWidget, QWidget
+
+from nnmm.process.base import ProcessBase
+from nnmm.process.value_objects.mylist_row import MylistRow
+from nnmm.process.value_objects.pane_snapshot import PaneSnapshot
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.process.value_objects.table_row_list import TableRowList
+from nnmm.util import CustomLogger, Result
+
+logging.setLoggerClass(CustomLogger)
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+def get_snapshot_path(db_fullpath: str | Path | None) -> Path | None:
+    """DBファイルに対応するスナップショットのパスを返す
+
+    Notes:
+        別のDBのスナップショットを表示しないよう、DBファイルと同じ場所に
+        {DBファイル名}_pane_snapshot.json として保存する
+
+    Args:
+        db_fullpath (str | Path | None): DBファイルのパス
+
+    Returns:
+        Path | None: スナップショットのパス, インメモリDBなどファイルでない場合はNone
+    """
+    if db_fullpath is None or str(db_fullpath) in ("", ".", ":memory:"):
+        return None
+    db_path = Path(db_fullpath)
+    return db_path.with_name(f"{db_path.stem}_pane_snapshot.json")
+
+
+class PaneSnapshotBase(ProcessBase):
+    def __init__(self, process_info: ProcessInfo) -> None:
+        super().__init__(process_info)
+
+    def create_component(self) -> QWidget:
+        """起動時・終了時に MainWindow から呼び出される"""
+        return None
+
+    def get_snapshot_path(self) -> Path | None:
+        return get_snapshot_path(getattr(self.window, "db_fullpath", None))
+
+
+class SavePaneSnapshot(PaneSnapshotBase):
+    @Slot()
+    def callback(self) -> Result:
+        """現在のマイリストペインとテーブルペインの表示内容をスナップショットとして保存する
+
+        Notes:
+            終了時に呼び出され、次回起動時に RestorePaneSnapshot で復元する
+
+        Returns:
+            Result: 成功時success, 保存先がない場合や失敗時failed
+        """
+        snapshot_path = self.get_snapshot_path()
+        if snapshot_path is None:
+            return Result.failed
+        try:
+            list_widget: QListWidget = self.window.list_widget
+            showname_list = [list_widget.item(i).text() for i in range(list_widget.count())]
+            include_new_index_list = [
+                i for i, showname in enumerate(showname_list) if showname.startswith(MylistRow.NEW_MARK)
+            ]
+            selected_index = max(0, list_widget.currentRow())
+
+            upper_textbox = self.get_upper_textbox()
+            mylist_url = upper_textbox.to_str() if upper_textbox else ""
+            table_row_list = self.get_all_table_row()
+            row_list = [table_row.to_row() for table_row in table_row_list] if table_row_list else []
+
+            snapshot = PaneSnapshot.create(showname_list, include_new_index_list, selected_index, mylist_url, row_list)
+
+            # 書き込み途中で終了しても壊れたスナップショットを残さないよう、一時ファイルから置き換える
+            temp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+            temp_path.write_bytes(snapshot.to_bytes())
+            temp_path.replace(snapshot_path)
+        except Exception as e:
+            logger.error(f"Pane snapshot save failed: {e}")
+            return Result.failed
+        logger.info(f"Pane snapshot saved ({len(showname_list)} mylists, {len(row_list)} rows).")
+        return Result.success
+
+
+class RestorePaneSnapshot(PaneSnapshotBase):
+    @Slot()
+    def callback(self) -> Result:
+        """保存したスナップショットをマイリストペインとテーブルペインに表示する
+
+        Notes:
+            起動時に DB を問い合わせずに表示するため、ウィンドウの最初の描画の前に呼び出す
+            DB の内容との食い違いは、描画後に ReconcilePaneSnapshot で解消する
+
+        Returns:
+            Result: 表示した場合success, スナップショットがない場合や不正な場合failed
+        """
+        snapshot_path = self.get_snapshot_path()
+        if snapshot_path is None or not snapshot_path.is_file():
+            return Result.failed
+        try:
+            snapshot = PaneSnapshot.from_bytes(snapshot_path.read_bytes())
+        except (OSError, ValueError) as e:
+            logger.info(f"Pane snapshot is ignored: {e}")
+            return Result.failed
+
+        index = snapshot.selected_index if snapshot.selected_index < len(snapshot.showname_list) else 0
+        self.set_all_mylist_row(list(snapshot.showname_list), list(snapshot.include_new_index_list), index)
+        self.set_upper_textbox(snapshot.mylist_url, False)
+        try:
+            table_row_list = TableRowList.create([list(row) for row in snapshot.table_row_list])
+        except (ValueError, TypeError, IndexError):
+            table_row_list = TableRowList.create([])
+        self.set_all_table_row(table_row_list)
+        return Result.success
+
+
+class ReconcilePaneSnapshot(PaneSnapshotBase):
+    @Slot()
+    def callback(self) -> Result:
+        """マイリストペインとテーブルペインを DB の内容で表示し直す
+
+        Notes:
+            スナップショットを表示した場合に、描画後に DB との食い違いを解消するために呼び出す
+            選択中のマイリストは保ち、テーブルペインに表示していたマイリストが DB になければ表示を消す
+
+        Returns:
+            Result: 成功時success
+        """
+        self.update_mylist_pane()
+
+        upper_textbox = self.get_upper_textbox()
+        mylist_url = upper_textbox.to_str() if upper_textbox else ""
+        if mylist_url == "":
+            return Result.success
+        if self.mylist_db.select_from_url(mylist_url):
+            self.update_table_pane(mylist_url)
+        else:
+            self.set_upper_textbox("", False)
+            self.set_all_table_row(TableRowList.create([]))
+        return Result.success
+
+
+if __name__ == "__main__":
+    import sys
+
+    import qdarktheme
+    from PySide6.QtWidgets import QApplication
+
+    from nnmm.main_window import MainWindow
+
+    app = QApplication()
+    qdarktheme.setup_theme()
+    window_main = MainWindow()
+    window_main.show()
+    exit_code = app.exec()
+    window_main.save_pane_snapshot()
+    sys.exit(exit_code)
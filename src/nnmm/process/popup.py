@@ -124,7 +124,7 @@ class PopupMylistWindow(PopupWindowBase):
             return None
 
         r = self.record
-        mylist_cols = Mylist.__table__.c.keys()
+        mylist_cols = Mylist.column_keys()
 
         # マイリスト情報をすべて含んでいない場合はNoneを返して終了
         for c in mylist_cols:
@@ -323,6 +323,9 @@ class PopupMylistWindow(PopupWindowBase):
         )
         logger.info("マイリスト情報更新完了")
 
+        # 更新確認インターバルなどの変更をスケジューラに反映
+        self.reschedule_mylist(url)
+
         self.popup_window.close()
         return Result.success
 
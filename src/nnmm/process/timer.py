@@ -1,4 +1,5 @@
 import re
+import time
 from datetime import datetime, timedelta
 from logging import INFO, getLogger
 
@@ -8,6 +9,8 @@ from PySide6.QtWidgets import QApplication, QWidget
 from nnmm.process.base import ProcessBase
 from nnmm.process.config import ConfigBase
 from nnmm.process.update_mylist import partial
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
+from nnmm.process.update_mylist.update_job_manager import UpdateJobManager
 from nnmm.process.value_objects.process_info import ProcessInfo
 from nnmm.util import Result
 
@@ -16,6 +19,26 @@ logger.setLevel(INFO)
 
 
 class Timer(ProcessBase):
+    """オートリロードのタイマー
+
+    Notes:
+        スケジューラ（MylistScheduler）が設定されていれば、次回更新確認日時が最も早いマイリストの時刻に起動し、
+        期限を過ぎたマイリストを DISPATCH_BATCH_SIZE 件ずつ更新処理に回す
+        オートリロード間隔は待機時間の上限として扱う（スケジューラの変更を拾い直すため）
+        スケジューラが設定されていなければ、オートリロード間隔ごとにインターバル更新を起動する
+
+    Attributes:
+        DISPATCH_BATCH_SIZE (int): 1回の起動で更新処理に回すマイリストの最大数
+        MAX_RUNNING_JOB_NUM (int): 同時に実行する更新ジョブの最大数
+        MIN_WAIT_MSEC (int): 次回起動までの最小待機時間[msec]
+        BUSY_WAIT_MSEC (int): 更新ジョブが上限まで実行中の場合の待機時間[msec]
+    """
+
+    DISPATCH_BATCH_SIZE = 8
+    MAX_RUNNING_JOB_NUM = 2
+    MIN_WAIT_MSEC = 1000
+    BUSY_WAIT_MSEC = 5000
+
     def __init__(self, process_info: ProcessInfo) -> None:
         super().__init__(process_info)
         self.timer: QTimer | None = None
@@ -27,6 +50,48 @@ class Timer(ProcessBase):
             self.timer.stop()
             self.timer = None
 
+    def _is_update_running(self) -> bool:
+        """マイリスト更新処理が実行中かどうか
+
+        UpdateJobManager が設定されていればジョブの状態から判定する
+        設定されていなければ左下のテキストボックスの表示から判定する
+        """
+        job_manager: UpdateJobManager | None = getattr(self.window, "update_job_manager", None)
+        if job_manager is not None:
+            return job_manager.is_running
+        pattern = r"^.*(取得中|更新中).*$"
+        v = self.get_bottom_textbox().to_str()
+        return re.search(pattern, v) is not None
+
+    def _dispatch_due_mylist(self, scheduler: MylistScheduler, max_wait_msec: int) -> int:
+        """次回更新確認日時を過ぎたマイリストを更新処理に回し、次回起動までの待機時間を返す
+
+        Args:
+            scheduler (MylistScheduler): マイリストごとの次回更新確認日時を管理するスケジューラ
+            max_wait_msec (int): 待機時間の上限[msec]
+
+        Returns:
+            int: 次回起動までの待機時間[msec]
+        """
+        job_manager: UpdateJobManager | None = getattr(self.window, "update_job_manager", None)
+        if job_manager is not None and len(job_manager.job_list()) >= self.MAX_RUNNING_JOB_NUM:
+            # 更新ジョブが上限まで実行中なら少し待ってから再度確認する
+            logger.info("Update running now ... wait for running jobs.")
+            return self.BUSY_WAIT_MSEC
+
+        mylist_url_list = scheduler.pop_due(time.time(), self.DISPATCH_BATCH_SIZE)
+        if mylist_url_list:
+            logger.info(f"Auto-reload start, {len(mylist_url_list)} mylist(s) due.")
+            process = partial.Partial(ProcessInfo.create("インターバル更新", self.window))
+            process.target_mylist_url_list = mylist_url_list
+            process.callback()
+
+        next_check_at = scheduler.next_check_at()
+        if next_check_at is None:
+            return max_wait_msec
+        wait_msec = int((next_check_at - time.time()) * 1000)
+        return min(max(wait_msec, self.MIN_WAIT_MSEC), max_wait_msec)
+
     def create_component(self) -> QWidget:
         """タイマー関連はコンポーネントは作成しない"""
         return None
@@ -61,13 +126,16 @@ class Timer(ProcessBase):
             return Result.failed
 
         # 更新処理スキップ判定
-        pattern = r"^.*(取得中|更新中).*$"
-        v = self.get_bottom_textbox().to_str()
+        s_interval = interval * 60 * 1000  # [min] -> [msec]
+        scheduler: MylistScheduler | None = getattr(self.window, "mylist_scheduler", None)
         if self.first_set:
             self.first_set = False
             # 初回起動ならスキップ
             logger.info("Auto-reload first set, skip first auto-reload cycle.")
-        elif re.search(pattern, v):
+        elif scheduler is not None:
+            # 期限を過ぎたマイリストのみ小分けにして更新処理に回す
+            s_interval = self._dispatch_due_mylist(scheduler, s_interval)
+        elif self._is_update_running():
             # 既に更新処理中ならスキップ
             logger.info("Update running now ... skip this auto-reload cycle.")
         else:
@@ -80,14 +148,13 @@ class Timer(ProcessBase):
         self._timer_cancel()
 
         # 次回起動タイマーをセット
-        s_interval = interval * 60 * 1000  # [min] -> [msec]
         self.timer = QTimer(singleShot=True)
         self.timer.timeout.connect(lambda: self.callback())
         self.timer.start(s_interval)
 
         # 次回起動時間の予測をログに出力
         dst_df = "%Y-%m-%d %H:%M:%S"
-        dst = datetime.now() + timedelta(minutes=interval)
+        dst = datetime.now() + timedelta(milliseconds=s_interval)
         logger.info(f"Next auto-reload cycle start at {dst.strftime(dst_df)}.")
         return Result.success
 
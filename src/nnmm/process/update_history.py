@@ -0,0 +1,152 @@
+import logging
+from logging import INFO, getLogger
+
+from PySide6.QtCore import Qt, Slot
+from PySide6.QtWidgets import QPushButton, QTableWidget, QTableWidgetItem, QWidget
+
+from nnmm.process.base import ProcessBase
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_run_db_controller import UpdateRunDBController
+from nnmm.update_trace import SpanStage
+from nnmm.util import CustomLogger, Result
+
+logging.setLoggerClass(CustomLogger)
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class ShowUpdateHistory(ProcessBase):
+    """更新履歴タブに、更新の実行履歴とマイリストごとの fetch の所要時間を表示する
+
+    Notes:
+        各列は数値のまま設定するため、ヘッダーをクリックすると数値として並べ替えられる
+        更新履歴は新しいものから MAX_RUN_ROW_NUM 件まで表示する
+    """
+
+    MAX_RUN_ROW_NUM = 200
+    RUN_COLS = [
+        "開始日時",
+        "種類",
+        "バージョン",
+        "所要時間[秒]",
+        "対象",
+        "成功",
+        "失敗",
+        "中止",
+        "新着動画",
+        "受信[KB]",
+    ] + [f"{stage.value}[ms]" for stage in SpanStage]
+    MYLIST_COLS = [
+        "マイリスト名",
+        "マイリストURL",
+        "最終取得日時",
+        "取得時間[ms]",
+        "結果",
+        "取得回数",
+        "失敗回数",
+        "失敗率[%]",
+    ]
+
+    def __init__(self, process_info: ProcessInfo) -> None:
+        super().__init__(process_info)
+
+    def create_component(self) -> QWidget:
+        button = QPushButton(self.name)
+        button.clicked.connect(lambda: self.callback())
+        return button
+
+    def to_run_row(self, run: dict) -> list:
+        """更新履歴のレコードを更新履歴テーブルの1行に変換する"""
+        stage_total_ms = run.get("stage_total_ms") or {}
+        return [
+            run.get("started_at"),
+            run.get("kind"),
+            run.get("version"),
+            round(run.get("elapsed_sec") or 0.0, 2),
+            run.get("target_num"),
+            run.get("success_num"),
+            run.get("failed_num"),
+            run.get("cancelled_num"),
+            run.get("new_video_num"),
+            round((run.get("bytes") or 0) / 1024, 1),
+        ] + [round(stage_total_ms.get(stage.value, 0.0), 1) for stage in SpanStage]
+
+    def to_mylist_row(self, fetch_latency: dict, showname: str) -> list:
+        """マイリストごとの fetch の所要時間のレコードを、マイリストテーブルの1行に変換する"""
+        latency_ms = fetch_latency.get("latency_ms")
+        fetch_count = fetch_latency.get("fetch_count") or 0
+        failed_count = fetch_latency.get("failed_count") or 0
+        return [
+            showname,
+            fetch_latency.get("mylist_url"),
+            fetch_latency.get("fetched_at"),
+            round(latency_ms, 1) if latency_ms is not None else None,
+            "成功" if fetch_latency.get("is_success") else "失敗",
+            fetch_count,
+            failed_count,
+            round(failed_count / fetch_count * 100, 1) if fetch_count > 0 else 0.0,
+        ]
+
+    def set_table(self, table_widget: QTableWidget, cols_name: list[str], row_list: list[list]) -> None:
+        """table_widget に行を設定する
+
+        値が None のセルは空欄とし、それ以外は表示用の値として設定する
+        設定中は並べ替えを止め、設定後に再開する
+        """
+        table_widget.setSortingEnabled(False)
+        table_widget.clearContents()
+        table_widget.setColumnCount(len(cols_name))
+        table_widget.setHorizontalHeaderLabels(cols_name)
+        table_widget.setRowCount(len(row_list))
+        for i, row in enumerate(row_list):
+            for j, value in enumerate(row):
+                item = QTableWidgetItem()
+                if value is not None:
+                    item.setData(Qt.ItemDataRole.DisplayRole, value)
+                table_widget.setItem(i, j, item)
+        table_widget.setSortingEnabled(True)
+
+    @Slot()
+    def callback(self) -> Result:
+        """更新履歴をDBから読み込んで表示する
+
+        Notes:
+            削除済のマイリストの fetch の所要時間は表示しない
+
+        Returns:
+            Result: 表示した場合success, 表示先や更新履歴のDBがない場合failed
+        """
+        update_run_db: UpdateRunDBController | None = getattr(self.window, "update_run_db", None)
+        run_table_widget: QTableWidget | None = getattr(self.window, "update_run_table_widget", None)
+        mylist_table_widget: QTableWidget | None = getattr(self.window, "mylist_latency_table_widget", None)
+        if update_run_db is None or run_table_widget is None or mylist_table_widget is None:
+            return Result.failed
+
+        run_list = update_run_db.select(self.MAX_RUN_ROW_NUM)
+        self.set_table(run_table_widget, self.RUN_COLS, [self.to_run_row(run) for run in run_list])
+
+        showname_dict = {m["url"]: m["showname"] for m in self.mylist_db.select()}
+        mylist_row_list = [
+            self.to_mylist_row(fetch_latency, showname_dict[fetch_latency["mylist_url"]])
+            for fetch_latency in update_run_db.select_fetch_latency()
+            if fetch_latency["mylist_url"] in showname_dict
+        ]
+        self.set_table(mylist_table_widget, self.MYLIST_COLS, mylist_row_list)
+
+        logger.info(f"Update history shown ({len(run_list)} runs, {len(mylist_row_list)} mylists).")
+        return Result.success
+
+
+if __name__ == "__main__":
+    import sys
+
+    import qdarktheme
+    from PySide6.QtWidgets import QApplication
+
+    from nnmm.main_window import MainWindow
+
+    app = QApplication()
+    qdarktheme.setup_theme()
+    window_main = MainWindow()
+    window_main.show()
+    sys.exit(app.exec())
@@ -6,14 +6,21 @@ from logging import INFO, getLogger
 from PySide6.QtCore import Slot
 from PySide6.QtWidgets import QPushButton, QWidget
 
+from nnmm.config_store import ConfigStore
 from nnmm.process import show_mylist_info_all
 from nnmm.process.base import ProcessBase
-from nnmm.process.update_mylist.database_updater import DatabaseUpdater
-from nnmm.process.update_mylist.fetcher import Fetcher
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
+from nnmm.process.update_mylist.pipeline import UpdatePipeline
+from nnmm.process.update_mylist.update_job_manager import UpdateJobManager, UpdateJobState
 from nnmm.process.update_mylist.value_objects.mylist_dict_list import MylistDictList
 from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList
+from nnmm.process.update_mylist.value_objects.payload import Payload
+from nnmm.process.update_mylist.value_objects.update_run_record import UpdateRunRecord
 from nnmm.process.update_mylist.value_objects.video_dict_list import VideoDictList
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_run_db_controller import UpdateRunDBController
+from nnmm.update_trace import get_log_dir, save_trace_report
 from nnmm.util import Result, is_mylist_include_new_video
 
 logger = getLogger(__name__)
@@ -33,12 +40,26 @@ class Base(ProcessBase):
             done_count (int): 処理対象について現在処理した数
             L_KIND (str): ログ出力用のメッセージベース
             E_DONE (str): 後続処理へのイベントキー
+            is_backfill (bool): 取得済の動画に到達しても打ち切らずに全件取得するかどうか
+            job_manager (UpdateJobManager | None): 実行中の更新ジョブを管理する UpdateJobManager
+            is_cancelled (bool): 直近の更新処理が中止されたかどうか
+            mylist_scheduler (MylistScheduler | None): マイリストごとの次回更新確認日時を管理するスケジューラ
+            circuit_breaker (MylistCircuitBreaker | None): 失敗し続けるマイリストの fetch を止めるサーキットブレーカー
+            is_forced_probe (bool): サーキットブレーカーの待機時間を待たずに回復確認を行うかどうか
+            update_run_db (UpdateRunDBController | None): 更新履歴を記録するDB
         """
         super().__init__(process_info)
 
         self.post_process = ThreadDoneBase
         self.L_KIND = "UpdateMylist Base"
         self.E_DONE = ""
+        self.is_backfill = False
+        self.job_manager: UpdateJobManager | None = getattr(self.window, "update_job_manager", None)
+        self.is_cancelled = False
+        self.mylist_scheduler: MylistScheduler | None = getattr(self.window, "mylist_scheduler", None)
+        self.circuit_breaker: MylistCircuitBreaker | None = getattr(self.window, "circuit_breaker", None)
+        self.is_forced_probe = False
+        self.update_run_db: UpdateRunDBController | None = getattr(self.window, "update_run_db", None)
 
     @abstractmethod
     def get_target_mylist(self) -> list[dict]:
@@ -74,24 +95,43 @@ class Base(ProcessBase):
 
         # 更新対象取得
         m_list = self.get_target_mylist()
+        m_list = self.filter_by_circuit_breaker(m_list)
         if not m_list:
             logger.info("Target Mylist is nothing.")
             return Result.failed
 
         now_mylist_with_video_list = MylistWithVideoList.create(m_list, self.mylist_info_db)
 
-        # マルチスレッドで更新対象のマイリストの情報を取得する
-        # fetched_video_listsにfetch結果を格納して以降で利用する
+        # 実行中の他の更新処理で更新中のマイリストは対象から除く
+        job = None
+        if self.job_manager is not None:
+            mylist_url_list = [m.mylist.url.non_query_url for m in now_mylist_with_video_list]
+            job = self.job_manager.submit(mylist_url_list)
+            if job is None:
+                logger.info("Target Mylist is already updating.")
+                return Result.failed
+            now_mylist_with_video_list = now_mylist_with_video_list.filter_by_url(job.mylist_url_list)
+
+        # マルチスレッドで更新対象のマイリストの情報を取得し、取得できたものから順にDBを更新する
         start = time.time()
-        fetched_video_lists = Fetcher(now_mylist_with_video_list, self.process_info).execute()
+        try:
+            pipeline = UpdatePipeline(now_mylist_with_video_list, self.process_info, self.is_backfill, job=job)
+            result = pipeline.execute()
+            self.is_cancelled = pipeline.job.is_cancelled
+        finally:
+            if job is not None:
+                self.job_manager.complete(job)
+            # 失敗、中止したマイリストも含めて次回更新確認日時を登録し直す
+            if self.mylist_scheduler is not None:
+                self.reschedule_mylist_list([m.mylist.url.non_query_url for m in now_mylist_with_video_list])
         elapsed_time = time.time() - start
-        logger.info(f"{self.L_KIND} getting done elapsed time : {elapsed_time:.2f} [sec]")
-
-        # マルチスレッドで更新対象のマイリストの情報についてDBを更新する
-        start = time.time()
-        result = DatabaseUpdater(fetched_video_lists, self.process_info).execute()
-        elapsed_time = time.time() - start
-        logger.info(f"{self.L_KIND} update done elapsed time : {elapsed_time:.2f} [sec]")
+        logger.info(f"{self.L_KIND} getting and update done elapsed time : {elapsed_time:.2f} [sec]")
+        # 各段階の所要時間の集計をログファイルと同じ場所に書き出す
+        save_trace_report(pipeline.trace, get_log_dir(), ConfigStore.is_update_trace_enabled())
+        self.save_update_run(pipeline, result)
+        if self.is_cancelled:
+            cancelled_num = pipeline.job.count(UpdateJobState.cancelled)
+            logger.info(f"{self.L_KIND} update cancelled, {cancelled_num} mylist(s) skipped.")
 
         logger.info(f"{self.L_KIND} update thread done.")
 
@@ -99,6 +139,93 @@ class Base(ProcessBase):
         threading.Thread(target=self.thread_done, daemon=False).start()
         return Result.success
 
+    def save_update_run(self, pipeline: UpdatePipeline, result: list[tuple[Payload, Result]]) -> Result:
+        """更新処理の結果を更新履歴に記録する
+
+        Notes:
+            更新処理中は記録せず、終了後に UpdateRunDBController で1度だけまとめて書き込む
+            記録に失敗しても更新処理には影響させず、エラーログを出力するのみとする
+
+        Args:
+            pipeline (UpdatePipeline): 実行を終えた UpdatePipeline
+            result (list[tuple[Payload, Result]]): UpdatePipeline.execute() の返り値
+
+        Returns:
+            Result: 記録した場合success, 更新履歴のDBが設定されていない場合や失敗時failed
+        """
+        if self.update_run_db is None:
+            return Result.failed
+        try:
+            result_list = [(payload.mylist.url.non_query_url, r) for payload, r in result]
+            record = UpdateRunRecord.create(self.L_KIND, pipeline.trace, pipeline.job, result_list)
+            mylist_fetch_list = [m.to_dict() for m in record.mylist_fetch_record_list]
+            run_id = self.update_run_db.insert(record.to_dict(), mylist_fetch_list)
+        except Exception as e:
+            logger.error(f"{self.L_KIND} update run save failed, {type(e).__name__}: {e}.")
+            return Result.failed
+        if run_id < 0:
+            logger.error(f"{self.L_KIND} update run save failed.")
+            return Result.failed
+        return Result.success
+
+    def filter_by_circuit_breaker(self, m_list: list[dict]) -> list[dict]:
+        """サーキットブレーカーが fetch を許可しないマイリストを更新対象から除く
+
+        Notes:
+            すべて更新、インターバル更新、単一更新のいずれもここで判定する
+            除いたマイリストがスケジューラから取り出したものであれば、次回更新確認日時を登録し直す
+            サーキットブレーカーが設定されていない場合は何もしない
+
+        Args:
+            m_list (list[dict]): 更新対象のマイリストを表す辞書リスト
+
+        Returns:
+            list[dict]: fetch を許可されたマイリストの辞書リスト
+        """
+        if self.circuit_breaker is None or not m_list:
+            return m_list
+
+        now = time.time()
+        allowed_list = []
+        skipped_url_list = []
+        for m in m_list:
+            if self.circuit_breaker.allow(m["url"], now, self.is_forced_probe):
+                allowed_list.append(m)
+            else:
+                skipped_url_list.append(m["url"])
+
+        if skipped_url_list:
+            logger.info(f"{self.L_KIND} {len(skipped_url_list)} mylist(s) skipped, circuit is open.")
+            if self.mylist_scheduler is not None:
+                self.reschedule_mylist_list(skipped_url_list)
+        return allowed_list
+
+    def reschedule_mylist_list(self, mylist_url_list: list[str]) -> Result:
+        """更新確認を行ったマイリストの次回更新確認日時をスケジューラに登録し直す
+
+        Notes:
+            更新確認に失敗したマイリストは checked_at が更新されないため、
+            現在日時からインターバル分後に登録する
+
+        Args:
+            mylist_url_list (list[str]): 更新確認を行ったマイリストURLのリスト
+
+        Returns:
+            Result: 登録し直した場合success, スケジューラが設定されていない場合failed
+        """
+        if self.mylist_scheduler is None:
+            return Result.failed
+
+        now = time.time()
+        mylist_url_set = set(mylist_url_list)
+        m_list = [m for m in self.mylist_db.select_schedule() if m["url"] in mylist_url_set]
+        for m in m_list:
+            self.mylist_scheduler.schedule_from_record(m, not_before=now)
+        # 更新中に削除されたマイリストは取り除く
+        for mylist_url in mylist_url_set - {m["url"] for m in m_list}:
+            self.mylist_scheduler.remove(mylist_url)
+        return Result.success
+
     def thread_done(self) -> Result:
         """後続処理
 
@@ -109,6 +236,8 @@ class Base(ProcessBase):
 
         process_info = ProcessInfo.create("-UPDATE_THREAD_DONE-", self.window)
         pb = self.post_process(process_info)
+        if self.is_cancelled:
+            pb.done_message = "更新中止"
         threading.Thread(target=pb.callback, daemon=False).start()
 
         logger.info(f"{self.L_KIND} update post process start done.")
@@ -121,10 +250,15 @@ class ThreadDoneBase(ProcessBase):
 
         このクラスのインスタンスは直接作成・呼び出しは行わない
         必要ならrunをオーバーライドしてそれぞれの後処理を実装する
+
+        Attributes:
+            L_KIND (str): ログ出力用のメッセージベース
+            done_message (str): 後処理完了時に左下に表示するメッセージ
         """
         super().__init__(process_info)
 
         self.L_KIND = "UpdateMylist Base"
+        self.done_message = "更新完了！"
 
     def create_component(self) -> QWidget:
         "後続処理なのでコンポーネントは作成しない"
@@ -134,7 +268,7 @@ class ThreadDoneBase(ProcessBase):
     def callback(self) -> Result:
         """マイリスト情報を更新後の後処理"""
         # 左下の表示を更新する
-        self.set_bottom_textbox("更新完了！", False)
+        self.set_bottom_textbox(self.done_message, False)
 
         # テーブルの表示を更新する
         mylist_url = self.get_upper_textbox().to_str()
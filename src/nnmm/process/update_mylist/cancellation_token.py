@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from logging import INFO, getLogger
+from typing import Any, Callable, Coroutine
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class CancellationToken:
+    """マイリスト更新処理の中止を伝えるトークン
+
+    Notes:
+        GUIスレッド（中止ボタン）から cancel() され、fetch, DB更新のワーカースレッドから参照される
+        一度中止されたトークンは元に戻らない
+        guard() で包んだコルーチンは、中止された時点で実行中のタスクごとキャンセルされる
+        （通信中の httpx のリクエストもその場で打ち切られる）
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """中止する, 任意のスレッドから呼び出してよい
+
+        登録済のコールバックを全て呼び出す
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = self._callbacks[:]
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except RuntimeError:
+                # 登録元のイベントループが既に閉じられている
+                pass
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """中止時に呼び出すコールバックを登録する
+
+        既に中止されている場合はその場で呼び出す
+
+        Args:
+            callback (Callable[[], None]): 中止時に呼び出すコールバック
+
+        Returns:
+            Callable[[], None]: 登録を解除する関数
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    async def guard(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """コルーチンを中止可能なタスクとして実行する
+
+        Args:
+            coro (Coroutine): 実行するコルーチン
+
+        Returns:
+            Any: コルーチンの返り値
+
+        Raises:
+            asyncio.CancelledError: 実行前、または実行中に中止された場合
+        """
+        loop = asyncio.get_running_loop()
+        task = loop.create_task(coro)
+        unregister = self.register(lambda: loop.call_soon_threadsafe(task.cancel))
+        try:
+            return await task
+        finally:
+            unregister()
+
+
+if __name__ == "__main__":
+    import time
+
+    async def sleep_and_return() -> str:
+        await asyncio.sleep(10)
+        return "done"
+
+    token = CancellationToken()
+    threading.Timer(0.5, token.cancel).start()
+    start = time.time()
+    try:
+        asyncio.run(token.guard(sleep_and_return()))
+    except asyncio.CancelledError:
+        print(f"cancelled after {time.time() - start:.2f} [sec]")
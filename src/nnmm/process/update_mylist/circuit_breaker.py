@@ -0,0 +1,206 @@
+import enum
+import threading
+import time
+from dataclasses import dataclass
+from logging import INFO, getLogger
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class CircuitState(enum.Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+@dataclass
+class _Circuit:
+    """マイリスト1件分の回路の状態, MylistCircuitBreaker の内部でのみ用いる"""
+
+    state: CircuitState
+    failure_count: int
+    is_permanent: bool
+    open_until: float
+
+
+class MylistCircuitBreaker:
+    """更新確認に失敗し続けるマイリストへの fetch を止めるサーキットブレーカー
+
+    Notes:
+        マイリストごとに closed -> open -> half_open -> (closed | open) の順に状態が遷移する
+        closed: 通常通り fetch する, 連続失敗回数が FAILURE_THRESHOLD に達すると open にする
+        open: fetch しない, 連続失敗回数から求めた待機時間が過ぎると half_open にする
+        half_open: 回復確認として1回だけ fetch する, 成功すれば closed, 失敗すれば待機時間を倍にして open に戻す
+        404, 410 など再試行しても回復しない失敗は1回で open にし、より長い待機時間から始める
+        その場合の回復確認は動画情報の取得ではなく、リトライなしの1リクエスト（is_fast_probe）で行う
+        登録のない（一度も失敗していない）マイリストは closed とみなす
+        すべて更新、インターバル更新、単一更新のいずれも allow で判定し、Fetcher が結果を記録する
+        fetch, DB更新のワーカースレッドとGUIスレッドの両方から呼び出される
+
+    Attributes:
+        FAILURE_THRESHOLD (int): closed から open にする連続失敗回数
+        BASE_OPEN_SECONDS (int): 一時的な失敗で open にしたときの最初の待機時間[s]
+        PERMANENT_BASE_OPEN_SECONDS (int): 恒久的な失敗で open にしたときの最初の待機時間[s]
+        MAX_OPEN_SECONDS (int): 待機時間の上限[s]
+    """
+
+    FAILURE_THRESHOLD = 3
+    BASE_OPEN_SECONDS = 15 * 60
+    PERMANENT_BASE_OPEN_SECONDS = 6 * 60 * 60
+    MAX_OPEN_SECONDS = 7 * 24 * 60 * 60
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._circuits: dict[str, _Circuit] = {}
+
+    def __len__(self) -> int:
+        """closed 以外の状態にあるマイリストの数"""
+        with self._lock:
+            return sum(1 for c in self._circuits.values() if c.state != CircuitState.closed)
+
+    @classmethod
+    def calc_open_seconds(cls, failure_count: int, is_permanent: bool) -> int:
+        """連続失敗回数から open にしておく待機時間を求める
+
+        Args:
+            failure_count (int): 連続失敗回数
+            is_permanent (bool): 直近の失敗が恒久的なものか
+
+        Returns:
+            int: 待機時間[s], open にするたびに倍になり MAX_OPEN_SECONDS で頭打ちになる
+        """
+        if is_permanent:
+            base_seconds, exponent = cls.PERMANENT_BASE_OPEN_SECONDS, failure_count - 1
+        else:
+            base_seconds, exponent = cls.BASE_OPEN_SECONDS, failure_count - cls.FAILURE_THRESHOLD
+        # 大きな連続失敗回数でも桁あふれしないよう、上限を超える分の指数は計算しない
+        exponent = min(max(0, exponent), cls.MAX_OPEN_SECONDS.bit_length())
+        return min(cls.MAX_OPEN_SECONDS, base_seconds * 2**exponent)
+
+    def load(self, mylist_list: list[dict]) -> int:
+        """登録内容を全て破棄し、DBの更新確認失敗カウントから作り直す
+
+        Notes:
+            失敗時刻は保存されていないため、連続失敗回数が FAILURE_THRESHOLD 以上のマイリストは
+            起動後の最初の更新で回復確認を行うよう half_open とする
+
+        Args:
+            mylist_list (list[dict]): MylistDBController.select_schedule などで取得したマイリストの辞書リスト
+
+        Returns:
+            int: closed 以外の状態にしたマイリストの数
+        """
+        with self._lock:
+            self._circuits.clear()
+            for mylist in mylist_list:
+                try:
+                    mylist_url = mylist["url"]
+                    failure_count = int(mylist["check_failed_count"])
+                except (KeyError, ValueError, TypeError):
+                    continue
+                if failure_count <= 0:
+                    continue
+                state = CircuitState.half_open if failure_count >= self.FAILURE_THRESHOLD else CircuitState.closed
+                self._circuits[mylist_url] = _Circuit(state, failure_count, False, 0.0)
+        return len(self)
+
+    def state(self, mylist_url: str) -> CircuitState:
+        """マイリストの現在の状態を返す"""
+        with self._lock:
+            circuit = self._circuits.get(mylist_url)
+            return circuit.state if circuit else CircuitState.closed
+
+    def open_until(self, mylist_url: str) -> float | None:
+        """open のマイリストの待機終了日時（エポック秒）を返す, open でなければNone"""
+        with self._lock:
+            circuit = self._circuits.get(mylist_url)
+            if circuit is None or circuit.state != CircuitState.open:
+                return None
+            return circuit.open_until
+
+    def allow(self, mylist_url: str, now: float | None = None, is_forced: bool = False) -> bool:
+        """マイリストを fetch してよいかを返す
+
+        Notes:
+            open で待機時間が過ぎていれば half_open にして回復確認を許可する
+            同じマイリストを同時に更新することは UpdateJobManager が防ぐため、回復確認の重複は考慮しない
+
+        Args:
+            mylist_url (str): マイリストURL
+            now (float | None): 現在日時（エポック秒）, Noneなら time.time()
+            is_forced (bool): 待機時間を待たずに回復確認を許可するか, 単一更新など利用者が明示した場合に用いる
+
+        Returns:
+            bool: fetch してよければTrue
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            circuit = self._circuits.get(mylist_url)
+            if circuit is None or circuit.state != CircuitState.open:
+                return True
+            if not is_forced and now < circuit.open_until:
+                return False
+            circuit.state = CircuitState.half_open
+        logger.info(f"{mylist_url} : circuit half-open, probing.")
+        return True
+
+    def is_fast_probe(self, mylist_url: str) -> bool:
+        """回復確認をリトライなしの1リクエストで行うべきかを返す
+
+        Returns:
+            bool: half_open かつ直近の失敗が恒久的なものならTrue
+        """
+        with self._lock:
+            circuit = self._circuits.get(mylist_url)
+            return circuit is not None and circuit.state == CircuitState.half_open and circuit.is_permanent
+
+    def record_success(self, mylist_url: str) -> None:
+        """fetch に成功したマイリストを closed に戻す"""
+        with self._lock:
+            circuit = self._circuits.pop(mylist_url, None)
+        if circuit is not None and circuit.state != CircuitState.closed:
+            logger.info(f"{mylist_url} : circuit closed, recovered.")
+
+    def record_failure(self, mylist_url: str, is_permanent: bool = False, now: float | None = None) -> CircuitState:
+        """fetch に失敗したマイリストの連続失敗回数を数え、必要なら open にする
+
+        Args:
+            mylist_url (str): マイリストURL
+            is_permanent (bool): 再試行しても回復しない失敗か
+            now (float | None): 現在日時（エポック秒）, Noneなら time.time()
+
+        Returns:
+            CircuitState: 記録後の状態
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            circuit = self._circuits.setdefault(mylist_url, _Circuit(CircuitState.closed, 0, False, 0.0))
+            circuit.failure_count = circuit.failure_count + 1
+            circuit.is_permanent = is_permanent
+            is_open = (
+                circuit.state == CircuitState.half_open
+                or is_permanent
+                or circuit.failure_count >= self.FAILURE_THRESHOLD
+            )
+            if not is_open:
+                return circuit.state
+            open_seconds = self.calc_open_seconds(circuit.failure_count, is_permanent)
+            circuit.state = CircuitState.open
+            circuit.open_until = now + open_seconds
+            failure_count = circuit.failure_count
+        logger.warning(
+            f"{mylist_url} : circuit open for {open_seconds} [sec], "
+            f"{failure_count} consecutive failure(s){', permanent' if is_permanent else ''}."
+        )
+        return CircuitState.open
+
+
+if __name__ == "__main__":
+    breaker = MylistCircuitBreaker()
+    url = "https://www.nicovideo.jp/user/10000001/video"
+    for _ in range(4):
+        print(breaker.record_failure(url), breaker.open_until(url))
+    print(breaker.allow(url), breaker.allow(url, is_forced=True), breaker.state(url))
+    breaker.record_success(url)
+    print(breaker.state(url))
@@ -1,17 +1,18 @@
-from concurrent.futures import ThreadPoolExecutor
 from logging import INFO, getLogger
 
-from PySide6.QtWidgets import QLineEdit
-
+from nnmm.config_store import ConfigStore
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.cancellation_token import CancellationToken
 from nnmm.process.update_mylist.executor_base import ExecutorBase
-from nnmm.process.update_mylist.value_objects.payload_list import PayloadList
+from nnmm.process.update_mylist.value_objects.mylist_diff import MylistDiff
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
 from nnmm.process.update_mylist.value_objects.typed_mylist import TypedMylist
-from nnmm.process.update_mylist.value_objects.typed_video import TypedVideo
 from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList
+from nnmm.process.update_mylist.value_objects.video_batch import VideoBatch
 from nnmm.process.value_objects.process_info import ProcessInfo
 from nnmm.process.value_objects.table_row import Status
+from nnmm.update_trace import SpanStage, UpdateTrace, bind, span
 from nnmm.util import Result, get_now_datetime
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
 
@@ -20,109 +21,144 @@ logger.setLevel(INFO)
 
 
 class DatabaseUpdater(ExecutorBase):
-    """fetch 後の動画情報をDBに反映させる処理をマルチスレッドで起動する
+    """fetch 後の1マイリスト分の動画情報をDBに反映させる
 
-    Attribute:
-        payload_list (PayloadList): fetch 後のペイロードのリスト
+    Notes:
+        スレッドの起動とペイロードの受け渡しは UpdatePipeline が行い、
+        各スレッドから execute_worker が呼ばれる
 
-    Returns:
-        Result: DB更新に成功したら Result.success, 失敗時 Result.failed
+    Attribute:
+        max_check_interval_minutes (int | None): 適応的インターバルの上限[min], Noneなら適応的インターバルを用いない
     """
 
-    payload_list: PayloadList
+    max_check_interval_minutes: int | None
 
-    def __init__(self, payload_list: PayloadList, process_info: ProcessInfo) -> None:
+    def __init__(
+        self,
+        process_info: ProcessInfo,
+        cancel_token: CancellationToken | None = None,
+        trace: UpdateTrace | None = None,
+    ) -> None:
         """初期設定
 
         Args:
-            payload_list (PayloadList): fetch 後のペイロードのリスト
             process_info (ProcessInfo): 画面更新用 process_info
+            cancel_token (CancellationToken | None): 中止を伝えるトークン, 中止後はDB更新を開始しない
+            trace (UpdateTrace | None): 差分確認とDB更新の所要時間を記録する UpdateTrace
         """
-        super().__init__(process_info)
-        if not isinstance(payload_list, PayloadList):
-            raise ValueError("payload_list must be PayloadList.")
-        self.payload_list = payload_list
-
-    def execute(self) -> PayloadList:
-        """DB更新を行う thread を起動する
-
-        Returns:
-            PayloadList: DB更新に用いたペイロードと、DB更新処理結果のResult
-                         この返り値は呼び出し元では使用されない
-        """
-        result_buf = []
-        all_index_num = len(self.payload_list)
-        with ThreadPoolExecutor(max_workers=8, thread_name_prefix="np_thread") as executor:
-            futures = []
-            for payload in self.payload_list:
-                mylist = payload.mylist
-                video_list = payload.video_list
-                fetched_info = payload.fetched_info
-                future = executor.submit(self.execute_worker, mylist, video_list, fetched_info, all_index_num)
-                futures.append((payload, future))
-            result_buf = [(f[0], f[1].result()) for f in futures]
-        return result_buf
+        super().__init__(process_info, cancel_token, trace)
+        self.max_check_interval_minutes = ConfigStore.get_max_check_interval_minutes()
 
     def execute_worker(self, *argv) -> FetchedVideoInfo | Result:
         """具体的なDB更新を担当するワーカー
 
-        TODO:
-            処理を分割したい
+        差分確認は make_diff(), DBへの反映は write_diff() に任せる
 
         Returns:
             FetchedVideoInfo | Result: Result のみ返す
                                        DB更新に成功したら Result.success, 失敗時 Result.failed
         """
         mylist: TypedMylist = argv[0]
-        video_list: TypedVideoList = argv[1]
+        video_status: dict[str, Status] | TypedVideoList = argv[1]  # 更新前の動画情報
         fetched_info: FetchedVideoInfo | Result = argv[2]
         all_index_num: int = argv[3]
 
+        # 中止されていたらDB更新を開始しない
+        # 書き込み途中のマイリストは中止せず最後まで反映させる
+        mylist_url = mylist.url.non_query_url
+        if self.cancel_token.is_cancelled:
+            logger.info(mylist_url + f" : update cancelled ... ({self.done_count}/{all_index_num}).")
+            self.emit_progress(ProgressEvent.updated(mylist_url, False))
+            return Result.failed
+
         # マルチスレッド内では各々のスレッドごとに新しくDBセッションを張る
         mylist_db = MylistDBController(self.mylist_db.dbname)
         mylist_info_db = MylistInfoDBController(self.mylist_info_db.dbname)
 
-        mylist_url = mylist.url.non_query_url
         if fetched_info == Result.failed:
             # 新規マイリスト取得でレンダリングが失敗した場合など
             logger.info(mylist_url + f" : no records ... ({self.done_count}/{all_index_num}).")
             mylist_db.update_check_failed_count(mylist_url)
+            self.emit_progress(ProgressEvent.updated(mylist_url, False))
             return Result.failed
         else:
             # マイリスト更新に成功しているのでカウントをリセット
             mylist_db.reset_check_failed_count(mylist_url)
 
-        # fetched_info から TypedVideoList を作成
-        dst = get_now_datetime()
-        prev_video_list: TypedVideoList = video_list
-        fetched_info_dict_list = fetched_info._make_result_dict()
-        now_video_list = TypedVideoList.create([
-            TypedVideo.create(fetched_info_dict | {"id": fetched_info_dict["no"], "created_at": dst})
-            for fetched_info_dict in fetched_info_dict_list
+        # 差分確認とDBへの格納
+        # 新たに追加された動画の数は更新履歴に記録するため、DB更新のスパンの付随情報とする
+        with bind(self.trace, mylist_url):
+            with span(SpanStage.diff):
+                prev_status_dict = self.to_status_dict(video_status)
+                diff = self.make_diff(mylist_url, prev_status_dict, fetched_info, get_now_datetime())
+            new_video_num = sum(1 for video_id in diff.video_id_list if video_id not in prev_status_dict)
+            with span(SpanStage.db_write, video_num=len(diff), new_video_num=new_video_num):
+                self.write_diff(mylist_db, mylist_info_db, diff, self.max_check_interval_minutes)
+
+        # プログレス表示
+        with self.lock:
+            self.done_count = self.done_count + 1
+            logger.info(mylist_url + f" : update done ... ({self.done_count}/{all_index_num}).")
+        self.emit_progress(ProgressEvent.updated(mylist_url, True))
+        return Result.success
+
+    @classmethod
+    def to_status_dict(cls, video_status: dict[str, Status] | TypedVideoList) -> dict[str, Status]:
+        """更新前の動画情報を {動画ID: 視聴状況} の辞書で返す"""
+        if isinstance(video_status, dict):
+            return video_status
+        return {v.video_id.id: v.status for v in video_status}
+
+    @classmethod
+    def make_diff(
+        cls,
+        mylist_url: str,
+        video_status: dict[str, Status] | TypedVideoList,
+        fetched_info: FetchedVideoInfo,
+        dst: str,
+    ) -> MylistDiff:
+        """fetch 後の動画情報と更新前の動画情報から、DBに反映すべき更新内容を求める
+
+        Notes:
+            DBへのアクセスは行わないため、別プロセスのワーカーからも呼び出せる（ShardedUpdater）
+
+        Args:
+            mylist_url (str): マイリストURL
+            video_status (dict[str, Status] | TypedVideoList): 更新前の動画情報
+            fetched_info (FetchedVideoInfo): fetch 後の動画情報
+            dst (str): 更新確認日時 "%Y-%m-%d %H:%M:%S" 形式
+
+        Returns:
+            MylistDiff: DBに反映すべき更新内容
+        """
+        # fetched_info から VideoBatch を作成
+        # 取得結果の行は FetchedVideoInfo 側でキャッシュされているものを使う
+        cols = FetchedVideoInfo.RESULT_DICT_COLS
+        now_video_batch = VideoBatch.create([
+            dict(zip(cols, row, strict=True)) | {"id": row[0], "created_at": dst}
+            for row in fetched_info.iter_result_rows()
         ])
 
-        # 更新前の動画idリストの設定
-        prev_videoid_list = [v.video_id.id for v in prev_video_list]
+        # 更新前の {動画id: 状況ステータス} の設定
+        prev_status_dict = cls.to_status_dict(video_status)
 
         # 更新後の動画idリストの設定
-        now_videoid_list = [v.video_id.id for v in now_video_list]
+        now_videoid_list = now_video_batch.video_id_list
 
         # 状況ステータスを調べる
         status_check_list = []
         add_new_video_flag = False
         for n in now_videoid_list:
-            if n in prev_videoid_list:
+            if n in prev_status_dict:
                 # 以前から保持していた動画が取得された場合->ステータスも保持する
-                s = [p.status for p in prev_video_list if p.video_id.id == n]
-                status_check_list.append(s[0])
+                status_check_list.append(prev_status_dict[n])
             else:
                 # 新規に動画が追加された場合->"未視聴"に設定
                 status_check_list.append(Status.not_watched)
                 add_new_video_flag = True
 
         # 状況ステータス設定
-        for index, status in enumerate(status_check_list):
-            now_video_list[index] = now_video_list[index].replace_from_typed_value(status=status)
+        now_video_batch = now_video_batch.replace_status_list(status_check_list)
 
         # THINK::マイリスト作成者名が変わっていた場合に更新する方法
         # usernameが変更されていた場合
@@ -137,29 +173,40 @@ class DatabaseUpdater(ExecutorBase):
         #         mylist_info_db.update_username_in_mylist(mylist_url, now_username)
         #         logger.info(f"Mylist username changed , {prev_username} -> {now_username}")
 
+        return MylistDiff.from_video_batch(mylist_url, now_video_batch, add_new_video_flag, dst)
+
+    @classmethod
+    def write_diff(
+        cls,
+        mylist_db: MylistDBController,
+        mylist_info_db: MylistInfoDBController,
+        diff: MylistDiff,
+        max_check_interval_minutes: int | None = None,
+    ) -> None:
+        """fetch に成功したマイリストの更新内容をDBに反映する
+
+        Args:
+            mylist_db (MylistDBController): マイリスト情報DB
+            mylist_info_db (MylistInfoDBController): 動画情報DB
+            diff (MylistDiff): DBに反映すべき更新内容
+            max_check_interval_minutes (int | None): 適応的インターバルの上限[min], Noneなら用いない
+        """
+        mylist_url = diff.mylist_url
+        dst = diff.checked_at
+
         # DBに格納
-        records = [m.to_dict() for m in now_video_list]
-        mylist_info_db.upsert_from_list(records)
+        mylist_info_db.upsert_from_list(diff.to_dict_list())
 
         # マイリストの更新確認日時更新
         # 新しい動画情報が追加されたかに関わらずchecked_atを更新する
-        mylist_db.update_checked_at(mylist_url, dst)
+        # 適応的インターバルが有効なら、新着の有無に応じて次回更新確認までの間隔も伸縮させる
+        mylist_db.update_checked_at(mylist_url, dst, diff.has_new_video, max_check_interval_minutes)
 
         # マイリストの更新日時更新
         # 新しい動画情報が追加されたときにupdated_atを更新する
-        if add_new_video_flag:
+        if diff.has_new_video:
             mylist_db.update_updated_at(mylist_url, dst)
 
-        # プログレス表示
-        with self.lock:
-            self.done_count = self.done_count + 1
-            p_str = f"更新中({self.done_count}/{all_index_num})"
-            oneline_log: QLineEdit = self.window.oneline_log
-            oneline_log.setText(p_str)
-            oneline_log.update()
-            logger.info(mylist_url + f" : update done ... ({self.done_count}/{all_index_num}).")
-        return Result.success
-
 
 if __name__ == "__main__":
     import sys
@@ -1,38 +1,68 @@
 import threading
 from abc import ABC, abstractmethod
-
-from PySide6.QtWidgets import QDialog
+from typing import TYPE_CHECKING
 
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
-from nnmm.process.update_mylist.value_objects.payload_list import PayloadList
+from nnmm.process.update_mylist.cancellation_token import CancellationToken
+from nnmm.process.update_mylist.progress_sink import ProgressSink
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_trace import UpdateTrace
 from nnmm.util import Result
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
 
+if TYPE_CHECKING:
+    from PySide6.QtWidgets import QDialog
+
+    from nnmm.process.value_objects.headless_host import HeadlessHost
+
 
 class ExecutorBase(ABC):
     process_info: ProcessInfo
-    window: QDialog
+    window: "QDialog | HeadlessHost"
     mylist_db: MylistDBController
     mylist_info_db: MylistInfoDBController
+    progress_bus: ProgressSink | None
+    cancel_token: CancellationToken
+    trace: UpdateTrace | None
     lock: threading.Lock
     done_count: int
 
-    def __init__(self, process_info: ProcessInfo) -> None:
+    def __init__(
+        self,
+        process_info: ProcessInfo,
+        cancel_token: CancellationToken | None = None,
+        trace: UpdateTrace | None = None,
+    ) -> None:
         if not isinstance(process_info, ProcessInfo):
             raise ValueError("process_info must be ProcessInfo.")
+        if cancel_token is not None and not isinstance(cancel_token, CancellationToken):
+            raise ValueError("cancel_token must be CancellationToken.")
+        if trace is not None and not isinstance(trace, UpdateTrace):
+            raise ValueError("trace must be UpdateTrace.")
         self.process_info = process_info
         self.window = process_info.window
         self.mylist_db = process_info.mylist_db
         self.mylist_info_db = process_info.mylist_info_db
+        self.progress_bus = getattr(self.window, "progress_bus", None)
+        # 指定がなければ中止されることのないトークンを用いる
+        self.cancel_token = cancel_token if cancel_token is not None else CancellationToken()
+        # 指定があれば各段階の所要時間をスパンとして記録する
+        self.trace = trace
 
         self.lock = threading.Lock()
         self.done_count = 0
 
-    @abstractmethod
-    def execute(self) -> PayloadList:
-        raise NotImplementedError
+    def emit_progress(self, event: ProgressEvent) -> None:
+        """進捗イベントを発行する
+
+        ワーカーからはウィジェットを直接操作せず、ProgressBus を経由してGUIスレッドで反映させる
+        GUIを伴わない場合は HeadlessHost に設定された ProgressSink に渡す
+        いずれも設定されていない場合は何もしない
+        """
+        if self.progress_bus is not None:
+            self.progress_bus.emit(event)
 
     @abstractmethod
     def execute_worker(self, *argv) -> FetchedVideoInfo | Result:
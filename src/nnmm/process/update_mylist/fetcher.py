@@ -1,87 +1,111 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 from logging import INFO, getLogger
 
-from PySide6.QtWidgets import QLineEdit
-
+from nnmm.process.update_mylist.cancellation_token import CancellationToken
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
 from nnmm.process.update_mylist.executor_base import ExecutorBase
-from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList
-from nnmm.process.update_mylist.value_objects.payload_list import PayloadList
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_trace import UpdateTrace, bind
 from nnmm.util import Result
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
 from nnmm.video_info_fetcher.video_info_fetcher import VideoInfoFetcher
+from nnmm.video_info_fetcher.video_info_fetcher_base import PermanentFetchError
 
 logger = getLogger(__name__)
 logger.setLevel(INFO)
 
 
 class Fetcher(ExecutorBase):
-    """マイリスト更新時に video_info を fetch してくる fetcher をマルチスレッドで起動する
+    """マイリスト更新時に1マイリスト分の video_info を fetch してくる
 
-    Attribute:
-        mylist_with_video_list (MylistWithVideoList): fetch すべきマイリスト情報と現在の動画情報
+    Notes:
+        スレッドの起動とマイリストの割り振りは UpdatePipeline が行い、
+        各スレッドから execute_worker が呼ばれる
 
-    Returns:
-        PayloadList: PayloadList.create() で返される fetch 後の動画情報
+    Attribute:
+        is_backfill (bool): 取得済の動画に到達しても打ち切らずに全件取得するかどうか
+        circuit_breaker (MylistCircuitBreaker | None): fetch の成否を記録するサーキットブレーカー
     """
 
-    mylist_with_video_list: MylistWithVideoList
+    is_backfill: bool
+    circuit_breaker: MylistCircuitBreaker | None
 
-    def __init__(self, mylist_with_video_list: MylistWithVideoList, process_info: ProcessInfo) -> None:
+    def __init__(
+        self,
+        process_info: ProcessInfo,
+        is_backfill: bool = False,
+        cancel_token: CancellationToken | None = None,
+        trace: UpdateTrace | None = None,
+    ) -> None:
         """初期設定
 
         Args:
-            mylist_with_video_list (MylistWithVideoList): fetch すべきマイリスト情報と現在の動画情報
             process_info (ProcessInfo): 画面更新用 process_info
+            is_backfill (bool): 取得済の動画に到達しても打ち切らずに全件取得するかどうか
+            cancel_token (CancellationToken | None): 中止を伝えるトークン, 中止されると通信中の fetch も打ち切る
+            trace (UpdateTrace | None): fetch の各段階の所要時間を記録する UpdateTrace
         """
-        super().__init__(process_info)
-        if not isinstance(mylist_with_video_list, MylistWithVideoList):
-            raise ValueError("mylist_with_video_list must be MylistWithVideoList.")
-        self.mylist_with_video_list = mylist_with_video_list
+        super().__init__(process_info, cancel_token, trace)
+        self.is_backfill = is_backfill
+        self.circuit_breaker = getattr(self.window, "circuit_breaker", None)
 
-    def execute(self) -> PayloadList:
-        """fetch する thread を起動する
+    async def _fetch(
+        self, mylist_url: str, known_video_id_list: list[str], is_fast_probe: bool
+    ) -> FetchedVideoInfo | Result:
+        """1マイリスト分の fetch を行う
 
-        Returns:
-            PayloadList: fetch すべきマイリスト情報と現在の動画情報と、fetch 後の動画情報をまとめたペイロード
+        恒久的な失敗で止めていたマイリストは、先にリトライなしの1リクエストで回復を確認し、
+        回復していれば続けて動画情報を取得する
         """
-        result_buf = []
-        all_index_num = len(self.mylist_with_video_list)
-        with ThreadPoolExecutor(max_workers=8, thread_name_prefix="ap_thread") as executor:
-            futures = []
-            for mylist_with_video in self.mylist_with_video_list:
-                mylist = mylist_with_video.mylist
-                video_list = mylist_with_video.video_list
-                mylist_url = mylist.url.non_query_url
-                future = executor.submit(self.execute_worker, mylist_url, all_index_num)
-                futures.append((mylist_with_video, future))
-            result_buf = [(f[0], f[1].result()) for f in futures]
-        return PayloadList.create(result_buf)
+        if is_fast_probe and not await VideoInfoFetcher.probe(mylist_url):
+            return Result.failed
+        return await VideoInfoFetcher.fetch_videoinfo(mylist_url, known_video_id_list, self.is_backfill)
 
     def execute_worker(self, *argv) -> FetchedVideoInfo | Result:
         """具体的な fetch を担当するワーカー
 
+        Notes:
+            サーキットブレーカーが設定されている場合は fetch の成否を記録する
+            中止された場合は成否を記録しない
+
         Returns:
             FetchedVideoInfo | Result: fetch 後の動画情報, fetch 失敗時は Result.failed
         """
-        mylist_url, all_index_num = argv
+        mylist_url, known_video_id_list, all_index_num = argv
+        breaker = self.circuit_breaker
+        is_fast_probe = breaker is not None and breaker.is_fast_probe(mylist_url)
         result = Result.failed
+        is_cancelled = False
+        is_permanent = False
         try:
-            result = asyncio.run(VideoInfoFetcher.fetch_videoinfo(mylist_url))
+            # asyncio.run() で実行するタスクにも記録先が引き継がれる
+            with bind(self.trace, mylist_url):
+                coro = self._fetch(mylist_url, known_video_id_list, is_fast_probe)
+                result = asyncio.run(self.cancel_token.guard(coro))
+        except asyncio.CancelledError:
+            # 中止された場合、通信中のリクエストはその場で打ち切られる
+            is_cancelled = True
+        except PermanentFetchError:
+            is_permanent = True
         except Exception as e:
             pass
 
+        is_success = isinstance(result, FetchedVideoInfo)
+        if breaker is not None and not is_cancelled:
+            if is_success:
+                breaker.record_success(mylist_url)
+            else:
+                breaker.record_failure(mylist_url, is_permanent)
         with self.lock:
             self.done_count = self.done_count + 1
-            if isinstance(result, FetchedVideoInfo):
-                p_str = f"取得中({self.done_count}/{all_index_num})"
-                oneline_log: QLineEdit = self.window.oneline_log
-                oneline_log.setText(p_str)
-                oneline_log.update()
+            if is_cancelled:
+                logger.info(mylist_url + f" : fetching cancelled. ({self.done_count}/{all_index_num}).")
+            elif is_success:
                 logger.info(mylist_url + f" : getting done ... ({self.done_count}/{all_index_num}).")
             else:
                 logger.info(mylist_url + f" : fetching failed. ({self.done_count}/{all_index_num}).")
+        self.emit_progress(ProgressEvent.fetched(mylist_url, is_success))
         return result
 
 
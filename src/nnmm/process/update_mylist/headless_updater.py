@@ -0,0 +1,261 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from logging import INFO, getLogger
+from pathlib import Path
+
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
+from nnmm.process.update_mylist.pipeline import UpdatePipeline
+from nnmm.process.update_mylist.progress_sink import ProgressSink
+from nnmm.process.update_mylist.sharded_updater import ShardedUpdater
+from nnmm.process.update_mylist.update_job_manager import UpdateJob, UpdateJobState
+from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList
+from nnmm.process.update_mylist.value_objects.update_summary import UpdateSummary
+from nnmm.process.value_objects.headless_host import HeadlessHost
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.process.value_objects.table_row import Status
+from nnmm.update_trace import save_trace_report
+from nnmm.util import Result
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class HeadlessUpdater:
+    """GUIを伴わずにマイリストの更新を行う
+
+    Notes:
+        fetch, 差分確認, DB更新はGUIと同じく UpdatePipeline に任せ、同じDBを更新する
+        メインウィンドウの代わりに HeadlessHost を ProcessInfo.window として渡し、Qt は import しない
+        GUIの更新処理と同様に、サーキットブレーカーで失敗し続けるマイリストの fetch を止める
+        process_num が指定されていれば、fetch と差分確認を ShardedUpdater のワーカープロセスで行う
+        report_dir が指定されていれば、更新のたびに各段階の所要時間の集計を書き出す（UpdatePipeline の場合のみ）
+        cancel() は任意のスレッド（シグナルハンドラなど）から呼び出してよい
+
+    Attributes:
+        mylist_db (MylistDBController): マイリスト情報DB
+        mylist_info_db (MylistInfoDBController): 動画情報DB
+        circuit_breaker (MylistCircuitBreaker): 失敗し続けるマイリストの fetch を止めるサーキットブレーカー
+        host (HeadlessHost): ProcessInfo.window として渡すメインウィンドウの代わり
+        process_info (ProcessInfo): UpdatePipeline に渡す process_info
+        process_num (int | None): ShardedUpdater のワーカープロセス数, Noneなら UpdatePipeline を用いる
+        report_dir (Path | None): 更新処理のレポートの書き出し先, Noneなら書き出さない
+        is_chrome_trace (bool): レポートに加えて Chrome trace 形式のファイルも書き出すかどうか
+    """
+
+    PROCESS_NAME = "-HEADLESS_UPDATE-"
+    # インターバル更新と同じく、1分先までに期限を迎えるマイリストを対象とする
+    DUE_MARGIN = timedelta(minutes=1)
+    DEFAULT_POLL_SECONDS = 60
+
+    mylist_db: MylistDBController
+    mylist_info_db: MylistInfoDBController
+    circuit_breaker: MylistCircuitBreaker
+    host: HeadlessHost
+    process_info: ProcessInfo
+    process_num: int | None
+    report_dir: Path | None
+    is_chrome_trace: bool
+
+    def __init__(
+        self,
+        mylist_db: MylistDBController,
+        mylist_info_db: MylistInfoDBController,
+        progress_sink: ProgressSink | None = None,
+        process_num: int | None = None,
+        report_dir: Path | None = None,
+        is_chrome_trace: bool = False,
+    ) -> None:
+        """初期設定
+
+        Args:
+            mylist_db (MylistDBController): マイリスト情報DB
+            mylist_info_db (MylistInfoDBController): 動画情報DB
+            progress_sink (ProgressSink | None): 進捗イベントの受け取り先, Noneなら進捗は表示しない
+            process_num (int | None): ShardedUpdater のワーカープロセス数, Noneなら UpdatePipeline を用いる
+            report_dir (Path | None): 更新処理のレポートの書き出し先, Noneなら書き出さない
+            is_chrome_trace (bool): レポートに加えて Chrome trace 形式のファイルも書き出すかどうか
+        """
+        if process_num is not None and (not isinstance(process_num, int) or process_num < 1):
+            raise ValueError("process_num must be int and >= 1.")
+        if report_dir is not None and process_num is not None:
+            # ShardedUpdater では fetch を別プロセスで行うため、各段階の所要時間を記録できない
+            raise ValueError("report_dir is not available with process_num.")
+        self.mylist_db = mylist_db
+        self.mylist_info_db = mylist_info_db
+        self.circuit_breaker = MylistCircuitBreaker()
+        self.circuit_breaker.load(mylist_db.select_schedule())
+        self.host = HeadlessHost(mylist_db, mylist_info_db, progress_sink, self.circuit_breaker)
+        self.process_info = ProcessInfo(self.PROCESS_NAME, self.host, mylist_db, mylist_info_db)
+        self.process_num = process_num
+        self.report_dir = None if report_dir is None else Path(report_dir)
+        self.is_chrome_trace = is_chrome_trace
+        self._lock = threading.Lock()
+        self._job: UpdateJob | None = None
+        self._stop_event = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._stop_event.is_set()
+
+    def cancel(self) -> None:
+        """実行中の更新を中止し、以降の更新を行わない
+
+        通信中の fetch は打ち切り、書き込み中のマイリストは最後まで反映させる
+        """
+        self._stop_event.set()
+        with self._lock:
+            if self._job is not None:
+                self._job.cancel()
+
+    def select_all(self) -> list[dict]:
+        """全てのマイリストを返す"""
+        return self.mylist_db.select()
+
+    def select_due(self, now: datetime | None = None) -> list[dict]:
+        """次回更新確認日時を迎えたマイリストを返す
+
+        Notes:
+            更新確認失敗カウントの上限は設けず、失敗し続けるマイリストはサーキットブレーカーで間引く
+
+        Args:
+            now (datetime | None): 基準日時, Noneなら現在日時
+        """
+        now = datetime.now() if now is None else now
+        return self.mylist_db.select_due(now + self.DUE_MARGIN, None)
+
+    def select_url(self, mylist_url_list: list[str]) -> list[dict]:
+        """指定のマイリストURLのマイリストを、指定の順に返す, DBに存在しないURLは除く"""
+        m_list = []
+        for mylist_url in mylist_url_list:
+            records = self.mylist_db.select_from_url(mylist_url)
+            if not records:
+                logger.warning(f"{mylist_url} : mylist is not registered, skipped.")
+                continue
+            m_list.extend(records)
+        return m_list
+
+    def update(self, m_list: list[dict], is_backfill: bool = False, is_forced_probe: bool = False) -> UpdateSummary:
+        """マイリストを更新する
+
+        Args:
+            m_list (list[dict]): 更新対象のマイリストを表す辞書リスト
+            is_backfill (bool): 取得済の動画に到達しても打ち切らずに全件取得するかどうか
+            is_forced_probe (bool): サーキットブレーカーの待機時間を待たずに回復確認を行うかどうか
+
+        Returns:
+            UpdateSummary: 更新結果
+        """
+        start = time.time()
+        target_num = len(m_list)
+        m_list = [m for m in m_list if self.circuit_breaker.allow(m["url"], start, is_forced_probe)]
+        skipped_num = target_num - len(m_list)
+        if skipped_num:
+            logger.info(f"{skipped_num} mylist(s) skipped, circuit is open.")
+        if not m_list or self.is_cancelled:
+            cancelled_num = len(m_list) if self.is_cancelled else 0
+            return UpdateSummary(target_num, skipped_num, cancelled=cancelled_num)
+
+        mylist_with_video_list = MylistWithVideoList.create(m_list, self.mylist_info_db)
+        job = UpdateJob.create([m.mylist.url.non_query_url for m in mylist_with_video_list])
+        with self._lock:
+            self._job = job
+            if self.is_cancelled:
+                job.cancel()
+        try:
+            if self.process_num is None:
+                pipeline = UpdatePipeline(mylist_with_video_list, self.process_info, is_backfill, job=job)
+                result = [(payload.mylist.url.non_query_url, r) for payload, r in pipeline.execute()]
+                if self.report_dir is not None:
+                    save_trace_report(pipeline.trace, self.report_dir, self.is_chrome_trace)
+            else:
+                sharded_updater = ShardedUpdater(
+                    mylist_with_video_list, self.process_info, is_backfill, self.process_num, job=job
+                )
+                result = sharded_updater.execute()
+        finally:
+            with self._lock:
+                self._job = None
+
+        updated_url_list = [mylist_url for mylist_url, r in result if r == Result.success]
+        self.update_include_flag(updated_url_list)
+
+        updated_num = len(updated_url_list)
+        cancelled_num = job.count(UpdateJobState.cancelled)
+        failed_num = len(m_list) - updated_num - cancelled_num
+        elapsed = max(0.0, time.time() - start)
+        return UpdateSummary(target_num, skipped_num, updated_num, failed_num, cancelled_num, elapsed)
+
+    def update_include_flag(self, mylist_url_list: list[str]) -> None:
+        """未視聴の動画を含むマイリストに新着表示を付ける
+
+        GUIでは更新後処理で行う、左のマイリスト一覧の新着表示の判定をDBのみで行う
+        """
+        for mylist_url in mylist_url_list:
+            status_dict = self.mylist_info_db.select_status_from_mylist_url(mylist_url)
+            if Status.not_watched.value in status_dict.values():
+                self.mylist_db.update_include_flag(mylist_url, True)
+
+    def run_daemon(self, poll_seconds: float = DEFAULT_POLL_SECONDS, is_backfill: bool = False) -> int:
+        """中止されるまで、次回更新確認日時を迎えたマイリストを順次更新し続ける
+
+        Notes:
+            マイリストごとの次回更新確認日時は MylistScheduler で管理し、最も早い日時まで待機する
+            他のプロセス（GUIなど）で追加されたマイリストを取り込むため、待機は最長でも poll_seconds とする
+            更新確認に失敗したマイリストは、現在日時からインターバル分後に登録し直す
+
+        Args:
+            poll_seconds (float): 待機時間の上限[sec]
+            is_backfill (bool): 取得済の動画に到達しても打ち切らずに全件取得するかどうか
+
+        Returns:
+            int: 更新処理を行った回数
+        """
+        if poll_seconds <= 0:
+            raise ValueError("poll_seconds must be > 0.")
+        scheduler = MylistScheduler(max_check_failed_count=None)
+        run_count = 0
+        while not self.is_cancelled:
+            # 登録されていないマイリストのみ追加する
+            for m in self.mylist_db.select_schedule():
+                if m["url"] not in scheduler:
+                    scheduler.schedule_from_record(m)
+
+            mylist_url_list = scheduler.pop_due(time.time() + self.DUE_MARGIN.total_seconds())
+            if mylist_url_list:
+                summary = self.update(self.select_url(mylist_url_list), is_backfill)
+                logger.info(f"Headless update done, {summary.to_text()}.")
+                run_count = run_count + 1
+                self._reschedule(scheduler, mylist_url_list)
+
+            next_check_at = scheduler.next_check_at()
+            wait = poll_seconds
+            if next_check_at is not None:
+                wait = min(max(0.0, next_check_at - self.DUE_MARGIN.total_seconds() - time.time()), poll_seconds)
+            self._stop_event.wait(wait)
+        return run_count
+
+    def _reschedule(self, scheduler: MylistScheduler, mylist_url_list: list[str]) -> None:
+        """更新確認を行ったマイリストの次回更新確認日時を登録し直す, DBから削除されたマイリストは登録しない"""
+        now = time.time()
+        mylist_url_set = set(mylist_url_list)
+        for m in self.mylist_db.select_schedule():
+            if m["url"] in mylist_url_set:
+                scheduler.schedule_from_record(m, not_before=now)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from nnmm.config_store import ConfigStore
+    from nnmm.process.update_mylist.progress_sink import ConsoleProgressSink
+
+    config = ConfigStore.get_config()
+    db_fullpath = config["db"].get("save_path", "")
+    updater = HeadlessUpdater(
+        MylistDBController(db_fullpath), MylistInfoDBController(db_fullpath), ConsoleProgressSink(sys.stdout)
+    )
+    print(updater.update(updater.select_due()).to_text())
@@ -0,0 +1,204 @@
+import heapq
+import threading
+import time
+from datetime import datetime
+from logging import INFO, getLogger
+
+from nnmm.model import calc_next_check_at, interval_to_minutes
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class MylistScheduler:
+    """マイリストごとの次回更新確認日時を min-heap で管理するスケジューラ
+
+    Notes:
+        heap の要素は (next_check_at, seq, mylist_url) で、next_check_at はエポック秒
+        マイリストの追加・編集・更新確認のたびに schedule_from_record で差分更新する
+        同じマイリストを再登録した場合、古い要素は heap に残したまま無効とし、取り出し時に読み捨てる
+        更新確認失敗カウントが max_check_failed_count 以上のマイリストは更新が停止したor削除されたとみなし登録しない
+        サーキットブレーカーと併用する場合は max_check_failed_count を None とし、失敗し続けるマイリストも登録して
+        fetch するかどうかの判定はサーキットブレーカーに任せる
+        fetch, DB更新のワーカースレッドとGUIスレッドの両方から呼び出される
+
+    Attributes:
+        MAX_CHECK_FAILED_COUNT (int): 更新対象とする更新確認失敗カウントの上限の既定値
+        max_check_failed_count (int | None): 更新対象とする更新確認失敗カウントの上限, Noneなら上限なし
+    """
+
+    MAX_CHECK_FAILED_COUNT = 10
+
+    def __init__(self, max_check_failed_count: int | None = MAX_CHECK_FAILED_COUNT) -> None:
+        self.max_check_failed_count = max_check_failed_count
+        self._lock = threading.Lock()
+        self._heap: list[tuple[float, int, str]] = []
+        self._entries: dict[str, tuple[float, int]] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, mylist_url: str) -> bool:
+        with self._lock:
+            return mylist_url in self._entries
+
+    @classmethod
+    def calc_next_check_at(
+        cls, mylist: dict, max_check_failed_count: int | None = MAX_CHECK_FAILED_COUNT
+    ) -> float | None:
+        """マイリストの辞書から次回更新確認日時を求める
+
+        Notes:
+            辞書が next_check_at を含む場合（MylistDBController.select_schedule で取得した場合）はその値を用いる
+            適応的インターバルで伸縮した値はこちらにのみ反映されている
+            含まない場合は check_interval と checked_at から求める
+
+        Args:
+            mylist (dict): MylistDBController.select_schedule などで取得したマイリストの辞書
+            max_check_failed_count (int | None): 更新確認失敗カウントの上限, Noneなら上限なし
+
+        Returns:
+            float | None: 次回更新確認日時（エポック秒）,
+                          更新対象としない場合、または解釈できない場合None
+        """
+        try:
+            mylist_url = mylist["url"]
+            check_failed_count = int(mylist["check_failed_count"])
+            interval_str = str(mylist["check_interval"])
+            checked_at = mylist["checked_at"]
+        except (KeyError, ValueError, TypeError):
+            logger.error("MylistScheduler calc_next_check_at failed, mylist record is invalid.")
+            return None
+
+        if max_check_failed_count is not None and check_failed_count >= max_check_failed_count:
+            # このマイリストを再び更新対象としたい場合はDBの check_failed_count を手動更新すること
+            logger.warning(f"{mylist_url} : exceed max_check_failed_count, not scheduled.")
+            return None
+
+        if "next_check_at" in mylist:
+            next_check_at = mylist["next_check_at"]
+        else:
+            # DBの next_check_at 列と同じ計算を用いる
+            next_check_at = calc_next_check_at(checked_at, interval_to_minutes(interval_str))
+        if next_check_at is None:
+            logger.error(f"{mylist_url} : update interval setting is invalid, not scheduled : {interval_str}.")
+            return None
+        return float(next_check_at)
+
+    def schedule(self, mylist_url: str, next_check_at: float) -> None:
+        """マイリストの次回更新確認日時を登録する, 登録済なら置き換える
+
+        Args:
+            mylist_url (str): マイリストURL
+            next_check_at (float): 次回更新確認日時（エポック秒）
+        """
+        with self._lock:
+            self._seq += 1
+            self._entries[mylist_url] = (next_check_at, self._seq)
+            heapq.heappush(self._heap, (next_check_at, self._seq, mylist_url))
+
+    def schedule_from_record(self, mylist: dict, not_before: float | None = None) -> float | None:
+        """マイリストの辞書から次回更新確認日時を求めて登録する
+
+        Notes:
+            更新確認に失敗した場合は checked_at が更新されないため、そのままでは即座に再度対象となってしまう
+            更新確認後の再登録では not_before に現在日時を渡し、
+            求めた日時が過ぎていれば現在日時からインターバル分後に登録する
+
+        Args:
+            mylist (dict): マイリストの辞書
+            not_before (float | None): 次回更新確認日時の下限（エポック秒）, Noneなら下限なし
+
+        Returns:
+            float | None: 登録した次回更新確認日時, 登録しなかった場合None（登録済なら取り除く）
+        """
+        mylist_url = mylist.get("url", "")
+        next_check_at = self.calc_next_check_at(mylist, self.max_check_failed_count)
+        if next_check_at is None:
+            self.remove(mylist_url)
+            return None
+        if not_before is not None and next_check_at <= not_before:
+            interval = mylist.get("check_interval_minutes") or interval_to_minutes(str(mylist["check_interval"]))
+            next_check_at = not_before + interval * 60
+        self.schedule(mylist_url, next_check_at)
+        return next_check_at
+
+    def load(self, mylist_list: list[dict]) -> int:
+        """登録内容を全て破棄し、マイリストの辞書リストから作り直す
+
+        Args:
+            mylist_list (list[dict]): MylistDBController.select_schedule で取得したマイリストの辞書リスト
+
+        Returns:
+            int: 登録したマイリストの数
+        """
+        with self._lock:
+            self._heap.clear()
+            self._entries.clear()
+        for mylist in mylist_list:
+            self.schedule_from_record(mylist)
+        return len(self)
+
+    def remove(self, mylist_url: str) -> None:
+        """マイリストを登録から取り除く, 登録されていなければ何もしない"""
+        with self._lock:
+            self._entries.pop(mylist_url, None)
+
+    def _discard_stale(self) -> None:
+        """heap の先頭にある無効な要素を読み捨てる, ロックを取得した状態で呼び出すこと"""
+        while self._heap:
+            next_check_at, seq, mylist_url = self._heap[0]
+            if self._entries.get(mylist_url) == (next_check_at, seq):
+                return
+            heapq.heappop(self._heap)
+
+    def next_check_at(self) -> float | None:
+        """最も早い次回更新確認日時を返す, 登録がなければNone"""
+        with self._lock:
+            self._discard_stale()
+            if not self._heap:
+                return None
+            return self._heap[0][0]
+
+    def pop_due(self, now: float | None = None, limit: int | None = None) -> list[str]:
+        """次回更新確認日時を過ぎたマイリストを早い順に取り出す
+
+        取り出したマイリストは登録から外れる
+        更新確認後に schedule_from_record で再登録すること
+
+        Args:
+            now (float | None): 現在日時（エポック秒）, Noneなら time.time()
+            limit (int | None): 取り出す最大数, Noneなら全て
+
+        Returns:
+            list[str]: 取り出したマイリストURLのリスト
+        """
+        now = time.time() if now is None else now
+        result = []
+        with self._lock:
+            while limit is None or len(result) < limit:
+                self._discard_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, _, mylist_url = heapq.heappop(self._heap)
+                del self._entries[mylist_url]
+                result.append(mylist_url)
+        return result
+
+
+if __name__ == "__main__":
+    scheduler = MylistScheduler()
+    scheduler.load([
+        {
+            "url": f"https://www.nicovideo.jp/user/1000000{i}/video",
+            "checked_at": "2023-12-22 12:34:56",
+            "check_interval": f"{i * 15}分",
+            "check_failed_count": 0,
+        }
+        for i in range(1, 4)
+    ])
+    print(datetime.fromtimestamp(scheduler.next_check_at()))
+    print(scheduler.pop_due(limit=2))
+    print(len(scheduler))
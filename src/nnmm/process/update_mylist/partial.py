@@ -3,7 +3,6 @@ from logging import INFO, getLogger
 
 from nnmm.process.update_mylist.base import Base, ThreadDoneBase
 from nnmm.process.value_objects.process_info import ProcessInfo
-from nnmm.util import interval_translate
 
 logger = getLogger(__name__)
 logger.setLevel(INFO)
@@ -16,66 +15,48 @@ class Partial(Base):
         Attributes:
             L_KIND (str): ログ出力用のメッセージベース
             E_DONE (str): 後続処理へのイベントキー
+            target_mylist_url_list (list[str] | None): 更新対象のマイリストURLリスト,
+                                                       Noneなら次回更新確認日時を過ぎたマイリストを対象とする
         """
         super().__init__(process_info)
 
         self.post_process = PartialThreadDone
         self.L_KIND = "Partial mylist"
         self.E_DONE = "-PARTIAL_UPDATE_THREAD_DONE-"
+        self.target_mylist_url_list: list[str] | None = None
 
     def get_target_mylist(self) -> list[dict]:
         """更新対象のマイリストを返す
 
         Notes:
             Partialにおいては対象は複数のマイリストとなる
-            前回更新確認時からインターバル分だけ経過している、かつ
-            更新確認失敗カウントが MAX_CHECK_FAILED_COUNT 未満 のマイリストのみ更新対象とする
+            前回更新確認時からインターバル分だけ経過しているマイリストのみ更新対象とする
+            サーキットブレーカーが設定されていない場合は、
+            更新確認失敗カウントが MAX_CHECK_FAILED_COUNT 未満のマイリストに限る
+            target_mylist_url_list が指定されていればそのマイリストを対象とする（タイマーからの小分けの起動）
+            スケジューラが設定されていれば、次回更新確認日時を過ぎたマイリストをスケジューラから取り出す
 
         Returns:
             list[dict]: 更新対象のマイリストのリスト、エラー時空リスト
         """
+        mylist_url_list = self.target_mylist_url_list
+        if mylist_url_list is None and self.mylist_scheduler is not None:
+            mylist_url_list = self.mylist_scheduler.pop_due()
+        if mylist_url_list is not None:
+            mylist_url_set = set(mylist_url_list)
+            return [m for m in self.mylist_db.select() if m["url"] in mylist_url_set]
+
+        # サーキットブレーカーが設定されていれば、失敗し続けるマイリストはそちらで間引き、回復すれば自動で戻す
+        # 設定されていなければ、更新確認失敗カウントが MAX_CHECK_FAILED_COUNT 以上なら更新対象としない
+        # この条件に当てはまるマイリストは更新が停止したor削除されたマイリストとみなし、select_due が警告ログに出力する
+        # インターバル文字列が解釈できないマイリストは next_check_at が未設定のため対象とならない
+        # そのようなマイリストは next_check_at を求めた時点で MylistDBController がエラーログに出力している
         MAX_CHECK_FAILED_COUNT = 10
-        result = []
-        m_list = self.mylist_db.select()
-
-        src_df = "%Y/%m/%d %H:%M"
-        dst_df = "%Y-%m-%d %H:%M:%S"
-        now_dst = datetime.now()
-        try:
-            for m in m_list:
-                checked_dst = datetime.strptime(m["checked_at"], dst_df)
-                interval_str = str(m["check_interval"])
-                check_failed_count = int(m["check_failed_count"])
-
-                dt = interval_translate(interval_str) - 1
-                if dt < -1:
-                    # インターバル文字列解釈エラー
-                    mylist_url = m["url"]
-                    showname = m["showname"]
-                    logger.error(f"{self.L_KIND} get_target_mylist failed, update interval setting is invalid :")
-                    logger.error(f"\t{showname}")
-                    logger.error(f"\t{mylist_url} : {interval_str}")
-                    continue
-
-                # 予測次回チェック日時取得
-                predict_dst = checked_dst + timedelta(minutes=dt)
-                if predict_dst < now_dst:
-                    # 現在日時が予測次回チェック日時を過ぎている場合
-                    if check_failed_count >= MAX_CHECK_FAILED_COUNT:
-                        # 更新確認失敗カウントが MAX_CHECK_FAILED_COUNT 以上なら更新対象としない
-                        # この条件に当てはまるマイリストはPartialにおいては更新が停止したor削除されたマイリストとみなす
-                        # このマイリストを再び更新対象としたい場合はDBの check_failed_count を手動更新すること
-                        mylist_url = m["url"]
-                        showname = m["showname"]
-                        warning_str = "{} get_target_mylist warning, exceed MAX_CHECK_FAILED_COUNT retry for {} : {}."
-                        logger.warning(warning_str.format(self.L_KIND, mylist_url, showname))
-                        continue
-                    result.append(m)
-        except (KeyError, ValueError):
-            # マイリストオブジェクトのキーエラーなど
-            logger.error(f"{self.L_KIND} get_target_mylist failed, KeyError.")
-            return []
-        return result
+        max_check_failed_count = MAX_CHECK_FAILED_COUNT if self.circuit_breaker is None else None
+
+        # タイマーの起動タイミングとのずれを吸収するため、1分先までに期限を迎えるマイリストを対象とする
+        now_dst = datetime.now() + timedelta(minutes=1)
+        return self.mylist_db.select_due(now_dst, max_check_failed_count)
 
 
 class PartialThreadDone(ThreadDoneBase):
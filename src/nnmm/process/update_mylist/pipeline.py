@@ -0,0 +1,230 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from logging import INFO, getLogger
+from typing import TYPE_CHECKING
+
+from nnmm.process.update_mylist.database_updater import DatabaseUpdater
+from nnmm.process.update_mylist.update_job_manager import UpdateJob, UpdateJobState
+from nnmm.process.update_mylist.value_objects.mylist_with_video import MylistWithVideo
+from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList
+from nnmm.process.update_mylist.value_objects.payload import Payload
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_trace import UpdateTrace
+from nnmm.util import Result
+
+if TYPE_CHECKING:
+    from nnmm.process.update_mylist.fetcher import Fetcher
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class UpdatePipeline:
+    """マイリスト更新時の fetch と DB更新を、有界キューでつないで並行に行う
+
+    Notes:
+        全マイリストの fetch を待ってからDB更新を行うと、
+        最初のDB更新が最も遅い fetch を待つことになり、全マイリスト分のペイロードを同時に保持することになる
+        UpdatePipeline では fetch が終わったマイリストから順にキューに積み、DB更新スレッドが随時取り出して処理する
+        キューの大きさは queue_size で制限され、キューが一杯の間は fetch スレッドが待機する（背圧）
+        具体的な fetch, DB更新の処理はそれぞれ Fetcher.execute_worker, DatabaseUpdater.execute_worker に任せる
+        各マイリストの状態は job に記録し、job が中止されたら未着手のマイリストの fetch, DB更新は行わない
+        fetch, DB更新の各段階の所要時間は trace に記録し、呼び出し元でレポートとして書き出す
+
+    Attributes:
+        mylist_with_video_list (MylistWithVideoList): fetch すべきマイリスト情報と現在の動画情報
+        job (UpdateJob): 状態の記録と中止の確認に用いるジョブ
+        fetcher (Fetcher): fetch を担当する Fetcher
+        database_updater (DatabaseUpdater): DB更新を担当する DatabaseUpdater
+        queue_size (int): fetch 後、DB更新待ちのペイロードを保持する数の上限
+        trace (UpdateTrace): 各段階の所要時間を記録する UpdateTrace
+    """
+
+    FETCH_WORKER_NUM = 8
+    UPDATE_WORKER_NUM = 8
+    DEFAULT_QUEUE_SIZE = 8
+
+    mylist_with_video_list: MylistWithVideoList
+    job: UpdateJob
+    fetcher: "Fetcher"
+    database_updater: DatabaseUpdater
+    queue_size: int
+    trace: UpdateTrace
+
+    def __init__(
+        self,
+        mylist_with_video_list: MylistWithVideoList,
+        process_info: ProcessInfo,
+        is_backfill: bool = False,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        job: UpdateJob | None = None,
+    ) -> None:
+        """初期設定
+
+        Args:
+            mylist_with_video_list (MylistWithVideoList): fetch すべきマイリスト情報と現在の動画情報
+            process_info (ProcessInfo): 画面更新用 process_info
+            is_backfill (bool): 取得済の動画に到達しても打ち切らずに全件取得するかどうか
+            queue_size (int): fetch 後、DB更新待ちのペイロードを保持する数の上限
+            job (UpdateJob | None): UpdateJobManager に登録したジョブ, 指定がなければ単独のジョブを作成する
+
+        Raises:
+            ValueError: 引数が不正な場合
+        """
+        if not isinstance(mylist_with_video_list, MylistWithVideoList):
+            raise ValueError("mylist_with_video_list must be MylistWithVideoList.")
+        if not isinstance(queue_size, int) or queue_size < 1:
+            raise ValueError("queue_size must be int and >= 1.")
+        if job is None:
+            job = UpdateJob.create([m.mylist.url.non_query_url for m in mylist_with_video_list])
+        if not isinstance(job, UpdateJob):
+            raise ValueError("job must be UpdateJob.")
+        self.job = job
+        self.trace = UpdateTrace()
+        # 通信・解析用のモジュール（httpx, bs4 など）は起動時には読み込まず、初回の更新時に読み込む
+        from nnmm.process.update_mylist.fetcher import Fetcher
+
+        self.fetcher = Fetcher(process_info, is_backfill, job.cancel_token, self.trace)
+        self.database_updater = DatabaseUpdater(process_info, job.cancel_token, self.trace)
+        self.mylist_with_video_list = mylist_with_video_list
+        self.queue_size = queue_size
+
+    def execute(self) -> list[tuple[Payload, Result]]:
+        """fetch する thread と DB更新を行う thread を起動する
+
+        Returns:
+            list[tuple[Payload, Result]]: DB更新に用いたペイロードと、DB更新処理結果のResult
+                                          DB更新が終わった順に並ぶ
+                                          この返り値は呼び出し元では使用されない
+        """
+        all_index_num = len(self.mylist_with_video_list)
+        self.fetcher.emit_progress(ProgressEvent.started(all_index_num))
+        payload_queue: queue.Queue[Payload | None] = queue.Queue(maxsize=self.queue_size)
+        update_worker_num = max(1, min(self.UPDATE_WORKER_NUM, all_index_num))
+        with ThreadPoolExecutor(max_workers=update_worker_num, thread_name_prefix="np_thread") as update_executor:
+            update_futures = [
+                update_executor.submit(self.update_worker, payload_queue, all_index_num)
+                for _ in range(update_worker_num)
+            ]
+            try:
+                with ThreadPoolExecutor(max_workers=self.FETCH_WORKER_NUM, thread_name_prefix="ap_thread") as executor:
+                    fetch_futures = [
+                        executor.submit(self.fetch_worker, mylist_with_video, payload_queue, all_index_num)
+                        for mylist_with_video in self.mylist_with_video_list
+                    ]
+                for future in fetch_futures:
+                    future.result()
+            finally:
+                # fetch が全て終わったら（失敗時も）DB更新スレッドに終了を伝える
+                for _ in range(update_worker_num):
+                    payload_queue.put(None)
+            result_buf = [r for future in update_futures for r in future.result()]
+        self.trace.finish()
+        self.fetcher.emit_progress(ProgressEvent.finished())
+        return result_buf
+
+    def fetch_worker(
+        self, mylist_with_video: MylistWithVideo, payload_queue: queue.Queue, all_index_num: int
+    ) -> Result:
+        """1マイリスト分の fetch を行い、結果をペイロードとしてキューに積むワーカー
+
+        キューが一杯の場合は空きができるまで待機する
+        ジョブが中止されていた場合、fetch もキューへの追加も行わない
+        fetch 前後の処理（取得済の動画情報の読み込みなど）で例外が発生した場合、
+        そのマイリストはDB更新を行わずに done とする
+
+        Returns:
+            Result: キューに積んだら Result.success, 中止された場合と失敗した場合 Result.failed
+        """
+        mylist_url = mylist_with_video.mylist.url.non_query_url
+        if not self.job.transition(mylist_url, UpdateJobState.fetching):
+            return Result.failed
+
+        # ここで例外を送出すると execute() から呼び出し元まで伝播し、更新処理の後始末が行われないため全て捕捉する
+        try:
+            # 取得済の動画は fetch するマイリストの分のみ、ここで {動画ID: 視聴状況} として読み込む
+            known_video_id_list = list(mylist_with_video.video_status_dict.keys())
+            fetched_info = self.fetcher.execute_worker(mylist_url, known_video_id_list, all_index_num)
+            if self.job.is_cancelled:
+                # fetch 中に中止された場合は、取得結果に関わらずDB更新は行わない
+                self.job.transition(mylist_url, UpdateJobState.cancelled)
+                mylist_with_video.release_video_status_dict()
+                return Result.failed
+
+            payload_queue.put(Payload.create(mylist_with_video, fetched_info))
+        except Exception as e:
+            logger.error(f"UpdatePipeline fetch worker failed, {type(e).__name__}: {e}.")
+            self.fetcher.emit_progress(ProgressEvent.updated(mylist_url, False))
+            mylist_with_video.release_video_status_dict()
+            if self.job.is_cancelled:
+                self.job.transition(mylist_url, UpdateJobState.cancelled)
+            else:
+                self.job.transition(mylist_url, UpdateJobState.done)
+            return Result.failed
+        return Result.success
+
+    def update_worker(self, payload_queue: queue.Queue, all_index_num: int) -> list[tuple[Payload, Result]]:
+        """キューからペイロードを取り出してDB更新を行うワーカー
+
+        終端(None)を受け取るまで繰り返す
+        1マイリスト分のDB更新に失敗しても、残りのペイロードの処理は続ける
+        ジョブが中止されていた場合、取り出したペイロードのDB更新は行わずに破棄する
+
+        Returns:
+            list[tuple[Payload, Result]]: 処理したペイロードと、DB更新処理結果のResult
+        """
+        result_buf = []
+        while (payload := payload_queue.get()) is not None:
+            # ここで例外を送出して終了すると、キューが一杯のまま fetch スレッドが待ち続けるため全て捕捉する
+            mylist_url = ""
+            try:
+                mylist = payload.mylist
+                mylist_url = mylist.url.non_query_url
+                if self.job.is_cancelled:
+                    self.job.transition(mylist_url, UpdateJobState.cancelled)
+                    result_buf.append((payload, Result.failed))
+                    continue
+
+                self.job.transition(mylist_url, UpdateJobState.writing)
+                video_status_dict = payload.video_status_dict
+                fetched_info = payload.fetched_info
+                result = self.database_updater.execute_worker(mylist, video_status_dict, fetched_info, all_index_num)
+                self._finish_writing(mylist_url, result)
+            except Exception as e:
+                logger.error(f"UpdatePipeline update worker failed, {type(e).__name__}: {e}.")
+                self.database_updater.emit_progress(ProgressEvent.updated(mylist_url, False))
+                result = Result.failed
+                if self.job.state(mylist_url) == UpdateJobState.writing:
+                    self._finish_writing(mylist_url, result)
+            finally:
+                # 差分確認が終わったら取得済の動画情報は破棄する
+                payload.mylist_with_video.release_video_status_dict()
+            result_buf.append((payload, result))
+        return result_buf
+
+    def _finish_writing(self, mylist_url: str, result: Result) -> None:
+        """DB更新を終えたマイリストを終端状態に遷移させる
+
+        DB更新の開始直後に中止され、DatabaseUpdater が何もせずに終えた場合は cancelled とする
+        それ以外は DB更新の成否に関わらず done とする
+        """
+        if result == Result.failed and self.job.is_cancelled:
+            self.job.transition(mylist_url, UpdateJobState.cancelled)
+        else:
+            self.job.transition(mylist_url, UpdateJobState.done)
+
+
+if __name__ == "__main__":
+    import sys
+
+    import qdarktheme
+    from PySide6.QtWidgets import QApplication
+
+    from nnmm.main_window import MainWindow
+
+    app = QApplication()
+    qdarktheme.setup_theme()
+    window_main = MainWindow()
+    window_main.show()
+    sys.exit(app.exec())
@@ -0,0 +1,106 @@
+from logging import INFO, getLogger
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal, Slot
+from PySide6.QtWidgets import QLineEdit, QProgressBar
+
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent, ProgressEventKind
+from nnmm.process.update_mylist.value_objects.progress_state import ProgressState
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class ProgressBus(QObject):
+    """マイリスト更新処理の進捗イベントをGUIスレッドへ受け渡すイベントバス
+
+    Notes:
+        fetch, DB更新のワーカー（GUIスレッド以外）は emit() で ProgressEvent を発行するのみで、ウィジェットは操作しない
+        イベントは Qt のシグナル(QueuedConnection)でGUIスレッドへ送られ、ProgressState に集計される
+        ウィジェットへの反映は FRAME_INTERVAL_MS ごとのタイマーでまとめて行い、イベントごとの再描画は行わない
+        更新処理中のみタイマーを動かし、finished イベントを受け取ったら最終状態を反映して止める
+
+    Attributes:
+        oneline_log (QLineEdit): 進捗状況を表示する下部テキストボックス
+        progress_bar (QProgressBar | None): 進捗状況を表示するプログレスバー
+        state (ProgressState): 現在の進捗状況
+    """
+
+    FRAME_INTERVAL_MS = 100
+
+    event_emitted = Signal(object)
+
+    oneline_log: QLineEdit
+    progress_bar: QProgressBar | None
+    state: ProgressState
+
+    def __init__(self, oneline_log: QLineEdit, progress_bar: QProgressBar | None = None, parent=None) -> None:
+        super().__init__(parent)
+        self.oneline_log = oneline_log
+        self.progress_bar = progress_bar
+        self.state = ProgressState()
+        self._is_dirty = False
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.FRAME_INTERVAL_MS)
+        self._timer.timeout.connect(self.flush)
+
+        # 発行元のスレッドに関わらず、GUIスレッド（このインスタンスのスレッド）で受け取る
+        self.event_emitted.connect(self._on_event, Qt.ConnectionType.QueuedConnection)
+
+    def emit(self, event: ProgressEvent) -> None:
+        """進捗イベントを発行する, 任意のスレッドから呼び出してよい
+
+        Args:
+            event (ProgressEvent): 進捗イベント
+        """
+        if not isinstance(event, ProgressEvent):
+            raise ValueError("event must be ProgressEvent.")
+        self.event_emitted.emit(event)
+
+    @Slot(object)
+    def _on_event(self, event: ProgressEvent) -> None:
+        """GUIスレッドで進捗イベントを集計する"""
+        self.state = self.state.apply(event)
+        self._is_dirty = True
+        match event.kind:
+            case ProgressEventKind.started:
+                self._timer.start()
+            case ProgressEventKind.finished:
+                self._timer.stop()
+                self.flush()
+
+    @Slot()
+    def flush(self) -> None:
+        """集計済の進捗状況をウィジェットに反映する"""
+        if not self._is_dirty:
+            return
+        self._is_dirty = False
+
+        state = self.state
+        if state.is_running:
+            # 終了後の下部テキストボックスは後続処理（"更新完了！"）に任せる
+            self.oneline_log.setText(state.to_status_text())
+        if self.progress_bar is not None:
+            self.progress_bar.setMaximum(max(state.total, 1))
+            self.progress_bar.setValue(state.updated)
+            self.progress_bar.setFormat(state.to_detail_text())
+
+
+if __name__ == "__main__":
+    import sys
+
+    from PySide6.QtWidgets import QApplication, QVBoxLayout, QWidget
+
+    app = QApplication()
+    widget = QWidget()
+    layout = QVBoxLayout(widget)
+    oneline_log = QLineEdit()
+    progress_bar = QProgressBar()
+    layout.addWidget(oneline_log)
+    layout.addWidget(progress_bar)
+    progress_bus = ProgressBus(oneline_log, progress_bar)
+    progress_bus.emit(ProgressEvent.started(2))
+    progress_bus.emit(ProgressEvent.fetched("https://www.nicovideo.jp/user/10000001/video", True))
+    progress_bus.emit(ProgressEvent.updated("https://www.nicovideo.jp/user/10000001/video", True))
+    widget.show()
+    sys.exit(app.exec())
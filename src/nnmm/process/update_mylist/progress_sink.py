@@ -0,0 +1,73 @@
+import sys
+import threading
+import time
+from logging import INFO, getLogger
+from typing import Protocol, TextIO
+
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent, ProgressEventKind
+from nnmm.process.update_mylist.value_objects.progress_state import ProgressState
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class ProgressSink(Protocol):
+    """マイリスト更新処理の進捗イベントの受け取り先
+
+    Notes:
+        fetch, DB更新のワーカーは emit() で ProgressEvent を発行するのみで、表示方法は受け取り先に任せる
+        GUIでは ProgressBus、GUIを伴わない nnmm.cli では ConsoleProgressSink を用いる
+        emit() は任意のスレッドから呼び出される
+    """
+
+    def emit(self, event: ProgressEvent) -> None: ...
+
+
+class ConsoleProgressSink:
+    """進捗イベントを集計し、進捗状況をテキストストリームに書き出す
+
+    Notes:
+        ワーカースレッドから呼び出されるため、集計と書き出しはロックを取得して行う
+        書き出しは INTERVAL_SECONDS ごとにまとめて行い、finished イベントを受け取ったら最終状態を書き出す
+
+    Attributes:
+        stream (TextIO): 書き出し先, 既定は標準エラー出力
+        state (ProgressState): 現在の進捗状況
+    """
+
+    INTERVAL_SECONDS = 1.0
+
+    stream: TextIO
+    state: ProgressState
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self.stream = stream if stream is not None else sys.stderr
+        self.state = ProgressState()
+        self._lock = threading.Lock()
+        self._last_written_at = 0.0
+
+    def emit(self, event: ProgressEvent) -> None:
+        """進捗イベントを集計する, 任意のスレッドから呼び出してよい
+
+        Args:
+            event (ProgressEvent): 進捗イベント
+        """
+        if not isinstance(event, ProgressEvent):
+            raise ValueError("event must be ProgressEvent.")
+        with self._lock:
+            self.state = self.state.apply(event)
+            now = time.monotonic()
+            is_finished = event.kind == ProgressEventKind.finished
+            if not is_finished and now - self._last_written_at < self.INTERVAL_SECONDS:
+                return
+            self._last_written_at = now
+            self.stream.write(self.state.to_detail_text() + "\n")
+            self.stream.flush()
+
+
+if __name__ == "__main__":
+    sink = ConsoleProgressSink(sys.stdout)
+    sink.emit(ProgressEvent.started(2))
+    sink.emit(ProgressEvent.fetched("https://www.nicovideo.jp/user/10000001/video", True))
+    sink.emit(ProgressEvent.updated("https://www.nicovideo.jp/user/10000001/video", True))
+    sink.emit(ProgressEvent.finished())
@@ -0,0 +1,327 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from logging import INFO, getLogger
+from typing import Callable, Iterator
+
+from nnmm.config_store import ConfigStore
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.database_updater import DatabaseUpdater
+from nnmm.process.update_mylist.executor_base import ExecutorBase
+from nnmm.process.update_mylist.update_job_manager import UpdateJob, UpdateJobState
+from nnmm.process.update_mylist.value_objects.mylist_diff import MylistDiff
+from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
+from nnmm.process.update_mylist.value_objects.shard_task import ShardTask
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.util import Result, get_now_datetime
+from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
+from nnmm.video_info_fetcher.video_info_fetcher import VideoInfoFetcher
+from nnmm.video_info_fetcher.video_info_fetcher_base import PermanentFetchError
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+# ワーカープロセス内で同時に fetch するマイリスト数
+SHARD_CONCURRENCY = 8
+
+ShardFunc = Callable[[list[ShardTask], bool], list[MylistDiff]]
+
+
+def init_worker(config: dict | None) -> None:
+    """ワーカープロセスの初期化, 親プロセスで読み込んだ設定を引き継ぐ
+
+    Ctrl+C は親プロセスでジョブの中止として扱うため、ワーカープロセスでは無視する
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if config:
+        ConfigStore.config = config
+
+
+async def _fetch_diff(task: ShardTask, is_backfill: bool) -> MylistDiff:
+    """1マイリスト分の fetch と差分確認を行う, Fetcher._fetch と同じく回復確認を先に行う"""
+    mylist_url = task.mylist_url
+    try:
+        if task.is_fast_probe and not await VideoInfoFetcher.probe(mylist_url):
+            return MylistDiff.failed(mylist_url)
+        known_video_id_list = list(task.video_status_dict.keys())
+        fetched_info = await VideoInfoFetcher.fetch_videoinfo(mylist_url, known_video_id_list, is_backfill)
+    except PermanentFetchError:
+        return MylistDiff.failed(mylist_url, is_permanent=True)
+    except Exception:
+        return MylistDiff.failed(mylist_url)
+    if not isinstance(fetched_info, FetchedVideoInfo):
+        return MylistDiff.failed(mylist_url)
+    return DatabaseUpdater.make_diff(mylist_url, task.video_status_dict, fetched_info, get_now_datetime())
+
+
+async def _fetch_shard(task_list: list[ShardTask], is_backfill: bool) -> list[MylistDiff]:
+    semaphore = asyncio.Semaphore(SHARD_CONCURRENCY)
+
+    async def fetch_diff(task: ShardTask) -> MylistDiff:
+        async with semaphore:
+            return await _fetch_diff(task, is_backfill)
+
+    return list(await asyncio.gather(*(fetch_diff(task) for task in task_list)))
+
+
+def fetch_shard(task_list: list[ShardTask], is_backfill: bool) -> list[MylistDiff]:
+    """ワーカープロセスで1シャード分の fetch, 解析, 差分確認を行う
+
+    Notes:
+        シャードごとに独自のイベントループを立て、SHARD_CONCURRENCY 件ずつ並行に fetch する
+        DBにはアクセスせず、DBに反映すべき更新内容を MylistDiff で親プロセスに返す
+
+    Args:
+        task_list (list[ShardTask]): シャードに含まれるマイリストの fetch 指示
+        is_backfill (bool): 取得済の動画に到達しても打ち切らずに全件取得するかどうか
+
+    Returns:
+        list[MylistDiff]: task_list と同じ順の更新内容
+    """
+    return asyncio.run(_fetch_shard(task_list, is_backfill))
+
+
+class ShardedUpdater(ExecutorBase):
+    """マイリストをシャードに分け、fetch と差分確認を複数のワーカープロセスで行う
+
+    Notes:
+        大量のマイリストの更新では、ページの解析（BeautifulSoup, orjson, find_values）や
+        ValueObject の構築、差分確認が CPU 律速となり、スレッドでは GIL により直列化される
+        ShardedUpdater ではこれらを ProcessPoolExecutor のワーカープロセスで行い、
+        ワーカーからは MylistDiff のみを受け取って、DB更新は親プロセスの1スレッドで順に行う（単一の書き込み）
+        ワーカープロセスは Windows と同じく spawn で起動する
+        同時に投入するシャードは process_num の MAX_PENDING_PER_PROCESS 倍までとし、
+        更新前の動画情報はシャードの投入時に読み込み、投入後に破棄する
+        サーキットブレーカーによる回復確認の判定と記録、ジョブの状態遷移は親プロセスで行う
+        中止された場合、未投入・実行待ちのシャードは取り消し、実行中のシャードの結果はDBに反映しない
+
+    Attributes:
+        mylist_with_video_list (MylistWithVideoList): fetch すべきマイリスト情報と現在の動画情報
+        is_backfill (bool): 取得済の動画に到達しても打ち切らずに全件取得するかどうか
+        process_num (int): ワーカープロセス数
+        shard_size (int): 1シャードに含めるマイリスト数
+        job (UpdateJob): 状態の記録と中止の確認に用いるジョブ
+        circuit_breaker (MylistCircuitBreaker | None): fetch の成否を記録するサーキットブレーカー
+        max_check_interval_minutes (int | None): 適応的インターバルの上限[min]
+        shard_func (ShardFunc): ワーカープロセスで実行する関数, 既定は fetch_shard
+    """
+
+    # プロセスあたりのシャード数の目安, 大きいほど負荷が均等になり、中止にも早く応じる
+    SHARDS_PER_PROCESS = 4
+    MAX_SHARD_SIZE = 64
+    MAX_PENDING_PER_PROCESS = 2
+
+    mylist_with_video_list: MylistWithVideoList
+    is_backfill: bool
+    process_num: int
+    shard_size: int
+    job: UpdateJob
+    circuit_breaker: MylistCircuitBreaker | None
+    max_check_interval_minutes: int | None
+    shard_func: ShardFunc
+
+    def __init__(
+        self,
+        mylist_with_video_list: MylistWithVideoList,
+        process_info: ProcessInfo,
+        is_backfill: bool = False,
+        process_num: int | None = None,
+        job: UpdateJob | None = None,
+        shard_func: ShardFunc = fetch_shard,
+    ) -> None:
+        """初期設定
+
+        Args:
+            mylist_with_video_list (MylistWithVideoList): fetch すべきマイリスト情報と現在の動画情報
+            process_info (ProcessInfo): 画面更新用 process_info
+            is_backfill (bool): 取得済の動画に到達しても打ち切らずに全件取得するかどうか
+            process_num (int | None): ワーカープロセス数, Noneなら CPU 数
+            job (UpdateJob | None): UpdateJobManager に登録したジョブ, 指定がなければ単独のジョブを作成する
+            shard_func (ShardFunc): ワーカープロセスで実行する、モジュールレベルの関数
+
+        Raises:
+            ValueError: 引数が不正な場合
+        """
+        if job is None:
+            job = UpdateJob.create([m.mylist.url.non_query_url for m in mylist_with_video_list])
+        if not isinstance(job, UpdateJob):
+            raise ValueError("job must be UpdateJob.")
+        super().__init__(process_info, job.cancel_token)
+        if not isinstance(mylist_with_video_list, MylistWithVideoList):
+            raise ValueError("mylist_with_video_list must be MylistWithVideoList.")
+        if process_num is None:
+            process_num = os.cpu_count() or 1
+        if not isinstance(process_num, int) or process_num < 1:
+            raise ValueError("process_num must be int and >= 1.")
+        if not callable(shard_func):
+            raise ValueError("shard_func must be callable.")
+        self.mylist_with_video_list = mylist_with_video_list
+        self.is_backfill = is_backfill
+        self.process_num = process_num
+        self.shard_size = self.calc_shard_size(len(mylist_with_video_list), process_num)
+        self.job = job
+        self.circuit_breaker = getattr(self.window, "circuit_breaker", None)
+        self.max_check_interval_minutes = ConfigStore.get_max_check_interval_minutes()
+        self.shard_func = shard_func
+
+    @classmethod
+    def calc_shard_size(cls, mylist_num: int, process_num: int) -> int:
+        """1シャードに含めるマイリスト数を求める
+
+        各プロセスに SHARDS_PER_PROCESS 個ずつ行き渡る大きさとし、MAX_SHARD_SIZE を上限とする
+        """
+        shard_num = process_num * cls.SHARDS_PER_PROCESS
+        return max(1, min(cls.MAX_SHARD_SIZE, -(-mylist_num // shard_num)))
+
+    def make_shard(self, start: int) -> list[ShardTask]:
+        """start 番目のマイリストから shard_size 個分のシャードを作成する
+
+        更新前の動画情報はここで読み込んで ShardTask に移し、MylistWithVideo からは破棄する
+        中止されたマイリストはシャードに含めない
+        """
+        task_list = []
+        breaker = self.circuit_breaker
+        for mylist_with_video in self.mylist_with_video_list[start : start + self.shard_size]:
+            mylist_url = mylist_with_video.mylist.url.non_query_url
+            if not self.job.transition(mylist_url, UpdateJobState.fetching):
+                continue
+            is_fast_probe = breaker is not None and breaker.is_fast_probe(mylist_url)
+            task_list.append(ShardTask(mylist_url, mylist_with_video.video_status_dict, is_fast_probe))
+            mylist_with_video.release_video_status_dict()
+        return task_list
+
+    def iter_shard_results(self) -> Iterator[list[MylistDiff]]:
+        """シャードをワーカープロセスに投入し、終わったシャードから順に結果を返すジェネレータ
+
+        Notes:
+            中止された場合は新たなシャードを投入せず、実行待ちのシャードを取り消して終了する
+            実行中のシャードは終わるまで待つが、その結果は返さない
+            ワーカープロセスが異常終了した場合など、シャード単位で失敗した場合は全て fetch 失敗として返す
+        """
+        mylist_num = len(self.mylist_with_video_list)
+        if mylist_num == 0:
+            return
+        max_pending = self.process_num * self.MAX_PENDING_PER_PROCESS
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=self.process_num,
+            mp_context=mp_context,
+            initializer=init_worker,
+            initargs=(ConfigStore.config,),
+        ) as executor:
+            pending: dict[Future, list[ShardTask]] = {}
+            start = 0
+            try:
+                while start < mylist_num or pending:
+                    while start < mylist_num and len(pending) < max_pending and not self.job.is_cancelled:
+                        task_list = self.make_shard(start)
+                        start = start + self.shard_size
+                        if task_list:
+                            pending[executor.submit(self.shard_func, task_list, self.is_backfill)] = task_list
+                    if self.job.is_cancelled:
+                        break
+                    if not pending:
+                        continue
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task_list = pending.pop(future)
+                        if self.job.is_cancelled:
+                            break
+                        try:
+                            diff_list = future.result()
+                        except Exception as e:
+                            logger.error(f"Shard failed, {type(e).__name__}: {e}.")
+                            diff_list = [MylistDiff.failed(task.mylist_url) for task in task_list]
+                        yield diff_list
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def execute(self) -> list[tuple[str, Result]]:
+        """ワーカープロセスでの fetch と、親プロセスでのDB更新を行う
+
+        Returns:
+            list[tuple[str, Result]]: マイリストURLと、DB更新処理結果のResult
+                                      DB更新が終わった順に並ぶ, 中止されたマイリストは含まない
+        """
+        all_index_num = len(self.mylist_with_video_list)
+        self.emit_progress(ProgressEvent.started(all_index_num))
+        result_buf = []
+        try:
+            for diff_list in self.iter_shard_results():
+                for diff in diff_list:
+                    result_buf.append((diff.mylist_url, self.execute_worker(diff, all_index_num)))
+        finally:
+            # 結果を反映しなかったマイリストは中止扱いとする
+            for mylist_url in self.job.active_mylist_url_list():
+                self.job.transition(mylist_url, UpdateJobState.cancelled)
+            self.emit_progress(ProgressEvent.finished())
+        return result_buf
+
+    def execute_worker(self, *argv) -> Result:
+        """ワーカープロセスから受け取った1マイリスト分の更新内容をDBに反映する
+
+        Notes:
+            親プロセスの1スレッドから順に呼び出され、DB更新はこのメソッドでのみ行う
+            サーキットブレーカーが設定されている場合は fetch の成否を記録する
+
+        Returns:
+            Result: DB更新に成功したら Result.success, fetch 失敗時・中止時は Result.failed
+        """
+        diff: MylistDiff = argv[0]
+        all_index_num: int = argv[1]
+        mylist_url = diff.mylist_url
+        self.emit_progress(ProgressEvent.fetched(mylist_url, diff.is_success))
+        if self.job.is_cancelled or not self.job.transition(mylist_url, UpdateJobState.writing):
+            self.job.transition(mylist_url, UpdateJobState.cancelled)
+            logger.info(mylist_url + f" : update cancelled ... ({self.done_count}/{all_index_num}).")
+            self.emit_progress(ProgressEvent.updated(mylist_url, False))
+            return Result.failed
+
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            if diff.is_success:
+                breaker.record_success(mylist_url)
+            else:
+                breaker.record_failure(mylist_url, diff.is_permanent)
+
+        result = Result.failed
+        try:
+            if diff.is_success:
+                self.mylist_db.reset_check_failed_count(mylist_url)
+                DatabaseUpdater.write_diff(self.mylist_db, self.mylist_info_db, diff, self.max_check_interval_minutes)
+                result = Result.success
+            else:
+                self.mylist_db.update_check_failed_count(mylist_url)
+        except Exception as e:
+            logger.error(f"{mylist_url} : update failed, {type(e).__name__}: {e}.")
+        finally:
+            self.job.transition(mylist_url, UpdateJobState.done)
+
+        self.done_count = self.done_count + 1
+        if result == Result.success:
+            logger.info(mylist_url + f" : update done ... ({self.done_count}/{all_index_num}).")
+        else:
+            logger.info(mylist_url + f" : fetching failed. ({self.done_count}/{all_index_num}).")
+        self.emit_progress(ProgressEvent.updated(mylist_url, result == Result.success))
+        return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    from nnmm.mylist_db_controller import MylistDBController
+    from nnmm.mylist_info_db_controller import MylistInfoDBController
+    from nnmm.process.update_mylist.progress_sink import ConsoleProgressSink
+    from nnmm.process.value_objects.headless_host import HeadlessHost
+
+    config = ConfigStore.get_config()
+    db_fullpath = config["db"].get("save_path", "")
+    mylist_db = MylistDBController(db_fullpath)
+    mylist_info_db = MylistInfoDBController(db_fullpath)
+    host = HeadlessHost(mylist_db, mylist_info_db, ConsoleProgressSink(sys.stdout))
+    process_info = ProcessInfo("-SHARDED_UPDATE-", host, mylist_db, mylist_info_db)
+    mylist_with_video_list = MylistWithVideoList.create(mylist_db.select(), mylist_info_db)
+    print(ShardedUpdater(mylist_with_video_list, process_info).execute())
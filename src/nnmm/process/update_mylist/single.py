@@ -1,5 +1,7 @@
 from logging import INFO, getLogger
 
+from PySide6.QtWidgets import QWidget
+
 from nnmm.process.update_mylist.base import Base, ThreadDoneBase
 from nnmm.process.value_objects.process_info import ProcessInfo
 
@@ -21,6 +23,8 @@ class Single(Base):
         self.post_process = SingleThreadDone
         self.L_KIND = "Single mylist"
         self.E_DONE = "-UPDATE_THREAD_DONE-"
+        # 利用者が明示的に更新したマイリストは、サーキットブレーカーの待機時間を待たずに回復確認を行う
+        self.is_forced_probe = True
 
     def get_target_mylist(self) -> list[dict]:
         """更新対象のマイリストを返す
@@ -45,6 +49,46 @@ class SingleThreadDone(ThreadDoneBase):
         self.L_KIND = "Single mylist"
 
 
+class SingleBackfill(Base):
+    def __init__(self, process_info: ProcessInfo) -> None:
+        """マイリスト情報を全件取得して更新する
+
+        Notes:
+            "全件再取得"
+            左のマイリストの右クリックメニューから起動される
+            通常の更新は取得済の動画に到達した時点でページングを打ち切るが、
+            SingleBackfillは選択されている単一のマイリストについて全ページを辿って動画情報を更新する
+        """
+        super().__init__(process_info)
+
+        self.post_process = SingleThreadDone
+        self.L_KIND = "Single mylist backfill"
+        self.E_DONE = "-UPDATE_THREAD_DONE-"
+        self.is_backfill = True
+        self.is_forced_probe = True
+
+    def create_component(self) -> QWidget:
+        """QListWidgetの右クリックメニューから起動するためコンポーネントは作成しない"""
+        return None
+
+    def get_target_mylist(self) -> list[dict]:
+        """更新対象のマイリストを返す
+
+        Notes:
+            SingleBackfillにおいては対象は左のマイリストで選択されている単一のマイリストとなる
+
+        Returns:
+            list[dict]: 更新対象のマイリストのリスト、エラー時空リスト
+        """
+        selected_mylist_row = self.get_selected_mylist_row()
+        if not selected_mylist_row:
+            return []
+
+        showname = selected_mylist_row.without_new_mark_name()
+        m_list = self.mylist_db.select_from_showname(showname)
+        return m_list
+
+
 if __name__ == "__main__":
     import sys
 
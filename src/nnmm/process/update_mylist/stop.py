@@ -0,0 +1,64 @@
+from logging import INFO, getLogger
+
+from PySide6.QtCore import Slot
+from PySide6.QtWidgets import QPushButton, QWidget
+
+from nnmm.process.base import ProcessBase
+from nnmm.process.update_mylist.update_job_manager import UpdateJobManager
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.util import Result
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class Stop(ProcessBase):
+    def __init__(self, process_info: ProcessInfo) -> None:
+        """実行中のマイリスト更新処理を中止する
+
+        Notes:
+            "更新中止" ボタンが押された場合
+            fetch 中のマイリストは通信を打ち切り、未着手のマイリストは fetch, DB更新を行わない
+            DB更新中のマイリストはそのマイリストの書き込みが終わるまで待つ
+
+        Attributes:
+            job_manager (UpdateJobManager | None): 実行中の更新ジョブを管理する UpdateJobManager
+        """
+        super().__init__(process_info)
+        self.job_manager: UpdateJobManager | None = getattr(self.window, "update_job_manager", None)
+
+    def create_component(self) -> QWidget:
+        stop_button = QPushButton(self.name)
+        stop_button.clicked.connect(lambda: self.callback())
+        return stop_button
+
+    @Slot()
+    def callback(self) -> Result:
+        """実行中の全ての更新ジョブを中止する
+
+        Returns:
+            Result: 中止したジョブがあれば Result.success, 実行中のジョブがなければ Result.failed
+        """
+        if self.job_manager is None or not self.job_manager.is_running:
+            logger.info("Update stop skipped, no update is running.")
+            return Result.failed
+
+        job_num = self.job_manager.cancel()
+        self.set_bottom_textbox("中止しています...", False)
+        logger.info(f"Update stop requested, {job_num} job(s) cancelled.")
+        return Result.success
+
+
+if __name__ == "__main__":
+    import sys
+
+    import qdarktheme
+    from PySide6.QtWidgets import QApplication
+
+    from nnmm.main_window import MainWindow
+
+    app = QApplication()
+    qdarktheme.setup_theme()
+    window_main = MainWindow()
+    window_main.show()
+    sys.exit(app.exec())
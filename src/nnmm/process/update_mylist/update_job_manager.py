@@ -0,0 +1,232 @@
+import enum
+import threading
+from logging import INFO, getLogger
+from typing import Self
+
+from nnmm.process.update_mylist.cancellation_token import CancellationToken
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class UpdateJobState(enum.Enum):
+    queued = "queued"
+    fetching = "fetching"
+    writing = "writing"
+    done = "done"
+    cancelled = "cancelled"
+
+    @property
+    def is_terminal(self) -> bool:
+        return self in (UpdateJobState.done, UpdateJobState.cancelled)
+
+
+# 許可する状態遷移, 終端状態（done, cancelled）からはどこにも遷移しない
+# fetch 中に失敗して DB更新まで進めなかったマイリストは fetching から直接 done に遷移する
+_TRANSITIONS: dict[UpdateJobState, tuple[UpdateJobState, ...]] = {
+    UpdateJobState.queued: (UpdateJobState.fetching, UpdateJobState.cancelled),
+    UpdateJobState.fetching: (UpdateJobState.writing, UpdateJobState.done, UpdateJobState.cancelled),
+    UpdateJobState.writing: (UpdateJobState.done, UpdateJobState.cancelled),
+    UpdateJobState.done: (),
+    UpdateJobState.cancelled: (),
+}
+
+
+class UpdateJob:
+    """1回のマイリスト更新処理（すべて更新、インターバル更新、単一更新のいずれか）を表すジョブ
+
+    Notes:
+        マイリストごとに queued -> fetching -> writing -> done の順に状態が遷移する
+        中止された場合、終端状態でないマイリストは cancelled に遷移する
+        状態遷移は fetch, DB更新のワーカースレッドから行われる
+
+    Attributes:
+        job_id (int): ジョブID
+        mylist_url_list (list[str]): 更新対象のマイリストURLリスト
+        cancel_token (CancellationToken): このジョブの中止を伝えるトークン
+    """
+
+    job_id: int
+    mylist_url_list: list[str]
+    cancel_token: CancellationToken
+
+    def __init__(self, job_id: int, mylist_url_list: list[str]) -> None:
+        if not isinstance(job_id, int):
+            raise ValueError("job_id must be int.")
+        if not isinstance(mylist_url_list, list) or not all(isinstance(url, str) for url in mylist_url_list):
+            raise ValueError("mylist_url_list must be list[str].")
+        self.job_id = job_id
+        self.mylist_url_list = mylist_url_list
+        self.cancel_token = CancellationToken()
+        self._lock = threading.Lock()
+        self._states = {mylist_url: UpdateJobState.queued for mylist_url in mylist_url_list}
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.cancel_token.is_cancelled
+
+    @property
+    def is_finished(self) -> bool:
+        """全てのマイリストが終端状態かどうか"""
+        with self._lock:
+            return all(state.is_terminal for state in self._states.values())
+
+    def state(self, mylist_url: str) -> UpdateJobState | None:
+        """マイリストの現在の状態を返す, 対象外のマイリストならNone"""
+        with self._lock:
+            return self._states.get(mylist_url)
+
+    def count(self, state: UpdateJobState) -> int:
+        """指定の状態にあるマイリストの数を返す"""
+        with self._lock:
+            return sum(1 for s in self._states.values() if s == state)
+
+    def active_mylist_url_list(self) -> list[str]:
+        """終端状態でないマイリストURLのリストを返す"""
+        with self._lock:
+            return [mylist_url for mylist_url, state in self._states.items() if not state.is_terminal]
+
+    def transition(self, mylist_url: str, state: UpdateJobState) -> bool:
+        """マイリストの状態を遷移させる
+
+        Notes:
+            中止と状態遷移は別スレッドから同時に行われうるため、
+            既に cancelled になっているマイリストへの遷移は例外とせず、何もせずに False を返す
+
+        Args:
+            mylist_url (str): 対象のマイリストURL
+            state (UpdateJobState): 遷移先の状態
+
+        Returns:
+            bool: 遷移させたら True, 既に中止されていた場合 False
+
+        Raises:
+            ValueError: 対象外のマイリスト、または許可されない状態遷移の場合
+        """
+        if not isinstance(state, UpdateJobState):
+            raise ValueError("state must be UpdateJobState.")
+        with self._lock:
+            if mylist_url not in self._states:
+                raise ValueError(f"{mylist_url} is not in this job.")
+            now_state = self._states[mylist_url]
+            if now_state == UpdateJobState.cancelled:
+                return False
+            if state not in _TRANSITIONS[now_state]:
+                raise ValueError(f"invalid transition {now_state.value} -> {state.value} : {mylist_url}.")
+            self._states[mylist_url] = state
+        return True
+
+    def cancel(self) -> None:
+        """ジョブを中止する
+
+        待機中（queued）のマイリストはその場で cancelled にする
+        fetch 中、DB更新中のマイリストはワーカーが中止を確認した時点で cancelled になる
+        """
+        self.cancel_token.cancel()
+        with self._lock:
+            for mylist_url, state in self._states.items():
+                if state == UpdateJobState.queued:
+                    self._states[mylist_url] = UpdateJobState.cancelled
+
+    @classmethod
+    def create(cls, mylist_url_list: list[str]) -> Self:
+        """UpdateJobManager を通さない単独のジョブを作成する"""
+        return cls(0, mylist_url_list)
+
+
+class UpdateJobManager:
+    """マイリスト更新ジョブを管理する
+
+    Notes:
+        手動更新とタイマーによるインターバル更新が同時に起動されても、
+        同じマイリストを二重に更新しないように、実行中のジョブに含まれるマイリストは新たなジョブから除外する
+        中止ボタンからは cancel() で実行中の全てのジョブを中止する
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: list[UpdateJob] = []
+        self._next_job_id = 1
+
+    @property
+    def is_running(self) -> bool:
+        """実行中のジョブがあるかどうか"""
+        with self._lock:
+            return len(self._jobs) > 0
+
+    def job_list(self) -> list[UpdateJob]:
+        """実行中のジョブのリストを返す"""
+        with self._lock:
+            return self._jobs[:]
+
+    def state(self, mylist_url: str) -> UpdateJobState | None:
+        """実行中のジョブにおけるマイリストの状態を返す, 含まれていなければNone"""
+        with self._lock:
+            for job in self._jobs:
+                if (state := job.state(mylist_url)) is not None and not state.is_terminal:
+                    return state
+        return None
+
+    def submit(self, mylist_url_list: list[str]) -> UpdateJob | None:
+        """ジョブを登録する
+
+        実行中のジョブで更新中（終端状態でない）のマイリスト、リスト内で重複するマイリストは除外する
+
+        Args:
+            mylist_url_list (list[str]): 更新対象のマイリストURLリスト
+
+        Returns:
+            UpdateJob | None: 登録したジョブ, 除外した結果更新対象がなくなった場合はNone
+        """
+        with self._lock:
+            running_url_set = set()
+            for job in self._jobs:
+                running_url_set.update(job.active_mylist_url_list())
+
+            target_url_list = []
+            for mylist_url in mylist_url_list:
+                if mylist_url in running_url_set:
+                    logger.info(f"{mylist_url} : already updating, skipped.")
+                    continue
+                running_url_set.add(mylist_url)
+                target_url_list.append(mylist_url)
+            if not target_url_list:
+                return None
+
+            job = UpdateJob(self._next_job_id, target_url_list)
+            self._next_job_id += 1
+            self._jobs.append(job)
+        return job
+
+    def complete(self, job: UpdateJob) -> None:
+        """ジョブを終了させ、管理対象から外す
+
+        Args:
+            job (UpdateJob): 終了させるジョブ
+        """
+        with self._lock:
+            if job in self._jobs:
+                self._jobs.remove(job)
+
+    def cancel(self) -> int:
+        """実行中の全てのジョブを中止する
+
+        Returns:
+            int: 中止したジョブの数
+        """
+        job_list = self.job_list()
+        for job in job_list:
+            job.cancel()
+        return len(job_list)
+
+
+if __name__ == "__main__":
+    manager = UpdateJobManager()
+    url_1 = "https://www.nicovideo.jp/user/10000001/video"
+    url_2 = "https://www.nicovideo.jp/user/10000002/video"
+    job_1 = manager.submit([url_1])
+    job_2 = manager.submit([url_1, url_2])
+    print(job_2.mylist_url_list)
+    job_1.transition(url_1, UpdateJobState.fetching)
+    manager.cancel()
+    print(job_1.state(url_1), job_2.state(url_2))
@@ -23,7 +23,7 @@ class MylistDict:
         Returns:
             bool: dict のキーと Mylist の属性が一致した場合True
         """
-        valid_key = Mylist.__table__.c.keys()
+        valid_key = Mylist.column_keys()
         instance_key = list(self._dict.keys())
         if instance_key != valid_key:
             raise ValueError("_dict.keys() is invalid key.")
@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from typing import Self
+
+from nnmm.process.update_mylist.value_objects.video_batch import VideoBatch
+from nnmm.util import Result
+
+
+@dataclass(frozen=True)
+class MylistDiff:
+    """1マイリスト分の、DBに反映すべき更新内容
+
+    Notes:
+        fetch と差分確認の結果を、DB更新を行う側に受け渡すためのコンパクトな表現
+        プロセス間で受け渡せるよう、文字列とタプルのみで構成する
+        rows の各行は VideoBatch.COLS の並びで、値は VideoBatch.to_dict_list() と同じ形式
+        fetch に失敗した場合は rows を持たず、result が Result.failed となる
+
+    Attributes:
+        mylist_url (str): マイリストURL
+        result (Result): fetch と差分確認に成功したら Result.success
+        rows (tuple[tuple[str, ...], ...]): DBに格納する動画情報の行
+        has_new_video (bool): 新たに追加された動画があるかどうか
+        checked_at (str): 更新確認日時 "%Y-%m-%d %H:%M:%S" 形式
+        is_permanent (bool): fetch の失敗が再試行しても回復しないものかどうか
+    """
+
+    mylist_url: str
+    result: Result
+    rows: tuple[tuple[str, ...], ...] = ()
+    has_new_video: bool = False
+    checked_at: str = ""
+    is_permanent: bool = False
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.mylist_url, str) or not self.mylist_url:
+            raise ValueError("mylist_url must be non-empty str.")
+        if not isinstance(self.result, Result):
+            raise ValueError("result must be Result.")
+        if not isinstance(self.rows, tuple) or not all(isinstance(row, tuple) for row in self.rows):
+            raise ValueError("rows must be tuple[tuple].")
+        if not all(len(row) == len(VideoBatch.COLS) for row in self.rows):
+            raise ValueError(f"rows element size must be {len(VideoBatch.COLS)}.")
+        if not isinstance(self.has_new_video, bool):
+            raise ValueError("has_new_video must be bool.")
+        if not isinstance(self.checked_at, str):
+            raise ValueError("checked_at must be str.")
+        if not isinstance(self.is_permanent, bool):
+            raise ValueError("is_permanent must be bool.")
+        if self.result == Result.failed and self.rows:
+            raise ValueError("failed MylistDiff must not have rows.")
+
+    def __len__(self) -> int:
+        return self.rows.__len__()
+
+    @property
+    def is_success(self) -> bool:
+        return self.result == Result.success
+
+    @property
+    def video_id_list(self) -> list[str]:
+        """各行の動画IDのリスト"""
+        index = VideoBatch.COLS.index("video_id")
+        return [row[index] for row in self.rows]
+
+    def to_dict_list(self) -> list[dict[str, str]]:
+        """各行を VideoBatch.to_dict_list() と同じ形式の辞書のリストで返す"""
+        return [dict(zip(VideoBatch.COLS, row, strict=True)) for row in self.rows]
+
+    @classmethod
+    def from_video_batch(cls, mylist_url: str, video_batch: VideoBatch, has_new_video: bool, checked_at: str) -> Self:
+        """差分確認後の VideoBatch から作成する"""
+        rows = tuple(tuple(d.values()) for d in video_batch.iter_dict())
+        return cls(mylist_url, Result.success, rows, has_new_video, checked_at)
+
+    @classmethod
+    def failed(cls, mylist_url: str, is_permanent: bool = False) -> Self:
+        """fetch に失敗したマイリストを表すインスタンスを作成する"""
+        return cls(mylist_url, Result.failed, is_permanent=is_permanent)
+
+
+if __name__ == "__main__":
+    mylist_url = "https://www.nicovideo.jp/user/1234567/video"
+    video_batch = VideoBatch.create([
+        {
+            "id": 1,
+            "video_id": "sm12345678",
+            "title": "テスト動画",
+            "username": "投稿者1",
+            "status": "未視聴",
+            "uploaded_at": "2023-12-22 12:34:56",
+            "registered_at": "2023-12-22 12:34:56",
+            "video_url": "https://www.nicovideo.jp/watch/sm12345678",
+            "mylist_url": mylist_url,
+            "created_at": "2023-12-22 12:34:56",
+        }
+    ])
+    diff = MylistDiff.from_video_batch(mylist_url, video_batch, True, "2023-12-22 12:34:56")
+    print(diff.to_dict_list())
+    print(MylistDiff.failed(mylist_url, True))
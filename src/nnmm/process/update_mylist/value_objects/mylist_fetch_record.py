@@ -0,0 +1,36 @@
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class MylistFetchRecord:
+    """更新処理1回分の、1マイリストの fetch の結果
+
+    Attributes:
+        mylist_url (str): マイリストURL
+        fetched_at (str): 更新処理の終了日時 "%Y-%m-%d %H:%M:%S" 形式
+        latency_ms (float | None): fetch の所要時間[ms], 計測できなかった場合None
+        is_success (bool): fetch とDB更新に成功したかどうか
+    """
+
+    mylist_url: str
+    fetched_at: str
+    latency_ms: float | None
+    is_success: bool
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.mylist_url, str) or not self.mylist_url:
+            raise ValueError("mylist_url must be non-empty str.")
+        if not isinstance(self.fetched_at, str):
+            raise ValueError("fetched_at must be str.")
+        if self.latency_ms is not None and (not isinstance(self.latency_ms, float) or self.latency_ms < 0):
+            raise ValueError("latency_ms must be None or float and >= 0.")
+        if not isinstance(self.is_success, bool):
+            raise ValueError("is_success must be bool.")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+if __name__ == "__main__":
+    record = MylistFetchRecord("https://www.nicovideo.jp/user/10000001/video", "2023-12-22 12:34:56", 123.4, True)
+    print(record.to_dict())
@@ -1,23 +1,38 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Self
 
 from nnmm.mylist_info_db_controller import MylistInfoDBController
 from nnmm.process.update_mylist.value_objects.typed_mylist import TypedMylist
 from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList
 from nnmm.process.update_mylist.value_objects.video_dict_list import VideoDictList
+from nnmm.process.value_objects.table_row import Status
 
 
 @dataclass(frozen=False)
 class MylistWithVideo:
-    """マイリストと、そのマイリストが保持する動画情報を紐づけたクラス"""
+    """マイリストと、そのマイリストが保持する動画情報を紐づけたクラス
+
+    Notes:
+        _video_list を持たず _mylist_info_db のみを持つ場合は遅延読み込みとなる（create_lazy）
+            video_list は参照のたびにDBから読み込む
+            video_status_dict は初回参照時に {動画ID: 視聴状況} のみをDBから読み込んで保持し、
+            release_video_status_dict() で破棄する
+        マイリスト更新時は全マイリスト分の動画情報を先に読み込まず、
+        fetch するマイリストの分のみを video_status_dict で読み込んで、差分確認後に破棄する
+    """
 
     _typed_mylist: TypedMylist
-    _video_list: TypedVideoList
+    _video_list: TypedVideoList | None = None
+    _mylist_info_db: MylistInfoDBController | None = field(default=None, compare=False, repr=False)
+    _video_status_dict: dict[str, Status] | None = field(default=None, init=False, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         if not isinstance(self._typed_mylist, TypedMylist):
             raise ValueError("_typed_mylist must be TypedMylist.")
-        if not isinstance(self._video_list, TypedVideoList):
+        if self._video_list is None:
+            if not isinstance(self._mylist_info_db, MylistInfoDBController):
+                raise ValueError("_mylist_info_db must be MylistInfoDBController if _video_list is None.")
+        elif not isinstance(self._video_list, TypedVideoList):
             raise ValueError("_video_list must be TypedVideoList.")
 
     @property
@@ -26,7 +41,30 @@ class MylistWithVideo:
 
     @property
     def video_list(self) -> TypedVideoList:
-        return self._video_list
+        if self._video_list is not None:
+            return self._video_list
+        mylist_url = self._typed_mylist.url.non_query_url
+        video_dict_list = VideoDictList.create(self._mylist_info_db.select_from_mylist_url(mylist_url))
+        return video_dict_list.to_typed_video_list()
+
+    @property
+    def video_status_dict(self) -> dict[str, Status]:
+        """このマイリストが保持する動画の {動画ID: 視聴状況}
+
+        初回参照時に作成して release_video_status_dict() まで保持する
+        """
+        if self._video_status_dict is None:
+            if self._video_list is not None:
+                self._video_status_dict = {video.video_id.id: video.status for video in self._video_list}
+            else:
+                mylist_url = self._typed_mylist.url.non_query_url
+                status_dict = self._mylist_info_db.select_status_from_mylist_url(mylist_url)
+                self._video_status_dict = {video_id: Status(status) for video_id, status in status_dict.items()}
+        return self._video_status_dict
+
+    def release_video_status_dict(self) -> None:
+        """保持している video_status_dict を破棄する"""
+        self._video_status_dict = None
 
     @classmethod
     def create(cls, typed_mylist: TypedMylist, mylist_info_db: MylistInfoDBController) -> Self:
@@ -52,6 +90,28 @@ class MylistWithVideo:
         typed_video_list = video_dict_list.to_typed_video_list()
         return cls(typed_mylist, typed_video_list)
 
+    @classmethod
+    def create_lazy(cls, typed_mylist: TypedMylist, mylist_info_db: MylistInfoDBController) -> Self:
+        """マイリストと、そのマイリストが保持する動画情報を参照する DBコントローラ を紐づける
+
+        動画情報は作成時には読み込まない
+
+        Args:
+            typed_mylist (TypedMylist): マイリスト
+            mylist_info_db (MylistInfoDBController): MylistInfo 取得用DBコントローラ
+
+        Raises:
+            ValueError: 引数の型が不正な場合
+
+        Returns:
+            Self: 遅延読み込みの MylistWithVideo インスタンス
+        """
+        if not isinstance(typed_mylist, TypedMylist):
+            raise ValueError("typed_mylist must be TypedMylist.")
+        if not isinstance(mylist_info_db, MylistInfoDBController):
+            raise ValueError("mylist_info_db must be MylistInfoDBController.")
+        return cls(typed_mylist, None, mylist_info_db)
+
 
 if __name__ == "__main__":
     pass
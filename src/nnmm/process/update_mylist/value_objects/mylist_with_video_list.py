@@ -31,6 +31,18 @@ class MylistWithVideoList:
     def __getitem__(self, item) -> MylistWithVideo:
         return self._list.__getitem__(item)
 
+    def filter_by_url(self, mylist_url_list: list[str]) -> Self:
+        """指定のマイリストURLのマイリストのみを含む MylistWithVideoList を返す
+
+        Args:
+            mylist_url_list (list[str]): 残すマイリストのURLリスト
+
+        Returns:
+            Self: 順序は元の MylistWithVideoList の順序を保つ
+        """
+        mylist_url_set = set(mylist_url_list)
+        return self.__class__([m for m in self._list if m.mylist.url.non_query_url in mylist_url_set])
+
     @classmethod
     def create(cls, mylist_list: list[dict] | list[Mylist], mylist_info_db: MylistInfoDBController) -> Self:
         """複数のマイリストと、それぞれのマイリストが保持する動画情報をそれぞれ取得して紐づける
@@ -60,7 +72,8 @@ class MylistWithVideoList:
         mylist_dict_list = MylistDictList.create(mylist_list)
         typed_mylist_list = mylist_dict_list.to_typed_mylist_list()
 
-        return cls([MylistWithVideo.create(typed_mylist, mylist_info_db) for typed_mylist in typed_mylist_list])
+        # 動画情報はこの時点では読み込まず、各マイリストの更新時に必要な分のみ読み込む
+        return cls([MylistWithVideo.create_lazy(typed_mylist, mylist_info_db) for typed_mylist in typed_mylist_list])
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ from typing import Self
 from nnmm.process.update_mylist.value_objects.mylist_with_video import MylistWithVideo
 from nnmm.process.update_mylist.value_objects.typed_mylist import TypedMylist
 from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList
+from nnmm.process.value_objects.table_row import Status
 from nnmm.util import Result
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
 
@@ -57,6 +58,10 @@ class Payload:
     def video_list(self) -> TypedVideoList:
         return self._mylist_with_video.video_list
 
+    @property
+    def video_status_dict(self) -> dict[str, Status]:
+        return self._mylist_with_video.video_status_dict
+
     @property
     def fetched_info(self) -> FetchedVideoInfo:
         return self._fetched_info
@@ -0,0 +1,65 @@
+import enum
+import time
+from dataclasses import dataclass, field
+from typing import Self
+
+
+class ProgressEventKind(enum.Enum):
+    started = "started"
+    fetch_done = "fetch_done"
+    fetch_failed = "fetch_failed"
+    update_done = "update_done"
+    update_failed = "update_failed"
+    finished = "finished"
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """マイリスト更新処理の進捗イベント
+
+    fetch, DB更新のワーカーから発行され、ProgressBus を経由してGUIスレッドで集計される
+
+    Attributes:
+        kind (ProgressEventKind): イベントの種類
+        mylist_url (str): 対象のマイリストURL, started, finished の場合は空文字列
+        total (int): 更新対象のマイリスト数, started 以外では0
+        occurred_at (float): 発生時刻(time.monotonic), 比較には用いない
+    """
+
+    kind: ProgressEventKind
+    mylist_url: str = ""
+    total: int = 0
+    occurred_at: float = field(default_factory=time.monotonic, compare=False)
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.kind, ProgressEventKind):
+            raise ValueError("kind must be ProgressEventKind.")
+        if not isinstance(self.mylist_url, str):
+            raise ValueError("mylist_url must be str.")
+        if not isinstance(self.total, int) or self.total < 0:
+            raise ValueError("total must be int and >= 0.")
+        if not isinstance(self.occurred_at, float):
+            raise ValueError("occurred_at must be float.")
+
+    @classmethod
+    def started(cls, total: int) -> Self:
+        return cls(ProgressEventKind.started, total=total)
+
+    @classmethod
+    def finished(cls) -> Self:
+        return cls(ProgressEventKind.finished)
+
+    @classmethod
+    def fetched(cls, mylist_url: str, is_success: bool) -> Self:
+        kind = ProgressEventKind.fetch_done if is_success else ProgressEventKind.fetch_failed
+        return cls(kind, mylist_url)
+
+    @classmethod
+    def updated(cls, mylist_url: str, is_success: bool) -> Self:
+        kind = ProgressEventKind.update_done if is_success else ProgressEventKind.update_failed
+        return cls(kind, mylist_url)
+
+
+if __name__ == "__main__":
+    print(ProgressEvent.started(10))
+    print(ProgressEvent.fetched("https://www.nicovideo.jp/user/10000001/video", True))
@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+from typing import Self
+
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent, ProgressEventKind
+
+
+@dataclass(frozen=True)
+class ProgressState:
+    """進捗イベントを集計した、マイリスト更新処理の進捗状況
+
+    Attributes:
+        total (int): 更新対象のマイリスト数
+        fetch_done (int): fetch に成功した数
+        fetch_failed (int): fetch に失敗した数
+        update_done (int): DB更新に成功した数
+        update_failed (int): DB更新に失敗した（fetch 失敗で更新しなかった場合も含む）数
+        started_at (float): 更新開始時刻(time.monotonic), 開始前は0.0
+        last_event_at (float): 最後にイベントを受け取った時刻(time.monotonic)
+        is_running (bool): 更新処理中かどうか
+    """
+
+    total: int = 0
+    fetch_done: int = 0
+    fetch_failed: int = 0
+    update_done: int = 0
+    update_failed: int = 0
+    started_at: float = 0.0
+    last_event_at: float = 0.0
+    is_running: bool = False
+
+    @property
+    def fetched(self) -> int:
+        """fetch が終わった数"""
+        return self.fetch_done + self.fetch_failed
+
+    @property
+    def updated(self) -> int:
+        """DB更新が終わった数"""
+        return self.update_done + self.update_failed
+
+    @property
+    def elapsed(self) -> float:
+        """更新開始から最後のイベントまでの経過時間[sec]"""
+        return max(0.0, self.last_event_at - self.started_at)
+
+    @property
+    def throughput(self) -> float:
+        """1秒あたりにDB更新まで終わったマイリスト数"""
+        return self.updated / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """残り時間の予測[sec], 予測できない場合はNone"""
+        if self.throughput <= 0:
+            return None
+        return (self.total - self.updated) / self.throughput
+
+    def apply(self, event: ProgressEvent) -> Self:
+        """event を反映した進捗状況を返す
+
+        Args:
+            event (ProgressEvent): 進捗イベント
+
+        Returns:
+            Self: event 反映後の ProgressState
+        """
+        if not isinstance(event, ProgressEvent):
+            raise ValueError("event must be ProgressEvent.")
+        at = event.occurred_at
+        match event.kind:
+            case ProgressEventKind.started:
+                return ProgressState(total=event.total, started_at=at, last_event_at=at, is_running=True)
+            case ProgressEventKind.finished:
+                return self._replace(last_event_at=at, is_running=False)
+            case ProgressEventKind.fetch_done:
+                return self._replace(fetch_done=self.fetch_done + 1, last_event_at=at)
+            case ProgressEventKind.fetch_failed:
+                return self._replace(fetch_failed=self.fetch_failed + 1, last_event_at=at)
+            case ProgressEventKind.update_done:
+                return self._replace(update_done=self.update_done + 1, last_event_at=at)
+            case ProgressEventKind.update_failed:
+                return self._replace(update_failed=self.update_failed + 1, last_event_at=at)
+
+    def _replace(self, **kwargs) -> Self:
+        return ProgressState(**(self.__dict__ | kwargs))
+
+    def to_status_text(self) -> str:
+        """下部テキストボックスに表示する文字列
+
+        Notes:
+            Timer は下部テキストボックスに "取得中" か "更新中" が含まれるかで更新処理中かを判定する
+        """
+        if self.fetched < self.total:
+            return f"取得中({self.fetched}/{self.total})"
+        return f"更新中({self.updated}/{self.total})"
+
+    def to_detail_text(self) -> str:
+        """プログレスバーに表示する文字列"""
+        detail = f"取得 {self.fetched}/{self.total}  更新 {self.updated}/{self.total}"
+        if self.update_failed:
+            detail += f"  失敗 {self.update_failed}"
+        detail += f"  {self.throughput:.1f}件/秒"
+        eta = self.eta
+        if self.is_running and eta is not None:
+            detail += f"  残り約{int(eta) // 60}:{int(eta) % 60:02}"
+        return detail
+
+
+if __name__ == "__main__":
+    state = ProgressState()
+    for event in [
+        ProgressEvent.started(2),
+        ProgressEvent.fetched("https://www.nicovideo.jp/user/10000001/video", True),
+        ProgressEvent.updated("https://www.nicovideo.jp/user/10000001/video", True),
+        ProgressEvent.fetched("https://www.nicovideo.jp/user/10000002/video", False),
+    ]:
+        state = state.apply(event)
+        print(state.to_status_text(), state.to_detail_text())
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+
+from nnmm.process.value_objects.table_row import Status
+
+
+@dataclass(frozen=True)
+class ShardTask:
+    """ShardedUpdater のワーカープロセスに渡す、1マイリスト分の fetch と差分確認の指示
+
+    Notes:
+        プロセス間で受け渡せるよう、文字列と Status のみで構成する
+
+    Attributes:
+        mylist_url (str): マイリストURL
+        video_status_dict (dict[str, Status]): 更新前の {動画ID: 視聴状況}
+        is_fast_probe (bool): 回復確認をリトライなしの1リクエストで先に行うかどうか
+    """
+
+    mylist_url: str
+    video_status_dict: dict[str, Status]
+    is_fast_probe: bool = False
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.mylist_url, str) or not self.mylist_url:
+            raise ValueError("mylist_url must be non-empty str.")
+        if not isinstance(self.video_status_dict, dict):
+            raise ValueError("video_status_dict must be dict.")
+        if not all(isinstance(v, Status) for v in self.video_status_dict.values()):
+            raise ValueError("video_status_dict value must be Status.")
+        if not isinstance(self.is_fast_probe, bool):
+            raise ValueError("is_fast_probe must be bool.")
+
+
+if __name__ == "__main__":
+    task = ShardTask("https://www.nicovideo.jp/user/1234567/video", {"sm12345678": Status.watched})
+    print(task)
@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+from typing import Self
+
+from nnmm.process.update_mylist.update_job_manager import UpdateJob, UpdateJobState
+from nnmm.process.update_mylist.value_objects.mylist_fetch_record import MylistFetchRecord
+from nnmm.update_trace import UpdateTrace
+from nnmm.util import Result, get_app_version, get_now_datetime
+
+
+@dataclass(frozen=True)
+class UpdateRunRecord:
+    """更新履歴に記録する、マイリスト更新処理1回分の結果
+
+    Notes:
+        更新処理の終了後に UpdateTrace と UpdateJob から作成し、UpdateRunDBController でまとめて書き込む
+
+    Attributes:
+        kind (str): 更新の種類, 更新処理の L_KIND
+        version (str): 更新を行った NNMM のバージョン
+        started_at (str): 開始日時 "%Y-%m-%d %H:%M:%S" 形式
+        finished_at (str): 終了日時 "%Y-%m-%d %H:%M:%S" 形式
+        elapsed_sec (float): 経過時間[sec]
+        target_num (int): 更新対象のマイリスト数
+        success_num (int): fetch とDB更新に成功した数
+        failed_num (int): fetch またはDB更新に失敗した数
+        cancelled_num (int): 中止により処理しなかった数
+        new_video_num (int): 新たに追加された動画の数
+        bytes (int): 受信バイト数の合計
+        stage_total_ms (tuple[tuple[str, float], ...]): (段階, 全マイリスト分の所要時間の合計[ms]) のタプル
+        mylist_fetch_record_list (tuple[MylistFetchRecord, ...]): 中止されなかったマイリストごとの結果
+    """
+
+    kind: str
+    version: str
+    started_at: str
+    finished_at: str
+    elapsed_sec: float
+    target_num: int
+    success_num: int
+    failed_num: int
+    cancelled_num: int
+    new_video_num: int
+    bytes: int
+    stage_total_ms: tuple[tuple[str, float], ...] = ()
+    mylist_fetch_record_list: tuple[MylistFetchRecord, ...] = ()
+
+    def __post_init__(self) -> None:
+        for name in ["kind", "version", "started_at", "finished_at"]:
+            if not isinstance(getattr(self, name), str):
+                raise ValueError(f"{name} must be str.")
+        if not isinstance(self.elapsed_sec, float) or self.elapsed_sec < 0:
+            raise ValueError("elapsed_sec must be float and >= 0.")
+        for name in ["target_num", "success_num", "failed_num", "cancelled_num", "new_video_num", "bytes"]:
+            value = getattr(self, name)
+            if not isinstance(value, int) or value < 0:
+                raise ValueError(f"{name} must be int and >= 0.")
+        if not isinstance(self.stage_total_ms, tuple) or not all(
+            isinstance(t, tuple) and len(t) == 2 for t in self.stage_total_ms
+        ):
+            raise ValueError("stage_total_ms must be tuple[tuple[str, float]].")
+        if not isinstance(self.mylist_fetch_record_list, tuple) or not all(
+            isinstance(r, MylistFetchRecord) for r in self.mylist_fetch_record_list
+        ):
+            raise ValueError("mylist_fetch_record_list must be tuple[MylistFetchRecord].")
+
+    def to_dict(self) -> dict:
+        """UpdateRun テーブルの1行を表す辞書を返す, マイリストごとの結果は含めない"""
+        return {
+            "kind": self.kind,
+            "version": self.version,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_sec": self.elapsed_sec,
+            "target_num": self.target_num,
+            "success_num": self.success_num,
+            "failed_num": self.failed_num,
+            "cancelled_num": self.cancelled_num,
+            "new_video_num": self.new_video_num,
+            "bytes": self.bytes,
+            "stage_total_ms": dict(self.stage_total_ms),
+        }
+
+    @classmethod
+    def create(cls, kind: str, trace: UpdateTrace, job: UpdateJob, result_list: list[tuple[str, Result]]) -> Self:
+        """更新処理の終了後に、記録済の UpdateTrace と UpdateJob から作成する
+
+        Notes:
+            中止されたマイリストは fetch の結果を持たないため、マイリストごとの結果には含めない
+            例外などで結果が得られなかったマイリストは失敗として数える
+
+        Args:
+            kind (str): 更新の種類
+            trace (UpdateTrace): 更新処理の各段階の所要時間を記録した UpdateTrace
+            job (UpdateJob): 更新処理のジョブ
+            result_list (list[tuple[str, Result]]): (マイリストURL, DB更新処理結果) のリスト
+
+        Returns:
+            UpdateRunRecord: 更新処理1回分の結果
+        """
+        finished_at = get_now_datetime()
+        cancelled_num = job.count(UpdateJobState.cancelled)
+        latency_dict = trace.fetch_latency_dict()
+        mylist_fetch_record_list = tuple(
+            MylistFetchRecord(mylist_url, finished_at, latency_dict.get(mylist_url), result == Result.success)
+            for mylist_url, result in result_list
+            if job.state(mylist_url) != UpdateJobState.cancelled
+        )
+        target_num = len(job.mylist_url_list)
+        success_num = sum(1 for record in mylist_fetch_record_list if record.is_success)
+        stage_total_ms = tuple((stage, summary["total_ms"]) for stage, summary in trace.summarize().items())
+        return cls(
+            kind,
+            get_app_version(),
+            trace.started_at,
+            finished_at,
+            trace.elapsed if trace.elapsed is not None else trace.now(),
+            target_num,
+            success_num,
+            max(0, target_num - success_num - cancelled_num),
+            cancelled_num,
+            trace.sum_attr("new_video_num"),
+            trace.sum_attr("bytes"),
+            stage_total_ms,
+            mylist_fetch_record_list,
+        )
+
+
+if __name__ == "__main__":
+    from nnmm.update_trace import SpanStage
+
+    mylist_url = "https://www.nicovideo.jp/user/10000001/video"
+    trace = UpdateTrace()
+    trace.record(SpanStage.page_request, mylist_url, 0.0, 0.1, {"bytes": 1024})
+    trace.record(SpanStage.db_write, mylist_url, 0.1, 0.2, {"new_video_num": 2})
+    trace.finish()
+    record = UpdateRunRecord.create("UpdateMylist Every", trace, UpdateJob.create([mylist_url]), [])
+    print(record.to_dict())
@@ -0,0 +1,51 @@
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class UpdateSummary:
+    """GUIを伴わないマイリスト更新処理1回分の結果
+
+    Attributes:
+        target (int): 更新対象として選択したマイリスト数
+        skipped (int): サーキットブレーカーにより fetch しなかった数
+        updated (int): DB更新まで成功した数
+        failed (int): fetch またはDB更新に失敗した数
+        cancelled (int): 中止により処理しなかった数
+        elapsed (float): 経過時間[sec]
+    """
+
+    target: int = 0
+    skipped: int = 0
+    updated: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    elapsed: float = 0.0
+
+    def __post_init__(self) -> None:
+        for name in ["target", "skipped", "updated", "failed", "cancelled"]:
+            value = getattr(self, name)
+            if not isinstance(value, int) or value < 0:
+                raise ValueError(f"{name} must be int and >= 0.")
+        if not isinstance(self.elapsed, float) or self.elapsed < 0:
+            raise ValueError("elapsed must be float and >= 0.")
+
+    @property
+    def is_success(self) -> bool:
+        """失敗、中止したマイリストがないかどうか"""
+        return self.failed == 0 and self.cancelled == 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_text(self) -> str:
+        """標準出力に表示する文字列"""
+        return (
+            f"target {self.target}  updated {self.updated}  failed {self.failed}  "
+            f"skipped {self.skipped}  cancelled {self.cancelled}  {self.elapsed:.2f} [sec]"
+        )
+
+
+if __name__ == "__main__":
+    summary = UpdateSummary(target=3, skipped=1, updated=1, failed=1, elapsed=1.5)
+    print(summary.to_text())
+    print(summary.to_dict())
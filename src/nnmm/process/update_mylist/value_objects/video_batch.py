@@ -0,0 +1,356 @@
+import copy
+import re
+from dataclasses import dataclass
+from typing import Any, Iterator, Self
+
+from nnmm.process.update_mylist.value_objects.created_at import CreatedAt
+from nnmm.process.update_mylist.value_objects.typed_video import TypedVideo
+from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList
+from nnmm.process.update_mylist.value_objects.video_row_index import VideoRowIndex
+from nnmm.process.value_objects.table_row import Status
+from nnmm.video_info_fetcher.value_objects.mylist_url_factory import MylistURLFactory
+from nnmm.video_info_fetcher.value_objects.registered_at import RegisteredAt
+from nnmm.video_info_fetcher.value_objects.title import Title
+from nnmm.video_info_fetcher.value_objects.uploaded_at import UploadedAt
+from nnmm.video_info_fetcher.value_objects.username import Username
+from nnmm.video_info_fetcher.value_objects.video_url import VideoURL
+from nnmm.video_info_fetcher.value_objects.videoid import Videoid
+
+
+@dataclass(frozen=True, slots=True)
+class VideoBatch:
+    """動画一覧を列ごとの配列で保持するデータクラス
+
+    Notes:
+        TypedVideoList は1動画ごとに TypedVideo と各ValueObject を生成するが、
+        VideoBatch は列ごとに値(文字列など)のタプルを保持し、バリデーションも列ごとに1回行う
+        DB更新などの大量の動画をまとめて扱う経路で使う
+        行単位の値が必要な場合は VideoBatchRow を都度作成する（batch[i], iter(batch)）
+        TypedVideo が必要な場合は to_typed_video_list() で変換する
+
+        列の値の形式は TypedVideo.to_dict() と同じ
+            ただし id は int, status は Status で保持する
+        日時の列は DATETIME_PATTERN の形式のみ確認し、日付として正しいかまでは確認しない
+        列のタプルはインスタンス間で共有するため、replace_status_list() 等は変更のない列をコピーしない
+
+    Raises:
+        ValueError: 列の型や値が不正な場合、列の大きさが異なる場合
+    """
+
+    id_list: tuple[int, ...]
+    video_id_list: tuple[str, ...]
+    title_list: tuple[str, ...]
+    username_list: tuple[str, ...]
+    status_list: tuple[Status, ...]
+    uploaded_at_list: tuple[str, ...]
+    registered_at_list: tuple[str, ...]
+    video_url_list: tuple[str, ...]
+    mylist_url_list: tuple[str, ...]
+    created_at_list: tuple[str, ...]
+
+    # 列名, TypedVideo.to_dict() のキーと同じ並び
+    COLS = (
+        "id",
+        "video_id",
+        "title",
+        "username",
+        "status",
+        "uploaded_at",
+        "registered_at",
+        "video_url",
+        "mylist_url",
+        "created_at",
+    )
+    VIDEO_ID_PATTERN = re.compile(r"s[ms][0-9]+")
+    VIDEO_URL_PATTERN = re.compile(VideoURL.VIDEO_URL_PATTERN)
+    DATETIME_PATTERN = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}")
+
+    def __post_init__(self) -> None:
+        """初期化後処理
+
+        バリデーションのみ
+        """
+        self._is_valid(self.COLS)
+
+    def __len__(self) -> int:
+        return self.id_list.__len__()
+
+    def __iter__(self) -> Iterator["VideoBatchRow"]:
+        return (VideoBatchRow(self, index) for index in range(len(self)))
+
+    def __getitem__(self, index: int) -> "VideoBatchRow":
+        if not isinstance(index, int):
+            raise ValueError("index must be int.")
+        if index < 0:
+            index = index + len(self)
+        if not (0 <= index < len(self)):
+            raise IndexError("VideoBatch index out of range.")
+        return VideoBatchRow(self, index)
+
+    def _column(self, col: str) -> tuple:
+        return getattr(self, f"{col}_list")
+
+    def _is_valid(self, cols: tuple[str, ...]) -> bool:
+        """cols で指定された列のバリデーション
+
+        Args:
+            cols (tuple[str, ...]): 確認する列名
+
+        Raises:
+            ValueError: 列の型や値が不正な場合、列の大きさが異なる場合
+
+        Returns:
+            bool: 指定された列が全て正常ならTrue
+        """
+        num = len(self.id_list) if isinstance(self.id_list, tuple) else -1
+        for col in cols:
+            column = self._column(col)
+            if not isinstance(column, tuple):
+                raise ValueError(f"{col}_list must be tuple.")
+            if len(column) != num:
+                raise ValueError("There are different size (*_list).")
+            if not column:
+                continue
+
+            match col:
+                case "id":
+                    if not all(type(v) is int for v in column):
+                        raise ValueError("id_list element must be int.")
+                    if min(column) < 0:
+                        raise ValueError("id_list element must be >= 0.")
+                case "status":
+                    if not all(isinstance(v, Status) for v in column):
+                        raise ValueError("status_list element must be Status.")
+                case _:
+                    if not all(isinstance(v, str) for v in column):
+                        raise ValueError(f"{col}_list element must be str.")
+
+            match col:
+                case "video_id":
+                    pattern = self.VIDEO_ID_PATTERN
+                case "video_url":
+                    pattern = self.VIDEO_URL_PATTERN
+                case "uploaded_at" | "registered_at" | "created_at":
+                    pattern = self.DATETIME_PATTERN
+                case "title" | "username":
+                    if "" in column:
+                        raise ValueError(f"{col}_list include empty string.")
+                    continue
+                case "mylist_url":
+                    # マイリストURLは種類が少ないため重複を除いて確認する
+                    for mylist_url in set(column):
+                        if MylistURLFactory.create(mylist_url).non_query_url != mylist_url:
+                            raise ValueError(f"{mylist_url} is not non query MylistURL.")
+                    continue
+                case _:
+                    continue
+            if not all(map(pattern.fullmatch, column)):
+                raise ValueError(f"{col}_list include invalid value.")
+        return True
+
+    def _replace_columns(self, **columns: tuple) -> Self:
+        """指定した列のみを差し替えたインスタンスを返す
+
+        バリデーションは差し替えた列のみ行う
+        """
+        instance = copy.copy(self)
+        for col, column in columns.items():
+            if col not in self.COLS:
+                raise ValueError(f"'{col}' is not VideoBatch's column.")
+            object.__setattr__(instance, f"{col}_list", column)
+        instance._is_valid(tuple(columns.keys()))
+        return instance
+
+    def replace_status_list(self, status_list: list[Status]) -> Self:
+        """状況の列を差し替えたインスタンスを返す
+
+        Args:
+            status_list (list[Status]): 新しい状況の列
+
+        Returns:
+            Self: 状況の列のみが異なる VideoBatch
+        """
+        return self._replace_columns(status=tuple(status_list))
+
+    def iter_dict(self) -> Iterator[dict[str, str]]:
+        """各行を TypedVideo.to_dict() と同じ形式の辞書で返すジェネレータ"""
+        zipped_list = zip(
+            self.id_list,
+            self.video_id_list,
+            self.title_list,
+            self.username_list,
+            self.status_list,
+            self.uploaded_at_list,
+            self.registered_at_list,
+            self.video_url_list,
+            self.mylist_url_list,
+            self.created_at_list,
+        )
+        for (
+            row_id,
+            video_id,
+            title,
+            username,
+            status,
+            uploaded_at,
+            registered_at,
+            video_url,
+            mylist_url,
+            created_at,
+        ) in zipped_list:
+            yield {
+                "id": str(row_id),
+                "video_id": video_id,
+                "title": title,
+                "username": username,
+                "status": status.value,
+                "uploaded_at": uploaded_at,
+                "registered_at": registered_at,
+                "video_url": video_url,
+                "mylist_url": mylist_url,
+                "created_at": created_at,
+            }
+
+    def to_dict_list(self) -> list[dict[str, str]]:
+        """各行を TypedVideo.to_dict() と同じ形式の辞書のリストで返す"""
+        return list(self.iter_dict())
+
+    def to_typed_video_list(self) -> TypedVideoList:
+        """TypedVideoList に変換する"""
+        return TypedVideoList.create([row.to_typed_video() for row in self])
+
+    @classmethod
+    def create(cls, video_dict_list: list[dict[str, Any]]) -> Self:
+        """動画を表す dict のリストから VideoBatch を作成する
+
+        Args:
+            video_dict_list (list[dict[str, Any]]):
+                TypedVideo.create() の引数と同じ形式の dict のリスト
+                mylist_info_db.select_from_mylist_url() 系の返り値を想定
+
+        Returns:
+            Self: VideoBatch インスタンス
+        """
+        if not isinstance(video_dict_list, list):
+            raise ValueError("video_dict_list must be list.")
+
+        columns = {col: tuple(d[col] for d in video_dict_list) for col in cls.COLS}
+        columns["id"] = tuple(int(v) for v in columns["id"])
+        columns["status"] = tuple(Status(v) for v in columns["status"])
+
+        # URL はクエリなしの形式に揃える
+        video_url_pattern = cls.VIDEO_URL_PATTERN
+        columns["video_url"] = tuple(
+            v if isinstance(v, str) and video_url_pattern.fullmatch(v) else VideoURL.create(v).non_query_url
+            for v in columns["video_url"]
+        )
+        mylist_url_dict = {v: MylistURLFactory.create(v).non_query_url for v in set(columns["mylist_url"])}
+        columns["mylist_url"] = tuple(mylist_url_dict[v] for v in columns["mylist_url"])
+
+        return cls(*[columns[col] for col in cls.COLS])
+
+    @classmethod
+    def from_typed_video_list(cls, typed_video_list: TypedVideoList | list[TypedVideo]) -> Self:
+        """TypedVideoList から VideoBatch を作成する"""
+        return cls.create([typed_video.to_dict() for typed_video in typed_video_list])
+
+
+@dataclass(frozen=True, slots=True)
+class VideoBatchRow:
+    """VideoBatch の1行を参照するビュー
+
+    値は保持せず、参照先の VideoBatch の列から都度取り出す
+    """
+
+    batch: VideoBatch
+    index: int
+
+    @property
+    def id(self) -> int:
+        return self.batch.id_list[self.index]
+
+    @property
+    def video_id(self) -> str:
+        return self.batch.video_id_list[self.index]
+
+    @property
+    def title(self) -> str:
+        return self.batch.title_list[self.index]
+
+    @property
+    def username(self) -> str:
+        return self.batch.username_list[self.index]
+
+    @property
+    def status(self) -> Status:
+        return self.batch.status_list[self.index]
+
+    @property
+    def uploaded_at(self) -> str:
+        return self.batch.uploaded_at_list[self.index]
+
+    @property
+    def registered_at(self) -> str:
+        return self.batch.registered_at_list[self.index]
+
+    @property
+    def video_url(self) -> str:
+        return self.batch.video_url_list[self.index]
+
+    @property
+    def mylist_url(self) -> str:
+        return self.batch.mylist_url_list[self.index]
+
+    @property
+    def created_at(self) -> str:
+        return self.batch.created_at_list[self.index]
+
+    def to_dict(self) -> dict[str, str]:
+        """TypedVideo.to_dict() と同じ形式の辞書を返す"""
+        return {
+            "id": str(self.id),
+            "video_id": self.video_id,
+            "title": self.title,
+            "username": self.username,
+            "status": self.status.value,
+            "uploaded_at": self.uploaded_at,
+            "registered_at": self.registered_at,
+            "video_url": self.video_url,
+            "mylist_url": self.mylist_url,
+            "created_at": self.created_at,
+        }
+
+    def to_typed_video(self) -> TypedVideo:
+        """TypedVideo に変換する"""
+        return TypedVideo(
+            VideoRowIndex(self.id),
+            Videoid(self.video_id),
+            Title(self.title),
+            Username(self.username),
+            self.status,
+            UploadedAt(self.uploaded_at),
+            RegisteredAt(self.registered_at),
+            VideoURL.create(self.video_url),
+            MylistURLFactory.create(self.mylist_url),
+            CreatedAt(self.created_at),
+        )
+
+
+if __name__ == "__main__":
+    video_batch = VideoBatch.create([
+        {
+            "id": i,
+            "video_id": f"sm1234567{i}",
+            "title": f"title_{i}",
+            "username": f"username_{i}",
+            "status": "未視聴",
+            "uploaded_at": f"2023-12-22 12:34:5{i}",
+            "registered_at": f"2023-12-22 12:34:5{i}",
+            "video_url": f"https://www.nicovideo.jp/watch/sm1234567{i}",
+            "mylist_url": "https://www.nicovideo.jp/user/10000001/video",
+            "created_at": f"2023-12-22 12:34:5{i}",
+        }
+        for i in range(1, 4)
+    ])
+    print(video_batch[0].to_typed_video())
+    print(video_batch.replace_status_list([Status.watched] * len(video_batch)).to_dict_list())
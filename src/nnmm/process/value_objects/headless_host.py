@@ -0,0 +1,50 @@
+from typing import TYPE_CHECKING
+
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+
+if TYPE_CHECKING:
+    from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+    from nnmm.process.update_mylist.progress_sink import ProgressSink
+
+
+class HeadlessHost:
+    """GUIを伴わずに更新処理を行う際に、メインウィンドウの代わりとして ProcessInfo.window に渡す
+
+    Notes:
+        更新処理のエンジン部分（Fetcher, DatabaseUpdater）がメインウィンドウから参照する属性のみを持つ
+        Qt に依存しないため、nnmm.cli から用いる
+
+    Attributes:
+        mylist_db (MylistDBController): マイリスト情報DB
+        mylist_info_db (MylistInfoDBController): 動画情報DB
+        progress_bus (ProgressSink | None): 進捗イベントの受け取り先
+        circuit_breaker (MylistCircuitBreaker | None): 失敗し続けるマイリストの fetch を止めるサーキットブレーカー
+    """
+
+    mylist_db: MylistDBController
+    mylist_info_db: MylistInfoDBController
+    progress_bus: "ProgressSink | None"
+    circuit_breaker: "MylistCircuitBreaker | None"
+
+    def __init__(
+        self,
+        mylist_db: MylistDBController,
+        mylist_info_db: MylistInfoDBController,
+        progress_bus: "ProgressSink | None" = None,
+        circuit_breaker: "MylistCircuitBreaker | None" = None,
+    ) -> None:
+        if not isinstance(mylist_db, MylistDBController):
+            raise ValueError("mylist_db must be MylistDBController.")
+        if not isinstance(mylist_info_db, MylistInfoDBController):
+            raise ValueError("mylist_info_db must be MylistInfoDBController.")
+        self.mylist_db = mylist_db
+        self.mylist_info_db = mylist_info_db
+        self.progress_bus = progress_bus
+        self.circuit_breaker = circuit_breaker
+
+
+if __name__ == "__main__":
+    db_fullpath = ":memory:"
+    host = HeadlessHost(MylistDBController(db_fullpath), MylistInfoDBController(db_fullpath))
+    print(host.progress_bus, host.circuit_breaker)
@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+from typing import ClassVar, Self
+
+import orjson
+
+
+@dataclass(frozen=True)
+class PaneSnapshot:
+    """最後に表示していたマイリストペインとテーブルペインの内容
+
+    Notes:
+        起動時に DB を問い合わせる前に表示するためのもので、表示内容をそのまま文字列で保持する
+        表示後に DB の内容で表示し直すため、DB と食い違っていてもよい
+
+    Attributes:
+        showname_list (tuple[str, ...]): マイリストペインの表示名, 新着マイリストは新着マーク付き
+        include_new_index_list (tuple[int, ...]): 新着マイリストのインデックス
+        selected_index (int): 選択中のマイリストのインデックス
+        mylist_url (str): テーブルペインに表示していたマイリストのURL, 空文字列なら未表示
+        table_row_list (tuple[tuple[str, ...], ...]): テーブルペインの各行, 先頭から MAX_TABLE_ROW_NUM 行まで
+    """
+
+    showname_list: tuple[str, ...]
+    include_new_index_list: tuple[int, ...]
+    selected_index: int
+    mylist_url: str
+    table_row_list: tuple[tuple[str, ...], ...]
+
+    # 保存形式のバージョン, 形式を変えた場合は上げて古いスナップショットを読み捨てる
+    VERSION: ClassVar[int] = 1
+    # スナップショットを小さく保つため、テーブルペインの行は先頭からこの数まで保持する
+    MAX_TABLE_ROW_NUM: ClassVar[int] = 1000
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.showname_list, tuple):
+            raise ValueError("showname_list must be tuple.")
+        if not all(isinstance(s, str) for s in self.showname_list):
+            raise ValueError("showname_list element must be str.")
+        if not isinstance(self.include_new_index_list, tuple):
+            raise ValueError("include_new_index_list must be tuple.")
+        if not all(isinstance(i, int) and 0 <= i < len(self.showname_list) for i in self.include_new_index_list):
+            raise ValueError("include_new_index_list element must be index of showname_list.")
+        if not isinstance(self.selected_index, int) or self.selected_index < 0:
+            raise ValueError("selected_index must be int and >= 0.")
+        if not isinstance(self.mylist_url, str):
+            raise ValueError("mylist_url must be str.")
+        if not isinstance(self.table_row_list, tuple):
+            raise ValueError("table_row_list must be tuple.")
+        if len(self.table_row_list) > self.MAX_TABLE_ROW_NUM:
+            raise ValueError(f"table_row_list length must be <= {self.MAX_TABLE_ROW_NUM}.")
+        for row in self.table_row_list:
+            if not isinstance(row, tuple) or not all(isinstance(s, str) for s in row):
+                raise ValueError("table_row_list element must be tuple of str.")
+
+    def to_bytes(self) -> bytes:
+        """JSON にシリアライズする"""
+        return orjson.dumps({
+            "version": self.VERSION,
+            "showname_list": self.showname_list,
+            "include_new_index_list": self.include_new_index_list,
+            "selected_index": self.selected_index,
+            "mylist_url": self.mylist_url,
+            "table_row_list": self.table_row_list,
+        })
+
+    @classmethod
+    def create(
+        cls,
+        showname_list: list[str],
+        include_new_index_list: list[int],
+        selected_index: int,
+        mylist_url: str,
+        table_row_list: list[list[str]],
+    ) -> Self:
+        """画面から読み取った内容からインスタンスを作成する
+
+        Notes:
+            テーブルペインの行は先頭から MAX_TABLE_ROW_NUM 行までとする
+
+        Raises:
+            ValueError: 引数が不正な場合
+
+        Returns:
+            Self: PaneSnapshot インスタンス
+        """
+        if not isinstance(showname_list, list | tuple) or not isinstance(include_new_index_list, list | tuple):
+            raise ValueError("showname_list and include_new_index_list must be list.")
+        if not isinstance(table_row_list, list | tuple):
+            raise ValueError("table_row_list must be list.")
+        if not all(isinstance(row, list | tuple) for row in table_row_list):
+            raise ValueError("table_row_list element must be list.")
+        return cls(
+            tuple(showname_list),
+            tuple(include_new_index_list),
+            selected_index,
+            mylist_url,
+            tuple(tuple(row) for row in table_row_list[: cls.MAX_TABLE_ROW_NUM]),
+        )
+
+    @classmethod
+    def from_bytes(cls, snapshot_bytes: bytes) -> Self:
+        """to_bytes() でシリアライズした JSON からインスタンスを作成する
+
+        Raises:
+            ValueError: JSON として不正, 保存形式のバージョンが異なる, 内容が不正な場合
+
+        Returns:
+            Self: PaneSnapshot インスタンス
+        """
+        try:
+            snapshot_dict = orjson.loads(snapshot_bytes)
+        except orjson.JSONDecodeError as e:
+            raise ValueError("snapshot is invalid json.") from e
+        match snapshot_dict:
+            case {
+                "version": cls.VERSION,
+                "showname_list": list(showname_list),
+                "include_new_index_list": list(include_new_index_list),
+                "selected_index": selected_index,
+                "mylist_url": mylist_url,
+                "table_row_list": list(table_row_list),
+            }:
+                return cls.create(showname_list, include_new_index_list, selected_index, mylist_url, table_row_list)
+            case _:
+                raise ValueError("snapshot is invalid structure or version.")
+
+
+if __name__ == "__main__":
+    snapshot = PaneSnapshot.create(
+        ["投稿者1さんの投稿動画", "*:投稿者2さんの投稿動画"],
+        [1],
+        1,
+        "https://www.nicovideo.jp/user/2222222/video",
+        [["1", "sm12345678", "動画タイトル1", "投稿者2", "未視聴", "", "", "", ""]],
+    )
+    print(snapshot.to_bytes().decode())
+    print(PaneSnapshot.from_bytes(snapshot.to_bytes()) == snapshot)
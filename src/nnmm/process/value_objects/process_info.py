@@ -1,27 +1,38 @@
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Self
 
-from PySide6.QtWidgets import QDialog
-
 if TYPE_CHECKING:
+    from PySide6.QtWidgets import QDialog
+
     from nnmm.main_window import MainWindow
 
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.value_objects.headless_host import HeadlessHost
 
 
 @dataclass(frozen=True)
 class ProcessInfo:
+    """処理の呼び出し元の情報
+
+    Notes:
+        window はGUIではメインウィンドウ(QDialog)、GUIを伴わない nnmm.cli では HeadlessHost となる
+        nnmm.cli から Qt を import しないよう、QDialog は window が HeadlessHost でない場合のみ import する
+    """
+
     name: str
-    window: QDialog
+    window: "QDialog | HeadlessHost"
     mylist_db: MylistDBController
     mylist_info_db: MylistInfoDBController
 
     def __post_init__(self) -> None:
         if not isinstance(self.name, str):
             raise ValueError("name must be str.")
-        if not isinstance(self.window, QDialog):
-            raise ValueError("window must be QDialog.")
+        if not isinstance(self.window, HeadlessHost):
+            from PySide6.QtWidgets import QDialog
+
+            if not isinstance(self.window, QDialog):
+                raise ValueError("window must be QDialog or HeadlessHost.")
         if not isinstance(self.mylist_db, MylistDBController):
             raise ValueError("mylist_db must be MylistDBController.")
         if not isinstance(self.mylist_info_db, MylistInfoDBController):
@@ -0,0 +1,168 @@
+from sqlalchemy import desc
+from sqlalchemy.orm import sessionmaker
+
+from nnmm.db_controller_base import DBControllerBase
+from nnmm.model import MylistFetchLatency, UpdateRun
+
+
+class UpdateRunDBController(DBControllerBase):
+    # 保持する更新履歴の件数の上限, 超えた分は古いものから削除する
+    MAX_RUN_NUM = 1000
+
+    def __init__(self, db_fullpath: str = "NNMM_DB.db"):
+        super().__init__(db_fullpath)
+
+    def insert(self, run: dict, mylist_fetch_list: list[dict]) -> int:
+        """UpdateRunに更新履歴を1件INSERTし、MylistFetchLatencyをマイリストごとにUPSERTする
+
+        Notes:
+            更新処理1回分の結果を、更新処理の終了後に1トランザクションでまとめて書き込む
+            MylistFetchLatency の fetched_at, latency_ms, is_success は上書きし、fetch_count, failed_count は加算する
+            MAX_RUN_NUM を超えた古い更新履歴は削除する
+
+        Args:
+            run (dict): UpdateRun の列をキーとする辞書, UpdateRunRecord.to_dict() の返り値
+            mylist_fetch_list (list[dict]): MylistFetchLatency の列をキーとする辞書のリスト
+                                            MylistFetchRecord.to_dict() の返り値のリスト
+
+        Returns:
+            int: 成功時INSERTした更新履歴のid, 失敗時-1
+        """
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        session = Session()
+        try:
+            r = UpdateRun(
+                run.get("kind"),
+                run.get("version"),
+                run.get("started_at"),
+                run.get("finished_at"),
+                run.get("elapsed_sec"),
+                run.get("target_num"),
+                run.get("success_num"),
+                run.get("failed_num"),
+                run.get("cancelled_num"),
+                run.get("new_video_num"),
+                run.get("bytes"),
+                run.get("stage_total_ms", {}),
+            )
+            session.add(r)
+
+            # 既存のレコードは1回のSELECTでまとめて取得する
+            mylist_url_list = [m.get("mylist_url") for m in mylist_fetch_list]
+            q = session.query(MylistFetchLatency).filter(MylistFetchLatency.mylist_url.in_(mylist_url_list))
+            prev_dict = {p.mylist_url: p for p in q.all()}
+            for m in mylist_fetch_list:
+                failed_num = 0 if m.get("is_success") else 1
+                p = prev_dict.get(m.get("mylist_url"))
+                if p is None:
+                    # INSERT
+                    p = MylistFetchLatency(
+                        m.get("mylist_url"),
+                        m.get("fetched_at"),
+                        m.get("latency_ms"),
+                        m.get("is_success"),
+                        1,
+                        failed_num,
+                    )
+                    session.add(p)
+                    prev_dict[p.mylist_url] = p
+                else:
+                    # UPDATE
+                    p.fetched_at = m.get("fetched_at")
+                    p.latency_ms = m.get("latency_ms")
+                    p.is_success = m.get("is_success")
+                    p.fetch_count = (p.fetch_count or 0) + 1
+                    p.failed_count = (p.failed_count or 0) + failed_num
+
+            session.flush()
+            res = r.id
+
+            # 古い更新履歴を削除する
+            oldest_id = (
+                session.query(UpdateRun.id).order_by(desc(UpdateRun.id)).offset(self.MAX_RUN_NUM).limit(1).scalar()
+            )
+            if oldest_id is not None:
+                session.query(UpdateRun).filter(UpdateRun.id <= oldest_id).delete()
+
+            session.commit()
+        except Exception:
+            session.rollback()
+            res = -1
+        finally:
+            session.close()
+        return res
+
+    def select(self, limit: int | None = None) -> list[dict]:
+        """UpdateRunから新しい順にSELECTする
+
+        Note:
+            "select * from UpdateRun order by id desc [limit {limit}]"
+
+        Args:
+            limit (int | None): 取得レコード数上限, Noneなら全て
+
+        Returns:
+            list[dict]: SELECTしたレコードの辞書リスト
+        """
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        session = Session()
+
+        q = session.query(UpdateRun).order_by(desc(UpdateRun.id))
+        if limit is not None:
+            q = q.limit(limit)
+        res_dict = [r.to_dict() for r in q.all()]
+
+        session.close()
+        return res_dict
+
+    def select_fetch_latency(self) -> list[dict]:
+        """MylistFetchLatencyから fetch の所要時間の降順にSELECTする
+
+        Note:
+            "select * from MylistFetchLatency order by latency_ms desc"
+            latency_ms が NULL のレコードは最後に並ぶ
+
+        Returns:
+            list[dict]: SELECTしたレコードの辞書リスト
+        """
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        session = Session()
+
+        res = session.query(MylistFetchLatency).order_by(desc(MylistFetchLatency.latency_ms)).all()
+        res_dict = [r.to_dict() for r in res]
+
+        session.close()
+        return res_dict
+
+
+if __name__ == "__main__":
+    db_fullpath = ":memory:"
+    update_run_db = UpdateRunDBController(db_fullpath=str(db_fullpath))
+
+    res = update_run_db.insert(
+        {
+            "kind": "UpdateMylist Every",
+            "version": "2.1.0",
+            "started_at": "2023-12-22 12:34:00",
+            "finished_at": "2023-12-22 12:34:56",
+            "elapsed_sec": 56.0,
+            "target_num": 1,
+            "success_num": 1,
+            "failed_num": 0,
+            "cancelled_num": 0,
+            "new_video_num": 2,
+            "bytes": 1024,
+            "stage_total_ms": {"page_request": 123.4},
+        },
+        [
+            {
+                "mylist_url": "https://www.nicovideo.jp/user/11111111/video",
+                "fetched_at": "2023-12-22 12:34:56",
+                "latency_ms": 123.4,
+                "is_success": True,
+            }
+        ],
+    )
+    print(res)
+    print(update_run_db.select())
+    print(update_run_db.select_fetch_latency())
@@ -0,0 +1,397 @@
+import enum
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging import INFO, getLogger
+from logging.handlers import QueueHandler
+from pathlib import Path
+from typing import Iterator
+
+import orjson
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class SpanStage(enum.Enum):
+    """マイリスト1件の更新処理の段階, レポートはこの順に並べる"""
+
+    cookie_load = "cookie_load"
+    page_request = "page_request"
+    parse = "parse"
+    api_lookup = "api_lookup"
+    merge = "merge"
+    diff = "diff"
+    db_write = "db_write"
+
+    @property
+    def is_fetch(self) -> bool:
+        """fetch の段階（DB更新より前の段階）かどうか"""
+        return self not in (SpanStage.diff, SpanStage.db_write)
+
+
+@dataclass(frozen=True)
+class Span:
+    """更新処理の1段階分の計測結果
+
+    Attributes:
+        stage (SpanStage): 段階
+        mylist_url (str): 対象マイリストURL
+        start (float): UpdateTrace の作成からの開始時刻[sec]
+        duration (float): 所要時間[sec]
+        thread_id (int): 計測したスレッドのID
+        thread_name (str): 計測したスレッドの名前
+        attrs (dict): 付随情報, 受信バイト数(bytes), ステータスコード(status_code), リトライ回数(retry_count) など
+    """
+
+    stage: SpanStage
+    mylist_url: str
+    start: float
+    duration: float
+    thread_id: int
+    thread_name: str
+    attrs: dict = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.stage, SpanStage):
+            raise ValueError("stage must be SpanStage.")
+        if not isinstance(self.mylist_url, str):
+            raise ValueError("mylist_url must be str.")
+        if not isinstance(self.start, float) or not isinstance(self.duration, float) or self.duration < 0:
+            raise ValueError("start and duration must be float, duration must be >= 0.")
+        if not isinstance(self.attrs, dict):
+            raise ValueError("attrs must be dict.")
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.stage.value,
+            "mylist_url": self.mylist_url,
+            "start_ms": self.start * 1000,
+            "duration_ms": self.duration * 1000,
+            "thread_id": self.thread_id,
+            "thread_name": self.thread_name,
+            "attrs": self.attrs,
+        }
+
+
+class UpdateTrace:
+    """1回の更新処理で、マイリストごとの各段階の所要時間をスパンとして記録する
+
+    Notes:
+        スパンの記録は bind() でこのインスタンスと対象マイリストをコンテキストに設定した上で、span() で行う
+        fetch, DB更新の各ワーカースレッドから呼び出されるため、記録はロックで保護する
+        記録したスパンは段階ごとに集計（p50/p95/max など）したレポートと、
+        chrome://tracing や Perfetto で表示できる Chrome trace 形式に書き出せる
+
+    Attributes:
+        started_at (str): 作成日時 "%Y-%m-%d %H:%M:%S" 形式
+        elapsed (float | None): finish() までの経過時間[sec], finish() 前はNone
+    """
+
+    PERCENTILE_LIST = (50, 95)
+    SLOWEST_MYLIST_NUM = 10
+    REPORT_FILE_NAME = "update_report.json"
+    CHROME_TRACE_FILE_NAME = "update_trace.json"
+
+    started_at: str
+    elapsed: float | None
+
+    def __init__(self) -> None:
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.elapsed = None
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._span_list: list[Span] = []
+
+    @property
+    def span_list(self) -> list[Span]:
+        with self._lock:
+            return list(self._span_list)
+
+    def now(self) -> float:
+        """作成時からの経過時間[sec]"""
+        return time.perf_counter() - self._origin
+
+    def record(self, stage: SpanStage, mylist_url: str, start: float, end: float, attrs: dict | None = None) -> Span:
+        """スパンを1件記録する
+
+        Args:
+            stage (SpanStage): 段階
+            mylist_url (str): 対象マイリストURL
+            start (float): now() で得た開始時刻[sec]
+            end (float): now() で得た終了時刻[sec]
+            attrs (dict | None): 付随情報
+
+        Returns:
+            Span: 記録したスパン
+        """
+        current_thread = threading.current_thread()
+        span = Span(
+            stage,
+            mylist_url,
+            start,
+            max(0.0, end - start),
+            current_thread.ident or 0,
+            current_thread.name,
+            attrs or {},
+        )
+        with self._lock:
+            self._span_list.append(span)
+        return span
+
+    def finish(self) -> None:
+        """更新処理の終了時に呼び出し、全体の経過時間を記録する"""
+        self.elapsed = self.now()
+
+    @staticmethod
+    def percentile(sorted_value_list: list[float], p: int) -> float:
+        """昇順に並んだ値の p パーセンタイルを最近接順位法で求める, 空なら 0.0"""
+        if not sorted_value_list:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * len(sorted_value_list)))
+        return sorted_value_list[rank - 1]
+
+    def summarize(self) -> dict[str, dict]:
+        """段階ごとに所要時間の分布と付随情報を集計する
+
+        Returns:
+            dict[str, dict]: {段階: 集計結果}, 記録のない段階は含めない
+                             集計結果は件数, エラー件数, 所要時間の合計/p50/p95/最大[ms],
+                             受信バイト数とリトライ回数の合計, ステータスコードごとの件数
+        """
+        span_dict: dict[SpanStage, list[Span]] = defaultdict(list)
+        for span in self.span_list:
+            span_dict[span.stage].append(span)
+
+        summary = {}
+        for stage in SpanStage:
+            span_list = span_dict.get(stage, [])
+            if not span_list:
+                continue
+            duration_list = sorted(span.duration * 1000 for span in span_list)
+            status_code_counter = Counter(
+                str(span.attrs["status_code"]) for span in span_list if "status_code" in span.attrs
+            )
+            stage_summary = {
+                "count": len(span_list),
+                "error_count": sum(1 for span in span_list if "error" in span.attrs),
+                "total_ms": sum(duration_list),
+            }
+            for p in self.PERCENTILE_LIST:
+                stage_summary[f"p{p}_ms"] = self.percentile(duration_list, p)
+            stage_summary["max_ms"] = duration_list[-1]
+            stage_summary["bytes"] = sum(span.attrs.get("bytes", 0) for span in span_list)
+            stage_summary["retry_count"] = sum(span.attrs.get("retry_count", 0) for span in span_list)
+            stage_summary["status_codes"] = dict(sorted(status_code_counter.items()))
+            summary[stage.value] = stage_summary
+        return summary
+
+    def slowest_mylists(self) -> list[dict]:
+        """スパンの所要時間の合計が大きいマイリストを SLOWEST_MYLIST_NUM 件返す
+
+        Returns:
+            list[dict]: 合計の降順の {"mylist_url", "total_ms", "stages": {段階: 所要時間の合計[ms]}} のリスト
+        """
+        stage_ms_dict: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for span in self.span_list:
+            stage_ms_dict[span.mylist_url][span.stage.value] += span.duration * 1000
+        mylist_list = [
+            {"mylist_url": mylist_url, "total_ms": sum(stage_ms.values()), "stages": dict(stage_ms)}
+            for mylist_url, stage_ms in stage_ms_dict.items()
+        ]
+        mylist_list.sort(key=lambda m: m["total_ms"], reverse=True)
+        return mylist_list[: self.SLOWEST_MYLIST_NUM]
+
+    def fetch_latency_dict(self) -> dict[str, float]:
+        """マイリストごとの fetch の所要時間を返す
+
+        Notes:
+            fetch の段階のスパンのうち、最初の開始から最後の終了までの経過時間とする
+            動画情報APIの取得などは並行して行われるため、スパンの所要時間の合計とはしない
+
+        Returns:
+            dict[str, float]: {マイリストURL: fetch の所要時間[ms]}, fetch の段階のスパンがないマイリストは含めない
+        """
+        range_dict: dict[str, tuple[float, float]] = {}
+        for span in self.span_list:
+            if not span.stage.is_fetch:
+                continue
+            end = span.start + span.duration
+            start_min, end_max = range_dict.get(span.mylist_url, (span.start, end))
+            range_dict[span.mylist_url] = (min(start_min, span.start), max(end_max, end))
+        return {mylist_url: (end - start) * 1000 for mylist_url, (start, end) in range_dict.items()}
+
+    def sum_attr(self, key: str) -> int:
+        """全スパンの付随情報 key の値の合計を返す, 受信バイト数(bytes)や新着動画数(new_video_num)の集計に用いる"""
+        return sum(span.attrs.get(key, 0) for span in self.span_list)
+
+    def to_report(self) -> dict:
+        """集計結果をレポートとして返す"""
+        span_list = self.span_list
+        return {
+            "started_at": self.started_at,
+            "elapsed_sec": self.elapsed if self.elapsed is not None else self.now(),
+            "mylist_num": len({span.mylist_url for span in span_list}),
+            "span_num": len(span_list),
+            "stages": self.summarize(),
+            "slowest_mylists": self.slowest_mylists(),
+        }
+
+    def to_chrome_trace(self) -> dict:
+        """記録したスパンを Chrome trace 形式（Trace Event Format）で返す
+
+        Notes:
+            スパンは完了イベント(ph="X")とし、スレッドごとに1行で表示されるようスレッド名のメタデータを付ける
+        """
+        pid = os.getpid()
+        span_list = self.span_list
+        thread_name_dict = {span.thread_id: span.thread_name for span in span_list}
+        event_list = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}}
+            for thread_id, thread_name in thread_name_dict.items()
+        ]
+        for span in span_list:
+            event_list.append({
+                "name": span.stage.value,
+                "cat": "nnmm",
+                "ph": "X",
+                "ts": span.start * 1_000_000,
+                "dur": span.duration * 1_000_000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {"mylist_url": span.mylist_url} | span.attrs,
+            })
+        return {"traceEvents": event_list, "displayTimeUnit": "ms"}
+
+
+# 実行中のスレッド（タスク）で記録先となる UpdateTrace と対象マイリストURL
+# asyncio.run() で実行するタスクにはコンテキストがコピーされるため、fetch 中の非同期処理からも参照できる
+_binding: ContextVar[tuple[UpdateTrace, str] | None] = ContextVar("update_trace_binding", default=None)
+
+
+@contextmanager
+def bind(trace: UpdateTrace | None, mylist_url: str) -> Iterator[None]:
+    """with 句の中で span() を呼び出したときの記録先と対象マイリストURLを設定する
+
+    Args:
+        trace (UpdateTrace | None): 記録先, Noneなら記録しない
+        mylist_url (str): 対象マイリストURL
+    """
+    token = _binding.set(None if trace is None else (trace, mylist_url))
+    try:
+        yield
+    finally:
+        _binding.reset(token)
+
+
+def is_tracing() -> bool:
+    """bind() により記録先が設定されているかどうか"""
+    return _binding.get() is not None
+
+
+@contextmanager
+def span(stage: SpanStage, **attrs) -> Iterator[dict]:
+    """with 句の中の処理の所要時間を stage のスパンとして記録する
+
+    Notes:
+        with 句で受け取った辞書に付随情報を追加すると、スパンに記録される
+        例外が送出された場合は attrs["error"] に例外名を記録して、例外はそのまま送出する
+        記録先が設定されていない場合は何も記録しない
+
+    Args:
+        stage (SpanStage): 段階
+        attrs: 付随情報の初期値
+
+    Yields:
+        dict: 付随情報
+    """
+    binding = _binding.get()
+    if binding is None:
+        yield attrs
+        return
+    trace, mylist_url = binding
+    start = trace.now()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = type(e).__name__
+        raise
+    finally:
+        trace.record(stage, mylist_url, start, trace.now(), attrs)
+
+
+def get_log_dir() -> Path:
+    """ログファイルの出力先ディレクトリを返す
+
+    Notes:
+        rootロガーのファイルハンドラから求める, ハンドラが QueueListener に移されている場合はそちらから探す
+        ファイルに出力していない場合はカレントディレクトリとする
+    """
+    handler_list = list(logging.getLogger().handlers)
+    for handler in handler_list[:]:
+        listener = getattr(handler, "listener", None) if isinstance(handler, QueueHandler) else None
+        if listener is not None:
+            handler_list.extend(listener.handlers)
+    for handler in handler_list:
+        if isinstance(handler, logging.FileHandler):
+            return Path(handler.baseFilename).parent
+    return Path(".")
+
+
+def save_trace_report(trace: UpdateTrace, report_dir: Path, is_chrome_trace: bool = False) -> Path | None:
+    """更新処理のレポートを report_dir に書き出す
+
+    Notes:
+        前回の更新処理のレポートは上書きする
+        書き出しに失敗しても更新処理には影響させず、エラーログを出力するのみとする
+
+    Args:
+        trace (UpdateTrace): 記録済の UpdateTrace
+        report_dir (Path): 書き出し先ディレクトリ
+        is_chrome_trace (bool): レポートに加えて Chrome trace 形式のファイルも書き出すかどうか
+
+    Returns:
+        Path | None: 書き出したレポートのパス, 失敗時None
+    """
+    try:
+        report_dir = Path(report_dir)
+        report_dir.mkdir(parents=True, exist_ok=True)
+        report = trace.to_report()
+        report_path = report_dir / UpdateTrace.REPORT_FILE_NAME
+        report_path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        if is_chrome_trace:
+            (report_dir / UpdateTrace.CHROME_TRACE_FILE_NAME).write_bytes(orjson.dumps(trace.to_chrome_trace()))
+    except Exception as e:
+        logger.error(f"Update report save failed, {type(e).__name__}: {e}.")
+        return None
+
+    for stage, stage_summary in report["stages"].items():
+        logger.info(
+            f"{stage} : {stage_summary['count']} span(s), "
+            f"p50 {stage_summary['p50_ms']:.1f}ms, p95 {stage_summary['p95_ms']:.1f}ms, "
+            f"max {stage_summary['max_ms']:.1f}ms."
+        )
+    logger.info(f"Update report saved : {report_path}.")
+    return report_path
+
+
+if __name__ == "__main__":
+    trace = UpdateTrace()
+    for i in range(3):
+        mylist_url = f"https://www.nicovideo.jp/user/{10000000 + i}/video"
+        with bind(trace, mylist_url):
+            with span(SpanStage.page_request, url=mylist_url) as attrs:
+                time.sleep(0.01 * (i + 1))
+                attrs["status_code"] = 200
+                attrs["bytes"] = 1024
+            with span(SpanStage.parse):
+                time.sleep(0.001)
+    trace.finish()
+    print(orjson.dumps(trace.to_report(), option=orjson.OPT_INDENT_2).decode())
@@ -1,18 +1,24 @@
 import enum
+import importlib.metadata
 import logging
 import re
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice, repeat
 from logging import Logger, getLogger
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 
-from PySide6.QtGui import QTextCursor
-from PySide6.QtWidgets import QDialog, QInputDialog, QMessageBox, QTextEdit
-
-from nnmm.model import Mylist
+from nnmm.model import Mylist, interval_to_minutes
 from nnmm.mylist_db_controller import MylistDBController
 
-window_cache: QDialog = None
+# 更新処理のエンジン部分は Qt なしでも動かせるよう（nnmm.cli）、Qt はGUIから呼ばれる関数内で import する
+if TYPE_CHECKING:
+    from PySide6.QtWidgets import QDialog
+
+    from nnmm.log_sink import GuiLogSink
+
+window_cache: "QDialog" = None
 
 
 class CustomLogger(Logger):
@@ -30,23 +36,8 @@ class CustomLogger(Logger):
         if args:
             return
 
-        # window指定確認
-        global window_cache
-        window = window_cache
-        if not window:
-            # window_cacheがNoneなら何もせず終了
-            return
-        if not isinstance(window, QDialog):
-            # window_cacheがQDialogでないなら何もせず終了
-            return
-
         # GUI画面表示
-        textarea: QTextEdit = window.textarea
-        # old_text = textarea.document().toPlainText()
-        now_datetime = get_now_datetime()
-        textarea.append(f"{now_datetime} {msg}")
-        textarea.moveCursor(QTextCursor.MoveOperation.End)
-        textarea.update()
+        self._put_gui_log(msg)
 
     def error(self, msg: str, *args, **kwargs):
         # コンソールとファイル出力
@@ -59,24 +50,30 @@ class CustomLogger(Logger):
         if args:
             return
 
+        # GUI画面表示
+        self._put_gui_log(msg)
+
+    def _put_gui_log(self, msg: str) -> None:
+        """GUIのログタブに表示する行をログシンクに積む
+
+        ワーカースレッドからも呼ばれるため、ここではウィジェットを操作しない
+        実際の追記は GuiLogSink がGUIスレッドでまとめて行う
+        """
         # window指定確認
         global window_cache
         window = window_cache
         if not window:
             # window_cacheがNoneなら何もせず終了
             return
+        from PySide6.QtWidgets import QDialog
+
         if not isinstance(window, QDialog):
             # window_cacheがQDialogでないなら何もせず終了
             return
 
-        # GUI画面表示
-        textarea: QTextEdit = window.textarea
-        # old_text = textarea.document().toPlainText()
+        log_sink: "GuiLogSink" = window.log_sink
         now_datetime = get_now_datetime()
-        textarea.append(f"{now_datetime} {msg}")
-        textarea.moveCursor(QTextCursor.MoveOperation.End)
-        textarea.update()
-        # window.repaint()
+        log_sink.put(f"{now_datetime} {msg}")
 
 
 class Result(enum.Enum):
@@ -102,6 +99,38 @@ def log_suppress():
             getLogger(name).disabled = True
 
 
+def _iter_find_values(obj: Any, key: str, key_white_list: list[str], key_black_list: list[str]) -> Iterator[Any]:
+    """find_values の探索本体
+
+    再帰呼び出しと階層ごとのリスト生成を行わず、子要素のイテレータをスタックに積んで深さ優先で探索する
+    値は再帰版と同じ順序(行きがけ順)で返される
+    """
+    stack = []
+    if isinstance(obj, dict):
+        stack.append(iter(obj.items()))
+    elif isinstance(obj, list):
+        stack.append(zip(repeat(None), obj))
+
+    while stack:
+        for k, v in stack[-1]:
+            if k is not None:
+                if k == key:
+                    yield v
+                if key_white_list and (k not in key_white_list):
+                    continue
+                if k in key_black_list:
+                    continue
+            if isinstance(v, dict) and v:
+                stack.append(iter(v.items()))
+                break
+            if isinstance(v, list) and v:
+                stack.append(zip(repeat(None), v))
+                break
+        else:
+            # 現在の階層を探索し終えた
+            stack.pop()
+
+
 def find_values(
     obj: Any,
     key: str,
@@ -114,25 +143,12 @@ def find_values(
     if not key_black_list:
         key_black_list = []
 
-    def _inner_helper(inner_obj: Any, inner_key: str, inner_result: list) -> list:
-        if isinstance(inner_obj, dict) and (inner_dict := inner_obj):
-            for k, v in inner_dict.items():
-                if k == inner_key:
-                    inner_result.append(v)
-                if key_white_list and (k not in key_white_list):
-                    continue
-                if k in key_black_list:
-                    continue
-                inner_result.extend(_inner_helper(v, inner_key, []))
-        if isinstance(inner_obj, list) and (inner_list := inner_obj):
-            for element in inner_list:
-                inner_result.extend(_inner_helper(element, inner_key, []))
-        return inner_result
-
-    result = _inner_helper(obj, key, [])
+    values = _iter_find_values(obj, key, key_white_list, key_black_list)
     if not is_predict_one:
-        return result
+        return list(values)
 
+    # 一意に確定するかどうかは2つ目が見つかった時点で判定できる
+    result = list(islice(values, 2))
     if len(result) < 1:
         raise ValueError(f"Value of key='{key}' is not found.")
     if len(result) > 1:
@@ -140,6 +156,189 @@ def find_values(
     return result[0]
 
 
+class JsonPath:
+    """JSON(dict/list)から値を取り出すための事前コンパイル済キーパス
+
+    Notes:
+        パスは "." 区切りのキーの並びで表す
+            "data.detail.owner.user.nickname"
+        "*" は dict の全ての値、list の全ての要素にマッチする
+        パスの途中に list がある場合は暗黙にその全要素を辿る
+            "data.items.video.id" -> data.items の各要素の video.id
+        パスの終端に到達した値は list であっても展開せずにそのまま返す
+
+        find_values と異なり木全体を走査せず、パスに沿った要素のみを辿る
+        同じパス文字列の compile 結果はキャッシュして使い回す
+
+    Attributes:
+        path (str): パス文字列
+        keys (tuple[str, ...]): パスを "." で分割したキーの並び
+    """
+
+    WILDCARD = "*"
+
+    path: str
+    keys: tuple[str, ...]
+
+    _cache: dict[str, "JsonPath"] = {}
+
+    def __init__(self, path: str) -> None:
+        if not isinstance(path, str):
+            raise TypeError("path must be str.")
+        keys = tuple(path.split(".")) if path != "" else ()
+        if any(key == "" for key in keys):
+            raise ValueError(f"path is invalid: '{path}'.")
+        self.path = path
+        self.keys = keys
+
+    def __repr__(self) -> str:
+        return f"JsonPath('{self.path}')"
+
+    @classmethod
+    def compile(cls, path: "str | JsonPath") -> "JsonPath":
+        """パス文字列から JsonPath を作成する
+
+        Args:
+            path (str | JsonPath): パス文字列, JsonPath ならばそのまま返す
+
+        Returns:
+            JsonPath: コンパイル済のキーパス
+        """
+        if isinstance(path, JsonPath):
+            return path
+        if path not in cls._cache:
+            cls._cache[path] = JsonPath(path)
+        return cls._cache[path]
+
+    def iter_values(self, obj: Any) -> Iterator[Any]:
+        """パスにマッチする値を先頭から順に返すジェネレータ
+
+        Args:
+            obj (Any): 探索対象の dict/list
+
+        Yields:
+            Any: パスにマッチした値
+        """
+        keys = self.keys
+        keys_num = len(keys)
+        wildcard = self.WILDCARD
+        # (要素, 次に辿るキーの位置) を積むスタック, 子は逆順に積むことで先頭から順に取り出す
+        stack = [(obj, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth == keys_num:
+                yield node
+                continue
+            if isinstance(node, list):
+                if keys[depth] == wildcard:
+                    stack.extend((element, depth + 1) for element in reversed(node))
+                else:
+                    stack.extend((element, depth) for element in reversed(node))
+                continue
+            if not isinstance(node, dict):
+                continue
+            key = keys[depth]
+            if key == wildcard:
+                stack.extend((value, depth + 1) for value in reversed(node.values()))
+            elif key in node:
+                stack.append((node[key], depth + 1))
+
+    def find_all(self, obj: Any) -> list:
+        """パスにマッチする値を全てリストで返す"""
+        return list(self.iter_values(obj))
+
+    def find_one(self, obj: Any) -> Any:
+        """パスにマッチする唯一の値を返す
+
+        Raises:
+            ValueError: マッチする値が見つからなかった場合, 複数見つかった場合
+
+        Returns:
+            Any: パスにマッチした値
+        """
+        result = list(islice(self.iter_values(obj), 2))
+        if len(result) < 1:
+            raise ValueError(f"Value of path='{self.path}' is not found.")
+        if len(result) > 1:
+            raise ValueError(f"Value of path='{self.path}' are multiple found.")
+        return result[0]
+
+
+DESTINATION_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATETIME_CACHE_SIZE = 65536
+_EPOCH_DATETIME = datetime(1970, 1, 1)
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _normalize_datetime(src: str) -> str:
+    """ISO 8601 形式の日時文字列を DESTINATION_DATETIME_FORMAT 形式に変換する
+
+    Notes:
+        タイムゾーン指定は捨て、元の日時表記（現地時刻）をそのまま残す
+        定期更新では同じ動画の日時を何度も変換するため、変換結果はキャッシュする
+    """
+    return datetime.fromisoformat(src).strftime(DESTINATION_DATETIME_FORMAT)
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _datetime_to_epoch(dt_str: str) -> float:
+    """DESTINATION_DATETIME_FORMAT 形式の日時文字列をエポック秒に変換する
+
+    Notes:
+        タイムゾーンは考慮せず、日時表記のまま 1970-01-01 00:00:00 からの経過秒とする
+        get_now_epoch の返り値と比較するための値であり、UNIX時間とは一致しない
+    """
+    return (datetime.fromisoformat(dt_str) - _EPOCH_DATETIME).total_seconds()
+
+
+def normalize_datetime_list(src_list: Iterable[str]) -> list[str]:
+    """ISO 8601 形式の日時文字列の列をまとめて DESTINATION_DATETIME_FORMAT 形式に変換する
+
+    Notes:
+        "2023-12-26T12:34:56+09:00" -> "2023-12-26 12:34:56"
+        各パーサが動画ごとに strptime/strftime していた変換をこの関数に集約する
+
+    Args:
+        src_list (Iterable[str]): ISO 8601 形式の日時文字列の列
+
+    Raises:
+        TypeError: 要素が文字列でない場合
+        ValueError: 要素が ISO 8601 形式として解釈できない場合
+
+    Returns:
+        list[str]: DESTINATION_DATETIME_FORMAT 形式の日時文字列リスト
+    """
+    return [_normalize_datetime(src) for src in src_list]
+
+
+def datetime_to_epoch_list(dt_str_list: Iterable[str]) -> list[float]:
+    """DESTINATION_DATETIME_FORMAT 形式の日時文字列の列をまとめてエポック秒に変換する
+
+    Notes:
+        未来日判定などで日時を比較する場合は、この返り値を get_now_epoch の返り値と比較する
+
+    Args:
+        dt_str_list (Iterable[str]): DESTINATION_DATETIME_FORMAT 形式の日時文字列の列
+
+    Raises:
+        TypeError: 要素が文字列でない場合
+        ValueError: 要素が DESTINATION_DATETIME_FORMAT 形式でない場合
+
+    Returns:
+        list[float]: エポック秒リスト
+    """
+    return [_datetime_to_epoch(dt_str) for dt_str in dt_str_list]
+
+
+def get_now_epoch() -> float:
+    """現在日時を datetime_to_epoch_list と同じ基準のエポック秒で返す
+
+    Returns:
+        float: 現在日時のエポック秒
+    """
+    return (datetime.now() - _EPOCH_DATETIME).total_seconds()
+
+
 def save_mylist(mylist_db: MylistDBController, save_file_path: str) -> Result:
     """MylistDBの内容をcsvファイルに書き出す
 
@@ -152,7 +351,7 @@ def save_mylist(mylist_db: MylistDBController, save_file_path: str) -> Result:
     """
     sd_path = Path(save_file_path)
     records = mylist_db.select()
-    mylist_cols = Mylist.__table__.c.keys()
+    mylist_cols = Mylist.column_keys()
     param_list = []
 
     # BOMつきutf-8で書き込むことによりExcelでも開けるcsvを出力する
@@ -175,7 +374,7 @@ def load_mylist(mylist_db: MylistDBController, load_file_path: str) -> Result:
         Result: 成功時Result.success, データ不整合Result.failed
     """
     sd_path = Path(load_file_path)
-    mylist_cols = Mylist.__table__.c.keys()
+    mylist_cols = Mylist.column_keys()
 
     records = []
     lines = str(sd_path.read_text(encoding="utf_8_sig"))
@@ -228,6 +427,18 @@ def get_now_datetime() -> str:
     return dst
 
 
+def get_app_version() -> str:
+    """NNMM のバージョンを返す
+
+    Returns:
+        str: パッケージのバージョン, パッケージとしてインストールされていない場合は空文字列
+    """
+    try:
+        return importlib.metadata.version("nnmm")
+    except importlib.metadata.PackageNotFoundError:
+        return ""
+
+
 def is_mylist_include_new_video(table_list: list[list[str]]) -> bool | KeyError:
     """現在のテーブルリスト内に状況が未視聴のものが一つでも含まれているかを返す
 
@@ -282,26 +493,9 @@ def interval_translate(interval_str: str) -> int:
     Returns:
         int: 成功時 分[min]を表す数値、失敗時 -1
     """
-    pattern = "^([0-9]+)分$"
-    if re.findall(pattern, interval_str):
-        return int(re.findall(pattern, interval_str)[0])
-
-    pattern = "^([0-9]+)時間$"
-    if re.findall(pattern, interval_str):
-        return int(re.findall(pattern, interval_str)[0]) * 60
-
-    pattern = "^([0-9]+)日$"
-    if re.findall(pattern, interval_str):
-        return int(re.findall(pattern, interval_str)[0]) * 60 * 24
-
-    pattern = "^([0-9]+)週間$"
-    if re.findall(pattern, interval_str):
-        return int(re.findall(pattern, interval_str)[0]) * 60 * 24 * 7
-
-    pattern = "^([0-9]+)ヶ月$"
-    if re.findall(pattern, interval_str):
-        return int(re.findall(pattern, interval_str)[0]) * 60 * 24 * 31  # 月は正確ではない28,29,30,31
-    return -1
+    # DBの check_interval_minutes 列と同じ変換を用いる
+    minutes = interval_to_minutes(interval_str)
+    return minutes if minutes is not None else -1
 
 
 def popup_get_text(message: str, title: str = None) -> str | None:
@@ -319,6 +513,8 @@ def popup_get_text(message: str, title: str = None) -> str | None:
     if not title:
         title = " "
 
+    from PySide6.QtWidgets import QInputDialog
+
     input_text, result = QInputDialog.getText(None, title, message)
 
     if result:
@@ -339,6 +535,8 @@ def popup(message: str, title: str = None, ok_cancel: bool = False) -> str | Non
         str: 成功時 ユーザーが入力した "OK" または "Cancel"
              ok_cancelフラグを指定しない場合は None
     """
+    from PySide6.QtWidgets import QMessageBox
+
     msgbox = QMessageBox()
     msgbox.setText(message)
     if title:
@@ -1,15 +1,13 @@
 import asyncio
 import html
 from dataclasses import dataclass
-from datetime import datetime
 
 import orjson
 from bs4 import BeautifulSoup
 
-from nnmm.util import MylistType, find_values
+from nnmm.util import JsonPath, MylistType, normalize_datetime_list
 from nnmm.video_info_fetcher.parser_base import ParserBase
 from nnmm.video_info_fetcher.value_objects.myshowname import Myshowname
-from nnmm.video_info_fetcher.value_objects.registered_at import RegisteredAt
 from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
 from nnmm.video_info_fetcher.value_objects.showname import Showname
 from nnmm.video_info_fetcher.value_objects.title import Title
@@ -27,8 +25,10 @@ class MylistHtmlParser(ParserBase):
     soup: BeautifulSoup
     data: dict
 
-    SOURCE_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
-    DESTINATION_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+    # API返り値から各値を取り出すキーパス
+    USERNAME_PATH = JsonPath.compile("data.mylist.owner.name")
+    MYLIST_NAME_PATH = JsonPath.compile("data.mylist.name")
+    ITEMS_PATH = JsonPath.compile("data.mylist.items")
 
     def __init__(self, url: str, response_text: str) -> None:
         super().__init__(url, response_text)
@@ -40,13 +40,13 @@ class MylistHtmlParser(ParserBase):
 
     def _get_username(self) -> Username:
         """投稿者収集"""
-        username = find_values(self.data["data"]["mylist"]["owner"], "name", True, [], [])
+        username = self.USERNAME_PATH.find_one(self.data)
         return Username(username)
 
     def _get_showname_myshowname(self) -> tuple[Showname, Myshowname]:
         """マイリスト名収集"""
         # マイリスト情報
-        mylist_name = find_values(self.data, "name", True, ["data", "mylist"], [])
+        mylist_name = self.MYLIST_NAME_PATH.find_one(self.data)
         username = self._get_username()
 
         myshowname = Myshowname(mylist_name)
@@ -56,7 +56,7 @@ class MylistHtmlParser(ParserBase):
     def _get_entries(self) -> tuple[VideoidList, TitleList, RegisteredAtList, VideoURLList]:
         """エントリー収集"""
         # 動画一覧
-        items = find_values(self.data, "items", True, ["data", "mylist"], [])
+        items = self.ITEMS_PATH.find_one(self.data)
 
         video_id_list = []
         title_list = []
@@ -72,19 +72,14 @@ class MylistHtmlParser(ParserBase):
 
             video_id_list.append(Videoid(video_id))
             title_list.append(Title(title))
-            registered_at_list.append(
-                RegisteredAt(
-                    datetime.strptime(registered_at, self.SOURCE_DATETIME_FORMAT).strftime(
-                        self.DESTINATION_DATETIME_FORMAT
-                    )
-                )
-            )
+            registered_at_list.append(registered_at)
             video_url_list.append(VideoURL.create(URL(video_url).non_query_url))
 
 
         video_id_list = VideoidList.create(video_id_list)
         title_list = TitleList.create(title_list)
-        registered_at_list = RegisteredAtList.create(registered_at_list)
+        # 登録日時はまとめて変換する
+        registered_at_list = RegisteredAtList.create(normalize_datetime_list(registered_at_list))
         video_url_list = VideoURLList.create(video_url_list)
         return (video_id_list, title_list, registered_at_list, video_url_list)
 
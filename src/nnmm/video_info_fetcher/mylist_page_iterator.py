@@ -0,0 +1,227 @@
+import asyncio
+import math
+import pprint
+from logging import INFO, getLogger
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+import orjson
+
+from nnmm.update_trace import SpanStage, span
+from nnmm.util import MylistType, normalize_datetime_list
+from nnmm.video_info_fetcher.value_objects.mylist_page import MylistPage
+from nnmm.video_info_fetcher.value_objects.mylist_url import MylistURL
+from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
+from nnmm.video_info_fetcher.value_objects.title_list import TitleList
+from nnmm.video_info_fetcher.value_objects.video_url_list import VideoURLList
+from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class MylistPageIterator:
+    """マイリストの動画一覧をAPIからページ単位で新しい順に取得する
+
+    Notes:
+        UploadedURL, UserMylistURL, SeriesURL の page_url() を使ってページを辿る
+        投稿動画とマイリストはAPI側で新しい順に並べて 1ページ目から順に辿る
+        シリーズはAPI側の並び順が古い順なので最終ページから遡って辿る
+
+        known_video_id_list に含まれる動画IDが一つでもあるページに到達した時点で打ち切る
+        （新しい順に辿っているので、それ以降のページはすべて取得済とみなせる）
+        is_backfill が True の場合は打ち切らずに全ページを辿る
+        is_backfill でない場合は取得済の動画が見つからなくても INCREMENTAL_MAX_PAGE_NUM ページで打ち切る
+        （取得済の動画がすべてマイリストから外れていた場合などに全ページを辿らないため）
+
+    Attributes:
+        mylist_url (MylistURL): 対象マイリストURL
+        get_response (Callable[[str], Awaitable[httpx.Response | None]]): ページ取得関数
+        known_video_id_set (set[str]): 取得済の動画IDの集合
+        is_backfill (bool): 全件取得するかどうか
+        page_size (int): 1ページあたりの動画数
+    """
+
+    mylist_url: MylistURL
+    get_response: Callable[[str], Awaitable[httpx.Response | None]]
+    known_video_id_set: set[str]
+    is_backfill: bool
+    page_size: int
+
+    # 1ページあたりの動画数のデフォルト
+    PAGE_SIZE = 100
+    # 辿るページ数の上限
+    MAX_PAGE_NUM = 1000
+    # is_backfill でない場合に辿るページ数の上限
+    INCREMENTAL_MAX_PAGE_NUM = 10
+
+    # API返り値JSON内の動画一覧までのキーパス, 各動画エントリ内の動画情報のキー, 総件数のキー
+    _items_path_dict: dict = {
+        MylistType.uploaded: (("data",), "essential", "totalCount"),
+        MylistType.mylist: (("data", "mylist"), "video", "totalItemCount"),
+        MylistType.series: (("data",), "video", "totalCount"),
+    }
+
+    def __init__(
+        self,
+        mylist_url: MylistURL,
+        get_response: Callable[[str], Awaitable[httpx.Response | None]],
+        known_video_id_list: list[str] | None = None,
+        is_backfill: bool = False,
+        page_size: int = PAGE_SIZE,
+    ) -> None:
+        if not isinstance(mylist_url, MylistURL):
+            raise ValueError("mylist_url must be MylistURL.")
+        if mylist_url.mylist_type not in self._items_path_dict:
+            raise ValueError("mylist_url is invalid mylist_type.")
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError("page_size must be 1 or more int.")
+        self.mylist_url = mylist_url
+        self.get_response = get_response
+        self.known_video_id_set = set(known_video_id_list or [])
+        self.is_backfill = is_backfill
+        self.page_size = page_size
+
+    @property
+    def is_ascending(self) -> bool:
+        """API側の並び順が古い順かどうか"""
+        return self.mylist_url.mylist_type == MylistType.series
+
+    @property
+    def max_page_num(self) -> int:
+        """辿るページ数の上限"""
+        if self.is_backfill:
+            return self.MAX_PAGE_NUM
+        return min(self.MAX_PAGE_NUM, self.INCREMENTAL_MAX_PAGE_NUM)
+
+    def _get_total_count(self, json_dict: dict) -> int:
+        """API返り値から総件数を取得する"""
+        path, _, total_count_key = self._items_path_dict[self.mylist_url.mylist_type]
+        data = json_dict
+        for key in path:
+            data = data[key]
+        return int(data.get(total_count_key, 0))
+
+    def _parse_page(self, page: int, response_text: str) -> MylistPage:
+        """API返り値を解析して MylistPage を作成する
+
+        Args:
+            page (int): ページ番号
+            response_text (str): API返り値のJSON文字列
+
+        Returns:
+            MylistPage: 1ページ分の動画一覧
+        """
+        path, entry_key, _ = self._items_path_dict[self.mylist_url.mylist_type]
+        json_dict = orjson.loads(response_text)
+        data = json_dict
+        for key in path:
+            data = data[key]
+
+        video_id_list = []
+        title_list = []
+        registered_at_list = []
+        for item in data["items"]:
+            e = item[entry_key]
+            video_id_list.append(e["id"])
+            title_list.append(e["title"])
+            registered_at_list.append(e["registeredAt"])
+        video_url_list = [f"https://www.nicovideo.jp/watch/{video_id}" for video_id in video_id_list]
+
+        return MylistPage(
+            page,
+            self._get_total_count(json_dict),
+            VideoidList.create(video_id_list),
+            TitleList.create(title_list),
+            RegisteredAtList.create(normalize_datetime_list(registered_at_list)),
+            VideoURLList.create(video_url_list),
+        )
+
+    async def _fetch_page(self, page: int) -> MylistPage:
+        """page ページ目を取得する
+
+        Raises:
+            ValueError: ページ取得に失敗した場合
+        """
+        request_url = self.mylist_url.page_url(page, self.page_size)
+        response = await self.get_response(request_url)
+        if not response:
+            raise ValueError(f"fetch page request failed: page={page}.")
+        with span(SpanStage.parse, kind="page", page=page):
+            return self._parse_page(page, response.text)
+
+    def is_reached_known(self, video_id_list: VideoidList) -> bool:
+        """取得済の動画に到達したため以降のページを打ち切るかどうかを返す
+
+        Args:
+            video_id_list (VideoidList): 1ページ分の動画IDリスト
+
+        Returns:
+            bool: video_id_list に取得済の動画IDが一つでも含まれていればTrue, is_backfill 時は常にFalse
+        """
+        if self.is_backfill:
+            return False
+        return any(video_id.id in self.known_video_id_set for video_id in video_id_list)
+
+    async def iterate(self, start_page: int = 1, first_response_text: str = "") -> AsyncIterator[MylistPage]:
+        """動画一覧をページ単位で新しい順に返す非同期ジェネレータ
+
+        Notes:
+            start_page より前のページは呼び出し側で取得済とみなして辿らない
+            シリーズの場合、総件数から最終ページを求めるために 1ページ目の返り値が必要になる
+            first_response_text が与えられればそれを使い、なければ 1ページ目を取得する
+
+        Args:
+            start_page (int): 辿り始めるページ番号(1始まり)
+            first_response_text (str): 取得済の 1ページ目のAPI返り値
+
+        Yields:
+            MylistPage: 1ページ分の動画一覧
+        """
+        if self.is_ascending:
+            # 古い順のAPIは最終ページから start_page まで遡る
+            if first_response_text:
+                total_count = self._get_total_count(orjson.loads(first_response_text))
+            else:
+                total_count = (await self._fetch_page(1)).total_count
+            last_page = math.ceil(total_count / self.page_size)
+            page_range = range(last_page, start_page - 1, -1)
+        else:
+            page_range = range(start_page, start_page + self.max_page_num)
+
+        max_page_num = self.max_page_num
+        for count, page in enumerate(page_range):
+            if count >= max_page_num:
+                logger.info(f"{self.mylist_url.non_query_url} : page iteration reached max page num ({max_page_num}).")
+                return
+
+            mylist_page = await self._fetch_page(page)
+            if len(mylist_page) == 0:
+                return
+            yield mylist_page
+
+            if self.is_reached_known(mylist_page.video_id_list):
+                return
+            if not self.is_ascending and mylist_page.total_count <= page * self.page_size:
+                # 最終ページまで到達した
+                return
+
+
+if __name__ == "__main__":
+    from nnmm.video_info_fetcher.value_objects.mylist_url_factory import MylistURLFactory
+    from nnmm.video_info_fetcher.video_info_fetcher import VideoInfoFetcher
+
+    urls = [
+        "https://www.nicovideo.jp/user/37896001/video",  # 投稿動画
+        # "https://www.nicovideo.jp/user/6063658/mylist/72036443",  # テスト用マイリスト
+        # "https://www.nicovideo.jp/user/12899156/series/442402",  # シリーズ
+    ]
+
+    async def main(url: str) -> None:
+        virf = VideoInfoFetcher(url)
+        iterator = MylistPageIterator(MylistURLFactory.create(url), virf._get_session_response, is_backfill=True)
+        async for mylist_page in iterator.iterate():
+            pprint.pprint(mylist_page)
+
+    for url in urls:
+        asyncio.run(main(url))
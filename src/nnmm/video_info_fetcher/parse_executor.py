@@ -0,0 +1,199 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import INFO, getLogger
+from typing import TYPE_CHECKING
+
+from nnmm.util import MylistType
+from nnmm.video_info_fetcher.value_objects.fetched_page_video_info import FetchedPageVideoInfo
+from nnmm.video_info_fetcher.value_objects.mylist_url_factory import MylistURLFactory
+from nnmm.video_info_fetcher.value_objects.myshowname import Myshowname
+from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
+from nnmm.video_info_fetcher.value_objects.showname import Showname
+from nnmm.video_info_fetcher.value_objects.title_list import TitleList
+from nnmm.video_info_fetcher.value_objects.video_url_list import VideoURLList
+from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
+
+if TYPE_CHECKING:
+    from nnmm.video_info_fetcher.parser_base import ParserBase
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+# 解析結果のコンパクトな表現
+# (マイリスト表示名, マイリスト名, 動画IDリスト, 動画タイトルリスト, 登録日時リスト, 動画URLリスト)
+ParsedPage = tuple[str, str, tuple[str, ...], tuple[str, ...], tuple[str, ...], tuple[str, ...]]
+
+
+def to_parsed_page(fetched_page_video_info: FetchedPageVideoInfo) -> ParsedPage:
+    """解析結果をプロセス間で受け渡せる文字列のタプルに変換する
+
+    ユーザーID, マイリストID, マイリストURLはURLから求まるため含めない
+    """
+    return (
+        fetched_page_video_info.showname.name,
+        fetched_page_video_info.myshowname.name,
+        tuple(video_id.id for video_id in fetched_page_video_info.video_id_list),
+        tuple(title.name for title in fetched_page_video_info.title_list),
+        tuple(registered_at.dt_str for registered_at in fetched_page_video_info.registered_at_list),
+        tuple(video_url.non_query_url for video_url in fetched_page_video_info.video_url_list),
+    )
+
+
+def from_parsed_page(url: str, parsed_page: ParsedPage) -> FetchedPageVideoInfo:
+    """to_parsed_page() で変換したタプルから解析結果を復元する"""
+    showname, myshowname, video_id_list, title_list, registered_at_list, video_url_list = parsed_page
+    mylist_url = MylistURLFactory.create(url)
+    num = len(video_id_list)
+    return FetchedPageVideoInfo(
+        list(range(1, num + 1)),
+        mylist_url.userid,
+        mylist_url.mylistid,
+        Showname(showname),
+        Myshowname(myshowname),
+        mylist_url,
+        VideoidList.create(list(video_id_list)),
+        TitleList.create(list(title_list)),
+        RegisteredAtList.create(list(registered_at_list)),
+        VideoURLList.create(list(video_url_list)),
+    )
+
+
+def create_parser(mylist_type: MylistType, url: str, response_text: str) -> "ParserBase":
+    """ParserFactory でパーサーを生成する
+
+    ParserFactory は bs4 などの解析用のモジュールを読み込むため、起動時には読み込まず初回の解析時に読み込む
+    """
+    from nnmm.video_info_fetcher.parser_factory import ParserFactory
+
+    return ParserFactory.create(mylist_type, url, response_text)
+
+
+def parse_response(mylist_type: MylistType, url: str, response_bytes: bytes) -> ParsedPage:
+    """ワーカープロセスで fetch 結果を解析し、文字列のタプルで返す
+
+    Args:
+        mylist_type (MylistType): マイリストタイプ
+        url (str): マイリストURL
+        response_bytes (bytes): UTF-8 でエンコードした fetch 結果
+
+    Returns:
+        ParsedPage: 解析結果, ValueObject への変換は呼び出し元で行う
+    """
+    parser = create_parser(mylist_type, url, response_bytes.decode("utf-8"))
+    return to_parsed_page(asyncio.run(parser.parse()))
+
+
+class ParseExecutor:
+    """fetch 結果の解析を行うプロセスプール
+
+    Notes:
+        投稿動画ページなどの大きなページの解析は純粋な Python の処理で、
+        fetch を行う各スレッドで解析すると GIL により他のスレッドの処理を止めてしまう
+        プロセスプールが有効なら、fetch 結果を bytes でワーカープロセスに送って解析させ、
+        文字列のタプルで受け取った結果を呼び出し元のスレッドで ValueObject に変換する
+        プロセス数が 0 ならプロセスプールを用いず、呼び出し元のスレッド内で解析する
+        プロセスプールは初回の解析時に spawn で起動し、shutdown() まで使い回す
+        ワーカープロセスが異常終了した場合はプロセスプールを無効にし、以降はスレッド内で解析する
+
+    Attributes:
+        process_num (int): プロセスプールのプロセス数, 0 ならプロセスプールを用いない
+    """
+
+    process_num: int = 0
+    _executor: ProcessPoolExecutor | None = None
+    _lock = threading.Lock()
+
+    def __init__(self) -> None:
+        class_name = self.__class__.__name__
+        raise ValueError(f"{class_name} cannot make instance, use classmethod.")
+
+    @classmethod
+    def configure(cls, process_num: int) -> None:
+        """プロセスプールのプロセス数を設定する, 起動済のプロセスプールは終了させる
+
+        Args:
+            process_num (int): プロセス数, 0 ならプロセスプールを用いない
+
+        Raises:
+            ValueError: process_num が 0 以上の int でない場合
+        """
+        if not isinstance(process_num, int) or process_num < 0:
+            raise ValueError("process_num must be int and >= 0.")
+        cls.shutdown()
+        with cls._lock:
+            cls.process_num = process_num
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls.process_num > 0
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor | None:
+        """プロセスプールを返す, 未起動なら起動する, 無効ならNone"""
+        with cls._lock:
+            if cls.process_num <= 0:
+                return None
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=cls.process_num, mp_context=multiprocessing.get_context("spawn")
+                )
+            return cls._executor
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """起動済のプロセスプールを終了させる"""
+        with cls._lock:
+            executor = cls._executor
+            cls._executor = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @classmethod
+    async def parse(cls, mylist_type: MylistType, url: str, response_text: str) -> FetchedPageVideoInfo:
+        """fetch 結果を解析する
+
+        Args:
+            mylist_type (MylistType): マイリストタイプ
+            url (str): マイリストURL
+            response_text (str): fetch 結果
+
+        Returns:
+            FetchedPageVideoInfo: 解析結果
+
+        Raises:
+            ValueError: 解析に失敗した場合など, 呼び出し元のスレッド内で解析した場合と同じ例外を送出する
+        """
+        executor = cls._get_executor()
+        if executor is None:
+            parser = create_parser(mylist_type, url, response_text)
+            return await parser.parse()
+
+        try:
+            loop = asyncio.get_running_loop()
+            parsed_page = await loop.run_in_executor(
+                executor, parse_response, mylist_type, url, response_text.encode("utf-8")
+            )
+        except BrokenProcessPool:
+            logger.warning("Parse process pool is broken, parse in thread from now on.")
+            with cls._lock:
+                cls.process_num = 0
+            cls.shutdown()
+            parser = create_parser(mylist_type, url, response_text)
+            return await parser.parse()
+        return from_parsed_page(url, parsed_page)
+
+
+if __name__ == "__main__":
+    url = "https://www.nicovideo.jp/user/12899156/series/442402"
+    response_text = (
+        r'{"data": {"detail": {"title": "シリーズ", "owner": {"user": {"nickname": "投稿者1"}}}, "items": []}}'
+    )
+    ParseExecutor.configure(1)
+    try:
+        mylist_type = MylistURLFactory.create(url).mylist_type
+        print(asyncio.run(ParseExecutor.parse(mylist_type, url, response_text)))
+    finally:
+        ParseExecutor.shutdown()
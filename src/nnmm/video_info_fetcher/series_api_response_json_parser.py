@@ -1,14 +1,12 @@
 import asyncio
 import pprint
 from dataclasses import dataclass
-from datetime import datetime
 
 import orjson
 
-from nnmm.util import MylistType, find_values
+from nnmm.util import JsonPath, MylistType, normalize_datetime_list
 from nnmm.video_info_fetcher.parser_base import ParserBase
 from nnmm.video_info_fetcher.value_objects.myshowname import Myshowname
-from nnmm.video_info_fetcher.value_objects.registered_at import RegisteredAt
 from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
 from nnmm.video_info_fetcher.value_objects.showname import Showname
 from nnmm.video_info_fetcher.value_objects.title import Title
@@ -24,7 +22,13 @@ from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
 class SeriesAPIResponseJsonParser(ParserBase):
     json_dict: dict
 
-    DESTINATION_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+    # API返り値から各値を取り出すキーパス
+    USERNAME_PATH = JsonPath.compile("data.detail.owner.user.nickname")
+    TITLE_PATH = JsonPath.compile("data.detail.title")
+    ITEMS_PATH = JsonPath.compile("data.items")
+    ITEM_VIDEO_ID_PATH = JsonPath.compile("video.id")
+    ITEM_TITLE_PATH = JsonPath.compile("video.title")
+    ITEM_REGISTERED_AT_PATH = JsonPath.compile("video.registeredAt")
 
     def __init__(self, url: str, response_text: str) -> None:
         super().__init__(url, response_text)
@@ -34,29 +38,27 @@ class SeriesAPIResponseJsonParser(ParserBase):
 
     def _get_username(self) -> Username:
         """投稿者収集"""
-        username = find_values(self.json_dict, "nickname", True, ["data", "detail", "owner", "user"], [])
+        username = self.USERNAME_PATH.find_one(self.json_dict)
         return Username(username)
 
     def _get_showname_myshowname(self) -> tuple[Showname, Myshowname]:
         """マイリスト名収集"""
         username = self._get_username()
-        title = find_values(self.json_dict, "title", True, ["data", "detail"], [])
+        title = self.TITLE_PATH.find_one(self.json_dict)
         myshowname = Myshowname(title)
         showname = Showname.create(MylistType.series, username, myshowname)
         return (showname, myshowname)
 
     def _get_entries(self) -> tuple[VideoidList, TitleList, RegisteredAtList, VideoURLList]:
         """エントリー収集"""
-        items_dict = find_values(self.json_dict, "items", True, [], [])
-        video_id_list = [Videoid(video_id) for video_id in find_values(items_dict, "id", False, ["video"], ["owner"])]
+        items_dict = self.ITEMS_PATH.find_one(self.json_dict)
+        video_id_list = [Videoid(video_id) for video_id in self.ITEM_VIDEO_ID_PATH.iter_values(items_dict)]
         video_url_list = [
             VideoURL.create(f"https://www.nicovideo.jp/watch/{video_id.id}") for video_id in video_id_list
         ]
-        title_list = [Title(title) for title in find_values(items_dict, "title", False, [], [])]
-        registered_at_list = [
-            RegisteredAt(datetime.fromisoformat(registered_at).strftime(self.DESTINATION_DATETIME_FORMAT))
-            for registered_at in find_values(items_dict, "registeredAt", False, [], [])
-        ]
+        title_list = [Title(title) for title in self.ITEM_TITLE_PATH.iter_values(items_dict)]
+        # 登録日時はまとめて変換する
+        registered_at_list = normalize_datetime_list(self.ITEM_REGISTERED_AT_PATH.iter_values(items_dict))
 
         video_id_list = VideoidList.create(video_id_list)
         title_list = TitleList.create(title_list)
@@ -1,15 +1,14 @@
 import asyncio
 import html
+import re
 from dataclasses import dataclass
-from datetime import datetime
 
 import orjson
 from bs4 import BeautifulSoup
 
-from nnmm.util import MylistType, find_values
+from nnmm.util import JsonPath, MylistType, normalize_datetime_list
 from nnmm.video_info_fetcher.parser_base import ParserBase
 from nnmm.video_info_fetcher.value_objects.myshowname import Myshowname
-from nnmm.video_info_fetcher.value_objects.registered_at import RegisteredAt
 from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
 from nnmm.video_info_fetcher.value_objects.showname import Showname
 from nnmm.video_info_fetcher.value_objects.title import Title
@@ -24,11 +23,20 @@ from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
 
 @dataclass
 class UploadedHtmlParser(ParserBase):
-    soup: BeautifulSoup
+    soup: BeautifulSoup | None
     data: dict
 
-    SOURCE_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
-    DESTINATION_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+    # 初期データから各値を取り出すキーパス
+    USERNAME_PATH = JsonPath.compile("state.userDetails.userDetails.user.nickname")
+    ITEMS_PATH = JsonPath.compile("body.data.items")
+
+    # 動画一覧の初期データが埋め込まれている要素のidと属性名
+    INITIAL_DATA_ELEMENT_ID = "js-initial-userpage-data"
+    INITIAL_DATA_ATTRIBUTE_NAME = "data-initial-data"
+
+    # 開始タグのタグ名部分と、属性一つ分(属性名, "値", '値', クォートなしの値)
+    _TAG_NAME_PATTERN = re.compile(r"<[a-zA-Z][^\s/>]*")
+    _ATTRIBUTE_PATTERN = re.compile(r"""\s*([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
 
     def __init__(self, url: str, response_text: str) -> None:
         super().__init__(url, response_text)
@@ -36,18 +44,83 @@ class UploadedHtmlParser(ParserBase):
             raise ValueError(f"url must be MylistType.uploaded: {url}.")
 
         # HTML解析
-        self.soup = BeautifulSoup(response_text, "html.parser")
-        elem = self.soup.find(id="js-initial-userpage-data")
-        if elem is None:
-            raise ValueError("js-initial-userpage-data が見つかりません")
+        # 高速経路で属性値を取り出せなかった場合のみ BeautifulSoup でDOMを構築する
+        self.soup = None
+        attribute_value = self._extract_initial_data(response_text)
+        if attribute_value is None:
+            self.soup = BeautifulSoup(response_text, "html.parser")
+            elem = self.soup.find(id=self.INITIAL_DATA_ELEMENT_ID)
+            if elem is None:
+                raise ValueError("js-initial-userpage-data が見つかりません")
+            attribute_value = elem[self.INITIAL_DATA_ATTRIBUTE_NAME]
 
         # HTMLエスケープ解除
-        json_text = html.unescape(elem["data-initial-data"])
+        json_text = html.unescape(attribute_value)
         self.data = orjson.loads(json_text)
 
+    @classmethod
+    def _parse_start_tag_attributes(cls, response_text: str, tag_start: int) -> dict[str, str] | None:
+        """tag_start 位置から始まる開始タグの属性を辞書で返す
+
+        Args:
+            response_text (str): HTML文字列
+            tag_start (int): 開始タグの "<" の位置
+
+        Returns:
+            dict[str, str] | None:
+                属性名をキー, エスケープされたままの属性値を値とする辞書
+                開始タグとして解釈できなければNone
+        """
+        m = cls._TAG_NAME_PATTERN.match(response_text, tag_start)
+        if not m:
+            return None
+
+        attributes = {}
+        pos = m.end()
+        while m := cls._ATTRIBUTE_PATTERN.match(response_text, pos):
+            name = m.group(1).lower()
+            value = next((v for v in m.group(2, 3, 4) if v is not None), "")
+            attributes.setdefault(name, value)
+            pos = m.end()
+
+        # 属性の並びの後ろがタグの終端でなければ解釈失敗とする
+        if not response_text.startswith((">", "/>"), pos):
+            return None
+        return attributes
+
+    @classmethod
+    def _extract_initial_data(cls, response_text: str) -> str | None:
+        """DOMを構築せずに js-initial-userpage-data 要素の data-initial-data 属性値を取り出す
+
+        Notes:
+            id 属性の文字列を直接検索し、その要素の開始タグだけを属性単位で解釈する
+            属性値内の ">" や属性の並び順には影響されない
+            想定外の記法で見つからなかった場合は None を返し、呼び出し側で BeautifulSoup にフォールバックする
+
+        Args:
+            response_text (str): 投稿動画ページのHTML文字列
+
+        Returns:
+            str | None: 文字参照を解決した属性値(BeautifulSoup で得られる値と同じ), 取り出せなかった場合None
+        """
+        id_pattern = f'id="{cls.INITIAL_DATA_ELEMENT_ID}"'
+        index = response_text.find(id_pattern)
+        while index != -1:
+            tag_start = response_text.rfind("<", 0, index)
+            if tag_start != -1:
+                attributes = cls._parse_start_tag_attributes(response_text, tag_start)
+                if attributes and attributes.get("id") == cls.INITIAL_DATA_ELEMENT_ID:
+                    attribute_value = attributes.get(cls.INITIAL_DATA_ATTRIBUTE_NAME)
+                    if attribute_value is None:
+                        return None
+                    # BeautifulSoup で取得した場合と同じく文字参照を解決した値を返す
+                    return html.unescape(attribute_value)
+            index = response_text.find(id_pattern, index + len(id_pattern))
+        return None
+
     def _get_username(self) -> Username:
         """投稿者収集"""
-        username = find_values(self.data, "nickname", True, ["state", "userDetails", "userDetails", "user"], [])
+        username = self.USERNAME_PATH.find_one(self.data)
         return Username(username)
 
     def _get_showname_myshowname(self) -> tuple[Showname, Myshowname]:
@@ -61,7 +134,7 @@ class UploadedHtmlParser(ParserBase):
         """エントリー収集"""
         # 動画一覧
         nvapi = self.data["nvapi"][0]
-        items = find_values(nvapi, "items", True, ["body", "data", "items"], [])
+        items = self.ITEMS_PATH.find_one(nvapi)
 
         video_id_list = []
         title_list = []
@@ -77,18 +150,13 @@ class UploadedHtmlParser(ParserBase):
 
             video_id_list.append(Videoid(video_id))
             title_list.append(Title(title))
-            registered_at_list.append(
-                RegisteredAt(
-                    datetime.strptime(registered_at, self.SOURCE_DATETIME_FORMAT).strftime(
-                        self.DESTINATION_DATETIME_FORMAT
-                    )
-                )
-            )
+            registered_at_list.append(registered_at)
             video_url_list.append(VideoURL.create(URL(video_url).non_query_url))
 
         video_id_list = VideoidList.create(video_id_list)
         title_list = TitleList.create(title_list)
-        registered_at_list = RegisteredAtList.create(registered_at_list)
+        # 登録日時はまとめて変換する
+        registered_at_list = RegisteredAtList.create(normalize_datetime_list(registered_at_list))
         video_url_list = VideoURLList.create(video_url_list)
         return (video_id_list, title_list, registered_at_list, video_url_list)
 
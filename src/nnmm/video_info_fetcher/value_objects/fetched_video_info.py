@@ -1,8 +1,9 @@
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, fields
+from functools import cached_property
 from pprint import pprint
-from typing import ClassVar
+from typing import Iterator
 
+from nnmm.util import datetime_to_epoch_list, get_now_epoch
 from nnmm.video_info_fetcher.value_objects.mylist_url import MylistURL
 from nnmm.video_info_fetcher.value_objects.mylistid import Mylistid
 from nnmm.video_info_fetcher.value_objects.myshowname import Myshowname
@@ -22,7 +23,8 @@ class FetchedVideoInfo:
 
     VideoInfoHtmlFetcher, VideoInfoRSSFetcher 参照
     このデータクラスの情報がfetchingの最終的な出力となる
-    _make_result_dict() にて以下の項目をキーとする辞書が返却される
+    result_dict にて以下の項目をキーとする辞書が返却される
+    result_rows / iter_result_rows() では同じ項目を同じ順に並べたタプルが返却される
     table_cols_name = ["No.", "動画ID", "動画名", "投稿者", "状況",
                        "投稿日時", "登録日時", "動画URL", "所属マイリストURL", "マイリスト表示名", "マイリスト名"]
     table_cols = ["no", "video_id", "title", "username", "status",
@@ -49,8 +51,6 @@ class FetchedVideoInfo:
     video_url_list: VideoURLList  # 動画URLリスト [https://www.nicovideo.jp/watch/sm12345678]
     username_list: UsernameList  # 投稿者リスト [投稿者1]
 
-    result_dict: ClassVar[list[dict]]  # 結果の辞書 [{key=RESULT_DICT_COLS, value=キーに対応する上記項目}]
-
     RESULT_DICT_COLS = (
         "no",
         "video_id",
@@ -68,10 +68,10 @@ class FetchedVideoInfo:
     def __post_init__(self) -> None:
         """初期化後処理
 
-        バリデーションとresult_dict の返り値設定を行う
+        バリデーションのみ
+        結果の行(result_rows, result_dict)は初回参照時に作成する
         """
         self._is_valid()
-        object.__setattr__(self, "result_dict", self._make_result_dict())
 
     def __len__(self) -> int:
         return self.no.__len__()
@@ -119,17 +119,24 @@ class FetchedVideoInfo:
             raise ValueError("There are different size (*_list).")
         return True
 
-    def _make_result_dict(self) -> list[dict]:
-        """結果の辞書を返す
+    def _make_result_rows(self) -> Iterator[tuple]:
+        """結果の行を先頭から順に返すジェネレータ
 
-        結果の辞書 [{key=RESULT_DICT_COLS, value=キーに対応する項目(文字列)}]
+        行は RESULT_DICT_COLS の順に値(文字列)を並べたタプル
+        登録日時が未来日の動画と、重複した動画IDの2件目以降は除外する
 
-        Returns:
-            list[dict]: 結果の辞書のリスト
+        Yields:
+            tuple: RESULT_DICT_COLS の順に値を並べたタプル
         """
-        # 結合
-        res = []
-        now_date = datetime.now()
+        # 全行で共通の値
+        mylist_url = self.mylist_url.non_query_url
+        showname = self.showname.name
+        myshowname = self.myshowname.name
+
+        # 登録日時が未来日の場合、登録しない（投稿予約など）
+        # 未来日判定は登録日時をまとめてエポック秒に変換してから比較する
+        now_epoch = get_now_epoch()
+        registered_at_epoch_list = datetime_to_epoch_list(r.dt_str for r in self.registered_at_list)
         zipped_list = zip(
             self.no,
             self.video_id_list,
@@ -138,15 +145,20 @@ class FetchedVideoInfo:
             self.registered_at_list,
             self.username_list,
             self.video_url_list,
+            registered_at_epoch_list,
             strict=True,
         )
-        for no, video_id, title, uploaded_at, registered_at, username, video_url in zipped_list:
-            # 登録日時が未来日の場合、登録しない（投稿予約など）
-            if now_date < datetime.strptime(registered_at.dt_str, RegisteredAtList.DESTINATION_DATETIME_FORMAT):
+        seen = set()
+        for no, video_id, title, uploaded_at, registered_at, username, video_url, registered_at_epoch in zipped_list:
+            if now_epoch < registered_at_epoch:
+                continue
+
+            # 重複削除
+            if video_id.id in seen:
                 continue
+            seen.add(video_id.id)
 
-            # 出力用の値を整形
-            value_list = [
+            yield (
                 no,
                 video_id.id,
                 title.name,
@@ -155,20 +167,58 @@ class FetchedVideoInfo:
                 uploaded_at.dt_str,
                 registered_at.dt_str,
                 video_url.video_url,
-                self.mylist_url.non_query_url,
-                self.showname.name,
-                self.myshowname.name,
-            ]
-            # 登録
-            res.append(dict(zip(FetchedVideoInfo.RESULT_DICT_COLS, value_list, strict=True)))
+                mylist_url,
+                showname,
+                myshowname,
+            )
+
+    def _make_result_dict(self) -> list[dict]:
+        """結果の辞書を返す
+
+        結果の辞書 [{key=RESULT_DICT_COLS, value=キーに対応する項目(文字列)}]
+        呼び出しのたびに作り直す、通常は result_rows / result_dict を参照すること
+
+        Returns:
+            list[dict]: 結果の辞書のリスト
+        """
+        cols = FetchedVideoInfo.RESULT_DICT_COLS
+        return [dict(zip(cols, row, strict=True)) for row in self._make_result_rows()]
+
+    @cached_property
+    def result_rows(self) -> tuple[tuple, ...]:
+        """結果の行
+
+        初回参照時に _make_result_rows() の結果を作成してキャッシュする
+
+        Returns:
+            tuple[tuple, ...]: RESULT_DICT_COLS の順に値を並べたタプルの並び
+        """
+        return tuple(self._make_result_rows())
+
+    @cached_property
+    def result_dict(self) -> list[dict]:
+        """結果の辞書
 
-        # 重複削除
-        seen = []
-        res = [x for x in res if x["video_id"] not in seen and not seen.append(x["video_id"])]
+        初回参照時に result_rows から作成してキャッシュする
 
-        return res
+        Returns:
+            list[dict]: [{key=RESULT_DICT_COLS, value=キーに対応する項目(文字列)}]
+        """
+        cols = FetchedVideoInfo.RESULT_DICT_COLS
+        return [dict(zip(cols, row, strict=True)) for row in self.result_rows]
+
+    def iter_result_rows(self) -> Iterator[tuple]:
+        """結果の行を先頭から順に返すジェネレータ
+
+        辞書を作らずに結果を走査したい場合に使う
+        行の作成は初回のみ行い、以降はキャッシュした result_rows を返す
+
+        Yields:
+            tuple: RESULT_DICT_COLS の順に値を並べたタプル
+        """
+        yield from self.result_rows
 
-    def to_dict(self) -> list[dict]:
+    def to_dict(self) -> dict:
         """データクラスの項目を辞書として取得する
 
         result とは異なり、値は各ValueObject が設定される
@@ -177,7 +227,7 @@ class FetchedVideoInfo:
             dict: {データクラスの項目: 対応するValueObject}
         """
         # return asdict(self)  # asdictだとキーと値が文字列になるため型情報が失われる
-        return self.__dict__
+        return {f.name: getattr(self, f.name) for f in fields(self)}
 
     @property
     def result(self) -> list[dict]:
@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, ClassVar, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class InternCache:
+    """同値の不変インスタンスを使い回すための上限付きLRUキャッシュ
+
+    Notes:
+        URL, VideoURL, MylistURL のように同じ値で何度も生成される不変なValueObject について、
+        生成済のインスタンスをキーごとに保持して使い回す
+        保持数が maxsize を超えた場合は最も長く参照されていないものから捨てる
+        maxsize が0の場合はキャッシュせず、毎回 factory で生成する
+        生成に失敗した（factory が例外を送出した）場合はキャッシュしない
+        複数スレッドから参照されるため、キャッシュの操作はロックして行う
+
+    Attributes:
+        name (str): キャッシュ名, 統計情報の表示に使う
+        maxsize (int): 保持するインスタンス数の上限
+        hits (int): キャッシュにあったインスタンスを返した回数
+        misses (int): 新たにインスタンスを生成した回数
+    """
+
+    DEFAULT_MAXSIZE = 4096
+
+    name: str
+    maxsize: int
+    hits: int
+    misses: int
+
+    # 作成された全てのキャッシュ, 統計情報の一覧表示に使う
+    _registry: ClassVar[list["InternCache"]] = []
+
+    def __init__(self, name: str, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        if not isinstance(name, str):
+            raise TypeError("name must be str.")
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError("maxsize must be int and >= 0.")
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[Hashable, object] = OrderedDict()
+        self._lock = threading.Lock()
+        InternCache._registry.append(self)
+
+    def __len__(self) -> int:
+        return self._cache.__len__()
+
+    def __repr__(self) -> str:
+        return f"InternCache('{self.name}', size={len(self)}/{self.maxsize}, hit_rate={self.hit_rate:.3f})"
+
+    @property
+    def hit_rate(self) -> float:
+        """キャッシュのヒット率, 一度も参照されていなければ0.0"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """key に対応するインスタンスを返す
+
+        キャッシュにあればそれを、なければ factory() で生成してキャッシュしてから返す
+
+        Args:
+            key (Hashable): キャッシュのキー
+            factory (Callable[[], T]): インスタンスを生成する関数
+
+        Returns:
+            T: key に対応するインスタンス
+        """
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        instance = factory()
+        if self.maxsize == 0:
+            return instance
+
+        with self._lock:
+            # 生成中に他スレッドが同じキーを登録していた場合はそちらを使う
+            instance = self._cache.setdefault(key, instance)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return instance
+
+    def set_maxsize(self, maxsize: int) -> None:
+        """保持数の上限を変更する, 上限を超えた分は古いものから捨てる"""
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError("maxsize must be int and >= 0.")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """保持しているインスタンスと統計情報を破棄する"""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """統計情報を返す
+
+        Returns:
+            dict: {"name", "size", "maxsize", "hits", "misses", "hit_rate"}
+        """
+        return {
+            "name": self.name,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+    @classmethod
+    def all_stats(cls) -> list[dict]:
+        """作成された全てのキャッシュの統計情報を返す"""
+        return [cache.stats() for cache in cls._registry]
+
+
+if __name__ == "__main__":
+    cache = InternCache("example", maxsize=2)
+    for key in ["a", "b", "a", "c", "b"]:
+        cache.get_or_create(key, lambda: object())
+    print(cache)
+    print(InternCache.all_stats())
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from pprint import pprint
+
+from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
+from nnmm.video_info_fetcher.value_objects.title_list import TitleList
+from nnmm.video_info_fetcher.value_objects.video_url_list import VideoURLList
+from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
+
+
+@dataclass(frozen=True)
+class MylistPage:
+    """ページ単位で取得した動画一覧の1ページ分をまとめたデータクラス
+
+    MylistPageIterator 参照
+
+    Raises:
+        TypeError: 初期化時の引数の型が不正な場合
+        ValueError: List系の入力の大きさが異なる場合
+
+    Returns:
+        MylistPage: 動画一覧の1ページ分の情報
+    """
+
+    page: int  # ページ番号(1始まり)
+    total_count: int  # マイリスト全体の動画数
+    video_id_list: VideoidList  # 動画IDリスト [sm12345678]
+    title_list: TitleList  # 動画タイトルリスト [テスト動画]
+    registered_at_list: RegisteredAtList  # 登録日時リスト [%Y-%m-%d %H:%M:%S]
+    video_url_list: VideoURLList  # 動画URLリスト [https://www.nicovideo.jp/watch/sm12345678]
+
+    def __post_init__(self) -> None:
+        """初期化後処理
+
+        バリデーションのみ
+        """
+        self._is_valid()
+
+    def __len__(self) -> int:
+        return self.video_id_list.__len__()
+
+    def _is_valid(self) -> bool | TypeError | ValueError:
+        """バリデーション
+
+        Returns:
+            bool: すべての値が正常ならTrue, 一つでも不正ならTypeError|ValueError
+        """
+        if not isinstance(self.page, int):
+            raise TypeError("page must be int.")
+        if not isinstance(self.total_count, int):
+            raise TypeError("total_count must be int.")
+        if not isinstance(self.video_id_list, VideoidList):
+            raise TypeError("video_id_list must be VideoidList.")
+        if not isinstance(self.title_list, TitleList):
+            raise TypeError("title_list must be TitleList.")
+        if not isinstance(self.registered_at_list, RegisteredAtList):
+            raise TypeError("registered_at_list must be RegisteredAtList.")
+        if not isinstance(self.video_url_list, VideoURLList):
+            raise TypeError("video_url_list must be VideoURLList.")
+
+        if self.page < 1:
+            raise ValueError("page must be 1 or more.")
+
+        num = len(self.video_id_list)
+        if not all([
+            len(self.title_list) == num,
+            len(self.registered_at_list) == num,
+            len(self.video_url_list) == num,
+        ]):
+            raise ValueError("There are different size (*_list).")
+        return True
+
+
+if __name__ == "__main__":
+    video_url_list = VideoURLList.create(["https://www.nicovideo.jp/watch/sm12345678"])
+    mylist_page = MylistPage(
+        1,
+        1,
+        VideoidList.create(video_url_list.video_id_list),
+        TitleList.create(["テスト動画"]),
+        RegisteredAtList.create(["2022-05-06 00:01:01"]),
+        video_url_list,
+    )
+    pprint(mylist_page)
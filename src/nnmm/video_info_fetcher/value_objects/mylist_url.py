@@ -43,6 +43,16 @@ class MylistURL(URL, ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def page_url(self, page: int, page_size: int) -> str:
+        """ページ指定で動画一覧を取得するAPIのURLを返す
+
+        Args:
+            page (int): 取得するページ番号(1始まり)
+            page_size (int): 1ページあたりの動画数
+        """
+        raise NotImplementedError
+
     @property
     @abstractmethod
     def userid(self) -> Userid:
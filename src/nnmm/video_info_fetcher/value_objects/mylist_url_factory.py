@@ -1,3 +1,4 @@
+from nnmm.video_info_fetcher.value_objects.intern_cache import InternCache
 from nnmm.video_info_fetcher.value_objects.mylist_url import MylistURL
 from nnmm.video_info_fetcher.value_objects.series_url import SeriesURL
 from nnmm.video_info_fetcher.value_objects.uploaded_url import UploadedURL
@@ -8,14 +9,34 @@ from nnmm.video_info_fetcher.value_objects.user_mylist_url import UserMylistURL
 class MylistURLFactory:
     _class_list: list[MylistURL] = [UploadedURL, UserMylistURL, SeriesURL]
 
+    # create() で生成したインスタンスのキャッシュ
+    _intern_cache = InternCache("MylistURL")
+
     def __init__(self) -> None:
         class_name = self.__class__.__name__
         raise ValueError(f"{class_name} cannot make instance, use classmethod {class_name}.create().")
 
     @classmethod
     def create(cls, url: str | URL) -> MylistURL:
+        """url に対応する種類の MylistURL インスタンスを作成する
+
+        同じURL文字列に対しては生成済のインスタンスを返す
+
+        Args:
+            url (str | URL): 対象URLを表す文字列 or URL
+
+        Raises:
+            ValueError: url がいずれの MylistURL の形式でもない場合
+
+        Returns:
+            MylistURL: UploadedURL, UserMylistURL, SeriesURL のいずれか
+        """
         if isinstance(url, URL):
             url = url.original_url
+        return cls._intern_cache.get_or_create(url, lambda: cls._create(url))
+
+    @classmethod
+    def _create(cls, url: str) -> MylistURL:
         for c in cls._class_list:
             if not hasattr(c, "is_valid_mylist_url"):
                 continue
@@ -102,6 +102,22 @@ class SeriesURL(MylistURL):
         fetch_url = urlunparse(urlparse(str(base_url))._replace(query=query_params, fragment=None))
         return fetch_url
 
+    def page_url(self, page: int, page_size: int) -> str:
+        """ページ指定でシリーズの動画一覧を取得するAPIのURLを返す
+
+        シリーズAPIはシリーズ内の並び順（古い順）でページングされる
+        新しい順に辿る場合は呼び出し側で最終ページから遡ること
+
+        Args:
+            page (int): 取得するページ番号(1始まり)
+            page_size (int): 1ページあたりの動画数
+
+        Returns:
+            str: シリーズ取得APIのURL
+        """
+        query_params = urlencode({"page": page, "pageSize": page_size})
+        return f"{self._get_fetch_url()}&{query_params}"
+
     @classmethod
     def is_valid_mylist_url(cls, url: str | URL) -> bool:
         """シリーズURLのパターンかどうかを返す
@@ -118,7 +134,7 @@ class SeriesURL(MylistURL):
                   そうでないならFalse
         """
         try:
-            non_query_url = URL(url).non_query_url
+            non_query_url = URL.create(url).non_query_url
             return re.search(SeriesURL.SERIES_URL_PATTERN, non_query_url) is not None
         except Exception:
             return False
@@ -136,7 +152,7 @@ class SeriesURL(MylistURL):
         Returns:
             SeriesURL: SeriesURL インスタンス
         """
-        return cls(URL(url))
+        return cls(URL.create(url))
 
 
 if __name__ == "__main__":
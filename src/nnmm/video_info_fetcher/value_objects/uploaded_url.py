@@ -1,6 +1,7 @@
 import re
 from dataclasses import dataclass
 from typing import ClassVar, Self
+from urllib.parse import urlencode
 
 from nnmm.util import MylistType
 from nnmm.video_info_fetcher.value_objects.mylist_url import MylistURL
@@ -31,6 +32,9 @@ class UploadedURL(MylistURL):
     # RSSリクエストURLサフィックス
     RSS_URL_SUFFIX = "?rss=2.0"
 
+    # 投稿動画一覧取得APIのベースURL
+    UPLOADED_API_BASE_URL = "https://nvapi.nicovideo.jp/v3/users/{}/videos"
+
     def __init__(self, url: str | Self) -> None:
         super().__init__(url)
         non_query_url = self.non_query_url
@@ -44,6 +48,28 @@ class UploadedURL(MylistURL):
         fetch_url = self.non_query_url + self.RSS_URL_SUFFIX
         return fetch_url
 
+    def page_url(self, page: int, page_size: int) -> str:
+        """ページ指定で投稿動画一覧を取得するAPIのURLを返す
+
+        投稿日時の降順（新しい順）で並べたときの page ページ目を取得する
+        "https://nvapi.nicovideo.jp/v3/users/{userid}/videos?sortKey=registeredAt&sortOrder=desc&pageSize={}&page={}"
+
+        Args:
+            page (int): 取得するページ番号(1始まり)
+            page_size (int): 1ページあたりの動画数
+
+        Returns:
+            str: 投稿動画一覧取得APIのURL
+        """
+        query_params = {
+            "sortKey": "registeredAt",
+            "sortOrder": "desc",
+            "pageSize": page_size,
+            "page": page,
+        }
+        base_url = self.UPLOADED_API_BASE_URL.format(self.userid.id)
+        return f"{base_url}?{urlencode(query_params)}"
+
     @property
     def userid(self) -> Userid:
         """ユーザーIDを返す
@@ -78,7 +104,7 @@ class UploadedURL(MylistURL):
                   そうでないならFalse
         """
         try:
-            non_query_url = URL(url).non_query_url
+            non_query_url = URL.create(url).non_query_url
             return re.search(UploadedURL.UPLOADED_URL_PATTERN, non_query_url) is not None
         except Exception:
             return False
@@ -96,7 +122,7 @@ class UploadedURL(MylistURL):
         Returns:
             UploadedURL: UploadedURL インスタンス
         """
-        return cls(URL(url))
+        return cls(URL.create(url))
 
 
 if __name__ == "__main__":
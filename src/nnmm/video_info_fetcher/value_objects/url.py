@@ -3,6 +3,8 @@ import urllib.parse
 from dataclasses import dataclass
 from typing import ClassVar, Self
 
+from nnmm.video_info_fetcher.value_objects.intern_cache import InternCache
+
 
 @dataclass(frozen=True)
 class URL:
@@ -24,15 +26,20 @@ class URL:
 
     URL_PATTERN = r"^https?://[a-zA-Z0-9_/:%#$&\?\(\)~\.=\+\-]+"
 
+    # create() で生成したインスタンスのキャッシュ
+    _intern_cache = InternCache("URL")
+
     def __init__(self, url: str | Self) -> None:
         """初期化処理
 
         Args:
             url (str | URL): 対象となるURL文字列（候補）
         """
-        # 引数の型を str に合わせる
+        # URL インスタンスならば検証と変換は済んでいるので値をそのまま使う
         if isinstance(url, URL):
-            url: str = url.original_url
+            object.__setattr__(self, "non_query_url", url.non_query_url)
+            object.__setattr__(self, "original_url", url.original_url)
+            return
 
         # 先頭が大文字のHから始まっていたら小文字にする
         if url.startswith("H"):
@@ -50,6 +57,23 @@ class URL:
         object.__setattr__(self, "non_query_url", non_query_url)
         object.__setattr__(self, "original_url", url)
 
+    @classmethod
+    def create(cls, url: str | Self) -> Self:
+        """URL インスタンスを作成する
+
+        同じURL文字列に対しては生成済のインスタンスを返す
+
+        Args:
+            url (str | URL): 対象となるURL文字列（候補）
+
+        Returns:
+            URL: URL インスタンス
+        """
+        if type(url) is URL:
+            return url
+        key = url.original_url if isinstance(url, URL) else url
+        return URL._intern_cache.get_or_create(key, lambda: URL(key))
+
     @classmethod
     def is_valid(self, estimated_url: str) -> bool:
         """URLのパターンかどうかを返す
@@ -1,6 +1,7 @@
 import re
 from dataclasses import dataclass
 from typing import ClassVar, Self
+from urllib.parse import urlencode
 
 from nnmm.util import MylistType
 from nnmm.video_info_fetcher.value_objects.mylist_url import MylistURL
@@ -57,6 +58,28 @@ class UserMylistURL(MylistURL):
         fetch_url = self.USER_MYLIST_API_ENDPOINT_BASE + self.mylistid.id
         return fetch_url
 
+    def page_url(self, page: int, page_size: int) -> str:
+        """ページ指定でマイリストの動画一覧を取得するAPIのURLを返す
+
+        マイリストへの登録日時の降順（新しい順）で並べたときの page ページ目を取得する
+        要user_sessionクッキー
+        "https://nvapi.nicovideo.jp/v2/mylists/{mylistid}?sortKey=addedAt&sortOrder=desc&pageSize={}&page={}"
+
+        Args:
+            page (int): 取得するページ番号(1始まり)
+            page_size (int): 1ページあたりの動画数
+
+        Returns:
+            str: マイリスト取得APIのURL
+        """
+        query_params = {
+            "sortKey": "addedAt",
+            "sortOrder": "desc",
+            "pageSize": page_size,
+            "page": page,
+        }
+        return f"{self.fetch_url}?{urlencode(query_params)}"
+
     @property
     def userid(self) -> Userid:
         """ユーザーIDを返す
@@ -93,7 +116,7 @@ class UserMylistURL(MylistURL):
                   そうでないならFalse
         """
         try:
-            non_query_url = URL(url).non_query_url
+            non_query_url = URL.create(url).non_query_url
             return re.search(UserMylistURL.USER_MYLIST_URL_PATTERN, non_query_url) is not None
         except Exception:
             return False
@@ -111,7 +134,7 @@ class UserMylistURL(MylistURL):
         Returns:
             UserMylistURL: UserMylistURL インスタンス
         """
-        return cls(URL(url))
+        return cls(URL.create(url))
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ import re
 from dataclasses import dataclass
 from typing import Self
 
+from nnmm.video_info_fetcher.value_objects.intern_cache import InternCache
 from nnmm.video_info_fetcher.value_objects.url import URL
 from nnmm.video_info_fetcher.value_objects.videoid import Videoid
 
@@ -26,6 +27,9 @@ class VideoURL:
     VIDEO_URL_PATTERN = r"^https://www.nicovideo.jp/watch/(s[ms][0-9]+)$"
     VIDEO_ID_PATTERN = r"s[ms][0-9]"
 
+    # create() で生成したインスタンスのキャッシュ
+    _intern_cache = InternCache("VideoURL")
+
     def __post_init__(self) -> None:
         """初期化後処理
 
@@ -77,6 +81,7 @@ class VideoURL:
 
         URL インスタンスを作成して
         それをもとにしてVideoURL インスタンス作成する
+        同じURL文字列に対しては生成済のインスタンスを返す
 
         Args:
             url (str | URL): 対象URLを表す文字列 or URL
@@ -84,7 +89,8 @@ class VideoURL:
         Returns:
             VideoURL: VideoURL インスタンス
         """
-        return cls(URL(url))
+        key = url.original_url if isinstance(url, URL) else url
+        return VideoURL._intern_cache.get_or_create(key, lambda: cls(URL.create(key)))
 
     @classmethod
     def is_valid(cls, url: str | URL) -> bool | ValueError:
@@ -105,7 +111,7 @@ class VideoURL:
             ValueError: URLインスタンスとして不正な場合
         """
         # video_url の形として正しいか
-        non_query_url = URL(url).non_query_url
+        non_query_url = URL.create(url).non_query_url
         if re.search(VideoURL.VIDEO_URL_PATTERN, non_query_url) is None:
             return False
 
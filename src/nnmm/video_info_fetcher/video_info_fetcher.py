@@ -6,12 +6,18 @@ from dataclasses import dataclass
 from logging import INFO, getLogger
 from pathlib import Path
 
-from nnmm.process import config as process_config
-from nnmm.video_info_fetcher.parser_base import ParserBase
-from nnmm.video_info_fetcher.parser_factory import ParserFactory
+from nnmm.config_store import ConfigStore
+from nnmm.update_trace import SpanStage, span
+from nnmm.util import MylistType
+from nnmm.video_info_fetcher.mylist_page_iterator import MylistPageIterator
+from nnmm.video_info_fetcher.parse_executor import ParseExecutor
 from nnmm.video_info_fetcher.value_objects.fetched_page_video_info import FetchedPageVideoInfo
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
-from nnmm.video_info_fetcher.video_info_fetcher_base import VideoInfoFetcherBase
+from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
+from nnmm.video_info_fetcher.value_objects.title_list import TitleList
+from nnmm.video_info_fetcher.value_objects.video_url_list import VideoURLList
+from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
+from nnmm.video_info_fetcher.video_info_fetcher_base import PermanentFetchError, VideoInfoFetcherBase
 
 logger = getLogger(__name__)
 logger.setLevel(INFO)
@@ -19,20 +25,176 @@ logger.setLevel(INFO)
 
 @dataclass
 class VideoInfoFetcher(VideoInfoFetcherBase):
-    def __init__(self, url: str):
-        super().__init__(url)
+    def __init__(self, url: str, known_video_id_list: list[str] | None = None, is_backfill: bool = False):
+        super().__init__(url, known_video_id_list, is_backfill)
 
     async def _analysis_response_text(self, response_text: str) -> FetchedPageVideoInfo:
+        """fetch 結果を解析する, ParseExecutor が有効ならワーカープロセスで解析する"""
         try:
             mylist_url = self.mylist_url.non_query_url
             mylist_type = self.mylist_url.mylist_type
-            parser: ParserBase = ParserFactory.create(mylist_type, mylist_url, response_text)
-            res = await parser.parse()
+            with span(SpanStage.parse, kind="page"):
+                res = await ParseExecutor.parse(mylist_type, mylist_url, response_text)
         except Exception:
             logger.error(f"{self.mylist_url.non_query_url}: response text parse error.")
             raise ValueError("response text analysis failed.")
         return res
 
+    @property
+    def is_paging(self) -> bool:
+        """取得済の動画に到達するまでページ単位で辿るかどうか
+
+        known_video_id_list が None または空で、is_backfill も指定されていない場合はページングしない
+        """
+        return bool(self.known_video_id_list) or self.is_backfill
+
+    @property
+    def is_first_page_aligned(self) -> bool:
+        """最初の取得を page_url() の 1ページ目として行うかどうか
+
+        マイリスト/シリーズの fetch_url は page_url() と同じAPIのため、ページングする場合は
+        固定のページサイズを指定して取得し、その返り値をメタ情報と 1ページ目の動画一覧の両方に用いる
+        投稿動画の fetch_url は page_url() とは別のページのため、そのまま取得する
+        """
+        return self.is_paging and self.mylist_url.mylist_type in (MylistType.mylist, MylistType.series)
+
+    @property
+    def first_request_url(self) -> str:
+        """最初に取得するURL"""
+        if self.is_first_page_aligned:
+            return self.mylist_url.page_url(1, MylistPageIterator.PAGE_SIZE)
+        return self.mylist_url.fetch_url
+
+    def _replace_video_list(self, fetched_d: FetchedPageVideoInfo, video_items: list[tuple]) -> FetchedPageVideoInfo:
+        """fetched_d のメタ情報はそのままに、動画一覧を video_items に差し替える
+
+        Args:
+            fetched_d (FetchedPageVideoInfo): 差し替え元の解析結果
+            video_items (list[tuple]): (動画ID, 動画タイトル, 登録日時, 動画URL) のリスト
+
+        Returns:
+            FetchedPageVideoInfo: 動画一覧を差し替えた解析結果
+        """
+        video_id_list, title_list, registered_at_list, video_url_list = (
+            [list(col) for col in zip(*video_items)] if video_items else ([], [], [], [])
+        )
+        return FetchedPageVideoInfo(
+            list(range(1, len(video_items) + 1)),
+            fetched_d.userid,
+            fetched_d.mylistid,
+            fetched_d.showname,
+            fetched_d.myshowname,
+            fetched_d.mylist_url,
+            VideoidList.create(video_id_list),
+            TitleList.create(title_list),
+            RegisteredAtList.create(registered_at_list),
+            VideoURLList.create(video_url_list),
+        )
+
+    async def _fetch_pages(self, fetched_d: FetchedPageVideoInfo, response_text: str) -> FetchedPageVideoInfo:
+        """取得済の動画に到達するまでの動画一覧をページ単位で取得して fetched_d に反映する
+
+        Notes:
+            ページングしない場合（is_paging 参照）は fetched_d をそのまま返す
+            マイリスト/シリーズは最初の取得が固定のページサイズの 1ページ目となっているため、2ページ目以降を辿る
+                マイリストは 1ページ目に取得済の動画が含まれているか、1ページ目が最終ページならば辿らない
+                シリーズは古い順のため最終ページから遡り、取得済の動画で打ち切らなければ最後に 1ページ目を結合する
+            投稿動画の fetch_url の返り値は新しい順で、page_url() とページサイズが異なりページ境界が揃わない
+                取得済の動画が含まれていればそれより新しい動画はすべて含まれているため、辿らずにそのまま用いる
+                含まれていなければ 1ページ目から辿り直し、fetch_url の返り値からはメタ情報のみを使う
+
+        Args:
+            fetched_d (FetchedPageVideoInfo): 最初の取得結果の解析結果
+            response_text (str): 最初の取得結果
+
+        Returns:
+            FetchedPageVideoInfo: ページ単位で取得した動画一覧を反映した解析結果,
+                                  ページングしなかった場合は fetched_d そのもの
+        """
+        if not self.is_paging or len(fetched_d.video_id_list) == 0:
+            return fetched_d
+
+        iterator = MylistPageIterator(
+            self.mylist_url, self._get_session_response, self.known_video_id_list, self.is_backfill
+        )
+        first_items = list(
+            zip(fetched_d.video_id_list, fetched_d.title_list, fetched_d.registered_at_list, fetched_d.video_url_list)
+        )
+        if self.is_first_page_aligned:
+            if not iterator.is_ascending and (
+                iterator.is_reached_known(fetched_d.video_id_list) or len(first_items) < iterator.page_size
+            ):
+                return fetched_d
+            start_page = 2
+        else:
+            if iterator.is_reached_known(fetched_d.video_id_list):
+                return fetched_d
+            first_items = []
+            start_page = 1
+
+        page_items = []
+        is_page_fetched = False
+        is_reached_known = False
+        async for mylist_page in iterator.iterate(start_page, response_text):
+            is_page_fetched = True
+            page_items.extend(
+                zip(
+                    mylist_page.video_id_list,
+                    mylist_page.title_list,
+                    mylist_page.registered_at_list,
+                    mylist_page.video_url_list,
+                )
+            )
+            is_reached_known = iterator.is_reached_known(mylist_page.video_id_list)
+        if not is_page_fetched:
+            return fetched_d
+
+        if iterator.is_ascending:
+            # 最終ページから遡っているため、取得済の動画で打ち切らなかった場合のみ最後に 1ページ目を結合する
+            video_items = page_items if is_reached_known else page_items + first_items
+        else:
+            video_items = first_items + page_items
+
+        # 取得中に動画が追加されるとページ境界がずれて重複することがある
+        seen_video_id_set = set()
+        unique_video_items = []
+        for video_item in video_items:
+            if video_item[0].id in seen_video_id_set:
+                continue
+            seen_video_id_set.add(video_item[0].id)
+            unique_video_items.append(video_item)
+
+        logger.info(f"{self.mylist_url.non_query_url} : {len(unique_video_items)} videos fetched from pages.")
+        return self._replace_video_list(fetched_d, unique_video_items)
+
+    def _exclude_known_videos(self, fetched_d: FetchedPageVideoInfo) -> FetchedPageVideoInfo:
+        """取得済の動画を除いた解析結果を返す
+
+        Notes:
+            ページングしながら差分を取得する場合（known_video_id_list が空でなく is_backfill でない場合）、
+            取得済の動画は動画情報APIを引かずに結果から除き、新しく追加された動画のみを返す
+            取得済の動画のDB上の情報はそのまま残る（タイトル変更などは is_backfill での取得時に反映される）
+
+        Args:
+            fetched_d (FetchedPageVideoInfo): 解析結果
+
+        Returns:
+            FetchedPageVideoInfo: 取得済の動画を除いた解析結果, 除く必要がない場合は fetched_d そのもの
+        """
+        if not self.known_video_id_list or self.is_backfill:
+            return fetched_d
+        known_video_id_set = set(self.known_video_id_list)
+        video_items = [
+            video_item
+            for video_item in zip(
+                fetched_d.video_id_list, fetched_d.title_list, fetched_d.registered_at_list, fetched_d.video_url_list
+            )
+            if video_item[0].id not in known_video_id_set
+        ]
+        if len(video_items) == len(fetched_d.video_id_list):
+            return fetched_d
+        return self._replace_video_list(fetched_d, video_items)
+
     async def _fetch_videoinfo_from_fetch_url(self) -> FetchedVideoInfo:
         """投稿動画/マイリストページアドレスから掲載されている動画の情報を取得する
 
@@ -48,14 +210,23 @@ class VideoInfoFetcher(VideoInfoFetcherBase):
         Returns:
             video_info_list (list[dict]): 動画情報をまとめた辞書リスト キーはNotesを参照, エラー時 空リスト
         """
-        # fetch_url を元に動画情報を fetch
-        response = await self._get_session_response(self.mylist_url.fetch_url)
+        # fetch_url（ページングする場合マイリスト/シリーズは page_url の 1ページ目）を元に動画情報を fetch
+        request_url = self.first_request_url
+        response = await self._get_session_response(request_url)
         if not response:
+            if self.is_permanent_failure():
+                raise PermanentFetchError(f"{request_url} : status code {self.last_status_code}.")
             raise ValueError("fetch request failed.")
 
         # RSS/APIから必要な情報を収集する
         fetched_d = await self._analysis_response_text(response.text)
 
+        # 取得済の動画に到達するまでページ単位で辿る
+        fetched_d = await self._fetch_pages(fetched_d, response.text)
+
+        # 取得済の動画は動画情報APIを引かない
+        fetched_d = self._exclude_known_videos(fetched_d)
+
         userid = fetched_d.userid
         mylistid = fetched_d.mylistid
         video_id_list = fetched_d.video_id_list
@@ -70,7 +241,7 @@ class VideoInfoFetcher(VideoInfoFetcherBase):
             raise ValueError("video url from fetched data and from api is different.")
 
         # config取得
-        config = process_config.ConfigBase.get_config()
+        config = ConfigStore.get_config()
         if not config:
             raise ValueError("config read failed.")
 
@@ -92,7 +263,8 @@ class VideoInfoFetcher(VideoInfoFetcherBase):
             pass  # 仮に書き込みに失敗しても以降の処理は続行する
 
         # 結合
-        video_d = FetchedVideoInfo.merge(fetched_d, api_d)
+        with span(SpanStage.merge):
+            video_d = FetchedVideoInfo.merge(fetched_d, api_d)
         return video_d
 
     async def _fetch_videoinfo(self) -> FetchedVideoInfo:
@@ -101,7 +273,7 @@ class VideoInfoFetcher(VideoInfoFetcherBase):
 
 if __name__ == "__main__":
     logging.config.fileConfig("./log/logging.ini", disable_existing_loggers=False)
-    process_config.ConfigBase.set_config()
+    ConfigStore.set_config()
 
     urls = [
         # "https://www.nicovideo.jp/user/37896001/video",  # 投稿動画
@@ -4,21 +4,22 @@ import pprint
 import traceback
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from datetime import datetime
+from http.cookiejar import CookieJar
 from logging import CRITICAL, INFO, getLogger
+from typing import ClassVar
 
 import browser_cookie3
 import httpx
 import xmltodict
 
-from nnmm.util import CustomLogger, Result
+from nnmm.update_trace import SpanStage, is_tracing, span
+from nnmm.util import CustomLogger, Result, normalize_datetime_list
 from nnmm.video_info_fetcher.value_objects.fetched_api_video_info import FetchedAPIVideoInfo
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
 from nnmm.video_info_fetcher.value_objects.mylist_url import MylistURL
 from nnmm.video_info_fetcher.value_objects.mylist_url_factory import MylistURLFactory
 from nnmm.video_info_fetcher.value_objects.title import Title
 from nnmm.video_info_fetcher.value_objects.title_list import TitleList
-from nnmm.video_info_fetcher.value_objects.uploaded_at import UploadedAt
 from nnmm.video_info_fetcher.value_objects.uploaded_at_list import UploadedAtList
 from nnmm.video_info_fetcher.value_objects.username import Username
 from nnmm.video_info_fetcher.value_objects.username_list import UsernameList
@@ -38,25 +39,108 @@ httpx_logger = getLogger("httpx")
 httpx_logger.setLevel(CRITICAL)
 
 
+class PermanentFetchError(Exception):
+    """マイリストが削除された（404, 410）など、再試行しても回復しない取得失敗を表す例外"""
+
+
 @dataclass
 class VideoInfoFetcherBase(ABC):
     mylist_url: MylistURL
+    known_video_id_list: list[str] | None
+    is_backfill: bool
+    last_status_code: int | None
 
     API_URL_BASE = "https://ext.nicovideo.jp/api/getthumbinfo/"
     MAX_RETRY_NUM = 5
+    PERMANENT_FAILURE_STATUS_CODES = (404, 410)
+
+    # 通信に用いる httpx のトランスポート, Noneなら実際のサイトに接続する
+    # ベンチマークなどで実際のサイトに接続せずに取得処理を行う場合に configure_transport() で差し替える
+    _transport: ClassVar[httpx.AsyncBaseTransport | None] = None
+
+    def __init__(self, url: str, known_video_id_list: list[str] | None = None, is_backfill: bool = False):
+        """初期設定
 
-    def __init__(self, url: str):
+        Args:
+            url (str): 対象マイリストURL
+            known_video_id_list (list[str] | None): 取得済の動画IDリスト
+                                                    指定時は取得済の動画に到達するまで2ページ目以降も取得する
+            is_backfill (bool): Trueなら取得済の動画に関わらず全ページを取得する
+        """
         self.mylist_url = MylistURLFactory.create(url)
+        self.known_video_id_list = known_video_id_list
+        self.is_backfill = is_backfill
+        self.last_status_code = None
+
+    @classmethod
+    def configure_transport(cls, transport: httpx.AsyncBaseTransport | None) -> None:
+        """通信に用いる httpx のトランスポートを差し替える
+
+        Notes:
+            プロセス全体の設定として、全ての派生クラスのページ取得と動画情報APIの取得に用いる
+            トランスポートはリクエストごとのクライアントの終了時に閉じられるため、
+            閉じても再利用できるもの（httpx.MockTransport など）を渡すこと
+            差し替えている間はブラウザのクッキーを読み込まない
+
+        Args:
+            transport (httpx.AsyncBaseTransport | None): 差し替え先のトランスポート, Noneなら実際のサイトに接続する
+        """
+        if not isinstance(transport, httpx.AsyncBaseTransport | None):
+            raise ValueError("transport must be httpx.AsyncBaseTransport or None.")
+        VideoInfoFetcherBase._transport = transport
+
+    @staticmethod
+    def _create_transport(retries: int) -> httpx.AsyncBaseTransport:
+        """通信に用いる httpx のトランスポートを返す, 差し替えられていればそれを返す"""
+        if VideoInfoFetcherBase._transport is not None:
+            return VideoInfoFetcherBase._transport
+        return httpx.AsyncHTTPTransport(retries=retries)
+
+    @staticmethod
+    def _load_cookies() -> CookieJar | dict:
+        """ブラウザのクッキーを読み込む, トランスポートが差し替えられていれば読み込まない"""
+        if VideoInfoFetcherBase._transport is not None:
+            return {}
+        return browser_cookie3.firefox(domain_name="nicovideo.jp")
+
+    @staticmethod
+    def _get_trace_kwargs(attrs: dict) -> dict:
+        """スパンを記録中なら、接続の試行回数からリトライ回数を数える httpx の trace 拡張を返す
+
+        Notes:
+            AsyncHTTPTransport の接続のリトライは httpx の外からは見えないため、
+            TCP接続の開始イベントを数えて 2回目以降をリトライとして attrs["retry_count"] に記録する
 
-    async def _get_session_response(self, request_url: str) -> httpx.Response | None:
+        Args:
+            attrs (dict): span() で受け取った付随情報
+
+        Returns:
+            dict: client.get() に渡すキーワード引数, 記録していなければ空辞書
+        """
+        if not is_tracing():
+            return {}
+        attrs["retry_count"] = 0
+        connect_count = 0
+
+        async def trace(event_name: str, info: dict) -> None:
+            nonlocal connect_count
+            if event_name == "connection.connect_tcp.started":
+                connect_count = connect_count + 1
+                attrs["retry_count"] = connect_count - 1
+
+        return {"extensions": {"trace": trace}}
+
+    async def _get_session_response(self, request_url: str, max_retry_num: int | None = None) -> httpx.Response | None:
         """非同期でページ取得する
 
         Notes:
             接続は self.MAX_RETRY_NUM = 5 回試行する
             この回数リトライしてもページ取得できなかった場合、responseがNoneとなる
+            レスポンスのステータスコードは self.last_status_code に記録する
 
         Args:
             request_url (str): リクエストURL
+            max_retry_num (int | None): 接続のリトライ回数, Noneなら self.MAX_RETRY_NUM
 
         Returns:
             response (httpx.Response): ページ取得結果のレスポンス
@@ -65,8 +149,10 @@ class VideoInfoFetcherBase(ABC):
         response = None
         follow_redirects = True
         timeout = httpx.Timeout(60, read=10)
-        transport = httpx.AsyncHTTPTransport(retries=self.MAX_RETRY_NUM)
-        cj = browser_cookie3.firefox(domain_name="nicovideo.jp")
+        retries = self.MAX_RETRY_NUM if max_retry_num is None else max_retry_num
+        transport = self._create_transport(retries)
+        with span(SpanStage.cookie_load):
+            cj = self._load_cookies()
         headers = {
             "User-Agent": "Mozilla/5.0",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8,application/json;charset=utf-8",
@@ -82,7 +168,11 @@ class VideoInfoFetcherBase(ABC):
             ) as client:
                 client.cookies.update(cj)
                 client.headers.update(headers)
-                response = await client.get(request_url)
+                with span(SpanStage.page_request, url=request_url) as attrs:
+                    response = await client.get(request_url, **self._get_trace_kwargs(attrs))
+                    self.last_status_code = response.status_code
+                    attrs["status_code"] = response.status_code
+                    attrs["bytes"] = len(response.content)
                 response.raise_for_status()
         except Exception:
             logger.error(request_url)
@@ -103,49 +193,70 @@ class VideoInfoFetcherBase(ABC):
         Returns:
             FetchedAPIVideoInfo: 解析結果
         """
-        src_df = "%Y-%m-%dT%H:%M:%S%z"
-        dst_df = "%Y-%m-%d %H:%M:%S"
-
         if not isinstance(video_id_list, VideoidList):
             raise ValueError("Get videoinfo from api failed, video_id_list is not VideoidList.")
 
-        title_list = []
-        uploaded_at_list = []
-        video_url_list = []
-        username_list = []
+        response_text_list = []
         follow_redirects = True
         timeout = httpx.Timeout(60, read=10)
-        transport = httpx.AsyncHTTPTransport(retries=self.MAX_RETRY_NUM)
+        transport = self._create_transport(self.MAX_RETRY_NUM)
         async with httpx.AsyncClient(
             follow_redirects=follow_redirects, timeout=timeout, transport=transport
         ) as client:
             for video_id in video_id_list:
                 url = self.API_URL_BASE + video_id.id
 
-                response = await client.get(url)
+                with span(SpanStage.api_lookup, video_id=video_id.id) as attrs:
+                    response = await client.get(url, **self._get_trace_kwargs(attrs))
+                    attrs["status_code"] = response.status_code
+                    attrs["bytes"] = len(response.content)
                 response.raise_for_status()
-                xml_dict = xmltodict.parse(response.text)
-                thumb_lx = xml_dict["nicovideo_thumb_response"]["thumb"]
+                response_text_list.append(response.text)
+
+        with span(SpanStage.parse, kind="api"):
+            return self.parse_api_response_list(video_id_list, response_text_list)
+
+    @classmethod
+    def parse_api_response_list(cls, video_id_list: VideoidList, response_text_list: list[str]) -> FetchedAPIVideoInfo:
+        """動画情報APIの応答を解析する
 
-                # 動画タイトル
-                title = thumb_lx["title"]
-                title_list.append(Title(title))
+        Notes:
+            通信を伴わないため、取得済の応答の解析のみを行う場合（ベンチマークなど）にも用いる
 
-                # 投稿日時
-                uploaded_at = datetime.strptime(thumb_lx["first_retrieve"], src_df).strftime(dst_df)
-                uploaded_at_list.append(UploadedAt(uploaded_at))
+        Args:
+            video_id_list (VideoidList): 動画IDリスト
+            response_text_list (list[str]): 動画IDそれぞれについての動画情報APIの応答
 
-                # 動画URL
-                video_url = thumb_lx["watch_url"]
-                video_url_list.append(VideoURL.create(video_url))
+        Returns:
+            FetchedAPIVideoInfo: 解析結果
+        """
+        title_list = []
+        uploaded_at_list = []
+        video_url_list = []
+        username_list = []
+        for response_text in response_text_list:
+            xml_dict = xmltodict.parse(response_text)
+            thumb_lx = xml_dict["nicovideo_thumb_response"]["thumb"]
+
+            # 動画タイトル
+            title = thumb_lx["title"]
+            title_list.append(Title(title))
 
-                # 投稿者
-                username = thumb_lx["user_nickname"]
-                username_list.append(Username(username))
+            # 投稿日時
+            uploaded_at_list.append(thumb_lx["first_retrieve"])
+
+            # 動画URL
+            video_url = thumb_lx["watch_url"]
+            video_url_list.append(VideoURL.create(video_url))
+
+            # 投稿者
+            username = thumb_lx["user_nickname"]
+            username_list.append(Username(username))
 
         # ValueObjectに変換
         title_list = TitleList.create(title_list)
-        uploaded_at_list = UploadedAtList.create(uploaded_at_list)
+        # 投稿日時はまとめて変換する
+        uploaded_at_list = UploadedAtList.create(normalize_datetime_list(uploaded_at_list))
         video_url_list = VideoURLList.create(video_url_list)
         username_list = UsernameList.create(username_list)
 
@@ -161,33 +272,73 @@ class VideoInfoFetcherBase(ABC):
 
         return FetchedAPIVideoInfo(**res)
 
+    def is_permanent_failure(self) -> bool:
+        """直近のページ取得の失敗が再試行しても回復しないものかどうかを返す"""
+        return self.last_status_code in self.PERMANENT_FAILURE_STATUS_CODES
+
     @abstractmethod
     async def _fetch_videoinfo(self) -> FetchedVideoInfo:
         raise NotImplementedError
 
     @classmethod
-    async def fetch_videoinfo(cls, url: str) -> FetchedVideoInfo | Result:
+    async def fetch_videoinfo(
+        cls, url: str, known_video_id_list: list[str] | None = None, is_backfill: bool = False
+    ) -> FetchedVideoInfo | Result:
+        """動画情報を取得する
+
+        Returns:
+            FetchedVideoInfo | Result: 動画情報, 取得失敗時 Result.failed
+
+        Raises:
+            PermanentFetchError: マイリストが削除されているなど、再試行しても回復しない失敗の場合
+        """
         res = []
         try:
-            fetcher = cls(url)
+            fetcher = cls(url, known_video_id_list, is_backfill)
             res = await fetcher._fetch_videoinfo()
+        except PermanentFetchError:
+            logger.error(f"{url} : permanent fetch failure.")
+            raise
         except Exception:
             logger.error(traceback.format_exc())
             return Result.failed
         return res
 
+    @classmethod
+    async def probe(cls, url: str) -> bool:
+        """リトライなしの1リクエストで、マイリストが取得できる状態に戻ったかを確認する
+
+        Notes:
+            恒久的な失敗で更新を止めているマイリストの回復確認に用いる
+            動画情報の解析や2ページ目以降、動画情報APIの取得は行わない
+
+        Args:
+            url (str): 対象マイリストURL
+
+        Returns:
+            bool: 取得できればTrue, 一時的な失敗ならFalse
+
+        Raises:
+            PermanentFetchError: 依然として再試行しても回復しない失敗の場合
+        """
+        fetcher = cls(url)
+        response = await fetcher._get_session_response(fetcher.mylist_url.fetch_url, max_retry_num=0)
+        if response is None and fetcher.is_permanent_failure():
+            raise PermanentFetchError(f"{url} : status code {fetcher.last_status_code}.")
+        return response is not None
+
 
 if __name__ == "__main__":
-    from nnmm.process import config as process_config
+    from nnmm.config_store import ConfigStore
 
     logging.config.fileConfig("./log/logging.ini", disable_existing_loggers=False)
     for name in logging.root.manager.loggerDict:
         getLogger(name).disabled = True
-    process_config.ConfigBase.set_config()
+    ConfigStore.set_config()
 
     class ConcreteVideoInfoFetcher(VideoInfoFetcherBase):
-        def __init__(self, url: str):
-            super().__init__(url)
+        def __init__(self, url: str, known_video_id_list: list[str] | None = None, is_backfill: bool = False):
+            super().__init__(url, known_video_id_list, is_backfill)
 
         async def _fetch_videoinfo(self) -> list[dict]:
             return await self._get_videoinfo_from_api(
@@ -11,6 +11,7 @@ from nnmm.main_window import MainWindow
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
 from nnmm.process.base import NEW_MYLIST_COLOR, ProcessBase
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
 from nnmm.process.value_objects.mylist_row import MylistRow, SelectedMylistRow
 from nnmm.process.value_objects.mylist_row_index import SelectedMylistRowIndex
 from nnmm.process.value_objects.mylist_row_list import MylistRowList
@@ -880,6 +881,31 @@ class TestProcessBase(unittest.TestCase):
             actual = instance.update_table_pane(params.mylist_url)
             post_run(actual, instance, params)
 
+    def test_reschedule_mylist(self):
+        mylist_url = "https://www.nicovideo.jp/user/10000001/video"
+
+        # スケジューラが設定されていない場合
+        actual = self.instance.reschedule_mylist(mylist_url)
+        self.assertEqual(Result.failed, actual)
+        self.instance.mylist_db.select_schedule.assert_not_called()
+
+        # DBにマイリストが存在する場合は登録し直す
+        scheduler = MagicMock(spec=MylistScheduler)
+        self.instance.window.mylist_scheduler = scheduler
+        record = {"url": mylist_url}
+        self.instance.mylist_db.select_schedule.return_value = [record]
+        actual = self.instance.reschedule_mylist(mylist_url)
+        self.assertEqual(Result.success, actual)
+        self.instance.mylist_db.select_schedule.assert_called_once_with(mylist_url)
+        self.assertEqual([call.schedule_from_record(record)], scheduler.mock_calls)
+
+        # DBにマイリストが存在しない場合は取り除く
+        scheduler.reset_mock()
+        self.instance.mylist_db.select_schedule.return_value = []
+        actual = self.instance.reschedule_mylist(mylist_url)
+        self.assertEqual(Result.success, actual)
+        self.assertEqual([call.remove(mylist_url)], scheduler.mock_calls)
+
 
 if __name__ == "__main__":
     import sys
@@ -66,6 +66,25 @@ class TestConfigBase(unittest.TestCase):
         self.assertEqual(ConfigBase.config, actual2)
         mock_set_config.assert_not_called()
 
+    def test_get_max_check_interval_minutes(self):
+        """ConfigBase.get_max_check_interval_minutes が適応的インターバルの上限を分で返すことを確認する"""
+        mock_get_config = self.enterContext(patch("nnmm.process.config.ConfigBase.get_config"))
+
+        mock_get_config.return_value = {"general": {"max_check_interval": "1日"}}
+        self.assertEqual(60 * 24, ConfigBase.get_max_check_interval_minutes())
+
+        # 使用しない設定の場合
+        mock_get_config.return_value = {"general": {"max_check_interval": "(使用しない)"}}
+        self.assertIsNone(ConfigBase.get_max_check_interval_minutes())
+
+        # 項目がない旧形式の設定ファイルの場合
+        mock_get_config.return_value = {"general": {"browser_path": "/path"}}
+        self.assertIsNone(ConfigBase.get_max_check_interval_minutes())
+
+        # 設定ファイルが読み込めない場合
+        mock_get_config.side_effect = IOError
+        self.assertIsNone(ConfigBase.get_max_check_interval_minutes())
+
     def test_set_config(self):
         """ConfigBase.set_config が orjson.loads と Path.read_bytes を使って設定を読み込むことを確認する"""
 
@@ -106,6 +106,44 @@ class TestConfigLoad(unittest.TestCase):
         window.tbox_rss_save_path.reset_mock()
         window.tbox_db_path.reset_mock()
 
+        # 適応的インターバルの上限のコンボボックスがある場合は設定値を反映する
+        window.cbox_max_check_interval = MagicMock()
+        cfg = {
+            "general": {
+                "browser_path": "/b4",
+                "auto_reload": "(使用しない)",
+                "rss_save_path": "/r4",
+                "max_check_interval": "1日",
+            },
+            "db": {"save_path": "/d4"},
+        }
+        self.enterContext(patch("nnmm.process.config.ConfigBase.get_config", return_value=cfg))
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        window.cbox_max_check_interval.clear.assert_called_once_with()
+        window.cbox_max_check_interval.addItems.assert_called_once_with(ConfigLoad.MAX_CHECK_INTERVAL_CANDIDATES)
+        window.cbox_max_check_interval.addItem.assert_not_called()
+        window.cbox_max_check_interval.setCurrentText.assert_called_once_with("1日")
+
+        # 候補にない文言でもフォーマットが合っているなら候補に追加され選択される
+        window.cbox_max_check_interval.reset_mock()
+        cfg["general"]["max_check_interval"] = "2週間"
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        window.cbox_max_check_interval.addItem.assert_called_once_with("2週間")
+        window.cbox_max_check_interval.setCurrentText.assert_called_once_with("2週間")
+
+        # 項目がない旧形式の設定ファイルや不正な値の場合は"(使用しない)"が適用される
+        for max_check_interval in [None, "invalid_format"]:
+            window.cbox_max_check_interval.reset_mock()
+            cfg["general"].pop("max_check_interval", None)
+            if max_check_interval is not None:
+                cfg["general"]["max_check_interval"] = max_check_interval
+            actual = instance.callback()
+            self.assertEqual(Result.success, actual)
+            window.cbox_max_check_interval.addItem.assert_not_called()
+            window.cbox_max_check_interval.setCurrentText.assert_called_once_with("(使用しない)")
+
         # 異常系: ウィジェットが存在しない場合は失敗を返す
         # window は QDialog だが tbox や cbox を持たない
         self.process_info.window = MagicMock(spec=QDialog)
@@ -147,6 +147,8 @@ class TestConfigSave(unittest.TestCase):
             mock_mdb = self.enterContext(patch("nnmm.process.config.MylistDBController"))
             mock_minfo = self.enterContext(patch("nnmm.process.config.MylistInfoDBController"))
             # 実際の shutil.move を使って移動を確認する（必要ならパッチでも可）
+            prev_mylist_db = self.process_info.mylist_db
+            prev_mylist_info_db = self.process_info.mylist_info_db
             instance = ConfigSave(self.process_info)
             actual = instance.callback()
 
@@ -154,7 +156,9 @@ class TestConfigSave(unittest.TestCase):
             # 設定ファイルに新しいパスが書き込まれていること
             saved_cfg = orjson.loads(Path(ConfigBase.CONFIG_FILE_PATH).read_bytes())
             self.assertEqual(new_cfg, saved_cfg)
-            # コントローラが再生成されていること
+            # 移動前に以前のDBの接続が閉じられ、コントローラが再生成されていること
+            prev_mylist_db.close.assert_called_once_with()
+            prev_mylist_info_db.close.assert_called_once_with()
             mock_mdb.assert_called()
             mock_minfo.assert_called()
         finally:
@@ -235,6 +239,43 @@ class TestConfigSave(unittest.TestCase):
             tmp_prev.unlink(missing_ok=True)
             tmp_cfg.unlink(missing_ok=True)
 
+        # 適応的インターバルの上限のコンボボックスがある場合は設定値を書き込む
+        tmp_cfg = Path(tempfile.NamedTemporaryFile(delete=False).name)
+        try:
+            prev_cfg = {
+                "general": {"browser_path": "/b", "auto_reload": "(使用しない)", "rss_save_path": "/r"},
+                "db": {"save_path": str(tmp_cfg)},
+            }
+            ConfigBase.config = prev_cfg
+            orig_cfg_path = ConfigBase.CONFIG_FILE_PATH
+            ConfigBase.CONFIG_FILE_PATH = str(tmp_cfg)
+
+            self.process_info.window.tbox_browser_path.text.return_value = "/b"
+            self.process_info.window.cbox.currentText.return_value = "(使用しない)"
+            self.process_info.window.tbox_rss_save_path.text.return_value = "/r"
+            self.process_info.window.tbox_db_path.text.return_value = str(tmp_cfg)
+            self.process_info.window.cbox_max_check_interval = MagicMock(spec=QComboBox)
+            self.enterContext(patch("nnmm.process.config.popup"))
+            self.enterContext(patch("nnmm.process.config.ConfigBase.set_config"))
+
+            for max_check_interval, expect_value in [
+                ("1週間", "1週間"),
+                ("2週間", "2週間"),
+                ("invalid_format", "(使用しない)"),
+            ]:
+                self.process_info.window.cbox_max_check_interval.currentText.return_value = max_check_interval
+                instance = ConfigSave(self.process_info)
+                actual = instance.callback()
+                self.assertEqual(Result.success, actual)
+
+                saved_cfg = orjson.loads(Path(ConfigBase.CONFIG_FILE_PATH).read_bytes())
+                expected_cfg = copy.deepcopy(prev_cfg)
+                expected_cfg["general"]["max_check_interval"] = expect_value
+                self.assertEqual(expected_cfg, saved_cfg)
+        finally:
+            ConfigBase.CONFIG_FILE_PATH = orig_cfg_path
+            tmp_cfg.unlink(missing_ok=True)
+
         # 必要なウィジェットが無ければ abort -> Result.failed
         self.process_info.window = MagicMock(spec=QDialog)  # no tbox/cbox attributes
         instance = ConfigSave(self.process_info)
@@ -418,6 +418,7 @@ class TestCreateMylist(unittest.TestCase):
             instance.set_bottom_textbox = MagicMock()
             instance.update_mylist_pane = MagicMock()
             instance.update_table_pane = MagicMock()
+            instance.reschedule_mylist = MagicMock()
 
             mylist_url = self._get_mylist_url_list()[0]
             mock_popup_get_text.reset_mock()
@@ -597,6 +598,7 @@ class TestCreateMylist(unittest.TestCase):
                 ],
                 instance.mylist_db.mock_calls,
             )
+            instance.reschedule_mylist.assert_called_once_with(non_query_url)
 
             instance.set_upper_textbox.assert_called_once_with(non_query_url)
             instance.set_bottom_textbox.assert_any_call("マイリスト追加完了")
@@ -142,6 +142,7 @@ class TestDeleteMylist(unittest.TestCase):
             instance.set_all_table_row = MagicMock()
             instance.set_upper_textbox = MagicMock()
             instance.set_bottom_textbox = MagicMock()
+            instance.reschedule_mylist = MagicMock()
 
             return instance
 
@@ -204,6 +205,7 @@ class TestDeleteMylist(unittest.TestCase):
 
             instance.mylist_info_db.delete_in_mylist.assert_called_once_with(mylist_url)
             instance.mylist_db.delete_from_mylist_url.assert_called_once_with(mylist_url)
+            instance.reschedule_mylist.assert_called_once_with(mylist_url)
             instance.update_mylist_pane.assert_called_once_with()
             instance.set_all_table_row.assert_called_once_with([])
             instance.set_upper_textbox.assert_called_once_with("")
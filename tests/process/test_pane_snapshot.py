@@ -0,0 +1,198 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from mock import MagicMock, call, patch
+from PySide6.QtWidgets import QDialog
+
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.pane_snapshot import ReconcilePaneSnapshot, RestorePaneSnapshot, SavePaneSnapshot, get_snapshot_path
+from nnmm.process.value_objects.pane_snapshot import PaneSnapshot
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.process.value_objects.table_row_list import TableRowList
+from nnmm.process.value_objects.textbox_upper import UpperTextbox
+from nnmm.util import Result
+
+MYLIST_URL = "https://www.nicovideo.jp/user/2222222/video"
+
+
+class TestPaneSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.process.pane_snapshot.logger"))
+        self.temp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.db_fullpath = self.temp_dir / "NNMM_DB.db"
+        self.snapshot_path = self.temp_dir / "NNMM_DB_pane_snapshot.json"
+
+        self.process_info = MagicMock(spec=ProcessInfo)
+        self.process_info.name = "-TEST_PROCESS-"
+        self.process_info.window = MagicMock(spec=QDialog)
+        self.process_info.window.db_fullpath = self.db_fullpath
+        self.process_info.mylist_db = MagicMock(spec=MylistDBController)
+        self.process_info.mylist_info_db = MagicMock(spec=MylistInfoDBController)
+
+    def _make_showname_list(self) -> list[str]:
+        return ["投稿者1さんの投稿動画", "*:投稿者2さんの投稿動画", "投稿者3さんの投稿動画"]
+
+    def _make_table_row_list(self, num: int = 3) -> list[list[str]]:
+        return [
+            [
+                f"{i + 1}",
+                f"sm1000000{i}",
+                f"動画タイトル{i}",
+                "投稿者2",
+                "未視聴",
+                "2023-12-26 12:34:56",
+                "2023-12-26 12:34:56",
+                f"https://www.nicovideo.jp/watch/sm1000000{i}",
+                MYLIST_URL,
+            ]
+            for i in range(num)
+        ]
+
+    def _make_snapshot(self) -> PaneSnapshot:
+        return PaneSnapshot.create(self._make_showname_list(), [1], 1, MYLIST_URL, self._make_table_row_list())
+
+    def test_get_snapshot_path(self):
+        self.assertEqual(Path("./NNMM_DB_pane_snapshot.json"), get_snapshot_path("./NNMM_DB.db"))
+        self.assertEqual(self.snapshot_path, get_snapshot_path(self.db_fullpath))
+        self.assertIsNone(get_snapshot_path(":memory:"))
+        self.assertIsNone(get_snapshot_path(""))
+        self.assertIsNone(get_snapshot_path(Path("")))
+        self.assertIsNone(get_snapshot_path(None))
+
+    def test_component(self):
+        for process_class in [SavePaneSnapshot, RestorePaneSnapshot, ReconcilePaneSnapshot]:
+            instance = process_class(self.process_info)
+            self.assertEqual(self.process_info, instance.process_info)
+            self.assertIsNone(instance.create_component())
+
+    def test_save(self):
+        instance = SavePaneSnapshot(self.process_info)
+        showname_list = self._make_showname_list()
+        list_widget = MagicMock()
+        self.process_info.window.list_widget = list_widget
+        list_widget.count.return_value = len(showname_list)
+        list_widget.item.side_effect = lambda i: MagicMock(**{"text.return_value": showname_list[i]})
+        list_widget.currentRow.return_value = 1
+        instance.get_upper_textbox = MagicMock(return_value=UpperTextbox(MYLIST_URL))
+        instance.get_all_table_row = MagicMock(return_value=TableRowList.create(self._make_table_row_list()))
+
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        self.assertEqual(self._make_snapshot(), PaneSnapshot.from_bytes(self.snapshot_path.read_bytes()))
+        self.assertEqual([self.snapshot_path], list(self.temp_dir.iterdir()))
+
+        # 未選択, テーブル未表示の場合
+        list_widget.currentRow.return_value = -1
+        instance.get_upper_textbox.return_value = UpperTextbox("")
+        instance.get_all_table_row.return_value = TableRowList.create([])
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        expect = PaneSnapshot.create(showname_list, [1], 0, "", [])
+        self.assertEqual(expect, PaneSnapshot.from_bytes(self.snapshot_path.read_bytes()))
+
+        # 保存に失敗した場合は以前のスナップショットを残す
+        instance.get_all_table_row.side_effect = ValueError
+        actual = instance.callback()
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(expect, PaneSnapshot.from_bytes(self.snapshot_path.read_bytes()))
+
+        # 保存先がない場合
+        self.process_info.window.db_fullpath = ":memory:"
+        actual = SavePaneSnapshot(self.process_info).callback()
+        self.assertEqual(Result.failed, actual)
+
+    def test_restore(self):
+        instance = RestorePaneSnapshot(self.process_info)
+        instance.set_all_mylist_row = MagicMock()
+        instance.set_upper_textbox = MagicMock()
+        instance.set_all_table_row = MagicMock()
+
+        def pre_run(snapshot_bytes: bytes | None) -> None:
+            instance.set_all_mylist_row.reset_mock()
+            instance.set_upper_textbox.reset_mock()
+            instance.set_all_table_row.reset_mock()
+            self.snapshot_path.unlink(missing_ok=True)
+            if snapshot_bytes is not None:
+                self.snapshot_path.write_bytes(snapshot_bytes)
+
+        pre_run(self._make_snapshot().to_bytes())
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        instance.set_all_mylist_row.assert_called_once_with(self._make_showname_list(), [1], 1)
+        instance.set_upper_textbox.assert_called_once_with(MYLIST_URL, False)
+        instance.set_all_table_row.assert_called_once_with(TableRowList.create(self._make_table_row_list()))
+
+        # 選択中のインデックスが範囲外, テーブルの行が不正な場合
+        snapshot = PaneSnapshot.create(self._make_showname_list(), [], 5, MYLIST_URL, [["invalid"]])
+        pre_run(snapshot.to_bytes())
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        instance.set_all_mylist_row.assert_called_once_with(self._make_showname_list(), [], 0)
+        instance.set_all_table_row.assert_called_once_with(TableRowList.create([]))
+
+        # スナップショットがない, 不正な場合は何も表示しない
+        for snapshot_bytes in [None, b"invalid"]:
+            pre_run(snapshot_bytes)
+            actual = instance.callback()
+            self.assertEqual(Result.failed, actual)
+            instance.set_all_mylist_row.assert_not_called()
+            instance.set_upper_textbox.assert_not_called()
+            instance.set_all_table_row.assert_not_called()
+
+        self.process_info.window.db_fullpath = ":memory:"
+        actual = RestorePaneSnapshot(self.process_info).callback()
+        self.assertEqual(Result.failed, actual)
+
+    def test_reconcile(self):
+        instance = ReconcilePaneSnapshot(self.process_info)
+        instance.update_mylist_pane = MagicMock()
+        instance.get_upper_textbox = MagicMock()
+        instance.update_table_pane = MagicMock()
+        instance.set_upper_textbox = MagicMock()
+        instance.set_all_table_row = MagicMock()
+
+        def pre_run(mylist_url: str, records: list[dict]) -> None:
+            for m in [
+                instance.update_mylist_pane,
+                instance.update_table_pane,
+                instance.set_upper_textbox,
+                instance.set_all_table_row,
+            ]:
+                m.reset_mock()
+            instance.mylist_db.reset_mock()
+            instance.get_upper_textbox.return_value = UpperTextbox(mylist_url)
+            instance.mylist_db.select_from_url.return_value = records
+
+        # テーブルに表示していたマイリストがDBにあれば、DBの内容で表示し直す
+        pre_run(MYLIST_URL, [{"url": MYLIST_URL}])
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        instance.update_mylist_pane.assert_called_once_with()
+        instance.mylist_db.select_from_url.assert_called_once_with(MYLIST_URL)
+        instance.update_table_pane.assert_called_once_with(MYLIST_URL)
+        instance.set_all_table_row.assert_not_called()
+
+        # DBになければテーブルの表示を消す
+        pre_run(MYLIST_URL, [])
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        instance.update_table_pane.assert_not_called()
+        instance.set_upper_textbox.assert_called_once_with("", False)
+        instance.set_all_table_row.assert_called_once_with(TableRowList.create([]))
+
+        # テーブル未表示ならマイリストペインのみ表示し直す
+        pre_run("", [])
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        instance.update_mylist_pane.assert_called_once_with()
+        instance.mylist_db.select_from_url.assert_not_called()
+        self.assertEqual([call()], instance.update_mylist_pane.mock_calls)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
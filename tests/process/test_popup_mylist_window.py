@@ -440,6 +440,7 @@ class TestPopupMylistWindow(unittest.TestCase):
     def test_update_mylist_info(self):
         instance = PopupMylistWindow(self.process_info)
         instance.popup_window = MagicMock()
+        instance.reschedule_mylist = MagicMock()
 
         # 正常系
         record = self._make_record()
@@ -467,10 +468,12 @@ class TestPopupMylistWindow(unittest.TestCase):
             ],
             instance.mylist_db.mock_calls,
         )
+        instance.reschedule_mylist.assert_called_once_with(record["url"])
         instance.popup_window.close.assert_called_once()
 
         instance.mylist_db.reset_mock()
         instance.popup_window.reset_mock()
+        instance.reschedule_mylist.reset_mock()
 
         # 異常系: インターバル文字列が不正
         record = self._make_record()
@@ -481,6 +484,7 @@ class TestPopupMylistWindow(unittest.TestCase):
 
         self.assertEqual(Result.failed, actual)
         instance.mylist_db.assert_not_called()
+        instance.reschedule_mylist.assert_not_called()
         instance.popup_window.close.assert_called_once()
 
         instance.mylist_db.reset_mock()
@@ -9,6 +9,8 @@ from PySide6.QtWidgets import QDialog
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
 from nnmm.process.timer import Timer
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
+from nnmm.process.update_mylist.update_job_manager import UpdateJobManager
 from nnmm.process.value_objects.process_info import ProcessInfo
 from nnmm.util import Result
 
@@ -68,6 +70,7 @@ class TestTimer(unittest.TestCase):
         )
 
         def pre_run(params: Params) -> Timer:
+            self.process_info.window = MagicMock(spec=QDialog)
             instance = self._get_instance()
             instance.get_bottom_textbox = MagicMock()
             instance._timer_cancel = MagicMock()
@@ -84,6 +87,21 @@ class TestTimer(unittest.TestCase):
             elif params.kind_skip == "running":
                 instance.first_set = False
                 instance.get_bottom_textbox.return_value.to_str.return_value = "更新中"
+            elif params.kind_skip == "running_job":
+                instance.first_set = False
+                instance.window.update_job_manager = MagicMock(spec=UpdateJobManager)
+                instance.window.update_job_manager.is_running = True
+                instance.get_bottom_textbox.return_value.to_str.return_value = ""
+            elif params.kind_skip == "start_job":
+                instance.first_set = False
+                instance.window.update_job_manager = MagicMock(spec=UpdateJobManager)
+                instance.window.update_job_manager.is_running = False
+                instance.get_bottom_textbox.return_value.to_str.return_value = "更新中"
+            elif params.kind_skip == "scheduler":
+                instance.first_set = False
+                instance.window.mylist_scheduler = MagicMock(spec=MylistScheduler)
+                instance._dispatch_due_mylist = MagicMock(return_value=12345)
+                instance.get_bottom_textbox.return_value.to_str.return_value = "更新中"
             else:  # "start"
                 instance.first_set = False
                 instance.get_bottom_textbox.return_value.to_str.return_value = ""
@@ -108,25 +126,41 @@ class TestTimer(unittest.TestCase):
                 mock_qtimer.assert_not_called()
                 return
 
-            instance.get_bottom_textbox.return_value.to_str.assert_called_once_with()
+            # UpdateJobManager が設定されていれば左下のテキストボックスは参照しない
+            if params.kind_skip in ["running", "start"]:
+                instance.get_bottom_textbox.return_value.to_str.assert_called_once_with()
+            else:
+                instance.get_bottom_textbox.assert_not_called()
 
             if params.kind_skip == "first_set":
                 mock_process_info.assert_not_called()
                 mock_partial.assert_not_called()
-            elif params.kind_skip == "running":
+            elif params.kind_skip == "scheduler":
+                # 期限を過ぎたマイリストの更新処理の起動は _dispatch_due_mylist に任せる
+                instance._dispatch_due_mylist.assert_called_once_with(instance.window.mylist_scheduler, 15 * 60 * 1000)
                 mock_process_info.assert_not_called()
                 mock_partial.assert_not_called()
-            else:  # "start"
+            elif params.kind_skip in ["running", "running_job"]:
+                mock_process_info.assert_not_called()
+                mock_partial.assert_not_called()
+            else:  # "start", "start_job"
                 mock_process_info.assert_called_once_with("インターバル更新", instance.window)
                 self.assertEqual([call(mock_process_info.return_value), call().callback()], mock_partial.mock_calls)
 
             instance._timer_cancel.assert_called_once_with()
             mock_qtimer.assert_called()
+            if params.kind_skip == "scheduler":
+                mock_qtimer.return_value.start.assert_called_once_with(12345)
+            else:
+                mock_qtimer.return_value.start.assert_called_once_with(15 * 60 * 1000)
 
         params_list = [
             Params("15分毎", "first_set", Result.success),
             Params("15分毎", "running", Result.success),
             Params("15分毎", "start", Result.success),
+            Params("15分毎", "running_job", Result.success),
+            Params("15分毎", "start_job", Result.success),
+            Params("15分毎", "scheduler", Result.success),
             Params("(使用しない)", "first_set", Result.failed),
             Params("", "first_set", Result.failed),
             Params("invalid", "first_set", Result.failed),
@@ -136,6 +170,57 @@ class TestTimer(unittest.TestCase):
             actual = instance.callback()
             post_run(actual, instance, params)
 
+    def test_dispatch_due_mylist(self):
+        mock_partial = self.enterContext(patch("nnmm.process.timer.partial.Partial"))
+        mock_process_info = self.enterContext(patch("nnmm.process.timer.ProcessInfo.create"))
+        mock_time = self.enterContext(patch("nnmm.process.timer.time.time"))
+        mock_time.return_value = 1000.0
+        max_wait_msec = 15 * 60 * 1000
+        mylist_url_list = [f"https://www.nicovideo.jp/user/1000000{i}/video" for i in range(1, 3)]
+
+        instance = self._get_instance()
+        scheduler = MagicMock(spec=MylistScheduler)
+        job_manager = MagicMock(spec=UpdateJobManager)
+        instance.window.update_job_manager = job_manager
+
+        # 期限を過ぎたマイリストがあれば更新処理に回し、次の期限まで待つ
+        job_manager.job_list.return_value = []
+        scheduler.pop_due.return_value = mylist_url_list
+        scheduler.next_check_at.return_value = 1060.0
+        actual = instance._dispatch_due_mylist(scheduler, max_wait_msec)
+        self.assertEqual(60 * 1000, actual)
+        scheduler.pop_due.assert_called_once_with(1000.0, Timer.DISPATCH_BATCH_SIZE)
+        mock_process_info.assert_called_once_with("インターバル更新", instance.window)
+        mock_partial.assert_called_once_with(mock_process_info.return_value)
+        self.assertEqual(mylist_url_list, mock_partial.return_value.target_mylist_url_list)
+        mock_partial.return_value.callback.assert_called_once_with()
+
+        # 期限を過ぎたマイリストがなければ起動しない, 待機時間は上限で打ち切る
+        mock_partial.reset_mock()
+        scheduler.pop_due.return_value = []
+        scheduler.next_check_at.return_value = 1000.0 + 24 * 60 * 60
+        actual = instance._dispatch_due_mylist(scheduler, max_wait_msec)
+        self.assertEqual(max_wait_msec, actual)
+        mock_partial.assert_not_called()
+
+        # 期限を過ぎたマイリストが残っていれば最小待機時間で再度起動する
+        scheduler.next_check_at.return_value = 900.0
+        actual = instance._dispatch_due_mylist(scheduler, max_wait_msec)
+        self.assertEqual(Timer.MIN_WAIT_MSEC, actual)
+
+        # 登録がなければ上限まで待つ
+        scheduler.next_check_at.return_value = None
+        actual = instance._dispatch_due_mylist(scheduler, max_wait_msec)
+        self.assertEqual(max_wait_msec, actual)
+
+        # 更新ジョブが上限まで実行中ならスケジューラから取り出さずに少し待つ
+        scheduler.reset_mock()
+        job_manager.job_list.return_value = [MagicMock()] * Timer.MAX_RUNNING_JOB_NUM
+        actual = instance._dispatch_due_mylist(scheduler, max_wait_msec)
+        self.assertEqual(Timer.BUSY_WAIT_MSEC, actual)
+        scheduler.pop_due.assert_not_called()
+        mock_partial.assert_not_called()
+
 
 if __name__ == "__main__":
     if sys.argv:
@@ -0,0 +1,177 @@
+import sys
+import unittest
+
+from mock import MagicMock, call, patch
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QDialog, QTableWidget
+
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_history import ShowUpdateHistory
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_run_db_controller import UpdateRunDBController
+from nnmm.update_trace import SpanStage
+from nnmm.util import Result
+
+MYLIST_URL_LIST = [
+    "https://www.nicovideo.jp/user/10000001/video",
+    "https://www.nicovideo.jp/user/10000002/video",
+    "https://www.nicovideo.jp/user/10000003/video",
+]
+
+
+class TestShowUpdateHistory(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.process.update_history.logger.info"))
+        self.process_info = MagicMock(spec=ProcessInfo)
+        self.process_info.name = "-TEST_PROCESS-"
+        self.process_info.window = MagicMock(spec=QDialog)
+        self.process_info.mylist_db = MagicMock(spec=MylistDBController)
+        self.process_info.mylist_info_db = MagicMock(spec=MylistInfoDBController)
+
+    def _make_run(self) -> dict:
+        return {
+            "id": 1,
+            "kind": "Every mylist",
+            "version": "2.1.0",
+            "started_at": "2023-12-22 12:34:00",
+            "finished_at": "2023-12-22 12:34:56",
+            "elapsed_sec": 56.123,
+            "target_num": 3,
+            "success_num": 1,
+            "failed_num": 1,
+            "cancelled_num": 1,
+            "new_video_num": 2,
+            "bytes": 2048,
+            "stage_total_ms": {"page_request": 10.04, "db_write": 5.0},
+        }
+
+    def _make_fetch_latency(self, mylist_url: str, latency_ms: float | None = 123.45) -> dict:
+        return {
+            "mylist_url": mylist_url,
+            "fetched_at": "2023-12-22 12:34:56",
+            "latency_ms": latency_ms,
+            "is_success": False,
+            "fetch_count": 4,
+            "failed_count": 1,
+        }
+
+    def test_init(self):
+        instance = ShowUpdateHistory(self.process_info)
+        self.assertEqual(self.process_info, instance.process_info)
+        self.assertEqual(10 + len(SpanStage), len(ShowUpdateHistory.RUN_COLS))
+
+    def test_create_component(self):
+        mock_button = self.enterContext(patch("nnmm.process.update_history.QPushButton"))
+        instance = ShowUpdateHistory(self.process_info)
+        actual = instance.create_component()
+        self.assertEqual(mock_button.return_value, actual)
+        mock_button.assert_called_once_with("-TEST_PROCESS-")
+        mock_button.return_value.clicked.connect.assert_called_once()
+
+    def test_to_run_row(self):
+        instance = ShowUpdateHistory(self.process_info)
+        actual = instance.to_run_row(self._make_run())
+        expect = ["2023-12-22 12:34:00", "Every mylist", "2.1.0", 56.12, 3, 1, 1, 1, 2, 2.0]
+        expect += [0.0, 10.0, 0.0, 0.0, 0.0, 0.0, 5.0]
+        self.assertEqual(expect, actual)
+        self.assertEqual(len(ShowUpdateHistory.RUN_COLS), len(actual))
+
+    def test_to_mylist_row(self):
+        instance = ShowUpdateHistory(self.process_info)
+        actual = instance.to_mylist_row(self._make_fetch_latency(MYLIST_URL_LIST[0]), "投稿者1さんの投稿動画")
+        expect = [
+            "投稿者1さんの投稿動画",
+            MYLIST_URL_LIST[0],
+            "2023-12-22 12:34:56",
+            123.5,
+            "失敗",
+            4,
+            1,
+            25.0,
+        ]
+        self.assertEqual(expect, actual)
+        self.assertEqual(len(ShowUpdateHistory.MYLIST_COLS), len(actual))
+
+        # 所要時間を計測できなかった場合, 取得回数が0の場合
+        fetch_latency = self._make_fetch_latency(MYLIST_URL_LIST[0], None) | {"is_success": True, "fetch_count": 0}
+        actual = instance.to_mylist_row(fetch_latency, "")
+        self.assertIsNone(actual[3])
+        self.assertEqual("成功", actual[4])
+        self.assertEqual(0.0, actual[7])
+
+    def test_set_table(self):
+        mock_item = self.enterContext(patch("nnmm.process.update_history.QTableWidgetItem"))
+        item_list = [MagicMock(), MagicMock()]
+        mock_item.side_effect = item_list
+        table_widget = MagicMock(spec=QTableWidget)
+
+        instance = ShowUpdateHistory(self.process_info)
+        instance.set_table(table_widget, ["列1", "列2"], [[1.5, None]])
+        self.assertEqual(
+            [
+                call.setSortingEnabled(False),
+                call.clearContents(),
+                call.setColumnCount(2),
+                call.setHorizontalHeaderLabels(["列1", "列2"]),
+                call.setRowCount(1),
+                call.setItem(0, 0, item_list[0]),
+                call.setItem(0, 1, item_list[1]),
+                call.setSortingEnabled(True),
+            ],
+            table_widget.mock_calls,
+        )
+        # 数値のまま設定し、None は空欄とする
+        self.assertEqual([call.setData(Qt.ItemDataRole.DisplayRole, 1.5)], item_list[0].mock_calls)
+        self.assertEqual([], item_list[1].mock_calls)
+
+    def test_callback(self):
+        instance = ShowUpdateHistory(self.process_info)
+        instance.set_table = MagicMock()
+
+        # 表示先や更新履歴のDBがない場合
+        actual = instance.callback()
+        self.assertEqual(Result.failed, actual)
+        instance.set_table.assert_not_called()
+
+        update_run_db = MagicMock(spec=UpdateRunDBController)
+        update_run_db.select.return_value = [self._make_run()]
+        update_run_db.select_fetch_latency.return_value = [
+            self._make_fetch_latency(mylist_url) for mylist_url in MYLIST_URL_LIST
+        ]
+        instance.window.update_run_db = update_run_db
+        instance.window.update_run_table_widget = MagicMock(spec=QTableWidget)
+        instance.window.mylist_latency_table_widget = MagicMock(spec=QTableWidget)
+        # 3件目のマイリストは削除済
+        instance.mylist_db.select.return_value = [
+            {"url": MYLIST_URL_LIST[0], "showname": "投稿者1さんの投稿動画"},
+            {"url": MYLIST_URL_LIST[1], "showname": "投稿者2さんの投稿動画"},
+        ]
+
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        update_run_db.select.assert_called_once_with(ShowUpdateHistory.MAX_RUN_ROW_NUM)
+        self.assertEqual(
+            [
+                call(
+                    instance.window.update_run_table_widget,
+                    ShowUpdateHistory.RUN_COLS,
+                    [instance.to_run_row(self._make_run())],
+                ),
+                call(
+                    instance.window.mylist_latency_table_widget,
+                    ShowUpdateHistory.MYLIST_COLS,
+                    [
+                        instance.to_mylist_row(self._make_fetch_latency(MYLIST_URL_LIST[0]), "投稿者1さんの投稿動画"),
+                        instance.to_mylist_row(self._make_fetch_latency(MYLIST_URL_LIST[1]), "投稿者2さんの投稿動画"),
+                    ],
+                ),
+            ],
+            instance.set_table.mock_calls,
+        )
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
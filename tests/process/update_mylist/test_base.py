@@ -9,8 +9,12 @@ from PySide6.QtWidgets import QDialog
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
 from nnmm.process.update_mylist.base import Base, ThreadDoneBase
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
+from nnmm.process.update_mylist.update_job_manager import UpdateJobManager, UpdateJobState
 from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_run_db_controller import UpdateRunDBController
 from nnmm.util import Result
 
 
@@ -38,6 +42,27 @@ class TestBase(unittest.TestCase):
         self.assertEqual(ThreadDoneBase, instance.post_process)
         self.assertEqual("Concrete Kind", instance.L_KIND)
         self.assertEqual("Concrete Event Key", instance.E_DONE)
+        self.assertEqual(False, instance.is_backfill)
+        self.assertIsNone(instance.job_manager)
+        self.assertFalse(instance.is_cancelled)
+        self.assertIsNone(instance.mylist_scheduler)
+        self.assertIsNone(instance.circuit_breaker)
+        self.assertFalse(instance.is_forced_probe)
+        self.assertIsNone(instance.update_run_db)
+
+        job_manager = MagicMock(spec=UpdateJobManager)
+        self.process_info.window.update_job_manager = job_manager
+        scheduler = MagicMock(spec=MylistScheduler)
+        self.process_info.window.mylist_scheduler = scheduler
+        circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        self.process_info.window.circuit_breaker = circuit_breaker
+        update_run_db = MagicMock(spec=UpdateRunDBController)
+        self.process_info.window.update_run_db = update_run_db
+        instance = ConcreteBase(self.process_info)
+        self.assertIs(job_manager, instance.job_manager)
+        self.assertIs(scheduler, instance.mylist_scheduler)
+        self.assertIs(circuit_breaker, instance.circuit_breaker)
+        self.assertIs(update_run_db, instance.update_run_db)
 
     def test_get_target_mylist(self):
         instance = ConcreteBase(self.process_info)
@@ -82,37 +107,129 @@ class TestBase(unittest.TestCase):
         mock_mylist_with_video_list = self.enterContext(
             patch("nnmm.process.update_mylist.base.MylistWithVideoList.create", spec=MylistWithVideoList)
         )
-        mock_fetcher = self.enterContext(patch("nnmm.process.update_mylist.base.Fetcher"))
-        mock_database_updater = self.enterContext(patch("nnmm.process.update_mylist.base.DatabaseUpdater"))
+        mock_pipeline = self.enterContext(patch("nnmm.process.update_mylist.base.UpdatePipeline"))
         mock_thread = self.enterContext(patch("nnmm.process.update_mylist.base.threading"))
+        mock_get_log_dir = self.enterContext(patch("nnmm.process.update_mylist.base.get_log_dir"))
+        mock_save_trace_report = self.enterContext(patch("nnmm.process.update_mylist.base.save_trace_report"))
+        mock_is_update_trace_enabled = self.enterContext(
+            patch("nnmm.process.update_mylist.base.ConfigStore.is_update_trace_enabled")
+        )
 
         mock_time.time.return_value = 0
+        mock_is_update_trace_enabled.return_value = False
+        mock_pipeline.return_value.job.is_cancelled = False
 
         # 正常系
         instance = ConcreteBase(self.process_info)
+        self.assertIsNone(instance.job_manager)
         instance.get_target_mylist = MagicMock()
         instance.get_target_mylist.return_value = ["valid_target_mylist"]
+        instance.save_update_run = MagicMock()
 
         actual = instance.update_mylist_info_thread()
         self.assertEqual(Result.success, actual)
+        self.assertFalse(instance.is_cancelled)
         self.assertEqual(
             [call(["valid_target_mylist"], instance.mylist_info_db)], mock_mylist_with_video_list.mock_calls
         )
         self.assertEqual(
-            [call(mock_mylist_with_video_list.return_value, instance.process_info), call().execute()],
-            mock_fetcher.mock_calls,
-        )
-        self.assertEqual(
-            [call(mock_fetcher.return_value.execute.return_value, instance.process_info), call().execute()],
-            mock_database_updater.mock_calls,
+            [call(mock_mylist_with_video_list.return_value, instance.process_info, False, job=None), call().execute()],
+            mock_pipeline.mock_calls,
         )
         self.assertEqual(
             [call.Thread(target=instance.thread_done, daemon=False), call.Thread().start()],
             mock_thread.mock_calls,
         )
+        # 各段階の所要時間の集計をログファイルと同じ場所に書き出す
+        mock_save_trace_report.assert_called_once_with(
+            mock_pipeline.return_value.trace, mock_get_log_dir.return_value, False
+        )
+        # 更新処理の結果を更新履歴に記録する
+        instance.save_update_run.assert_called_once_with(
+            mock_pipeline.return_value, mock_pipeline.return_value.execute.return_value
+        )
 
-        mock_fetcher.reset_mock()
-        mock_database_updater.reset_mock()
+        mock_mylist_with_video_list.reset_mock()
+        mock_pipeline.reset_mock()
+        mock_thread.reset_mock()
+        mock_save_trace_report.reset_mock()
+
+        # UpdateJobManager が設定されている場合
+        mylist_url_list = [
+            "https://www.nicovideo.jp/user/10000001/video",
+            "https://www.nicovideo.jp/user/10000002/video",
+        ]
+        now_mylist_with_video_list = mock_mylist_with_video_list.return_value
+        mylist_with_video_list = [MagicMock() for _ in mylist_url_list]
+        for mylist_with_video, mylist_url in zip(mylist_with_video_list, mylist_url_list):
+            mylist_with_video.mylist.url.non_query_url = mylist_url
+        now_mylist_with_video_list.__iter__.return_value = iter(mylist_with_video_list)
+        job_manager = MagicMock(spec=UpdateJobManager)
+        job = job_manager.submit.return_value
+        job.mylist_url_list = mylist_url_list[1:]
+        instance.window.update_job_manager = job_manager
+        instance = ConcreteBase(self.process_info)
+        instance.get_target_mylist = MagicMock(return_value=["valid_target_mylist"])
+
+        actual = instance.update_mylist_info_thread()
+        self.assertEqual(Result.success, actual)
+        self.assertEqual([call.submit(mylist_url_list), call.complete(job)], job_manager.mock_calls)
+        # 実行中の他の更新処理で更新中のマイリストは除外される
+        now_mylist_with_video_list.filter_by_url.assert_called_once_with(mylist_url_list[1:])
+        self.assertEqual(
+            [
+                call(now_mylist_with_video_list.filter_by_url.return_value, instance.process_info, False, job=job),
+                call().execute(),
+            ],
+            mock_pipeline.mock_calls,
+        )
+        mock_thread.Thread.assert_called_once_with(target=instance.thread_done, daemon=False)
+
+        mock_pipeline.reset_mock()
+        mock_thread.reset_mock()
+        job_manager.reset_mock()
+
+        # 中止された場合
+        now_mylist_with_video_list.__iter__.return_value = iter(mylist_with_video_list)
+        mock_pipeline.return_value.job.is_cancelled = True
+        mock_pipeline.return_value.job.count.return_value = 1
+        actual = instance.update_mylist_info_thread()
+        self.assertEqual(Result.success, actual)
+        self.assertTrue(instance.is_cancelled)
+        self.assertEqual([call.submit(mylist_url_list), call.complete(job)], job_manager.mock_calls)
+        mock_pipeline.return_value.job.count.assert_called_once_with(UpdateJobState.cancelled)
+        mock_thread.Thread.assert_called_once_with(target=instance.thread_done, daemon=False)
+
+        mock_pipeline.reset_mock()
+        mock_thread.reset_mock()
+        job_manager.reset_mock()
+
+        # 全て他の更新処理で更新中だった場合
+        now_mylist_with_video_list.__iter__.return_value = iter(mylist_with_video_list)
+        job_manager.submit.return_value = None
+        actual = instance.update_mylist_info_thread()
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual([call.submit(mylist_url_list)], job_manager.mock_calls)
+        mock_pipeline.assert_not_called()
+        mock_thread.assert_not_called()
+
+        # 例外が発生してもジョブは終了させ、次回更新確認日時を登録し直す
+        now_mylist_with_video_list.__iter__.return_value = iter(mylist_with_video_list)
+        now_mylist_with_video_list.filter_by_url.return_value.__iter__.return_value = iter(mylist_with_video_list[1:])
+        job_manager.submit.return_value = job
+        job_manager.reset_mock()
+        instance.mylist_scheduler = MagicMock(spec=MylistScheduler)
+        instance.reschedule_mylist_list = MagicMock()
+        mock_pipeline.return_value.execute.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            instance.update_mylist_info_thread()
+        self.assertEqual([call.submit(mylist_url_list), call.complete(job)], job_manager.mock_calls)
+        instance.reschedule_mylist_list.assert_called_once_with(mylist_url_list[1:])
+        mock_pipeline.return_value.execute.side_effect = None
+
+        del instance.window.update_job_manager
+        instance = ConcreteBase(self.process_info)
+        mock_pipeline.reset_mock()
         mock_thread.reset_mock()
 
         # 異常系
@@ -122,10 +239,132 @@ class TestBase(unittest.TestCase):
         actual = instance.update_mylist_info_thread()
         self.assertEqual(Result.failed, actual)
 
-        mock_fetcher.assert_not_called()
-        mock_database_updater.assert_not_called()
+        mock_pipeline.assert_not_called()
         mock_thread.assert_not_called()
 
+        # サーキットブレーカーで全て除外された場合
+        instance.get_target_mylist.return_value = [{"url": "https://www.nicovideo.jp/user/10000001/video"}]
+        instance.circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        instance.circuit_breaker.allow.return_value = False
+        actual = instance.update_mylist_info_thread()
+        self.assertEqual(Result.failed, actual)
+        mock_pipeline.assert_not_called()
+        mock_thread.assert_not_called()
+
+    def test_save_update_run(self):
+        mock_logger_error = self.enterContext(patch("nnmm.process.update_mylist.base.logger.error"))
+        mock_record = self.enterContext(patch("nnmm.process.update_mylist.base.UpdateRunRecord.create"))
+        mylist_url_list = [
+            "https://www.nicovideo.jp/user/10000001/video",
+            "https://www.nicovideo.jp/user/10000002/video",
+        ]
+        result = []
+        for mylist_url, r in zip(mylist_url_list, [Result.success, Result.failed]):
+            payload = MagicMock()
+            payload.mylist.url.non_query_url = mylist_url
+            result.append((payload, r))
+        pipeline = MagicMock()
+        record = mock_record.return_value
+        mylist_fetch_record = MagicMock()
+        record.mylist_fetch_record_list = (mylist_fetch_record,)
+
+        # 更新履歴のDBが設定されていなければ記録しない
+        instance = ConcreteBase(self.process_info)
+        actual = instance.save_update_run(pipeline, result)
+        self.assertEqual(Result.failed, actual)
+        mock_record.assert_not_called()
+
+        instance.update_run_db = MagicMock(spec=UpdateRunDBController)
+        instance.update_run_db.insert.return_value = 1
+        actual = instance.save_update_run(pipeline, result)
+        self.assertEqual(Result.success, actual)
+        mock_record.assert_called_once_with(
+            "Concrete Kind",
+            pipeline.trace,
+            pipeline.job,
+            [(mylist_url_list[0], Result.success), (mylist_url_list[1], Result.failed)],
+        )
+        self.assertEqual(
+            [call.insert(record.to_dict.return_value, [mylist_fetch_record.to_dict.return_value])],
+            instance.update_run_db.mock_calls,
+        )
+        mock_logger_error.assert_not_called()
+
+        # 記録に失敗しても例外は送出しない
+        instance.update_run_db.insert.return_value = -1
+        actual = instance.save_update_run(pipeline, result)
+        self.assertEqual(Result.failed, actual)
+        mock_logger_error.assert_called_once()
+
+        mock_record.side_effect = ValueError
+        actual = instance.save_update_run(pipeline, result)
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(2, mock_logger_error.call_count)
+
+    def test_filter_by_circuit_breaker(self):
+        mock_time = self.enterContext(patch("nnmm.process.update_mylist.base.time"))
+        mock_time.time.return_value = 1000.0
+        mylist_dict_list = [{"url": f"https://www.nicovideo.jp/user/1000000{i}/video"} for i in range(1, 4)]
+
+        # サーキットブレーカーが設定されていない場合はそのまま返す
+        instance = ConcreteBase(self.process_info)
+        actual = instance.filter_by_circuit_breaker(mylist_dict_list)
+        self.assertEqual(mylist_dict_list, actual)
+
+        # fetch を許可されないマイリストを除く
+        circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        circuit_breaker.allow.side_effect = lambda url, now, is_forced: url != mylist_dict_list[1]["url"]
+        self.process_info.window.circuit_breaker = circuit_breaker
+        instance = ConcreteBase(self.process_info)
+        instance.reschedule_mylist_list = MagicMock()
+        actual = instance.filter_by_circuit_breaker(mylist_dict_list)
+        self.assertEqual([mylist_dict_list[0], mylist_dict_list[2]], actual)
+        self.assertEqual([call.allow(m["url"], 1000.0, False) for m in mylist_dict_list], circuit_breaker.mock_calls)
+        instance.reschedule_mylist_list.assert_not_called()
+
+        # スケジューラが設定されていれば除いたマイリストを登録し直す
+        circuit_breaker.reset_mock()
+        instance.mylist_scheduler = MagicMock(spec=MylistScheduler)
+        instance.is_forced_probe = True
+        actual = instance.filter_by_circuit_breaker(mylist_dict_list)
+        self.assertEqual([mylist_dict_list[0], mylist_dict_list[2]], actual)
+        self.assertEqual([call.allow(m["url"], 1000.0, True) for m in mylist_dict_list], circuit_breaker.mock_calls)
+        instance.reschedule_mylist_list.assert_called_once_with([mylist_dict_list[1]["url"]])
+
+        # 対象がなければ何もしない
+        circuit_breaker.reset_mock()
+        actual = instance.filter_by_circuit_breaker([])
+        self.assertEqual([], actual)
+        circuit_breaker.allow.assert_not_called()
+
+    def test_reschedule_mylist_list(self):
+        mock_time = self.enterContext(patch("nnmm.process.update_mylist.base.time"))
+        mock_time.time.return_value = 1000.0
+        mylist_dict_list = [{"url": f"https://www.nicovideo.jp/user/1000000{i}/video"} for i in range(1, 4)]
+        deleted_url = "https://www.nicovideo.jp/user/99999999/video"
+
+        # スケジューラが設定されていない場合
+        instance = ConcreteBase(self.process_info)
+        actual = instance.reschedule_mylist_list([mylist_dict_list[0]["url"]])
+        self.assertEqual(Result.failed, actual)
+        instance.mylist_db.select_schedule.assert_not_called()
+
+        # 対象のマイリストのみ登録し直し、DBに存在しないマイリストは取り除く
+        scheduler = MagicMock(spec=MylistScheduler)
+        self.process_info.window.mylist_scheduler = scheduler
+        instance = ConcreteBase(self.process_info)
+        instance.mylist_db.select_schedule.return_value = mylist_dict_list
+        actual = instance.reschedule_mylist_list([mylist_dict_list[2]["url"], mylist_dict_list[0]["url"], deleted_url])
+        self.assertEqual(Result.success, actual)
+        self.assertEqual(
+            [
+                call.schedule_from_record(mylist_dict_list[0], not_before=1000.0),
+                call.schedule_from_record(mylist_dict_list[2], not_before=1000.0),
+                call.remove(deleted_url),
+            ],
+            scheduler.mock_calls,
+        )
+
     def test_thread_done(self):
         instance = ConcreteBase(self.process_info)
 
@@ -141,6 +380,14 @@ class TestBase(unittest.TestCase):
             instance.post_process.mock_calls,
         )
 
+        # 中止された場合は後処理の完了メッセージを変える
+        instance.post_process = MagicMock()
+        instance.post_process.return_value.done_message = "更新完了！"
+        instance.is_cancelled = True
+        actual = instance.thread_done()
+        self.assertEqual(Result.success, actual)
+        self.assertEqual("更新中止", instance.post_process.return_value.done_message)
+
 
 if __name__ == "__main__":
     if sys.argv:
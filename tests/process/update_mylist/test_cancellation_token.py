@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+
+from mock import MagicMock
+
+from nnmm.process.update_mylist.cancellation_token import CancellationToken
+
+
+class TestCancellationToken(unittest.TestCase):
+    def test_init(self):
+        instance = CancellationToken()
+        self.assertFalse(instance.is_cancelled)
+        self.assertEqual([], instance._callbacks)
+
+    def test_cancel(self):
+        instance = CancellationToken()
+        callback_1 = MagicMock()
+        callback_2 = MagicMock(side_effect=RuntimeError)
+        callback_3 = MagicMock()
+        instance.register(callback_1)
+        instance.register(callback_2)
+        instance.register(callback_3)
+
+        # コールバックで RuntimeError が発生しても残りのコールバックは呼び出す
+        instance.cancel()
+        self.assertTrue(instance.is_cancelled)
+        callback_1.assert_called_once_with()
+        callback_2.assert_called_once_with()
+        callback_3.assert_called_once_with()
+        self.assertEqual([], instance._callbacks)
+
+        # 2回目以降は何もしない
+        instance.cancel()
+        callback_1.assert_called_once_with()
+
+    def test_register(self):
+        instance = CancellationToken()
+        callback = MagicMock()
+        unregister = instance.register(callback)
+        self.assertEqual([callback], instance._callbacks)
+        callback.assert_not_called()
+
+        # 登録を解除したコールバックは呼び出されない
+        unregister()
+        self.assertEqual([], instance._callbacks)
+        unregister()
+        instance.cancel()
+        callback.assert_not_called()
+
+        # 既に中止されている場合はその場で呼び出す
+        unregister = instance.register(callback)
+        callback.assert_called_once_with()
+        self.assertEqual([], instance._callbacks)
+        unregister()
+
+    def test_guard(self):
+        async def return_value() -> str:
+            await asyncio.sleep(0)
+            return "done"
+
+        async def sleep_long() -> str:
+            await asyncio.sleep(10)
+            return "done"
+
+        # 中止されなければコルーチンの返り値を返す
+        instance = CancellationToken()
+        actual = asyncio.run(instance.guard(return_value()))
+        self.assertEqual("done", actual)
+        self.assertEqual([], instance._callbacks)
+
+        # コルーチンで発生した例外はそのまま送出する
+        async def raise_error():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            asyncio.run(instance.guard(raise_error()))
+        self.assertEqual([], instance._callbacks)
+
+        # 実行中に別スレッドから中止された場合、その場でキャンセルされる
+        instance = CancellationToken()
+        timer = threading.Timer(0.1, instance.cancel)
+        timer.start()
+        start = time.time()
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(instance.guard(sleep_long()))
+        self.assertLess(time.time() - start, 5)
+        timer.join()
+
+        # 既に中止されている場合は実行しない
+        coro = sleep_long()
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(instance.guard(coro))
+        self.assertIsNone(coro.cr_frame)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,156 @@
+import sys
+import unittest
+
+from mock import patch
+
+from nnmm.process.update_mylist.circuit_breaker import CircuitState, MylistCircuitBreaker
+
+
+class TestMylistCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.process.update_mylist.circuit_breaker.logger"))
+        self.mylist_url = "https://www.nicovideo.jp/user/10000001/video"
+
+    def test_init(self):
+        instance = MylistCircuitBreaker()
+        self.assertEqual(0, len(instance))
+        self.assertEqual(CircuitState.closed, instance.state(self.mylist_url))
+        self.assertIsNone(instance.open_until(self.mylist_url))
+        self.assertTrue(instance.allow(self.mylist_url, 0.0))
+        self.assertFalse(instance.is_fast_probe(self.mylist_url))
+
+    def test_calc_open_seconds(self):
+        base = MylistCircuitBreaker.BASE_OPEN_SECONDS
+        permanent_base = MylistCircuitBreaker.PERMANENT_BASE_OPEN_SECONDS
+        threshold = MylistCircuitBreaker.FAILURE_THRESHOLD
+
+        # 一時的な失敗は FAILURE_THRESHOLD 回目から倍々に伸ばす
+        self.assertEqual(base, MylistCircuitBreaker.calc_open_seconds(threshold, False))
+        self.assertEqual(base * 2, MylistCircuitBreaker.calc_open_seconds(threshold + 1, False))
+        self.assertEqual(base * 4, MylistCircuitBreaker.calc_open_seconds(threshold + 2, False))
+
+        # 恒久的な失敗は1回目から倍々に伸ばす
+        self.assertEqual(permanent_base, MylistCircuitBreaker.calc_open_seconds(1, True))
+        self.assertEqual(permanent_base * 2, MylistCircuitBreaker.calc_open_seconds(2, True))
+
+        # 上限で頭打ちになる
+        self.assertEqual(MylistCircuitBreaker.MAX_OPEN_SECONDS, MylistCircuitBreaker.calc_open_seconds(100, False))
+        self.assertEqual(MylistCircuitBreaker.MAX_OPEN_SECONDS, MylistCircuitBreaker.calc_open_seconds(10000, True))
+
+    def test_record_failure(self):
+        instance = MylistCircuitBreaker()
+        threshold = MylistCircuitBreaker.FAILURE_THRESHOLD
+
+        # FAILURE_THRESHOLD 回連続で失敗するまでは closed のまま
+        for _ in range(threshold - 1):
+            self.assertEqual(CircuitState.closed, instance.record_failure(self.mylist_url, now=1000.0))
+            self.assertTrue(instance.allow(self.mylist_url, 1000.0))
+        self.assertEqual(0, len(instance))
+
+        actual = instance.record_failure(self.mylist_url, now=1000.0)
+        self.assertEqual(CircuitState.open, actual)
+        self.assertEqual(1, len(instance))
+        open_until = 1000.0 + MylistCircuitBreaker.BASE_OPEN_SECONDS
+        self.assertEqual(open_until, instance.open_until(self.mylist_url))
+
+        # 恒久的な失敗は1回で open にする
+        other_url = "https://www.nicovideo.jp/user/10000002/video"
+        actual = instance.record_failure(other_url, is_permanent=True, now=1000.0)
+        self.assertEqual(CircuitState.open, actual)
+        self.assertEqual(1000.0 + MylistCircuitBreaker.PERMANENT_BASE_OPEN_SECONDS, instance.open_until(other_url))
+        self.assertEqual(2, len(instance))
+
+    def test_allow(self):
+        instance = MylistCircuitBreaker()
+        for _ in range(MylistCircuitBreaker.FAILURE_THRESHOLD):
+            instance.record_failure(self.mylist_url, now=1000.0)
+        open_until = instance.open_until(self.mylist_url)
+
+        # 待機時間中は fetch しない
+        self.assertFalse(instance.allow(self.mylist_url, open_until - 1))
+        self.assertEqual(CircuitState.open, instance.state(self.mylist_url))
+
+        # 待機時間を過ぎれば half_open にして回復確認を許可する
+        self.assertTrue(instance.allow(self.mylist_url, open_until))
+        self.assertEqual(CircuitState.half_open, instance.state(self.mylist_url))
+        self.assertIsNone(instance.open_until(self.mylist_url))
+
+        # 回復確認に失敗すると待機時間を倍にして open に戻す
+        actual = instance.record_failure(self.mylist_url, now=open_until)
+        self.assertEqual(CircuitState.open, actual)
+        self.assertEqual(open_until + MylistCircuitBreaker.BASE_OPEN_SECONDS * 2, instance.open_until(self.mylist_url))
+
+        # 待機時間中でも強制すれば回復確認を許可する
+        self.assertTrue(instance.allow(self.mylist_url, open_until, is_forced=True))
+        self.assertEqual(CircuitState.half_open, instance.state(self.mylist_url))
+
+        # now を省略した場合は現在日時
+        with patch("nnmm.process.update_mylist.circuit_breaker.time.time", return_value=0.0):
+            instance.record_failure(self.mylist_url)
+            self.assertFalse(instance.allow(self.mylist_url))
+
+    def test_is_fast_probe(self):
+        instance = MylistCircuitBreaker()
+        instance.record_failure(self.mylist_url, is_permanent=True, now=1000.0)
+        # open の間は回復確認を行わない
+        self.assertFalse(instance.is_fast_probe(self.mylist_url))
+
+        instance.allow(self.mylist_url, is_forced=True)
+        self.assertTrue(instance.is_fast_probe(self.mylist_url))
+
+        # 一時的な失敗による half_open では通常通り取得する
+        other_url = "https://www.nicovideo.jp/user/10000002/video"
+        for _ in range(MylistCircuitBreaker.FAILURE_THRESHOLD):
+            instance.record_failure(other_url, now=1000.0)
+        instance.allow(other_url, is_forced=True)
+        self.assertEqual(CircuitState.half_open, instance.state(other_url))
+        self.assertFalse(instance.is_fast_probe(other_url))
+
+    def test_record_success(self):
+        instance = MylistCircuitBreaker()
+        instance.record_failure(self.mylist_url, is_permanent=True, now=1000.0)
+        instance.allow(self.mylist_url, is_forced=True)
+
+        # 成功すれば closed に戻り、連続失敗回数もリセットされる
+        instance.record_success(self.mylist_url)
+        self.assertEqual(CircuitState.closed, instance.state(self.mylist_url))
+        self.assertEqual(0, len(instance))
+        for _ in range(MylistCircuitBreaker.FAILURE_THRESHOLD - 1):
+            self.assertEqual(CircuitState.closed, instance.record_failure(self.mylist_url, now=1000.0))
+
+        # 登録がなくても何もしない
+        instance.record_success("https://www.nicovideo.jp/user/99999999/video")
+
+    def test_load(self):
+        instance = MylistCircuitBreaker()
+        instance.record_failure("https://www.nicovideo.jp/user/99999999/video", is_permanent=True, now=1000.0)
+
+        threshold = MylistCircuitBreaker.FAILURE_THRESHOLD
+        mylist_dict_list = [
+            {"url": f"https://www.nicovideo.jp/user/1000000{i}/video", "check_failed_count": count}
+            for i, count in enumerate([0, threshold - 1, threshold, 10])
+        ]
+        mylist_dict_list.append({"url": "https://www.nicovideo.jp/user/10000009/video"})
+        mylist_dict_list.append({"url": "https://www.nicovideo.jp/user/10000010/video", "check_failed_count": "x"})
+
+        # 連続失敗回数が FAILURE_THRESHOLD 以上のマイリストは half_open として起動後の最初の更新で回復確認を行う
+        actual = instance.load(mylist_dict_list)
+        self.assertEqual(2, actual)
+        self.assertEqual(CircuitState.closed, instance.state("https://www.nicovideo.jp/user/99999999/video"))
+        self.assertEqual(CircuitState.closed, instance.state(mylist_dict_list[0]["url"]))
+        self.assertEqual(CircuitState.closed, instance.state(mylist_dict_list[1]["url"]))
+        self.assertEqual(CircuitState.half_open, instance.state(mylist_dict_list[2]["url"]))
+        self.assertEqual(CircuitState.half_open, instance.state(mylist_dict_list[3]["url"]))
+        self.assertTrue(instance.allow(mylist_dict_list[3]["url"], 0.0))
+
+        # 連続失敗回数は引き継ぐ
+        self.assertEqual(CircuitState.open, instance.record_failure(mylist_dict_list[1]["url"], now=1000.0))
+        instance.record_failure(mylist_dict_list[3]["url"], now=1000.0)
+        expect = 1000.0 + MylistCircuitBreaker.calc_open_seconds(11, False)
+        self.assertEqual(expect, instance.open_until(mylist_dict_list[3]["url"]))
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
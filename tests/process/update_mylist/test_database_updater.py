@@ -8,13 +8,17 @@ from PySide6.QtWidgets import QDialog
 
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.cancellation_token import CancellationToken
 from nnmm.process.update_mylist.database_updater import DatabaseUpdater
-from nnmm.process.update_mylist.value_objects.payload import Payload
-from nnmm.process.update_mylist.value_objects.payload_list import PayloadList
+from nnmm.process.update_mylist.progress_bus import ProgressBus
+from nnmm.process.update_mylist.value_objects.mylist_diff import MylistDiff
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
 from nnmm.process.update_mylist.value_objects.typed_mylist import TypedMylist
 from nnmm.process.update_mylist.value_objects.typed_video import TypedVideo
 from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.process.value_objects.table_row import Status
+from nnmm.update_trace import SpanStage, UpdateTrace
 from nnmm.util import Result
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
 from nnmm.video_info_fetcher.value_objects.mylistid import Mylistid
@@ -101,40 +105,21 @@ class TestDatabaseUpdater(unittest.TestCase):
         return fetched_video_info
 
     def test_init(self):
-        payload_list = MagicMock(spec=PayloadList)
-        instance = DatabaseUpdater(payload_list, self.process_info)
-        self.assertEqual(payload_list, instance.payload_list)
-
-        with self.assertRaises(ValueError):
-            instance = DatabaseUpdater("invalid", self.process_info)
-
-    def test_execute(self):
-        with ExitStack() as stack:
-            mock_thread = self.enterContext(patch("nnmm.process.update_mylist.database_updater.ThreadPoolExecutor"))
-
-            mock_thread.return_value.__enter__.return_value.submit.return_value.result.return_value = (
-                "executor.submit().result()"
-            )
-            payload_list = MagicMock(spec=PayloadList)
-            payload = MagicMock(spec=Payload)
+        mock_get_max = self.enterContext(
+            patch("nnmm.process.update_mylist.database_updater.ConfigStore.get_max_check_interval_minutes")
+        )
+        mock_get_max.return_value = 60 * 24
+        instance = DatabaseUpdater(self.process_info)
+        self.assertFalse(instance.cancel_token.is_cancelled)
+        self.assertEqual(60 * 24, instance.max_check_interval_minutes)
+        mock_get_max.assert_called_once_with()
 
-            instance = DatabaseUpdater(payload_list, self.process_info)
-            instance.payload_list = [payload]
-            actual = instance.execute()
-            self.assertEqual([(payload, "executor.submit().result()")], actual)
+        cancel_token = CancellationToken()
+        instance = DatabaseUpdater(self.process_info, cancel_token)
+        self.assertIs(cancel_token, instance.cancel_token)
 
-            self.assertEqual(
-                [
-                    call(max_workers=8, thread_name_prefix="np_thread"),
-                    call().__enter__(),
-                    call()
-                    .__enter__()
-                    .submit(instance.execute_worker, payload.mylist, payload.video_list, payload.fetched_info, 1),
-                    call().__enter__().submit().result(),
-                    call().__exit__(None, None, None),
-                ],
-                mock_thread.mock_calls,
-            )
+        with self.assertRaises(ValueError):
+            instance = DatabaseUpdater("invalid")
 
     def test_execute_worker(self):
         mock_logger = self.enterContext(patch("nnmm.process.update_mylist.database_updater.logger.info"))
@@ -147,13 +132,12 @@ class TestDatabaseUpdater(unittest.TestCase):
         )
         dst = "2023-12-23 15:49:43"
         mock_get_now_datetime.return_value = dst
-        payload_list = MagicMock(spec=PayloadList)
-        payload = MagicMock(spec=PayloadList)
-
-        instance = DatabaseUpdater(payload_list, self.process_info)
+        instance = DatabaseUpdater(self.process_info)
         instance.mylist_db.dbname = "mylist_db.dbname"
         instance.mylist_info_db.dbname = "mylist_info_db.dbname"
         instance.window.oneline_log = MagicMock()
+        instance.progress_bus = MagicMock(spec=ProgressBus)
+        instance.max_check_interval_minutes = 60 * 24
 
         def get_payload(is_valid_fetched_info, add_new_video_flag):
             mylist = self._get_typed_mylist()
@@ -175,6 +159,7 @@ class TestDatabaseUpdater(unittest.TestCase):
             mock_mylist_db.reset_mock()
             mock_mylist_info_db.reset_mock()
             instance.window.reset_mock()
+            instance.progress_bus.reset_mock()
             instance.done_count = 0
 
         def post_run(payload, is_valid_fetched_info, add_new_video_flag):
@@ -186,12 +171,16 @@ class TestDatabaseUpdater(unittest.TestCase):
                 )
                 self.assertEqual([call("mylist_info_db.dbname")], mock_mylist_info_db.mock_calls)
                 instance.window.assert_not_called()
+                self.assertEqual(
+                    [call.emit(ProgressEvent.updated(mylist_url, False))],
+                    instance.progress_bus.mock_calls,
+                )
                 return
 
             expect_mylist_db_calls = [
                 call("mylist_db.dbname"),
                 call().reset_check_failed_count(mylist_url),
-                call().update_checked_at(mylist_url, dst),
+                call().update_checked_at(mylist_url, dst, add_new_video_flag, 60 * 24),
             ]
             if add_new_video_flag:
                 expect_mylist_db_calls.append(call().update_updated_at(mylist_url, dst))
@@ -223,9 +212,11 @@ class TestDatabaseUpdater(unittest.TestCase):
                 mock_mylist_info_db.mock_calls,
             )
 
+            # ワーカーからはウィジェットを操作せず、進捗イベントを発行する
+            self.assertEqual([], instance.window.mock_calls)
             self.assertEqual(
-                [call.oneline_log.setText("更新中(1/1)"), call.oneline_log.update()],
-                instance.window.mock_calls,
+                [call.emit(ProgressEvent.updated(mylist_url, True))],
+                instance.progress_bus.mock_calls,
             )
 
         Params = namedtuple("Params", ["is_valid_fetched_info", "add_new_video_flag", "result"])
@@ -242,6 +233,135 @@ class TestDatabaseUpdater(unittest.TestCase):
             self.assertEqual(expect, actual)
             post_run(payload, *params[:-1])
 
+            # 更新前の動画情報を {動画ID: 視聴状況} で渡しても同じ結果になる
+            mylist, video_list, fetched_info, all_index_num = payload
+            video_status_dict = {v.video_id.id: v.status for v in video_list}
+            payload = (mylist, video_status_dict, fetched_info, all_index_num)
+            pre_run(payload, *params[:-1])
+            actual = instance.execute_worker(*payload)
+            self.assertEqual(expect, actual)
+            post_run(payload, *params[:-1])
+
+        # UpdateTrace が指定されていれば差分確認とDB更新の所要時間を記録する
+        instance.trace = UpdateTrace()
+        payload = get_payload(True, True)
+        pre_run(payload, True, True)
+        actual = instance.execute_worker(*payload)
+        self.assertEqual(Result.success, actual)
+        span_list = instance.trace.span_list
+        self.assertEqual([SpanStage.diff, SpanStage.db_write], [s.stage for s in span_list])
+        self.assertEqual({payload[0].url.non_query_url}, {s.mylist_url for s in span_list})
+        self.assertEqual({"video_num": 1, "new_video_num": 1}, span_list[1].attrs)
+
+        # 以前から保持していた動画は新たに追加された動画として数えない
+        instance.trace = UpdateTrace()
+        payload = get_payload(True, False)
+        pre_run(payload, True, False)
+        actual = instance.execute_worker(*payload)
+        self.assertEqual(Result.success, actual)
+        self.assertEqual({"video_num": 1, "new_video_num": 0}, instance.trace.span_list[1].attrs)
+        instance.trace = None
+
+        # 中止されていた場合はDB更新を開始しない
+        payload = get_payload(True, True)
+        pre_run(payload, True, True)
+        instance.cancel_token.cancel()
+        actual = instance.execute_worker(*payload)
+        self.assertEqual(Result.failed, actual)
+        mock_mylist_db.assert_not_called()
+        mock_mylist_info_db.assert_not_called()
+        self.assertEqual(
+            [call.emit(ProgressEvent.updated(payload[0].url.non_query_url, False))],
+            instance.progress_bus.mock_calls,
+        )
+
+    def test_to_status_dict(self):
+        video_status_dict = {"sm12345678": Status.watched}
+        self.assertIs(video_status_dict, DatabaseUpdater.to_status_dict(video_status_dict))
+
+        mylist_url = "https://www.nicovideo.jp/user/1234567/mylist/12345678"
+        typed_video = TypedVideo.create({
+            "id": 1,
+            "video_id": "sm12345678",
+            "title": "テスト動画",
+            "username": "投稿者1",
+            "status": "",
+            "uploaded_at": "2022-05-06 00:00:01",
+            "registered_at": "2022-05-06 00:01:01",
+            "video_url": "https://www.nicovideo.jp/watch/sm12345678",
+            "mylist_url": mylist_url,
+            "created_at": "2022-05-06 00:01:01",
+        })
+        actual = DatabaseUpdater.to_status_dict(TypedVideoList.create([typed_video]))
+        self.assertEqual({"sm12345678": Status.watched}, actual)
+        self.assertEqual({}, DatabaseUpdater.to_status_dict(TypedVideoList.create([])))
+
+    def test_make_diff(self):
+        dst = "2023-12-23 15:49:43"
+        mylist_url = "https://www.nicovideo.jp/user/1234567/mylist/12345678"
+        fetched_info = self._get_fetched_video_info()
+        expect_row = (
+            "1",
+            "sm12345678",
+            "テスト動画",
+            "投稿者1",
+            "未視聴",
+            "2022-05-06 00:00:01",
+            "2022-05-06 00:01:01",
+            "https://www.nicovideo.jp/watch/sm12345678",
+            mylist_url,
+            dst,
+        )
+
+        # 新規に追加された動画は未視聴とする
+        actual = DatabaseUpdater.make_diff(mylist_url, {}, fetched_info, dst)
+        self.assertEqual(MylistDiff(mylist_url, Result.success, (expect_row,), True, dst), actual)
+
+        # 以前から保持していた動画は視聴状況を保持する
+        actual = DatabaseUpdater.make_diff(mylist_url, {"sm12345678": Status.watched}, fetched_info, dst)
+        expect_row = expect_row[:4] + ("",) + expect_row[5:]
+        self.assertEqual(MylistDiff(mylist_url, Result.success, (expect_row,), False, dst), actual)
+
+        # 更新前の動画情報を TypedVideoList で渡しても同じ結果になる
+        typed_video = TypedVideo.create({
+            "id": 1,
+            "video_id": "sm12345678",
+            "title": "テスト動画",
+            "username": "投稿者1",
+            "status": "",
+            "uploaded_at": "2022-05-06 00:00:01",
+            "registered_at": "2022-05-06 00:01:01",
+            "video_url": "https://www.nicovideo.jp/watch/sm12345678",
+            "mylist_url": mylist_url,
+            "created_at": "2022-05-06 00:01:01",
+        })
+        video_list = TypedVideoList.create([typed_video])
+        self.assertEqual(actual, DatabaseUpdater.make_diff(mylist_url, video_list, fetched_info, dst))
+
+    def test_write_diff(self):
+        dst = "2023-12-23 15:49:43"
+        mylist_url = "https://www.nicovideo.jp/user/1234567/mylist/12345678"
+        mylist_db = MagicMock(spec=MylistDBController)
+        mylist_info_db = MagicMock(spec=MylistInfoDBController)
+        diff = DatabaseUpdater.make_diff(mylist_url, {}, self._get_fetched_video_info(), dst)
+
+        DatabaseUpdater.write_diff(mylist_db, mylist_info_db, diff, 60 * 24)
+        self.assertEqual([call.upsert_from_list(diff.to_dict_list())], mylist_info_db.mock_calls)
+        self.assertEqual(
+            [call.update_checked_at(mylist_url, dst, True, 60 * 24), call.update_updated_at(mylist_url, dst)],
+            mylist_db.mock_calls,
+        )
+
+        # 新着がなければ更新日時は更新しない
+        mylist_db.reset_mock()
+        mylist_info_db.reset_mock()
+        diff = DatabaseUpdater.make_diff(
+            mylist_url, {"sm12345678": Status.watched}, self._get_fetched_video_info(), dst
+        )
+        DatabaseUpdater.write_diff(mylist_db, mylist_info_db, diff)
+        self.assertEqual([call.upsert_from_list(diff.to_dict_list())], mylist_info_db.mock_calls)
+        self.assertEqual([call.update_checked_at(mylist_url, dst, False, None)], mylist_db.mock_calls)
+
 
 if __name__ == "__main__":
     if sys.argv:
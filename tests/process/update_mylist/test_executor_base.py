@@ -1,24 +1,29 @@
 import sys
 import unittest
 
-from mock import MagicMock
+from mock import MagicMock, call
 from PySide6.QtWidgets import QDialog
 
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.cancellation_token import CancellationToken
 from nnmm.process.update_mylist.executor_base import ExecutorBase
-from nnmm.process.update_mylist.value_objects.payload_list import PayloadList
+from nnmm.process.update_mylist.progress_bus import ProgressBus
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_trace import UpdateTrace
 from nnmm.util import Result
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
 
 
 class ConcreteExecutorBase(ExecutorBase):
-    def __init__(self, process_info: ProcessInfo) -> None:
-        super().__init__(process_info)
-
-    def execute(self) -> PayloadList:
-        return []
+    def __init__(
+        self,
+        process_info: ProcessInfo,
+        cancel_token: CancellationToken | None = None,
+        trace: UpdateTrace | None = None,
+    ) -> None:
+        super().__init__(process_info, cancel_token, trace)
 
     def execute_worker(self, *argv) -> FetchedVideoInfo | Result:
         return []
@@ -39,16 +44,42 @@ class TestExecutorBase(unittest.TestCase):
         self.assertEqual(self.process_info.mylist_db, instance.mylist_db)
         self.assertEqual(self.process_info.mylist_info_db, instance.mylist_info_db)
 
+        self.assertIsNone(instance.progress_bus)
+        self.assertIsInstance(instance.cancel_token, CancellationToken)
+        self.assertFalse(instance.cancel_token.is_cancelled)
+        self.assertIsNone(instance.trace)
         self.assertIsNotNone(instance.lock)
         self.assertEqual(0, instance.done_count)
 
+        cancel_token = CancellationToken()
+        instance = ConcreteExecutorBase(self.process_info, cancel_token)
+        self.assertIs(cancel_token, instance.cancel_token)
+
+        trace = UpdateTrace()
+        instance = ConcreteExecutorBase(self.process_info, cancel_token, trace)
+        self.assertIs(trace, instance.trace)
+
+        self.process_info.window.progress_bus = MagicMock(spec=ProgressBus)
+        instance = ConcreteExecutorBase(self.process_info)
+        self.assertEqual(self.process_info.window.progress_bus, instance.progress_bus)
+
         with self.assertRaises(ValueError):
             instance = ConcreteExecutorBase("invalid")
+        with self.assertRaises(ValueError):
+            instance = ConcreteExecutorBase(self.process_info, "invalid")
+        with self.assertRaises(ValueError):
+            instance = ConcreteExecutorBase(self.process_info, None, "invalid")
 
-    def test_execute(self):
+    def test_emit_progress(self):
         instance = ConcreteExecutorBase(self.process_info)
-        actual = instance.execute()
-        self.assertEqual([], actual)
+        event = ProgressEvent.started(1)
+
+        # ProgressBus が設定されていなければ何もしない
+        instance.emit_progress(event)
+
+        instance.progress_bus = MagicMock(spec=ProgressBus)
+        instance.emit_progress(event)
+        self.assertEqual([call.emit(event)], instance.progress_bus.mock_calls)
 
     def test_execute_worker(self):
         instance = ConcreteExecutorBase(self.process_info)
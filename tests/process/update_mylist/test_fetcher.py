@@ -1,4 +1,7 @@
+import asyncio
 import sys
+import threading
+import time
 import unittest
 from contextlib import ExitStack
 
@@ -8,12 +11,16 @@ from PySide6.QtWidgets import QDialog
 
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.cancellation_token import CancellationToken
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
 from nnmm.process.update_mylist.fetcher import Fetcher
-from nnmm.process.update_mylist.value_objects.mylist_with_video import MylistWithVideo
-from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList
+from nnmm.process.update_mylist.progress_bus import ProgressBus
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_trace import SpanStage, UpdateTrace, span
 from nnmm.util import Result
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
+from nnmm.video_info_fetcher.video_info_fetcher_base import PermanentFetchError
 
 
 class TestFetcher(unittest.TestCase):
@@ -26,79 +33,186 @@ class TestFetcher(unittest.TestCase):
         self.process_info.mylist_info_db = MagicMock(spec=MylistInfoDBController)
 
     def test_init(self):
-        mylist_with_video_list = MagicMock(spec=MylistWithVideoList)
-        instance = Fetcher(mylist_with_video_list, self.process_info)
-        self.assertEqual(mylist_with_video_list, instance.mylist_with_video_list)
+        instance = Fetcher(self.process_info)
+        self.assertEqual(False, instance.is_backfill)
+        self.assertIsNone(instance.circuit_breaker)
 
-        with self.assertRaises(ValueError):
-            instance = Fetcher("invalid", self.process_info)
-
-    def test_execute(self):
-        mock_thread = self.enterContext(patch("nnmm.process.update_mylist.fetcher.ThreadPoolExecutor"))
-        mock_create = self.enterContext(patch("nnmm.process.update_mylist.fetcher.PayloadList.create"))
+        circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        self.process_info.window.circuit_breaker = circuit_breaker
+        instance = Fetcher(self.process_info)
+        self.assertIs(circuit_breaker, instance.circuit_breaker)
 
-        mock_thread.return_value.__enter__.return_value.submit.return_value.result.return_value = (
-            "executor.submit().result()"
-        )
-        mock_create.side_effect = lambda p: "PayloadList.create()"
-        mylist_with_video_list = MagicMock(spec=MylistWithVideoList)
-        mylist_with_video = MagicMock(spec=MylistWithVideo)
-        mylist_with_video.mylist.url.non_query_url = MagicMock()
+        instance = Fetcher(self.process_info, True)
+        self.assertEqual(True, instance.is_backfill)
+        self.assertFalse(instance.cancel_token.is_cancelled)
 
-        instance = Fetcher(mylist_with_video_list, self.process_info)
-        instance.mylist_with_video_list = [mylist_with_video]
-        actual = instance.execute()
-        self.assertEqual("PayloadList.create()", actual)
+        cancel_token = CancellationToken()
+        instance = Fetcher(self.process_info, True, cancel_token)
+        self.assertIs(cancel_token, instance.cancel_token)
 
-        self.assertEqual(
-            [
-                call(max_workers=8, thread_name_prefix="ap_thread"),
-                call().__enter__(),
-                call().__enter__().submit(instance.execute_worker, mylist_with_video.mylist.url.non_query_url, 1),
-                call().__enter__().submit().result(),
-                call().__exit__(None, None, None),
-            ],
-            mock_thread.mock_calls,
-        )
-        self.assertEqual([call([(mylist_with_video, "executor.submit().result()")])], mock_create.mock_calls)
+        with self.assertRaises(ValueError):
+            instance = Fetcher("invalid")
 
     def test_execute_worker(self):
         mock_fetch_videoinfo = self.enterContext(
             patch("nnmm.process.update_mylist.fetcher.VideoInfoFetcher.fetch_videoinfo")
         )
-        mylist_with_video_list = MagicMock(spec=MylistWithVideoList)
-        instance = Fetcher(mylist_with_video_list, self.process_info)
+        instance = Fetcher(self.process_info)
         instance.window.oneline_log = MagicMock()
+        instance.progress_bus = MagicMock(spec=ProgressBus)
 
         mylist_url = "https://www.nicovideo.jp/user/1111111/mylist/10000001"
+        known_video_id_list = ["sm12345678"]
         all_index_num = 2
 
         # 正常系
         fetched_video_info = MagicMock(spec=FetchedVideoInfo)
         mock_fetch_videoinfo.return_value = fetched_video_info
 
-        actual = instance.execute_worker(mylist_url, all_index_num)
+        actual = instance.execute_worker(mylist_url, known_video_id_list, all_index_num)
         expect = fetched_video_info
         self.assertEqual(expect, actual)
-        self.assertEqual([call(mylist_url), call().__eq__(fetched_video_info)], mock_fetch_videoinfo.mock_calls)
         self.assertEqual(
-            [call.setText("取得中(1/2)"), call.update()],
-            instance.window.oneline_log.mock_calls,
+            [call(mylist_url, known_video_id_list, False), call().__eq__(fetched_video_info)],
+            mock_fetch_videoinfo.mock_calls,
+        )
+        # ワーカーからはウィジェットを操作せず、進捗イベントを発行する
+        self.assertEqual([], instance.window.oneline_log.mock_calls)
+        self.assertEqual(
+            [call.emit(ProgressEvent.fetched(mylist_url, True))],
+            instance.progress_bus.mock_calls,
         )
 
         mock_fetch_videoinfo.reset_mock()
-        instance.window.oneline_log.reset_mock()
+        instance.progress_bus.reset_mock()
 
         # 異常系: fetch 時に例外が発生しても処理は続行される
         mock_fetch_videoinfo.side_effect = httpx.HTTPStatusError
 
-        actual = instance.execute_worker(mylist_url, all_index_num)
+        actual = instance.execute_worker(mylist_url, known_video_id_list, all_index_num)
         self.assertEqual(Result.failed, actual)
-        self.assertEqual([call(mylist_url)], mock_fetch_videoinfo.mock_calls)
+        self.assertEqual([call(mylist_url, known_video_id_list, False)], mock_fetch_videoinfo.mock_calls)
         instance.window.oneline_log.assert_not_called()
+        self.assertEqual(
+            [call.emit(ProgressEvent.fetched(mylist_url, False))],
+            instance.progress_bus.mock_calls,
+        )
 
         mock_fetch_videoinfo.reset_mock()
-        instance.window.oneline_log.reset_mock()
+        instance.progress_bus.reset_mock()
+
+        # ProgressBus が設定されていない場合も処理は続行される
+        instance.progress_bus = None
+        mock_fetch_videoinfo.side_effect = None
+        actual = instance.execute_worker(mylist_url, known_video_id_list, all_index_num)
+        self.assertEqual(fetched_video_info, actual)
+
+        # UpdateTrace が指定されていれば、fetch 中の非同期処理から対象マイリストのスパンを記録できる
+        async def fetch_with_span(*args):
+            with span(SpanStage.page_request):
+                return fetched_video_info
+
+        mock_fetch_videoinfo.side_effect = fetch_with_span
+        instance.trace = UpdateTrace()
+        actual = instance.execute_worker(mylist_url, known_video_id_list, all_index_num)
+        self.assertEqual(fetched_video_info, actual)
+        self.assertEqual(
+            [(SpanStage.page_request, mylist_url)], [(s.stage, s.mylist_url) for s in instance.trace.span_list]
+        )
+        instance.trace = None
+
+        # fetch 中に中止された場合は通信を打ち切り、失敗として扱う
+        instance.progress_bus = MagicMock(spec=ProgressBus)
+        started = threading.Event()
+
+        async def fetch_long(*args):
+            started.set()
+            await asyncio.sleep(10)
+            return fetched_video_info
+
+        mock_fetch_videoinfo.side_effect = fetch_long
+        timer = threading.Thread(target=lambda: started.wait(5) and instance.cancel_token.cancel())
+        timer.start()
+        start = time.time()
+        actual = instance.execute_worker(mylist_url, known_video_id_list, all_index_num)
+        timer.join()
+        self.assertEqual(Result.failed, actual)
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(
+            [call.emit(ProgressEvent.fetched(mylist_url, False))],
+            instance.progress_bus.mock_calls,
+        )
+
+    def test_execute_worker_with_circuit_breaker(self):
+        mock_fetch_videoinfo = self.enterContext(
+            patch("nnmm.process.update_mylist.fetcher.VideoInfoFetcher.fetch_videoinfo")
+        )
+        mock_probe = self.enterContext(patch("nnmm.process.update_mylist.fetcher.VideoInfoFetcher.probe"))
+        circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        circuit_breaker.is_fast_probe.return_value = False
+        self.process_info.window.circuit_breaker = circuit_breaker
+        instance = Fetcher(self.process_info)
+
+        mylist_url = "https://www.nicovideo.jp/user/1111111/mylist/10000001"
+        known_video_id_list = ["sm12345678"]
+        fetched_video_info = MagicMock(spec=FetchedVideoInfo)
+
+        # 成功した場合は成功を記録する
+        mock_fetch_videoinfo.return_value = fetched_video_info
+        actual = instance.execute_worker(mylist_url, known_video_id_list, 1)
+        self.assertIs(fetched_video_info, actual)
+        self.assertEqual(
+            [call.is_fast_probe(mylist_url), call.record_success(mylist_url)],
+            circuit_breaker.mock_calls,
+        )
+        mock_probe.assert_not_called()
+
+        # 一時的な失敗の場合
+        circuit_breaker.reset_mock()
+        mock_fetch_videoinfo.return_value = Result.failed
+        actual = instance.execute_worker(mylist_url, known_video_id_list, 1)
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(
+            [call.is_fast_probe(mylist_url), call.record_failure(mylist_url, False)],
+            circuit_breaker.mock_calls,
+        )
+
+        # 恒久的な失敗の場合
+        circuit_breaker.reset_mock()
+        mock_fetch_videoinfo.side_effect = PermanentFetchError
+        actual = instance.execute_worker(mylist_url, known_video_id_list, 1)
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(
+            [call.is_fast_probe(mylist_url), call.record_failure(mylist_url, True)],
+            circuit_breaker.mock_calls,
+        )
+
+        # 回復確認で取得できなければ動画情報は取得しない
+        circuit_breaker.reset_mock()
+        mock_fetch_videoinfo.reset_mock()
+        mock_fetch_videoinfo.side_effect = None
+        mock_fetch_videoinfo.return_value = fetched_video_info
+        circuit_breaker.is_fast_probe.return_value = True
+        mock_probe.return_value = False
+        actual = instance.execute_worker(mylist_url, known_video_id_list, 1)
+        self.assertEqual(Result.failed, actual)
+        mock_probe.assert_awaited_once_with(mylist_url)
+        mock_fetch_videoinfo.assert_not_called()
+        self.assertEqual(
+            [call.is_fast_probe(mylist_url), call.record_failure(mylist_url, False)],
+            circuit_breaker.mock_calls,
+        )
+
+        # 回復確認で取得できれば続けて動画情報を取得する
+        circuit_breaker.reset_mock()
+        mock_probe.return_value = True
+        actual = instance.execute_worker(mylist_url, known_video_id_list, 1)
+        self.assertIs(fetched_video_info, actual)
+        mock_fetch_videoinfo.assert_awaited_once_with(mylist_url, known_video_id_list, False)
+        self.assertEqual(
+            [call.is_fast_probe(mylist_url), call.record_success(mylist_url)],
+            circuit_breaker.mock_calls,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,311 @@
+import sys
+import threading
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import freezegun
+from mock import ANY, MagicMock, call, patch
+
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.headless_updater import HeadlessUpdater
+from nnmm.process.update_mylist.progress_sink import ConsoleProgressSink
+from nnmm.process.update_mylist.update_job_manager import UpdateJob, UpdateJobState
+from nnmm.process.update_mylist.value_objects.update_summary import UpdateSummary
+from nnmm.process.value_objects.headless_host import HeadlessHost
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.util import Result
+
+
+class TestHeadlessUpdater(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.process.update_mylist.headless_updater.logger"))
+        self.mylist_db = MagicMock(spec=MylistDBController)
+        self.mylist_db.select_schedule.return_value = []
+        self.mylist_info_db = MagicMock(spec=MylistInfoDBController)
+
+    def _get_mylist_dict(self, index: int = 1) -> dict:
+        mylist_dict = {
+            "id": str(index),
+            "username": f"username_{index}",
+            "mylistname": "投稿動画",
+            "type": "uploaded",
+            "showname": f"投稿者{index}さんの投稿動画",
+            "url": f"https://www.nicovideo.jp/user/1000000{index}/video",
+            "created_at": "2023-12-22 12:34:56",
+            "updated_at": "2023-12-22 12:34:56",
+            "checked_at": "2023-12-22 12:34:56",
+            "check_interval": "15分",
+            "check_failed_count": 0,
+            "is_include_new": False,
+        }
+        return mylist_dict
+
+    def _get_schedule_dict(self, index: int = 1, next_check_at: int = 0) -> dict:
+        return {
+            "url": f"https://www.nicovideo.jp/user/1000000{index}/video",
+            "checked_at": "2023-12-22 12:34:56",
+            "check_interval": "15分",
+            "check_failed_count": 0,
+            "check_interval_minutes": 15,
+            "next_check_at": next_check_at,
+        }
+
+    def _make_payload(self, mylist_url: str) -> MagicMock:
+        payload = MagicMock()
+        payload.mylist.url.non_query_url = mylist_url
+        return payload
+
+    def test_init(self):
+        progress_sink = MagicMock(spec=ConsoleProgressSink)
+        schedule_list = [self._get_schedule_dict(1)]
+        self.mylist_db.select_schedule.return_value = schedule_list
+        mock_circuit_breaker = self.enterContext(
+            patch("nnmm.process.update_mylist.headless_updater.MylistCircuitBreaker")
+        )
+        circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        mock_circuit_breaker.return_value = circuit_breaker
+
+        instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db, progress_sink)
+        self.assertIs(self.mylist_db, instance.mylist_db)
+        self.assertIs(self.mylist_info_db, instance.mylist_info_db)
+        self.assertIs(circuit_breaker, instance.circuit_breaker)
+        circuit_breaker.load.assert_called_once_with(schedule_list)
+
+        self.assertIsInstance(instance.host, HeadlessHost)
+        self.assertIs(progress_sink, instance.host.progress_bus)
+        self.assertIs(circuit_breaker, instance.host.circuit_breaker)
+
+        self.assertIsInstance(instance.process_info, ProcessInfo)
+        self.assertEqual("-HEADLESS_UPDATE-", instance.process_info.name)
+        self.assertIs(instance.host, instance.process_info.window)
+        self.assertFalse(instance.is_cancelled)
+        self.assertIsNone(instance.process_num)
+        self.assertIsNone(instance.report_dir)
+        self.assertFalse(instance.is_chrome_trace)
+
+        instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db, progress_sink, 4)
+        self.assertEqual(4, instance.process_num)
+
+        instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db, None, None, "./report", True)
+        self.assertEqual(Path("./report"), instance.report_dir)
+        self.assertTrue(instance.is_chrome_trace)
+
+        # ShardedUpdater では各段階の所要時間を記録できない
+        with self.assertRaises(ValueError):
+            instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db, None, 2, Path("./report"))
+
+        for process_num in [0, 1.5, "2"]:
+            with self.assertRaises(ValueError):
+                instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db, progress_sink, process_num)
+
+    def test_select(self):
+        self.enterContext(freezegun.freeze_time("2023-12-23 12:34:56"))
+        mylist_dict_list = [self._get_mylist_dict(i) for i in range(1, 4)]
+        instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db)
+
+        self.mylist_db.select.return_value = mylist_dict_list
+        self.assertEqual(mylist_dict_list, instance.select_all())
+
+        # インターバル更新と同じく1分先までに期限を迎えるマイリスト, 失敗カウントの上限は設けない
+        self.mylist_db.select_due.return_value = mylist_dict_list[:1]
+        self.assertEqual(mylist_dict_list[:1], instance.select_due())
+        self.mylist_db.select_due.assert_called_once_with(datetime(2023, 12, 23, 12, 35, 56), None)
+        self.mylist_db.select_due.reset_mock()
+        self.assertEqual(mylist_dict_list[:1], instance.select_due(datetime(2023, 12, 24, 0, 0, 0)))
+        self.mylist_db.select_due.assert_called_once_with(datetime(2023, 12, 24, 0, 1, 0), None)
+
+        # 指定の順に返す, 登録されていないURLは除く
+        mylist_dict_dict = {m["url"]: m for m in mylist_dict_list}
+        self.mylist_db.select_from_url.side_effect = lambda url: (
+            [mylist_dict_dict[url]] if url in mylist_dict_dict else []
+        )
+        unknown_url = "https://www.nicovideo.jp/user/99999999/video"
+        actual = instance.select_url([mylist_dict_list[2]["url"], unknown_url, mylist_dict_list[0]["url"]])
+        self.assertEqual([mylist_dict_list[2], mylist_dict_list[0]], actual)
+
+    def test_update(self):
+        mock_mwvl = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.MylistWithVideoList"))
+        mock_job = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.UpdateJob"))
+        mock_pipeline = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.UpdatePipeline"))
+        mock_include = self.enterContext(patch.object(HeadlessUpdater, "update_include_flag"))
+        mock_save_trace_report = self.enterContext(
+            patch("nnmm.process.update_mylist.headless_updater.save_trace_report")
+        )
+
+        mylist_dict_list = [self._get_mylist_dict(i) for i in range(1, 5)]
+        url_list = [m["url"] for m in mylist_dict_list]
+        mylist_with_video_list = []
+        for url in url_list[1:]:
+            m = MagicMock()
+            m.mylist.url.non_query_url = url
+            mylist_with_video_list.append(m)
+        mock_mwvl.create.return_value = mylist_with_video_list
+        job = MagicMock(spec=UpdateJob)
+        job.count.return_value = 1
+        mock_job.create.return_value = job
+        mock_pipeline.return_value.execute.return_value = [
+            (self._make_payload(url_list[1]), Result.success),
+            (self._make_payload(url_list[2]), Result.failed),
+        ]
+
+        instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db)
+        instance.circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        instance.circuit_breaker.allow.side_effect = lambda url, now, is_forced: url != url_list[0]
+
+        actual = instance.update(mylist_dict_list, True, True)
+        self.assertEqual(UpdateSummary(4, 1, 1, 1, 1, actual.elapsed), actual)
+        self.assertEqual([call(url, ANY, True) for url in url_list], instance.circuit_breaker.allow.mock_calls)
+        mock_mwvl.create.assert_called_once_with(mylist_dict_list[1:], self.mylist_info_db)
+        mock_job.create.assert_called_once_with(url_list[1:])
+        mock_pipeline.assert_called_once_with(mylist_with_video_list, instance.process_info, True, job=job)
+        mock_pipeline.return_value.execute.assert_called_once_with()
+        mock_include.assert_called_once_with([url_list[1]])
+        job.count.assert_called_once_with(UpdateJobState.cancelled)
+        job.cancel.assert_not_called()
+        # report_dir が指定されていなければレポートは書き出さない
+        mock_save_trace_report.assert_not_called()
+
+        # report_dir が指定されていれば、各段階の所要時間の集計を書き出す
+        instance.report_dir = Path("./report")
+        instance.is_chrome_trace = True
+        actual = instance.update(mylist_dict_list)
+        mock_save_trace_report.assert_called_once_with(mock_pipeline.return_value.trace, Path("./report"), True)
+
+        # 全てサーキットブレーカーで除外された場合は何もしない
+        mock_pipeline.reset_mock()
+        instance.circuit_breaker.allow.side_effect = lambda url, now, is_forced: False
+        actual = instance.update(mylist_dict_list)
+        self.assertEqual(UpdateSummary(4, 4), actual)
+        mock_pipeline.assert_not_called()
+
+        # 対象が空
+        actual = instance.update([])
+        self.assertEqual(UpdateSummary(), actual)
+        mock_pipeline.assert_not_called()
+
+        # 中止済なら fetch しない
+        instance.circuit_breaker.allow.side_effect = lambda url, now, is_forced: True
+        instance.cancel()
+        actual = instance.update(mylist_dict_list)
+        self.assertEqual(UpdateSummary(4, 0, cancelled=4), actual)
+        mock_pipeline.assert_not_called()
+
+    def test_update_sharded(self):
+        mock_mwvl = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.MylistWithVideoList"))
+        mock_job = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.UpdateJob"))
+        mock_pipeline = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.UpdatePipeline"))
+        mock_sharded = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.ShardedUpdater"))
+        mock_include = self.enterContext(patch.object(HeadlessUpdater, "update_include_flag"))
+
+        mylist_dict_list = [self._get_mylist_dict(i) for i in range(1, 4)]
+        url_list = [m["url"] for m in mylist_dict_list]
+        mylist_with_video_list = MagicMock()
+        mock_mwvl.create.return_value = mylist_with_video_list
+        job = MagicMock(spec=UpdateJob)
+        job.count.return_value = 0
+        mock_job.create.return_value = job
+        mock_sharded.return_value.execute.return_value = [
+            (url_list[2], Result.success),
+            (url_list[0], Result.success),
+            (url_list[1], Result.failed),
+        ]
+
+        # process_num が指定されていれば ShardedUpdater で更新する
+        instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db, None, 2)
+        actual = instance.update(mylist_dict_list, True)
+        self.assertEqual(UpdateSummary(3, 0, 2, 1, 0, actual.elapsed), actual)
+        mock_pipeline.assert_not_called()
+        mock_sharded.assert_called_once_with(mylist_with_video_list, instance.process_info, True, 2, job=job)
+        mock_sharded.return_value.execute.assert_called_once_with()
+        mock_include.assert_called_once_with([url_list[2], url_list[0]])
+
+    def test_cancel(self):
+        mock_mwvl = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.MylistWithVideoList"))
+        mock_job = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.UpdateJob"))
+        mock_pipeline = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.UpdatePipeline"))
+        self.enterContext(patch.object(HeadlessUpdater, "update_include_flag"))
+        mock_mwvl.create.return_value = []
+        job = MagicMock(spec=UpdateJob)
+        job.count.return_value = 1
+        mock_job.create.return_value = job
+
+        instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db)
+
+        # 更新処理中に中止されたら実行中のジョブを中止する
+        def execute():
+            instance.cancel()
+            return []
+
+        mock_pipeline.return_value.execute.side_effect = execute
+        actual = instance.update([self._get_mylist_dict(1)])
+        self.assertEqual(UpdateSummary(1, 0, 0, 0, 1, actual.elapsed), actual)
+        job.cancel.assert_called_once_with()
+        self.assertTrue(instance.is_cancelled)
+
+        # 実行中のジョブがなければ中止状態にするのみ
+        job.cancel.reset_mock()
+        instance.cancel()
+        job.cancel.assert_not_called()
+
+    def test_update_include_flag(self):
+        url_list = [self._get_mylist_dict(i)["url"] for i in range(1, 4)]
+        status_dict = {
+            url_list[0]: {"sm11111111": "視聴済", "sm22222222": "未視聴"},
+            url_list[1]: {"sm33333333": "視聴済"},
+            url_list[2]: {},
+        }
+        self.mylist_info_db.select_status_from_mylist_url.side_effect = lambda url: status_dict[url]
+
+        instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db)
+        instance.update_include_flag(url_list)
+        self.assertEqual([call(url) for url in url_list], self.mylist_info_db.select_status_from_mylist_url.mock_calls)
+        self.mylist_db.update_include_flag.assert_called_once_with(url_list[0], True)
+
+    def test_run_daemon(self):
+        mock_update = self.enterContext(patch.object(HeadlessUpdater, "update"))
+        mock_select_url = self.enterContext(patch.object(HeadlessUpdater, "select_url"))
+        mock_time = self.enterContext(patch("nnmm.process.update_mylist.headless_updater.time.time"))
+        now = 1_700_000_000.0
+        mock_time.return_value = now
+
+        # 1件目は期限を迎えている, 2件目は10分後
+        schedule_list = [self._get_schedule_dict(1, int(now) - 60), self._get_schedule_dict(2, int(now) + 600)]
+        instance = HeadlessUpdater(self.mylist_db, self.mylist_info_db)
+        self.mylist_db.select_schedule.return_value = schedule_list
+        mylist_dict = self._get_mylist_dict(1)
+        mock_select_url.return_value = [mylist_dict]
+        mock_update.return_value = UpdateSummary(1, 0, 1)
+
+        wait_list = []
+
+        def wait(timeout):
+            wait_list.append(timeout)
+            if len(wait_list) >= 2:
+                instance.cancel()
+            return instance.is_cancelled
+
+        instance._stop_event = MagicMock(spec=threading.Event)
+        instance._stop_event.is_set.side_effect = lambda: len(wait_list) >= 2
+        instance._stop_event.wait.side_effect = wait
+
+        actual = instance.run_daemon(poll_seconds=300)
+        self.assertEqual(1, actual)
+        mock_select_url.assert_called_once_with([schedule_list[0]["url"]])
+        mock_update.assert_called_once_with([mylist_dict], False)
+
+        # 1周目: 1件目は更新確認後に現在日時からインターバル分後に登録し直すため、次は2件目の10分後
+        # ただし待機は poll_seconds まで
+        # 2周目: 期限を迎えたマイリストはない
+        self.assertEqual([300, 300], wait_list)
+
+        with self.assertRaises(ValueError):
+            instance.run_daemon(poll_seconds=0)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
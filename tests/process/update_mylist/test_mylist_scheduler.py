@@ -0,0 +1,195 @@
+import sys
+import unittest
+from datetime import datetime
+
+from mock import patch
+
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
+
+
+class TestMylistScheduler(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.process.update_mylist.mylist_scheduler.logger"))
+
+    def _get_mylist_dict(self, index: int = 1) -> dict:
+        return {
+            "id": index,
+            "url": f"https://www.nicovideo.jp/user/1000000{index}/video",
+            "checked_at": "2023-12-22 12:00:00",
+            "check_interval": "15分",
+            "check_failed_count": 0,
+        }
+
+    def _epoch(self, datetime_str: str) -> float:
+        return datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S").timestamp()
+
+    def test_init(self):
+        instance = MylistScheduler()
+        self.assertEqual(MylistScheduler.MAX_CHECK_FAILED_COUNT, instance.max_check_failed_count)
+        self.assertEqual(0, len(instance))
+        self.assertIsNone(instance.next_check_at())
+        self.assertEqual([], instance.pop_due(self._epoch("2023-12-22 12:00:00")))
+
+    def test_calc_next_check_at(self):
+        mylist_dict = self._get_mylist_dict()
+        actual = MylistScheduler.calc_next_check_at(mylist_dict)
+        self.assertEqual(self._epoch("2023-12-22 12:15:00"), actual)
+
+        mylist_dict["check_interval"] = "1日"
+        actual = MylistScheduler.calc_next_check_at(mylist_dict)
+        self.assertEqual(self._epoch("2023-12-23 12:00:00"), actual)
+
+        # 更新確認失敗カウント超過
+        mylist_dict = self._get_mylist_dict()
+        mylist_dict["check_failed_count"] = MylistScheduler.MAX_CHECK_FAILED_COUNT
+        self.assertIsNone(MylistScheduler.calc_next_check_at(mylist_dict))
+
+        # 上限なしなら更新確認失敗カウントによらず求める
+        actual = MylistScheduler.calc_next_check_at(mylist_dict, None)
+        self.assertEqual(self._epoch("2023-12-22 12:15:00"), actual)
+
+        # インターバル文字列解釈エラー
+        mylist_dict = self._get_mylist_dict()
+        mylist_dict["check_interval"] = "invalid"
+        self.assertIsNone(MylistScheduler.calc_next_check_at(mylist_dict))
+
+        # 日時形式エラー
+        mylist_dict = self._get_mylist_dict()
+        mylist_dict["checked_at"] = "invalid"
+        self.assertIsNone(MylistScheduler.calc_next_check_at(mylist_dict))
+
+        # キーエラー
+        mylist_dict = self._get_mylist_dict()
+        del mylist_dict["checked_at"]
+        self.assertIsNone(MylistScheduler.calc_next_check_at(mylist_dict))
+
+        # DBで求めた next_check_at を含む場合はその値を用いる
+        mylist_dict = self._get_mylist_dict()
+        mylist_dict["check_interval_minutes"] = 60
+        mylist_dict["next_check_at"] = self._epoch("2023-12-22 13:00:00")
+        actual = MylistScheduler.calc_next_check_at(mylist_dict)
+        self.assertEqual(self._epoch("2023-12-22 13:00:00"), actual)
+
+        mylist_dict["next_check_at"] = None
+        self.assertIsNone(MylistScheduler.calc_next_check_at(mylist_dict))
+
+    def test_schedule(self):
+        instance = MylistScheduler()
+        url_1 = self._get_mylist_dict(1)["url"]
+        url_2 = self._get_mylist_dict(2)["url"]
+        instance.schedule(url_1, 200.0)
+        instance.schedule(url_2, 100.0)
+        self.assertEqual(2, len(instance))
+        self.assertIn(url_1, instance)
+        self.assertEqual(100.0, instance.next_check_at())
+
+        # 登録済のマイリストは置き換える
+        instance.schedule(url_2, 300.0)
+        self.assertEqual(2, len(instance))
+        self.assertEqual(200.0, instance.next_check_at())
+        self.assertEqual([url_1, url_2], instance.pop_due(300.0))
+
+    def test_schedule_from_record(self):
+        instance = MylistScheduler()
+        mylist_dict = self._get_mylist_dict()
+        actual = instance.schedule_from_record(mylist_dict)
+        self.assertEqual(self._epoch("2023-12-22 12:15:00"), actual)
+        self.assertEqual(actual, instance.next_check_at())
+
+        # 下限を過ぎていなければそのまま登録する
+        not_before = self._epoch("2023-12-22 12:10:00")
+        actual = instance.schedule_from_record(mylist_dict, not_before=not_before)
+        self.assertEqual(self._epoch("2023-12-22 12:15:00"), actual)
+
+        # 下限を過ぎていれば下限からインターバル分後に登録する
+        not_before = self._epoch("2023-12-22 13:00:00")
+        actual = instance.schedule_from_record(mylist_dict, not_before=not_before)
+        self.assertEqual(self._epoch("2023-12-22 13:15:00"), actual)
+        self.assertEqual(actual, instance.next_check_at())
+        self.assertEqual(1, len(instance))
+
+        # check_interval_minutes を含む場合はその値をインターバルとする
+        mylist_dict["check_interval_minutes"] = 60
+        mylist_dict["next_check_at"] = self._epoch("2023-12-22 13:00:00")
+        actual = instance.schedule_from_record(mylist_dict, not_before=not_before)
+        self.assertEqual(self._epoch("2023-12-22 14:00:00"), actual)
+
+        # 更新対象としないマイリストは取り除く
+        mylist_dict["check_failed_count"] = MylistScheduler.MAX_CHECK_FAILED_COUNT
+        actual = instance.schedule_from_record(mylist_dict)
+        self.assertIsNone(actual)
+        self.assertEqual(0, len(instance))
+        self.assertIsNone(instance.next_check_at())
+
+        # 上限なしのスケジューラなら更新確認失敗カウントによらず登録する
+        instance = MylistScheduler(max_check_failed_count=None)
+        actual = instance.schedule_from_record(mylist_dict)
+        self.assertEqual(self._epoch("2023-12-22 13:00:00"), actual)
+        self.assertEqual(1, len(instance))
+
+    def test_load(self):
+        instance = MylistScheduler()
+        instance.schedule("https://www.nicovideo.jp/user/99999999/video", 0.0)
+
+        mylist_dict_list = [self._get_mylist_dict(i) for i in range(1, 5)]
+        mylist_dict_list[0]["checked_at"] = "2023-12-22 13:00:00"
+        mylist_dict_list[1]["checked_at"] = "2023-12-22 11:00:00"
+        mylist_dict_list[2]["check_interval"] = "invalid"
+        mylist_dict_list[3]["check_interval"] = "1時間"
+
+        actual = instance.load(mylist_dict_list)
+        self.assertEqual(3, actual)
+        self.assertNotIn("https://www.nicovideo.jp/user/99999999/video", instance)
+        self.assertNotIn(mylist_dict_list[2]["url"], instance)
+        self.assertEqual(self._epoch("2023-12-22 11:15:00"), instance.next_check_at())
+
+    def test_remove(self):
+        instance = MylistScheduler()
+        url_1 = self._get_mylist_dict(1)["url"]
+        url_2 = self._get_mylist_dict(2)["url"]
+        instance.schedule(url_1, 100.0)
+        instance.schedule(url_2, 200.0)
+
+        instance.remove(url_1)
+        self.assertNotIn(url_1, instance)
+        self.assertEqual(200.0, instance.next_check_at())
+
+        # 登録されていなければ何もしない
+        instance.remove(url_1)
+        self.assertEqual(1, len(instance))
+
+    def test_pop_due(self):
+        instance = MylistScheduler()
+        url_list = [self._get_mylist_dict(i)["url"] for i in range(1, 6)]
+        for i, url in enumerate(url_list):
+            instance.schedule(url, 500.0 - i * 100.0)
+
+        # 期限を過ぎたものを早い順に limit 件まで取り出す
+        actual = instance.pop_due(350.0, limit=2)
+        self.assertEqual([url_list[4], url_list[3]], actual)
+        self.assertEqual(3, len(instance))
+        self.assertNotIn(url_list[4], instance)
+
+        actual = instance.pop_due(350.0)
+        self.assertEqual([url_list[2]], actual)
+        self.assertEqual(400.0, instance.next_check_at())
+
+        # 期限を過ぎたものがなければ空リスト
+        self.assertEqual([], instance.pop_due(350.0))
+
+        # 取り除いた、置き換えたマイリストの古い要素は取り出さない
+        instance.remove(url_list[1])
+        instance.schedule(url_list[0], 1000.0)
+        self.assertEqual([], instance.pop_due(999.0))
+        self.assertEqual([url_list[0]], instance.pop_due(1000.0))
+        self.assertEqual(0, len(instance))
+
+        # now を省略した場合は現在日時
+        instance.schedule(url_list[0], 0.0)
+        self.assertEqual([url_list[0]], instance.pop_due())
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -1,13 +1,15 @@
 import sys
 import unittest
-from contextlib import ExitStack
+from datetime import datetime
 
 import freezegun
-from mock import MagicMock, patch
+from mock import MagicMock
 from PySide6.QtWidgets import QDialog
 
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
 from nnmm.process.update_mylist.partial import Partial, PartialThreadDone
 from nnmm.process.value_objects.process_info import ProcessInfo
 
@@ -43,35 +45,56 @@ class TestPartial(unittest.TestCase):
         self.assertEqual(PartialThreadDone, instance.post_process)
         self.assertEqual("Partial mylist", instance.L_KIND)
         self.assertEqual("-PARTIAL_UPDATE_THREAD_DONE-", instance.E_DONE)
+        self.assertIsNone(instance.target_mylist_url_list)
 
     def test_get_target_mylist(self):
-        with ExitStack() as stack:
-            f_now = "2023-12-23 12:34:56"
-            freeze_gun = self.enterContext(freezegun.freeze_time(f_now))
-            mock_logger = self.enterContext(patch("nnmm.process.update_mylist.partial.logger"))
-
-            MAX_CHECK_FAILED_COUNT = 10
-            mylist_dict_list = [self._get_mylist_dict(i) for i in range(4)]
-            # 更新対象となるmylist_dict
-            mylist_dict_list[0]["checked_at"] = "2023-12-20 12:34:56"
-            # 更新対象とならないmylist_dict
-            mylist_dict_list[1]["checked_at"] = "2023-12-23 12:34:56"
-            # インターバル文字列解釈エラーとなるmylist_dict
-            mylist_dict_list[2]["check_interval"] = "invalid"
-            # 更新確認失敗カウント超過となるmylist_dict
-            mylist_dict_list[3]["check_failed_count"] = MAX_CHECK_FAILED_COUNT
-
-            instance = Partial(self.process_info)
-            instance.mylist_db.select = lambda: mylist_dict_list
-            actual = instance.get_target_mylist()
-            expect = [mylist_dict_list[0]]
-            self.assertEqual(expect, actual)
-
-            # キーエラーとなるmylist_dict
-            mylist_dict_list = [self._get_mylist_dict()]
-            del mylist_dict_list[0]["check_interval"]
-            actual = instance.get_target_mylist()
-            self.assertEqual([], actual)
+        self.enterContext(freezegun.freeze_time("2023-12-23 12:34:56"))
+        MAX_CHECK_FAILED_COUNT = 10
+        mylist_dict_list = [self._get_mylist_dict(i) for i in range(2)]
+        self.process_info.mylist_db.select_due.return_value = mylist_dict_list
+
+        # 1分先までに次回更新確認日時を迎えるマイリストをDBから選択する
+        instance = Partial(self.process_info)
+        actual = instance.get_target_mylist()
+        self.assertEqual(mylist_dict_list, actual)
+        self.process_info.mylist_db.select_due.assert_called_once_with(
+            datetime(2023, 12, 23, 12, 35, 56), MAX_CHECK_FAILED_COUNT
+        )
+        self.process_info.mylist_db.select.assert_not_called()
+
+        # サーキットブレーカーが設定されていれば更新確認失敗カウントの上限は設けない
+        self.process_info.mylist_db.select_due.reset_mock()
+        self.process_info.window.circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        instance = Partial(self.process_info)
+        actual = instance.get_target_mylist()
+        self.assertEqual(mylist_dict_list, actual)
+        self.process_info.mylist_db.select_due.assert_called_once_with(datetime(2023, 12, 23, 12, 35, 56), None)
+
+    def test_get_target_mylist_with_scheduler(self):
+        mylist_dict_list = [self._get_mylist_dict(i) for i in range(4)]
+        self.process_info.mylist_db.select.return_value = mylist_dict_list
+
+        # 対象のマイリストURLリストが指定されていればそのマイリストを返す
+        instance = Partial(self.process_info)
+        instance.target_mylist_url_list = [mylist_dict_list[2]["url"], mylist_dict_list[0]["url"]]
+        actual = instance.get_target_mylist()
+        self.assertEqual([mylist_dict_list[0], mylist_dict_list[2]], actual)
+
+        # スケジューラが設定されていれば期限を過ぎたマイリストを取り出して返す
+        scheduler = MagicMock(spec=MylistScheduler)
+        scheduler.pop_due.return_value = [mylist_dict_list[1]["url"], "https://www.nicovideo.jp/user/99999999/video"]
+        self.process_info.window.mylist_scheduler = scheduler
+        instance = Partial(self.process_info)
+        actual = instance.get_target_mylist()
+        self.assertEqual([mylist_dict_list[1]], actual)
+        scheduler.pop_due.assert_called_once_with()
+
+        # 指定がある場合はスケジューラから取り出さない
+        scheduler.reset_mock()
+        instance.target_mylist_url_list = [mylist_dict_list[3]["url"]]
+        actual = instance.get_target_mylist()
+        self.assertEqual([mylist_dict_list[3]], actual)
+        scheduler.pop_due.assert_not_called()
 
     def test_thread_done_init(self):
         instance = PartialThreadDone(self.process_info)
@@ -0,0 +1,362 @@
+import queue
+import sys
+import threading
+import unittest
+
+from mock import MagicMock, call, patch
+from PySide6.QtWidgets import QDialog
+
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.database_updater import DatabaseUpdater
+from nnmm.process.update_mylist.fetcher import Fetcher
+from nnmm.process.update_mylist.pipeline import UpdatePipeline
+from nnmm.process.update_mylist.progress_bus import ProgressBus
+from nnmm.process.update_mylist.update_job_manager import UpdateJob, UpdateJobState
+from nnmm.process.update_mylist.value_objects.mylist_with_video import MylistWithVideo
+from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList
+from nnmm.process.update_mylist.value_objects.payload import Payload
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.process.value_objects.table_row import Status
+from nnmm.update_trace import UpdateTrace
+from nnmm.util import Result
+
+
+class TestUpdatePipeline(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.process.update_mylist.pipeline.logger.error"))
+        self.process_info = MagicMock(spec=ProcessInfo)
+        self.process_info.name = "-TEST_PROCESS-"
+        self.process_info.window = MagicMock(spec=QDialog)
+        self.process_info.mylist_db = MagicMock(spec=MylistDBController)
+        self.process_info.mylist_info_db = MagicMock(spec=MylistInfoDBController)
+
+    def _make_mylist_with_video(self, index: int) -> MylistWithVideo:
+        mylist_with_video = MagicMock(spec=MylistWithVideo)
+        mylist_with_video.mylist.url.non_query_url = f"https://www.nicovideo.jp/user/1000000{index}/video"
+        mylist_with_video.video_status_dict = {f"sm1234567{index}": Status.not_watched}
+        return mylist_with_video
+
+    def _make_mylist_with_video_list(self, num: int) -> MylistWithVideoList:
+        item_list = [self._make_mylist_with_video(i) for i in range(1, num + 1)]
+        mylist_with_video_list = MagicMock(spec=MylistWithVideoList)
+        mylist_with_video_list.__iter__.side_effect = lambda: iter(item_list)
+        mylist_with_video_list.__len__.return_value = num
+        mylist_with_video_list.__getitem__.side_effect = item_list.__getitem__
+        return mylist_with_video_list
+
+    def _make_instance(self, num: int, queue_size: int = UpdatePipeline.DEFAULT_QUEUE_SIZE) -> UpdatePipeline:
+        mylist_with_video_list = self._make_mylist_with_video_list(num)
+        instance = UpdatePipeline(mylist_with_video_list, self.process_info, queue_size=queue_size)
+        instance.fetcher.execute_worker = MagicMock(side_effect=lambda url, ids, n: f"fetched_{url}")
+        instance.database_updater.execute_worker = MagicMock(return_value=Result.success)
+        return instance
+
+    def test_init(self):
+        mylist_with_video_list = MagicMock(spec=MylistWithVideoList)
+        instance = UpdatePipeline(mylist_with_video_list, self.process_info)
+        self.assertEqual(mylist_with_video_list, instance.mylist_with_video_list)
+        self.assertIsInstance(instance.fetcher, Fetcher)
+        self.assertIsInstance(instance.database_updater, DatabaseUpdater)
+        self.assertEqual(False, instance.fetcher.is_backfill)
+        self.assertEqual(UpdatePipeline.DEFAULT_QUEUE_SIZE, instance.queue_size)
+        # ジョブの指定がなければ単独のジョブを作成する
+        self.assertEqual([], instance.job.mylist_url_list)
+        self.assertIs(instance.job.cancel_token, instance.fetcher.cancel_token)
+        self.assertIs(instance.job.cancel_token, instance.database_updater.cancel_token)
+        # fetch とDB更新の各段階の所要時間は同じ UpdateTrace に記録する
+        self.assertIsInstance(instance.trace, UpdateTrace)
+        self.assertIs(instance.trace, instance.fetcher.trace)
+        self.assertIs(instance.trace, instance.database_updater.trace)
+
+        instance = UpdatePipeline(mylist_with_video_list, self.process_info, True, 2)
+        self.assertEqual(True, instance.fetcher.is_backfill)
+        self.assertEqual(2, instance.queue_size)
+
+        mylist_with_video_list = self._make_mylist_with_video_list(2)
+        job = UpdateJob(1, [m.mylist.url.non_query_url for m in mylist_with_video_list])
+        instance = UpdatePipeline(mylist_with_video_list, self.process_info, job=job)
+        self.assertIs(job, instance.job)
+        self.assertIs(job.cancel_token, instance.fetcher.cancel_token)
+        self.assertIs(job.cancel_token, instance.database_updater.cancel_token)
+
+        instance = UpdatePipeline(mylist_with_video_list, self.process_info)
+        self.assertEqual(job.mylist_url_list, instance.job.mylist_url_list)
+
+        with self.assertRaises(ValueError):
+            instance = UpdatePipeline("invalid", self.process_info)
+        with self.assertRaises(ValueError):
+            instance = UpdatePipeline(mylist_with_video_list, self.process_info, queue_size=0)
+        with self.assertRaises(ValueError):
+            instance = UpdatePipeline(mylist_with_video_list, self.process_info, queue_size="1")
+        with self.assertRaises(ValueError):
+            instance = UpdatePipeline(mylist_with_video_list, self.process_info, job="invalid")
+
+    def test_execute(self):
+        mock_payload_create = self.enterContext(patch("nnmm.process.update_mylist.pipeline.Payload.create"))
+        mock_payload_create.side_effect = lambda m, f: MagicMock(
+            spec=Payload, mylist_with_video=m, mylist=m.mylist, fetched_info=f
+        )
+
+        num = 20
+        instance = self._make_instance(num, queue_size=2)
+        actual = instance.execute()
+
+        # 全マイリストが1回ずつ fetch, DB更新される
+        mylist_with_video_list = instance.mylist_with_video_list
+        self.assertEqual(num, len(actual))
+        self.assertCountEqual(
+            [(m, f"fetched_{m.mylist.url.non_query_url}") for m in mylist_with_video_list],
+            [(p.mylist_with_video, p.fetched_info) for p, _ in actual],
+        )
+        self.assertTrue(all(r == Result.success for _, r in actual))
+        self.assertCountEqual(
+            [call(m.mylist.url.non_query_url, list(m.video_status_dict.keys()), num) for m in mylist_with_video_list],
+            instance.fetcher.execute_worker.mock_calls,
+        )
+        self.assertEqual(num, len(instance.database_updater.execute_worker.mock_calls))
+        # 全マイリストが done に遷移する
+        self.assertEqual(num, instance.job.count(UpdateJobState.done))
+        # 終了時に経過時間を記録する
+        self.assertIsInstance(instance.trace.elapsed, float)
+
+        # 開始時と終了時に進捗イベントを発行する
+        instance = self._make_instance(num)
+        instance.fetcher.progress_bus = MagicMock(spec=ProgressBus)
+        instance.execute()
+        self.assertEqual(
+            [call.emit(ProgressEvent.started(num)), call.emit(ProgressEvent.finished())],
+            instance.fetcher.progress_bus.mock_calls,
+        )
+
+        # 対象が空でも終了する
+        instance = self._make_instance(0)
+        self.assertEqual([], instance.execute())
+        instance.fetcher.execute_worker.assert_not_called()
+        instance.database_updater.execute_worker.assert_not_called()
+
+    def test_execute_streaming(self):
+        # 最初の fetch 結果は、残りの fetch が終わる前にDB更新される
+        instance = self._make_instance(3, queue_size=1)
+        first_url = instance.mylist_with_video_list[0].mylist.url.non_query_url
+        first_updated = threading.Event()
+
+        def fetch(url, ids, n):
+            if url != first_url and not first_updated.wait(timeout=5):
+                raise TimeoutError
+            return Result.failed
+
+        def update(mylist, video_list, fetched_info, n):
+            if mylist.url.non_query_url == first_url:
+                first_updated.set()
+            return Result.success
+
+        instance.fetcher.execute_worker.side_effect = fetch
+        instance.database_updater.execute_worker.side_effect = update
+        actual = instance.execute()
+        self.assertTrue(first_updated.is_set())
+        self.assertEqual(3, len(actual))
+        self.assertTrue(all(p.fetched_info == Result.failed for p, _ in actual))
+
+    def test_execute_fetch_error(self):
+        # fetch ワーカーで例外が発生しても呼び出し元には伝わらず、全マイリストが done に遷移して終了する
+        instance = self._make_instance(3)
+        instance.fetcher.execute_worker.side_effect = ValueError
+        self.assertEqual([], instance.execute())
+        instance.database_updater.execute_worker.assert_not_called()
+        self.assertEqual(3, instance.job.count(UpdateJobState.done))
+        self.assertTrue(instance.job.is_finished)
+
+        # 取得済の動画情報の読み込みに失敗したマイリストのみDB更新を行わない
+        mock_payload_create = self.enterContext(patch("nnmm.process.update_mylist.pipeline.Payload.create"))
+        mock_payload_create.side_effect = lambda m, f: MagicMock(
+            spec=Payload, mylist_with_video=m, mylist=m.mylist, fetched_info=f
+        )
+        instance = self._make_instance(3)
+        failed_mylist_with_video = instance.mylist_with_video_list[1]
+        type(failed_mylist_with_video).video_status_dict = property(MagicMock(side_effect=ValueError))
+        actual = instance.execute()
+        self.assertEqual(2, len(actual))
+        self.assertNotIn(failed_mylist_with_video, [p.mylist_with_video for p, _ in actual])
+        self.assertEqual(2, len(instance.database_updater.execute_worker.mock_calls))
+        self.assertEqual(3, instance.job.count(UpdateJobState.done))
+
+    def test_execute_cancel(self):
+        # 開始前に中止された場合は fetch, DB更新を行わない
+        num = 5
+        instance = self._make_instance(num)
+        instance.job.cancel()
+        self.assertEqual([], instance.execute())
+        instance.fetcher.execute_worker.assert_not_called()
+        instance.database_updater.execute_worker.assert_not_called()
+        self.assertEqual(num, instance.job.count(UpdateJobState.cancelled))
+
+        # 最初の fetch 中に中止された場合、以降のマイリストは fetch, DB更新を行わない
+        instance = self._make_instance(num, queue_size=1)
+        instance.FETCH_WORKER_NUM = 1
+
+        def fetch(url, ids, n):
+            instance.job.cancel()
+            return Result.failed
+
+        instance.fetcher.execute_worker.side_effect = fetch
+        self.assertEqual([], instance.execute())
+        self.assertEqual(1, len(instance.fetcher.execute_worker.mock_calls))
+        instance.database_updater.execute_worker.assert_not_called()
+        self.assertEqual(num, instance.job.count(UpdateJobState.cancelled))
+
+    def test_fetch_worker(self):
+        mock_payload_create = self.enterContext(patch("nnmm.process.update_mylist.pipeline.Payload.create"))
+        instance = self._make_instance(1)
+        mylist_with_video = instance.mylist_with_video_list[0]
+        mylist_url = mylist_with_video.mylist.url.non_query_url
+        payload_queue = MagicMock(spec=queue.Queue)
+
+        actual = instance.fetch_worker(mylist_with_video, payload_queue, 1)
+        self.assertEqual(Result.success, actual)
+        self.assertEqual([call(mylist_url, ["sm12345671"], 1)], instance.fetcher.execute_worker.mock_calls)
+        self.assertEqual([call(mylist_with_video, f"fetched_{mylist_url}")], mock_payload_create.mock_calls)
+        self.assertEqual([call.put(mock_payload_create.return_value)], payload_queue.mock_calls)
+        self.assertEqual(UpdateJobState.fetching, instance.job.state(mylist_url))
+
+        # 開始前に中止されていた場合
+        mock_payload_create.reset_mock()
+        payload_queue.reset_mock()
+        instance = self._make_instance(1)
+        instance.job.cancel()
+        actual = instance.fetch_worker(mylist_with_video, payload_queue, 1)
+        self.assertEqual(Result.failed, actual)
+        instance.fetcher.execute_worker.assert_not_called()
+        mock_payload_create.assert_not_called()
+        self.assertEqual([], payload_queue.mock_calls)
+        self.assertEqual(UpdateJobState.cancelled, instance.job.state(mylist_url))
+
+        # fetch 中に中止された場合
+        mylist_with_video.reset_mock()
+        instance = self._make_instance(1)
+        instance.fetcher.execute_worker.side_effect = lambda url, ids, n: instance.job.cancel()
+        actual = instance.fetch_worker(mylist_with_video, payload_queue, 1)
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(1, len(instance.fetcher.execute_worker.mock_calls))
+        mock_payload_create.assert_not_called()
+        self.assertEqual([], payload_queue.mock_calls)
+        mylist_with_video.release_video_status_dict.assert_called_once_with()
+        self.assertEqual(UpdateJobState.cancelled, instance.job.state(mylist_url))
+
+        # 取得済の動画情報の読み込みで例外が発生した場合
+        mylist_with_video = self._make_mylist_with_video(1)
+        type(mylist_with_video).video_status_dict = property(MagicMock(side_effect=ValueError("db error")))
+        payload_queue.reset_mock()
+        instance = self._make_instance(1)
+        instance.fetcher.progress_bus = MagicMock(spec=ProgressBus)
+        actual = instance.fetch_worker(mylist_with_video, payload_queue, 1)
+        self.assertEqual(Result.failed, actual)
+        instance.fetcher.execute_worker.assert_not_called()
+        mock_payload_create.assert_not_called()
+        self.assertEqual([], payload_queue.mock_calls)
+        self.assertEqual(
+            [call.emit(ProgressEvent.updated(mylist_url, False))], instance.fetcher.progress_bus.mock_calls
+        )
+        mylist_with_video.release_video_status_dict.assert_called_once_with()
+        self.assertEqual(UpdateJobState.done, instance.job.state(mylist_url))
+
+        # ペイロードの作成で例外が発生した場合
+        mylist_with_video = self._make_mylist_with_video(1)
+        mock_payload_create.side_effect = ValueError
+        instance = self._make_instance(1)
+        actual = instance.fetch_worker(mylist_with_video, payload_queue, 1)
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(1, len(instance.fetcher.execute_worker.mock_calls))
+        self.assertEqual([], payload_queue.mock_calls)
+        self.assertEqual(UpdateJobState.done, instance.job.state(mylist_url))
+
+        # 例外の発生時に中止されていた場合
+        mylist_with_video = self._make_mylist_with_video(1)
+        instance = self._make_instance(1)
+
+        def fetch(url, ids, n):
+            instance.job.cancel()
+            raise ValueError
+
+        instance.fetcher.execute_worker.side_effect = fetch
+        actual = instance.fetch_worker(mylist_with_video, payload_queue, 1)
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(UpdateJobState.cancelled, instance.job.state(mylist_url))
+
+    def test_update_worker(self):
+        instance = self._make_instance(0)
+        instance.database_updater.progress_bus = MagicMock(spec=ProgressBus)
+        payload_list = [MagicMock(spec=Payload) for _ in range(3)]
+        for i, payload in enumerate(payload_list):
+            payload.mylist.url.non_query_url = f"https://www.nicovideo.jp/user/1000000{i}/video"
+        instance.job = UpdateJob.create([p.mylist.url.non_query_url for p in payload_list])
+        for payload in payload_list:
+            instance.job.transition(payload.mylist.url.non_query_url, UpdateJobState.fetching)
+        payload_queue = queue.Queue()
+        for payload in payload_list + [None]:
+            payload_queue.put(payload)
+
+        # 2つ目のペイロードのDB更新で例外が発生しても続ける
+        instance.database_updater.execute_worker.side_effect = [Result.success, ValueError, Result.success]
+        actual = instance.update_worker(payload_queue, 3)
+        expect = [
+            (payload_list[0], Result.success),
+            (payload_list[1], Result.failed),
+            (payload_list[2], Result.success),
+        ]
+        self.assertEqual(expect, actual)
+        self.assertEqual(
+            [call(p.mylist, p.video_status_dict, p.fetched_info, 3) for p in payload_list],
+            instance.database_updater.execute_worker.mock_calls,
+        )
+        # 差分確認後は取得済の動画情報を破棄する
+        for payload in payload_list:
+            payload.mylist_with_video.release_video_status_dict.assert_called_once_with()
+        self.assertTrue(payload_queue.empty())
+        # 例外が発生した分は DB更新失敗 として進捗イベントを発行する
+        mylist_url = payload_list[1].mylist.url.non_query_url
+        self.assertEqual(
+            [call.emit(ProgressEvent.updated(mylist_url, False))],
+            instance.database_updater.progress_bus.mock_calls,
+        )
+        # 成否に関わらず done に遷移する
+        for payload in payload_list:
+            self.assertEqual(UpdateJobState.done, instance.job.state(payload.mylist.url.non_query_url))
+
+        # 中止された場合は取り出したペイロードのDB更新を行わない
+        instance.database_updater.execute_worker.reset_mock()
+        instance.job = UpdateJob.create([p.mylist.url.non_query_url for p in payload_list])
+        for payload in payload_list:
+            payload.reset_mock()
+            instance.job.transition(payload.mylist.url.non_query_url, UpdateJobState.fetching)
+            payload_queue.put(payload)
+        payload_queue.put(None)
+        instance.job.cancel()
+        actual = instance.update_worker(payload_queue, 3)
+        self.assertEqual([(p, Result.failed) for p in payload_list], actual)
+        instance.database_updater.execute_worker.assert_not_called()
+        for payload in payload_list:
+            payload.mylist_with_video.release_video_status_dict.assert_called_once_with()
+            self.assertEqual(UpdateJobState.cancelled, instance.job.state(payload.mylist.url.non_query_url))
+
+        # DB更新の開始直後に中止された場合は cancelled に遷移する
+        instance.job = UpdateJob.create([p.mylist.url.non_query_url for p in payload_list[:1]])
+        instance.job.transition(payload_list[0].mylist.url.non_query_url, UpdateJobState.fetching)
+
+        def update(mylist, video_status_dict, fetched_info, n):
+            instance.job.cancel()
+            return Result.failed
+
+        instance.database_updater.execute_worker.side_effect = update
+        payload_queue.put(payload_list[0])
+        payload_queue.put(None)
+        actual = instance.update_worker(payload_queue, 1)
+        self.assertEqual([(payload_list[0], Result.failed)], actual)
+        self.assertEqual(UpdateJobState.cancelled, instance.job.state(payload_list[0].mylist.url.non_query_url))
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
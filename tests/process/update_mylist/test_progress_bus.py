@@ -0,0 +1,117 @@
+import sys
+import unittest
+
+from mock import MagicMock, call
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QLineEdit, QProgressBar
+
+from nnmm.process.update_mylist.progress_bus import ProgressBus
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
+from nnmm.process.update_mylist.value_objects.progress_state import ProgressState
+
+
+class TestProgressBus(unittest.TestCase):
+    def setUp(self):
+        self.oneline_log = MagicMock(spec=QLineEdit)
+        self.progress_bar = MagicMock(spec=QProgressBar)
+        self.mylist_url = "https://www.nicovideo.jp/user/10000001/video"
+
+    def _make_instance(self) -> ProgressBus:
+        instance = ProgressBus(self.oneline_log, self.progress_bar)
+        instance._timer = MagicMock(spec=QTimer)
+        return instance
+
+    def test_init(self):
+        instance = ProgressBus(self.oneline_log, self.progress_bar)
+        self.assertEqual(self.oneline_log, instance.oneline_log)
+        self.assertEqual(self.progress_bar, instance.progress_bar)
+        self.assertEqual(ProgressState(), instance.state)
+        self.assertFalse(instance._is_dirty)
+        self.assertEqual(ProgressBus.FRAME_INTERVAL_MS, instance._timer.interval())
+        self.assertFalse(instance._timer.isActive())
+
+        instance = ProgressBus(self.oneline_log)
+        self.assertIsNone(instance.progress_bar)
+
+    def test_emit(self):
+        instance = self._make_instance()
+        received = []
+        instance.event_emitted.connect(received.append, Qt.ConnectionType.DirectConnection)
+
+        event = ProgressEvent.started(1)
+        instance.emit(event)
+        self.assertEqual([event], received)
+
+        # 発行したスレッドではウィジェットを操作しない
+        self.assertEqual([], self.oneline_log.mock_calls)
+        self.assertEqual([], self.progress_bar.mock_calls)
+
+        with self.assertRaises(ValueError):
+            instance.emit("invalid")
+
+    def test_on_event(self):
+        instance = self._make_instance()
+
+        instance._on_event(ProgressEvent.started(2))
+        self.assertEqual(2, instance.state.total)
+        self.assertTrue(instance._is_dirty)
+        self.assertEqual([call.start()], instance._timer.mock_calls)
+
+        # 受け取っただけではウィジェットに反映しない
+        instance._timer.reset_mock()
+        instance._on_event(ProgressEvent.fetched(self.mylist_url, True))
+        instance._on_event(ProgressEvent.updated(self.mylist_url, True))
+        self.assertEqual(1, instance.state.fetched)
+        self.assertEqual(1, instance.state.updated)
+        self.assertEqual([], instance._timer.mock_calls)
+        self.assertEqual([], self.oneline_log.mock_calls)
+
+        # 終了時はタイマーを止めて最終状態を反映する
+        instance._on_event(ProgressEvent.finished())
+        self.assertFalse(instance.state.is_running)
+        self.assertFalse(instance._is_dirty)
+        self.assertEqual([call.stop()], instance._timer.mock_calls)
+        self.assertEqual([], self.oneline_log.mock_calls)
+        self.assertEqual(
+            [call.setMaximum(2), call.setValue(1), call.setFormat(instance.state.to_detail_text())],
+            self.progress_bar.mock_calls,
+        )
+
+    def test_flush(self):
+        instance = self._make_instance()
+
+        # 変更がなければ何もしない
+        instance.flush()
+        self.assertEqual([], self.oneline_log.mock_calls)
+        self.assertEqual([], self.progress_bar.mock_calls)
+
+        # 複数のイベントをまとめて1回で反映する
+        instance._on_event(ProgressEvent.started(3))
+        for _ in range(3):
+            instance._on_event(ProgressEvent.fetched(self.mylist_url, True))
+        instance._on_event(ProgressEvent.updated(self.mylist_url, True))
+        instance.flush()
+        self.assertEqual([call.setText("更新中(1/3)")], self.oneline_log.mock_calls)
+        self.assertEqual(
+            [call.setMaximum(3), call.setValue(1), call.setFormat(instance.state.to_detail_text())],
+            self.progress_bar.mock_calls,
+        )
+
+        self.oneline_log.reset_mock()
+        self.progress_bar.reset_mock()
+        instance.flush()
+        self.assertEqual([], self.oneline_log.mock_calls)
+        self.assertEqual([], self.progress_bar.mock_calls)
+
+        # プログレスバーがない場合
+        instance = ProgressBus(self.oneline_log)
+        instance._timer = MagicMock(spec=QTimer)
+        instance._on_event(ProgressEvent.started(0))
+        instance.flush()
+        self.assertEqual([call.setText("更新中(0/0)")], self.oneline_log.mock_calls)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
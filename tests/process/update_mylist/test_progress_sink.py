@@ -0,0 +1,56 @@
+import io
+import sys
+import unittest
+
+from mock import patch
+
+from nnmm.process.update_mylist.progress_sink import ConsoleProgressSink
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent, ProgressEventKind
+from nnmm.process.update_mylist.value_objects.progress_state import ProgressState
+
+
+class TestConsoleProgressSink(unittest.TestCase):
+    def setUp(self):
+        self.mylist_url = "https://www.nicovideo.jp/user/10000001/video"
+
+    def test_init(self):
+        stream = io.StringIO()
+        instance = ConsoleProgressSink(stream)
+        self.assertIs(stream, instance.stream)
+        self.assertEqual(ProgressState(), instance.state)
+
+        instance = ConsoleProgressSink()
+        self.assertIs(sys.stderr, instance.stream)
+
+    def test_emit(self):
+        stream = io.StringIO()
+        instance = ConsoleProgressSink(stream)
+        interval = ConsoleProgressSink.INTERVAL_SECONDS
+        with patch("nnmm.process.update_mylist.progress_sink.time.monotonic") as mock_monotonic:
+            event_list = [
+                (ProgressEvent(ProgressEventKind.started, "", 2, 10.0), interval),
+                (ProgressEvent(ProgressEventKind.fetch_done, self.mylist_url, 0, 11.0), interval + 0.5),
+                (ProgressEvent(ProgressEventKind.update_done, self.mylist_url, 0, 12.0), interval * 2),
+                (ProgressEvent(ProgressEventKind.finished, "", 0, 13.0), interval * 2 + 0.1),
+            ]
+            expect_state = ProgressState()
+            expect_lines = []
+            for event, now in event_list:
+                mock_monotonic.return_value = now
+                instance.emit(event)
+                expect_state = expect_state.apply(event)
+                self.assertEqual(expect_state, instance.state)
+                # 前回の書き出しから INTERVAL_SECONDS 経過していない場合は書き出さない, finished は必ず書き出す
+                if now != interval + 0.5:
+                    expect_lines.append(expect_state.to_detail_text())
+        self.assertEqual(expect_lines, stream.getvalue().splitlines())
+        self.assertEqual(3, len(expect_lines))
+
+        with self.assertRaises(ValueError):
+            instance.emit("invalid_event")
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
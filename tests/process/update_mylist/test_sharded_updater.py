@@ -0,0 +1,458 @@
+import asyncio
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from mock import MagicMock, call, patch
+
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.progress_sink import ProgressSink
+from nnmm.process.update_mylist.sharded_updater import (
+    SHARD_CONCURRENCY,
+    ShardedUpdater,
+    _fetch_diff,
+    fetch_shard,
+    init_worker,
+)
+from nnmm.process.update_mylist.update_job_manager import UpdateJob, UpdateJobState
+from nnmm.process.update_mylist.value_objects.mylist_diff import MylistDiff
+from nnmm.process.update_mylist.value_objects.mylist_with_video import MylistWithVideo
+from nnmm.process.update_mylist.value_objects.mylist_with_video_list import MylistWithVideoList
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent
+from nnmm.process.update_mylist.value_objects.shard_task import ShardTask
+from nnmm.process.update_mylist.value_objects.typed_mylist import TypedMylist
+from nnmm.process.update_mylist.value_objects.typed_video import TypedVideo
+from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList
+from nnmm.process.value_objects.headless_host import HeadlessHost
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.process.value_objects.table_row import Status
+from nnmm.util import Result
+from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
+from nnmm.video_info_fetcher.video_info_fetcher_base import PermanentFetchError
+
+
+def fake_shard(task_list: list[ShardTask], is_backfill: bool) -> list[MylistDiff]:
+    """ワーカープロセスで実行する、fetch を行わずに空の更新内容を返すシャード関数"""
+    return [MylistDiff(task.mylist_url, Result.success, checked_at="2023-12-22 12:34:56") for task in task_list]
+
+
+def thread_pool(max_workers, mp_context, initializer, initargs) -> ThreadPoolExecutor:
+    """ProcessPoolExecutor の代わりに用いるスレッドプール"""
+    return ThreadPoolExecutor(max_workers)
+
+
+class TestShardedUpdater(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.process.update_mylist.sharded_updater.logger.info"))
+        self.enterContext(patch("nnmm.process.update_mylist.sharded_updater.logger.error"))
+        mock_get_max = self.enterContext(
+            patch("nnmm.process.update_mylist.sharded_updater.ConfigStore.get_max_check_interval_minutes")
+        )
+        mock_get_max.return_value = 60 * 24
+        self.mylist_db = MagicMock(spec=MylistDBController)
+        self.mylist_info_db = MagicMock(spec=MylistInfoDBController)
+        self.progress_bus = MagicMock(spec=ProgressSink)
+        self.host = HeadlessHost(self.mylist_db, self.mylist_info_db, self.progress_bus)
+        self.process_info = MagicMock(spec=ProcessInfo)
+        self.process_info.name = "-TEST_PROCESS-"
+        self.process_info.window = self.host
+        self.process_info.mylist_db = self.mylist_db
+        self.process_info.mylist_info_db = self.mylist_info_db
+
+    def _get_mylist_url(self, index: int) -> str:
+        return f"https://www.nicovideo.jp/user/1000000{index}/video"
+
+    def _get_mylist_with_video_list(self, num: int) -> MylistWithVideoList:
+        m_list = []
+        for i in range(1, num + 1):
+            mylist_url = self._get_mylist_url(i)
+            typed_mylist = TypedMylist.create({
+                "id": i,
+                "username": f"username_{i}",
+                "mylistname": "投稿動画",
+                "type": "uploaded",
+                "showname": f"投稿者{i}さんの投稿動画",
+                "url": mylist_url,
+                "created_at": "2023-12-22 12:34:56",
+                "updated_at": "2023-12-22 12:34:56",
+                "checked_at": "2023-12-22 12:34:56",
+                "check_interval": "15分",
+                "check_failed_count": 0,
+                "is_include_new": False,
+            })
+            typed_video = TypedVideo.create({
+                "id": i,
+                "video_id": f"sm1000000{i}",
+                "title": f"title_{i}",
+                "username": f"username_{i}",
+                "status": "",
+                "uploaded_at": "2023-12-22 12:34:51",
+                "registered_at": "2023-12-22 12:34:51",
+                "video_url": f"https://www.nicovideo.jp/watch/sm1000000{i}",
+                "mylist_url": mylist_url,
+                "created_at": "2023-12-22 12:34:51",
+            })
+            m_list.append(MylistWithVideo(typed_mylist, TypedVideoList.create([typed_video])))
+        return MylistWithVideoList(m_list)
+
+    def _get_diff(self, index: int, has_new_video: bool = False) -> MylistDiff:
+        mylist_url = self._get_mylist_url(index)
+        row = (
+            "1",
+            f"sm1000000{index}",
+            f"title_{index}",
+            f"username_{index}",
+            "",
+            "2023-12-22 12:34:51",
+            "2023-12-22 12:34:51",
+            f"https://www.nicovideo.jp/watch/sm1000000{index}",
+            mylist_url,
+            "2023-12-23 12:34:56",
+        )
+        return MylistDiff(mylist_url, Result.success, (row,), has_new_video, "2023-12-23 12:34:56")
+
+    def test_init(self):
+        mylist_with_video_list = self._get_mylist_with_video_list(3)
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, process_num=2)
+        self.assertIs(mylist_with_video_list, instance.mylist_with_video_list)
+        self.assertFalse(instance.is_backfill)
+        self.assertEqual(2, instance.process_num)
+        self.assertEqual(1, instance.shard_size)
+        self.assertEqual([self._get_mylist_url(i) for i in range(1, 4)], instance.job.active_mylist_url_list())
+        self.assertIs(instance.job.cancel_token, instance.cancel_token)
+        self.assertIsNone(instance.circuit_breaker)
+        self.assertEqual(60 * 24, instance.max_check_interval_minutes)
+        self.assertIs(fetch_shard, instance.shard_func)
+
+        circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        self.host.circuit_breaker = circuit_breaker
+        job = UpdateJob.create([self._get_mylist_url(1)])
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, True, 1, job, fake_shard)
+        self.assertTrue(instance.is_backfill)
+        self.assertIs(job, instance.job)
+        self.assertIs(circuit_breaker, instance.circuit_breaker)
+        self.assertIs(fake_shard, instance.shard_func)
+
+        mock_cpu_count = self.enterContext(patch("nnmm.process.update_mylist.sharded_updater.os.cpu_count"))
+        mock_cpu_count.return_value = 4
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info)
+        self.assertEqual(4, instance.process_num)
+        mock_cpu_count.return_value = None
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info)
+        self.assertEqual(1, instance.process_num)
+
+        params_list = [
+            {"process_num": 0},
+            {"process_num": 1.0},
+            {"job": "invalid"},
+            {"shard_func": "invalid"},
+        ]
+        for params in params_list:
+            with self.assertRaises(ValueError):
+                instance = ShardedUpdater(mylist_with_video_list, self.process_info, **params)
+        with self.assertRaises(ValueError):
+            instance = ShardedUpdater("invalid", self.process_info, job=job)
+
+    def test_calc_shard_size(self):
+        self.assertEqual(1, ShardedUpdater.calc_shard_size(0, 1))
+        self.assertEqual(1, ShardedUpdater.calc_shard_size(3, 1))
+        self.assertEqual(2, ShardedUpdater.calc_shard_size(5, 1))
+        self.assertEqual(63, ShardedUpdater.calc_shard_size(2000, 8))
+        self.assertEqual(ShardedUpdater.MAX_SHARD_SIZE, ShardedUpdater.calc_shard_size(2000, 1))
+
+    def test_make_shard(self):
+        mylist_with_video_list = self._get_mylist_with_video_list(5)
+        circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        circuit_breaker.is_fast_probe.side_effect = lambda url: url == self._get_mylist_url(2)
+        self.host.circuit_breaker = circuit_breaker
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, process_num=1)
+        self.assertEqual(2, instance.shard_size)
+
+        actual = instance.make_shard(0)
+        expect = [
+            ShardTask(self._get_mylist_url(1), {"sm10000001": Status.watched}, False),
+            ShardTask(self._get_mylist_url(2), {"sm10000002": Status.watched}, True),
+        ]
+        self.assertEqual(expect, actual)
+        self.assertEqual(UpdateJobState.fetching, instance.job.state(self._get_mylist_url(1)))
+        self.assertEqual(UpdateJobState.fetching, instance.job.state(self._get_mylist_url(2)))
+        self.assertEqual(UpdateJobState.queued, instance.job.state(self._get_mylist_url(3)))
+        self.assertEqual(
+            [call.is_fast_probe(self._get_mylist_url(1)), call.is_fast_probe(self._get_mylist_url(2))],
+            circuit_breaker.mock_calls,
+        )
+
+        # 中止されたマイリストはシャードに含めない
+        instance.job.transition(self._get_mylist_url(3), UpdateJobState.cancelled)
+        actual = instance.make_shard(2)
+        self.assertEqual([ShardTask(self._get_mylist_url(4), {"sm10000004": Status.watched})], actual)
+
+        # 末尾のシャードは shard_size に満たなくてもよい
+        actual = instance.make_shard(4)
+        self.assertEqual([ShardTask(self._get_mylist_url(5), {"sm10000005": Status.watched})], actual)
+        self.assertEqual([], instance.make_shard(6))
+
+    def test_init_worker(self):
+        mock_signal = self.enterContext(patch("nnmm.process.update_mylist.sharded_updater.signal.signal"))
+        mock_config_store = self.enterContext(patch("nnmm.process.update_mylist.sharded_updater.ConfigStore"))
+        mock_config_store.config = None
+
+        init_worker({"db": {"save_path": "nnmm.db"}})
+        mock_signal.assert_called_once()
+        self.assertEqual({"db": {"save_path": "nnmm.db"}}, mock_config_store.config)
+
+        mock_config_store.config = "previous"
+        init_worker(None)
+        self.assertEqual("previous", mock_config_store.config)
+
+    def test_fetch_diff(self):
+        mock_fetch_videoinfo = self.enterContext(
+            patch("nnmm.process.update_mylist.sharded_updater.VideoInfoFetcher.fetch_videoinfo")
+        )
+        mock_probe = self.enterContext(patch("nnmm.process.update_mylist.sharded_updater.VideoInfoFetcher.probe"))
+        mock_make_diff = self.enterContext(
+            patch("nnmm.process.update_mylist.sharded_updater.DatabaseUpdater.make_diff")
+        )
+        mock_now = self.enterContext(patch("nnmm.process.update_mylist.sharded_updater.get_now_datetime"))
+
+        mylist_url = self._get_mylist_url(1)
+        video_status_dict = {"sm10000001": Status.watched}
+        fetched_info = MagicMock(spec=FetchedVideoInfo)
+        mock_now.return_value = "2023-12-23 12:34:56"
+        mock_make_diff.return_value = self._get_diff(1)
+
+        def pre_run(fetched_result, probe_result=True) -> None:
+            mock_fetch_videoinfo.reset_mock(side_effect=True)
+            mock_probe.reset_mock(side_effect=True)
+            mock_make_diff.reset_mock()
+            if isinstance(fetched_result, type) and issubclass(fetched_result, Exception):
+                mock_fetch_videoinfo.side_effect = fetched_result
+            else:
+                mock_fetch_videoinfo.return_value = fetched_result
+            mock_probe.return_value = probe_result
+
+        # 正常系
+        pre_run(fetched_info)
+        actual = asyncio.run(_fetch_diff(ShardTask(mylist_url, video_status_dict), True))
+        self.assertEqual(self._get_diff(1), actual)
+        self.assertEqual([call(mylist_url, ["sm10000001"], True)], mock_fetch_videoinfo.mock_calls)
+        mock_probe.assert_not_called()
+        self.assertEqual(
+            [call(mylist_url, video_status_dict, fetched_info, "2023-12-23 12:34:56")], mock_make_diff.mock_calls
+        )
+
+        # 回復確認に成功した場合は fetch を続ける
+        pre_run(fetched_info)
+        actual = asyncio.run(_fetch_diff(ShardTask(mylist_url, video_status_dict, True), False))
+        self.assertEqual(self._get_diff(1), actual)
+        self.assertEqual([call(mylist_url)], mock_probe.mock_calls)
+        self.assertEqual([call(mylist_url, ["sm10000001"], False)], mock_fetch_videoinfo.mock_calls)
+
+        # 回復確認に失敗した場合は fetch しない
+        pre_run(fetched_info, False)
+        actual = asyncio.run(_fetch_diff(ShardTask(mylist_url, video_status_dict, True), False))
+        self.assertEqual(MylistDiff.failed(mylist_url), actual)
+        mock_fetch_videoinfo.assert_not_called()
+        mock_make_diff.assert_not_called()
+
+        # fetch 失敗
+        pre_run(Result.failed)
+        actual = asyncio.run(_fetch_diff(ShardTask(mylist_url, video_status_dict), False))
+        self.assertEqual(MylistDiff.failed(mylist_url), actual)
+        mock_make_diff.assert_not_called()
+
+        pre_run(ValueError)
+        actual = asyncio.run(_fetch_diff(ShardTask(mylist_url, video_status_dict), False))
+        self.assertEqual(MylistDiff.failed(mylist_url), actual)
+
+        # 再試行しても回復しない失敗
+        pre_run(PermanentFetchError)
+        actual = asyncio.run(_fetch_diff(ShardTask(mylist_url, video_status_dict), False))
+        self.assertEqual(MylistDiff.failed(mylist_url, True), actual)
+
+    def test_fetch_shard(self):
+        mock_fetch_diff = self.enterContext(patch("nnmm.process.update_mylist.sharded_updater._fetch_diff"))
+        running = {"now": 0, "max": 0}
+
+        async def fetch_diff(task, is_backfill):
+            running["now"] = running["now"] + 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0)
+            running["now"] = running["now"] - 1
+            return MylistDiff.failed(task.mylist_url, is_backfill)
+
+        mock_fetch_diff.side_effect = fetch_diff
+        task_list = [ShardTask(self._get_mylist_url(i), {}) for i in range(SHARD_CONCURRENCY * 2)]
+        actual = fetch_shard(task_list, True)
+        self.assertEqual([MylistDiff.failed(task.mylist_url, True) for task in task_list], actual)
+        self.assertEqual(SHARD_CONCURRENCY, running["max"])
+        self.assertEqual([], fetch_shard([], False))
+
+    def test_execute_worker(self):
+        mock_write_diff = self.enterContext(
+            patch("nnmm.process.update_mylist.sharded_updater.DatabaseUpdater.write_diff")
+        )
+        circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+        self.host.circuit_breaker = circuit_breaker
+        mylist_with_video_list = self._get_mylist_with_video_list(4)
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, process_num=1)
+        for i in range(1, 5):
+            instance.job.transition(self._get_mylist_url(i), UpdateJobState.fetching)
+
+        def pre_run() -> None:
+            mock_write_diff.reset_mock(side_effect=True)
+            circuit_breaker.reset_mock()
+            self.mylist_db.reset_mock()
+            self.progress_bus.reset_mock()
+
+        # 正常系
+        pre_run()
+        diff = self._get_diff(1)
+        actual = instance.execute_worker(diff, 4)
+        self.assertEqual(Result.success, actual)
+        self.assertEqual(UpdateJobState.done, instance.job.state(diff.mylist_url))
+        self.assertEqual(1, instance.done_count)
+        self.assertEqual([call.record_success(diff.mylist_url)], circuit_breaker.mock_calls)
+        self.assertEqual([call.reset_check_failed_count(diff.mylist_url)], self.mylist_db.mock_calls)
+        self.assertEqual(
+            [call(self.mylist_db, self.mylist_info_db, diff, 60 * 24)],
+            mock_write_diff.mock_calls,
+        )
+        self.assertEqual(
+            [
+                call.emit(ProgressEvent.fetched(diff.mylist_url, True)),
+                call.emit(ProgressEvent.updated(diff.mylist_url, True)),
+            ],
+            self.progress_bus.mock_calls,
+        )
+
+        # fetch 失敗
+        pre_run()
+        diff = MylistDiff.failed(self._get_mylist_url(2), True)
+        actual = instance.execute_worker(diff, 4)
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(UpdateJobState.done, instance.job.state(diff.mylist_url))
+        self.assertEqual(2, instance.done_count)
+        self.assertEqual([call.record_failure(diff.mylist_url, True)], circuit_breaker.mock_calls)
+        self.assertEqual([call.update_check_failed_count(diff.mylist_url)], self.mylist_db.mock_calls)
+        mock_write_diff.assert_not_called()
+        self.assertEqual(
+            [
+                call.emit(ProgressEvent.fetched(diff.mylist_url, False)),
+                call.emit(ProgressEvent.updated(diff.mylist_url, False)),
+            ],
+            self.progress_bus.mock_calls,
+        )
+
+        # DB更新時の例外は失敗として扱い、処理は続行する
+        pre_run()
+        mock_write_diff.side_effect = ValueError
+        diff = self._get_diff(3)
+        actual = instance.execute_worker(diff, 4)
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(UpdateJobState.done, instance.job.state(diff.mylist_url))
+        self.assertEqual(3, instance.done_count)
+
+        # 中止後はDB更新を行わない
+        pre_run()
+        instance.job.cancel()
+        diff = self._get_diff(4)
+        actual = instance.execute_worker(diff, 4)
+        self.assertEqual(Result.failed, actual)
+        self.assertEqual(UpdateJobState.cancelled, instance.job.state(diff.mylist_url))
+        self.assertEqual(3, instance.done_count)
+        circuit_breaker.assert_not_called()
+        self.assertEqual([], self.mylist_db.mock_calls)
+        mock_write_diff.assert_not_called()
+        self.assertEqual(
+            [
+                call.emit(ProgressEvent.fetched(diff.mylist_url, True)),
+                call.emit(ProgressEvent.updated(diff.mylist_url, False)),
+            ],
+            self.progress_bus.mock_calls,
+        )
+
+    def test_iter_shard_results(self):
+        mock_executor = self.enterContext(patch("nnmm.process.update_mylist.sharded_updater.ProcessPoolExecutor"))
+        mock_executor.side_effect = thread_pool
+        mylist_with_video_list = self._get_mylist_with_video_list(5)
+
+        # 正常系, 終わったシャードから順に返す
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, process_num=1, shard_func=fake_shard)
+        actual = [diff.mylist_url for diff_list in instance.iter_shard_results() for diff in diff_list]
+        self.assertEqual([self._get_mylist_url(i) for i in range(1, 6)], sorted(actual))
+        mock_executor.assert_called_once()
+        self.assertEqual(1, mock_executor.call_args.kwargs["max_workers"])
+        self.assertEqual("spawn", mock_executor.call_args.kwargs["mp_context"].get_start_method())
+        self.assertIs(init_worker, mock_executor.call_args.kwargs["initializer"])
+
+        # シャード単位で失敗した場合は全て fetch 失敗として返す
+        def raise_shard(task_list, is_backfill):
+            raise ValueError
+
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, process_num=1, shard_func=raise_shard)
+        actual = [diff for diff_list in instance.iter_shard_results() for diff in diff_list]
+        actual.sort(key=lambda diff: diff.mylist_url)
+        self.assertEqual([MylistDiff.failed(self._get_mylist_url(i)) for i in range(1, 6)], actual)
+
+        # 中止後は新たなシャードを投入しない
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, process_num=1, shard_func=fake_shard)
+        actual = []
+        for diff_list in instance.iter_shard_results():
+            actual.extend(diff_list)
+            instance.job.cancel()
+        self.assertEqual(instance.shard_size, len(actual))
+
+        # マイリストがない場合はワーカーを起動しない
+        mock_executor.reset_mock()
+        instance = ShardedUpdater(MylistWithVideoList([]), self.process_info, process_num=1)
+        self.assertEqual([], list(instance.iter_shard_results()))
+        mock_executor.assert_not_called()
+
+    def test_execute(self):
+        mock_executor = self.enterContext(patch("nnmm.process.update_mylist.sharded_updater.ProcessPoolExecutor"))
+        mock_executor.side_effect = thread_pool
+        mock_write_diff = self.enterContext(
+            patch("nnmm.process.update_mylist.sharded_updater.DatabaseUpdater.write_diff")
+        )
+        mylist_with_video_list = self._get_mylist_with_video_list(3)
+
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, process_num=1, shard_func=fake_shard)
+        actual = instance.execute()
+        self.assertEqual([(self._get_mylist_url(i), Result.success) for i in range(1, 4)], sorted(actual))
+        self.assertEqual(3, instance.job.count(UpdateJobState.done))
+        self.assertEqual(3, len(mock_write_diff.mock_calls))
+        self.assertEqual(ProgressEvent.started(3), self.progress_bus.emit.call_args_list[0].args[0])
+        self.assertEqual(ProgressEvent.finished(), self.progress_bus.emit.call_args_list[-1].args[0])
+
+        # 中止された場合、結果を反映しなかったマイリストは中止扱いとする
+        mock_write_diff.reset_mock()
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, process_num=1, shard_func=fake_shard)
+        instance.job.cancel()
+        actual = instance.execute()
+        self.assertEqual([], actual)
+        self.assertEqual(3, instance.job.count(UpdateJobState.cancelled))
+        mock_write_diff.assert_not_called()
+
+    def test_execute_process(self):
+        mock_write_diff = self.enterContext(
+            patch("nnmm.process.update_mylist.sharded_updater.DatabaseUpdater.write_diff")
+        )
+        mylist_with_video_list = self._get_mylist_with_video_list(3)
+
+        # 実際にワーカープロセスを起動する
+        instance = ShardedUpdater(mylist_with_video_list, self.process_info, process_num=2, shard_func=fake_shard)
+        actual = instance.execute()
+        self.assertEqual(
+            sorted((self._get_mylist_url(i), Result.success) for i in range(1, 4)),
+            sorted(actual),
+        )
+        self.assertEqual(3, len(mock_write_diff.mock_calls))
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
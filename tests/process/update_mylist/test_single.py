@@ -7,7 +7,7 @@ from PySide6.QtWidgets import QDialog
 
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
-from nnmm.process.update_mylist.single import Single, SingleThreadDone
+from nnmm.process.update_mylist.single import Single, SingleBackfill, SingleThreadDone
 from nnmm.process.value_objects.process_info import ProcessInfo
 
 
@@ -41,6 +41,7 @@ class TestSingle(unittest.TestCase):
         self.assertEqual(SingleThreadDone, instance.post_process)
         self.assertEqual("Single mylist", instance.L_KIND)
         self.assertEqual("-UPDATE_THREAD_DONE-", instance.E_DONE)
+        self.assertTrue(instance.is_forced_probe)
 
     def test_get_target_mylist(self):
         with ExitStack() as stack:
@@ -64,6 +65,36 @@ class TestSingle(unittest.TestCase):
             self.assertEqual([], actual)
             instance.mylist_db.assert_not_called()
 
+    def test_backfill_init(self):
+        instance = SingleBackfill(self.process_info)
+        self.assertEqual(self.process_info, instance.process_info)
+        self.assertEqual(SingleThreadDone, instance.post_process)
+        self.assertEqual("Single mylist backfill", instance.L_KIND)
+        self.assertEqual("-UPDATE_THREAD_DONE-", instance.E_DONE)
+        self.assertEqual(True, instance.is_backfill)
+        self.assertTrue(instance.is_forced_probe)
+        self.assertIsNone(instance.create_component())
+
+    def test_backfill_get_target_mylist(self):
+        mock_selected_mylist_row = self.enterContext(
+            patch("nnmm.process.update_mylist.single.Base.get_selected_mylist_row")
+        )
+
+        mylist_dict_list = [self._get_mylist_dict()]
+        showname = mylist_dict_list[0]["showname"]
+        instance = SingleBackfill(self.process_info)
+
+        mock_selected_mylist_row.return_value.without_new_mark_name.side_effect = lambda: showname
+        instance.mylist_db.select_from_showname.side_effect = lambda s: mylist_dict_list
+        actual = instance.get_target_mylist()
+        self.assertEqual(mylist_dict_list, actual)
+
+        instance.mylist_db.reset_mock()
+        mock_selected_mylist_row.return_value = None
+        actual = instance.get_target_mylist()
+        self.assertEqual([], actual)
+        instance.mylist_db.select_from_showname.assert_not_called()
+
     def test_thread_done_init(self):
         instance = SingleThreadDone(self.process_info)
         self.assertEqual(self.process_info, instance.process_info)
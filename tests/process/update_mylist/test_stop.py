@@ -0,0 +1,71 @@
+import sys
+import unittest
+
+from mock import MagicMock, call, patch
+from PySide6.QtWidgets import QDialog
+
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.stop import Stop
+from nnmm.process.update_mylist.update_job_manager import UpdateJobManager
+from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.util import Result
+
+
+class TestStop(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.process.update_mylist.stop.logger.info"))
+        self.process_info = MagicMock(spec=ProcessInfo)
+        self.process_info.name = "-TEST_PROCESS-"
+        self.process_info.window = MagicMock(spec=QDialog)
+        self.process_info.mylist_db = MagicMock(spec=MylistDBController)
+        self.process_info.mylist_info_db = MagicMock(spec=MylistInfoDBController)
+
+    def test_init(self):
+        instance = Stop(self.process_info)
+        self.assertEqual(self.process_info, instance.process_info)
+        self.assertIsNone(instance.job_manager)
+
+        job_manager = MagicMock(spec=UpdateJobManager)
+        self.process_info.window.update_job_manager = job_manager
+        instance = Stop(self.process_info)
+        self.assertIs(job_manager, instance.job_manager)
+
+    def test_create_component(self):
+        mock_qpush = self.enterContext(patch("nnmm.process.update_mylist.stop.QPushButton"))
+        instance = Stop(self.process_info)
+        actual = instance.create_component()
+        self.assertIs(mock_qpush.return_value, actual)
+        mock_qpush.assert_called_once_with(self.process_info.name)
+        mock_qpush.return_value.clicked.connect.assert_called_once()
+
+    def test_callback(self):
+        # UpdateJobManager が設定されていない場合
+        instance = Stop(self.process_info)
+        instance.set_bottom_textbox = MagicMock()
+        actual = instance.callback()
+        self.assertEqual(Result.failed, actual)
+        instance.set_bottom_textbox.assert_not_called()
+
+        # 実行中のジョブがない場合
+        job_manager = MagicMock(spec=UpdateJobManager)
+        job_manager.is_running = False
+        instance.job_manager = job_manager
+        actual = instance.callback()
+        self.assertEqual(Result.failed, actual)
+        job_manager.cancel.assert_not_called()
+        instance.set_bottom_textbox.assert_not_called()
+
+        # 実行中のジョブがある場合
+        job_manager.is_running = True
+        job_manager.cancel.return_value = 2
+        actual = instance.callback()
+        self.assertEqual(Result.success, actual)
+        self.assertEqual([call.cancel()], job_manager.mock_calls)
+        instance.set_bottom_textbox.assert_called_once_with("中止しています...", False)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,192 @@
+import sys
+import unittest
+
+from mock import patch
+
+from nnmm.process.update_mylist.cancellation_token import CancellationToken
+from nnmm.process.update_mylist.update_job_manager import UpdateJob, UpdateJobManager, UpdateJobState
+
+
+class TestUpdateJobState(unittest.TestCase):
+    def test_is_terminal(self):
+        self.assertFalse(UpdateJobState.queued.is_terminal)
+        self.assertFalse(UpdateJobState.fetching.is_terminal)
+        self.assertFalse(UpdateJobState.writing.is_terminal)
+        self.assertTrue(UpdateJobState.done.is_terminal)
+        self.assertTrue(UpdateJobState.cancelled.is_terminal)
+
+
+class TestUpdateJob(unittest.TestCase):
+    def setUp(self):
+        self.mylist_url_list = [f"https://www.nicovideo.jp/user/1000000{i}/video" for i in range(1, 4)]
+
+    def test_init(self):
+        instance = UpdateJob(1, self.mylist_url_list)
+        self.assertEqual(1, instance.job_id)
+        self.assertEqual(self.mylist_url_list, instance.mylist_url_list)
+        self.assertIsInstance(instance.cancel_token, CancellationToken)
+        self.assertFalse(instance.is_cancelled)
+        self.assertFalse(instance.is_finished)
+        for mylist_url in self.mylist_url_list:
+            self.assertEqual(UpdateJobState.queued, instance.state(mylist_url))
+        self.assertIsNone(instance.state("https://www.nicovideo.jp/user/99999999/video"))
+
+        # 対象がなければ終了済とみなす
+        self.assertTrue(UpdateJob(1, []).is_finished)
+
+        with self.assertRaises(ValueError):
+            instance = UpdateJob("1", self.mylist_url_list)
+        with self.assertRaises(ValueError):
+            instance = UpdateJob(1, "invalid")
+        with self.assertRaises(ValueError):
+            instance = UpdateJob(1, [None])
+
+    def test_create(self):
+        instance = UpdateJob.create(self.mylist_url_list)
+        self.assertEqual(0, instance.job_id)
+        self.assertEqual(self.mylist_url_list, instance.mylist_url_list)
+
+    def test_transition(self):
+        instance = UpdateJob(1, self.mylist_url_list)
+        mylist_url = self.mylist_url_list[0]
+
+        for state in [UpdateJobState.fetching, UpdateJobState.writing, UpdateJobState.done]:
+            self.assertTrue(instance.transition(mylist_url, state))
+            self.assertEqual(state, instance.state(mylist_url))
+        self.assertEqual(1, instance.count(UpdateJobState.done))
+        self.assertEqual(2, instance.count(UpdateJobState.queued))
+        self.assertEqual(self.mylist_url_list[1:], instance.active_mylist_url_list())
+
+        # 許可されない状態遷移
+        with self.assertRaises(ValueError):
+            instance.transition(mylist_url, UpdateJobState.fetching)
+        with self.assertRaises(ValueError):
+            instance.transition(self.mylist_url_list[1], UpdateJobState.writing)
+        with self.assertRaises(ValueError):
+            instance.transition(self.mylist_url_list[1], UpdateJobState.done)
+        with self.assertRaises(ValueError):
+            instance.transition("https://www.nicovideo.jp/user/99999999/video", UpdateJobState.fetching)
+        with self.assertRaises(ValueError):
+            instance.transition(self.mylist_url_list[1], "fetching")
+
+        # どの状態からも cancelled に遷移できる
+        self.assertTrue(instance.transition(self.mylist_url_list[1], UpdateJobState.cancelled))
+        instance.transition(self.mylist_url_list[2], UpdateJobState.fetching)
+        self.assertTrue(instance.transition(self.mylist_url_list[2], UpdateJobState.cancelled))
+        self.assertTrue(instance.is_finished)
+
+        # 既に cancelled になっているマイリストへの遷移は何もしない
+        self.assertFalse(instance.transition(self.mylist_url_list[1], UpdateJobState.fetching))
+        self.assertEqual(UpdateJobState.cancelled, instance.state(self.mylist_url_list[1]))
+
+        # fetch 中に失敗したマイリストは fetching から done に遷移できる
+        instance = UpdateJob(1, self.mylist_url_list)
+        instance.transition(self.mylist_url_list[0], UpdateJobState.fetching)
+        self.assertTrue(instance.transition(self.mylist_url_list[0], UpdateJobState.done))
+        self.assertEqual(UpdateJobState.done, instance.state(self.mylist_url_list[0]))
+
+    def test_cancel(self):
+        instance = UpdateJob(1, self.mylist_url_list)
+        instance.transition(self.mylist_url_list[0], UpdateJobState.fetching)
+        instance.transition(self.mylist_url_list[1], UpdateJobState.fetching)
+        instance.transition(self.mylist_url_list[1], UpdateJobState.writing)
+
+        instance.cancel()
+        self.assertTrue(instance.is_cancelled)
+        self.assertTrue(instance.cancel_token.is_cancelled)
+
+        # queued のマイリストはその場で cancelled になり、処理中のマイリストはそのまま
+        self.assertEqual(UpdateJobState.fetching, instance.state(self.mylist_url_list[0]))
+        self.assertEqual(UpdateJobState.writing, instance.state(self.mylist_url_list[1]))
+        self.assertEqual(UpdateJobState.cancelled, instance.state(self.mylist_url_list[2]))
+        self.assertFalse(instance.is_finished)
+
+
+class TestUpdateJobManager(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.process.update_mylist.update_job_manager.logger.info"))
+        self.mylist_url_list = [f"https://www.nicovideo.jp/user/1000000{i}/video" for i in range(1, 4)]
+
+    def test_init(self):
+        instance = UpdateJobManager()
+        self.assertFalse(instance.is_running)
+        self.assertEqual([], instance.job_list())
+
+    def test_submit(self):
+        instance = UpdateJobManager()
+        url_1, url_2, url_3 = self.mylist_url_list
+
+        job_1 = instance.submit([url_1, url_2, url_1])
+        self.assertEqual(1, job_1.job_id)
+        # リスト内で重複するマイリストは除外する
+        self.assertEqual([url_1, url_2], job_1.mylist_url_list)
+        self.assertTrue(instance.is_running)
+        self.assertEqual([job_1], instance.job_list())
+
+        # 実行中のジョブで更新中のマイリストは除外する
+        job_2 = instance.submit([url_2, url_3])
+        self.assertEqual(2, job_2.job_id)
+        self.assertEqual([url_3], job_2.mylist_url_list)
+        self.assertEqual([job_1, job_2], instance.job_list())
+
+        # 全て除外された場合は登録しない
+        self.assertIsNone(instance.submit([url_1, url_3]))
+        self.assertIsNone(instance.submit([]))
+        self.assertEqual([job_1, job_2], instance.job_list())
+
+        # 実行中のジョブでも終端状態のマイリストは再度登録できる
+        job_1.transition(url_1, UpdateJobState.fetching)
+        job_1.transition(url_1, UpdateJobState.writing)
+        job_1.transition(url_1, UpdateJobState.done)
+        job_3 = instance.submit([url_1])
+        self.assertEqual([url_1], job_3.mylist_url_list)
+
+    def test_state(self):
+        instance = UpdateJobManager()
+        url_1, url_2, url_3 = self.mylist_url_list
+        job_1 = instance.submit([url_1, url_2])
+        job_1.transition(url_1, UpdateJobState.fetching)
+        self.assertEqual(UpdateJobState.fetching, instance.state(url_1))
+        self.assertEqual(UpdateJobState.queued, instance.state(url_2))
+        self.assertIsNone(instance.state(url_3))
+
+        job_1.transition(url_1, UpdateJobState.cancelled)
+        self.assertIsNone(instance.state(url_1))
+
+    def test_complete(self):
+        instance = UpdateJobManager()
+        job_1 = instance.submit(self.mylist_url_list[:1])
+        job_2 = instance.submit(self.mylist_url_list[1:])
+
+        instance.complete(job_1)
+        self.assertEqual([job_2], instance.job_list())
+        self.assertTrue(instance.is_running)
+
+        # 終了済のジョブを再度指定しても何もしない
+        instance.complete(job_1)
+        instance.complete(job_2)
+        self.assertEqual([], instance.job_list())
+        self.assertFalse(instance.is_running)
+
+        # 終了したジョブのマイリストは再度登録できる
+        job_3 = instance.submit(self.mylist_url_list)
+        self.assertEqual(self.mylist_url_list, job_3.mylist_url_list)
+
+    def test_cancel(self):
+        instance = UpdateJobManager()
+        self.assertEqual(0, instance.cancel())
+
+        job_1 = instance.submit(self.mylist_url_list[:1])
+        job_2 = instance.submit(self.mylist_url_list[1:])
+        self.assertEqual(2, instance.cancel())
+        self.assertTrue(job_1.is_cancelled)
+        self.assertTrue(job_2.is_cancelled)
+
+        # 中止しても complete されるまでは実行中とみなす
+        self.assertTrue(instance.is_running)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
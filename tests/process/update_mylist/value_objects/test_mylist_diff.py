@@ -0,0 +1,104 @@
+import pickle
+import sys
+import unittest
+
+from nnmm.process.update_mylist.value_objects.mylist_diff import MylistDiff
+from nnmm.process.update_mylist.value_objects.video_batch import VideoBatch
+from nnmm.util import Result
+
+
+class TestMylistDiff(unittest.TestCase):
+    def setUp(self):
+        self.mylist_url = "https://www.nicovideo.jp/user/1234567/video"
+        self.checked_at = "2023-12-22 12:34:56"
+
+    def _get_video_dict(self, index: int) -> dict:
+        return {
+            "id": index,
+            "video_id": f"sm1234567{index}",
+            "title": f"テスト動画{index}",
+            "username": "投稿者1",
+            "status": "未視聴",
+            "uploaded_at": "2023-12-22 12:34:56",
+            "registered_at": "2023-12-22 12:34:56",
+            "video_url": f"https://www.nicovideo.jp/watch/sm1234567{index}",
+            "mylist_url": self.mylist_url,
+            "created_at": self.checked_at,
+        }
+
+    def _get_row(self, index: int) -> tuple[str, ...]:
+        return tuple(str(v) for v in self._get_video_dict(index).values())
+
+    def test_init(self):
+        rows = (self._get_row(1), self._get_row(2))
+        instance = MylistDiff(self.mylist_url, Result.success, rows, True, self.checked_at)
+        self.assertEqual(self.mylist_url, instance.mylist_url)
+        self.assertEqual(Result.success, instance.result)
+        self.assertEqual(rows, instance.rows)
+        self.assertTrue(instance.has_new_video)
+        self.assertEqual(self.checked_at, instance.checked_at)
+        self.assertFalse(instance.is_permanent)
+        self.assertEqual(2, len(instance))
+
+        instance = MylistDiff(self.mylist_url, Result.failed)
+        self.assertEqual((), instance.rows)
+        self.assertEqual(0, len(instance))
+
+        params_list = [
+            {"mylist_url": ""},
+            {"mylist_url": None},
+            {"result": "success"},
+            {"rows": [self._get_row(1)]},
+            {"rows": (list(self._get_row(1)),)},
+            {"rows": (self._get_row(1)[:-1],)},
+            {"has_new_video": "True"},
+            {"checked_at": None},
+            {"is_permanent": 1},
+            {"result": Result.failed, "rows": (self._get_row(1),)},
+        ]
+        for params in params_list:
+            kwargs = {"mylist_url": self.mylist_url, "result": Result.success} | params
+            with self.assertRaises(ValueError):
+                instance = MylistDiff(**kwargs)
+
+    def test_is_success(self):
+        self.assertTrue(MylistDiff(self.mylist_url, Result.success).is_success)
+        self.assertFalse(MylistDiff(self.mylist_url, Result.failed).is_success)
+
+    def test_video_id_list(self):
+        rows = (self._get_row(1), self._get_row(2))
+        instance = MylistDiff(self.mylist_url, Result.success, rows, True, self.checked_at)
+        self.assertEqual(["sm12345671", "sm12345672"], instance.video_id_list)
+        self.assertEqual([], MylistDiff.failed(self.mylist_url).video_id_list)
+
+    def test_to_dict_list(self):
+        rows = (self._get_row(1), self._get_row(2))
+        instance = MylistDiff(self.mylist_url, Result.success, rows, True, self.checked_at)
+        expect = [dict(zip(VideoBatch.COLS, row)) for row in rows]
+        self.assertEqual(expect, instance.to_dict_list())
+        self.assertEqual([], MylistDiff.failed(self.mylist_url).to_dict_list())
+
+    def test_from_video_batch(self):
+        video_batch = VideoBatch.create([self._get_video_dict(1), self._get_video_dict(2)])
+        actual = MylistDiff.from_video_batch(self.mylist_url, video_batch, True, self.checked_at)
+        self.assertEqual(Result.success, actual.result)
+        self.assertTrue(actual.has_new_video)
+        self.assertEqual(self.checked_at, actual.checked_at)
+        self.assertEqual(video_batch.to_dict_list(), actual.to_dict_list())
+
+        # プロセス間で受け渡せる
+        self.assertEqual(actual, pickle.loads(pickle.dumps(actual)))
+
+    def test_failed(self):
+        actual = MylistDiff.failed(self.mylist_url)
+        self.assertEqual(MylistDiff(self.mylist_url, Result.failed), actual)
+        self.assertFalse(actual.is_permanent)
+
+        actual = MylistDiff.failed(self.mylist_url, True)
+        self.assertEqual(MylistDiff(self.mylist_url, Result.failed, is_permanent=True), actual)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,53 @@
+import sys
+import unittest
+from dataclasses import FrozenInstanceError
+
+from nnmm.process.update_mylist.value_objects.mylist_fetch_record import MylistFetchRecord
+
+
+class TestMylistFetchRecord(unittest.TestCase):
+    def setUp(self):
+        self.mylist_url = "https://www.nicovideo.jp/user/10000001/video"
+        self.fetched_at = "2023-12-22 12:34:56"
+
+    def test_init(self):
+        instance = MylistFetchRecord(self.mylist_url, self.fetched_at, 123.4, True)
+        self.assertEqual(self.mylist_url, instance.mylist_url)
+        self.assertEqual(self.fetched_at, instance.fetched_at)
+        self.assertEqual(123.4, instance.latency_ms)
+        self.assertTrue(instance.is_success)
+
+        # 計測できなかった場合
+        instance = MylistFetchRecord(self.mylist_url, self.fetched_at, None, False)
+        self.assertIsNone(instance.latency_ms)
+
+        with self.assertRaises(FrozenInstanceError):
+            instance.is_success = True
+
+        params_list = [
+            ("", self.fetched_at, 1.0, True),
+            (None, self.fetched_at, 1.0, True),
+            (self.mylist_url, None, 1.0, True),
+            (self.mylist_url, self.fetched_at, 1, True),
+            (self.mylist_url, self.fetched_at, -1.0, True),
+            (self.mylist_url, self.fetched_at, 1.0, "True"),
+        ]
+        for params in params_list:
+            with self.assertRaises(ValueError):
+                instance = MylistFetchRecord(*params)
+
+    def test_to_dict(self):
+        instance = MylistFetchRecord(self.mylist_url, self.fetched_at, 123.4, True)
+        expect = {
+            "mylist_url": self.mylist_url,
+            "fetched_at": self.fetched_at,
+            "latency_ms": 123.4,
+            "is_success": True,
+        }
+        self.assertEqual(expect, instance.to_dict())
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
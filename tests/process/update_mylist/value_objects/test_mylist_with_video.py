@@ -1,7 +1,7 @@
 import sys
 import unittest
 
-from mock import MagicMock
+from mock import MagicMock, call
 
 from nnmm.model import Mylist
 from nnmm.mylist_info_db_controller import MylistInfoDBController
@@ -9,6 +9,7 @@ from nnmm.process.update_mylist.value_objects.mylist_with_video import MylistWit
 from nnmm.process.update_mylist.value_objects.typed_mylist import TypedMylist
 from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList
 from nnmm.process.update_mylist.value_objects.video_dict_list import VideoDictList
+from nnmm.process.value_objects.table_row import Status
 
 
 class TestMylistWithVideoList(unittest.TestCase):
@@ -72,6 +73,64 @@ class TestMylistWithVideoList(unittest.TestCase):
         with self.assertRaises(ValueError):
             instance = MylistWithVideo(typed_mylist, "invalid")
 
+        # 遅延読み込み
+        mylist_info_db = MagicMock(spec=MylistInfoDBController)
+        instance = MylistWithVideo(typed_mylist, None, mylist_info_db)
+        self.assertIsNone(instance._video_list)
+        self.assertIs(mylist_info_db, instance._mylist_info_db)
+
+        with self.assertRaises(ValueError):
+            instance = MylistWithVideo(typed_mylist)
+        with self.assertRaises(ValueError):
+            instance = MylistWithVideo(typed_mylist, None, "invalid")
+
+    def test_video_list(self):
+        mock_mylist_info_db = MagicMock(spec=MylistInfoDBController)
+        mock_mylist_info_db.select_from_mylist_url.side_effect = lambda url: [self._get_video_dict(url)]
+        typed_mylist = TypedMylist.create(self._get_mylist_dict())
+        mylist_url = typed_mylist.url.non_query_url
+        expect = VideoDictList.create([self._get_video_dict(mylist_url)]).to_typed_video_list()
+
+        # 遅延読み込みの場合は参照のたびにDBから読み込む
+        instance = MylistWithVideo.create_lazy(typed_mylist, mock_mylist_info_db)
+        self.assertEqual(expect, instance.video_list)
+        self.assertEqual(expect, instance.video_list)
+        self.assertEqual(
+            [call.select_from_mylist_url(mylist_url), call.select_from_mylist_url(mylist_url)],
+            mock_mylist_info_db.mock_calls,
+        )
+
+        instance = MylistWithVideo(typed_mylist, expect)
+        self.assertIs(expect, instance.video_list)
+
+    def test_video_status_dict(self):
+        mock_mylist_info_db = MagicMock(spec=MylistInfoDBController)
+        mock_mylist_info_db.select_status_from_mylist_url.return_value = {
+            "sm00000001": "未視聴",
+            "sm00000002": "",
+        }
+        typed_mylist = TypedMylist.create(self._get_mylist_dict())
+        mylist_url = typed_mylist.url.non_query_url
+        expect = {"sm00000001": Status.not_watched, "sm00000002": Status.watched}
+
+        # 遅延読み込みの場合は初回参照時のみDBから読み込み、破棄するまで保持する
+        instance = MylistWithVideo.create_lazy(typed_mylist, mock_mylist_info_db)
+        self.assertEqual(expect, instance.video_status_dict)
+        self.assertIs(instance.video_status_dict, instance.video_status_dict)
+        self.assertEqual([call.select_status_from_mylist_url(mylist_url)], mock_mylist_info_db.mock_calls)
+
+        instance.release_video_status_dict()
+        self.assertIsNone(instance._video_status_dict)
+        self.assertEqual(expect, instance.video_status_dict)
+        self.assertEqual(2, mock_mylist_info_db.select_status_from_mylist_url.call_count)
+
+        # 動画情報を保持している場合はそこから作成する
+        video_dict_list = [self._get_video_dict(mylist_url, 1), self._get_video_dict(mylist_url, 2)]
+        video_dict_list[1]["status"] = ""
+        typed_video_list = VideoDictList.create(video_dict_list).to_typed_video_list()
+        instance = MylistWithVideo(typed_mylist, typed_video_list)
+        self.assertEqual(expect, instance.video_status_dict)
+
     def test_create(self):
         mock_mylist_info_db = MagicMock(spec=MylistInfoDBController)
 
@@ -93,6 +152,21 @@ class TestMylistWithVideoList(unittest.TestCase):
         with self.assertRaises(ValueError):
             instance = MylistWithVideo.create(typed_mylist, "invalid")
 
+    def test_create_lazy(self):
+        mock_mylist_info_db = MagicMock(spec=MylistInfoDBController)
+        typed_mylist = TypedMylist.create(self._get_mylist_dict())
+        actual = MylistWithVideo.create_lazy(typed_mylist, mock_mylist_info_db)
+        expect = MylistWithVideo(typed_mylist, None, mock_mylist_info_db)
+        self.assertEqual(expect, actual)
+        self.assertIs(mock_mylist_info_db, actual._mylist_info_db)
+        mock_mylist_info_db.select_from_mylist_url.assert_not_called()
+        mock_mylist_info_db.select_status_from_mylist_url.assert_not_called()
+
+        with self.assertRaises(ValueError):
+            instance = MylistWithVideo.create_lazy("invalid", mock_mylist_info_db)
+        with self.assertRaises(ValueError):
+            instance = MylistWithVideo.create_lazy(typed_mylist, "invalid")
+
 
 if __name__ == "__main__":
     if sys.argv:
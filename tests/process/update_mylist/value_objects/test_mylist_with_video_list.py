@@ -67,10 +67,29 @@ class TestMylistWithVideoList(unittest.TestCase):
         self.assertEqual(len(instance), 1)
         self.assertEqual(instance[0], mylist_with_video)
 
+    def test_filter_by_url(self):
+        mylist_with_video_list = [MagicMock(spec=MylistWithVideo) for _ in range(3)]
+        for i, mylist_with_video in enumerate(mylist_with_video_list, start=1):
+            mylist_with_video.mylist.url.non_query_url = f"https://www.nicovideo.jp/user/{i:08}/video"
+        instance = MylistWithVideoList(mylist_with_video_list)
+
+        # 順序は元の順序を保つ
+        mylist_url_list = [
+            "https://www.nicovideo.jp/user/00000003/video",
+            "https://www.nicovideo.jp/user/00000001/video",
+            "https://www.nicovideo.jp/user/99999999/video",
+        ]
+        actual = instance.filter_by_url(mylist_url_list)
+        expect = MylistWithVideoList([mylist_with_video_list[0], mylist_with_video_list[2]])
+        self.assertEqual(expect, actual)
+
+        actual = instance.filter_by_url([])
+        self.assertEqual(MylistWithVideoList([]), actual)
+
     def test_create(self):
         with ExitStack() as stack:
             mock_create = self.enterContext(
-                patch("nnmm.process.update_mylist.value_objects.mylist_with_video_list.MylistWithVideo.create")
+                patch("nnmm.process.update_mylist.value_objects.mylist_with_video_list.MylistWithVideo.create_lazy")
             )
             mock_mylist_with_video = MagicMock(spec=MylistWithVideo)
             mock_create.side_effect = lambda m, db: mock_mylist_with_video
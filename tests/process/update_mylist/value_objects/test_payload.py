@@ -46,6 +46,7 @@ class TestPayload(unittest.TestCase):
         self.assertEqual(mylist_with_video, instance.mylist_with_video)
         self.assertEqual(mylist_with_video.mylist, instance.mylist)
         self.assertEqual(mylist_with_video.video_list, instance.video_list)
+        self.assertEqual(mylist_with_video.video_status_dict, instance.video_status_dict)
         self.assertEqual(fetched_info, instance.fetched_info)
 
     def test_create(self):
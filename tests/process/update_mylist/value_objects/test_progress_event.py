@@ -0,0 +1,61 @@
+import sys
+import unittest
+from dataclasses import FrozenInstanceError
+
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent, ProgressEventKind
+
+
+class TestProgressEvent(unittest.TestCase):
+    def test_init(self):
+        mylist_url = "https://www.nicovideo.jp/user/10000001/video"
+        instance = ProgressEvent(ProgressEventKind.fetch_done, mylist_url, 0, 1.0)
+        self.assertEqual(ProgressEventKind.fetch_done, instance.kind)
+        self.assertEqual(mylist_url, instance.mylist_url)
+        self.assertEqual(0, instance.total)
+        self.assertEqual(1.0, instance.occurred_at)
+
+        instance = ProgressEvent(ProgressEventKind.started, total=10)
+        self.assertEqual("", instance.mylist_url)
+        self.assertEqual(10, instance.total)
+        self.assertIsInstance(instance.occurred_at, float)
+
+        # 発生時刻は比較に用いない
+        self.assertEqual(
+            ProgressEvent(ProgressEventKind.finished, occurred_at=1.0),
+            ProgressEvent(ProgressEventKind.finished, occurred_at=2.0),
+        )
+
+        with self.assertRaises(FrozenInstanceError):
+            instance.total = 1
+
+        with self.assertRaises(ValueError):
+            instance = ProgressEvent("started")
+        with self.assertRaises(ValueError):
+            instance = ProgressEvent(ProgressEventKind.fetch_done, None)
+        with self.assertRaises(ValueError):
+            instance = ProgressEvent(ProgressEventKind.started, total=-1)
+        with self.assertRaises(ValueError):
+            instance = ProgressEvent(ProgressEventKind.started, occurred_at=1)
+
+    def test_create(self):
+        mylist_url = "https://www.nicovideo.jp/user/10000001/video"
+        self.assertEqual(ProgressEvent(ProgressEventKind.started, total=3), ProgressEvent.started(3))
+        self.assertEqual(ProgressEvent(ProgressEventKind.finished), ProgressEvent.finished())
+        self.assertEqual(
+            ProgressEvent(ProgressEventKind.fetch_done, mylist_url), ProgressEvent.fetched(mylist_url, True)
+        )
+        self.assertEqual(
+            ProgressEvent(ProgressEventKind.fetch_failed, mylist_url), ProgressEvent.fetched(mylist_url, False)
+        )
+        self.assertEqual(
+            ProgressEvent(ProgressEventKind.update_done, mylist_url), ProgressEvent.updated(mylist_url, True)
+        )
+        self.assertEqual(
+            ProgressEvent(ProgressEventKind.update_failed, mylist_url), ProgressEvent.updated(mylist_url, False)
+        )
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
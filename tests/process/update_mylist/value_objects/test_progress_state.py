@@ -0,0 +1,90 @@
+import sys
+import unittest
+from dataclasses import FrozenInstanceError
+
+from nnmm.process.update_mylist.value_objects.progress_event import ProgressEvent, ProgressEventKind
+from nnmm.process.update_mylist.value_objects.progress_state import ProgressState
+
+
+class TestProgressState(unittest.TestCase):
+    def _apply(self, event_list: list[tuple[ProgressEventKind, float]], total: int = 4) -> ProgressState:
+        state = ProgressState()
+        for kind, occurred_at in event_list:
+            mylist_url = "" if kind in [ProgressEventKind.started, ProgressEventKind.finished] else "mylist_url"
+            event_total = total if kind == ProgressEventKind.started else 0
+            state = state.apply(ProgressEvent(kind, mylist_url, event_total, occurred_at))
+        return state
+
+    def test_init(self):
+        instance = ProgressState()
+        self.assertEqual(0, instance.total)
+        self.assertEqual(0, instance.fetched)
+        self.assertEqual(0, instance.updated)
+        self.assertEqual(0.0, instance.elapsed)
+        self.assertEqual(0.0, instance.throughput)
+        self.assertIsNone(instance.eta)
+        self.assertFalse(instance.is_running)
+
+        with self.assertRaises(FrozenInstanceError):
+            instance.total = 1
+
+    def test_apply(self):
+        kind = ProgressEventKind
+        state = self._apply([(kind.started, 10.0)])
+        self.assertEqual(ProgressState(total=4, started_at=10.0, last_event_at=10.0, is_running=True), state)
+
+        state = self._apply([
+            (kind.started, 10.0),
+            (kind.fetch_done, 11.0),
+            (kind.fetch_failed, 11.5),
+            (kind.update_done, 12.0),
+            (kind.update_failed, 12.0),
+        ])
+        expect = ProgressState(4, 1, 1, 1, 1, 10.0, 12.0, True)
+        self.assertEqual(expect, state)
+        self.assertEqual(2, state.fetched)
+        self.assertEqual(2, state.updated)
+        self.assertEqual(2.0, state.elapsed)
+        self.assertEqual(1.0, state.throughput)
+        self.assertEqual(2.0, state.eta)
+
+        state = state.apply(ProgressEvent(kind.finished, occurred_at=14.0))
+        self.assertFalse(state.is_running)
+        self.assertEqual(4.0, state.elapsed)
+
+        # 再度開始した場合は集計をやり直す
+        state = state.apply(ProgressEvent(kind.started, total=2, occurred_at=20.0))
+        self.assertEqual(ProgressState(total=2, started_at=20.0, last_event_at=20.0, is_running=True), state)
+
+        with self.assertRaises(ValueError):
+            state.apply("invalid")
+
+    def test_to_status_text(self):
+        kind = ProgressEventKind
+        state = self._apply([(kind.started, 10.0), (kind.fetch_done, 11.0), (kind.update_done, 12.0)])
+        self.assertEqual("取得中(1/4)", state.to_status_text())
+
+        state = self._apply([(kind.started, 10.0)] + [(kind.fetch_done, 11.0)] * 4 + [(kind.update_done, 12.0)])
+        self.assertEqual("更新中(1/4)", state.to_status_text())
+
+    def test_to_detail_text(self):
+        kind = ProgressEventKind
+        state = self._apply([(kind.started, 10.0)])
+        self.assertEqual("取得 0/4  更新 0/4  0.0件/秒", state.to_detail_text())
+
+        state = self._apply(
+            [(kind.started, 10.0)]
+            + [(kind.fetch_done, 11.0)] * 2
+            + [(kind.update_done, 12.0)]
+            + [(kind.update_failed, 14.0)]
+        )
+        self.assertEqual("取得 2/4  更新 2/4  失敗 1  0.5件/秒  残り約0:04", state.to_detail_text())
+
+        state = state.apply(ProgressEvent(kind.finished, occurred_at=14.0))
+        self.assertEqual("取得 2/4  更新 2/4  失敗 1  0.5件/秒", state.to_detail_text())
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,39 @@
+import pickle
+import sys
+import unittest
+
+from nnmm.process.update_mylist.value_objects.shard_task import ShardTask
+from nnmm.process.value_objects.table_row import Status
+
+
+class TestShardTask(unittest.TestCase):
+    def test_init(self):
+        mylist_url = "https://www.nicovideo.jp/user/1234567/video"
+        video_status_dict = {"sm12345678": Status.watched, "sm12345679": Status.not_watched}
+        instance = ShardTask(mylist_url, video_status_dict, True)
+        self.assertEqual(mylist_url, instance.mylist_url)
+        self.assertEqual(video_status_dict, instance.video_status_dict)
+        self.assertTrue(instance.is_fast_probe)
+
+        instance = ShardTask(mylist_url, {})
+        self.assertFalse(instance.is_fast_probe)
+
+        # プロセス間で受け渡せる
+        self.assertEqual(instance, pickle.loads(pickle.dumps(instance)))
+
+        params_list = [
+            ("", {}, False),
+            (None, {}, False),
+            (mylist_url, [], False),
+            (mylist_url, {"sm12345678": ""}, False),
+            (mylist_url, {}, "True"),
+        ]
+        for params in params_list:
+            with self.assertRaises(ValueError):
+                instance = ShardTask(*params)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,155 @@
+import sys
+import unittest
+from dataclasses import FrozenInstanceError
+
+from mock import patch
+
+from nnmm.process.update_mylist.update_job_manager import UpdateJob, UpdateJobState
+from nnmm.process.update_mylist.value_objects.mylist_fetch_record import MylistFetchRecord
+from nnmm.process.update_mylist.value_objects.update_run_record import UpdateRunRecord
+from nnmm.update_trace import SpanStage, UpdateTrace
+from nnmm.util import Result
+
+MYLIST_URL_LIST = [
+    "https://www.nicovideo.jp/user/10000001/video",
+    "https://www.nicovideo.jp/user/10000002/video",
+    "https://www.nicovideo.jp/user/10000003/video",
+    "https://www.nicovideo.jp/user/10000004/video",
+]
+
+
+class TestUpdateRunRecord(unittest.TestCase):
+    def _make_instance(self, **kwargs) -> UpdateRunRecord:
+        params = {
+            "kind": "Every mylist",
+            "version": "2.1.0",
+            "started_at": "2023-12-22 12:34:00",
+            "finished_at": "2023-12-22 12:34:56",
+            "elapsed_sec": 56.0,
+            "target_num": 3,
+            "success_num": 1,
+            "failed_num": 1,
+            "cancelled_num": 1,
+            "new_video_num": 2,
+            "bytes": 1024,
+            "stage_total_ms": (("page_request", 10.0), ("db_write", 5.0)),
+            "mylist_fetch_record_list": (
+                MylistFetchRecord(MYLIST_URL_LIST[0], "2023-12-22 12:34:56", 10.0, True),
+                MylistFetchRecord(MYLIST_URL_LIST[1], "2023-12-22 12:34:56", None, False),
+            ),
+        }
+        return UpdateRunRecord(**(params | kwargs))
+
+    def test_init(self):
+        instance = self._make_instance()
+        self.assertEqual("Every mylist", instance.kind)
+        self.assertEqual(56.0, instance.elapsed_sec)
+        self.assertEqual(3, instance.target_num)
+        self.assertEqual(2, len(instance.mylist_fetch_record_list))
+
+        with self.assertRaises(FrozenInstanceError):
+            instance.target_num = 1
+
+        params_list = [
+            {"kind": None},
+            {"version": None},
+            {"started_at": 0},
+            {"finished_at": 0},
+            {"elapsed_sec": 1},
+            {"elapsed_sec": -1.0},
+            {"target_num": -1},
+            {"success_num": 1.0},
+            {"failed_num": None},
+            {"cancelled_num": -1},
+            {"new_video_num": "0"},
+            {"bytes": -1},
+            {"stage_total_ms": {"page_request": 10.0}},
+            {"stage_total_ms": (("page_request",),)},
+            {"mylist_fetch_record_list": [MylistFetchRecord(MYLIST_URL_LIST[0], "", None, True)]},
+            {"mylist_fetch_record_list": (MYLIST_URL_LIST[0],)},
+        ]
+        for params in params_list:
+            with self.assertRaises(ValueError):
+                instance = self._make_instance(**params)
+
+    def test_to_dict(self):
+        instance = self._make_instance()
+        expect = {
+            "kind": "Every mylist",
+            "version": "2.1.0",
+            "started_at": "2023-12-22 12:34:00",
+            "finished_at": "2023-12-22 12:34:56",
+            "elapsed_sec": 56.0,
+            "target_num": 3,
+            "success_num": 1,
+            "failed_num": 1,
+            "cancelled_num": 1,
+            "new_video_num": 2,
+            "bytes": 1024,
+            "stage_total_ms": {"page_request": 10.0, "db_write": 5.0},
+        }
+        self.assertEqual(expect, instance.to_dict())
+
+    def test_create(self):
+        mock_now = self.enterContext(
+            patch("nnmm.process.update_mylist.value_objects.update_run_record.get_now_datetime")
+        )
+        mock_version = self.enterContext(
+            patch("nnmm.process.update_mylist.value_objects.update_run_record.get_app_version")
+        )
+        mock_now.return_value = "2023-12-22 12:34:56"
+        mock_version.return_value = "2.1.0"
+
+        trace = UpdateTrace()
+        trace.record(SpanStage.page_request, MYLIST_URL_LIST[0], 0.0, 0.010, {"bytes": 1000})
+        trace.record(SpanStage.db_write, MYLIST_URL_LIST[0], 0.010, 0.015, {"video_num": 3, "new_video_num": 2})
+        trace.record(SpanStage.page_request, MYLIST_URL_LIST[1], 0.0, 0.020, {"bytes": 24, "error": "HTTPError"})
+        trace.finish()
+
+        # 1件目は成功, 2件目は fetch に失敗, 3件目は中止, 4件目は結果が得られなかった
+        job = UpdateJob.create(MYLIST_URL_LIST)
+        job.transition(MYLIST_URL_LIST[0], UpdateJobState.fetching)
+        job.transition(MYLIST_URL_LIST[1], UpdateJobState.fetching)
+        job.transition(MYLIST_URL_LIST[3], UpdateJobState.fetching)
+        job.transition(MYLIST_URL_LIST[2], UpdateJobState.cancelled)
+        result_list = [
+            (MYLIST_URL_LIST[0], Result.success),
+            (MYLIST_URL_LIST[1], Result.failed),
+            (MYLIST_URL_LIST[2], Result.failed),
+        ]
+
+        actual = UpdateRunRecord.create("Every mylist", trace, job, result_list)
+        self.assertEqual("Every mylist", actual.kind)
+        self.assertEqual("2.1.0", actual.version)
+        self.assertEqual(trace.started_at, actual.started_at)
+        self.assertEqual("2023-12-22 12:34:56", actual.finished_at)
+        self.assertEqual(trace.elapsed, actual.elapsed_sec)
+        self.assertEqual(4, actual.target_num)
+        self.assertEqual(1, actual.success_num)
+        self.assertEqual(2, actual.failed_num)
+        self.assertEqual(1, actual.cancelled_num)
+        self.assertEqual(2, actual.new_video_num)
+        self.assertEqual(1024, actual.bytes)
+        self.assertEqual(["page_request", "db_write"], [stage for stage, _ in actual.stage_total_ms])
+        self.assertAlmostEqual(30.0, actual.stage_total_ms[0][1])
+
+        # 中止されたマイリストはマイリストごとの結果に含めない
+        self.assertEqual(
+            [MYLIST_URL_LIST[0], MYLIST_URL_LIST[1]], [r.mylist_url for r in actual.mylist_fetch_record_list]
+        )
+        self.assertEqual([True, False], [r.is_success for r in actual.mylist_fetch_record_list])
+        self.assertAlmostEqual(10.0, actual.mylist_fetch_record_list[0].latency_ms)
+        self.assertAlmostEqual(20.0, actual.mylist_fetch_record_list[1].latency_ms)
+        self.assertEqual({"2023-12-22 12:34:56"}, {r.fetched_at for r in actual.mylist_fetch_record_list})
+
+        # 何も記録していない場合
+        actual = UpdateRunRecord.create("Every mylist", UpdateTrace(), UpdateJob.create([]), [])
+        self.assertEqual(0, actual.target_num)
+        self.assertEqual((), actual.stage_total_ms)
+        self.assertEqual((), actual.mylist_fetch_record_list)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
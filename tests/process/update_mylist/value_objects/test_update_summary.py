@@ -0,0 +1,53 @@
+import sys
+import unittest
+
+from nnmm.process.update_mylist.value_objects.update_summary import UpdateSummary
+
+
+class TestUpdateSummary(unittest.TestCase):
+    def test_init(self):
+        instance = UpdateSummary(4, 1, 1, 1, 1, 1.5)
+        self.assertEqual(4, instance.target)
+        self.assertEqual(1, instance.skipped)
+        self.assertEqual(1, instance.updated)
+        self.assertEqual(1, instance.failed)
+        self.assertEqual(1, instance.cancelled)
+        self.assertEqual(1.5, instance.elapsed)
+
+        instance = UpdateSummary()
+        self.assertEqual(UpdateSummary(0, 0, 0, 0, 0, 0.0), instance)
+
+        params_list = [
+            {"target": -1},
+            {"skipped": "1"},
+            {"updated": 1.0},
+            {"failed": None},
+            {"cancelled": -1},
+            {"elapsed": 1},
+            {"elapsed": -1.0},
+        ]
+        for params in params_list:
+            with self.assertRaises(ValueError):
+                instance = UpdateSummary(**params)
+
+    def test_is_success(self):
+        self.assertTrue(UpdateSummary(3, 1, 2).is_success)
+        self.assertTrue(UpdateSummary().is_success)
+        self.assertFalse(UpdateSummary(3, 0, 2, 1).is_success)
+        self.assertFalse(UpdateSummary(3, 0, 2, 0, 1).is_success)
+
+    def test_to_dict(self):
+        instance = UpdateSummary(4, 1, 1, 1, 1, 1.5)
+        expect = {"target": 4, "skipped": 1, "updated": 1, "failed": 1, "cancelled": 1, "elapsed": 1.5}
+        self.assertEqual(expect, instance.to_dict())
+
+    def test_to_text(self):
+        instance = UpdateSummary(4, 1, 1, 1, 1, 1.5)
+        expect = "target 4  updated 1  failed 1  skipped 1  cancelled 1  1.50 [sec]"
+        self.assertEqual(expect, instance.to_text())
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,195 @@
+import sys
+import unittest
+from dataclasses import FrozenInstanceError
+from typing import Iterator
+
+from nnmm.process.update_mylist.value_objects.typed_video import TypedVideo
+from nnmm.process.update_mylist.value_objects.typed_video_list import TypedVideoList
+from nnmm.process.update_mylist.value_objects.video_batch import VideoBatch, VideoBatchRow
+from nnmm.process.value_objects.table_row import Status
+
+
+class TestVideoBatch(unittest.TestCase):
+    def _make_video_dict(self, index: int = 1) -> dict[str, str]:
+        uploaded_url = f"https://www.nicovideo.jp/user/1000000{index}/video"
+        mylist_url = f"https://www.nicovideo.jp/user/1000000{index}/mylist/{index:08}"
+        return {
+            "id": str(index),
+            "video_id": f"sm1234567{index}",
+            "title": f"title_{index}",
+            "username": f"username_{index}",
+            "status": f"未視聴" if index == 1 else "",
+            "uploaded_at": f"2023-12-22 12:34:5{index}",
+            "registered_at": f"2023-12-22 12:34:5{index}",
+            "video_url": f"https://www.nicovideo.jp/watch/sm1234567{index}",
+            "mylist_url": uploaded_url if index == 1 else mylist_url,
+            "created_at": f"2023-12-22 12:34:5{index}",
+        }
+
+    def _make_video_dict_list(self, num: int = 3) -> list[dict[str, str]]:
+        return [self._make_video_dict(i) for i in range(1, num + 1)]
+
+    def _make_columns(self, video_dict_list: list[dict[str, str]]) -> dict[str, tuple]:
+        columns = {col: tuple(d[col] for d in video_dict_list) for col in VideoBatch.COLS}
+        columns["id"] = tuple(int(v) for v in columns["id"])
+        columns["status"] = tuple(Status(v) for v in columns["status"])
+        return columns
+
+    def test_init(self):
+        video_dict_list = self._make_video_dict_list()
+        columns = self._make_columns(video_dict_list)
+        instance = VideoBatch(**{f"{col}_list": columns[col] for col in VideoBatch.COLS})
+        for col in VideoBatch.COLS:
+            self.assertEqual(columns[col], getattr(instance, f"{col}_list"))
+        self.assertEqual(3, len(instance))
+        self.assertFalse(hasattr(instance, "__dict__"))
+
+        with self.assertRaises(FrozenInstanceError):
+            instance.id_list = ()
+
+        # 空の VideoBatch も許容する
+        instance = VideoBatch(*[() for _ in VideoBatch.COLS])
+        self.assertEqual(0, len(instance))
+
+        # 列ごとの異常系
+        invalid_values = {
+            "id": ["1", -1],
+            "video_id": ["invalid", 1],
+            "title": ["", 1],
+            "username": ["", 1],
+            "status": ["未視聴"],
+            "uploaded_at": ["2023/12/22 12:34:56", "2023-12-22"],
+            "registered_at": ["2023/12/22 12:34:56"],
+            "video_url": ["https://www.nicovideo.jp/watch/sm12345671?ref=top", "invalid"],
+            "mylist_url": ["https://www.nicovideo.jp/user/10000001/video?ref=top", "https://invalid.url/"],
+            "created_at": ["invalid"],
+        }
+        for col, values in invalid_values.items():
+            for value in values:
+                invalid_columns = dict(columns)
+                invalid_columns[col] = (value,) + columns[col][1:]
+                with self.assertRaises(ValueError):
+                    instance = VideoBatch(*[invalid_columns[c] for c in VideoBatch.COLS])
+
+        # 列の型が不正
+        with self.assertRaises(ValueError):
+            instance = VideoBatch(*[list(columns[c]) for c in VideoBatch.COLS])
+
+        # 列の大きさが異なる
+        invalid_columns = dict(columns)
+        invalid_columns["title"] = columns["title"][:-1]
+        with self.assertRaises(ValueError):
+            instance = VideoBatch(*[invalid_columns[c] for c in VideoBatch.COLS])
+
+    def test_magic_method(self):
+        instance = VideoBatch.create(self._make_video_dict_list())
+        self.assertIsInstance(iter(instance), Iterator)
+        self.assertEqual([VideoBatchRow(instance, i) for i in range(3)], list(instance))
+        self.assertEqual(VideoBatchRow(instance, 1), instance[1])
+        self.assertEqual(VideoBatchRow(instance, 2), instance[-1])
+        with self.assertRaises(IndexError):
+            instance[3]
+        with self.assertRaises(ValueError):
+            instance["0"]
+
+    def test_replace_status_list(self):
+        instance = VideoBatch.create(self._make_video_dict_list())
+        status_list = [Status.watched, Status.not_watched, Status.not_watched]
+        actual = instance.replace_status_list(status_list)
+        self.assertEqual(tuple(status_list), actual.status_list)
+        # 変更のない列は共有する
+        for col in VideoBatch.COLS:
+            if col == "status":
+                continue
+            self.assertIs(getattr(instance, f"{col}_list"), getattr(actual, f"{col}_list"))
+        # 元のインスタンスは変わらない
+        self.assertEqual((Status.not_watched, Status.watched, Status.watched), instance.status_list)
+
+        with self.assertRaises(ValueError):
+            actual = instance.replace_status_list(["未視聴", "", ""])
+        with self.assertRaises(ValueError):
+            actual = instance.replace_status_list([Status.watched])
+        with self.assertRaises(ValueError):
+            actual = instance._replace_columns(invalid=())
+
+    def test_to_dict_list(self):
+        video_dict_list = self._make_video_dict_list()
+        instance = VideoBatch.create(video_dict_list)
+        self.assertEqual(video_dict_list, instance.to_dict_list())
+        self.assertIsInstance(instance.iter_dict(), Iterator)
+        self.assertEqual(video_dict_list, list(instance.iter_dict()))
+        self.assertEqual([], VideoBatch.create([]).to_dict_list())
+
+    def test_to_typed_video_list(self):
+        video_dict_list = self._make_video_dict_list()
+        instance = VideoBatch.create(video_dict_list)
+        actual = instance.to_typed_video_list()
+        expect = TypedVideoList.create([TypedVideo.create(d) for d in video_dict_list])
+        self.assertEqual(expect, actual)
+
+    def test_create(self):
+        video_dict_list = self._make_video_dict_list()
+        actual = VideoBatch.create(video_dict_list)
+        columns = self._make_columns(video_dict_list)
+        expect = VideoBatch(*[columns[col] for col in VideoBatch.COLS])
+        self.assertEqual(expect, actual)
+
+        # id は int, URL はクエリなしの形式に揃える
+        video_dict = self._make_video_dict(1) | {
+            "id": 1,
+            "video_url": "https://www.nicovideo.jp/watch/sm12345671?ref=top",
+            "mylist_url": "https://www.nicovideo.jp/user/10000001/video?ref=top",
+        }
+        actual = VideoBatch.create([video_dict])
+        self.assertEqual([self._make_video_dict(1)], actual.to_dict_list())
+
+        with self.assertRaises(ValueError):
+            actual = VideoBatch.create("invalid")
+        with self.assertRaises(KeyError):
+            actual = VideoBatch.create([{"id": "1"}])
+
+    def test_from_typed_video_list(self):
+        video_dict_list = self._make_video_dict_list()
+        typed_video_list = TypedVideoList.create([TypedVideo.create(d) for d in video_dict_list])
+        actual = VideoBatch.from_typed_video_list(typed_video_list)
+        expect = VideoBatch.create(video_dict_list)
+        self.assertEqual(expect, actual)
+
+
+class TestVideoBatchRow(unittest.TestCase):
+    def test_row(self):
+        video_dict = {
+            "id": "1",
+            "video_id": "sm12345671",
+            "title": "title_1",
+            "username": "username_1",
+            "status": "未視聴",
+            "uploaded_at": "2023-12-22 12:34:51",
+            "registered_at": "2023-12-22 12:34:52",
+            "video_url": "https://www.nicovideo.jp/watch/sm12345671",
+            "mylist_url": "https://www.nicovideo.jp/user/10000001/video",
+            "created_at": "2023-12-22 12:34:53",
+        }
+        batch = VideoBatch.create([video_dict])
+        instance = batch[0]
+        self.assertEqual(1, instance.id)
+        self.assertEqual("sm12345671", instance.video_id)
+        self.assertEqual("title_1", instance.title)
+        self.assertEqual("username_1", instance.username)
+        self.assertEqual(Status.not_watched, instance.status)
+        self.assertEqual("2023-12-22 12:34:51", instance.uploaded_at)
+        self.assertEqual("2023-12-22 12:34:52", instance.registered_at)
+        self.assertEqual("https://www.nicovideo.jp/watch/sm12345671", instance.video_url)
+        self.assertEqual("https://www.nicovideo.jp/user/10000001/video", instance.mylist_url)
+        self.assertEqual("2023-12-22 12:34:53", instance.created_at)
+        self.assertEqual(video_dict, instance.to_dict())
+        self.assertEqual(TypedVideo.create(video_dict), instance.to_typed_video())
+
+        with self.assertRaises(FrozenInstanceError):
+            instance.index = 1
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
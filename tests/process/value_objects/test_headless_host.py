@@ -0,0 +1,46 @@
+import sys
+import unittest
+
+from mock import MagicMock
+
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.progress_sink import ConsoleProgressSink
+from nnmm.process.value_objects.headless_host import HeadlessHost
+
+
+class TestHeadlessHost(unittest.TestCase):
+    def test_init(self):
+        mylist_db = MagicMock(spec=MylistDBController)
+        mylist_info_db = MagicMock(spec=MylistInfoDBController)
+        progress_sink = MagicMock(spec=ConsoleProgressSink)
+        circuit_breaker = MagicMock(spec=MylistCircuitBreaker)
+
+        actual = HeadlessHost(mylist_db, mylist_info_db, progress_sink, circuit_breaker)
+        self.assertIs(mylist_db, actual.mylist_db)
+        self.assertIs(mylist_info_db, actual.mylist_info_db)
+        self.assertIs(progress_sink, actual.progress_bus)
+        self.assertIs(circuit_breaker, actual.circuit_breaker)
+
+        actual = HeadlessHost(mylist_db, mylist_info_db)
+        self.assertIsNone(actual.progress_bus)
+        self.assertIsNone(actual.circuit_breaker)
+
+        # メインウィンドウと同様に getattr で参照できる
+        self.assertIsNone(getattr(actual, "progress_bus", None))
+
+        params_list = [
+            (-1, mylist_info_db),
+            (mylist_db, -1),
+            (mylist_info_db, mylist_db),
+        ]
+        for params in params_list:
+            with self.assertRaises(ValueError):
+                actual = HeadlessHost(params[0], params[1])
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,120 @@
+import sys
+import unittest
+
+import orjson
+
+from nnmm.process.value_objects.pane_snapshot import PaneSnapshot
+
+
+class TestPaneSnapshot(unittest.TestCase):
+    def _make_table_row_list(self, num: int = 3) -> list[list[str]]:
+        return [
+            [
+                f"{i + 1}",
+                f"sm1000000{i}",
+                f"動画タイトル{i}",
+                "投稿者2",
+                "未視聴",
+                "2023-12-26 12:34:56",
+                "2023-12-26 12:34:56",
+                f"https://www.nicovideo.jp/watch/sm1000000{i}",
+                "https://www.nicovideo.jp/user/2222222/video",
+            ]
+            for i in range(num)
+        ]
+
+    def _make_instance(self) -> PaneSnapshot:
+        return PaneSnapshot.create(
+            ["投稿者1さんの投稿動画", "*:投稿者2さんの投稿動画", "投稿者3さんの投稿動画"],
+            [1],
+            1,
+            "https://www.nicovideo.jp/user/2222222/video",
+            self._make_table_row_list(),
+        )
+
+    def test_init(self):
+        instance = self._make_instance()
+        self.assertEqual(
+            ("投稿者1さんの投稿動画", "*:投稿者2さんの投稿動画", "投稿者3さんの投稿動画"), instance.showname_list
+        )
+        self.assertEqual((1,), instance.include_new_index_list)
+        self.assertEqual(1, instance.selected_index)
+        self.assertEqual("https://www.nicovideo.jp/user/2222222/video", instance.mylist_url)
+        self.assertEqual(tuple(tuple(row) for row in self._make_table_row_list()), instance.table_row_list)
+
+        # 空のペインも許容する
+        instance = PaneSnapshot((), (), 0, "", ())
+        self.assertEqual((), instance.showname_list)
+
+        params_list = [
+            (["s"], (), 0, "", ()),
+            (("s", 1), (), 0, "", ()),
+            (("s",), [0], 0, "", ()),
+            (("s",), (1,), 0, "", ()),
+            (("s",), (-1,), 0, "", ()),
+            (("s",), (), -1, "", ()),
+            (("s",), (), "0", "", ()),
+            (("s",), (), 0, None, ()),
+            (("s",), (), 0, "", []),
+            (("s",), (), 0, "", (["a"],)),
+            (("s",), (), 0, "", (("a", 1),)),
+        ]
+        for params in params_list:
+            with self.assertRaises(ValueError):
+                instance = PaneSnapshot(*params)
+
+    def test_create(self):
+        # テーブルペインの行は MAX_TABLE_ROW_NUM 行までに切り詰める
+        num = PaneSnapshot.MAX_TABLE_ROW_NUM + 5
+        row_list = [[str(i)] for i in range(num)]
+        instance = PaneSnapshot.create([], [], 0, "", row_list)
+        self.assertEqual(PaneSnapshot.MAX_TABLE_ROW_NUM, len(instance.table_row_list))
+        self.assertEqual(("0",), instance.table_row_list[0])
+
+        params_list = [
+            ("s", [], 0, "", []),
+            ([], None, 0, "", []),
+            ([], [], 0, "", None),
+            ([], [], 0, "", ["a"]),
+        ]
+        for params in params_list:
+            with self.assertRaises(ValueError):
+                instance = PaneSnapshot.create(*params)
+
+    def test_to_bytes(self):
+        instance = self._make_instance()
+        actual = orjson.loads(instance.to_bytes())
+        expect = {
+            "version": PaneSnapshot.VERSION,
+            "showname_list": ["投稿者1さんの投稿動画", "*:投稿者2さんの投稿動画", "投稿者3さんの投稿動画"],
+            "include_new_index_list": [1],
+            "selected_index": 1,
+            "mylist_url": "https://www.nicovideo.jp/user/2222222/video",
+            "table_row_list": self._make_table_row_list(),
+        }
+        self.assertEqual(expect, actual)
+
+    def test_from_bytes(self):
+        instance = self._make_instance()
+        actual = PaneSnapshot.from_bytes(instance.to_bytes())
+        self.assertEqual(instance, actual)
+
+        snapshot_dict = orjson.loads(instance.to_bytes())
+        invalid_list = [
+            b"invalid json",
+            b"[]",
+            orjson.dumps(snapshot_dict | {"version": PaneSnapshot.VERSION + 1}),
+            orjson.dumps({k: v for k, v in snapshot_dict.items() if k != "mylist_url"}),
+            orjson.dumps(snapshot_dict | {"showname_list": "s"}),
+            orjson.dumps(snapshot_dict | {"include_new_index_list": [10]}),
+            orjson.dumps(snapshot_dict | {"selected_index": -1}),
+        ]
+        for invalid in invalid_list:
+            with self.assertRaises(ValueError):
+                actual = PaneSnapshot.from_bytes(invalid)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -7,6 +7,7 @@ from PySide6.QtWidgets import QDialog
 from nnmm.main_window import MainWindow
 from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.value_objects.headless_host import HeadlessHost
 from nnmm.process.value_objects.process_info import ProcessInfo
 
 
@@ -22,6 +23,11 @@ class TestProcessInfo(unittest.TestCase):
         self.assertEqual(mylist_db, actual.mylist_db)
         self.assertEqual(mylist_info_db, actual.mylist_info_db)
 
+        # GUIを伴わない更新処理ではメインウィンドウの代わりに HeadlessHost を渡す
+        host = HeadlessHost(mylist_db, mylist_info_db)
+        actual = ProcessInfo(process_name, host, mylist_db, mylist_info_db)
+        self.assertIs(host, actual.window)
+
         params_list = [
             (-1, window, mylist_db, mylist_info_db),
             (process_name, -1, mylist_db, mylist_info_db),
@@ -0,0 +1,328 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import orjson
+from mock import MagicMock, patch
+
+from nnmm import cli
+from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+from nnmm.process.update_mylist.headless_updater import HeadlessUpdater
+from nnmm.process.update_mylist.progress_sink import ConsoleProgressSink
+from nnmm.process.update_mylist.value_objects.update_summary import UpdateSummary
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.cli.logger"))
+        self.enterContext(patch("nnmm.cli.setup_logging"))
+        self.temp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.db_fullpath = str(self.temp_dir / "NNMM_DB.db")
+        # --config の既定値は一時ディレクトリ内の設定ファイルとする, DBは --db で指定する
+        self.config_path = self.temp_dir / "config.json"
+        self.rss_save_path = str(self.temp_dir / "rss")
+        config = {
+            "general": {"browser_path": "", "auto_reload": "", "rss_save_path": self.rss_save_path},
+            "db": {"save_path": str(self.temp_dir / "config.db")},
+        }
+        self.config_path.write_bytes(orjson.dumps(config))
+        self.enterContext(patch.object(cli.ConfigStore, "CONFIG_FILE_PATH", str(self.config_path)))
+        self.enterContext(patch.object(cli.ConfigStore, "config", None))
+
+    def _make_db(self) -> tuple[MylistDBController, MylistInfoDBController]:
+        mylist_db = MylistDBController(self.db_fullpath)
+        mylist_info_db = MylistInfoDBController(self.db_fullpath)
+        for i in range(1, 4):
+            mylist_url = f"https://www.nicovideo.jp/user/1000000{i}/video"
+            mylist_db.upsert(
+                i,
+                f"投稿者{i}",
+                "投稿動画",
+                "uploaded",
+                f"投稿者{i}さんの投稿動画",
+                mylist_url,
+                "2023-12-22 12:34:56",
+                "2023-12-22 12:34:56",
+                "2023-12-22 12:34:56",
+                "15分",
+                i - 1,
+                i == 1,
+            )
+            status = "未視聴" if i == 1 else "視聴済"
+            mylist_info_db.upsert(
+                f"sm1000000{i}",
+                f"動画タイトル{i}",
+                f"投稿者{i}",
+                status,
+                "2023-12-22 12:34:56",
+                "2023-12-22 12:34:56",
+                f"https://www.nicovideo.jp/watch/sm1000000{i}",
+                mylist_url,
+                "2023-12-22 12:34:56",
+            )
+        return mylist_db, mylist_info_db
+
+    def _run_main(self, argv: list[str]) -> tuple[int, str]:
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            actual = cli.main(argv)
+        return actual, stdout.getvalue()
+
+    def test_import_without_qt(self):
+        code = "import sys, nnmm.cli; print([m for m in sys.modules if m.startswith(('PySide6', 'qdarktheme'))])"
+        src_path = str(Path(cli.__file__).parent.parent)
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, env={"PYTHONPATH": src_path}, check=True
+        )
+        self.assertEqual("[]", result.stdout.strip())
+
+    def test_create_parser(self):
+        parser = cli.create_parser()
+        args = parser.parse_args(["update", "--due"])
+        self.assertEqual("update", args.command)
+        self.assertTrue(args.due)
+        self.assertFalse(args.backfill)
+        self.assertEqual(HeadlessUpdater.DEFAULT_POLL_SECONDS, args.poll)
+
+        args = parser.parse_args(["--db", "a.db", "-q", "update", "--url", "url_1", "url_2", "--json"])
+        self.assertEqual("a.db", args.db)
+        self.assertTrue(args.quiet)
+        self.assertEqual(["url_1", "url_2"], args.url)
+        self.assertTrue(args.json)
+
+    def test_main_usage_error(self):
+        with patch("sys.stderr", io.StringIO()):
+            self.assertEqual(cli.EXIT_USAGE, self._run_main([])[0])
+            self.assertEqual(cli.EXIT_USAGE, self._run_main(["update"])[0])
+            self.assertEqual(cli.EXIT_USAGE, self._run_main(["update", "--all", "--due"])[0])
+
+        # 設定ファイルが読み込めない, --db の指定があっても同様
+        config_path = str(self.temp_dir / "not_exist.json")
+        self.assertEqual(cli.EXIT_USAGE, self._run_main(["--config", config_path, "stats"])[0])
+        self.assertEqual(
+            cli.EXIT_USAGE, self._run_main(["--config", config_path, "--db", self.db_fullpath, "stats"])[0]
+        )
+
+    def test_resolve_db_fullpath(self):
+        config_path = str(self.config_path)
+        expect = str(Path(self.temp_dir / "config.db"))
+        self.assertEqual(expect, cli.resolve_db_fullpath(config_path, None))
+        self.assertEqual(config_path, cli.ConfigStore.CONFIG_FILE_PATH)
+        self.assertEqual(self.rss_save_path, cli.ConfigStore.config["general"]["rss_save_path"])
+
+        # --db の指定は設定ファイルの db.save_path のみを上書きする
+        cli.ConfigStore.config = None
+        self.assertEqual(str(Path(self.db_fullpath)), cli.resolve_db_fullpath(config_path, self.db_fullpath))
+        self.assertEqual(self.db_fullpath, cli.ConfigStore.config["db"]["save_path"])
+        self.assertEqual(self.rss_save_path, cli.ConfigStore.config["general"]["rss_save_path"])
+
+        with self.assertRaises(IOError):
+            cli.resolve_db_fullpath(str(self.temp_dir / "not_exist.json"), None)
+        with self.assertRaises(IOError):
+            cli.resolve_db_fullpath(str(self.temp_dir / "not_exist.json"), self.db_fullpath)
+
+    def test_stats(self):
+        self._make_db()
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "stats", "--json"])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        stats = orjson.loads(stdout)
+        self.assertEqual(3, stats["mylist_num"])
+        self.assertEqual(1, stats["include_new_num"])
+        self.assertEqual(3, stats["video_num"])
+        self.assertEqual(1, stats["not_watched_num"])
+        self.assertEqual(2, stats["failing_mylist_num"])
+        self.assertEqual(0, stats["circuit_tripped_num"])
+        self.assertEqual(3, stats["due_num"])
+        self.assertEqual("2023-12-22 12:49:56", stats["next_check_at"])
+
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "stats"])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        self.assertEqual(list(stats.keys()), [line.split()[0] for line in stdout.splitlines()])
+
+    def test_export(self):
+        self._make_db()
+        output_path = str(self.temp_dir / "mylist.csv")
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "export", output_path])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        self.assertEqual(output_path, stdout.strip())
+        self.assertTrue(Path(output_path).exists())
+        self.assertIn("https://www.nicovideo.jp/user/10000003/video", Path(output_path).read_text(encoding="utf_8"))
+
+        with patch("nnmm.cli.save_mylist") as mock_save_mylist:
+            mock_save_mylist.return_value = cli.Result.failed
+            actual, stdout = self._run_main(["--db", self.db_fullpath, "export", output_path])
+            self.assertEqual(cli.EXIT_FAILURE, actual)
+
+    def test_update(self):
+        mock_parse_executor = self.enterContext(patch("nnmm.cli.ParseExecutor"))
+        mock_get_parse_process_num = self.enterContext(patch("nnmm.cli.ConfigStore.get_parse_process_num"))
+        mock_get_parse_process_num.return_value = 0
+        mock_updater_class = self.enterContext(patch("nnmm.cli.HeadlessUpdater"))
+        mock_updater_class.DEFAULT_POLL_SECONDS = HeadlessUpdater.DEFAULT_POLL_SECONDS
+        updater = MagicMock(spec=HeadlessUpdater)
+        mock_updater_class.return_value = updater
+        m_list = [{"url": "url_1"}, {"url": "url_2"}]
+        updater.select_all.return_value = m_list
+        updater.select_due.return_value = m_list[:1]
+        updater.select_url.return_value = m_list[1:]
+        updater.update.return_value = UpdateSummary(2, 0, 2, 0, 0, 1.0)
+
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--all"])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        self.assertEqual(UpdateSummary(2, 0, 2, 0, 0, 1.0).to_text(), stdout.strip())
+        updater.update.assert_called_once_with(m_list, False, is_forced_probe=False)
+        self.assertIsInstance(mock_updater_class.call_args.args[0], MylistDBController)
+        self.assertIsInstance(mock_updater_class.call_args.args[1], MylistInfoDBController)
+        self.assertIsInstance(mock_updater_class.call_args.args[2], ConsoleProgressSink)
+        self.assertIsNone(mock_updater_class.call_args.args[3])
+        # 解析用プロセスプールは設定ファイルの値で起動し、終了時に終了させる
+        mock_parse_executor.configure.assert_called_once_with(0)
+        mock_parse_executor.shutdown.assert_called_once_with()
+
+        # -q なら進捗は表示しない
+        updater.update.reset_mock()
+        updater.update.return_value = UpdateSummary(1, 0, 0, 1, 0, 1.0)
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "-q", "update", "--due", "--backfill", "--json"])
+        self.assertEqual(cli.EXIT_FAILURE, actual)
+        self.assertEqual(UpdateSummary(1, 0, 0, 1, 0, 1.0).to_dict(), orjson.loads(stdout))
+        updater.update.assert_called_once_with(m_list[:1], True, is_forced_probe=False)
+        self.assertIsNone(mock_updater_class.call_args.args[2])
+
+        # 個別に指定されたマイリストは待機時間を待たずに回復確認を行う
+        updater.update.reset_mock()
+        updater.update.return_value = UpdateSummary(1, 0, 1, 0, 0, 1.0)
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--url", "url_2"])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        updater.select_url.assert_called_once_with(["url_2"])
+        updater.update.assert_called_once_with(m_list[1:], False, is_forced_probe=True)
+
+        # 登録されていないマイリストが指定された
+        updater.update.reset_mock()
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--url", "url_2", "url_3"])
+        self.assertEqual(cli.EXIT_USAGE, actual)
+        updater.update.assert_not_called()
+
+        # デーモン
+        updater.run_daemon.return_value = 3
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--daemon", "--poll", "10"])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        updater.run_daemon.assert_called_once_with(10.0, False)
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--daemon", "--poll", "0"])
+        self.assertEqual(cli.EXIT_USAGE, actual)
+
+        # -j でワーカープロセス数を指定する
+        updater.update.reset_mock()
+        updater.update.return_value = UpdateSummary(2, 0, 2, 0, 0, 1.0)
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--all", "-j", "2"])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        self.assertEqual(2, mock_updater_class.call_args.args[3])
+        updater.update.assert_called_once_with(m_list, False, is_forced_probe=False)
+
+        mock_updater_class.reset_mock()
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--all", "-j", "0"])
+        self.assertEqual(cli.EXIT_USAGE, actual)
+        mock_updater_class.assert_not_called()
+
+        # --parse-processes は設定ファイルの値より優先する
+        mock_parse_executor.reset_mock()
+        mock_get_parse_process_num.reset_mock()
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--all", "--parse-processes", "2"])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        mock_get_parse_process_num.assert_not_called()
+        mock_parse_executor.configure.assert_called_once_with(2)
+        mock_parse_executor.shutdown.assert_called_once_with()
+
+        mock_parse_executor.reset_mock()
+        mock_updater_class.reset_mock()
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--all", "--parse-processes", "-1"])
+        self.assertEqual(cli.EXIT_USAGE, actual)
+        mock_updater_class.assert_not_called()
+        mock_parse_executor.configure.assert_not_called()
+
+        # 既定ではレポートを書き出さない
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--all"])
+        self.assertIsNone(mock_updater_class.call_args.kwargs["report_dir"])
+        self.assertFalse(mock_updater_class.call_args.kwargs["is_chrome_trace"])
+
+        # --report, --trace で各段階の所要時間の集計と Chrome trace を書き出す
+        report_dir = str(self.temp_dir / "report")
+        actual, stdout = self._run_main([
+            "--db",
+            self.db_fullpath,
+            "update",
+            "--all",
+            "--report",
+            report_dir,
+            "--trace",
+        ])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        self.assertEqual(Path(report_dir), mock_updater_class.call_args.kwargs["report_dir"])
+        self.assertTrue(mock_updater_class.call_args.kwargs["is_chrome_trace"])
+
+        # --trace は --report が必要, --report は -j と併用できない
+        mock_updater_class.reset_mock()
+        for argv in [["--trace"], ["--report", report_dir, "-j", "2"]]:
+            actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--all", *argv])
+            self.assertEqual(cli.EXIT_USAGE, actual)
+        mock_updater_class.assert_not_called()
+
+    def test_update_with_db_from_other_cwd(self):
+        # cron などで別のディレクトリから --db を指定して実行しても、更新処理は --config の設定を参照する
+        mock_updater_class = self.enterContext(patch("nnmm.cli.HeadlessUpdater"))
+        mock_updater_class.DEFAULT_POLL_SECONDS = HeadlessUpdater.DEFAULT_POLL_SECONDS
+        updater = MagicMock(spec=HeadlessUpdater)
+        mock_updater_class.return_value = updater
+        updater.select_all.return_value = []
+        rss_save_path_list = []
+
+        def update(m_list, is_backfill, is_forced_probe):
+            # 更新処理の中で参照される設定
+            rss_save_path_list.append(cli.ConfigStore.get_config()["general"]["rss_save_path"])
+            return UpdateSummary(0, 0, 0, 0, 0, 1.0)
+
+        updater.update.side_effect = update
+
+        # 設定ファイルのパスは既定値（カレントディレクトリからの相対パス）に戻しておく
+        self.enterContext(patch.object(cli.ConfigStore, "CONFIG_FILE_PATH", "./config/config.json"))
+        cwd = self.temp_dir / "cwd"
+        cwd.mkdir()
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(cwd)
+        argv = ["--config", str(self.config_path), "--db", self.db_fullpath, "update", "--all"]
+        actual, stdout = self._run_main(argv)
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        updater.update.assert_called_once_with([], False, is_forced_probe=False)
+        self.assertEqual([self.rss_save_path], rss_save_path_list)
+        self.assertEqual(self.db_fullpath, mock_updater_class.call_args.args[0].dbname)
+        self.assertFalse((cwd / "config").exists())
+
+    def test_update_signal(self):
+        mock_updater_class = self.enterContext(patch("nnmm.cli.HeadlessUpdater"))
+        mock_updater_class.DEFAULT_POLL_SECONDS = HeadlessUpdater.DEFAULT_POLL_SECONDS
+        updater = MagicMock(spec=HeadlessUpdater)
+        mock_updater_class.return_value = updater
+        previous_handler = cli.signal.getsignal(cli.signal.SIGINT)
+
+        # 更新中に受け取った SIGINT で更新を中止し、終了後はハンドラを元に戻す
+        def run_daemon(poll_seconds, is_backfill):
+            handler = cli.signal.getsignal(cli.signal.SIGINT)
+            handler(cli.signal.SIGINT, None)
+            return 0
+
+        updater.run_daemon.side_effect = run_daemon
+        actual, stdout = self._run_main(["--db", self.db_fullpath, "update", "--daemon"])
+        self.assertEqual(cli.EXIT_SUCCESS, actual)
+        updater.cancel.assert_called_once_with()
+        self.assertIs(previous_handler, cli.signal.getsignal(cli.signal.SIGINT))
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,151 @@
+import shutil
+import sys
+import unittest
+from pathlib import Path
+
+import orjson
+from mock import patch
+
+from nnmm.config_store import ConfigStore
+
+TEST_CONFIG_DIR = "./tests/config_store/"
+
+
+class TestConfigStore(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch.object(ConfigStore, "config", None))
+        self.enterContext(patch.object(ConfigStore, "CONFIG_FILE_PATH", TEST_CONFIG_DIR + "config.json"))
+        Path(TEST_CONFIG_DIR).mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(TEST_CONFIG_DIR)
+
+    def _make_config(self, max_check_interval: str | None = None) -> dict:
+        config = {
+            "general": {
+                "browser_path": "",
+                "auto_reload": "(使用しない)",
+                "rss_save_path": "",
+            },
+            "db": {
+                "save_path": "./NNMM_DB.db",
+            },
+        }
+        if max_check_interval is not None:
+            config["general"]["max_check_interval"] = max_check_interval
+        return config
+
+    def _write_config(self, config: dict) -> None:
+        Path(ConfigStore.CONFIG_FILE_PATH).write_bytes(orjson.dumps(config))
+
+    def test_load_config(self):
+        config = self._make_config()
+        self._write_config(config)
+        self.assertEqual(config, ConfigStore.load_config(ConfigStore.CONFIG_FILE_PATH))
+
+        with self.assertRaises(IOError):
+            ConfigStore.load_config(TEST_CONFIG_DIR + "not_exist.json")
+
+        self._write_config({})
+        with self.assertRaises(IOError):
+            ConfigStore.load_config(ConfigStore.CONFIG_FILE_PATH)
+
+        self._write_config({"general": {}, "db": {}})
+        with self.assertRaises(IOError):
+            ConfigStore.load_config(ConfigStore.CONFIG_FILE_PATH)
+
+    def test_get_config(self):
+        config = self._make_config()
+        self._write_config(config)
+        self.assertEqual(config, ConfigStore.get_config())
+        self.assertEqual(config, ConfigStore.config)
+
+        # 読み込み済ならファイルは読み込まない
+        Path(ConfigStore.CONFIG_FILE_PATH).unlink()
+        self.assertEqual(config, ConfigStore.get_config())
+
+    def test_set_config(self):
+        config = self._make_config()
+        self._write_config(config)
+        self.assertEqual(config, ConfigStore.set_config())
+        self.assertEqual(config, ConfigStore.config)
+
+        # 読み込み済でも読み込み直す
+        config["db"]["save_path"] = "./other_NNMM_DB.db"
+        self._write_config(config)
+        self.assertEqual(config, ConfigStore.set_config())
+
+        Path(ConfigStore.CONFIG_FILE_PATH).unlink()
+        with self.assertRaises(IOError):
+            ConfigStore.set_config()
+
+    def test_get_max_check_interval_minutes(self):
+        self._write_config(self._make_config("1日"))
+        self.assertEqual(24 * 60, ConfigStore.get_max_check_interval_minutes())
+
+        self._write_config(self._make_config("(使用しない)"))
+        ConfigStore.set_config()
+        self.assertIsNone(ConfigStore.get_max_check_interval_minutes())
+
+        # 項目がない旧形式の設定ファイル
+        self._write_config(self._make_config())
+        ConfigStore.set_config()
+        self.assertIsNone(ConfigStore.get_max_check_interval_minutes())
+
+        # 設定ファイルが読み込めない
+        Path(ConfigStore.CONFIG_FILE_PATH).unlink()
+        ConfigStore.config = None
+        self.assertIsNone(ConfigStore.get_max_check_interval_minutes())
+
+    def test_get_parse_process_num(self):
+        config = self._make_config()
+        config["general"]["parse_process_num"] = 4
+        self._write_config(config)
+        self.assertEqual(4, ConfigStore.get_parse_process_num())
+
+        # 文字列でも数値として解釈できればよい, 負の値は 0 とする
+        params_list = [("2", 2), (-1, 0), ("invalid", 0), (None, 0)]
+        for value, expect in params_list:
+            config["general"]["parse_process_num"] = value
+            self._write_config(config)
+            ConfigStore.set_config()
+            self.assertEqual(expect, ConfigStore.get_parse_process_num())
+
+        # 項目がない旧形式の設定ファイル
+        self._write_config(self._make_config())
+        ConfigStore.set_config()
+        self.assertEqual(0, ConfigStore.get_parse_process_num())
+
+        # 設定ファイルが読み込めない
+        Path(ConfigStore.CONFIG_FILE_PATH).unlink()
+        ConfigStore.config = None
+        self.assertEqual(0, ConfigStore.get_parse_process_num())
+
+    def test_is_update_trace_enabled(self):
+        config = self._make_config()
+        config["general"]["update_trace"] = True
+        self._write_config(config)
+        self.assertTrue(ConfigStore.is_update_trace_enabled())
+
+        # true 以外は書き出さない
+        for value in [False, "true", 1, None]:
+            config["general"]["update_trace"] = value
+            self._write_config(config)
+            ConfigStore.set_config()
+            self.assertFalse(ConfigStore.is_update_trace_enabled())
+
+        # 項目がない旧形式の設定ファイル
+        self._write_config(self._make_config())
+        ConfigStore.set_config()
+        self.assertFalse(ConfigStore.is_update_trace_enabled())
+
+        # 設定ファイルが読み込めない
+        Path(ConfigStore.CONFIG_FILE_PATH).unlink()
+        ConfigStore.config = None
+        self.assertFalse(ConfigStore.is_update_trace_enabled())
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,138 @@
+import logging
+import sys
+import unittest
+from logging.handlers import QueueHandler, QueueListener
+
+from mock import MagicMock, call, patch
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QPlainTextEdit
+
+import nnmm.log_sink
+from nnmm.log_sink import GuiLogSink, start_queue_logging, stop_queue_logging
+
+
+class TestGuiLogSink(unittest.TestCase):
+    def setUp(self):
+        self.mock_timer = self.enterContext(patch("nnmm.log_sink.QTimer"))
+        self.textarea = MagicMock(spec=QPlainTextEdit)
+
+    def test_init(self):
+        instance = GuiLogSink(self.textarea)
+        self.assertIs(self.textarea, instance.textarea)
+        self.assertEqual(0, len(instance._buffer))
+        self.assertEqual(GuiLogSink.MAX_BLOCK_COUNT, instance._buffer.maxlen)
+        self.assertEqual(
+            [call.setReadOnly(True), call.setMaximumBlockCount(GuiLogSink.MAX_BLOCK_COUNT)],
+            self.textarea.mock_calls,
+        )
+        self.assertEqual(
+            [
+                call(instance),
+                call().setInterval(GuiLogSink.FLUSH_INTERVAL_MS),
+                call().timeout.connect(instance.flush),
+                call().start(),
+            ],
+            self.mock_timer.mock_calls,
+        )
+
+    def test_put(self):
+        instance = GuiLogSink(self.textarea)
+        self.textarea.reset_mock()
+
+        instance.put("line 1")
+        instance.put("line 2")
+        self.assertEqual(["line 1", "line 2"], list(instance._buffer))
+
+        # 積むだけではテキストエリアを操作しない
+        self.assertEqual([], self.textarea.mock_calls)
+
+        # 上限を超えた場合は古い行から捨てる
+        for i in range(GuiLogSink.MAX_BLOCK_COUNT):
+            instance.put(f"line {i + 3}")
+        self.assertEqual(GuiLogSink.MAX_BLOCK_COUNT, len(instance._buffer))
+        self.assertEqual("line 3", instance._buffer[0])
+
+    def test_flush(self):
+        instance = GuiLogSink(self.textarea)
+        self.textarea.reset_mock()
+
+        # 積まれた行がなければ何もしない
+        instance.flush()
+        self.assertEqual([], self.textarea.mock_calls)
+
+        # 積まれた行を1回でまとめて追記する
+        instance.put("line 1")
+        instance.put("line 2")
+        instance.put("line 3")
+        instance.flush()
+        self.assertEqual(
+            [call.appendPlainText("line 1\nline 2\nline 3"), call.moveCursor(QTextCursor.MoveOperation.End)],
+            self.textarea.mock_calls,
+        )
+        self.assertEqual(0, len(instance._buffer))
+
+        self.textarea.reset_mock()
+        instance.flush()
+        self.assertEqual([], self.textarea.mock_calls)
+
+
+class TestQueueLogging(unittest.TestCase):
+    def setUp(self):
+        self.mock_register = self.enterContext(patch("nnmm.log_sink.atexit.register"))
+        # 開始済の QueueListener は退避しておく
+        self.orig_listener = nnmm.log_sink._queue_listener
+        nnmm.log_sink._queue_listener = None
+        self.root_logger = logging.getLogger()
+        self.orig_handlers = self.root_logger.handlers[:]
+        for handler in self.orig_handlers:
+            self.root_logger.removeHandler(handler)
+        self.handler = MagicMock(spec=logging.Handler)
+        self.handler.level = logging.NOTSET
+        self.root_logger.addHandler(self.handler)
+
+    def tearDown(self):
+        stop_queue_logging()
+        for handler in self.root_logger.handlers[:]:
+            self.root_logger.removeHandler(handler)
+        for handler in self.orig_handlers:
+            self.root_logger.addHandler(handler)
+        nnmm.log_sink._queue_listener = self.orig_listener
+
+    def test_start_queue_logging(self):
+        actual = start_queue_logging()
+        self.assertIsInstance(actual, QueueListener)
+        self.assertEqual(actual, nnmm.log_sink._queue_listener)
+        self.assertEqual((self.handler,), actual.handlers)
+        self.assertEqual(1, len(self.root_logger.handlers))
+        self.assertIsInstance(self.root_logger.handlers[0], QueueHandler)
+        # 移したハンドラは QueueHandler から辿れる
+        self.assertEqual(actual, self.root_logger.handlers[0].listener)
+        self.mock_register.assert_called_once_with(stop_queue_logging)
+
+        # 開始済の場合は同じ QueueListener を返す
+        self.assertEqual(actual, start_queue_logging())
+        self.mock_register.assert_called_once()
+
+        # 呼び出し元ではなく QueueListener のスレッドでハンドラが呼ばれる
+        logger = logging.getLogger("nnmm.test_log_sink")
+        logger.warning("queued message")
+        stop_queue_logging()
+        self.handler.handle.assert_called_once()
+        record = self.handler.handle.call_args.args[0]
+        self.assertEqual("queued message", record.getMessage())
+
+    def test_stop_queue_logging(self):
+        # 開始していない場合は何もしない
+        stop_queue_logging()
+        self.assertEqual([self.handler], self.root_logger.handlers)
+
+        start_queue_logging()
+        stop_queue_logging()
+        self.assertIsNone(nnmm.log_sink._queue_listener)
+        self.assertEqual([self.handler], self.root_logger.handlers)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -12,9 +12,14 @@ from nnmm.mylist_db_controller import MylistDBController
 from nnmm.mylist_info_db_controller import MylistInfoDBController
 from nnmm.process import config, copy_mylist_url, copy_video_url, create_mylist, delete_mylist, move_down, move_up
 from nnmm.process import not_watched, popup, search, show_mylist_info_all, video_play, video_play_with_focus_back
-from nnmm.process import watched, watched_all_mylist, watched_mylist
+from nnmm.process import pane_snapshot, update_history, watched, watched_all_mylist, watched_mylist
 from nnmm.process.base import ProcessBase
+from nnmm.process.update_mylist import single, stop
+from nnmm.process.update_mylist.circuit_breaker import MylistCircuitBreaker
+from nnmm.process.update_mylist.mylist_scheduler import MylistScheduler
+from nnmm.process.update_mylist.update_job_manager import UpdateJobManager
 from nnmm.process.value_objects.process_info import ProcessInfo
+from nnmm.update_run_db_controller import UpdateRunDBController
 from nnmm.util import Result
 
 TEST_DB_PATH = ":memory:"
@@ -41,13 +46,18 @@ class ConcreteErrorProcessBase(ProcessBase):
 
 class TestWindowMain(unittest.TestCase):
     def _get_instance(
-        self, use_create_layout: bool = False, use_update_mylist_pane: bool = False, use_init_config: bool = False
+        self,
+        use_create_layout: bool = False,
+        use_update_mylist_pane: bool = False,
+        use_init_config: bool = False,
+        use_restore_pane_snapshot: bool = False,
     ):
         self.mock_list = [
             self.enterContext(patch("nnmm.main_window.logger.info")),
             self.enterContext(patch("nnmm.main_window.QDialog.__init__")),
             self.enterContext(patch("nnmm.main_window.MylistDBController", spec=MylistDBController)),
             self.enterContext(patch("nnmm.main_window.MylistInfoDBController", spec=MylistInfoDBController)),
+            self.enterContext(patch("nnmm.main_window.UpdateRunDBController", spec=UpdateRunDBController)),
             self.enterContext(patch("nnmm.main_window.QIcon")),
             self.enterContext(patch("nnmm.main_window.MainWindow.setWindowIcon")),
             self.enterContext(patch("nnmm.main_window.MainWindow.setWindowTitle")),
@@ -55,9 +65,12 @@ class TestWindowMain(unittest.TestCase):
             self.enterContext(patch("nnmm.main_window.MainWindow.setGeometry")),
             self.enterContext(patch("nnmm.main_window.asyncio.set_event_loop_policy")),
             self.enterContext(patch("nnmm.main_window.asyncio.WindowsSelectorEventLoopPolicy")),
-            self.enterContext(patch("nnmm.main_window.timer.Timer")),
             self.enterContext(patch("nnmm.main_window.MainWindow.activateWindow")),
+            self.enterContext(patch("nnmm.main_window.ParseExecutor.configure")),
         ]
+        # マイリスト一覧の表示とタイマーの起動は最初の描画の後に行うため、__init__ では呼ばれない
+        self.mock_single_shot = self.enterContext(patch("nnmm.main_window.QTimer.singleShot"))
+        self.mock_timer = self.enterContext(patch("nnmm.main_window.timer.Timer"))
         mock_config = self.enterContext(patch("nnmm.main_window.config.ConfigBase.set_config"))
         mock_config.side_effect = lambda: {"db": {"save_path": "./tests/cache"}}
         self.mock_list.append(mock_config)
@@ -65,9 +78,11 @@ class TestWindowMain(unittest.TestCase):
         if not use_create_layout:
             self.mock_list.append(self.enterContext(patch("nnmm.main_window.MainWindow.create_layout")))
         if not use_update_mylist_pane:
-            self.mock_list.append(self.enterContext(patch("nnmm.main_window.MainWindow.update_mylist_pane")))
+            self.mock_update_mylist_pane = self.enterContext(patch("nnmm.main_window.MainWindow.update_mylist_pane"))
         if not use_init_config:
             self.mock_list.append(self.enterContext(patch("nnmm.main_window.MainWindow.init_config")))
+        if not use_restore_pane_snapshot:
+            self.mock_list.append(self.enterContext(patch("nnmm.main_window.MainWindow.restore_pane_snapshot")))
         mw = MainWindow()
         return mw
 
@@ -96,11 +111,26 @@ class TestWindowMain(unittest.TestCase):
         self.assertTrue(hasattr(instance, "db_fullpath"))
         self.assertTrue(hasattr(instance, "mylist_db"))
         self.assertTrue(hasattr(instance, "mylist_info_db"))
+        self.assertTrue(hasattr(instance, "update_run_db"))
         self.assertTrue(hasattr(instance, "time"))
+        self.assertIsInstance(instance.update_job_manager, UpdateJobManager)
+        self.assertFalse(instance.update_job_manager.is_running)
+        self.assertIsInstance(instance.mylist_scheduler, MylistScheduler)
+        self.assertIsNone(instance.mylist_scheduler.max_check_failed_count)
+        self.assertIsInstance(instance.circuit_breaker, MylistCircuitBreaker)
+        self.assertIsNone(instance.time)
+        self.assertFalse(instance.is_pane_snapshot_restored)
 
         for mock_item in self.mock_list:
             mock_item.assert_called()
 
+        # DBからの読み込みはウィンドウの最初の描画の後に行う
+        self.assertFalse(instance.is_initial_data_requested)
+        self.mock_single_shot.assert_not_called()
+        instance.mylist_db.select_schedule.assert_not_called()
+        self.mock_update_mylist_pane.assert_not_called()
+        self.mock_timer.assert_not_called()
+
         # 異常系: アイコンパスが不正な場合はデフォルトを使用する
         prev_path = nnmm.main_window.ICON_PATH
         nnmm.main_window.ICON_PATH = "not exist path"
@@ -122,11 +152,18 @@ class TestWindowMain(unittest.TestCase):
             self.enterContext(patch("nnmm.main_window.QTabWidget")),
             self.enterContext(patch("nnmm.main_window.MainWindow.create_mylist_tab_layout")),
             self.enterContext(patch("nnmm.main_window.MainWindow.create_config_tab_layout")),
-            self.enterContext(patch("nnmm.main_window.QTextEdit")),
+            self.enterContext(patch("nnmm.main_window.MainWindow.create_update_history_tab_layout")),
+            self.enterContext(patch("nnmm.main_window.QPlainTextEdit")),
+            self.enterContext(patch("nnmm.main_window.GuiLogSink")),
         ]
         instance = self._get_instance(use_create_layout=True)
+        self.assertIs(mock_list[4].return_value, instance.update_history_tab)
+        self.assertIs(mock_list[1].return_value, instance.tabs)
 
         self.assertTrue(hasattr(instance, "textarea"))
+        self.assertTrue(hasattr(instance, "log_sink"))
+        self.assertEqual(instance, nnmm.main_window.nnmm.util.window_cache)
+        nnmm.main_window.nnmm.util.window_cache = None
 
         expect_calls_list = [
             [call(), call().addWidget(mock_list[1].return_value)],
@@ -134,11 +171,15 @@ class TestWindowMain(unittest.TestCase):
                 call(),
                 call().addTab(mock_list[2].return_value, "マイリスト"),
                 call().addTab(mock_list[3].return_value, "設定"),
-                call().addTab(mock_list[4].return_value, "ログ"),
+                call().addTab(mock_list[4].return_value, "更新履歴"),
+                call().addTab(mock_list[5].return_value, "ログ"),
+                call().currentChanged.connect(instance.on_tab_changed),
             ],
             [call(1200, 850)],
             [call(1200, 850)],
+            [call(1200, 850)],
             [call(), call().setMinimumHeight(300)],
+            [call(mock_list[5].return_value, instance)],
         ]
 
         for expect_calls, mock_item in zip(expect_calls_list, mock_list):
@@ -200,6 +241,8 @@ class TestWindowMain(unittest.TestCase):
             self.enterContext(patch("nnmm.main_window.QTableWidget")),
             self.enterContext(patch("nnmm.main_window.MainWindow.table_context_menu")),
             self.enterContext(patch("nnmm.main_window.QGridLayout")),
+            self.enterContext(patch("nnmm.main_window.QProgressBar")),
+            self.enterContext(patch("nnmm.main_window.ProgressBus")),
         ]
 
         WINDOW_WIDTH = 1200
@@ -212,6 +255,10 @@ class TestWindowMain(unittest.TestCase):
         self.assertTrue(hasattr(instance, "oneline_log"))
         self.assertTrue(hasattr(instance, "table_widget"))
         self.assertTrue(hasattr(instance, "tbox_mylist_url"))
+        self.assertTrue(hasattr(instance, "progress_bar"))
+        self.assertTrue(hasattr(instance, "progress_bus"))
+        mock_list[12].assert_called_once_with(instance.oneline_log, instance.progress_bar, instance)
+        self.assertIn(call("更新中止", stop.Stop), mock_list[3].mock_calls)
 
         expect = [
             [
@@ -242,12 +289,18 @@ class TestWindowMain(unittest.TestCase):
                 call.customContextMenuRequested.connect(mock_list[9]),
             ],
             [],
+            [
+                call.setValue(0),
+                call.setTextVisible(True),
+                call.setFormat(""),
+            ],
         ]
         actual = [
             instance.list_widget.mock_calls,
             instance.oneline_log.mock_calls,
             instance.table_widget.mock_calls,
             instance.tbox_mylist_url.mock_calls,
+            instance.progress_bar.mock_calls,
         ]
         for e, a in zip(expect, actual, strict=True):
             self.assertEqual(e, a)
@@ -281,6 +334,7 @@ class TestWindowMain(unittest.TestCase):
             instance.process_helper("---", None),
             instance.process_helper("全動画表示", show_mylist_info_all.ShowMylistInfoAll),
             instance.process_helper("マイリストURLをクリップボードにコピー", copy_mylist_url.CopyMylistUrl),
+            instance.process_helper("全件再取得", single.SingleBackfill),
             instance.process_helper("---", None),
             instance.process_helper("視聴済にする（選択）", watched_mylist.WatchedMylist),
             instance.process_helper("視聴済にする（全て）", watched_all_mylist.WatchedAllMylist),
@@ -407,6 +461,121 @@ class TestWindowMain(unittest.TestCase):
         expected_call = call.addWidget(mock_list[5].return_value, alignment=Qt.AlignmentFlag.AlignRight)
         self.assertTrue(any(c == expected_call for c in vbox.mock_calls))
 
+    def test_create_update_history_tab_layout(self):
+        """更新履歴タブのレイアウトをテストする（create_update_history_tab_layout）"""
+        mock_list = [
+            self.enterContext(patch("nnmm.main_window.QGroupBox")),
+            self.enterContext(patch("nnmm.main_window.QVBoxLayout")),
+            self.enterContext(patch("nnmm.main_window.QLabel")),
+            self.enterContext(patch("nnmm.main_window.QTableWidget")),
+            self.enterContext(patch("nnmm.main_window.MainWindow.component_helper")),
+        ]
+
+        instance = self._get_instance()
+        actual = instance.create_update_history_tab_layout(1200, 850)
+        self.assertEqual(mock_list[0].return_value, actual)
+        mock_list[0].assert_called_once_with("更新履歴")
+        mock_list[1].assert_called_once_with(mock_list[0].return_value)
+
+        # 更新履歴とマイリストごとの取得時間の2つのテーブルを作成する
+        self.assertEqual(2, mock_list[3].call_count)
+        self.assertIs(mock_list[3].return_value, instance.update_run_table_widget)
+        self.assertIs(mock_list[3].return_value, instance.mylist_latency_table_widget)
+        table_widget = mock_list[3].return_value
+        table_widget.setSortingEnabled.assert_called_with(True)
+        table_widget.setEditTriggers.assert_called_with(QAbstractItemView.EditTrigger.NoEditTriggers)
+
+        mock_list[4].assert_called_once_with("再読込", update_history.ShowUpdateHistory)
+        vbox = mock_list[1].return_value
+        expected_call = call.addWidget(mock_list[4].return_value, alignment=Qt.AlignmentFlag.AlignRight)
+        self.assertEqual(expected_call, vbox.mock_calls[-1])
+
+    def test_on_tab_changed(self):
+        """更新履歴タブを表示したときに更新履歴を読み込む（on_tab_changed）"""
+        mock_show = self.enterContext(patch("nnmm.main_window.update_history.ShowUpdateHistory"))
+        instance = self._get_instance()
+        instance.tabs = MagicMock()
+        instance.update_history_tab = MagicMock()
+        instance.tabs.widget.side_effect = lambda index: instance.update_history_tab if index == 2 else MagicMock()
+
+        instance.on_tab_changed(0)
+        mock_show.assert_not_called()
+
+        instance.on_tab_changed(2)
+        mock_show.assert_called_once()
+        self.assertEqual("更新履歴表示", mock_show.call_args.args[0].name)
+        mock_show.return_value.callback.assert_called_once_with()
+
+    def test_paint_event(self):
+        """最初の描画の後にDBからの読み込みを予約する（paintEvent）のテスト"""
+        mock_paint_event = self.enterContext(patch("nnmm.main_window.QDialog.paintEvent"))
+        instance = self._get_instance()
+        event = MagicMock()
+
+        instance.paintEvent(event)
+        mock_paint_event.assert_called_once_with(event)
+        self.assertTrue(instance.is_initial_data_requested)
+        self.mock_single_shot.assert_called_once_with(0, instance.load_initial_data)
+
+        # 2回目以降の描画では予約しない
+        instance.paintEvent(event)
+        self.assertEqual(2, mock_paint_event.call_count)
+        self.mock_single_shot.assert_called_once_with(0, instance.load_initial_data)
+
+    def test_load_initial_data(self):
+        """DBからの初期データ読み込み（load_initial_data）のテスト"""
+        instance = self._get_instance()
+        mock_scheduler_load = self.enterContext(patch.object(instance.mylist_scheduler, "load"))
+        mock_circuit_breaker_load = self.enterContext(patch.object(instance.circuit_breaker, "load"))
+        schedule_list = [self._get_mylist_dict(1), self._get_mylist_dict(2)]
+        instance.mylist_db.select_schedule.return_value = schedule_list
+
+        actual = instance.load_initial_data()
+        self.assertEqual(Result.success, actual)
+        instance.mylist_db.select_schedule.assert_called_once_with()
+        mock_scheduler_load.assert_called_once_with(schedule_list)
+        mock_circuit_breaker_load.assert_called_once_with(schedule_list)
+        self.mock_update_mylist_pane.assert_called_once_with()
+        self.mock_timer.assert_called_once()
+        self.mock_timer.return_value.callback.assert_called_once_with()
+        self.assertEqual(self.mock_timer.return_value.callback.return_value, instance.time)
+
+        # スナップショットを表示していた場合は、表示を保ったままDBの内容で表示し直す
+        mock_callback_helper = self.enterContext(patch("nnmm.main_window.MainWindow.callback_helper"))
+        self.mock_update_mylist_pane.reset_mock()
+        instance.is_pane_snapshot_restored = True
+        actual = instance.load_initial_data()
+        self.assertEqual(Result.success, actual)
+        mock_callback_helper.assert_any_call("表示内容照合", pane_snapshot.ReconcilePaneSnapshot)
+        self.mock_update_mylist_pane.assert_not_called()
+
+    def test_pane_snapshot(self):
+        """表示内容の復元（restore_pane_snapshot）と保存（save_pane_snapshot）のテスト"""
+        mock_callback_helper = self.enterContext(patch("nnmm.main_window.MainWindow.callback_helper"))
+        mock_callback_helper.return_value.return_value = Result.success
+
+        # 復元は __init__ から呼ばれる
+        instance = self._get_instance(use_restore_pane_snapshot=True)
+        self.assertTrue(instance.is_pane_snapshot_restored)
+        mock_callback_helper.assert_any_call("表示内容復元", pane_snapshot.RestorePaneSnapshot)
+
+        mock_callback_helper.reset_mock()
+        mock_callback_helper.return_value.return_value = Result.failed
+        actual = instance.restore_pane_snapshot()
+        self.assertEqual(Result.failed, actual)
+        self.assertFalse(instance.is_pane_snapshot_restored)
+        self.assertEqual(
+            [call("表示内容復元", pane_snapshot.RestorePaneSnapshot), call()()], mock_callback_helper.mock_calls
+        )
+
+        mock_callback_helper.reset_mock()
+        mock_callback_helper.return_value.return_value = Result.success
+        actual = instance.save_pane_snapshot()
+        self.assertEqual(Result.success, actual)
+        self.assertEqual(
+            [call("表示内容保存", pane_snapshot.SavePaneSnapshot), call()()], mock_callback_helper.mock_calls
+        )
+
     def test_update_mylist_pane(self):
         """マイリスト表示更新（update_mylist_pane）のテスト"""
         # create_layout はデフォルトでモックされるようにしてインスタンス作成
@@ -1,11 +1,24 @@
 import random
 import re
+import sqlite3
 import sys
+import tempfile
+import threading
 import unittest
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
 
+from mock import MagicMock, patch
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from nnmm.db_controller_base import DBControllerBase
 from nnmm.model import Mylist
 from nnmm.mylist_db_controller import MylistDBController
+from nnmm.mylist_info_db_controller import MylistInfoDBController
+
+OLD_FORMAT_DB_PATH = "./tests/cache/old_format_NNMM_DB.db"
 
 
 class TestMylistDBController(unittest.TestCase):
@@ -125,6 +138,15 @@ class TestMylistDBController(unittest.TestCase):
         r = Mylist(ml[0], ml[1], ml[2], ml[3], ml[4], mylist_url, ml[5], ml[6], ml[7], ml[8], ml[9], ml[10])
         return r
 
+    def _get_next_check_at(self, mylist_url: str) -> tuple[int | None, int | None]:
+        """(check_interval_minutes, next_check_at) をDBから直接取得する"""
+        with Session(self.controller.engine) as session:
+            record = session.query(Mylist).filter(Mylist.url == mylist_url).one()
+            return (record.check_interval_minutes, record.next_check_at)
+
+    def _epoch(self, datetime_str: str) -> int:
+        return int(datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S").timestamp())
+
     def _load_table(self) -> list[dict]:
         """テスト用の初期レコードを格納したテーブルを用意する
 
@@ -307,6 +329,9 @@ class TestMylistDBController(unittest.TestCase):
         res = controller.update_checked_at(mylist_url, dst)
         self.assertEqual(res, 0)
 
+        # 次回更新確認日時も求め直される
+        self.assertEqual((15, self._epoch(dst) + 15 * 60), self._get_next_check_at(mylist_url))
+
         for r in expect:
             if r["url"] == mylist_url:
                 r["checked_at"] = dst
@@ -320,6 +345,76 @@ class TestMylistDBController(unittest.TestCase):
         res = controller.update_checked_at("https://www.nicovideo.jp/user/99999999/video", dst)
         self.assertEqual(res, -1)
 
+    def test_update_checked_at_adaptive(self):
+        """適応的インターバルで更新確認インターバルを伸縮させる機能のテスト"""
+        controller = self.controller
+        expect = self._load_table()
+        r = expect[0]
+        mylist_url = r["url"]
+        max_minutes = 60 * 24
+
+        # 新着がなければインターバルを2倍ずつ伸ばし、上限で止める
+        # 最後に新着があったのは1ヶ月前とする
+        r["updated_at"] = "2021-09-17 00:00:11"
+        controller.update_updated_at(mylist_url, r["updated_at"])
+        checked_at = datetime.strptime(r["checked_at"], "%Y-%m-%d %H:%M:%S")
+        interval = 15
+        for expect_interval in [30, 60, 120, 240, 480, 960, 1440, 1440]:
+            checked_at = checked_at + timedelta(minutes=interval)
+            dst = checked_at.strftime("%Y-%m-%d %H:%M:%S")
+            res = controller.update_checked_at(mylist_url, dst, False, max_minutes)
+            self.assertEqual(0, res)
+            self.assertEqual(
+                (expect_interval, self._epoch(dst) + expect_interval * 60), self._get_next_check_at(mylist_url)
+            )
+            interval = expect_interval
+
+        # インターバル設定を変更しない UPSERT では伸ばした値を保持する
+        r["checked_at"] = dst
+        controller.upsert(*r.values())
+        self.assertEqual((1440, self._epoch(dst) + 1440 * 60), self._get_next_check_at(mylist_url))
+
+        # 新着があれば基準インターバルに戻す
+        controller.update_checked_at(mylist_url, dst, True, max_minutes)
+        self.assertEqual((15, self._epoch(dst) + 15 * 60), self._get_next_check_at(mylist_url))
+
+        # 最後に新着があってからの経過時間の 1/4 を超えて伸ばさない
+        controller.update_updated_at(mylist_url, dst)
+        dst = (checked_at + timedelta(minutes=15)).strftime("%Y-%m-%d %H:%M:%S")
+        controller.update_checked_at(mylist_url, dst, False, max_minutes)
+        self.assertEqual((15, self._epoch(dst) + 15 * 60), self._get_next_check_at(mylist_url))
+        dst = (checked_at + timedelta(minutes=240)).strftime("%Y-%m-%d %H:%M:%S")
+        controller.update_checked_at(mylist_url, dst, False, max_minutes)
+        self.assertEqual((30, self._epoch(dst) + 30 * 60), self._get_next_check_at(mylist_url))
+
+        # インターバル設定を変更した UPSERT では伸ばした値を破棄する
+        controller.update_checked_at(mylist_url, dst, False, max_minutes)
+        self.assertEqual(60, self._get_next_check_at(mylist_url)[0])
+        r["checked_at"] = dst
+        r["check_interval"] = "30分"
+        controller.upsert(*r.values())
+        self.assertEqual((30, self._epoch(dst) + 30 * 60), self._get_next_check_at(mylist_url))
+
+        # 上限が基準インターバルより小さい場合は基準インターバル
+        controller.update_checked_at(mylist_url, dst, False, 10)
+        self.assertEqual(30, self._get_next_check_at(mylist_url)[0])
+
+        # 適応的インターバルを用いない場合は基準インターバルに戻す
+        controller.update_checked_at(mylist_url, dst, False, max_minutes)
+        self.assertEqual(60, self._get_next_check_at(mylist_url)[0])
+        controller.update_checked_at(mylist_url, dst)
+        self.assertEqual((30, self._epoch(dst) + 30 * 60), self._get_next_check_at(mylist_url))
+
+        # インターバル文字列が解釈できない場合は未設定, 更新確認のたびにエラーログに出力する
+        mock_logger = self.enterContext(patch("nnmm.mylist_db_controller.logger"))
+        r["check_interval"] = "invalid"
+        controller.upsert(*r.values())
+        mock_logger.reset_mock()
+        controller.update_checked_at(mylist_url, dst, False, max_minutes)
+        self.assertEqual((None, None), self._get_next_check_at(mylist_url))
+        mock_logger.error.assert_called_once()
+        self.assertIn(mylist_url, mock_logger.error.call_args.args[0])
+
     def test_update_check_failed_count(self):
         controller = self.controller
         expect = self._load_table()
@@ -476,6 +571,337 @@ class TestMylistDBController(unittest.TestCase):
         actual = controller.select_from_url("存在しないマイリストurl")
         self.assertEqual([], actual)
 
+    def test_next_check_at(self):
+        """check_interval_minutes, next_check_at がINSERT, UPDATE時に設定される機能のテスト"""
+        controller = self.controller
+        expect = self._load_table()
+
+        r = expect[0]
+        self.assertEqual((15, self._epoch(r["checked_at"]) + 15 * 60), self._get_next_check_at(r["url"]))
+
+        # インターバルを変更した場合
+        controller.upsert(*[v if k != "check_interval" else "1日" for k, v in r.items()])
+        self.assertEqual((60 * 24, self._epoch(r["checked_at"]) + 60 * 24 * 60), self._get_next_check_at(r["url"]))
+
+        # インターバル文字列が解釈できない場合は未設定, インターバル更新の対象とならないことをエラーログに出力する
+        mock_logger = self.enterContext(patch("nnmm.mylist_db_controller.logger"))
+        controller.upsert(*[v if k != "check_interval" else "invalid" for k, v in r.items()])
+        self.assertEqual((None, None), self._get_next_check_at(r["url"]))
+        mock_logger.error.assert_called_once()
+        self.assertIn(r["url"], mock_logger.error.call_args.args[0])
+        self.assertIn("invalid", mock_logger.error.call_args.args[0])
+
+        # 解釈できる場合は出力しない
+        mock_logger.reset_mock()
+        controller.upsert(*r.values())
+        new_r = r | {
+            "id": 99,
+            "showname": "投稿者99さんの投稿動画",
+            "url": "https://www.nicovideo.jp/user/99999999/video",
+        }
+        controller.upsert(*new_r.values())
+        mock_logger.error.assert_not_called()
+
+        # to_dict には含まない
+        self.assertNotIn("next_check_at", controller.select()[0])
+        self.assertEqual(Mylist.__table__.c.keys()[:-2], Mylist.column_keys())
+
+    def test_select_due(self):
+        """次回更新確認日時を過ぎたマイリストをSELECTする機能のテスト"""
+        controller = self.controller
+        expect = self._load_table()
+
+        # 2021-10-17 00:00:11 ～ 00:22:11 に更新確認、インターバルは15分
+        now = datetime(2021, 10, 17, 0, 30, 0)
+        actual = controller.select_due(now)
+        sorted_expect = sorted(expect, key=lambda r: r["checked_at"])
+        expect_url = [r["url"] for r in sorted_expect if r["checked_at"] < "2021-10-17 00:15:00"]
+        self.assertEqual(expect_url, [r["url"] for r in actual])
+        self.assertEqual(expect[0], actual[0])
+
+        # 更新確認失敗カウントが上限以上のマイリストは対象とせず、警告ログに出力する
+        mock_logger = self.enterContext(patch("nnmm.mylist_db_controller.logger"))
+        for _ in range(3):
+            controller.update_check_failed_count(expect[0]["url"])
+        actual = controller.select_due(now, max_check_failed_count=3)
+        self.assertEqual(expect_url[1:], [r["url"] for r in actual])
+        mock_logger.warning.assert_called_once()
+        self.assertIn(expect[0]["url"], mock_logger.warning.call_args.args[0])
+        self.assertIn(expect[0]["showname"], mock_logger.warning.call_args.args[0])
+
+        # 上限なしなら更新確認失敗カウントによらず対象とする
+        mock_logger.reset_mock()
+        actual = controller.select_due(now, max_check_failed_count=None)
+        self.assertEqual(expect_url, [r["url"] for r in actual])
+        mock_logger.warning.assert_not_called()
+
+        # 期限を過ぎていないマイリストは上限以上でも出力しない
+        actual = controller.select_due(now - timedelta(days=1), max_check_failed_count=3)
+        self.assertEqual([], actual)
+        mock_logger.warning.assert_not_called()
+
+        # 期限を過ぎたマイリストがない場合
+        actual = controller.select_due(now - timedelta(days=1))
+        self.assertEqual([], actual)
+
+        # 基準日時を省略した場合は現在日時
+        actual = controller.select_due()
+        self.assertEqual(len(expect), len(actual))
+
+    def test_select_stats(self):
+        """Mylistの件数などの統計をSELECTする機能のテスト"""
+        controller = self.controller
+
+        # レコードが無い場合
+        expect = {
+            "mylist_num": 0,
+            "include_new_num": 0,
+            "failing_mylist_num": 0,
+            "tripped_mylist_num": 0,
+            "due_num": 0,
+            "next_check_at": None,
+        }
+        self.assertEqual(expect, controller.select_stats())
+
+        records = self._load_table()
+        for _ in range(3):
+            controller.update_check_failed_count(records[0]["url"])
+        controller.update_check_failed_count(records[1]["url"])
+
+        # 2021-10-17 00:00:11 ～ 00:22:11 に更新確認、インターバルは15分
+        now = datetime(2021, 10, 17, 0, 30, 0)
+        next_check_at_list = [self._epoch(r["checked_at"]) + 15 * 60 for r in records]
+        expect = {
+            "mylist_num": len(records),
+            "include_new_num": sum(1 for r in records if r["is_include_new"]),
+            "failing_mylist_num": 2,
+            "tripped_mylist_num": 1,
+            "due_num": sum(1 for t in next_check_at_list if t <= now.timestamp()),
+            "next_check_at": min(next_check_at_list),
+        }
+        actual = controller.select_stats(now, tripped_check_failed_count=3)
+        self.assertEqual(expect, actual)
+        # select_due の上限なしの場合と一致する
+        self.assertEqual(len(controller.select_due(now, max_check_failed_count=None)), actual["due_num"])
+
+        # 基準日時を省略した場合は現在日時
+        actual = controller.select_stats()
+        self.assertEqual(len(records), actual["due_num"])
+        self.assertEqual(0, actual["tripped_mylist_num"])
+
+    def test_select_schedule(self):
+        """MylistScheduler に登録するための列をSELECTする機能のテスト"""
+        controller = self.controller
+        expect = self._load_table()
+        controller.update_checked_at(expect[1]["url"], expect[1]["checked_at"], False, 60)
+
+        def to_schedule_dict(r: dict, interval: int) -> dict:
+            return {
+                "url": r["url"],
+                "checked_at": r["checked_at"],
+                "check_interval": r["check_interval"],
+                "check_failed_count": r["check_failed_count"],
+                "check_interval_minutes": interval,
+                "next_check_at": self._epoch(r["checked_at"]) + interval * 60,
+            }
+
+        actual = controller.select_schedule()
+        expect_list = [to_schedule_dict(r, 30 if i == 1 else 15) for i, r in enumerate(expect)]
+        self.assertEqual(expect_list, actual)
+
+        # urlを指定した場合
+        actual = controller.select_schedule(expect[1]["url"])
+        self.assertEqual([expect_list[1]], actual)
+
+        # 存在しないurlを指定する
+        actual = controller.select_schedule("存在しないマイリストurl")
+        self.assertEqual([], actual)
+
+    def test_migrate_next_check_at(self):
+        """check_interval_minutes, next_check_at 列を持たない旧形式のDBを移行する機能のテスト"""
+        db_path = Path(OLD_FORMAT_DB_PATH)
+        db_path.unlink(missing_ok=True)
+        self.addCleanup(db_path.unlink, missing_ok=True)
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE Mylist (id INTEGER NOT NULL, username VARCHAR(256) NOT NULL, "
+            "mylistname VARCHAR(256) NOT NULL, type VARCHAR(256), showname VARCHAR(256) NOT NULL UNIQUE, "
+            "url VARCHAR(512) NOT NULL UNIQUE, created_at VARCHAR(256), updated_at VARCHAR(256), "
+            "checked_at VARCHAR(256), check_interval VARCHAR(256), check_failed_count INTEGER, "
+            "is_include_new BOOLEAN DEFAULT (True), PRIMARY KEY (id))"
+        )
+        old_records = [
+            (1, "u", "m", "uploaded", "s1", "url_1", "", "", "2021-10-17 00:00:00", "15分", 0, False),
+            (2, "u", "m", "uploaded", "s2", "url_2", "", "", "2021-10-17 00:00:00", "2時間", 0, False),
+            (3, "u", "m", "uploaded", "s3", "url_3", "", "", "2021-10-17 00:00:00", "invalid", 0, False),
+        ]
+        conn.executemany("INSERT INTO Mylist VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", old_records)
+        conn.commit()
+        conn.close()
+
+        mock_logger = self.enterContext(patch("nnmm.mylist_db_controller.logger"))
+        self.controller = MylistDBController(str(db_path))
+        self.assertEqual((15, self._epoch("2021-10-17 00:15:00")), self._get_next_check_at("url_1"))
+        self.assertEqual((120, self._epoch("2021-10-17 02:00:00")), self._get_next_check_at("url_2"))
+        self.assertEqual((None, None), self._get_next_check_at("url_3"))
+        # インターバル文字列が解釈できないレコードはエラーログに出力する
+        mock_logger.error.assert_called_once()
+        self.assertIn("url_3", mock_logger.error.call_args.args[0])
+        self.assertIn("s3", mock_logger.error.call_args.args[0])
+
+        conn = sqlite3.connect(db_path)
+        index_list = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+        conn.close()
+        self.assertIn(("ix_Mylist_next_check_at",), index_list)
+
+        # 移行済のDBに再度適用しても何もしない
+        self.assertEqual(0, self.controller.migrate_next_check_at())
+        actual = self.controller.select_due(datetime(2021, 10, 17, 1, 0, 0))
+        self.assertEqual(["url_1"], [r["url"] for r in actual])
+        self.controller.engine.dispose()
+
+    def test_run_schema_task_once(self):
+        """スキーマの確認・移行処理を同じDBファイルに対して1度だけ行う機能のテスト"""
+        self.enterContext(patch.object(DBControllerBase, "_done_schema_task_set", set()))
+        temp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        db_path = temp_dir / "NNMM_DB.db"
+
+        # 初回はテーブル作成と移行を行い、同じDBファイルを指す2つ目以降のコントローラーでは省略する
+        mylist_db = MylistDBController(str(db_path))
+        self.addCleanup(mylist_db.engine.dispose)
+        mylist_info_db = MylistInfoDBController(str(db_path))
+        self.addCleanup(mylist_info_db.engine.dispose)
+        inode = db_path.stat().st_ino
+        expect = {
+            ("create_all", str(db_path.resolve()), inode),
+            ("migrate_next_check_at", str(db_path.resolve()), inode),
+        }
+        self.assertEqual(expect, DBControllerBase._done_schema_task_set)
+
+        func = MagicMock()
+        self.assertFalse(mylist_info_db.run_schema_task_once("create_all", func))
+        func.assert_not_called()
+        self.assertTrue(mylist_info_db.run_schema_task_once("other_task", func))
+        func.assert_called_once_with()
+        self.assertFalse(mylist_db.run_schema_task_once("other_task", func))
+        func.assert_called_once_with()
+
+        # インメモリDBはエンジンごとに別のDBとなるため、常に処理を行う
+        func.reset_mock()
+        self.assertTrue(self.controller.run_schema_task_once("create_all", func))
+        self.assertTrue(self.controller.run_schema_task_once("create_all", func))
+        self.assertEqual(2, func.call_count)
+        self.assertEqual(3, len(DBControllerBase._done_schema_task_set))
+
+        # 作成前のDBファイルは処理を行った後に記録する
+        other_path = temp_dir / "other_NNMM_DB.db"
+        other_db = MylistDBController(str(other_path))
+        self.addCleanup(other_db.engine.dispose)
+        self.assertIn(
+            ("create_all", str(other_path.resolve()), other_path.stat().st_ino), DBControllerBase._done_schema_task_set
+        )
+        self.assertEqual(5, len(DBControllerBase._done_schema_task_set))
+
+    def _upsert_video(self, mylist_info_db: MylistInfoDBController, mylist_url: str) -> None:
+        """mylist_url のマイリストに動画を1件格納する"""
+        mylist_info_db.upsert(
+            "sm11111111",
+            "動画タイトル1",
+            "投稿者1",
+            "未視聴",
+            "2021-05-29 22:00:11",
+            "2021-05-29 22:01:11",
+            "https://www.nicovideo.jp/watch/sm11111111",
+            mylist_url,
+            "2021-10-16 00:00:11",
+        )
+
+    def _make_file_db(self, mylist_url_list: list[str]) -> tuple[Path, MylistInfoDBController]:
+        """一時ディレクトリのDBファイルに、mylist_url_list の各マイリストの動画を1件ずつ格納する"""
+        temp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        db_path = temp_dir / "NNMM_DB.db"
+        mylist_info_db = MylistInfoDBController(str(db_path))
+        self.addCleanup(mylist_info_db.engine.dispose)
+        for mylist_url in mylist_url_list:
+            self._upsert_video(mylist_info_db, mylist_url)
+        return db_path, mylist_info_db
+
+    def test_engine(self):
+        """DBファイルとインメモリDBの接続設定のテスト"""
+        # インメモリDBは1つの接続を使い回す
+        self.assertIsInstance(self.controller.engine.pool, StaticPool)
+
+        # DBファイルはスレッドごとに別の接続を払い出し、WAL モードで開く
+        db_path, mylist_info_db = self._make_file_db([])
+        self.assertIsInstance(mylist_info_db.engine.pool, QueuePool)
+        with mylist_info_db.engine.connect() as conn:
+            self.assertEqual("wal", conn.exec_driver_sql("PRAGMA journal_mode").scalar())
+
+        # 同時に使用できる接続数に上限はなく、接続の返却待ちで例外とならない
+        thread_num = 16
+        barrier = threading.Barrier(thread_num, timeout=10)
+
+        def hold_connection() -> None:
+            with mylist_info_db.engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+                barrier.wait()
+
+        with ThreadPoolExecutor(max_workers=thread_num) as executor:
+            futures = [executor.submit(hold_connection) for _ in range(thread_num)]
+        for future in futures:
+            future.result()
+
+    def test_concurrent_access(self):
+        """DBファイルを複数のスレッドから並行して読み書きするテスト"""
+        mylist_url_list = [f"https://www.nicovideo.jp/user/{10000000 + i}/video" for i in range(8)]
+        db_path, mylist_info_db = self._make_file_db(mylist_url_list)
+
+        # 読み込みと書き込みを並行して繰り返してもエラーとならない
+        def worker(mylist_url: str) -> None:
+            for i in range(50):
+                self.assertEqual(1, len(mylist_info_db.select_status_from_mylist_url(mylist_url)))
+                self.assertEqual(0, mylist_info_db.update_status("sm11111111", mylist_url, "" if i % 2 else "未視聴"))
+
+        with ThreadPoolExecutor(max_workers=len(mylist_url_list)) as executor:
+            futures = [executor.submit(worker, mylist_url) for mylist_url in mylist_url_list]
+        for future in futures:
+            future.result()
+        self.assertEqual(len(mylist_url_list), len(mylist_info_db.select()))
+
+        # 他の接続が書き込み中（未コミット）でも、コミット済の内容を待たずに読み込める
+        mylist_url = mylist_url_list[0]
+        writer = sqlite3.connect(db_path, isolation_level=None)
+        self.addCleanup(writer.close)
+        writer.execute("BEGIN EXCLUSIVE")
+        writer.execute("UPDATE MylistInfo SET status = '' WHERE mylist_url = ?", (mylist_url,))
+        self.assertEqual({"sm11111111": ""}, mylist_info_db.select_status_from_mylist_url(mylist_url))
+        writer.execute("ROLLBACK")
+
+    def test_close(self):
+        """未反映の書き込みをDBファイル本体に反映させて接続を閉じる機能のテスト"""
+        mylist_url = "https://www.nicovideo.jp/user/10000000/video"
+        db_path, mylist_info_db = self._make_file_db([mylist_url])
+        wal_path = Path(f"{db_path}-wal")
+        self.assertTrue(wal_path.exists())
+
+        mylist_info_db.close()
+        self.assertEqual(0, mylist_info_db.engine.pool.checkedin())
+        self.assertFalse(wal_path.exists())
+
+        # DBファイル本体のみで内容が読める
+        conn = sqlite3.connect(db_path)
+        self.addCleanup(conn.close)
+        self.assertEqual([(mylist_url,)], conn.execute("SELECT mylist_url FROM MylistInfo").fetchall())
+
+        # 閉じた後も再度アクセスすれば新しく接続を張る
+        self.assertEqual(1, len(mylist_info_db.select()))
+
+        # インメモリDBは接続を閉じると失われるため何もしない
+        memory_db = MylistInfoDBController(":memory:")
+        self._upsert_video(memory_db, mylist_url)
+        memory_db.close()
+        self.assertEqual(1, len(memory_db.select()))
+
 
 if __name__ == "__main__":
     if sys.argv:
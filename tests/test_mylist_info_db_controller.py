@@ -508,6 +508,39 @@ class TestMylistInfoDBController(unittest.TestCase):
         actual = controller.select_from_mylist_url(error_mylist_url)
         self.assertEqual(actual, [])
 
+    def test_select_status_from_mylist_url(self):
+        """MylistInfoからmylist_urlを条件として動画IDと視聴状況のみをSELECTする機能のテスト"""
+        controller = self.controller
+        expect = self._load_table()
+
+        for mylist_url in self._get_mylist_url_list():
+            actual = controller.select_status_from_mylist_url(mylist_url)
+            self.assertTrue(len(actual) > 0)
+            expect_dict = {e["video_id"]: e["status"] for e in expect if e["mylist_url"] == mylist_url}
+            self.assertEqual(expect_dict, actual)
+
+        # 存在しないmylist_urlを指定する
+        error_mylist_url = "https://www.nicovideo.jp/user/99999999/mylist/99999999"
+        actual = controller.select_status_from_mylist_url(error_mylist_url)
+        self.assertEqual({}, actual)
+
+    def test_select_status_count(self):
+        """MylistInfoの視聴状況ごとのレコード数をSELECTする機能のテスト"""
+        controller = self.controller
+
+        # レコードが無い場合
+        self.assertEqual({}, controller.select_status_count())
+
+        expect = self._load_table()
+        controller.update_status(expect[0]["video_id"], expect[0]["mylist_url"], "")
+        expect[0]["status"] = ""
+        expect_dict = {}
+        for e in expect:
+            expect_dict[e["status"]] = expect_dict.get(e["status"], 0) + 1
+        actual = controller.select_status_count()
+        self.assertEqual(expect_dict, actual)
+        self.assertEqual(len(expect), sum(actual.values()))
+
     def test_select_from_username(self):
         """MylistInfoからusernameを条件としてSELECTする機能のテスト"""
         controller = self.controller
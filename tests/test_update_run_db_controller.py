@@ -0,0 +1,138 @@
+import sys
+import unittest
+
+from mock import patch
+
+from nnmm.model import UpdateRun
+from nnmm.update_run_db_controller import UpdateRunDBController
+
+MYLIST_URL_LIST = [
+    "https://www.nicovideo.jp/user/10000001/video",
+    "https://www.nicovideo.jp/user/10000002/video",
+]
+
+
+class TestUpdateRunDBController(unittest.TestCase):
+    def setUp(self):
+        self.controller = UpdateRunDBController(":memory:")
+
+    def _make_run(self, index: int = 1) -> dict:
+        return {
+            "kind": "Every mylist",
+            "version": "2.1.0",
+            "started_at": f"2023-12-22 12:34:0{index}",
+            "finished_at": f"2023-12-22 12:35:0{index}",
+            "elapsed_sec": 60.0,
+            "target_num": 2,
+            "success_num": 1,
+            "failed_num": 1,
+            "cancelled_num": 0,
+            "new_video_num": index,
+            "bytes": 1024,
+            "stage_total_ms": {"page_request": 10.0 * index, "db_write": 5.0},
+        }
+
+    def _make_mylist_fetch_list(self, fetched_at: str, is_success_list: list[bool]) -> list[dict]:
+        return [
+            {
+                "mylist_url": mylist_url,
+                "fetched_at": fetched_at,
+                "latency_ms": 100.0 * (i + 1),
+                "is_success": is_success,
+            }
+            for i, (mylist_url, is_success) in enumerate(zip(MYLIST_URL_LIST, is_success_list))
+        ]
+
+    def test_insert(self):
+        run = self._make_run(1)
+        actual = self.controller.insert(run, self._make_mylist_fetch_list("2023-12-22 12:35:01", [True, False]))
+        self.assertEqual(1, actual)
+        self.assertEqual([{"id": 1} | run], self.controller.select())
+
+        expect = [
+            {
+                "mylist_url": MYLIST_URL_LIST[1],
+                "fetched_at": "2023-12-22 12:35:01",
+                "latency_ms": 200.0,
+                "is_success": False,
+                "fetch_count": 1,
+                "failed_count": 1,
+            },
+            {
+                "mylist_url": MYLIST_URL_LIST[0],
+                "fetched_at": "2023-12-22 12:35:01",
+                "latency_ms": 100.0,
+                "is_success": True,
+                "fetch_count": 1,
+                "failed_count": 0,
+            },
+        ]
+        self.assertEqual(expect, self.controller.select_fetch_latency())
+
+        # 直近の値は上書きし、回数は加算する
+        mylist_fetch_list = self._make_mylist_fetch_list("2023-12-22 12:35:02", [False, True])
+        mylist_fetch_list[1]["latency_ms"] = None
+        actual = self.controller.insert(self._make_run(2), mylist_fetch_list)
+        self.assertEqual(2, actual)
+        expect = [
+            {
+                "mylist_url": MYLIST_URL_LIST[0],
+                "fetched_at": "2023-12-22 12:35:02",
+                "latency_ms": 100.0,
+                "is_success": False,
+                "fetch_count": 2,
+                "failed_count": 1,
+            },
+            {
+                "mylist_url": MYLIST_URL_LIST[1],
+                "fetched_at": "2023-12-22 12:35:02",
+                "latency_ms": None,
+                "is_success": True,
+                "fetch_count": 2,
+                "failed_count": 1,
+            },
+        ]
+        self.assertEqual(expect, self.controller.select_fetch_latency())
+
+        # マイリストごとの結果がなくても更新履歴は追加する
+        actual = self.controller.insert(self._make_run(3), [])
+        self.assertEqual(3, actual)
+        self.assertEqual([3, 2, 1], [r["id"] for r in self.controller.select()])
+
+        # 失敗時は何も書き込まない
+        with patch("nnmm.update_run_db_controller.UpdateRun", side_effect=ValueError):
+            actual = self.controller.insert(self._make_run(4), self._make_mylist_fetch_list("", [True, True]))
+        self.assertEqual(-1, actual)
+        self.assertEqual(3, len(self.controller.select()))
+        self.assertEqual(2, self.controller.select_fetch_latency()[0]["fetch_count"])
+
+    def test_insert_max_run_num(self):
+        # MAX_RUN_NUM を超えた古い更新履歴は削除する
+        self.enterContext(patch.object(UpdateRunDBController, "MAX_RUN_NUM", 3))
+        for i in range(1, 6):
+            self.controller.insert(self._make_run(i), [])
+        self.assertEqual([5, 4, 3], [r["id"] for r in self.controller.select()])
+
+    def test_select(self):
+        self.assertEqual([], self.controller.select())
+        for i in range(1, 4):
+            self.controller.insert(self._make_run(i), [])
+
+        actual = self.controller.select()
+        self.assertEqual([3, 2, 1], [r["id"] for r in actual])
+        self.assertEqual({"page_request": 30.0, "db_write": 5.0}, actual[0]["stage_total_ms"])
+
+        actual = self.controller.select(2)
+        self.assertEqual([3, 2], [r["id"] for r in actual])
+
+    def test_model(self):
+        r = UpdateRun(*self._make_run(1).values())
+        self.assertEqual('{"page_request":10.0,"db_write":5.0}', r.stage_total_ms)
+        self.assertEqual(self._make_run(1), {k: v for k, v in r.to_dict().items() if k != "id"})
+        self.assertEqual("<UpdateRun(id='None', started_at='2023-12-22 12:34:01')>", repr(r))
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -0,0 +1,271 @@
+import logging
+import sys
+import tempfile
+import threading
+import unittest
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+import orjson
+from mock import MagicMock, patch
+
+from nnmm.update_trace import (
+    Span,
+    SpanStage,
+    UpdateTrace,
+    bind,
+    get_log_dir,
+    is_tracing,
+    save_trace_report,
+    span,
+)
+
+MYLIST_URL = "https://www.nicovideo.jp/user/10000001/video"
+MYLIST_URL_2 = "https://www.nicovideo.jp/user/10000002/video"
+
+
+class TestUpdateTrace(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.update_trace.logger"))
+
+    def _make_trace(self) -> UpdateTrace:
+        """MYLIST_URL に page_request 10件(1~10ms), MYLIST_URL_2 に db_write 1件(100ms) を記録した UpdateTrace"""
+        trace = UpdateTrace()
+        for i in range(1, 11):
+            attrs = {"status_code": 200 if i < 10 else 404, "bytes": 100, "retry_count": 1 if i == 1 else 0}
+            trace.record(SpanStage.page_request, MYLIST_URL, 0.0, i / 1000, attrs)
+        trace.record(SpanStage.db_write, MYLIST_URL_2, 0.5, 0.6, {"error": "ValueError"})
+        return trace
+
+    def test_span(self):
+        instance = Span(SpanStage.parse, MYLIST_URL, 0.0, 0.001, 1, "thread", {"kind": "page"})
+        expect = {
+            "stage": "parse",
+            "mylist_url": MYLIST_URL,
+            "start_ms": 0.0,
+            "duration_ms": 1.0,
+            "thread_id": 1,
+            "thread_name": "thread",
+            "attrs": {"kind": "page"},
+        }
+        self.assertEqual(expect, instance.to_dict())
+
+        params_list = [
+            ("parse", MYLIST_URL, 0.0, 0.0, 1, "thread", {}),
+            (SpanStage.parse, None, 0.0, 0.0, 1, "thread", {}),
+            (SpanStage.parse, MYLIST_URL, 0, 0.0, 1, "thread", {}),
+            (SpanStage.parse, MYLIST_URL, 0.0, -1.0, 1, "thread", {}),
+            (SpanStage.parse, MYLIST_URL, 0.0, 0.0, 1, "thread", []),
+        ]
+        for params in params_list:
+            with self.assertRaises(ValueError):
+                instance = Span(*params)
+
+    def test_record(self):
+        trace = UpdateTrace()
+        self.assertIsNone(trace.elapsed)
+        actual = trace.record(SpanStage.diff, MYLIST_URL, 1.0, 1.5)
+        self.assertEqual(SpanStage.diff, actual.stage)
+        self.assertEqual(MYLIST_URL, actual.mylist_url)
+        self.assertEqual(0.5, actual.duration)
+        self.assertEqual(threading.current_thread().ident, actual.thread_id)
+        self.assertEqual({}, actual.attrs)
+        self.assertEqual([actual], trace.span_list)
+
+        # 終了時刻が開始時刻より前でも所要時間は 0 とする
+        actual = trace.record(SpanStage.diff, MYLIST_URL, 1.0, 0.5)
+        self.assertEqual(0.0, actual.duration)
+
+        trace.finish()
+        self.assertIsInstance(trace.elapsed, float)
+
+    def test_percentile(self):
+        value_list = [float(i) for i in range(1, 21)]
+        self.assertEqual(10.0, UpdateTrace.percentile(value_list, 50))
+        self.assertEqual(19.0, UpdateTrace.percentile(value_list, 95))
+        self.assertEqual(20.0, UpdateTrace.percentile(value_list, 100))
+        self.assertEqual(1.0, UpdateTrace.percentile(value_list, 0))
+        self.assertEqual(3.0, UpdateTrace.percentile([3.0], 95))
+        self.assertEqual(0.0, UpdateTrace.percentile([], 50))
+
+    def test_summarize(self):
+        actual = self._make_trace().summarize()
+        # 記録のない段階は含めず、SpanStage の順に並ぶ
+        self.assertEqual(["page_request", "db_write"], list(actual.keys()))
+
+        page_request = actual["page_request"]
+        self.assertEqual(10, page_request["count"])
+        self.assertEqual(0, page_request["error_count"])
+        self.assertAlmostEqual(55.0, page_request["total_ms"])
+        self.assertAlmostEqual(5.0, page_request["p50_ms"])
+        self.assertAlmostEqual(10.0, page_request["p95_ms"])
+        self.assertAlmostEqual(10.0, page_request["max_ms"])
+        self.assertEqual(1000, page_request["bytes"])
+        self.assertEqual(1, page_request["retry_count"])
+        self.assertEqual({"200": 9, "404": 1}, page_request["status_codes"])
+
+        db_write = actual["db_write"]
+        self.assertEqual(1, db_write["count"])
+        self.assertEqual(1, db_write["error_count"])
+        self.assertAlmostEqual(100.0, db_write["p50_ms"])
+        self.assertEqual(0, db_write["bytes"])
+        self.assertEqual({}, db_write["status_codes"])
+
+        self.assertEqual({}, UpdateTrace().summarize())
+
+    def test_slowest_mylists(self):
+        actual = self._make_trace().slowest_mylists()
+        self.assertEqual([MYLIST_URL_2, MYLIST_URL], [m["mylist_url"] for m in actual])
+        self.assertAlmostEqual(100.0, actual[0]["total_ms"])
+        self.assertEqual(["page_request"], list(actual[1]["stages"].keys()))
+        self.assertAlmostEqual(55.0, actual[1]["stages"]["page_request"])
+
+        # SLOWEST_MYLIST_NUM 件までとする
+        trace = UpdateTrace()
+        for i in range(UpdateTrace.SLOWEST_MYLIST_NUM + 5):
+            trace.record(SpanStage.diff, f"https://www.nicovideo.jp/user/{i}/video", 0.0, i / 1000)
+        actual = trace.slowest_mylists()
+        self.assertEqual(UpdateTrace.SLOWEST_MYLIST_NUM, len(actual))
+        self.assertEqual(
+            f"https://www.nicovideo.jp/user/{UpdateTrace.SLOWEST_MYLIST_NUM + 4}/video", actual[0]["mylist_url"]
+        )
+
+    def test_is_fetch(self):
+        fetch_stage_list = [s for s in SpanStage if s.is_fetch]
+        expect = [
+            SpanStage.cookie_load,
+            SpanStage.page_request,
+            SpanStage.parse,
+            SpanStage.api_lookup,
+            SpanStage.merge,
+        ]
+        self.assertEqual(expect, fetch_stage_list)
+
+    def test_fetch_latency_dict(self):
+        trace = UpdateTrace()
+        # 並行して取得した分は重ねて数えず、最初の開始から最後の終了までとする
+        trace.record(SpanStage.page_request, MYLIST_URL, 0.010, 0.020)
+        trace.record(SpanStage.api_lookup, MYLIST_URL, 0.020, 0.050)
+        trace.record(SpanStage.api_lookup, MYLIST_URL, 0.020, 0.040)
+        trace.record(SpanStage.db_write, MYLIST_URL, 0.050, 0.100)
+        # DB更新の段階のみのマイリストは含めない
+        trace.record(SpanStage.db_write, MYLIST_URL_2, 0.0, 0.1)
+        actual = trace.fetch_latency_dict()
+        self.assertEqual([MYLIST_URL], list(actual.keys()))
+        self.assertAlmostEqual(40.0, actual[MYLIST_URL])
+        self.assertEqual({}, UpdateTrace().fetch_latency_dict())
+
+    def test_sum_attr(self):
+        trace = self._make_trace()
+        self.assertEqual(1000, trace.sum_attr("bytes"))
+        self.assertEqual(1, trace.sum_attr("retry_count"))
+        self.assertEqual(0, trace.sum_attr("new_video_num"))
+
+    def test_to_report(self):
+        trace = self._make_trace()
+        trace.finish()
+        actual = trace.to_report()
+        self.assertEqual(trace.started_at, actual["started_at"])
+        self.assertEqual(trace.elapsed, actual["elapsed_sec"])
+        self.assertEqual(2, actual["mylist_num"])
+        self.assertEqual(11, actual["span_num"])
+        self.assertEqual(trace.summarize(), actual["stages"])
+        self.assertEqual(trace.slowest_mylists(), actual["slowest_mylists"])
+
+    def test_to_chrome_trace(self):
+        trace = UpdateTrace()
+        trace.record(SpanStage.page_request, MYLIST_URL, 0.001, 0.003, {"status_code": 200})
+        actual = trace.to_chrome_trace()
+        self.assertEqual("ms", actual["displayTimeUnit"])
+        metadata, event = actual["traceEvents"]
+        self.assertEqual("M", metadata["ph"])
+        self.assertEqual(threading.current_thread().name, metadata["args"]["name"])
+        self.assertEqual("page_request", event["name"])
+        self.assertEqual("X", event["ph"])
+        self.assertAlmostEqual(1000.0, event["ts"])
+        self.assertAlmostEqual(2000.0, event["dur"])
+        self.assertEqual(metadata["tid"], event["tid"])
+        self.assertEqual({"mylist_url": MYLIST_URL, "status_code": 200}, event["args"])
+
+    def test_bind_and_span(self):
+        trace = UpdateTrace()
+
+        # 記録先が設定されていなければ記録しない
+        self.assertFalse(is_tracing())
+        with span(SpanStage.parse, kind="page") as attrs:
+            attrs["bytes"] = 1
+        self.assertEqual({"kind": "page", "bytes": 1}, attrs)
+        self.assertEqual([], trace.span_list)
+
+        with bind(trace, MYLIST_URL):
+            self.assertTrue(is_tracing())
+            with span(SpanStage.parse, kind="page") as attrs:
+                attrs["bytes"] = 1
+            with bind(None, MYLIST_URL_2):
+                self.assertFalse(is_tracing())
+                with span(SpanStage.diff):
+                    pass
+            with self.assertRaises(ValueError):
+                with span(SpanStage.merge):
+                    raise ValueError
+        self.assertFalse(is_tracing())
+
+        actual = trace.span_list
+        self.assertEqual([SpanStage.parse, SpanStage.merge], [s.stage for s in actual])
+        self.assertEqual({MYLIST_URL}, {s.mylist_url for s in actual})
+        self.assertEqual({"kind": "page", "bytes": 1}, actual[0].attrs)
+        self.assertEqual({"error": "ValueError"}, actual[1].attrs)
+
+        # 別スレッドには記録先は引き継がれない
+        is_tracing_list = []
+        with bind(trace, MYLIST_URL):
+            thread = threading.Thread(target=lambda: is_tracing_list.append(is_tracing()))
+            thread.start()
+            thread.join()
+        self.assertEqual([False], is_tracing_list)
+
+    def test_get_log_dir(self):
+        root_logger = logging.getLogger()
+        orig_handlers = root_logger.handlers[:]
+        self.addCleanup(lambda: setattr(root_logger, "handlers", orig_handlers))
+        temp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        file_handler = RotatingFileHandler(temp_dir / "log.txt", delay=True)
+
+        # ファイルに出力していない場合はカレントディレクトリ
+        root_logger.handlers = [logging.StreamHandler()]
+        self.assertEqual(Path("."), get_log_dir())
+
+        root_logger.handlers = [logging.StreamHandler(), file_handler]
+        self.assertEqual(temp_dir, get_log_dir())
+
+        # QueueListener に移されたハンドラから探す
+        queue_handler = QueueHandler(MagicMock())
+        queue_handler.listener = QueueListener(MagicMock(), file_handler)
+        root_logger.handlers = [queue_handler]
+        self.assertEqual(temp_dir, get_log_dir())
+
+    def test_save_trace_report(self):
+        temp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        report_dir = temp_dir / "report"
+        trace = self._make_trace()
+        trace.finish()
+
+        actual = save_trace_report(trace, report_dir)
+        self.assertEqual(report_dir / UpdateTrace.REPORT_FILE_NAME, actual)
+        self.assertEqual(orjson.loads(orjson.dumps(trace.to_report())), orjson.loads(actual.read_bytes()))
+        self.assertFalse((report_dir / UpdateTrace.CHROME_TRACE_FILE_NAME).exists())
+
+        actual = save_trace_report(trace, report_dir, True)
+        chrome_trace = orjson.loads((report_dir / UpdateTrace.CHROME_TRACE_FILE_NAME).read_bytes())
+        self.assertEqual(11, len([e for e in chrome_trace["traceEvents"] if e["ph"] == "X"]))
+
+        # 書き出しに失敗しても例外は送出しない
+        (temp_dir / "file").write_text("")
+        actual = save_trace_report(trace, temp_dir / "file")
+        self.assertIsNone(actual)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -1,4 +1,5 @@
 import copy
+import importlib.metadata
 import random
 import sys
 import unittest
@@ -11,7 +12,8 @@ from mock import call, mock_open, patch
 
 from nnmm.model import Mylist
 from nnmm.mylist_db_controller import MylistDBController
-from nnmm.util import IncludeNewStatus, MylistType, Result, find_values, get_now_datetime, interval_translate
+from nnmm.util import IncludeNewStatus, JsonPath, MylistType, Result, find_values, get_app_version, get_now_datetime
+from nnmm.util import datetime_to_epoch_list, get_now_epoch, interval_translate, normalize_datetime_list
 from nnmm.util import is_mylist_include_new_video, load_mylist, popup, popup_get_text, save_mylist
 
 TEST_DB_PATH = ":memory:"
@@ -241,6 +243,133 @@ class TestUtil(unittest.TestCase):
         with self.assertRaises(ValueError):
             actual = find_values(sample_dict, "invalid_key", True)
 
+    def test_find_values_early_exit(self):
+        # 一意に確定する想定の指定では2つ目が見つかった時点で探索を打ち切る
+        sample_list = [{"key": 1}, {"key": 2}, "invalid_object"]
+
+        class NotToBeVisited(dict):
+            def items(self):
+                raise AssertionError("visited after early exit.")
+
+        sample_list[2] = NotToBeVisited(key=3)
+        with self.assertRaises(ValueError):
+            actual = find_values(sample_list, "key", True)
+
+        # 深い入れ子でも再帰上限に達しない
+        deep_dict = {"key": "bottom"}
+        for _ in range(sys.getrecursionlimit() * 2):
+            deep_dict = {"child": deep_dict}
+        actual = find_values(deep_dict, "key", True)
+        self.assertEqual("bottom", actual)
+
+    def test_JsonPath(self):
+        cache_filepath = Path("./tests/cache/test_notes_with_reactions.json")
+        sample_dict = orjson.loads(cache_filepath.read_bytes()).get("result")
+
+        # 初期化
+        json_path = JsonPath("user.username")
+        self.assertEqual("user.username", json_path.path)
+        self.assertEqual(("user", "username"), json_path.keys)
+        self.assertEqual("JsonPath('user.username')", repr(json_path))
+        self.assertEqual((), JsonPath("").keys)
+        with self.assertRaises(TypeError):
+            json_path = JsonPath(["user", "username"])
+        with self.assertRaises(ValueError):
+            json_path = JsonPath("user..username")
+
+        # compile は同じパス文字列に対して同じインスタンスを返す
+        json_path = JsonPath.compile("user.username")
+        self.assertIs(json_path, JsonPath.compile("user.username"))
+        self.assertIs(json_path, JsonPath.compile(json_path))
+
+        # 途中の list は暗黙に全要素を辿る
+        actual = JsonPath.compile("user.username").find_all(sample_dict)
+        expect = find_values(sample_dict, "username", False, ["user"])
+        self.assertEqual(expect, actual)
+
+        # ワイルドカード
+        actual = JsonPath.compile("note.files.*.name").find_all(sample_dict)
+        expect = find_values(sample_dict, "name", False, ["note", "files"])
+        self.assertEqual(expect, actual)
+        actual = JsonPath.compile("*.user.username").find_all(sample_dict)
+        expect = find_values(sample_dict, "username", False, ["user"])
+        self.assertEqual(expect, actual)
+        actual = JsonPath.compile("*.username").find_all(sample_dict[0])
+        self.assertEqual(["user1_username"], actual)
+
+        # 終端の list は展開しない
+        actual = JsonPath.compile("note.files").find_all(sample_dict)
+        expect = [item["note"]["files"] for item in sample_dict if "files" in item.get("note", {})]
+        self.assertNotEqual([], expect)
+        self.assertEqual(expect, actual)
+
+        # 空パスは対象そのもの
+        self.assertEqual([sample_dict], JsonPath.compile("").find_all(sample_dict))
+
+        # iter_values はジェネレータ
+        values = JsonPath.compile("id").iter_values(sample_dict)
+        self.assertEqual(sample_dict[0]["id"], next(values))
+
+        # 存在しないパス, 探索できない対象
+        self.assertEqual([], JsonPath.compile("invalid_key").find_all(sample_dict))
+        self.assertEqual([], JsonPath.compile("user.username").find_all({}))
+        self.assertEqual([], JsonPath.compile("user.username").find_all([]))
+        self.assertEqual([], JsonPath.compile("user.username").find_all("invalid_object"))
+
+        # find_one
+        actual = JsonPath.compile("user.username").find_one(sample_dict[0])
+        self.assertEqual("user1_username", actual)
+        with self.assertRaises(ValueError):
+            actual = JsonPath.compile("user.username").find_one(sample_dict)
+        with self.assertRaises(ValueError):
+            actual = JsonPath.compile("invalid_key").find_one(sample_dict)
+
+    def test_normalize_datetime_list(self):
+        """日時文字列をまとめて変換する機能のテスト"""
+        dst_df = "%Y-%m-%d %H:%M:%S"
+        src_list = [
+            "2023-12-26T12:34:56+09:00",
+            "2023-12-26T12:34:56Z",
+            "2007-03-06T00:33:00+09:00",
+            "2023-12-26T12:34:56.789+09:00",
+            "2023-12-26T12:34:56+09:00",
+        ]
+        actual = normalize_datetime_list(src_list)
+        expect = [datetime.fromisoformat(src).strftime(dst_df) for src in src_list]
+        self.assertEqual(expect, actual)
+        self.assertEqual("2023-12-26 12:34:56", actual[0])
+
+        # ジェネレータも受け付ける
+        actual = normalize_datetime_list(src for src in src_list)
+        self.assertEqual(expect, actual)
+
+        # 空リスト
+        self.assertEqual([], normalize_datetime_list([]))
+
+        # 異常系
+        with self.assertRaises(ValueError):
+            normalize_datetime_list(["2023-12-26T12:34:56+09:00", "invalid"])
+        with self.assertRaises(TypeError):
+            normalize_datetime_list([-1])
+
+    def test_datetime_to_epoch_list(self):
+        """日時文字列をまとめてエポック秒に変換する機能のテスト"""
+        dt_str_list = ["1970-01-01 00:00:00", "1970-01-02 00:00:01", "2023-04-01 00:01:00"]
+        actual = datetime_to_epoch_list(dt_str_list)
+        expect = [0.0, 86401.0, (datetime(2023, 4, 1, 0, 1, 0) - datetime(1970, 1, 1)).total_seconds()]
+        self.assertEqual(expect, actual)
+        self.assertEqual([], datetime_to_epoch_list([]))
+
+        with self.assertRaises(ValueError):
+            datetime_to_epoch_list(["invalid"])
+
+        # 現在日時と同じ基準で比較できる
+        with freezegun.freeze_time("2023-04-01 00:01:00"):
+            now_epoch = get_now_epoch()
+        self.assertEqual(actual[2], now_epoch)
+        past_epoch, future_epoch = datetime_to_epoch_list(["2023-04-01 00:00:59", "2023-04-01 00:01:01"])
+        self.assertTrue(past_epoch < now_epoch < future_epoch)
+
     def test_save_mylist(self):
         """save_mylistのテスト"""
         mockio = self.enterContext((patch("pathlib.Path.open", mock_open())))
@@ -286,7 +415,7 @@ class TestUtil(unittest.TestCase):
 
         # write呼び出し予測値
         expect = []
-        mylist_cols = Mylist.__table__.c.keys()
+        mylist_cols = Mylist.column_keys()
         expect.append(",".join(mylist_cols) + "\n")
         for r in records:
             param_list = [str(r.get(s)) for s in mylist_cols]
@@ -327,7 +456,7 @@ class TestUtil(unittest.TestCase):
 
         # Path.open().readline で返されるモックデータの用意
         readdata = []
-        mylist_cols = Mylist.__table__.c.keys()
+        mylist_cols = Mylist.column_keys()
         readdata.append(",".join(mylist_cols) + "\n")
         for r in records:
             param_list = [str(r.get(s)) for s in mylist_cols]
@@ -367,6 +496,16 @@ class TestUtil(unittest.TestCase):
 
         # TODO::重複して挿入を試みる
 
+    def test_get_app_version(self):
+        mock_version = self.enterContext(patch("nnmm.util.importlib.metadata.version"))
+        mock_version.return_value = "2.1.0"
+        self.assertEqual("2.1.0", get_app_version())
+        mock_version.assert_called_once_with("nnmm")
+
+        # パッケージとしてインストールされていない場合
+        mock_version.side_effect = importlib.metadata.PackageNotFoundError
+        self.assertEqual("", get_app_version())
+
     def test_get_now_datetime(self):
         """タイムスタンプを返す機能のテスト"""
         src_df = "%Y/%m/%d %H:%M"
@@ -505,17 +644,17 @@ class TestUtil(unittest.TestCase):
     def test_popup_get_text(self):
         """popup_get_text のテスト"""
         # 正常入力時
-        self.enterContext(patch("nnmm.util.QInputDialog.getText", return_value=("入力値", True)))
+        self.enterContext(patch("PySide6.QtWidgets.QInputDialog.getText", return_value=("入力値", True)))
         self.assertEqual(popup_get_text("メッセージ", "タイトル"), "入力値")
 
         # キャンセル時（タイトル省略もカバー）
-        self.enterContext(patch("nnmm.util.QInputDialog.getText", return_value=("", False)))
+        self.enterContext(patch("PySide6.QtWidgets.QInputDialog.getText", return_value=("", False)))
         self.assertIsNone(popup_get_text("メッセージ"))
 
     def test_popup(self):
         """popup のテスト（ok/cancel と通常表示）"""
         # ok_cancel=True の場合 OK / Cancel を返す
-        mock_msg = self.enterContext(patch("nnmm.util.QMessageBox"))
+        mock_msg = self.enterContext(patch("PySide6.QtWidgets.QMessageBox"))
         mock_msg.return_value.exec.side_effect = lambda: mock_msg.StandardButton.Ok
         actual = popup("message", "title", ok_cancel=True)
         self.assertEqual("OK", actual)
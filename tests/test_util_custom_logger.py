@@ -1,137 +1,97 @@
 import sys
 import unittest
 
-from mock import MagicMock, patch
-from PySide6.QtGui import QTextCursor
-from PySide6.QtWidgets import QDialog
+from mock import MagicMock, call, patch
+from PySide6.QtWidgets import QDialog, QPlainTextEdit
 
 import nnmm.util
+from nnmm.log_sink import GuiLogSink
 from nnmm.util import CustomLogger, window_cache
 
 
 class TestUtilCustomLogger(unittest.TestCase):
     def test_custom_logger_info(self):
-        """CustomLogger が GUI テキストエリアにログを追記することをテストする"""
+        """CustomLogger が GUI ログシンクにログを積むことをテストする"""
         self.enterContext(patch("nnmm.util.Logger.info"))
+        self.enterContext(patch("nnmm.util.get_now_datetime", return_value="2026-10-19 00:00:00"))
 
         # 元のキャッシュを退避しておく
         global window_cache
         orig_cache = nnmm.util.window_cache
 
-        class DummyTextarea:
-            def __init__(self):
-                self.appended_text = ""
-                self.last_move = None
-                self.updated = False
-
-            def append(self, text):
-                self.appended_text = text
-
-            def moveCursor(self, op):
-                self.last_move = op
-
-            def update(self):
-                self.updated = True
-
         mock_window = MagicMock(spec=QDialog)
         nnmm.util.window_cache = mock_window
 
         logger = CustomLogger("testlogger")
 
-        # 通常の info は textarea に追記されること
-        mock_window.textarea = DummyTextarea()
+        # 通常の info は log_sink に積まれること, テキストエリアは直接操作しないこと
+        mock_window.log_sink = MagicMock(spec=GuiLogSink)
+        mock_window.textarea = MagicMock(spec=QPlainTextEdit)
         logger.info("info message")
-        self.assertIn("info message", mock_window.textarea.appended_text)
-        self.assertEqual(QTextCursor.MoveOperation.End, mock_window.textarea.last_move)
-        self.assertTrue(mock_window.textarea.updated)
+        self.assertEqual([call.put("2026-10-19 00:00:00 info message")], mock_window.log_sink.mock_calls)
+        self.assertEqual([], mock_window.textarea.mock_calls)
 
         # args を伴う呼び出しは GUI 更新を行わないこと
-        mock_window.textarea = DummyTextarea()
+        mock_window.log_sink = MagicMock(spec=GuiLogSink)
         logger.info("ignored", "with_arg")
-        self.assertEqual("", mock_window.textarea.appended_text)
-        self.assertIsNone(mock_window.textarea.last_move)
-        self.assertFalse(mock_window.textarea.updated)
+        self.assertEqual([], mock_window.log_sink.mock_calls)
 
         # window指定がない場合も GUI 更新を行わないこと
         mock_window = MagicMock(spec=QDialog)
         nnmm.util.window_cache = None
-        mock_window.textarea = DummyTextarea()
+        mock_window.log_sink = MagicMock(spec=GuiLogSink)
         logger.info("info message")
-        self.assertEqual("", mock_window.textarea.appended_text)
-        self.assertIsNone(mock_window.textarea.last_move)
-        self.assertFalse(mock_window.textarea.updated)
+        self.assertEqual([], mock_window.log_sink.mock_calls)
 
         # window指定が不正なインスタンスタイプの場合も GUI 更新を行わないこと
         mock_window = MagicMock()
         nnmm.util.window_cache = mock_window
-        mock_window.textarea = DummyTextarea()
+        mock_window.log_sink = MagicMock(spec=GuiLogSink)
         logger.info("info message")
-        self.assertEqual("", mock_window.textarea.appended_text)
-        self.assertIsNone(mock_window.textarea.last_move)
-        self.assertFalse(mock_window.textarea.updated)
+        self.assertEqual([], mock_window.log_sink.mock_calls)
 
         # 後始末
         window_cache = orig_cache
 
     def test_custom_logger_error(self):
-        """CustomLogger が GUI テキストエリアにログを追記することをテストする"""
+        """CustomLogger が GUI ログシンクにログを積むことをテストする"""
         self.enterContext(patch("nnmm.util.Logger.error"))
+        self.enterContext(patch("nnmm.util.get_now_datetime", return_value="2026-10-19 00:00:00"))
 
         # 元のキャッシュを退避しておく
         global window_cache
         orig_cache = nnmm.util.window_cache
 
-        class DummyTextarea:
-            def __init__(self):
-                self.appended_text = ""
-                self.last_move = None
-                self.updated = False
-
-            def append(self, text):
-                self.appended_text = text
-
-            def moveCursor(self, op):
-                self.last_move = op
-
-            def update(self):
-                self.updated = True
-
         mock_window = MagicMock(spec=QDialog)
         nnmm.util.window_cache = mock_window
 
         logger = CustomLogger("testlogger")
 
-        # 通常の error は textarea に追記されること
-        mock_window.textarea = DummyTextarea()
+        # 通常の error は log_sink に積まれること, テキストエリアは直接操作しないこと
+        mock_window.log_sink = MagicMock(spec=GuiLogSink)
+        mock_window.textarea = MagicMock(spec=QPlainTextEdit)
         logger.error("error message")
-        self.assertIn("error message", mock_window.textarea.appended_text)
-        self.assertEqual(QTextCursor.MoveOperation.End, mock_window.textarea.last_move)
-        self.assertTrue(mock_window.textarea.updated)
+        self.assertEqual([call.put("2026-10-19 00:00:00 error message")], mock_window.log_sink.mock_calls)
+        self.assertEqual([], mock_window.textarea.mock_calls)
 
         # args を伴う呼び出しは GUI 更新を行わないこと
-        mock_window.textarea = DummyTextarea()
+        mock_window.log_sink = MagicMock(spec=GuiLogSink)
         logger.error("ignored", "with_arg")
-        self.assertEqual("", mock_window.textarea.appended_text)
-        self.assertIsNone(mock_window.textarea.last_move)
-        self.assertFalse(mock_window.textarea.updated)
+        self.assertEqual([], mock_window.log_sink.mock_calls)
 
         # window指定がない場合も GUI 更新を行わないこと
         mock_window = MagicMock(spec=QDialog)
         nnmm.util.window_cache = None
-        mock_window.textarea = DummyTextarea()
+        mock_window.log_sink = MagicMock(spec=GuiLogSink)
         logger.error("error message")
-        self.assertEqual("", mock_window.textarea.appended_text)
-        self.assertIsNone(mock_window.textarea.last_move)
-        self.assertFalse(mock_window.textarea.updated)
+        self.assertEqual([], mock_window.log_sink.mock_calls)
 
         # window指定が不正なインスタンスタイプの場合も GUI 更新を行わないこと
         mock_window = MagicMock()
         nnmm.util.window_cache = mock_window
-        mock_window.textarea = DummyTextarea()
+        mock_window.log_sink = MagicMock(spec=GuiLogSink)
         logger.error("error message")
-        self.assertEqual("", mock_window.textarea.appended_text)
-        self.assertIsNone(mock_window.textarea.last_move)
-        self.assertFalse(mock_window.textarea.updated)
+        self.assertEqual([], mock_window.log_sink.mock_calls)
 
         # 後始末
         window_cache = orig_cache
@@ -0,0 +1,214 @@
+import sys
+import unittest
+
+import orjson
+from mock import AsyncMock, MagicMock, call, patch
+
+from nnmm.video_info_fetcher.mylist_page_iterator import MylistPageIterator
+from nnmm.video_info_fetcher.value_objects.mylist_page import MylistPage
+from nnmm.video_info_fetcher.value_objects.mylist_url_factory import MylistURLFactory
+from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
+from nnmm.video_info_fetcher.value_objects.title_list import TitleList
+from nnmm.video_info_fetcher.value_objects.video_url_list import VideoURLList
+from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
+
+UPLOADED_URL = "https://www.nicovideo.jp/user/11111111/video"
+MYLIST_URL = "https://www.nicovideo.jp/user/11111111/mylist/00000011"
+SERIES_URL = "https://www.nicovideo.jp/user/11111111/series/00000011"
+
+
+class TestMylistPageIterator(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.video_info_fetcher.mylist_page_iterator.logger.info"))
+        mock_action_track_id = self.enterContext(
+            patch("nnmm.video_info_fetcher.value_objects.series_url.SeriesURL._make_action_track_id")
+        )
+        mock_action_track_id.return_value = "action_track_id"
+
+    def _make_response_text(self, url: str, video_nums: list[int], total_count: int) -> str:
+        """API返り値を模したJSON文字列を返す"""
+        entries = [
+            {
+                "id": f"sm1000000{i}",
+                "title": f"テスト動画{i}",
+                "registeredAt": f"2022-05-06T00:01:0{i}+09:00",
+            }
+            for i in video_nums
+        ]
+        mylist_type = MylistURLFactory.create(url).mylist_type
+        path, entry_key, total_count_key = MylistPageIterator._items_path_dict[mylist_type]
+        data = {"items": [{entry_key: e} for e in entries], total_count_key: total_count}
+        for key in reversed(path):
+            data = {key: data}
+        return orjson.dumps(data).decode()
+
+    def _make_mylist_page(self, page: int, video_nums: list[int], total_count: int) -> MylistPage:
+        return MylistPage(
+            page,
+            total_count,
+            VideoidList.create([f"sm1000000{i}" for i in video_nums]),
+            TitleList.create([f"テスト動画{i}" for i in video_nums]),
+            RegisteredAtList.create([f"2022-05-06 00:01:0{i}" for i in video_nums]),
+            VideoURLList.create([f"https://www.nicovideo.jp/watch/sm1000000{i}" for i in video_nums]),
+        )
+
+    def _make_get_response(self, url: str, pages: dict[int, list[int]], total_count: int) -> AsyncMock:
+        """page_url に対応するページの返り値を返す get_response を返す"""
+        mylist_url = MylistURLFactory.create(url)
+        response_dict = {}
+        for page, video_nums in pages.items():
+            response = MagicMock()
+            response.text = self._make_response_text(url, video_nums, total_count)
+            response_dict[mylist_url.page_url(page, 2)] = response
+
+        get_response = AsyncMock()
+        get_response.side_effect = lambda request_url: response_dict.get(request_url)
+        return get_response
+
+    async def _collect(self, instance: MylistPageIterator, *args) -> list[MylistPage]:
+        return [mylist_page async for mylist_page in instance.iterate(*args)]
+
+    def test_init(self):
+        mylist_url = MylistURLFactory.create(UPLOADED_URL)
+        get_response = AsyncMock()
+        instance = MylistPageIterator(mylist_url, get_response)
+        self.assertEqual(mylist_url, instance.mylist_url)
+        self.assertEqual(get_response, instance.get_response)
+        self.assertEqual(set(), instance.known_video_id_set)
+        self.assertEqual(False, instance.is_backfill)
+        self.assertEqual(MylistPageIterator.PAGE_SIZE, instance.page_size)
+        self.assertEqual(False, instance.is_ascending)
+
+        instance = MylistPageIterator(mylist_url, get_response, ["sm10000001", "sm10000001"], True, 2)
+        self.assertEqual({"sm10000001"}, instance.known_video_id_set)
+        self.assertEqual(True, instance.is_backfill)
+        self.assertEqual(2, instance.page_size)
+
+        instance = MylistPageIterator(MylistURLFactory.create(SERIES_URL), get_response)
+        self.assertEqual(True, instance.is_ascending)
+
+        with self.assertRaises(ValueError):
+            instance = MylistPageIterator(UPLOADED_URL, get_response)
+        with self.assertRaises(ValueError):
+            instance = MylistPageIterator(mylist_url, get_response, page_size=0)
+
+    def test_parse_page(self):
+        for url in [UPLOADED_URL, MYLIST_URL, SERIES_URL]:
+            instance = MylistPageIterator(MylistURLFactory.create(url), AsyncMock(), page_size=2)
+            response_text = self._make_response_text(url, [3, 2], 5)
+            actual = instance._parse_page(2, response_text)
+            expect = self._make_mylist_page(2, [3, 2], 5)
+            self.assertEqual(expect, actual)
+
+    def test_is_reached_known(self):
+        mylist_url = MylistURLFactory.create(UPLOADED_URL)
+        video_id_list = VideoidList.create(["sm10000002", "sm10000001"])
+
+        instance = MylistPageIterator(mylist_url, AsyncMock(), ["sm10000001"])
+        self.assertEqual(True, instance.is_reached_known(video_id_list))
+
+        instance = MylistPageIterator(mylist_url, AsyncMock(), ["sm10000003"])
+        self.assertEqual(False, instance.is_reached_known(video_id_list))
+
+        instance = MylistPageIterator(mylist_url, AsyncMock(), ["sm10000001"], True)
+        self.assertEqual(False, instance.is_reached_known(video_id_list))
+
+    async def test_iterate(self):
+        pages = {1: [7, 6], 2: [5, 4], 3: [3, 2], 4: [1]}
+        for url in [UPLOADED_URL, MYLIST_URL]:
+            mylist_url = MylistURLFactory.create(url)
+
+            # 取得済の動画を含むページで打ち切る
+            get_response = self._make_get_response(url, pages, 7)
+            instance = MylistPageIterator(mylist_url, get_response, ["sm10000004"], page_size=2)
+            actual = await self._collect(instance, 2)
+            expect = [self._make_mylist_page(2, [5, 4], 7)]
+            self.assertEqual(expect, actual)
+            self.assertEqual([call(mylist_url.page_url(2, 2))], get_response.mock_calls)
+
+            # is_backfill の場合は最終ページまで辿る
+            get_response = self._make_get_response(url, pages, 7)
+            instance = MylistPageIterator(mylist_url, get_response, ["sm10000004"], True, 2)
+            actual = await self._collect(instance)
+            expect = [self._make_mylist_page(page, video_nums, 7) for page, video_nums in pages.items()]
+            self.assertEqual(expect, actual)
+            self.assertEqual([call(mylist_url.page_url(page, 2)) for page in pages], get_response.mock_calls)
+
+            # 空ページに到達したら打ち切る
+            get_response = self._make_get_response(url, {1: [7, 6], 2: []}, 100)
+            instance = MylistPageIterator(mylist_url, get_response, page_size=2)
+            actual = await self._collect(instance)
+            self.assertEqual([self._make_mylist_page(1, [7, 6], 100)], actual)
+
+            # ページ取得に失敗した場合
+            get_response = self._make_get_response(url, {}, 7)
+            instance = MylistPageIterator(mylist_url, get_response, page_size=2)
+            with self.assertRaises(ValueError):
+                actual = await self._collect(instance)
+
+    async def test_iterate_series(self):
+        url = SERIES_URL
+        mylist_url = MylistURLFactory.create(url)
+        pages = {1: [1, 2], 2: [3, 4], 3: [5, 6], 4: [7]}
+        first_response_text = self._make_response_text(url, pages[1], 7)
+
+        # 最終ページから遡り、取得済の動画を含むページで打ち切る
+        get_response = self._make_get_response(url, pages, 7)
+        instance = MylistPageIterator(mylist_url, get_response, ["sm10000005"], page_size=2)
+        actual = await self._collect(instance, 2, first_response_text)
+        expect = [self._make_mylist_page(4, [7], 7), self._make_mylist_page(3, [5, 6], 7)]
+        self.assertEqual(expect, actual)
+        self.assertEqual(
+            [call(mylist_url.page_url(4, 2)), call(mylist_url.page_url(3, 2))],
+            get_response.mock_calls,
+        )
+
+        # first_response_text がなければ1ページ目を取得して総件数を求める
+        get_response = self._make_get_response(url, pages, 7)
+        instance = MylistPageIterator(mylist_url, get_response, is_backfill=True, page_size=2)
+        actual = await self._collect(instance, 2)
+        expect = [self._make_mylist_page(page, pages[page], 7) for page in [4, 3, 2]]
+        self.assertEqual(expect, actual)
+        self.assertEqual(
+            [call(mylist_url.page_url(page, 2)) for page in [1, 4, 3, 2]],
+            get_response.mock_calls,
+        )
+
+    async def test_iterate_max_page_num(self):
+        self.enterContext(patch.object(MylistPageIterator, "MAX_PAGE_NUM", 2))
+        url = UPLOADED_URL
+        mylist_url = MylistURLFactory.create(url)
+        pages = {1: [7, 6], 2: [5, 4], 3: [3, 2], 4: [1]}
+        get_response = self._make_get_response(url, pages, 7)
+        instance = MylistPageIterator(mylist_url, get_response, is_backfill=True, page_size=2)
+        actual = await self._collect(instance)
+        expect = [self._make_mylist_page(page, pages[page], 7) for page in [1, 2]]
+        self.assertEqual(expect, actual)
+
+    async def test_iterate_incremental_max_page_num(self):
+        self.enterContext(patch.object(MylistPageIterator, "INCREMENTAL_MAX_PAGE_NUM", 2))
+        url = UPLOADED_URL
+        mylist_url = MylistURLFactory.create(url)
+        pages = {1: [7, 6], 2: [5, 4], 3: [3, 2], 4: [1]}
+
+        # 取得済の動画が見つからなくても INCREMENTAL_MAX_PAGE_NUM ページで打ち切る
+        get_response = self._make_get_response(url, pages, 7)
+        instance = MylistPageIterator(mylist_url, get_response, ["sm99999999"], page_size=2)
+        self.assertEqual(2, instance.max_page_num)
+        actual = await self._collect(instance)
+        expect = [self._make_mylist_page(page, pages[page], 7) for page in [1, 2]]
+        self.assertEqual(expect, actual)
+
+        # is_backfill の場合は INCREMENTAL_MAX_PAGE_NUM を超えて辿る
+        get_response = self._make_get_response(url, pages, 7)
+        instance = MylistPageIterator(mylist_url, get_response, ["sm99999999"], True, 2)
+        self.assertEqual(MylistPageIterator.MAX_PAGE_NUM, instance.max_page_num)
+        actual = await self._collect(instance)
+        expect = [self._make_mylist_page(page, video_nums, 7) for page, video_nums in pages.items()]
+        self.assertEqual(expect, actual)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
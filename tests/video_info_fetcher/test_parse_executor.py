@@ -0,0 +1,157 @@
+import asyncio
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import orjson
+from mock import MagicMock, patch
+
+from nnmm.util import MylistType
+from nnmm.video_info_fetcher.parse_executor import ParseExecutor, from_parsed_page, parse_response, to_parsed_page
+from nnmm.video_info_fetcher.series_api_response_json_parser import SeriesAPIResponseJsonParser
+
+URL = "https://www.nicovideo.jp/user/11111111/series/123456"
+
+
+class TestParseExecutor(unittest.TestCase):
+    def setUp(self):
+        self.enterContext(patch("nnmm.video_info_fetcher.parse_executor.logger"))
+        self.enterContext(patch.object(ParseExecutor, "process_num", 0))
+        self.enterContext(patch.object(ParseExecutor, "_executor", None))
+
+    def tearDown(self):
+        ParseExecutor.shutdown()
+
+    def _make_response_text(self, video_num: int = 3) -> str:
+        items = [
+            {
+                "video": {
+                    "id": f"sm1000000{i}",
+                    "title": f"テスト動画{i}",
+                    "registeredAt": f"2023-12-2{i}T12:34:56+09:00",
+                }
+            }
+            for i in range(video_num)
+        ]
+        json_dict = {
+            "data": {"detail": {"title": "シリーズ1", "owner": {"user": {"nickname": "投稿者1"}}}, "items": items}
+        }
+        return orjson.dumps(json_dict).decode()
+
+    def _parse_in_thread(self, response_text: str):
+        return asyncio.run(SeriesAPIResponseJsonParser(URL, response_text).parse())
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            ParseExecutor()
+
+    def test_parsed_page(self):
+        response_text = self._make_response_text()
+        expect = self._parse_in_thread(response_text)
+        actual = to_parsed_page(expect)
+        self.assertEqual(
+            (
+                "「シリーズ1」-投稿者1さんのシリーズ",
+                "シリーズ1",
+                ("sm10000000", "sm10000001", "sm10000002"),
+                ("テスト動画0", "テスト動画1", "テスト動画2"),
+                ("2023-12-20 12:34:56", "2023-12-21 12:34:56", "2023-12-22 12:34:56"),
+                (
+                    "https://www.nicovideo.jp/watch/sm10000000",
+                    "https://www.nicovideo.jp/watch/sm10000001",
+                    "https://www.nicovideo.jp/watch/sm10000002",
+                ),
+            ),
+            actual,
+        )
+        self.assertEqual(expect, from_parsed_page(URL, actual))
+
+        expect = self._parse_in_thread(self._make_response_text(0))
+        self.assertEqual(expect, from_parsed_page(URL, to_parsed_page(expect)))
+
+    def test_parse_response(self):
+        response_text = self._make_response_text()
+        actual = parse_response(MylistType.series, URL, response_text.encode("utf-8"))
+        self.assertEqual(to_parsed_page(self._parse_in_thread(response_text)), actual)
+
+        with self.assertRaises(ValueError):
+            actual = parse_response(MylistType.uploaded, URL, response_text.encode("utf-8"))
+
+    def test_configure(self):
+        self.assertFalse(ParseExecutor.is_enabled())
+        self.assertIsNone(ParseExecutor._get_executor())
+
+        mock_executor = self.enterContext(
+            patch("nnmm.video_info_fetcher.parse_executor.ProcessPoolExecutor", spec=ProcessPoolExecutor)
+        )
+        ParseExecutor.configure(2)
+        self.assertTrue(ParseExecutor.is_enabled())
+        self.assertEqual(2, ParseExecutor.process_num)
+        mock_executor.assert_not_called()
+
+        # 初回の解析時に起動し、以降は使い回す
+        executor = ParseExecutor._get_executor()
+        self.assertIs(mock_executor.return_value, executor)
+        self.assertIs(executor, ParseExecutor._get_executor())
+        mock_executor.assert_called_once()
+        self.assertEqual(2, mock_executor.call_args.kwargs["max_workers"])
+        self.assertEqual("spawn", mock_executor.call_args.kwargs["mp_context"].get_start_method())
+
+        # 設定し直すと起動済のプロセスプールは終了させる
+        ParseExecutor.configure(0)
+        executor.shutdown.assert_called_once_with(wait=True, cancel_futures=True)
+        self.assertFalse(ParseExecutor.is_enabled())
+        self.assertIsNone(ParseExecutor._get_executor())
+
+        for process_num in [-1, 1.0, "1"]:
+            with self.assertRaises(ValueError):
+                ParseExecutor.configure(process_num)
+
+    def test_parse(self):
+        response_text = self._make_response_text()
+        expect = self._parse_in_thread(response_text)
+
+        # プロセスプールが無効ならスレッド内で解析する
+        mock_parse_response = self.enterContext(
+            patch("nnmm.video_info_fetcher.parse_executor.parse_response", side_effect=parse_response)
+        )
+        actual = asyncio.run(ParseExecutor.parse(MylistType.series, URL, response_text))
+        self.assertEqual(expect, actual)
+        mock_parse_response.assert_not_called()
+
+        # 有効なら bytes で送って解析させ、受け取ったタプルから復元する
+        mock_get_executor = self.enterContext(patch.object(ParseExecutor, "_get_executor"))
+        executor = self.enterContext(ThreadPoolExecutor(1))
+        mock_get_executor.return_value = executor
+        actual = asyncio.run(ParseExecutor.parse(MylistType.series, URL, response_text))
+        self.assertEqual(expect, actual)
+        mock_parse_response.assert_called_once_with(MylistType.series, URL, response_text.encode("utf-8"))
+
+        # 解析に失敗した場合はスレッド内で解析した場合と同じ例外を送出する
+        with self.assertRaises(ValueError):
+            actual = asyncio.run(ParseExecutor.parse(MylistType.uploaded, URL, response_text))
+
+        # ワーカープロセスが異常終了した場合は無効にしてスレッド内で解析する
+        broken_executor = MagicMock(spec=ProcessPoolExecutor)
+        broken_executor.submit.side_effect = BrokenProcessPool
+        mock_get_executor.return_value = broken_executor
+        ParseExecutor.process_num = 1
+        actual = asyncio.run(ParseExecutor.parse(MylistType.series, URL, response_text))
+        self.assertEqual(expect, actual)
+        self.assertFalse(ParseExecutor.is_enabled())
+
+    def test_parse_process(self):
+        # 実際にワーカープロセスを起動する
+        response_text = self._make_response_text()
+        ParseExecutor.configure(1)
+        actual = asyncio.run(ParseExecutor.parse(MylistType.series, URL, response_text))
+        self.assertEqual(self._parse_in_thread(response_text), actual)
+        ParseExecutor.shutdown()
+        self.assertIsNone(ParseExecutor._executor)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
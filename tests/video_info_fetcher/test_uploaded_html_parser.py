@@ -0,0 +1,190 @@
+import html
+import sys
+import unittest
+from datetime import datetime
+
+import orjson
+from mock import patch
+
+from nnmm.util import MylistType
+from nnmm.video_info_fetcher.uploaded_html_parser import UploadedHtmlParser
+from nnmm.video_info_fetcher.value_objects.myshowname import Myshowname
+from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
+from nnmm.video_info_fetcher.value_objects.showname import Showname
+from nnmm.video_info_fetcher.value_objects.title_list import TitleList
+from nnmm.video_info_fetcher.value_objects.username import Username
+from nnmm.video_info_fetcher.value_objects.video_url_list import VideoURLList
+from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
+
+
+class TestUploadedHtmlParser(unittest.TestCase):
+    def _get_url_set(self) -> list[str]:
+        """urlセットを返す"""
+        url_info = [
+            "https://www.nicovideo.jp/user/11111111/video",
+            "https://www.nicovideo.jp/user/22222222/video?ref=pc_mypage_nicorepo",
+            "https://www.nicovideo.jp/user/11111111/mylist/00000011",
+            "https://www.nicovideo.jp/user/11111111/series/123456",
+        ]
+        return url_info
+
+    def _get_iteminfo(self, n: int) -> dict:
+        d = {
+            "title": f"動画タイトル_{n} <\"'&>",
+            "video_url": "https://www.nicovideo.jp/watch/" + f"sm1000000{n}",
+            "registered_at": f"2023-12-26T12:34:5{n}+09:00",
+            "video_id": f"sm1000000{n}",
+        }
+        return d
+
+    def _make_initial_data(self, num: int = 5) -> dict:
+        """data-initial-data 属性に埋め込まれる擬似的な初期データを返す"""
+        items = []
+        for i in range(1, num + 1):
+            d = self._get_iteminfo(i)
+            items.append({
+                "essential": {
+                    "id": d["video_id"],
+                    "title": d["title"],
+                    "registeredAt": d["registered_at"],
+                }
+            })
+        return {
+            "state": {"userDetails": {"userDetails": {"user": {"nickname": "投稿者1"}}}},
+            "nvapi": [{"body": {"data": {"items": items}}}],
+        }
+
+    def _make_html(self, initial_data: dict, element: str = "") -> str:
+        """投稿動画ページを模した html を返す
+
+        Args:
+            initial_data (dict): data-initial-data 属性に埋め込む初期データ
+            element (str): 初期データを埋め込む要素, 空文字列なら標準的な形式の要素を使う
+        """
+        attribute_value = html.escape(orjson.dumps(initial_data).decode(), quote=True)
+        if element == "":
+            element = (
+                f'<div id="js-initial-userpage-data" data-initial-data="{attribute_value}" data-env="{{}}"></div>'
+            )
+        else:
+            element = element.format(attribute_value=attribute_value)
+        return (
+            "<!DOCTYPE html><html><head><title>投稿者1さんの投稿動画</title>"
+            '<script>document.getElementById("js-initial-userpage-data");</script></head>'
+            f'<body><div class="header"><a href="/">ニコニコ動画</a></div>{element}</body></html>'
+        )
+
+    def test_init(self):
+        initial_data = self._make_initial_data()
+        response_text = self._make_html(initial_data)
+        for url in self._get_url_set():
+            if "/video" not in url:
+                with self.assertRaises(ValueError):
+                    instance = UploadedHtmlParser(url, response_text)
+                continue
+            instance = UploadedHtmlParser(url, response_text)
+            self.assertEqual(initial_data, instance.data)
+            # 高速経路で取得できた場合は DOM を構築しない
+            self.assertIsNone(instance.soup)
+
+    def test_init_fallback(self):
+        mock_extract = self.enterContext(
+            patch("nnmm.video_info_fetcher.uploaded_html_parser.UploadedHtmlParser._extract_initial_data")
+        )
+        mock_extract.return_value = None
+        url = self._get_url_set()[0]
+        initial_data = self._make_initial_data()
+
+        # 高速経路で取得できなかった場合は BeautifulSoup で解析する
+        response_text = self._make_html(initial_data)
+        instance = UploadedHtmlParser(url, response_text)
+        self.assertEqual(initial_data, instance.data)
+        self.assertIsNotNone(instance.soup)
+        mock_extract.assert_called_once_with(response_text)
+
+        # 要素が存在しない
+        response_text = self._make_html(initial_data, "<div></div>")
+        with self.assertRaises(ValueError):
+            instance = UploadedHtmlParser(url, response_text)
+
+    def test_extract_initial_data(self):
+        initial_data = self._make_initial_data()
+        expect = orjson.dumps(initial_data).decode()
+
+        # 標準的な形式
+        response_text = self._make_html(initial_data)
+        actual = UploadedHtmlParser._extract_initial_data(response_text)
+        self.assertEqual(expect, actual)
+
+        # 属性の並び順が異なる, 属性値に ">" を含む
+        element = (
+            "<div data-title='a > b' data-initial-data=\"{attribute_value}\"\n"
+            '  class="x" id="js-initial-userpage-data" hidden></div>'
+        )
+        response_text = self._make_html(initial_data, element)
+        actual = UploadedHtmlParser._extract_initial_data(response_text)
+        self.assertEqual(expect, actual)
+
+        # 同じ id 文字列が別の要素の属性値に含まれる
+        element = (
+            "<a title='id=\"js-initial-userpage-data\"'>link</a>"
+            '<div id="js-initial-userpage-data" data-initial-data="{attribute_value}"></div>'
+        )
+        response_text = self._make_html(initial_data, element)
+        actual = UploadedHtmlParser._extract_initial_data(response_text)
+        self.assertEqual(expect, actual)
+
+        # 高速経路では解釈できない形式 -> None
+        element = "<div id='js-initial-userpage-data' data-initial-data='{attribute_value}'></div>"
+        response_text = self._make_html(initial_data, element)
+        actual = UploadedHtmlParser._extract_initial_data(response_text)
+        self.assertIsNone(actual)
+
+        # 要素が存在しない -> None
+        response_text = self._make_html(initial_data, "<div></div>")
+        actual = UploadedHtmlParser._extract_initial_data(response_text)
+        self.assertIsNone(actual)
+
+        # 高速経路と BeautifulSoup で同じ結果になる
+        url = self._get_url_set()[0]
+        response_text = self._make_html(initial_data, element)
+        instance = UploadedHtmlParser(url, response_text)
+        self.assertEqual(initial_data, instance.data)
+        self.assertIsNotNone(instance.soup)
+
+    def test_get_username(self):
+        url = self._get_url_set()[0]
+        instance = UploadedHtmlParser(url, self._make_html(self._make_initial_data()))
+        actual = instance._get_username()
+        self.assertEqual(Username("投稿者1"), actual)
+
+    def test_get_showname_myshowname(self):
+        url = self._get_url_set()[0]
+        instance = UploadedHtmlParser(url, self._make_html(self._make_initial_data()))
+        actual = instance._get_showname_myshowname()
+        myshowname = Myshowname("投稿動画")
+        showname = Showname.create(MylistType.uploaded, Username("投稿者1"), None)
+        self.assertEqual((showname, myshowname), actual)
+
+    def test_get_entries(self):
+        DESTINATION_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+        NUM = 5
+        url = self._get_url_set()[0]
+        instance = UploadedHtmlParser(url, self._make_html(self._make_initial_data(NUM)))
+        actual = instance._get_entries()
+
+        iteminfo_list = [self._get_iteminfo(i) for i in range(1, NUM + 1)]
+        video_id_list = VideoidList.create([d["video_id"] for d in iteminfo_list])
+        title_list = TitleList.create([d["title"] for d in iteminfo_list])
+        registered_at_list = RegisteredAtList.create([
+            datetime.fromisoformat(d["registered_at"]).strftime(DESTINATION_DATETIME_FORMAT) for d in iteminfo_list
+        ])
+        video_url_list = VideoURLList.create([d["video_url"] for d in iteminfo_list])
+        expect = (video_id_list, title_list, registered_at_list, video_url_list)
+        self.assertEqual(expect, actual)
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
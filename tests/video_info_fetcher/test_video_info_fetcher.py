@@ -1,3 +1,4 @@
+import html
 import shutil
 import sys
 import unittest
@@ -5,10 +6,24 @@ import warnings
 from collections import namedtuple
 from pathlib import Path
 
+import httpx
+import orjson
 from mock import MagicMock, call, mock_open, patch
 
+from nnmm.video_info_fetcher.mylist_page_iterator import MylistPageIterator
+from nnmm.video_info_fetcher.value_objects.fetched_page_video_info import FetchedPageVideoInfo
+from nnmm.video_info_fetcher.value_objects.mylist_page import MylistPage
 from nnmm.video_info_fetcher.value_objects.mylist_url_factory import MylistURLFactory
+from nnmm.video_info_fetcher.value_objects.mylistid import Mylistid
+from nnmm.video_info_fetcher.value_objects.myshowname import Myshowname
+from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
+from nnmm.video_info_fetcher.value_objects.showname import Showname
+from nnmm.video_info_fetcher.value_objects.title_list import TitleList
+from nnmm.video_info_fetcher.value_objects.userid import Userid
+from nnmm.video_info_fetcher.value_objects.video_url_list import VideoURLList
+from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
 from nnmm.video_info_fetcher.video_info_fetcher import VideoInfoFetcher
+from nnmm.video_info_fetcher.video_info_fetcher_base import PermanentFetchError
 
 RSS_PATH = "./tests/rss/"
 
@@ -33,38 +48,290 @@ class TestVideoInfoFetcher(unittest.IsolatedAsyncioTestCase):
         ]
         return url_info
 
+    def _get_video_lists(self, video_nums: list[int]) -> tuple:
+        """video_nums を動画番号とする動画情報のリストセットを返す"""
+        video_id_list = VideoidList.create([f"sm1000000{i}" for i in video_nums])
+        title_list = TitleList.create([f"テスト動画{i}" for i in video_nums])
+        registered_at_list = RegisteredAtList.create([f"2022-05-06 00:01:0{i}" for i in video_nums])
+        video_url_list = VideoURLList.create([f"https://www.nicovideo.jp/watch/sm1000000{i}" for i in video_nums])
+        return (video_id_list, title_list, registered_at_list, video_url_list)
+
+    def _get_fetched_page_video_info(self, url: str, video_nums: list[int]) -> FetchedPageVideoInfo:
+        """video_nums を動画番号とする FetchedPageVideoInfo を返す"""
+        return FetchedPageVideoInfo(
+            list(range(1, len(video_nums) + 1)),
+            Userid("11111111"),
+            Mylistid(""),
+            Showname("投稿者1さんの投稿動画"),
+            Myshowname("投稿動画"),
+            MylistURLFactory.create(url),
+            *self._get_video_lists(video_nums),
+        )
+
     def test_init(self):
         urls = self._get_url_set()
         for url in urls:
             instance = VideoInfoFetcher(url)
             expect_mylist_url = MylistURLFactory.create(url)
             self.assertEqual(expect_mylist_url, instance.mylist_url)
+            self.assertIsNone(instance.known_video_id_list)
+            self.assertEqual(False, instance.is_backfill)
+
+        instance = VideoInfoFetcher(urls[0], ["sm10000001"], True)
+        self.assertEqual(["sm10000001"], instance.known_video_id_list)
+        self.assertEqual(True, instance.is_backfill)
+
+    def test_first_request_url(self):
+        self.enterContext(
+            patch("nnmm.video_info_fetcher.value_objects.series_url.SeriesURL._make_action_track_id", lambda s: "id")
+        )
+        uploaded_url, _, mylist_url, _, _, series_url = self._get_url_set()
+        page_size = MylistPageIterator.PAGE_SIZE
+
+        # ページングしない場合は fetch_url を取得する
+        for url in [uploaded_url, mylist_url, series_url]:
+            for known_video_id_list in [None, []]:
+                instance = VideoInfoFetcher(url, known_video_id_list)
+                self.assertEqual(False, instance.is_paging)
+                self.assertEqual(False, instance.is_first_page_aligned)
+                self.assertEqual(instance.mylist_url.fetch_url, instance.first_request_url)
+
+        # ページングする場合、マイリスト/シリーズは page_url の 1ページ目を取得する
+        for url in [mylist_url, series_url]:
+            for args in [(["sm10000001"],), ([], True)]:
+                instance = VideoInfoFetcher(url, *args)
+                self.assertEqual(True, instance.is_paging)
+                self.assertEqual(True, instance.is_first_page_aligned)
+                self.assertEqual(instance.mylist_url.page_url(1, page_size), instance.first_request_url)
+
+        # 投稿動画の fetch_url は page_url とは別のページのため、ページングする場合も fetch_url を取得する
+        instance = VideoInfoFetcher(uploaded_url, ["sm10000001"])
+        self.assertEqual(True, instance.is_paging)
+        self.assertEqual(False, instance.is_first_page_aligned)
+        self.assertEqual(instance.mylist_url.fetch_url, instance.first_request_url)
+
+    async def test_fetch_pages(self):
+        self.enterContext(patch("nnmm.video_info_fetcher.video_info_fetcher.logger.info"))
+        mock_iterator = self.enterContext(patch("nnmm.video_info_fetcher.video_info_fetcher.MylistPageIterator"))
+
+        uploaded_url, _, mylist_url, _, _, series_url = self._get_url_set()
+        response_text = "response_text"
+
+        def prerun(instance: VideoInfoFetcher, pages: list[list[int]], page_size: int = 2, is_ascending: bool = False):
+            async def iterate(start_page, first_response_text):
+                for i, video_nums in enumerate(pages):
+                    yield MylistPage(start_page + i, 6, *self._get_video_lists(video_nums))
+
+            known_video_id_set = set(instance.known_video_id_list or [])
+
+            def is_reached_known(video_id_list):
+                if instance.is_backfill:
+                    return False
+                return any(video_id.id in known_video_id_set for video_id in video_id_list)
+
+            mock_iterator.reset_mock()
+            mock_iterator.return_value.page_size = page_size
+            mock_iterator.return_value.is_ascending = is_ascending
+            mock_iterator.return_value.is_reached_known.side_effect = is_reached_known
+            mock_iterator.return_value.iterate.side_effect = iterate
+
+        # known_video_id_list も is_backfill も指定されていない場合はページングしない
+        # known_video_id_list が空の場合も is_backfill でなければページングしない
+        fetched_d = self._get_fetched_page_video_info(uploaded_url, [9, 8])
+        for known_video_id_list in [None, []]:
+            instance = VideoInfoFetcher(uploaded_url, known_video_id_list)
+            prerun(instance, [[9, 8], [7, 6]])
+            actual = await instance._fetch_pages(fetched_d, response_text)
+            self.assertIs(fetched_d, actual)
+            mock_iterator.assert_not_called()
+
+        # 投稿動画: fetch_url の返り値に取得済の動画が含まれていればページングしない
+        instance = VideoInfoFetcher(uploaded_url, ["sm10000008"])
+        prerun(instance, [[9, 8], [7, 6]])
+        actual = await instance._fetch_pages(fetched_d, response_text)
+        self.assertIs(fetched_d, actual)
+        mock_iterator.return_value.iterate.assert_not_called()
+
+        # 投稿動画: 含まれていなければ 1ページ目から辿り直し、メタ情報のみ fetched_d から引き継ぐ
+        # ページ境界のずれによる重複は除外する
+        instance = VideoInfoFetcher(uploaded_url, ["sm10000005"])
+        prerun(instance, [[9, 8, 7], [7, 6, 5]])
+        actual = await instance._fetch_pages(fetched_d, response_text)
+        expect = self._get_fetched_page_video_info(uploaded_url, [9, 8, 7, 6, 5])
+        self.assertEqual(expect, actual)
+        self.assertEqual(
+            [
+                call(instance.mylist_url, instance._get_session_response, ["sm10000005"], False),
+                call().is_reached_known(fetched_d.video_id_list),
+                call().iterate(1, response_text),
+                call().is_reached_known(VideoidList.create(["sm10000009", "sm10000008", "sm10000007"])),
+                call().is_reached_known(VideoidList.create(["sm10000007", "sm10000006", "sm10000005"])),
+            ],
+            mock_iterator.mock_calls,
+        )
+
+        # マイリスト: 1ページ目に取得済の動画が含まれていれば2ページ目以降を辿らない
+        fetched_d = self._get_fetched_page_video_info(mylist_url, [9, 8])
+        instance = VideoInfoFetcher(mylist_url, ["sm10000008"])
+        prerun(instance, [[7, 6]])
+        actual = await instance._fetch_pages(fetched_d, response_text)
+        self.assertIs(fetched_d, actual)
+        mock_iterator.return_value.iterate.assert_not_called()
+
+        # マイリスト: 1ページ目が最終ページならば2ページ目以降を辿らない
+        instance = VideoInfoFetcher(mylist_url, [], True)
+        prerun(instance, [[7, 6]], page_size=100)
+        actual = await instance._fetch_pages(fetched_d, response_text)
+        self.assertIs(fetched_d, actual)
+        mock_iterator.return_value.iterate.assert_not_called()
+
+        # マイリスト: 1ページ目に続けて2ページ目以降を結合する
+        instance = VideoInfoFetcher(mylist_url, ["sm10000005"])
+        prerun(instance, [[7, 6], [5]])
+        actual = await instance._fetch_pages(fetched_d, response_text)
+        expect = self._get_fetched_page_video_info(mylist_url, [9, 8, 7, 6, 5])
+        self.assertEqual(expect, actual)
+        mock_iterator.return_value.iterate.assert_called_once_with(2, response_text)
+
+        # シリーズ: 最終ページから遡り、取得済の動画で打ち切った場合は 1ページ目を結合しない
+        fetched_d = self._get_fetched_page_video_info(series_url, [1, 2])
+        instance = VideoInfoFetcher(series_url, ["sm10000004"])
+        prerun(instance, [[5], [3, 4]], is_ascending=True)
+        actual = await instance._fetch_pages(fetched_d, response_text)
+        expect = self._get_fetched_page_video_info(series_url, [5, 3, 4])
+        self.assertEqual(expect, actual)
+        mock_iterator.return_value.iterate.assert_called_once_with(2, response_text)
+
+        # シリーズ: 打ち切らなかった場合は最後に 1ページ目を結合する
+        instance = VideoInfoFetcher(series_url, [], True)
+        prerun(instance, [[5], [3, 4]], is_ascending=True)
+        actual = await instance._fetch_pages(fetched_d, response_text)
+        expect = self._get_fetched_page_video_info(series_url, [5, 3, 4, 1, 2])
+        self.assertEqual(expect, actual)
+
+        # 2ページ目以降が無ければ fetched_d をそのまま返す
+        instance = VideoInfoFetcher(series_url, ["sm10000001"])
+        prerun(instance, [], is_ascending=True)
+        actual = await instance._fetch_pages(fetched_d, response_text)
+        self.assertIs(fetched_d, actual)
+
+        # 最初の取得結果が空ならばページングしない
+        instance = VideoInfoFetcher(uploaded_url, is_backfill=True)
+        prerun(instance, [[7, 6]])
+        empty_d = self._get_fetched_page_video_info(uploaded_url, [])
+        actual = await instance._fetch_pages(empty_d, response_text)
+        self.assertIs(empty_d, actual)
+        mock_iterator.assert_not_called()
+
+    def test_exclude_known_videos(self):
+        url = self._get_url_set()[0]
+        fetched_d = self._get_fetched_page_video_info(url, [9, 8, 7])
+
+        # 取得済の動画を除く
+        instance = VideoInfoFetcher(url, ["sm10000008", "sm10000001"])
+        actual = instance._exclude_known_videos(fetched_d)
+        self.assertEqual(self._get_fetched_page_video_info(url, [9, 7]), actual)
+
+        # すべて取得済ならば動画一覧は空となる
+        instance = VideoInfoFetcher(url, ["sm10000009", "sm10000008", "sm10000007"])
+        actual = instance._exclude_known_videos(fetched_d)
+        self.assertEqual(self._get_fetched_page_video_info(url, []), actual)
+
+        # 除く必要がない場合は fetched_d をそのまま返す
+        for args in [(None,), ([],), (["sm10000008"], True), (["sm10000001"],)]:
+            instance = VideoInfoFetcher(url, *args)
+            self.assertIs(fetched_d, instance._exclude_known_videos(fetched_d))
+
+    async def test_fetch_request_count(self):
+        """取得済の動画に到達している場合のリクエスト数のテスト"""
+        self.enterContext(patch("nnmm.video_info_fetcher.video_info_fetcher.logger.info"))
+        mock_config = self.enterContext(patch("nnmm.config_store.ConfigStore.get_config"))
+        mock_config.return_value = {"general": {"rss_save_path": RSS_PATH}}
+        self.addCleanup(VideoInfoFetcher.configure_transport, None)
+
+        def to_item(i: int) -> dict:
+            return {"id": f"sm1000000{i}", "title": f"テスト動画{i}", "registeredAt": f"2022-05-06T00:01:0{i}+09:00"}
+
+        def thumbinfo(i: int) -> str:
+            return (
+                "<nicovideo_thumb_response><thumb>"
+                f"<title>テスト動画{i}</title><first_retrieve>2022-05-06T00:00:0{i}+09:00</first_retrieve>"
+                f"<watch_url>https://www.nicovideo.jp/watch/sm1000000{i}</watch_url>"
+                "<user_nickname>投稿者1</user_nickname>"
+                "</thumb></nicovideo_thumb_response>"
+            )
+
+        request_url_list = []
+
+        def make_transport(page_response: httpx.Response) -> httpx.MockTransport:
+            def handler(request: httpx.Request) -> httpx.Response:
+                request_url_list.append(str(request.url))
+                if request.url.host == "ext.nicovideo.jp":
+                    return httpx.Response(200, text=thumbinfo(int(request.url.path[-1])))
+                return page_response
+
+            return httpx.MockTransport(handler)
+
+        # マイリスト: 1ページ目がすべて取得済ならば、1ページ目の取得のみで動画情報APIは引かない
+        url = self._get_url_set()[2]
+        data = {
+            "data": {
+                "mylist": {
+                    "name": "マイリスト1",
+                    "owner": {"name": "投稿者1"},
+                    "items": [{"video": to_item(i)} for i in [3, 2, 1]],
+                    "totalItemCount": 3,
+                }
+            }
+        }
+        VideoInfoFetcher.configure_transport(make_transport(httpx.Response(200, json=data)))
+        instance = VideoInfoFetcher(url, ["sm10000003", "sm10000002", "sm10000001"])
+        actual = await instance._fetch_videoinfo_from_fetch_url()
+        self.assertEqual(0, len(actual.video_id_list))
+        self.assertEqual([instance.mylist_url.page_url(1, MylistPageIterator.PAGE_SIZE)], request_url_list)
+
+        # 投稿動画: fetch_url の返り値に取得済の動画が含まれていれば、新しい動画の分のみ動画情報APIを引く
+        request_url_list.clear()
+        url = self._get_url_set()[0]
+        initial_data = {
+            "state": {"userDetails": {"userDetails": {"user": {"nickname": "投稿者1"}}}},
+            "nvapi": [{"body": {"data": {"items": [{"essential": to_item(i)} for i in [4, 3, 2, 1]]}}}],
+        }
+        attribute_value = html.escape(orjson.dumps(initial_data).decode())
+        text = f'<div id="js-initial-userpage-data" data-initial-data="{attribute_value}"></div>'
+        VideoInfoFetcher.configure_transport(make_transport(httpx.Response(200, text=text)))
+        instance = VideoInfoFetcher(url, ["sm10000003", "sm10000002", "sm10000001"])
+        actual = await instance._fetch_videoinfo_from_fetch_url()
+        self.assertEqual(VideoidList.create(["sm10000004"]), actual.video_id_list)
+        self.assertEqual(
+            [instance.mylist_url.fetch_url, VideoInfoFetcher.API_URL_BASE + "sm10000004"], request_url_list
+        )
 
     async def test_analysis_response_text(self):
         self.enterContext(patch("nnmm.video_info_fetcher.video_info_fetcher.logger.error"))
-        mock_create = self.enterContext(patch("nnmm.video_info_fetcher.video_info_fetcher.ParserFactory.create"))
+        mock_parse = self.enterContext(patch("nnmm.video_info_fetcher.video_info_fetcher.ParseExecutor.parse"))
 
-        async def f():
-            return "parser.parse()"
+        async def f(mylist_type, url, response_text):
+            return "ParseExecutor.parse()"
 
-        mock_create.return_value.parse.side_effect = f
+        mock_parse.side_effect = f
 
         response_text = "response_text"
         urls = self._get_url_set()
         for url in urls:
             instance = VideoInfoFetcher(url)
 
-            mock_create.reset_mock()
+            mock_parse.reset_mock()
             actual = await instance._analysis_response_text(response_text)
-            expect = "parser.parse()"
+            expect = "ParseExecutor.parse()"
             self.assertEqual(expect, actual)
 
             mylist_url = MylistURLFactory.create(url)
             non_query_url = mylist_url.non_query_url
             mylist_type = mylist_url.mylist_type
-            self.assertEqual([call(mylist_type, non_query_url, response_text), call().parse()], mock_create.mock_calls)
+            self.assertEqual([call(mylist_type, non_query_url, response_text)], mock_parse.mock_calls)
 
-        mock_create.side_effect = ValueError
+        mock_parse.side_effect = ValueError
         url = urls[0]
         with self.assertRaises(ValueError):
             instance = VideoInfoFetcher(url)
@@ -72,7 +339,7 @@ class TestVideoInfoFetcher(unittest.IsolatedAsyncioTestCase):
 
     async def test_fetch_videoinfo_from_fetch_url(self):
         self.enterContext(patch("nnmm.video_info_fetcher.video_info_fetcher.logger.error"))
-        mock_config = self.enterContext(patch("nnmm.process.config.ConfigBase.get_config"))
+        mock_config = self.enterContext(patch("nnmm.config_store.ConfigStore.get_config"))
         mock_session = self.enterContext(
             patch("nnmm.video_info_fetcher.video_info_fetcher.VideoInfoFetcher._get_session_response")
         )
@@ -256,6 +523,14 @@ class TestVideoInfoFetcher(unittest.IsolatedAsyncioTestCase):
                     actual = await instance._fetch_videoinfo_from_fetch_url()
             postrun(*params)
 
+        # マイリストが削除されていた場合は恒久的な失敗として送出する
+        instance = VideoInfoFetcher(url)
+        prerun(*params_list[-1])
+        instance.last_status_code = 404
+        with self.assertRaises(PermanentFetchError):
+            actual = await instance._fetch_videoinfo_from_fetch_url()
+        mock_analysis.assert_not_called()
+
     async def test_fetch_videoinfo(self):
         mock_fetch_videoinfo_from_fetch_url = self.enterContext(
             patch("nnmm.video_info_fetcher.video_info_fetcher.VideoInfoFetcher._fetch_videoinfo_from_fetch_url")
@@ -5,8 +5,10 @@ from itertools import repeat
 from urllib.error import HTTPError
 from urllib.parse import urlparse
 
+import httpx
 from mock import AsyncMock, MagicMock, patch
 
+from nnmm.update_trace import SpanStage, UpdateTrace, bind
 from nnmm.util import Result
 from nnmm.video_info_fetcher.value_objects.fetched_api_video_info import FetchedAPIVideoInfo
 from nnmm.video_info_fetcher.value_objects.fetched_video_info import FetchedVideoInfo
@@ -20,13 +22,13 @@ from nnmm.video_info_fetcher.value_objects.username_list import UsernameList
 from nnmm.video_info_fetcher.value_objects.video_url import VideoURL
 from nnmm.video_info_fetcher.value_objects.video_url_list import VideoURLList
 from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
-from nnmm.video_info_fetcher.video_info_fetcher_base import VideoInfoFetcherBase
+from nnmm.video_info_fetcher.video_info_fetcher_base import PermanentFetchError, VideoInfoFetcherBase
 
 
 # テスト用具体化ProcessBase
 class ConcreteVideoInfoFetcher(VideoInfoFetcherBase):
-    def __init__(self, url: str) -> None:
-        super().__init__(url)
+    def __init__(self, url: str, known_video_id_list: list[str] | None = None, is_backfill: bool = False) -> None:
+        super().__init__(url, known_video_id_list, is_backfill)
 
     async def _fetch_videoinfo(self) -> FetchedVideoInfo:
         return "test_fetch_videoinfo"
@@ -63,6 +65,7 @@ class TestVideoInfoFetcherBase(unittest.IsolatedAsyncioTestCase):
             instance = ConcreteVideoInfoFetcher(url)
             expect_url = MylistURLFactory.create(url)
             self.assertEqual(expect_url, instance.mylist_url)
+            self.assertIsNone(instance.last_status_code)
 
             API_URL_BASE = "https://ext.nicovideo.jp/api/getthumbinfo/"
             self.assertEqual(API_URL_BASE, VideoInfoFetcherBase.API_URL_BASE)
@@ -94,6 +97,7 @@ class TestVideoInfoFetcherBase(unittest.IsolatedAsyncioTestCase):
         actual = await instance._get_session_response(request_url)
         expect = mock_response
         self.assertEqual(expect, actual)
+        self.assertEqual(mock_response.status_code, instance.last_status_code)
 
         # 呼び出し確認::TODO
 
@@ -109,6 +113,113 @@ class TestVideoInfoFetcherBase(unittest.IsolatedAsyncioTestCase):
         expect = None
         self.assertEqual(expect, actual)
 
+    async def test_configure_transport(self):
+        mock_firefox = self.enterContext(
+            patch("nnmm.video_info_fetcher.video_info_fetcher_base.browser_cookie3.firefox")
+        )
+        self.addCleanup(VideoInfoFetcherBase.configure_transport, None)
+
+        request_url_list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            request_url_list.append(str(request.url))
+            if request.url.host == "ext.nicovideo.jp":
+                index = int(request.url.path.split("/")[-1][2:])
+                return httpx.Response(200, text=self._make_api_xml(index))
+            return httpx.Response(200, text="page")
+
+        # 差し替えたトランスポートで通信し、ブラウザのクッキーは読み込まない
+        VideoInfoFetcherBase.configure_transport(httpx.MockTransport(handler))
+        url = self._get_url_set()[0]
+        instance = ConcreteVideoInfoFetcher(url)
+        actual = await instance._get_session_response(instance.mylist_url.fetch_url)
+        self.assertEqual("page", actual.text)
+        self.assertEqual(200, instance.last_status_code)
+        mock_firefox.assert_not_called()
+
+        actual = await instance._get_videoinfo_from_api(VideoidList.create(["sm1", "sm2"]))
+        self.assertEqual(["sm1", "sm2"], [video_id.id for video_id in actual.video_id_list])
+        expect = [
+            instance.mylist_url.fetch_url,
+            "https://ext.nicovideo.jp/api/getthumbinfo/sm1",
+            "https://ext.nicovideo.jp/api/getthumbinfo/sm2",
+        ]
+        self.assertEqual(expect, request_url_list)
+
+        # エラー応答はそのまま失敗として扱う
+        VideoInfoFetcherBase.configure_transport(httpx.MockTransport(lambda request: httpx.Response(429)))
+        actual = await instance._get_session_response(instance.mylist_url.fetch_url)
+        self.assertIsNone(actual)
+        self.assertEqual(429, instance.last_status_code)
+
+        # Noneで実際のサイトに接続する設定に戻す
+        VideoInfoFetcherBase.configure_transport(None)
+        self.assertIsInstance(VideoInfoFetcherBase._create_transport(1), httpx.AsyncHTTPTransport)
+        self.assertEqual(mock_firefox.return_value, VideoInfoFetcherBase._load_cookies())
+        mock_firefox.assert_called_once_with(domain_name="nicovideo.jp")
+
+        with self.assertRaises(ValueError):
+            VideoInfoFetcherBase.configure_transport("invalid")
+
+    async def test_get_trace_kwargs(self):
+        # スパンを記録していなければ何も渡さない
+        attrs = {}
+        self.assertEqual({}, VideoInfoFetcherBase._get_trace_kwargs(attrs))
+        self.assertEqual({}, attrs)
+
+        # TCP接続の開始イベントの2回目以降をリトライとして数える
+        url = self._get_url_set()[0]
+        with bind(UpdateTrace(), url):
+            actual = VideoInfoFetcherBase._get_trace_kwargs(attrs)
+        self.assertEqual(0, attrs["retry_count"])
+        trace = actual["extensions"]["trace"]
+        for event_name in [
+            "connection.connect_tcp.started",
+            "connection.connect_tcp.failed",
+            "connection.connect_tcp.started",
+            "connection.connect_tcp.complete",
+            "http11.send_request_headers.started",
+        ]:
+            await trace(event_name, {})
+        self.assertEqual(1, attrs["retry_count"])
+
+    def test_is_permanent_failure(self):
+        url = self._get_url_set()[0]
+        instance = ConcreteVideoInfoFetcher(url)
+        self.assertFalse(instance.is_permanent_failure())
+        for status_code, expect in [(200, False), (403, False), (404, True), (410, True), (503, False)]:
+            instance.last_status_code = status_code
+            self.assertEqual(expect, instance.is_permanent_failure())
+
+    async def test_probe(self):
+        mock_session = self.enterContext(
+            patch("nnmm.video_info_fetcher.video_info_fetcher_base.VideoInfoFetcherBase._get_session_response")
+        )
+        url = self._get_url_set()[0]
+        fetch_url = MylistURLFactory.create(url).fetch_url
+
+        # 取得できた場合
+        mock_session.return_value = MagicMock()
+        actual = await ConcreteVideoInfoFetcher.probe(url)
+        self.assertTrue(actual)
+        mock_session.assert_awaited_once_with(fetch_url, max_retry_num=0)
+
+        # 一時的な失敗の場合
+        mock_session.return_value = None
+        actual = await ConcreteVideoInfoFetcher.probe(url)
+        self.assertFalse(actual)
+
+        # 依然として恒久的な失敗の場合
+        async def f(self, request_url, max_retry_num=None):
+            self.last_status_code = 404
+            return None
+
+        self.enterContext(
+            patch("nnmm.video_info_fetcher.video_info_fetcher_base.VideoInfoFetcherBase._get_session_response", f)
+        )
+        with self.assertRaises(PermanentFetchError):
+            actual = await ConcreteVideoInfoFetcher.probe(url)
+
     async def test_get_videoinfo_from_api(self):
         mock_logger_error = self.enterContext(patch("nnmm.video_info_fetcher.video_info_fetcher_base.logger.error"))
         mock_async_client = self.enterContext(
@@ -160,6 +271,18 @@ class TestVideoInfoFetcherBase(unittest.IsolatedAsyncioTestCase):
         actual = await instance._get_videoinfo_from_api(video_id_list)
         self.assertEqual(expect, actual)
 
+        # スパンを記録中なら、動画ごとの動画情報APIの取得と、応答の解析の所要時間を記録する
+        mock_get.get.side_effect = lambda url, **kwargs: make_response(url)
+        trace = UpdateTrace()
+        with bind(trace, url):
+            actual = await instance._get_videoinfo_from_api(video_id_list)
+        self.assertEqual(expect, actual)
+        span_list = trace.span_list
+        self.assertEqual([SpanStage.api_lookup] * num + [SpanStage.parse], [s.stage for s in span_list])
+        self.assertEqual(video_id_str_list, [s.attrs["video_id"] for s in span_list[:num]])
+        self.assertEqual({"kind": "api"}, span_list[-1].attrs)
+        mock_get.get.side_effect = lambda url: make_response(url)
+
         # 呼び出し確認::TODO
 
         mock_get.reset_mock()
@@ -193,6 +316,13 @@ class TestVideoInfoFetcherBase(unittest.IsolatedAsyncioTestCase):
         actual = await VideoInfoFetcherBase.fetch_videoinfo(url)
         self.assertEqual(Result.failed, actual)
 
+        # 恒久的な失敗は Result.failed にせず送出する
+        self.enterContext(
+            patch.object(ConcreteVideoInfoFetcher, "_fetch_videoinfo", AsyncMock(side_effect=PermanentFetchError))
+        )
+        with self.assertRaises(PermanentFetchError):
+            actual = await ConcreteVideoInfoFetcher.fetch_videoinfo(url)
+
 
 if __name__ == "__main__":
     if sys.argv:
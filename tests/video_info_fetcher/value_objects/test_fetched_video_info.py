@@ -248,6 +248,42 @@ class TestFetchedVideoInfo(unittest.TestCase):
         self.assertEqual(instance.result_dict, actual_result_dict)
         self.assertEqual(instance.result, actual_result_dict)
 
+    def test_result_rows(self):
+        self.enterContext(freezegun.freeze_time("2023-04-01 00:01:00"))
+        instance = self.make_instance(5)
+        expect = tuple(tuple(d.values()) for d in instance._make_result_dict())
+        self.assertEqual(5, len(expect))
+
+        # 初回参照時に作成してキャッシュする
+        self.assertNotIn("result_rows", instance.__dict__)
+        actual = instance.result_rows
+        self.assertEqual(expect, actual)
+        self.assertIs(actual, instance.result_rows)
+        self.assertEqual(list(expect), list(instance.iter_result_rows()))
+        self.assertEqual([dict(zip(FetchedVideoInfo.RESULT_DICT_COLS, row)) for row in expect], instance.result_dict)
+        self.assertIs(instance.result_dict, instance.result)
+
+        # キャッシュ後は日時が変わっても作り直さない
+        self.enterContext(freezegun.freeze_time("2023-03-28 00:01:00"))
+        self.assertEqual(expect, instance.result_rows)
+        self.assertNotEqual(list(expect), [tuple(d.values()) for d in instance._make_result_dict()])
+
+        # 重複した動画IDは最初の1件のみ残す
+        instance = self.make_instance(5)
+        d = instance.to_dict()
+        d["video_url_list"] = VideoURLList.create([
+            "https://www.nicovideo.jp/watch/sm10000000",
+            "https://www.nicovideo.jp/watch/sm10000001",
+            "https://www.nicovideo.jp/watch/sm10000000",
+            "https://www.nicovideo.jp/watch/sm10000002",
+            "https://www.nicovideo.jp/watch/sm10000001",
+        ])
+        d["video_id_list"] = VideoidList.create(d["video_url_list"].video_id_list)
+        d["registered_at_list"] = RegisteredAtList.create(["2023-03-27 00:00:00"] * 5)
+        instance = FetchedVideoInfo(**d)
+        actual = [(row[0], row[1]) for row in instance.iter_result_rows()]
+        self.assertEqual([(1, "sm10000000"), (2, "sm10000001"), (4, "sm10000002")], actual)
+
     def test_to_dict(self):
         instance = self.make_instance(5)
 
@@ -290,10 +326,11 @@ class TestFetchedVideoInfo(unittest.TestCase):
             "registered_at_list": instance.registered_at_list,
             "video_url_list": instance.video_url_list,
             "username_list": instance.username_list,
-            "result_dict": expect_result_dict,
         }
         actual = instance.to_dict()
         self.assertEqual(expect, actual)
+        # 結果の辞書は項目に含まれない
+        self.assertEqual(expect_result_dict, instance.result_dict)
 
     def test_merge(self):
         instance = self.make_instance(5)
@@ -0,0 +1,103 @@
+import sys
+import unittest
+
+from mock import MagicMock
+
+from nnmm.video_info_fetcher.value_objects.intern_cache import InternCache
+
+
+class TestInternCache(unittest.TestCase):
+    def test_init(self):
+        instance = InternCache("test")
+        self.assertEqual("test", instance.name)
+        self.assertEqual(InternCache.DEFAULT_MAXSIZE, instance.maxsize)
+        self.assertEqual(0, instance.hits)
+        self.assertEqual(0, instance.misses)
+        self.assertEqual(0, len(instance))
+        self.assertEqual(0.0, instance.hit_rate)
+        self.assertIn(instance, InternCache._registry)
+
+        instance = InternCache("test", 0)
+        self.assertEqual(0, instance.maxsize)
+
+        with self.assertRaises(TypeError):
+            instance = InternCache(None)
+        with self.assertRaises(ValueError):
+            instance = InternCache("test", -1)
+        with self.assertRaises(ValueError):
+            instance = InternCache("test", "1")
+
+    def test_get_or_create(self):
+        instance = InternCache("test", 2)
+        factory = MagicMock(side_effect=lambda: object())
+
+        # 初回は生成し、2回目以降は生成済のインスタンスを返す
+        first = instance.get_or_create("a", factory)
+        self.assertIs(first, instance.get_or_create("a", factory))
+        self.assertEqual(1, factory.call_count)
+        self.assertEqual(1, instance.hits)
+        self.assertEqual(1, instance.misses)
+        self.assertEqual(0.5, instance.hit_rate)
+
+        # 上限を超えたら最も長く参照されていないものから捨てる
+        instance.get_or_create("b", factory)
+        instance.get_or_create("a", factory)
+        instance.get_or_create("c", factory)
+        self.assertEqual(2, len(instance))
+        self.assertIs(first, instance.get_or_create("a", factory))
+        self.assertEqual(3, factory.call_count)
+        instance.get_or_create("b", factory)
+        self.assertEqual(4, factory.call_count)
+
+        # 生成に失敗した場合はキャッシュしない
+        instance = InternCache("test", 2)
+        factory = MagicMock(side_effect=ValueError)
+        with self.assertRaises(ValueError):
+            instance.get_or_create("a", factory)
+        self.assertEqual(0, len(instance))
+
+        # maxsize が0ならキャッシュしない
+        instance = InternCache("test", 0)
+        factory = MagicMock(side_effect=lambda: object())
+        self.assertIsNot(instance.get_or_create("a", factory), instance.get_or_create("a", factory))
+        self.assertEqual(0, len(instance))
+        self.assertEqual(2, instance.misses)
+
+    def test_set_maxsize(self):
+        instance = InternCache("test", 3)
+        for key in ["a", "b", "c"]:
+            instance.get_or_create(key, object)
+        instance.set_maxsize(1)
+        self.assertEqual(1, instance.maxsize)
+        self.assertEqual(1, len(instance))
+        instance.get_or_create("c", object)
+        self.assertEqual(1, instance.hits)
+
+        with self.assertRaises(ValueError):
+            instance.set_maxsize(-1)
+
+    def test_clear(self):
+        instance = InternCache("test")
+        instance.get_or_create("a", object)
+        instance.get_or_create("a", object)
+        instance.clear()
+        self.assertEqual(0, len(instance))
+        self.assertEqual(0, instance.hits)
+        self.assertEqual(0, instance.misses)
+
+    def test_stats(self):
+        instance = InternCache("test_stats", 10)
+        instance.get_or_create("a", object)
+        instance.get_or_create("a", object)
+        instance.get_or_create("a", object)
+        instance.get_or_create("b", object)
+        expect = {"name": "test_stats", "size": 2, "maxsize": 10, "hits": 2, "misses": 2, "hit_rate": 0.5}
+        self.assertEqual(expect, instance.stats())
+        self.assertIn(expect, InternCache.all_stats())
+        self.assertEqual("InternCache('test_stats', size=2/10, hit_rate=0.500)", repr(instance))
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
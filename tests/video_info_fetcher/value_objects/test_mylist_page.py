@@ -0,0 +1,86 @@
+"""MylistPage のテスト
+
+MylistPage の各種機能をテストする
+"""
+
+import sys
+import unittest
+from dataclasses import FrozenInstanceError
+
+from nnmm.video_info_fetcher.value_objects.mylist_page import MylistPage
+from nnmm.video_info_fetcher.value_objects.registered_at_list import RegisteredAtList
+from nnmm.video_info_fetcher.value_objects.title_list import TitleList
+from nnmm.video_info_fetcher.value_objects.video_url_list import VideoURLList
+from nnmm.video_info_fetcher.value_objects.videoid_list import VideoidList
+
+
+class TestMylistPage(unittest.TestCase):
+    def _make_args(self, num: int = 2) -> tuple:
+        video_url_list = VideoURLList.create([f"https://www.nicovideo.jp/watch/sm1234567{i}" for i in range(num)])
+        video_id_list = VideoidList.create(video_url_list.video_id_list)
+        title_list = TitleList.create([f"テスト動画{i}" for i in range(num)])
+        registered_at_list = RegisteredAtList.create([f"2022-05-06 00:01:0{i}" for i in range(num)])
+        return (video_id_list, title_list, registered_at_list, video_url_list)
+
+    def test_MylistPageInit(self):
+        """MylistPage の初期化後の状態をテストする"""
+        video_id_list, title_list, registered_at_list, video_url_list = self._make_args()
+
+        # 正常系
+        mylist_page = MylistPage(2, 150, video_id_list, title_list, registered_at_list, video_url_list)
+        self.assertEqual(2, mylist_page.page)
+        self.assertEqual(150, mylist_page.total_count)
+        self.assertEqual(video_id_list, mylist_page.video_id_list)
+        self.assertEqual(title_list, mylist_page.title_list)
+        self.assertEqual(registered_at_list, mylist_page.registered_at_list)
+        self.assertEqual(video_url_list, mylist_page.video_url_list)
+        self.assertEqual(2, len(mylist_page))
+
+        # 空ページも許容する
+        mylist_page = MylistPage(1, 0, *self._make_args(0))
+        self.assertEqual(0, len(mylist_page))
+
+        # 異常系
+        # インスタンス変数を後から変えようとする -> frozen違反
+        with self.assertRaises(FrozenInstanceError):
+            mylist_page = MylistPage(2, 150, video_id_list, title_list, registered_at_list, video_url_list)
+            mylist_page.page = 3
+
+    def test_is_valid(self):
+        """_is_valid のテスト"""
+        video_id_list, title_list, registered_at_list, video_url_list = self._make_args()
+
+        # 正常系
+        mylist_page = MylistPage(1, 2, video_id_list, title_list, registered_at_list, video_url_list)
+        self.assertEqual(True, mylist_page._is_valid())
+
+        # 異常系
+        # 型が不正
+        with self.assertRaises(TypeError):
+            mylist_page = MylistPage("1", 2, video_id_list, title_list, registered_at_list, video_url_list)
+        with self.assertRaises(TypeError):
+            mylist_page = MylistPage(1, "2", video_id_list, title_list, registered_at_list, video_url_list)
+        with self.assertRaises(TypeError):
+            mylist_page = MylistPage(1, 2, [], title_list, registered_at_list, video_url_list)
+        with self.assertRaises(TypeError):
+            mylist_page = MylistPage(1, 2, video_id_list, [], registered_at_list, video_url_list)
+        with self.assertRaises(TypeError):
+            mylist_page = MylistPage(1, 2, video_id_list, title_list, [], video_url_list)
+        with self.assertRaises(TypeError):
+            mylist_page = MylistPage(1, 2, video_id_list, title_list, registered_at_list, [])
+
+        # ページ番号が1未満
+        with self.assertRaises(ValueError):
+            mylist_page = MylistPage(0, 2, video_id_list, title_list, registered_at_list, video_url_list)
+
+        # List系の大きさが異なる
+        with self.assertRaises(ValueError):
+            mylist_page = MylistPage(
+                1, 2, video_id_list, TitleList.create(["テスト動画0"]), registered_at_list, video_url_list
+            )
+
+
+if __name__ == "__main__":
+    if sys.argv:
+        del sys.argv[1:]
+    unittest.main(warnings="ignore")
@@ -44,6 +44,14 @@ class TestMylistURLFactory(unittest.TestCase):
             expect = expect_mylist_url(url)
             self.assertEqual(expect, actual)
 
+        # 同じURL文字列に対しては同じインスタンスを返す
+        for url in urls:
+            hits = MylistURLFactory._intern_cache.hits
+            actual = MylistURLFactory.create(url)
+            self.assertIs(actual, MylistURLFactory.create(url))
+            self.assertIs(actual, MylistURLFactory.create(URL(url)))
+            self.assertEqual(hits + 3, MylistURLFactory._intern_cache.hits)
+
         url = "https://不正なURLアドレス/user/6063658/mylist/72036443"
         with self.assertRaises(ValueError):
             expect = expect_mylist_url(url)
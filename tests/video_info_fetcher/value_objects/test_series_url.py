@@ -73,6 +73,19 @@ class TestSeriesURL(unittest.TestCase):
         self.assertEqual(expect, actual)
         self.assertEqual(expect, instance.fetch_url)
 
+    def test_page_url(self):
+        mock_get_fetch_url = self.enterContext(
+            patch("nnmm.video_info_fetcher.value_objects.series_url.SeriesURL._get_fetch_url")
+        )
+        mock_get_fetch_url.side_effect = lambda: "https://nvapi.nicovideo.jp/v1/series/123456?_frontendId=6"
+
+        url = "https://www.nicovideo.jp/user/1234567/series/123456"
+        instance = SeriesURL(url)
+        actual = instance.page_url(2, 100)
+        expect = "https://nvapi.nicovideo.jp/v1/series/123456?_frontendId=6&page=2&pageSize=100"
+        self.assertEqual(expect, actual)
+        mock_get_fetch_url.assert_called_once_with()
+
     def test_create(self):
         url = "https://www.nicovideo.jp/user/1234567/series/123456?ref=pc_mypage_nicorepo"
         series_url = SeriesURL.create(url)
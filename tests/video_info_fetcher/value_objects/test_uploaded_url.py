@@ -38,6 +38,17 @@ class TestUploadedURL(unittest.TestCase):
             uploaded_url = UploadedURL(url)
             uploaded_url.original_url = url + "FrozenError"
 
+    def test_page_url(self):
+        """page_url のテスト"""
+        url = "https://www.nicovideo.jp/user/1234567/video?ref=pc_mypage_nicorepo"
+        uploaded_url = UploadedURL.create(url)
+        actual = uploaded_url.page_url(2, 100)
+        expect = (
+            "https://nvapi.nicovideo.jp/v3/users/1234567/videos"
+            "?sortKey=registeredAt&sortOrder=desc&pageSize=100&page=2"
+        )
+        self.assertEqual(expect, actual)
+
     def test_create(self):
         """create のテスト"""
         # 正常系
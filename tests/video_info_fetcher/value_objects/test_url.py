@@ -50,6 +50,25 @@ class TestURL(unittest.TestCase):
             original_url = "不正なURLアドレス"
             url = URL(original_url)
 
+    def test_create(self):
+        """create のテスト"""
+        urls = self._get_url_set()
+        for original_url in urls:
+            url = URL.create(original_url)
+            self.assertEqual(URL(original_url), url)
+            # 同じURL文字列に対しては同じインスタンスを返す
+            self.assertIs(url, URL.create(original_url))
+            # URL インスタンスはそのまま返す
+            self.assertIs(url, URL.create(url))
+
+        hits = URL._intern_cache.hits
+        URL.create(urls[0])
+        self.assertEqual(hits + 1, URL._intern_cache.hits)
+
+        # 異常系
+        with self.assertRaises(ValueError):
+            url = URL.create("不正なURLアドレス")
+
     def test_is_valid(self):
         """is_valid のテスト"""
         original_url = self._get_url_set()[0]
@@ -35,6 +35,14 @@ class TestUserMylistURL(unittest.TestCase):
             mylist_url = UserMylistURL(url)
             mylist_url.original_url = url + "FrozenError"
 
+    def test_page_url(self):
+        """page_url のテスト"""
+        url = "https://www.nicovideo.jp/user/1234567/mylist/12345678?ref=pc_mypage_nicorepo"
+        mylist_url = UserMylistURL.create(url)
+        actual = mylist_url.page_url(3, 50)
+        expect = "https://nvapi.nicovideo.jp/v2/mylists/12345678?sortKey=addedAt&sortOrder=desc&pageSize=50&page=3"
+        self.assertEqual(expect, actual)
+
     def test_create(self):
         """create のテスト"""
         # 正常系
@@ -49,6 +49,11 @@ class TestVideoURL(unittest.TestCase):
         video_url = VideoURL.create(url)
         self.assertEqual(url, video_url.url)
 
+        # 同じURL文字列に対しては同じインスタンスを返す
+        self.assertIs(video_url, VideoURL.create(url))
+        self.assertIs(video_url, VideoURL.create(url.original_url))
+        self.assertIsNot(video_url, VideoURL.create("https://www.nicovideo.jp/watch/sm12345678"))
+
         # 異常系
         # URLを表す文字列でない（URLのエラー）
         url = "不正なURL"